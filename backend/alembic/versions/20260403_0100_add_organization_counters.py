@@ -0,0 +1,55 @@
+"""Add organization counters table.
+
+Revision ID: 20260403_0100
+Revises: 20260402_0600
+Create Date: 2026-04-03 01:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.rls import generate_rls_policy_sql
+
+
+revision = "20260403_0100"
+down_revision = "20260402_0600"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "organization_counters",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("counter_key", sa.String(length=255), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("is_stale", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("reconciled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("organization_id", "counter_key", name="uq_org_counter_key"),
+    )
+    op.create_index(op.f("ix_organization_counters_id"), "organization_counters", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_organization_counters_organization_id"),
+        "organization_counters",
+        ["organization_id"],
+        unique=False,
+    )
+
+    op.execute(generate_rls_policy_sql("organization_counters"))
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP POLICY IF EXISTS organization_counters_tenant_isolation ON organization_counters;"
+    )
+    op.drop_index(
+        op.f("ix_organization_counters_organization_id"),
+        table_name="organization_counters",
+    )
+    op.drop_index(op.f("ix_organization_counters_id"), table_name="organization_counters")
+    op.drop_table("organization_counters")
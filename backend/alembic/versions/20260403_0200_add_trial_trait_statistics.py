@@ -0,0 +1,68 @@
+"""Add trial trait statistics table.
+
+Revision ID: 20260403_0200
+Revises: 20260403_0100
+Create Date: 2026-04-03 02:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.rls import generate_rls_policy_sql
+
+
+revision = "20260403_0200"
+down_revision = "20260403_0100"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trial_trait_statistics",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("study_id", sa.Integer(), nullable=False),
+        sa.Column("observation_variable_id", sa.Integer(), nullable=False),
+        sa.Column("germplasm_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("n", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sum_x", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("sum_x2", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["study_id"], ["studies.id"]),
+        sa.ForeignKeyConstraint(["observation_variable_id"], ["observation_variables.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "study_id", "observation_variable_id", "germplasm_id", name="uq_trial_trait_statistic_cell"
+        ),
+    )
+    op.create_index(op.f("ix_trial_trait_statistics_id"), "trial_trait_statistics", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_trial_trait_statistics_organization_id"),
+        "trial_trait_statistics",
+        ["organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_trial_trait_statistics_study_id"),
+        "trial_trait_statistics",
+        ["study_id"],
+        unique=False,
+    )
+
+    op.execute(generate_rls_policy_sql("trial_trait_statistics"))
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP POLICY IF EXISTS trial_trait_statistics_tenant_isolation ON trial_trait_statistics;"
+    )
+    op.drop_index(op.f("ix_trial_trait_statistics_study_id"), table_name="trial_trait_statistics")
+    op.drop_index(
+        op.f("ix_trial_trait_statistics_organization_id"),
+        table_name="trial_trait_statistics",
+    )
+    op.drop_index(op.f("ix_trial_trait_statistics_id"), table_name="trial_trait_statistics")
+    op.drop_table("trial_trait_statistics")
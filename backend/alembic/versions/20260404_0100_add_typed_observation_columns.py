@@ -0,0 +1,175 @@
+"""Add typed observation value columns and composite indexes.
+
+Revision ID: 20260404_0100
+Revises: 20260403_0200
+Create Date: 2026-04-04 01:00:00.000000
+"""
+
+import math
+import re
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+revision = "20260404_0100"
+down_revision = "20260403_0200"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 50_000
+
+# Frozen copy of the typing rules in app.models.phenotyping at this revision
+NUMERIC_VALUE_PATTERN = r"^[-+]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][-+]?[0-9]+)?$"
+_NUMERIC_VALUE = re.compile(NUMERIC_VALUE_PATTERN)
+CATEGORICAL_VALUE_MAX_LENGTH = 255
+
+COMPOSITE_INDEXES = {
+    "ix_observations_org_variable_study": ["organization_id", "observation_variable_id", "study_id"],
+    "ix_observations_study_germplasm": ["study_id", "germplasm_id"],
+    "ix_observations_org_observed_at": ["organization_id", "observed_at"],
+}
+
+# Try-casts: malformed legacy values become NULL instead of aborting the batch
+_POSTGRES_HELPERS = (
+    """
+CREATE OR REPLACE FUNCTION pg_temp.observation_try_float8(raw text) RETURNS double precision AS $$
+BEGIN
+    RETURN raw::double precision;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql IMMUTABLE
+""",
+    """
+CREATE OR REPLACE FUNCTION pg_temp.observation_try_timestamptz(raw text) RETURNS timestamptz AS $$
+BEGIN
+    RETURN NULLIF(btrim(raw), '')::timestamptz;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql STABLE
+""",
+)
+
+_POSTGRES_BACKFILL = """
+UPDATE observations AS o
+SET value_numeric = t.num,
+    value_categorical = CASE
+        WHEN t.num IS NULL AND t.txt <> '' AND length(t.txt) <= 255 THEN t.txt
+    END,
+    observed_at = pg_temp.observation_try_timestamptz(o.observation_time_stamp)
+FROM (
+    SELECT id,
+           btrim(value, E' \\t\\r\\n') AS txt,
+           CASE
+               WHEN btrim(value, E' \\t\\r\\n') ~ :pattern
+               THEN pg_temp.observation_try_float8(btrim(value, E' \\t\\r\\n'))
+           END AS num
+    FROM observations
+    WHERE id >= :lo AND id < :hi
+) AS t
+WHERE o.id = t.id
+"""
+
+
+def _typed_values(value, time_stamp) -> dict:
+    text = str(value).strip() if value is not None else ""
+    numeric = float(text) if _NUMERIC_VALUE.match(text) else None
+    if numeric is not None and not math.isfinite(numeric):
+        numeric = None
+    categorical = text if numeric is None and text and len(text) <= CATEGORICAL_VALUE_MAX_LENGTH else None
+
+    observed_at = None
+    if isinstance(time_stamp, datetime):
+        observed_at = time_stamp
+    elif time_stamp:
+        try:
+            observed_at = datetime.fromisoformat(str(time_stamp).strip())
+        except ValueError:
+            observed_at = None
+    if observed_at is not None and observed_at.tzinfo is None:
+        observed_at = observed_at.replace(tzinfo=UTC)
+
+    return {"value_numeric": numeric, "value_categorical": categorical, "observed_at": observed_at}
+
+
+def _backfill_postgres(bind) -> None:
+    lo, hi = bind.execute(sa.text("SELECT min(id), max(id) FROM observations")).one()
+    if lo is None:
+        return
+    # Naive timestamps are stored as UTC, matching _typed_values
+    bind.execute(sa.text("SET LOCAL timezone = 'UTC'"))
+    for helper in _POSTGRES_HELPERS:
+        bind.execute(sa.text(helper))
+    statement = sa.text(_POSTGRES_BACKFILL)
+    for start in range(lo, hi + 1, BACKFILL_BATCH_SIZE):
+        bind.execute(
+            statement,
+            {"pattern": NUMERIC_VALUE_PATTERN, "lo": start, "hi": start + BACKFILL_BATCH_SIZE},
+        )
+
+
+def _backfill_python(bind) -> None:
+    observations = sa.table(
+        "observations",
+        sa.column("id", sa.Integer),
+        sa.column("value", sa.Text),
+        sa.column("observation_time_stamp", sa.String),
+        sa.column("value_numeric", sa.Float),
+        sa.column("value_categorical", sa.String),
+        sa.column("observed_at", sa.DateTime(timezone=True)),
+    )
+    update = (
+        observations.update()
+        .where(observations.c.id == sa.bindparam("row_id"))
+        .values(
+            value_numeric=sa.bindparam("value_numeric"),
+            value_categorical=sa.bindparam("value_categorical"),
+            observed_at=sa.bindparam("observed_at"),
+        )
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(observations.c.id, observations.c.value, observations.c.observation_time_stamp)
+            .where(observations.c.id > last_id)
+            .order_by(observations.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        bind.execute(
+            update,
+            [
+                {"row_id": row.id, **_typed_values(row.value, row.observation_time_stamp)}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column("observations", sa.Column("value_numeric", sa.Float(), nullable=True))
+    op.add_column("observations", sa.Column("value_categorical", sa.String(length=255), nullable=True))
+    op.add_column("observations", sa.Column("observed_at", sa.DateTime(timezone=True), nullable=True))
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        _backfill_postgres(bind)
+    else:
+        _backfill_python(bind)
+
+    # Built after the backfill so the updates don't maintain them row by row
+    for name, columns in COMPOSITE_INDEXES.items():
+        op.create_index(name, "observations", columns, unique=False)
+
+
+def downgrade() -> None:
+    for name in COMPOSITE_INDEXES:
+        op.drop_index(name, table_name="observations")
+    op.drop_column("observations", "observed_at")
+    op.drop_column("observations", "value_categorical")
+    op.drop_column("observations", "value_numeric")
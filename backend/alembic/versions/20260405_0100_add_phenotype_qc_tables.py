@@ -0,0 +1,105 @@
+"""Add phenotype QC statistics and issues tables.
+
+Revision ID: 20260405_0100
+Revises: 20260404_0100
+Create Date: 2026-04-05 01:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.rls import generate_rls_policy_sql
+
+
+revision = "20260405_0100"
+down_revision = "20260404_0100"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "phenotype_qc_statistics",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("study_id", sa.Integer(), nullable=False),
+        sa.Column("observation_variable_id", sa.Integer(), nullable=False),
+        sa.Column("n", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("min_value", sa.Float(), nullable=True),
+        sa.Column("max_value", sa.Float(), nullable=True),
+        sa.Column("sum_x", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("sum_x2", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("sketch", sa.JSON(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["study_id"], ["studies.id"]),
+        sa.ForeignKeyConstraint(["observation_variable_id"], ["observation_variables.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("study_id", "observation_variable_id", name="uq_phenotype_qc_statistic_trait"),
+    )
+    op.create_index(op.f("ix_phenotype_qc_statistics_id"), "phenotype_qc_statistics", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_phenotype_qc_statistics_organization_id"),
+        "phenotype_qc_statistics",
+        ["organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_phenotype_qc_statistics_study_id"), "phenotype_qc_statistics", ["study_id"], unique=False
+    )
+
+    op.create_table(
+        "phenotype_qc_issues",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(length=30), nullable=False),
+        sa.Column("record_id", sa.Integer(), nullable=False),
+        sa.Column("observation_variable_id", sa.Integer(), nullable=True),
+        sa.Column("study_id", sa.Integer(), nullable=True),
+        sa.Column("germplasm_id", sa.Integer(), nullable=True),
+        sa.Column("value", sa.String(length=255), nullable=True),
+        sa.Column("rule", sa.String(length=50), nullable=False),
+        sa.Column("issue_type", sa.String(length=30), nullable=False),
+        sa.Column("severity", sa.String(length=20), nullable=False),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="open"),
+        sa.Column("batch_id", sa.String(length=64), nullable=True),
+        sa.Column("resolved_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("resolved_by", sa.String(length=255), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["study_id"], ["studies.id"]),
+        sa.ForeignKeyConstraint(["observation_variable_id"], ["observation_variables.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_phenotype_qc_issues_id"), "phenotype_qc_issues", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_phenotype_qc_issues_organization_id"), "phenotype_qc_issues", ["organization_id"], unique=False
+    )
+    op.create_index(
+        "ix_phenotype_qc_issues_org_status_severity",
+        "phenotype_qc_issues",
+        ["organization_id", "status", "severity"],
+        unique=False,
+    )
+    op.create_index("ix_phenotype_qc_issues_record", "phenotype_qc_issues", ["source", "record_id"], unique=False)
+
+    op.execute(generate_rls_policy_sql("phenotype_qc_statistics"))
+    op.execute(generate_rls_policy_sql("phenotype_qc_issues"))
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS phenotype_qc_issues_tenant_isolation ON phenotype_qc_issues;")
+    op.execute("DROP POLICY IF EXISTS phenotype_qc_statistics_tenant_isolation ON phenotype_qc_statistics;")
+    op.drop_index("ix_phenotype_qc_issues_record", table_name="phenotype_qc_issues")
+    op.drop_index("ix_phenotype_qc_issues_org_status_severity", table_name="phenotype_qc_issues")
+    op.drop_index(op.f("ix_phenotype_qc_issues_organization_id"), table_name="phenotype_qc_issues")
+    op.drop_index(op.f("ix_phenotype_qc_issues_id"), table_name="phenotype_qc_issues")
+    op.drop_table("phenotype_qc_issues")
+    op.drop_index(op.f("ix_phenotype_qc_statistics_study_id"), table_name="phenotype_qc_statistics")
+    op.drop_index(op.f("ix_phenotype_qc_statistics_organization_id"), table_name="phenotype_qc_statistics")
+    op.drop_index(op.f("ix_phenotype_qc_statistics_id"), table_name="phenotype_qc_statistics")
+    op.drop_table("phenotype_qc_statistics")
@@ -0,0 +1,57 @@
+"""Add BrAPI harvest checkpoints table.
+
+Revision ID: 20260406_0100
+Revises: 20260405_0100
+Create Date: 2026-04-06 01:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.rls import generate_rls_policy_sql
+
+
+revision = "20260406_0100"
+down_revision = "20260405_0100"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "brapi_harvest_checkpoints",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(length=500), nullable=False),
+        sa.Column("entity", sa.String(length=50), nullable=False),
+        sa.Column("next_page", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_pages", sa.Integer(), nullable=True),
+        sa.Column("search_results_db_id", sa.String(length=255), nullable=True),
+        sa.Column("run_started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("modified_since", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("records_harvested", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="idle"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("organization_id", "source", "entity", name="uq_brapi_harvest_checkpoint"),
+    )
+    op.create_index(op.f("ix_brapi_harvest_checkpoints_id"), "brapi_harvest_checkpoints", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_brapi_harvest_checkpoints_organization_id"),
+        "brapi_harvest_checkpoints",
+        ["organization_id"],
+        unique=False,
+    )
+
+    op.execute(generate_rls_policy_sql("brapi_harvest_checkpoints"))
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS brapi_harvest_checkpoints_tenant_isolation ON brapi_harvest_checkpoints;")
+    op.drop_index(op.f("ix_brapi_harvest_checkpoints_organization_id"), table_name="brapi_harvest_checkpoints")
+    op.drop_index(op.f("ix_brapi_harvest_checkpoints_id"), table_name="brapi_harvest_checkpoints")
+    op.drop_table("brapi_harvest_checkpoints")
@@ -0,0 +1,95 @@
+"""Backfill trial trait statistics from existing observations.
+
+The flush hook only counts observations written after trial_trait_statistics
+existed, so statistics for older observations are built here once. This runs
+after the typed-value backfill because the statistics sum value_numeric.
+
+Revision ID: 20260406_0200
+Revises: 20260406_0100
+Create Date: 2026-04-06 02:00:00.000000
+"""
+
+from datetime import UTC, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20260406_0200"
+down_revision = "20260406_0100"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    statistics = sa.table(
+        "trial_trait_statistics",
+        sa.column("organization_id", sa.Integer),
+        sa.column("study_id", sa.Integer),
+        sa.column("observation_variable_id", sa.Integer),
+        sa.column("germplasm_id", sa.Integer),
+        sa.column("n", sa.Integer),
+        sa.column("sum_x", sa.Float),
+        sa.column("sum_x2", sa.Float),
+        sa.column("created_at", sa.DateTime(timezone=True)),
+        sa.column("updated_at", sa.DateTime(timezone=True)),
+    )
+    observations = sa.table(
+        "observations",
+        sa.column("organization_id", sa.Integer),
+        sa.column("observation_unit_id", sa.Integer),
+        sa.column("observation_variable_id", sa.Integer),
+        sa.column("germplasm_id", sa.Integer),
+        sa.column("value_numeric", sa.Float),
+    )
+    units = sa.table("observation_units", sa.column("id", sa.Integer), sa.column("study_id", sa.Integer))
+    studies = sa.table("studies", sa.column("id", sa.Integer), sa.column("organization_id", sa.Integer))
+
+    # Same cells as TrialStatisticsService.rebuild: the unit's study, the study's
+    # organization, and germplasm 0 for observations without one
+    value = observations.c.value_numeric
+    germplasm_id = sa.func.coalesce(observations.c.germplasm_id, 0)
+    now = sa.literal(datetime.now(UTC), sa.DateTime(timezone=True))
+    cells = (
+        sa.select(
+            studies.c.organization_id,
+            units.c.study_id,
+            observations.c.observation_variable_id,
+            germplasm_id,
+            sa.func.count(),
+            sa.func.sum(value),
+            sa.func.sum(value * value),
+            now,
+            now,
+        )
+        .select_from(observations)
+        .join(units, units.c.id == observations.c.observation_unit_id)
+        .join(studies, studies.c.id == units.c.study_id)
+        .where(observations.c.organization_id == studies.c.organization_id)
+        .where(observations.c.observation_variable_id.isnot(None))
+        .where(value.isnot(None))
+        .group_by(studies.c.organization_id, units.c.study_id, observations.c.observation_variable_id, germplasm_id)
+    )
+
+    # Rows written by the hook since 20260403_0200 are rebuilt with the rest
+    op.execute(statistics.delete())
+    op.execute(
+        statistics.insert().from_select(
+            [
+                "organization_id",
+                "study_id",
+                "observation_variable_id",
+                "germplasm_id",
+                "n",
+                "sum_x",
+                "sum_x2",
+                "created_at",
+                "updated_at",
+            ],
+            cells,
+        )
+    )
+
+
+def downgrade() -> None:
+    pass
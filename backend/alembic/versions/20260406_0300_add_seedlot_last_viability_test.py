@@ -0,0 +1,63 @@
+"""Add seedlots.last_viability_test and its organization index.
+
+Revision ID: 20260406_0300
+Revises: 20260406_0200
+Create Date: 2026-04-06 03:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.germplasm import parse_last_viability_test
+
+
+revision = "20260406_0300"
+down_revision = "20260406_0200"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10_000
+INDEX_NAME = "ix_seedlots_org_last_viability_test"
+
+
+def _backfill(bind) -> None:
+    seedlots = sa.table(
+        "seedlots",
+        sa.column("id", sa.Integer),
+        sa.column("additional_info", sa.JSON),
+        sa.column("last_viability_test", sa.Date),
+    )
+    update = (
+        seedlots.update()
+        .where(seedlots.c.id == sa.bindparam("row_id"))
+        .values(last_viability_test=sa.bindparam("tested"))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(seedlots.c.id, seedlots.c.additional_info)
+            .where(seedlots.c.id > last_id)
+            .order_by(seedlots.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        tested = [
+            {"row_id": row.id, "tested": parse_last_viability_test(row.additional_info)}
+            for row in rows
+        ]
+        tested = [row for row in tested if row["tested"] is not None]
+        if tested:
+            bind.execute(update, tested)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column("seedlots", sa.Column("last_viability_test", sa.Date(), nullable=True))
+    _backfill(op.get_bind())
+    op.create_index(INDEX_NAME, "seedlots", ["organization_id", "last_viability_test"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name="seedlots")
+    op.drop_column("seedlots", "last_viability_test")
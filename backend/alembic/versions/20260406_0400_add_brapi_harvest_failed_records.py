@@ -0,0 +1,26 @@
+"""Add failed_records to BrAPI harvest checkpoints.
+
+Revision ID: 20260406_0400
+Revises: 20260406_0300
+Create Date: 2026-04-06 04:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20260406_0400"
+down_revision = "20260406_0300"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "brapi_harvest_checkpoints",
+        sa.Column("failed_records", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("brapi_harvest_checkpoints", "failed_records")
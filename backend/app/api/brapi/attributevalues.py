@@ -14,6 +14,7 @@ from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.brapi_phenotyping import GermplasmAttributeDefinition, GermplasmAttributeValue
 from app.models.germplasm import Germplasm
 
@@ -95,6 +96,7 @@ def model_to_response(av: GermplasmAttributeValue) -> dict:
 async def get_attribute_values(
     page: int = Query(0, ge=0),
     pageSize: int = Query(1000, ge=1, le=2000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     attributeDbId: str | None = Query(None),
     attributeName: str | None = Query(None),
     attributeValueDbId: str | None = Query(None),
@@ -127,20 +129,18 @@ async def get_attribute_values(
     if conditions:
         query = query.where(and_(*conditions))
 
-    # Get total count
-    count_result = await db.execute(select(GermplasmAttributeValue.id).where(and_(*conditions)) if conditions else select(GermplasmAttributeValue.id))
-    total_count = len(count_result.all())
-
-    # Apply pagination
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    result = await db.execute(query)
-    values = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken
+    )
+    values = page_result.items
+    total_count = page_result.total_count
 
-    return create_response(
+    response = create_response(
         {"data": [model_to_response(v) for v in values]},
-        page, pageSize, total_count
+        page_result.page, pageSize, total_count
     )
+    return with_page(response, page_result)
 
 
 @router.get("/attributevalues/{attributeValueDbId}")
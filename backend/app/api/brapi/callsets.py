@@ -7,11 +7,12 @@ Database-backed implementation (no in-memory stores)
 
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.genotyping import Call, CallSet, VariantSet
 
 
@@ -85,6 +86,7 @@ async def get_callsets(
     germplasmDbId: str | None = None,
     page: int = Query(0, ge=0),
     pageSize: int = Query(1000, ge=1, le=10000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     db: AsyncSession = Depends(get_db)
 ):
     """Retrieves a list of call sets from the database.
@@ -115,22 +117,17 @@ async def get_callsets(
     if variantSetDbId:
         query = query.join(CallSet.variant_sets).where(VariantSet.variant_set_db_id == variantSetDbId)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    # Execute query
-    result = await db.execute(query)
-    callsets = result.scalars().unique().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken
+    )
+    callsets = page_result.items
+    total = page_result.total_count
 
     # Convert to BrAPI format
     data = [callset_to_brapi(cs) for cs in callsets]
 
-    return brapi_response(data, page, pageSize, total)
+    return with_page(brapi_response(data, page_result.page, pageSize, total), page_result)
 
 
 @router.get("/callsets/{callSetDbId}")
@@ -174,6 +171,7 @@ async def get_callset_calls(
     callSetDbId: str,
     page: int = Query(0, ge=0),
     pageSize: int = Query(1000, ge=1, le=10000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     db: AsyncSession = Depends(get_db)
 ):
     """Retrieves all calls for a specific call set.
@@ -209,16 +207,12 @@ async def get_callset_calls(
         selectinload(Call.variant)
     ).where(Call.call_set_id == callset.id)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    result = await db.execute(query)
-    calls = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken
+    )
+    calls = page_result.items
+    total = page_result.total_count
 
     # Convert to BrAPI format
     data = []
@@ -235,4 +229,4 @@ async def get_callset_calls(
             "additionalInfo": call.additional_info or {}
         })
 
-    return brapi_response(data, page, pageSize, total)
+    return with_page(brapi_response(data, page_result.page, pageSize, total), page_result)
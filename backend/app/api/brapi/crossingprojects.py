@@ -11,11 +11,12 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_organization_id
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.core import Program
 from app.models.germplasm import CrossingProject as CrossingProjectModel
 
@@ -83,6 +84,7 @@ def create_response(data, page=0, page_size=1000, total_count=1):
 async def get_crossing_projects(
     page: int = Query(0, ge=0),
     pageSize: int = Query(1000, ge=1, le=2000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     crossingProjectDbId: str | None = Query(None),
     crossingProjectName: str | None = Query(None),
     programDbId: str | None = Query(None),
@@ -113,17 +115,14 @@ async def get_crossing_projects(
         subquery = select(Program.id).where(Program.program_db_id == programDbId)
         query = query.where(CrossingProjectModel.program_id.in_(subquery))
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total_count = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.order_by(CrossingProjectModel.crossing_project_name)
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    result = await db.execute(query)
-    projects = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken,
+        sort_keys=[CrossingProjectModel.crossing_project_name, CrossingProjectModel.id],
+        organization_id=org_id,
+    )
+    projects = page_result.items
+    total_count = page_result.total_count
 
     # Build response with related data
     result_data = []
@@ -138,7 +137,8 @@ async def get_crossing_projects(
 
         result_data.append(model_to_dict(project, program_name))
 
-    return create_response({"data": result_data}, page, pageSize, total_count)
+    response = create_response({"data": result_data}, page_result.page, pageSize, total_count)
+    return with_page(response, page_result)
 
 
 @router.get("/crossingprojects/{crossingProjectDbId}")
@@ -11,11 +11,12 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_optional_user
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models.phenotyping import Event
 
 
@@ -63,6 +64,7 @@ def _model_to_brapi(event: Event) -> dict:
 async def list_events(
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     eventDbId: str | None = None,
     eventType: str | None = None,
     studyDbId: str | None = None,
@@ -111,27 +113,19 @@ async def list_events(
     if dateRangeEnd:
         stmt = stmt.where(Event.date <= dateRangeEnd)
 
-    # Get total count
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    # Apply pagination and execute
-    stmt = stmt.offset(page * pageSize).limit(pageSize)
-    result = await db.execute(stmt)
-    results = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, stmt, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
+    results = page_result.items
 
     data = [_model_to_brapi(e) for e in results]
 
     return {
         "metadata": {
             "datafiles": [],
-            "pagination": {
-                "currentPage": page,
-                "pageSize": pageSize,
-                "totalCount": total,
-                "totalPages": (total + pageSize - 1) // pageSize if total > 0 else 0,
-            },
+            "pagination": page_result.pagination(),
             "status": [{"message": "Request successful", "messageType": "INFO"}],
         },
         "result": {"data": data},
@@ -9,12 +9,13 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_current_user, get_optional_user
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.germplasm import Cross
 from app.models.germplasm import Germplasm as GermplasmModel
 from app.modules.germplasm.services.germplasm_service import GermplasmService
@@ -116,6 +117,7 @@ def _brapi_response(data, page: int = 0, pageSize: int = 20, total: int = 0, mes
 async def list_germplasm(
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = None,
     germplasmName: str | None = None,
     commonCropName: str | None = None,
     species: str | None = None,
@@ -128,6 +130,7 @@ async def list_germplasm(
     Args:
         page (int): The page number to return.
         pageSize (int): The number of items to return per page.
+        pageToken (Optional[str]): The nextPageToken of the previous page.
         germplasmName (Optional[str]): A name to filter by.
         commonCropName (Optional[str]): A common crop name to filter by.
         species (Optional[str]): A species to filter by.
@@ -140,40 +143,30 @@ async def list_germplasm(
     """
     # Build query
     query = select(GermplasmModel)
-    count_query = select(func.count(GermplasmModel.id))
 
     # Filter by user's organization (multi-tenant isolation)
     if current_user and current_user.organization_id:
         query = query.where(GermplasmModel.organization_id == current_user.organization_id)
-        count_query = count_query.where(GermplasmModel.organization_id == current_user.organization_id)
 
     # Apply filters
     if germplasmName:
         query = query.where(GermplasmModel.germplasm_name.ilike(f"%{germplasmName}%"))
-        count_query = count_query.where(GermplasmModel.germplasm_name.ilike(f"%{germplasmName}%"))
     if commonCropName:
         query = query.where(GermplasmModel.common_crop_name.ilike(f"%{commonCropName}%"))
-        count_query = count_query.where(GermplasmModel.common_crop_name.ilike(f"%{commonCropName}%"))
     if species:
         query = query.where(GermplasmModel.species.ilike(f"%{species}%"))
-        count_query = count_query.where(GermplasmModel.species.ilike(f"%{species}%"))
     if genus:
         query = query.where(GermplasmModel.genus.ilike(f"%{genus}%"))
-        count_query = count_query.where(GermplasmModel.genus.ilike(f"%{genus}%"))
 
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    # Execute query
-    result = await db.execute(query)
-    germplasm_list = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
 
-    data = [_model_to_brapi(g) for g in germplasm_list]
-    return _brapi_response(data, page, pageSize, total)
+    data = [_model_to_brapi(g) for g in page_result.items]
+    response = _brapi_response(data, page_result.page, pageSize, page_result.total_count)
+    return with_page(response, page_result)
 
 
 @router.post("/germplasm")
@@ -446,6 +439,7 @@ async def get_germplasm_progeny(
     germplasmDbId: str,
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = None,
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_optional_user),
 ):
@@ -455,6 +449,7 @@ async def get_germplasm_progeny(
         germplasmDbId (str): The ID of the germplasm to get the progeny of.
         page (int): The page number to return.
         pageSize (int): The number of items to return per page.
+        pageToken (Optional[str]): The nextPageToken of the previous page.
         db (AsyncSession): The database session.
         current_user (Optional[User]): The current user.
 
@@ -499,17 +494,12 @@ async def get_germplasm_progeny(
     cross_ids = list(cross_roles.keys())
 
     progeny_query = select(GermplasmModel).where(GermplasmModel.cross_id.in_(cross_ids))
-    count_query = select(func.count(GermplasmModel.id)).where(GermplasmModel.cross_id.in_(cross_ids))
-
-    # Get total count
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    progeny_query = progeny_query.offset(page * pageSize).limit(pageSize)
-
-    progeny_result = await db.execute(progeny_query)
-    progeny_list = progeny_result.scalars().all()
+    page_result = await paginate(
+        db, progeny_query, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
+    progeny_list = page_result.items
+    total = page_result.total_count
 
     # 3. Format response
     progeny_data_list = []
@@ -527,7 +517,8 @@ async def get_germplasm_progeny(
         "progeny": progeny_data_list
     }
 
-    return _brapi_response(result_data, page, pageSize, total)
+    response = _brapi_response(result_data, page_result.page, pageSize, total)
+    return with_page(response, page_result)
 
 
 @router.get("/germplasm/{germplasmDbId}/mcpd")
@@ -11,12 +11,14 @@ from datetime import UTC, datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_current_user, get_optional_user
 from app.core.database import get_db
+from app.core.pagination import paginate
+from app.models.germplasm import Germplasm
 from app.models.phenotyping import Observation, ObservationUnit, ObservationVariable
 
 
@@ -73,6 +75,7 @@ def _model_to_brapi(obs: Observation) -> dict:
 async def list_observations(
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = None,
     studyDbId: str | None = None,
     germplasmDbId: str | None = None,
     observationVariableDbId: str | None = None,
@@ -85,6 +88,7 @@ async def list_observations(
     Args:
         page (int): The page number to retrieve.
         pageSize (int): The number of items per page.
+        pageToken (Optional[str]): The nextPageToken of the previous page.
         studyDbId (Optional[str]): The ID of the study to filter by.
         germplasmDbId (Optional[str]): The ID of the germplasm to filter by.
         observationVariableDbId (Optional[str]): The ID of the observation variable to filter by.
@@ -122,29 +126,17 @@ async def list_observations(
             ObservationUnit.observation_unit_db_id == observationUnitDbId
         )
 
-    # Get total count
-    count_query = select(func.count()).select_from(Observation)
-    if studyDbId:
-        with contextlib.suppress(ValueError):
-            count_query = count_query.where(Observation.study_id == int(studyDbId))
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Paginate
-    query = query.offset(page * pageSize).limit(pageSize)
-    result = await db.execute(query)
-    results = result.scalars().all()
-    data = [_model_to_brapi(obs) for obs in results]
+    # Keyset pagination; the total counts the same filters and is cached per filter
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
+    data = [_model_to_brapi(obs) for obs in page_result.items]
 
     return {
         "metadata": {
             "datafiles": [],
-            "pagination": {
-                "currentPage": page,
-                "pageSize": pageSize,
-                "totalCount": total,
-                "totalPages": (total + pageSize - 1) // pageSize if total > 0 else 0
-            },
+            "pagination": page_result.pagination(),
             "status": [{"message": "Request successful", "messageType": "INFO"}]
         },
         "result": {"data": data}
@@ -402,53 +394,53 @@ async def get_observations_table(
     Returns:
         A dictionary containing the observations in a table format and metadata.
     """
-    query = select(Observation).options(
-        selectinload(Observation.observation_unit),
-        selectinload(Observation.observation_variable),
-        selectinload(Observation.germplasm)
+    # Column projection: one row per observation, no ORM objects or relationship loads
+    query = (
+        select(
+            ObservationUnit.observation_unit_db_id,
+            Observation.observation_db_id,
+            Observation.germplasm_id,
+            Germplasm.germplasm_name,
+            ObservationVariable.observation_variable_name,
+            Observation.value,
+        )
+        .outerjoin(ObservationUnit, ObservationUnit.id == Observation.observation_unit_id)
+        .outerjoin(ObservationVariable, ObservationVariable.id == Observation.observation_variable_id)
+        .outerjoin(Germplasm, Germplasm.id == Observation.germplasm_id)
     )
 
     if studyDbId:
         with contextlib.suppress(ValueError):
             query = query.where(Observation.study_id == int(studyDbId))
     if observationUnitDbId:
-        query = query.join(ObservationUnit).where(
-            ObservationUnit.observation_unit_db_id.in_(observationUnitDbId)
-        )
+        query = query.where(ObservationUnit.observation_unit_db_id.in_(observationUnitDbId))
     if observationVariableDbId:
-        query = query.join(ObservationVariable).where(
-            ObservationVariable.observation_variable_db_id.in_(observationVariableDbId)
-        )
+        query = query.where(ObservationVariable.observation_variable_db_id.in_(observationVariableDbId))
     if germplasmDbId:
         with contextlib.suppress(ValueError):
             query = query.where(Observation.germplasm_id.in_([int(g) for g in germplasmDbId]))
 
     result = await db.execute(query)
-    results = result.scalars().all()
+    results = result.all()
 
     # Get unique variables
-    variables = list({
-        obs.observation_variable.observation_variable_name
-        for obs in results
-        if obs.observation_variable
-    })
+    variables = list(dict.fromkeys(row.observation_variable_name for row in results if row.observation_variable_name))
 
     # Build header row
     header_row = ["observationUnitDbId", "germplasmDbId", "germplasmName"] + variables
 
     # Build data rows (grouped by observation unit)
     units = {}
-    for obs in results:
-        unit_id = obs.observation_unit.observation_unit_db_id if obs.observation_unit else obs.observation_db_id
+    for row in results:
+        unit_id = row.observation_unit_db_id or row.observation_db_id
         if unit_id not in units:
             units[unit_id] = {
                 "observationUnitDbId": unit_id,
-                "germplasmDbId": str(obs.germplasm_id) if obs.germplasm_id else None,
-                "germplasmName": obs.germplasm.germplasm_name if obs.germplasm else None,
+                "germplasmDbId": str(row.germplasm_id) if row.germplasm_id else None,
+                "germplasmName": row.germplasm_name,
             }
-        if obs.observation_variable:
-            var_name = obs.observation_variable.observation_variable_name
-            units[unit_id][var_name] = obs.value
+        if row.observation_variable_name:
+            units[unit_id][row.observation_variable_name] = row.value
 
     data_rows = []
     for unit in units.values():
@@ -9,11 +9,12 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_organization_id
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.core import Ontology as OntologyModel
 
 
@@ -88,6 +89,7 @@ async def get_ontologies(
     ontologyName: str | None = None,
     page: int = Query(0, ge=0),
     pageSize: int = Query(1000, ge=1, le=10000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     db: AsyncSession = Depends(get_db),
     org_id: int = Depends(get_organization_id),
 ):
@@ -113,22 +115,20 @@ async def get_ontologies(
     if ontologyName:
         query = query.where(OntologyModel.ontology_name.ilike(f"%{ontologyName}%"))
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total_count = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.order_by(OntologyModel.ontology_name)
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    result = await db.execute(query)
-    ontologies = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken,
+        sort_keys=[OntologyModel.ontology_name, OntologyModel.id],
+        organization_id=org_id,
+    )
+    ontologies = page_result.items
+    total_count = page_result.total_count
 
     # Convert to BrAPI format
     ontologies_data = [model_to_dict(o) for o in ontologies]
 
-    return brapi_response(ontologies_data, page, pageSize, total_count)
+    response = brapi_response(ontologies_data, page_result.page, pageSize, total_count)
+    return with_page(response, page_result)
 
 
 @router.get("/ontologies/{ontologyDbId}")
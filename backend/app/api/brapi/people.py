@@ -6,11 +6,12 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_optional_user
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.core import Person as PersonModel
 
 
@@ -152,6 +153,7 @@ def create_single_response(data: any):
 async def list_people(
     page: int = Query(0, ge=0, description="Page number"),
     pageSize: int = Query(20, ge=1, le=1000, description="Page size"),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     firstName: str | None = Query(None, description="Filter by first name"),
     lastName: str | None = Query(None, description="Filter by last name"),
     db: AsyncSession = Depends(get_db),
@@ -183,22 +185,19 @@ async def list_people(
     if lastName:
         query = query.where(PersonModel.last_name.ilike(f"%{lastName}%"))
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    result = await db.execute(count_query)
-    total_count = result.scalar()
-
-    # Apply pagination
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    # Execute query
-    result = await db.execute(query)
-    people = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
+    people = page_result.items
+    total_count = page_result.total_count
 
     # Convert to BrAPI format
     people_list = [_model_to_brapi(p) for p in people]
 
-    return create_brapi_response(people_list, page, pageSize, total_count)
+    response = create_brapi_response(people_list, page_result.page, pageSize, total_count)
+    return with_page(response, page_result)
 
 
 @router.get("/people/{personDbId}")
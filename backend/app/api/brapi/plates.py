@@ -8,12 +8,13 @@ Database-backed implementation (no in-memory stores)
 import uuid
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_current_user, get_organization_id
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.core import User
 from app.models.genotyping import Plate
 from app.models.phenotyping import Sample
@@ -114,6 +115,7 @@ async def get_plates(
     externalReferenceSource: str | None = None,
     page: int = Query(0, ge=0),
     pageSize: int = Query(1000, ge=1, le=10000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -156,17 +158,13 @@ async def get_plates(
     if plateBarcode:
         query = query.where(Plate.plate_barcode == plateBarcode)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    # Execute query
-    result = await db.execute(query)
-    plates = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id
+    )
+    plates = page_result.items
+    total = page_result.total_count
 
     # Get samples for each plate
     data = []
@@ -189,7 +187,7 @@ async def get_plates(
         samples = samples_map.get(plate.plate_db_id, [])
         data.append(plate_to_brapi(plate, samples))
 
-    return brapi_response(data, page, pageSize, total)
+    return with_page(brapi_response(data, page_result.page, pageSize, total), page_result)
 
 
 @router.get("/plates/{plateDbId}")
@@ -7,11 +7,12 @@ Database-backed implementation (no in-memory stores)
 
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.genotyping import Reference, ReferenceSet
 
 
@@ -92,6 +93,7 @@ async def get_references(
     maxLength: int | None = None,
     page: int = Query(0, ge=0),
     pageSize: int = Query(1000, ge=1, le=10000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     db: AsyncSession = Depends(get_db)
 ):
     """Retrieves a list of references based on specified filter criteria.
@@ -129,22 +131,17 @@ async def get_references(
     if maxLength is not None:
         query = query.where(Reference.length <= maxLength)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    # Execute query
-    result = await db.execute(query)
-    references = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken
+    )
+    references = page_result.items
+    total = page_result.total_count
 
     # Convert to BrAPI format
     data = [reference_to_brapi(ref) for ref in references]
 
-    return brapi_response(data, page, pageSize, total)
+    return with_page(brapi_response(data, page_result.page, pageSize, total), page_result)
 
 
 @router.get("/references/{referenceDbId}")
@@ -11,12 +11,13 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_current_user, get_optional_user
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models.phenotyping import ObservationUnit, Sample
 
 
@@ -97,6 +98,7 @@ def _model_to_brapi(sample: Sample) -> dict:
 async def list_samples(
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     sampleDbId: str | None = None,
     sampleName: str | None = None,
     sampleType: str | None = None,
@@ -150,28 +152,18 @@ async def list_samples(
             ObservationUnit.observation_unit_db_id == observationUnitDbId
         )
 
-    # Get total count
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    stmt = stmt.offset(page * pageSize).limit(pageSize)
-
-    # Execute query
-    result = await db.execute(stmt)
-    samples = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, stmt, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
+    samples = page_result.items
     data = [_model_to_brapi(s) for s in samples]
 
     return {
         "metadata": {
             "datafiles": [],
-            "pagination": {
-                "currentPage": page,
-                "pageSize": pageSize,
-                "totalCount": total,
-                "totalPages": (total + pageSize - 1) // pageSize if total > 0 else 0,
-            },
+            "pagination": page_result.pagination(),
             "status": [{"message": "Request successful", "messageType": "INFO"}],
         },
         "result": {"data": data},
@@ -11,12 +11,13 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_current_user, get_optional_user
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models.core import Location, Program
 from app.models.germplasm import Germplasm, Seedlot, SeedlotTransaction
 
@@ -76,6 +77,7 @@ def _model_to_brapi(seedlot: Seedlot) -> dict:
 async def list_seedlots(
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     germplasmDbId: str | None = None,
     locationDbId: str | None = None,
     programDbId: str | None = None,
@@ -123,26 +125,18 @@ async def list_seedlots(
     if seedLotName:
         stmt = stmt.where(Seedlot.seedlot_name.ilike(f"%{seedLotName}%"))
 
-    # Get total count
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    # Apply pagination and execute
-    stmt = stmt.offset(page * pageSize).limit(pageSize)
-    result = await db.execute(stmt)
-    results = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, stmt, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
+    results = page_result.items
     data = [_model_to_brapi(sl) for sl in results]
 
     return {
         "metadata": {
             "datafiles": [],
-            "pagination": {
-                "currentPage": page,
-                "pageSize": pageSize,
-                "totalCount": total,
-                "totalPages": (total + pageSize - 1) // pageSize if total > 0 else 0,
-            },
+            "pagination": page_result.pagination(),
             "status": [{"message": "Request successful", "messageType": "INFO"}],
         },
         "result": {"data": data},
@@ -370,6 +364,7 @@ def _transaction_to_brapi(tx: SeedlotTransaction) -> dict:
 async def list_all_transactions(
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     seedLotDbId: str | None = None,
     transactionDbId: str | None = None,
     db: AsyncSession = Depends(get_db),
@@ -395,26 +390,18 @@ async def list_all_transactions(
     if transactionDbId:
         stmt = stmt.where(SeedlotTransaction.transaction_db_id == transactionDbId)
 
-    # Get total count
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    # Apply pagination and execute
-    stmt = stmt.offset(page * pageSize).limit(pageSize)
-    result = await db.execute(stmt)
-    results = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, stmt, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
+    results = page_result.items
     data = [_transaction_to_brapi(tx) for tx in results]
 
     return {
         "metadata": {
             "datafiles": [],
-            "pagination": {
-                "currentPage": page,
-                "pageSize": pageSize,
-                "totalCount": total,
-                "totalPages": (total + pageSize - 1) // pageSize if total > 0 else 0,
-            },
+            "pagination": page_result.pagination(),
             "status": [{"message": "Request successful", "messageType": "INFO"}],
         },
         "result": {"data": data},
@@ -426,6 +413,7 @@ async def list_seedlot_transactions(
     seedLotDbId: str,
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_optional_user),
 ):
@@ -459,26 +447,18 @@ async def list_seedlot_transactions(
         .where(SeedlotTransaction.seedlot_id == seedlot.id)
     )
 
-    # Get total count
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    # Apply pagination and execute
-    stmt = stmt.offset(page * pageSize).limit(pageSize)
-    result = await db.execute(stmt)
-    results = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, stmt, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
+    results = page_result.items
     data = [_transaction_to_brapi(tx) for tx in results]
 
     return {
         "metadata": {
             "datafiles": [],
-            "pagination": {
-                "currentPage": page,
-                "pageSize": pageSize,
-                "totalCount": total,
-                "totalPages": (total + pageSize - 1) // pageSize if total > 0 else 0,
-            },
+            "pagination": page_result.pagination(),
             "status": [{"message": "Request successful", "messageType": "INFO"}],
         },
         "result": {"data": data},
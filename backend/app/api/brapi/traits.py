@@ -9,11 +9,12 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_optional_user
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models.phenotyping import ObservationVariable
 
 
@@ -76,6 +77,7 @@ def _model_to_brapi(var: ObservationVariable) -> dict:
 async def list_traits(
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = None,
     traitClass: str | None = None,
     observationVariableName: str | None = None,
     commonCropName: str | None = None,
@@ -87,6 +89,7 @@ async def list_traits(
     Args:
         page (int): The page number to retrieve.
         pageSize (int): The number of items per page.
+        pageToken (Optional[str]): The nextPageToken of the previous page.
         traitClass (Optional[str]): An optional filter for the trait class.
         observationVariableName (Optional[str]): An optional filter for the observation variable name.
         commonCropName (Optional[str]): An optional filter for the common crop name.
@@ -113,28 +116,19 @@ async def list_traits(
     if commonCropName:
         query = query.where(ObservationVariable.common_crop_name.ilike(f"%{commonCropName}%"))
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Paginate
-    query = query.offset(page * pageSize).limit(pageSize)
-    result = await db.execute(query)
-    results = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
 
     # Convert to BrAPI format
-    data = [_model_to_brapi(var) for var in results]
+    data = [_model_to_brapi(var) for var in page_result.items]
 
     return {
         "metadata": {
             "datafiles": [],
-            "pagination": {
-                "currentPage": page,
-                "pageSize": pageSize,
-                "totalCount": total,
-                "totalPages": (total + pageSize - 1) // pageSize if total > 0 else 0,
-            },
+            "pagination": page_result.pagination(),
             "status": [{"message": "Request successful", "messageType": "INFO"}],
         },
         "result": {"data": data},
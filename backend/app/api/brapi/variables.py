@@ -11,11 +11,12 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_optional_user
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models.phenotyping import ObservationVariable
 
 
@@ -124,6 +125,7 @@ def _model_to_brapi(var: ObservationVariable) -> dict:
 async def list_variables(
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     observationVariableDbId: str | None = None,
     observationVariableName: str | None = None,
     traitClass: str | None = None,
@@ -177,28 +179,18 @@ async def list_variables(
     if ontologyDbId:
         stmt = stmt.where(ObservationVariable.ontology_db_id == ontologyDbId)
 
-    # Get total count
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    stmt = stmt.offset(page * pageSize).limit(pageSize)
-
-    # Execute query
-    result = await db.execute(stmt)
-    variables = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, stmt, page=page, page_size=pageSize, page_token=pageToken,
+        organization_id=current_user.organization_id if current_user else None
+    )
+    variables = page_result.items
     data = [_model_to_brapi(v) for v in variables]
 
     return {
         "metadata": {
             "datafiles": [],
-            "pagination": {
-                "currentPage": page,
-                "pageSize": pageSize,
-                "totalCount": total,
-                "totalPages": (total + pageSize - 1) // pageSize if total > 0 else 0,
-            },
+            "pagination": page_result.pagination(),
             "status": [{"message": "Request successful", "messageType": "INFO"}],
         },
         "result": {"data": data},
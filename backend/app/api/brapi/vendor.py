@@ -11,11 +11,12 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_optional_user, get_organization_id
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.genotyping import Plate, VendorOrder
 
 
@@ -138,6 +139,7 @@ async def get_vendor_specifications(
 async def list_vendor_orders(
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     orderId: str | None = None,
     submissionId: str | None = None,
     db: AsyncSession = Depends(get_db),
@@ -154,22 +156,20 @@ async def list_vendor_orders(
     if orderId:
         query = query.where(VendorOrder.order_db_id == orderId)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.order_by(VendorOrder.created_at.desc())
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    result = await db.execute(query)
-    orders = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken,
+        sort_keys=[VendorOrder.created_at.desc(), VendorOrder.id.desc()],
+        organization_id=org_id,
+    )
+    orders = page_result.items
+    total = page_result.total_count
 
-    return _brapi_response(
+    response = _brapi_response(
         {"data": [order_to_dict(o) for o in orders]},
-        page, pageSize, total
+        page_result.page, pageSize, total
     )
+    return with_page(response, page_result)
 
 
 @router.post("/vendor/orders")
@@ -209,6 +209,7 @@ async def get_vendor_order_plates(
     orderId: str,
     page: int = Query(0, ge=0),
     pageSize: int = Query(20, ge=1, le=1000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     db: AsyncSession = Depends(get_db),
     org_id: int = Depends(get_organization_id),
 ):
@@ -234,13 +235,11 @@ async def get_vendor_order_plates(
         Plate.plate_db_id.like(f"{orderId}%")  # Plates linked by naming convention
     )
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    query = query.offset(page * pageSize).limit(pageSize)
-    result = await db.execute(query)
-    plates = result.scalars().all()
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken, organization_id=org_id
+    )
+    plates = page_result.items
+    total = page_result.total_count
 
     plates_data = []
     for plate in plates:
@@ -275,7 +274,8 @@ async def get_vendor_order_plates(
         ]
         total = len(plates_data)
 
-    return _brapi_response({"data": plates_data}, page, pageSize, total)
+    response = _brapi_response({"data": plates_data}, page_result.page, pageSize, total)
+    return with_page(response, page_result)
 
 
 @router.get("/vendor/orders/{orderId}/results")
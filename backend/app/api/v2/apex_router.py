@@ -110,6 +110,7 @@ from app.api.v2 import (
     rbac,
     reports,
     resource_management,
+    result_artifacts,
     rls,
     search,
     security_audit,
@@ -148,6 +149,7 @@ apex_router = APIRouter(tags=["APEX"])
 # AI & Analytics
 # ============================================================================
 apex_router.include_router(compute.router, tags=["Compute Engine"])
+apex_router.include_router(result_artifacts.router, tags=["Result Artifacts"])
 apex_router.include_router(audit.router, tags=["Audit Trail"])
 apex_router.include_router(insights.router, tags=["AI Insights"])
 apex_router.include_router(vector.router, tags=["Vector Store"])
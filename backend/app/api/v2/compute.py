@@ -274,6 +274,10 @@ class ComputeStatusResponse(BaseModel):
     fortran_available: bool
     numpy_version: str
     capabilities: list[str]
+    kernels: dict[str, Any] = Field(
+        default_factory=dict,
+        description="Per operation: kernel implementations and the tuned choice per size bucket",
+    )
     approved_routines: list[ApprovedRoutineDescriptor]
     active_jobs: int
     redis_available: bool
@@ -316,8 +320,10 @@ async def get_compute_status():
             "PCA/SVD",
             "LD Analysis",
             "G×E Analysis",
+            "Stability Analysis",
             "Selection Index"
         ],
+        kernels=compute_engine.kernel_summary(),
         approved_routines=[ApprovedRoutineDescriptor.model_validate(item) for item in APPROVED_ROUTINES],
         active_jobs=stats["running"] + stats["pending"],
         redis_available=stats["redis_available"],
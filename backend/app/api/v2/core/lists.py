@@ -10,11 +10,12 @@ from datetime import UTC, datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_organization_id
 from app.core.database import get_db
+from app.core.pagination import paginate, with_page
 from app.models.core import List as ListModel
 
 
@@ -88,6 +89,7 @@ def create_response(data, page=0, page_size=1000, total_count=1):
 async def get_lists(
     page: int = Query(0, ge=0),
     pageSize: int = Query(1000, ge=1, le=2000),
+    pageToken: str | None = Query(None, description="nextPageToken of the previous page"),
     listType: str | None = Query(None, description="Filter by list type"),
     listName: str | None = Query(None, description="Filter by list name"),
     listDbId: str | None = Query(None, description="Filter by list DbId"),
@@ -114,22 +116,20 @@ async def get_lists(
     if listSource:
         query = query.where(ListModel.list_source == listSource)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total_count = total_result.scalar() or 0
-
-    # Apply pagination
-    query = query.order_by(ListModel.list_name)
-    query = query.offset(page * pageSize).limit(pageSize)
-
-    result = await db.execute(query)
-    lists = result.scalars().all()
+    # Keyset pagination; the total comes from the per-filter count cache
+    page_result = await paginate(
+        db, query, page=page, page_size=pageSize, page_token=pageToken,
+        sort_keys=[ListModel.list_name, ListModel.id],
+        organization_id=org_id,
+    )
+    lists = page_result.items
+    total_count = page_result.total_count
 
     # Convert to BrAPI format
     lists_data = [model_to_dict(item) for item in lists]
 
-    return create_response({"data": lists_data}, page, pageSize, total_count)
+    response = create_response({"data": lists_data}, page_result.page, pageSize, total_count)
+    return with_page(response, page_result)
 
 
 @router.get("/lists/{listDbId}")
@@ -18,7 +18,9 @@ from app.schemas.core import Location, LocationCreate, LocationUpdate
 router = APIRouter()
 
 
-def create_brapi_response(data: any, page: int, page_size: int, total_count: int):
+def create_brapi_response(
+    data: any, page: int, page_size: int, total_count: int, next_page_token: str | None = None
+):
     """Creates a standardized BrAPI response object.
 
     This helper function constructs a `BrAPIResponse` object, populating the
@@ -37,7 +39,11 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
 
     metadata = Metadata(
         pagination=Pagination(
-            current_page=page, page_size=page_size, total_count=total_count, total_pages=total_pages
+            current_page=page,
+            page_size=page_size,
+            total_count=total_count,
+            total_pages=total_pages,
+            next_page_token=next_page_token,
         ),
         status=[Status(message="Success", message_type="INFO")],
     )
@@ -49,6 +55,9 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
 async def list_locations(
     page: int = Query(0, ge=0),
     page_size: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    page_token: str | None = Query(
+        None, alias="pageToken", description="nextPageToken of the previous page"
+    ),
     location_type: str = Query(None, alias="locationType"),
     db: AsyncSession = Depends(get_db),
     org_id: int = Depends(get_organization_id),
@@ -72,13 +81,16 @@ async def list_locations(
     if location_type:
         filters["location_type"] = location_type
 
-    skip = page * page_size
-    locations, total_count = await location_crud.get_multi(
-        db, skip=skip, limit=page_size, org_id=org_id, filters=filters if filters else None
+    result = await location_crud.get_page(
+        db, page=page, page_size=page_size, page_token=page_token, org_id=org_id,
+        filters=filters if filters else None,
     )
+    locations, total_count = result.items, result.total_count
 
     location_list = [Location.model_validate(loc).model_dump(by_alias=True) for loc in locations]
-    return create_brapi_response(location_list, page, page_size, total_count)
+    return create_brapi_response(
+        location_list, result.page, page_size, total_count, result.next_page_token
+    )
 
 
 @router.get("/locations/{locationDbId}", response_model=BrAPIResponse[dict])
@@ -227,12 +227,12 @@ async def get_relationship_matrix(
     db: AsyncSession = Depends(deps.get_db),
     organization_id: int = Depends(deps.get_organization_id)
 ):
-    # Placeholder
-    return {
-        "success": True,
-        "individuals": payload.individual_ids or [],
-        "matrix": []
-    }
+    service = PedigreeService(db)
+    try:
+        result = await service.get_relationship_matrix(payload.individual_ids, organization_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, **result}
 
 # --- Standard BrAPI (Partial Implementation with Real Data) ---
 
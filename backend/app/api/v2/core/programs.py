@@ -18,7 +18,9 @@ from app.schemas.core import Program, ProgramCreate, ProgramUpdate
 router = APIRouter()
 
 
-def create_brapi_response(data: any, page: int, page_size: int, total_count: int):
+def create_brapi_response(
+    data: any, page: int, page_size: int, total_count: int, next_page_token: str | None = None
+):
     """Creates a BrAPI-formatted response with metadata.
 
     Args:
@@ -26,6 +28,7 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
         page (int): The current page number.
         page_size (int): The number of items per page.
         total_count (int): The total number of items.
+        next_page_token (str | None): Token for the following page, if any.
 
     Returns:
         A BrAPIResponse object containing the formatted data and metadata.
@@ -34,7 +37,11 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
 
     metadata = Metadata(
         pagination=Pagination(
-            current_page=page, page_size=page_size, total_count=total_count, total_pages=total_pages
+            current_page=page,
+            page_size=page_size,
+            total_count=total_count,
+            total_pages=total_pages,
+            next_page_token=next_page_token,
         ),
         status=[Status(message="Success", message_type="INFO")],
     )
@@ -46,6 +53,9 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
 async def list_programs(
     page: int = Query(0, ge=0, description="Page number"),
     page_size: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    page_token: str | None = Query(
+        None, alias="pageToken", description="nextPageToken of the previous page"
+    ),
     program_name: str = Query(None, alias="programName"),
     abbreviation: str = Query(None),
     common_crop_name: str = Query(None, alias="commonCropName"),
@@ -74,15 +84,18 @@ async def list_programs(
         filters["abbreviation"] = abbreviation
 
     # Get programs
-    skip = page * page_size
-    programs, total_count = await program_crud.get_multi(
-        db, skip=skip, limit=page_size, org_id=org_id, filters=filters if filters else None
+    result = await program_crud.get_page(
+        db, page=page, page_size=page_size, page_token=page_token, org_id=org_id,
+        filters=filters if filters else None,
     )
+    programs, total_count = result.items, result.total_count
 
     # Convert to response schema - must use model_dump for JSON serialization
     program_list = [Program.model_validate(p).model_dump(by_alias=True) for p in programs]
 
-    return create_brapi_response(program_list, page, page_size, total_count)
+    return create_brapi_response(
+        program_list, result.page, page_size, total_count, result.next_page_token
+    )
 
 
 @router.get("/programs/{programDbId}", response_model=BrAPIResponse[dict])
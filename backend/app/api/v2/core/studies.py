@@ -18,7 +18,9 @@ from app.schemas.core import Study, StudyCreate, StudyUpdate
 router = APIRouter()
 
 
-def create_brapi_response(data: any, page: int, page_size: int, total_count: int):
+def create_brapi_response(
+    data: any, page: int, page_size: int, total_count: int, next_page_token: str | None = None
+):
     """Creates a BrAPI response object.
 
     Args:
@@ -26,6 +28,7 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
         page (int): The current page number.
         page_size (int): The number of items per page.
         total_count (int): The total number of items.
+        next_page_token (str | None): Token for the following page, if any.
 
     Returns:
         A BrAPIResponse object.
@@ -33,7 +36,11 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
     total_pages = (total_count + page_size - 1) // page_size
     metadata = Metadata(
         pagination=Pagination(
-            current_page=page, page_size=page_size, total_count=total_count, total_pages=total_pages
+            current_page=page,
+            page_size=page_size,
+            total_count=total_count,
+            total_pages=total_pages,
+            next_page_token=next_page_token,
         ),
         status=[Status(message="Success", message_type="INFO")],
     )
@@ -44,6 +51,9 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
 async def list_studies(
     page: int = Query(0, ge=0),
     page_size: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    page_token: str | None = Query(
+        None, alias="pageToken", description="nextPageToken of the previous page"
+    ),
     trial_db_id: str = Query(None, alias="trialDbId"),
     active: bool = Query(None),
     db: AsyncSession = Depends(get_db),
@@ -66,13 +76,16 @@ async def list_studies(
     if active is not None:
         filters["active"] = active
 
-    skip = page * page_size
-    studies, total_count = await study_crud.get_multi(
-        db, skip=skip, limit=page_size, org_id=org_id, filters=filters if filters else None
+    result = await study_crud.get_page(
+        db, page=page, page_size=page_size, page_token=page_token, org_id=org_id,
+        filters=filters if filters else None,
     )
+    studies, total_count = result.items, result.total_count
 
     study_list = [Study.model_validate(s).model_dump(by_alias=True) for s in studies]
-    return create_brapi_response(study_list, page, page_size, total_count)
+    return create_brapi_response(
+        study_list, result.page, page_size, total_count, result.next_page_token
+    )
 
 
 @router.get("/studies/{studyDbId}", response_model=BrAPIResponse[dict])
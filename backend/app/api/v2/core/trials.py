@@ -26,7 +26,9 @@ from app.modules.breeding.services.trial_service import TrialService
 router = APIRouter()
 
 
-def create_brapi_response(data: any, page: int, page_size: int, total_count: int):
+def create_brapi_response(
+    data: any, page: int, page_size: int, total_count: int, next_page_token: str | None = None
+):
     """Constructs a standard BrAPI response object.
 
     Args:
@@ -41,7 +43,11 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
     total_pages = (total_count + page_size - 1) // page_size
     metadata = Metadata(
         pagination=Pagination(
-            current_page=page, page_size=page_size, total_count=total_count, total_pages=total_pages
+            current_page=page,
+            page_size=page_size,
+            total_count=total_count,
+            total_pages=total_pages,
+            next_page_token=next_page_token,
         ),
         status=[Status(message="Success", message_type="INFO")],
     )
@@ -52,6 +58,9 @@ def create_brapi_response(data: any, page: int, page_size: int, total_count: int
 async def list_trials(
     page: int = Query(0, ge=0),
     page_size: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    page_token: str | None = Query(
+        None, alias="pageToken", description="nextPageToken of the previous page"
+    ),
     program_db_id: str = Query(None, alias="programDbId"),
     active: bool = Query(None),
     db: AsyncSession = Depends(get_db),
@@ -77,13 +86,16 @@ async def list_trials(
     if active is not None:
         filters["active"] = active
 
-    skip = page * page_size
-    trials, total_count = await trial_crud.get_multi(
-        db, skip=skip, limit=page_size, org_id=org_id, filters=filters if filters else None
+    result = await trial_crud.get_page(
+        db, page=page, page_size=page_size, page_token=page_token, org_id=org_id,
+        filters=filters if filters else None,
     )
+    trials, total_count = result.items, result.total_count
 
     trial_list = [Trial.model_validate(t).model_dump(by_alias=True) for t in trials]
-    return create_brapi_response(trial_list, page, page_size, total_count)
+    return create_brapi_response(
+        trial_list, result.page, page_size, total_count, result.next_page_token
+    )
 
 
 @router.get("/trials/{trialDbId}", response_model=BrAPIResponse[dict])
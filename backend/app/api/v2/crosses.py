@@ -96,6 +96,7 @@ class RankCrossesRequest(BaseModel):
     min_genetic_distance: float = Field(0.1, description="Minimum genetic distance")
     top_n: int = Field(20, ge=1, le=100, description="Number of top crosses")
     rank_by: str = Field("usefulness", description="Ranking criterion")
+    max_uses_per_parent: int | None = Field(None, ge=1, description="Mate allocation: max crosses per parent")
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -133,6 +134,7 @@ class RankCrossesResponse(BaseModel):
 
     crosses: list[RankedCross]
     total_evaluated: int
+    total_candidates: int
     selection_intensity: float
     threshold: float
     rank_by: str
@@ -336,10 +338,12 @@ async def rank_crosses(request: RankCrossesRequest):
             - min_genetic_distance: Minimum genetic distance (default 0.1)
             - top_n: Number of top crosses to return (default 20)
             - rank_by: Ranking criterion (default "usefulness")
+            - max_uses_per_parent: Optional mate allocation limit per parent
 
     Returns:
         RankCrossesResponse: Contains ranked crosses list, total_evaluated,
-            selection_intensity, threshold, and rank_by method.
+            total_candidates (passing filters), selection_intensity,
+            threshold, and rank_by method.
 
     Raises:
         HTTPException: 400 if parent count doesn't match GEBVs or genotypes.
@@ -367,6 +371,7 @@ async def rank_crosses(request: RankCrossesRequest):
             min_genetic_distance=request.min_genetic_distance,
             top_n=request.top_n,
             rank_by=request.rank_by,
+            max_uses_per_parent=request.max_uses_per_parent,
         )
 
         ranked_crosses = [
@@ -391,6 +396,7 @@ async def rank_crosses(request: RankCrossesRequest):
         return RankCrossesResponse(
             crosses=ranked_crosses,
             total_evaluated=total_possible,
+            total_candidates=ranking.n_candidates,
             selection_intensity=ranking.selection_intensity,
             threshold=ranking.threshold,
             rank_by=ranking.method,
@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ...api.deps import get_current_user
 from ...core.database import get_db
 from ...modules.core.services.data_quality import get_data_quality_service
+from ...modules.core.services.phenotype_qc_service import submit_rescore_job
 
 
 router = APIRouter(prefix="/data-quality", tags=["Data Quality"])
@@ -64,10 +65,14 @@ async def list_issues(
 
 
 @router.get("/issues/{issue_id}")
-async def get_issue(issue_id: str):
+async def get_issue(
+    issue_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
     """Get issue by ID"""
     service = get_data_quality_service()
-    issue = service.get_issue(issue_id)
+    issue = await service.get_issue(db, current_user.organization_id, issue_id)
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
     return issue
@@ -81,30 +86,48 @@ async def create_issue(data: IssueCreate):
 
 
 @router.post("/issues/{issue_id}/resolve")
-async def resolve_issue(issue_id: str, data: IssueResolve):
+async def resolve_issue(
+    issue_id: str,
+    data: IssueResolve,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
     """Resolve an issue"""
     service = get_data_quality_service()
-    issue = service.resolve_issue(issue_id, data.resolvedBy, data.notes)
+    issue = await service.resolve_issue(
+        db, current_user.organization_id, issue_id, data.resolvedBy, data.notes
+    )
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
     return issue
 
 
 @router.post("/issues/{issue_id}/ignore")
-async def ignore_issue(issue_id: str, reason: str = Query(..., description="Reason for ignoring")):
+async def ignore_issue(
+    issue_id: str,
+    reason: str = Query(..., description="Reason for ignoring"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
     """Ignore an issue"""
     service = get_data_quality_service()
-    issue = service.ignore_issue(issue_id, reason)
+    issue = await service.ignore_issue(
+        db, current_user.organization_id, issue_id, reason, ignored_by=current_user.email
+    )
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
     return issue
 
 
 @router.post("/issues/{issue_id}/reopen")
-async def reopen_issue(issue_id: str):
+async def reopen_issue(
+    issue_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
     """Reopen a resolved/ignored issue"""
     service = get_data_quality_service()
-    issue = service.reopen_issue(issue_id)
+    issue = await service.reopen_issue(db, current_user.organization_id, issue_id)
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
     return issue
@@ -143,10 +166,21 @@ async def get_overall_score(
 
 # Validation endpoints
 @router.post("/validate")
-async def run_validation(entity: str | None = Query(None, description="Entity to validate (all if not specified)")):
+async def run_validation(
+    entity: str | None = Query(None, description="Entity to validate (all if not specified)"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
     """Run data validation"""
     service = get_data_quality_service()
-    return service.run_validation(entity=entity)
+    return await service.run_validation(db, current_user.organization_id, entity_type=entity)
+
+
+@router.post("/phenotype-qc/rescore")
+async def rescore_phenotype_qc(current_user=Depends(get_current_user)):
+    """Queue a re-score of every observation in the organization (rebuilds QC statistics)"""
+    task_id = await submit_rescore_job(current_user.organization_id, user_id=str(current_user.id))
+    return {"task_id": task_id, "status": "queued"}
 
 
 @router.get("/validation-history")
@@ -9,15 +9,32 @@ Endpoints:
 - POST /api/v2/export/markers - Export marker data
 - POST /api/v2/export/field-book - Generate field book template
 - POST /api/v2/export/custom - Custom data export
+- GET /api/v2/export/stream/{dataset} - Stream observations or a matrix from the database
 """
 
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.database import get_db
 from app.modules.core.services.data_export_service import get_export_service
+from app.modules.core.services.streaming_export_service import (
+    ExportDataset,
+    ExportError,
+    ExportFormat,
+    ExportScope,
+    build_plan,
+    count_source_rows,
+    encode,
+    filename,
+    media_type,
+    submit_export_job,
+)
 
 
 router = APIRouter(prefix="/export", tags=["Data Export"], dependencies=[Depends(get_current_user)])
@@ -305,6 +322,68 @@ async def custom_export(request: CustomExportRequest):
         raise HTTPException(500, f"Export failed: {str(e)}")
 
 
+@router.get("/stream/{dataset}")
+async def stream_export(
+    dataset: ExportDataset,
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv, tsv, parquet or xlsx"),
+    program_id: int | None = Query(None, description="Limit to one breeding program"),
+    trial_id: int | None = Query(None, description="Limit to one trial"),
+    study_id: int | None = Query(None, description="Limit to one study"),
+    variant_set_id: int | None = Query(None, description="Variant set (required for markers)"),
+    gzip: bool = Query(True, description="Gzip csv/tsv output"),
+    background: bool = Query(False, description="Write to an artifact even when small"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Stream an export straight from the database
+
+    Rows are read with a server-side cursor and encoded chunk by chunk, so
+    memory stays flat however large the export is. Exports reading more than
+    EXPORT_STREAM_MAX_ROWS rows (or with background=true) are queued instead:
+    the response is 202 with a task id whose result is the artifact handle.
+    """
+    scope = ExportScope(
+        organization_id=current_user.organization_id,
+        program_id=program_id,
+        trial_id=trial_id,
+        study_id=study_id,
+        variant_set_id=variant_set_id,
+    )
+    if dataset == ExportDataset.MARKERS and variant_set_id is None:
+        raise HTTPException(400, "Marker exports need a variant_set_id")
+
+    source_rows = await count_source_rows(db, dataset, scope)
+    if background or source_rows > settings.EXPORT_STREAM_MAX_ROWS:
+        task_id = await submit_export_job(
+            dataset, scope, format, gzip, user_id=str(current_user.id)
+        )
+        return JSONResponse(
+            status_code=202,
+            content={
+                "task_id": task_id,
+                "status": "queued",
+                "source_rows": source_rows,
+                "status_href": f"/api/v2/tasks/{task_id}",
+            },
+        )
+
+    try:
+        body = encode(await build_plan(db, dataset, scope), format, gzip)
+    except ExportError as e:
+        raise HTTPException(400, str(e))
+
+    download_name = filename(dataset, scope, format, gzip)
+    return StreamingResponse(
+        body,
+        media_type=media_type(format, gzip),
+        headers={
+            "Content-Disposition": f'attachment; filename="{download_name}"',
+            "X-Export-Source-Rows": str(source_rows),
+        },
+    )
+
+
 @router.get("/formats")
 async def list_export_formats():
     """List available export formats"""
@@ -331,5 +410,19 @@ async def list_export_formats():
                 "mime_type": "application/json",
                 "extension": ".json",
             },
+            {
+                "id": "parquet",
+                "name": "Parquet",
+                "description": "Columnar, one row group per chunk (streaming exports only)",
+                "mime_type": "application/vnd.apache.parquet",
+                "extension": ".parquet",
+            },
+            {
+                "id": "xlsx",
+                "name": "Excel",
+                "description": "Excel workbook (streaming exports only)",
+                "mime_type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                "extension": ".xlsx",
+            },
         ]
     }
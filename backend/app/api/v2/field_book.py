@@ -14,7 +14,6 @@ Endpoints:
 - GET /api/v2/field-book/studies/{id}/summary - Get collection summary
 """
 
-import uuid as uuid_module
 from datetime import UTC, datetime
 from typing import Any
 
@@ -32,6 +31,7 @@ from app.models.field_operations import (
     FieldBookStudy,
     FieldBookTrait,
 )
+from app.modules.core.services.phenotype_qc_service import TraitScale, phenotype_qc_service
 
 
 router = APIRouter(prefix="/field-book", tags=["Field Book"], dependencies=[Depends(get_current_user)])
@@ -113,6 +113,35 @@ async def get_study_by_code(db: AsyncSession, study_id: str) -> FieldBookStudy |
     return result.scalar_one_or_none()
 
 
+async def _score_synced_observations(
+    db: AsyncSession,
+    study: FieldBookStudy,
+    written: list[tuple[FieldBookObservation, FieldBookEntry, FieldBookTrait]],
+) -> dict[str, Any]:
+    """Run ingest QC over a synced batch and mark flagged rows as outliers."""
+    scales = {
+        trait.id: TraitScale.from_valid_values(trait.data_type, trait.min_value, trait.max_value, trait.categories)
+        for _, _, trait in written
+    }
+    records = [
+        {
+            "record_id": obs.id,
+            "observation_variable_id": trait.variable_id,
+            "study_id": study.study_id,
+            "germplasm_id": entry.germplasm_id,
+            "value": obs.value_numeric if obs.value_numeric is not None else obs.value_text,
+            "value_numeric": obs.value_numeric,
+            "scale": scales[trait.id],
+        }
+        for obs, entry, trait in written
+    ]
+    summary = await phenotype_qc_service.score_batch(db, study.organization_id, records, source="field_book")
+    flagged = set(summary["flagged_record_ids"])
+    for obs, _, _ in written:
+        obs.is_outlier = obs.id in flagged
+    return summary
+
+
 # ============================================
 # ENDPOINTS
 # ============================================
@@ -268,10 +297,10 @@ async def record_observation(
             existing.value_numeric = None
         existing.observation_timestamp = timestamp
         existing.notes = request.notes
+        obs = existing
     else:
         # Create new observation
         obs = FieldBookObservation(
-            id=uuid_module.uuid4(),
             organization_id=study.organization_id,
             study_id=study.id,
             entry_id=entry.id,
@@ -283,6 +312,8 @@ async def record_observation(
         )
         db.add(obs)
 
+    await db.flush()
+    qc = await _score_synced_observations(db, study, [(obs, entry, trait)])
     await db.commit()
 
     return {
@@ -293,6 +324,7 @@ async def record_observation(
         "trait_id": request.trait_id,
         "value": request.value,
         "timestamp": timestamp.isoformat(),
+        "qc_flagged": qc["flagged"],
     }
 
 
@@ -316,6 +348,7 @@ async def record_bulk_observations(
     traits_map = {t.trait_code: t for t in traits_result.scalars().all()}
 
     recorded = 0
+    written: list[tuple[FieldBookObservation, FieldBookEntry, FieldBookTrait]] = []
     for obs_data in request.observations:
         plot_id = obs_data.get("plot_id")
         trait_id = obs_data.get("trait_id")
@@ -346,9 +379,9 @@ async def record_bulk_observations(
                 existing.value_text = str(value)
                 existing.value_numeric = None
             existing.observation_timestamp = datetime.now(UTC)
+            written.append((existing, entry, trait))
         else:
             obs = FieldBookObservation(
-                id=uuid_module.uuid4(),
                 organization_id=study.organization_id,
                 study_id=study.id,
                 entry_id=entry.id,
@@ -358,9 +391,12 @@ async def record_bulk_observations(
                 observation_timestamp=datetime.now(UTC),
             )
             db.add(obs)
+            written.append((obs, entry, trait))
 
         recorded += 1
 
+    await db.flush()
+    qc = await _score_synced_observations(db, study, written)
     await db.commit()
 
     return {
@@ -368,6 +404,7 @@ async def record_bulk_observations(
         "message": f"Recorded {recorded} observations",
         "study_id": request.study_id,
         "observations_recorded": recorded,
+        "qc_flagged": qc["flagged"],
     }
 
 
@@ -7,15 +7,24 @@ Endpoints:
 - POST /api/v2/gwas/mlm - Mixed Linear Model with kinship
 - POST /api/v2/gwas/kinship - Calculate kinship matrix
 - POST /api/v2/gwas/pca - Population structure PCA
+
+GLM/MLM scans and kinship matrices return the full JSON payload by default.
+Pass ``output=artifact`` to store them as binary result artifacts instead; the
+response then carries the artifact handle and server-side previews.
 """
 
+from typing import Literal
 
 import numpy as np
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, ConfigDict, Field
 
-from app.api.deps import get_current_user
-from app.modules.genomics.services.gwas_service import get_gwas_service
+from app.api.deps import get_current_user, get_organization_id
+from app.modules.core.services.result_artifact_service import (
+    downsample_matrix,
+    get_result_artifact_store,
+)
+from app.modules.genomics.services.gwas_service import GWASResult, get_gwas_service
 
 
 router = APIRouter(prefix="/gwas", tags=["GWAS"], dependencies=[Depends(get_current_user)])
@@ -69,12 +78,39 @@ class PCARequest(BaseModel):
     n_components: int = Field(10, ge=1, le=50)
 
 
+ResultOutput = Literal["artifact", "inline"]
+
+OUTPUT_QUERY = Query("inline", description="inline: full JSON arrays; artifact: handle + previews")
+
+
+def _gwas_response(result: GWASResult, output: ResultOutput, organization_id: int) -> dict:
+    if output == "inline":
+        return result.to_dict()
+
+    artifact = get_result_artifact_store().save_table(
+        result.to_columns(),
+        name=f"gwas_{result.method.lower()}",
+        organization_id=organization_id,
+        metadata={"method": result.method, "n_samples": result.n_samples},
+    )
+    return {
+        **result.to_summary(),
+        "artifact": artifact.to_handle(),
+        "manhattan_preview": result.manhattan_preview(),
+        "qq_preview": result.qq_preview(),
+    }
+
+
 # ============================================
 # ENDPOINTS
 # ============================================
 
 @router.post("/glm")
-async def glm_gwas(request: GWASRequest):
+async def glm_gwas(
+    request: GWASRequest,
+    output: ResultOutput = OUTPUT_QUERY,
+    organization_id: int = Depends(get_organization_id),
+):
     """
     GLM (General Linear Model) GWAS
 
@@ -108,14 +144,18 @@ async def glm_gwas(request: GWASRequest):
             covariates=covariates,
         )
 
-        return result.to_dict()
+        return _gwas_response(result, output, organization_id)
 
     except Exception as e:
         raise HTTPException(500, f"GLM GWAS failed: {str(e)}")
 
 
 @router.post("/mlm")
-async def mlm_gwas(request: MLMRequest):
+async def mlm_gwas(
+    request: MLMRequest,
+    output: ResultOutput = OUTPUT_QUERY,
+    organization_id: int = Depends(get_organization_id),
+):
     """
     MLM (Mixed Linear Model) GWAS
 
@@ -157,14 +197,18 @@ async def mlm_gwas(request: MLMRequest):
             covariates=covariates,
         )
 
-        return result.to_dict()
+        return _gwas_response(result, output, organization_id)
 
     except Exception as e:
         raise HTTPException(500, f"MLM GWAS failed: {str(e)}")
 
 
 @router.post("/kinship")
-async def calculate_kinship(request: KinshipRequest):
+async def calculate_kinship(
+    request: KinshipRequest,
+    output: ResultOutput = OUTPUT_QUERY,
+    organization_id: int = Depends(get_organization_id),
+):
     """
     Calculate Genomic Relationship Matrix (Kinship)
 
@@ -180,13 +224,24 @@ async def calculate_kinship(request: KinshipRequest):
         genotypes = np.array(request.genotypes)
         kinship = service.calculate_kinship(genotypes, method=request.method)
 
-        return {
+        response = {
             "method": request.method,
             "n_samples": kinship.shape[0],
-            "kinship": kinship.tolist(),
             "mean_relatedness": float(np.mean(kinship[np.triu_indices_from(kinship, k=1)])),
             "diagonal_mean": float(np.mean(np.diag(kinship))),
         }
+        if output == "inline":
+            response["kinship"] = kinship.tolist()
+        else:
+            artifact = get_result_artifact_store().save_array(
+                kinship,
+                name=f"kinship_{request.method}",
+                organization_id=organization_id,
+                metadata={"method": request.method},
+            )
+            response["artifact"] = artifact.to_handle()
+            response["preview"] = downsample_matrix(kinship)
+        return response
 
     except Exception as e:
         raise HTTPException(500, f"Kinship calculation failed: {str(e)}")
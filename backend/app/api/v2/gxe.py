@@ -16,6 +16,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_active_user
 from app.core.database import get_db
+from app.models.core import User
 from app.modules.breeding.services.gxe_analysis_service import (
     GGEScaling,
     GxEMethod,
@@ -86,7 +87,8 @@ class MegaEnvRequest(BaseModel):
 @router.post("/analyze-from-db")
 async def analyze_from_db(
     request: GxEFromDbRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
 ):
     """
     Perform GxE analysis using data fetched directly from the database
@@ -97,13 +99,14 @@ async def analyze_from_db(
     data = await service.get_observation_matrix(
         db=db,
         study_db_ids=request.study_db_ids,
-        trait_db_id=request.trait_db_id
+        trait_db_id=request.trait_db_id,
+        organization_id=current_user.organization_id,
     )
 
     if "error" in data:
         raise HTTPException(404, detail=data["error"])
 
-    yield_matrix = np.array(data["yield_matrix"])
+    yield_matrix = np.asarray(data["yield_matrix"])
     genotype_names = data["genotype_names"]
     environment_names = data["environment_names"]
 
@@ -9,6 +9,14 @@ Endpoints:
 - GET /monitoring/compute/queue - Queue depth metrics
 - GET /monitoring/compute/alerts - Active alerts
 - GET /monitoring/dashboard - Web dashboard UI
+- GET /monitoring/requests/routes - Per-route latency histograms (superuser)
+- GET /monitoring/requests/n-plus-one - Routes issuing too many queries (superuser)
+- GET /monitoring/requests/slow - Recent slow requests by trace ID (superuser)
+- GET /monitoring/requests/trace/{trace_id} - One profiled request (superuser)
+- GET|POST|DELETE /monitoring/requests/sampler - Per-route stack sampling (superuser)
+- GET /monitoring/requests/sampler/{trace_id} - Folded stacks of a sampled request (superuser)
+- POST /monitoring/requests/reset - Clear request profiling aggregates (superuser)
+- GET /monitoring/startup - Route group registration and warm-up timings (superuser)
 
 Metrics tracked:
 - Job execution time (P50, P95, P99)
@@ -16,17 +24,21 @@ Metrics tracked:
 - Queue depth by worker type
 - Worker utilization
 - Alert status
+- Request latency by route template, with SQL/Redis/HTTP/compute/serialization time
 """
 
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from pydantic import BaseModel, Field
 
+from app.api.deps import get_current_superuser
+from app.core.config import settings
 from app.core.redis import redis_client
+from app.core.request_profiling import LATENCY_BUCKETS_MS, request_profiles
 from app.services.task_queue import ComputeType, TaskStatus, task_queue
 from app.services.compute_alerting import compute_alerting
 
@@ -623,3 +635,122 @@ async def get_alert_history(
         "total_alerts": len(alert_history),
         "alerts": alert_history,
     }
+
+
+# ============================================================================
+# Request Profiling
+# ============================================================================
+
+
+class SamplerRequest(BaseModel):
+    """Arm stack sampling for the next requests to one route"""
+    route: str = Field(..., description="Route key, e.g. 'GET /brapi/v2/germplasm/{germplasmDbId}'")
+    requests: int = Field(5, ge=1, le=100)
+    interval_ms: float = Field(5.0, ge=1.0, le=1000.0)
+
+
+@router.get("/requests/routes", dependencies=[Depends(get_current_superuser)])
+async def get_route_latency():
+    """
+    Per-route latency histograms for this worker process
+
+    Buckets are upper bounds in milliseconds (non-cumulative counts); percentiles
+    cover the most recent requests of each route.
+    """
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "buckets_ms": list(LATENCY_BUCKETS_MS),
+        "routes": request_profiles.histograms(),
+    }
+
+
+@router.get("/requests/n-plus-one", dependencies=[Depends(get_current_superuser)])
+async def get_n_plus_one_offenders(
+    top: int = Query(10, ge=1, le=100, description="Number of routes to return"),
+):
+    """
+    Routes whose requests issued more queries than REQUEST_PROFILE_N_PLUS_ONE_QUERIES
+
+    Each offender carries its worst request's trace ID and most repeated statement.
+    """
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "query_threshold": settings.REQUEST_PROFILE_N_PLUS_ONE_QUERIES,
+        "offenders": request_profiles.n_plus_one_offenders(top=top),
+    }
+
+
+@router.get("/requests/slow", dependencies=[Depends(get_current_superuser)])
+async def get_slow_requests(limit: int = Query(50, ge=1, le=200)):
+    """Most recent requests slower than REQUEST_PROFILE_SLOW_MS, newest first"""
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "slow_ms": settings.REQUEST_PROFILE_SLOW_MS,
+        "requests": request_profiles.slow_requests(limit=limit),
+    }
+
+
+@router.get("/requests/trace/{trace_id}", dependencies=[Depends(get_current_superuser)])
+async def get_profiled_request(trace_id: str):
+    """Time breakdown of a slow or sampled request"""
+    profile = request_profiles.find(trace_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No profile kept for this trace ID")
+    return profile
+
+
+@router.get("/requests/sampler", dependencies=[Depends(get_current_superuser)])
+async def get_sampler_state():
+    """Armed routes and captured samples"""
+    return request_profiles.sampler_state()
+
+
+@router.post("/requests/sampler", dependencies=[Depends(get_current_superuser)])
+async def arm_sampler(request: SamplerRequest):
+    """Sample the Python stack of the next requests to a route"""
+    request_profiles.arm(request.route, request.requests, request.interval_ms)
+    return request_profiles.sampler_state()
+
+
+@router.delete("/requests/sampler", dependencies=[Depends(get_current_superuser)])
+async def disarm_sampler(route: str = Query(..., description="Route key to disarm")):
+    """Stop sampling a route"""
+    if not request_profiles.disarm(route):
+        raise HTTPException(status_code=404, detail="Route is not armed")
+    return request_profiles.sampler_state()
+
+
+@router.get(
+    "/requests/sampler/{trace_id}",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(get_current_superuser)],
+)
+async def get_sampled_stacks(trace_id: str):
+    """Folded stacks of a sampled request (flamegraph.pl / speedscope input)"""
+    stacks = request_profiles.folded_stacks(trace_id)
+    if stacks is None:
+        raise HTTPException(status_code=404, detail="No samples kept for this trace ID")
+    return PlainTextResponse(stacks)
+
+
+@router.post("/requests/reset", dependencies=[Depends(get_current_superuser)])
+async def reset_request_profiles():
+    """Clear route histograms, slow requests and captured samples"""
+    request_profiles.reset()
+    return {"timestamp": datetime.now(UTC).isoformat(), "reset": True}
+
+
+@router.get("/startup", dependencies=[Depends(get_current_superuser)])
+async def get_startup_profile(request: Request):
+    """
+    Route registration profile of this worker process
+
+    Per route group: registration time (imports included), trigger (startup,
+    first request or warm-up) and per-router include time.
+    """
+    loader = getattr(request.app.state, "route_loader", None)
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "router_loading": settings.ROUTER_LOADING,
+        "registration": loader.profile() if loader is not None else None,
+    }
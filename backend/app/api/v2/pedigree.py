@@ -136,25 +136,25 @@ async def list_individuals(
 @router.post("/relationship-matrix")
 async def get_relationship_matrix(
     request: RelationshipMatrixRequest,
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get additive relationship matrix (A-matrix)
-    NOTE: Currently returns placeholder from DB service
+    Get additive relationship matrix (A-matrix) for the requested individuals
     """
-    PedigreeService(db)
+    service = PedigreeService(db)
 
-    # DB service doesn't implement full A-Matrix yet, so we warn or return placeholder
-    # Ideally we'd implement it there too, but for now we follow the service signature
     try:
-        # Assuming we might want to use the in-memory calc for small datasets?
-        # For now, let's just return success=False or partial
-        return {
-            "success": False,
-            "message": "Full A-Matrix calculation not yet migrated to DB service."
-        }
-    except Exception as e:
-        raise HTTPException(500, f"Failed to calculate matrix: {str(e)}")
+        result = await service.get_relationship_matrix(
+            request.individual_ids, organization_id=current_user.organization_id
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    return {
+        "success": True,
+        **result,
+    }
 
 
 @router.get("/ancestors/{individual_id}")
@@ -164,7 +164,7 @@ async def get_ancestors(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Trace ancestors of an individual using Recursive CTE
+    Trace ancestors of an individual from the pedigree index
     """
     service = PedigreeService(db)
 
@@ -1,7 +1,7 @@
 """Phenomic Selection API Router."""
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
@@ -16,6 +16,18 @@ router = APIRouter(prefix="/phenomic-selection", tags=["Phenomic Selection"])
 class PredictRequest(BaseModel):
     model_id: str
     sample_ids: list[str]
+    spectra: list[list[float]] | None = None
+
+
+class TrainModelRequest(BaseModel):
+    dataset_id: str
+    target_trait: str
+    spectra: list[list[float]]
+    reference_values: list[float]
+    preprocessing: list[str] = Field(default_factory=lambda: ["snv"])
+    max_components: int = Field(20, ge=1, le=100)
+    n_folds: int = Field(5, ge=2, le=20)
+    name: str | None = None
 
 
 @router.get("/datasets")
@@ -64,8 +76,33 @@ async def predict_traits(
 ):
     """Predict traits for samples"""
     return await phenomic_selection_service.predict_traits(
-        db, current_user.organization_id, request.model_id, request.sample_ids
+        db, current_user.organization_id, request.model_id, request.sample_ids, request.spectra
+    )
+
+
+@router.post("/models/train")
+async def train_model(
+    request: TrainModelRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """Calibrate a PLSR model on spectra and reference values"""
+    result = await phenomic_selection_service.train_model(
+        db,
+        current_user.organization_id,
+        request.dataset_id,
+        request.target_trait,
+        request.spectra,
+        request.reference_values,
+        preprocessing=request.preprocessing,
+        max_components=request.max_components,
+        n_folds=request.n_folds,
+        name=request.name,
     )
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    await db.commit()
+    return result
 
 
 @router.post("/upload", summary="Upload spectral data")
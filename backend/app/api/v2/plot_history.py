@@ -14,7 +14,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user, get_organization_id
 from app.core.database import get_db
 from app.models.core import Study
-from app.models.phenotyping import Observation, ObservationUnit
+from app.models.phenotyping import Observation, ObservationUnit, parse_observation_timestamp
 
 
 router = APIRouter(prefix="/plot-history", tags=["Plot History"], dependencies=[Depends(get_current_user)])
@@ -191,9 +191,11 @@ async def get_plot_events(
     """Get observations for a specific plot."""
     query = select(Observation).where(Observation.observation_unit_id == plot_id)
     if start_date:
-        query = query.where(Observation.observation_time_stamp >= start_date)
+        start = parse_observation_timestamp(start_date)
+        query = query.where(Observation.observed_at >= start) if start else query.where(Observation.observation_time_stamp >= start_date)
     if end_date:
-        query = query.where(Observation.observation_time_stamp <= end_date)
+        end = parse_observation_timestamp(end_date)
+        query = query.where(Observation.observed_at <= end) if end else query.where(Observation.observation_time_stamp <= end_date)
 
     query = query.order_by(desc(Observation.created_at)).limit(200)
     result = await db.execute(query)
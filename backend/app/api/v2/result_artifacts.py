@@ -0,0 +1,91 @@
+"""
+Result Artifacts API
+Handles and streaming downloads for binary compute outputs
+
+Endpoints:
+- GET /api/v2/artifacts/{artifact_id} - Artifact handle (shape, dtype, formats)
+- GET /api/v2/artifacts/{artifact_id}/data - Download, negotiated via Accept or ?format=
+
+Formats:
+- application/x-npy (application/x-npz for tables) - stored file, default
+- application/vnd.apache.arrow.stream - Arrow IPC stream
+- application/json - only when explicitly requested
+- Encoded files (exports) are sent as stored, with their own media type
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.api.deps import get_current_user, get_organization_id
+from app.modules.core.services.result_artifact_service import (
+    ArtifactFormat,
+    ArtifactKind,
+    ResultArtifact,
+    UnsupportedArtifactFormat,
+    get_result_artifact_store,
+    media_type_for,
+    negotiate_format,
+)
+
+
+router = APIRouter(prefix="/artifacts", tags=["Result Artifacts"], dependencies=[Depends(get_current_user)])
+
+FILE_EXTENSIONS = {
+    ArtifactFormat.ARROW: "arrows",
+    ArtifactFormat.JSON: "json",
+}
+
+
+def _get_artifact_or_404(artifact_id: str, organization_id: int) -> ResultArtifact:
+    artifact = get_result_artifact_store().get(artifact_id, organization_id)
+    if artifact is None:
+        raise HTTPException(404, "Artifact not found or expired")
+    return artifact
+
+
+@router.get("/{artifact_id}")
+async def get_artifact(
+    artifact_id: str,
+    organization_id: int = Depends(get_organization_id),
+):
+    """Get an artifact handle without its data."""
+    return _get_artifact_or_404(artifact_id, organization_id).to_handle()
+
+
+@router.get("/{artifact_id}/data")
+async def download_artifact(
+    artifact_id: str,
+    format: ArtifactFormat | None = Query(None, description="Override content negotiation: npy, arrow or json"),
+    accept: str | None = Header(None),
+    organization_id: int = Depends(get_organization_id),
+):
+    """
+    Stream artifact data.
+
+    The stored .npy/.npz file is sent as-is; Arrow and JSON are encoded
+    incrementally from memory-mapped arrays.
+    """
+    store = get_result_artifact_store()
+    artifact = _get_artifact_or_404(artifact_id, organization_id)
+    if artifact.kind == ArtifactKind.FILE:
+        return FileResponse(
+            store.path(artifact), media_type=artifact.media_type, filename=artifact.name
+        )
+
+    try:
+        fmt = negotiate_format(artifact, accept=accept, requested=format.value if format else None)
+    except UnsupportedArtifactFormat as e:
+        raise HTTPException(406, str(e))
+
+    media_type = media_type_for(artifact, fmt)
+    headers = {"Vary": "Accept"}
+    if fmt == ArtifactFormat.NPY:
+        return FileResponse(
+            store.path(artifact),
+            media_type=media_type,
+            filename=f"{artifact.name}{artifact.filename[artifact.filename.rfind('.'):]}",
+            headers=headers,
+        )
+
+    headers["Content-Disposition"] = f'attachment; filename="{artifact.name}.{FILE_EXTENSIONS[fmt]}"'
+    return StreamingResponse(store.iter_bytes(artifact, fmt), media_type=media_type, headers=headers)
@@ -358,7 +358,8 @@ async def ship_seed_request(
 
 @router.get("/summary")
 async def get_inventory_summary(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    org_id: int = Depends(get_organization_id),
 ):
     """
     Get inventory summary statistics
@@ -368,7 +369,7 @@ async def get_inventory_summary(
     """
     service = get_seed_inventory_service()
 
-    summary = await service.get_inventory_summary(db)
+    summary = await service.get_inventory_summary(db, org_id)
 
     return {
         "success": True,
@@ -378,7 +379,8 @@ async def get_inventory_summary(
 
 @router.get("/alerts")
 async def get_inventory_alerts(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    org_id: int = Depends(get_organization_id),
 ):
     """
     Get inventory alerts
@@ -390,7 +392,7 @@ async def get_inventory_alerts(
     """
     service = get_seed_inventory_service()
 
-    alerts = await service.get_alerts(db)
+    alerts = await service.get_alerts(db, org_id)
 
     return {
         "success": True,
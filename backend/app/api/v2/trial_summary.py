@@ -8,9 +8,9 @@ Queries Trial, Study, Observation tables for real data.
 
 from collections import defaultdict
 from datetime import UTC, datetime
-from math import sqrt
 from typing import Any
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy import and_, func, select
@@ -28,6 +28,11 @@ from app.modules.phenotyping.services.interpretation_service import (
     phenotype_interpretation_service,
     safe_float,
 )
+from app.modules.phenotyping.services.trial_statistics_service import (
+    SufficientStatistics,
+    anova_from_statistics,
+    trial_statistics_service,
+)
 from app.schemas.phenotype_interpretation import PhenotypeInterpretation
 from app.schemas.reevu_envelope import CalculationStep, EvidenceRef, ReevuEnvelope, UncertaintyInfo
 from app.schemas.trial_summary_contract import TrialSummaryContractMetadata
@@ -160,27 +165,6 @@ def _round_or_none(value: float | None, digits: int = 4) -> float | None:
     return round(value, digits) if value is not None else None
 
 
-def _mean(values: list[float]) -> float | None:
-    return sum(values) / len(values) if values else None
-
-
-def _sample_variance(values: list[float], mean_value: float | None = None) -> float | None:
-    if not values:
-        return None
-    if len(values) == 1:
-        return 0.0
-    center = mean_value if mean_value is not None else sum(values) / len(values)
-    return sum((value - center) ** 2 for value in values) / (len(values) - 1)
-
-
-def _coefficient_of_variation(values: list[float]) -> float | None:
-    mean_value = _mean(values)
-    variance = _sample_variance(values, mean_value)
-    if mean_value in (None, 0) or variance is None:
-        return None
-    return sqrt(variance) / mean_value * 100
-
-
 async def _load_trial_numeric_records(
     db: AsyncSession,
     organization_id: int,
@@ -190,7 +174,7 @@ async def _load_trial_numeric_records(
         select(
             Observation.id.label("observation_id"),
             Observation.observation_db_id.label("observation_db_id"),
-            Observation.value.label("value"),
+            Observation.value_numeric.label("value"),
             Observation.germplasm_id.label("germplasm_id"),
             ObservationUnit.entry_type.label("entry_type"),
             ObservationVariable.observation_variable_name.label("observation_variable_name"),
@@ -215,6 +199,7 @@ async def _load_trial_numeric_records(
         .where(Observation.organization_id == organization_id)
         .where(Study.organization_id == organization_id)
         .where(Study.trial_id == trial_internal_id)
+        .where(Observation.value_numeric.isnot(None))
     )
     result = await db.execute(stmt)
 
@@ -262,91 +247,33 @@ def _group_records_by_trait(records: list[dict[str, Any]]) -> dict[str, dict[str
     return {trait: dict(germplasm_groups) for trait, germplasm_groups in grouped.items()}
 
 
-def _select_primary_trait(trait_groups: dict[str, dict[str, list[float]]]) -> str | None:
-    if not trait_groups:
+def _select_primary_trait(trait_counts: dict[str, int]) -> str | None:
+    if not trait_counts:
         return None
 
     def priority(trait_name: str) -> tuple[int, int, int, str]:
         normalized = _normalize_trait_key(trait_name)
         exact_yield = int(normalized in {"yield", "grain_yield", "seed_yield", "plot_yield"})
         any_yield = int("yield" in normalized)
-        observation_count = sum(len(values) for values in trait_groups[trait_name].values())
-        return (exact_yield, any_yield, observation_count, trait_name)
+        return (exact_yield, any_yield, trait_counts[trait_name], trait_name)
 
-    return max(trait_groups.keys(), key=priority)
+    return max(trait_counts.keys(), key=priority)
 
 
-def _anova_metrics(grouped_values: dict[str, list[float]]) -> dict[str, Any]:
-    non_empty_groups = {key: values for key, values in grouped_values.items() if values}
-    group_count = len(non_empty_groups)
-    observation_count = sum(len(values) for values in non_empty_groups.values())
-    if group_count < 2 or observation_count <= group_count:
-        return {
-            "f_value": None,
-            "lsd": None,
-            "significance": None,
-            "genetic_variance": None,
-            "error_variance": None,
-            "heritability": None,
-            "selection_intensity": None,
-            "expected_gain": None,
-            "anova": None,
-        }
-
-    means = {key: sum(values) / len(values) for key, values in non_empty_groups.items()}
-    all_values = [value for values in non_empty_groups.values() for value in values]
-    grand_mean = sum(all_values) / len(all_values)
-    ss_between = sum(len(non_empty_groups[key]) * (means[key] - grand_mean) ** 2 for key in non_empty_groups)
-    ss_within = sum(
-        sum((value - means[key]) ** 2 for value in values)
-        for key, values in non_empty_groups.items()
-    )
-    df_between = group_count - 1
-    df_within = observation_count - group_count
-    ms_between = ss_between / df_between if df_between > 0 else None
-    ms_within = ss_within / df_within if df_within > 0 else None
-    f_value = (ms_between / ms_within) if ms_between is not None and ms_within not in (None, 0) else None
-    average_replicates = observation_count / group_count if group_count else None
-    lsd = (
-        1.96 * sqrt((2 * ms_within) / average_replicates)
-        if ms_within is not None and average_replicates not in (None, 0)
-        else None
-    )
-    mean_range = max(means.values()) - min(means.values()) if means else None
-    significance = None
-    if lsd is not None and mean_range is not None:
-        significance = "*" if mean_range > lsd else "ns"
-
-    genetic_variance = None
-    heritability = None
-    if ms_between is not None and ms_within is not None and average_replicates not in (None, 0):
-        genetic_variance = max((ms_between - ms_within) / average_replicates, 0.0)
-        denominator = genetic_variance + (ms_within / average_replicates)
-        heritability = genetic_variance / denominator if denominator > 0 else None
-
-    selection_intensity = 1.755 if group_count >= 10 else None
-    phenotypic_std_dev = sqrt(_sample_variance(all_values, grand_mean) or 0.0) if len(all_values) > 1 else None
-    expected_gain = None
-    if selection_intensity is not None and heritability is not None and phenotypic_std_dev is not None:
-        expected_gain = selection_intensity * heritability * phenotypic_std_dev
-
+def _group_cells_by_trait(cells: list[dict[str, Any]]) -> dict[str, SufficientStatistics]:
+    """Per-trait sufficient statistics with one group per germplasm entry."""
+    totals: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(lambda: [0.0, 0.0, 0.0]))
+    for cell in cells:
+        germplasm_key = cell.get("germplasm_key")
+        trait_name = cell.get("trait_name")
+        if germplasm_key and trait_name:
+            group = totals[trait_name][germplasm_key]
+            group[0] += cell["n"]
+            group[1] += cell["sum_x"]
+            group[2] += cell["sum_x2"]
     return {
-        "f_value": f_value,
-        "lsd": lsd,
-        "significance": significance,
-        "genetic_variance": genetic_variance,
-        "error_variance": ms_within,
-        "heritability": heritability,
-        "selection_intensity": selection_intensity,
-        "expected_gain": expected_gain,
-        "anova": {
-            "df_between": df_between,
-            "df_within": df_within,
-            "ss_between": round(ss_between, 4),
-            "ss_within": round(ss_within, 4),
-            "ms_between": _round_or_none(ms_between),
-            "ms_within": _round_or_none(ms_within),
-        },
+        trait_name: SufficientStatistics(*np.array(list(groups.values()), dtype=np.float64).T)
+        for trait_name, groups in totals.items()
     }
 
 
@@ -709,7 +636,9 @@ def _build_top_performers(
 ) -> tuple[list[TopPerformer], str | None]:
     trait_groups = _group_records_by_trait(records)
     selected_trait = requested_trait if requested_trait in trait_groups else None
-    primary_trait = selected_trait or _select_primary_trait(trait_groups)
+    primary_trait = selected_trait or _select_primary_trait(
+        {trait: sum(len(values) for values in groups.values()) for trait, groups in trait_groups.items()}
+    )
     if not primary_trait:
         return [], None
 
@@ -764,18 +693,17 @@ def _build_top_performers(
     return top_performers, primary_trait
 
 
-def _build_trait_summary(records: list[dict[str, Any]]) -> list[TraitSummary]:
-    trait_groups = _group_records_by_trait(records)
+def _build_trait_summary(cells: list[dict[str, Any]]) -> list[TraitSummary]:
+    trait_groups = _group_cells_by_trait(cells)
     summary_list: list[TraitSummary] = []
     for trait_name in sorted(trait_groups):
-        grouped_values = trait_groups[trait_name]
-        values = [value for trait_values in grouped_values.values() for value in trait_values]
-        metrics = _anova_metrics(grouped_values)
+        groups = trait_groups[trait_name]
+        metrics = anova_from_statistics(groups)
         summary_list.append(
             TraitSummary(
                 trait=trait_name,
-                mean=round(_mean(values) or 0.0, 4),
-                cv=round(_coefficient_of_variation(values) or 0.0, 4),
+                mean=round(groups.mean() or 0.0, 4),
+                cv=round(groups.coefficient_of_variation() or 0.0, 4),
                 lsd=_round_or_none(metrics["lsd"]),
                 fValue=_round_or_none(metrics["f_value"]),
                 significance=metrics["significance"],
@@ -784,41 +712,41 @@ def _build_trait_summary(records: list[dict[str, Any]]) -> list[TraitSummary]:
     return summary_list
 
 
-def _build_location_performance(records: list[dict[str, Any]]) -> list[LocationPerformance]:
-    trait_groups = _group_records_by_trait(records)
-    primary_trait = _select_primary_trait(trait_groups)
+def _build_location_performance(cells: list[dict[str, Any]]) -> list[LocationPerformance]:
+    trait_groups = _group_cells_by_trait(cells)
+    primary_trait = _select_primary_trait({trait: groups.count for trait, groups in trait_groups.items()})
     trial_trait_count = len(trait_groups)
     location_groups: dict[str, dict[str, Any]] = defaultdict(
         lambda: {
             "name": "Unassigned Location",
             "entries": set(),
-            "primary_values": [],
+            "primary_cells": [],
             "pairs": set(),
         }
     )
 
-    for record in records:
-        location_key = record["location_key"]
-        group = location_groups[location_key]
-        group["name"] = record["location_name"]
-        if record.get("germplasm_key"):
-            group["entries"].add(record["germplasm_key"])
-            group["pairs"].add((record["germplasm_key"], record["trait_name"]))
-        if primary_trait and record["trait_name"] == primary_trait:
-            group["primary_values"].append(record["value"])
+    for cell in cells:
+        group = location_groups[cell["location_key"]]
+        group["name"] = cell["location_name"]
+        if cell.get("germplasm_key"):
+            group["entries"].add(cell["germplasm_key"])
+            group["pairs"].add((cell["germplasm_key"], cell["trait_name"]))
+        if primary_trait and cell["trait_name"] == primary_trait:
+            group["primary_cells"].append(cell)
 
     results: list[LocationPerformance] = []
     for location_key, group in sorted(location_groups.items(), key=lambda item: item[1]["name"]):
         entry_count = len(group["entries"])
         total_pairs = entry_count * trial_trait_count
         completion_rate = round((len(group["pairs"]) / total_pairs) * 100, 2) if total_pairs else 0.0
+        primary = SufficientStatistics.from_cells(group["primary_cells"])
         results.append(
             LocationPerformance(
                 locationDbId=location_key,
                 locationName=group["name"],
                 entries=entry_count,
-                meanYield=round(_mean(group["primary_values"]) or 0.0, 4),
-                cv=round(_coefficient_of_variation(group["primary_values"]) or 0.0, 4),
+                meanYield=round(primary.mean() or 0.0, 4),
+                cv=round(primary.coefficient_of_variation() or 0.0, 4),
                 completionRate=completion_rate,
             )
         )
@@ -826,9 +754,9 @@ def _build_location_performance(records: list[dict[str, Any]]) -> list[LocationP
     return results
 
 
-def _build_trial_statistics(records: list[dict[str, Any]]) -> dict[str, Any]:
-    trait_groups = _group_records_by_trait(records)
-    primary_trait = _select_primary_trait(trait_groups)
+def _build_trial_statistics(cells: list[dict[str, Any]]) -> dict[str, Any]:
+    trait_groups = _group_cells_by_trait(cells)
+    primary_trait = _select_primary_trait({trait: groups.count for trait, groups in trait_groups.items()})
     if not primary_trait:
         return {
             "grand_mean": None,
@@ -843,12 +771,12 @@ def _build_trial_statistics(records: list[dict[str, Any]]) -> dict[str, Any]:
             "message": "Statistics require numeric trial observations.",
         }
 
-    primary_values = [value for values in trait_groups[primary_trait].values() for value in values]
-    metrics = _anova_metrics(trait_groups[primary_trait])
+    groups = trait_groups[primary_trait]
+    metrics = anova_from_statistics(groups)
     return {
         "primary_trait": primary_trait,
-        "grand_mean": _round_or_none(_mean(primary_values)),
-        "overall_cv": _round_or_none(_coefficient_of_variation(primary_values)),
+        "grand_mean": _round_or_none(groups.mean()),
+        "overall_cv": _round_or_none(groups.coefficient_of_variation()),
         "heritability": _round_or_none(metrics["heritability"]),
         "genetic_variance": _round_or_none(metrics["genetic_variance"]),
         "error_variance": _round_or_none(metrics["error_variance"]),
@@ -971,11 +899,21 @@ async def get_trial_summary(
     db: AsyncSession = Depends(get_db),
     organization_id: int = Depends(get_organization_id),
 ):
-    """Get comprehensive trial summary."""
+    """Get comprehensive trial summary.
+
+    Served from the cached payload while the trial's data version is
+    unchanged; otherwise rebuilt from materialised trait statistics.
+    """
     trial = await _resolve_trial(db, organization_id, trial_id)
     if not trial:
         raise HTTPException(status_code=404, detail="Trial not found")
 
+    cells = await trial_statistics_service.ensure_cells(db, organization_id, trial.id)
+    data_version = await trial_statistics_service.data_version(db, organization_id, trial.id)
+    cached = await trial_statistics_service.get_cached_summary(organization_id, trial.id, data_version)
+    if cached is not None:
+        return TrialSummaryResponse.model_validate(cached)
+
     trial = (
         await db.execute(
             select(Trial)
@@ -993,6 +931,7 @@ async def get_trial_summary(
             )
         )
     ).scalars().all()
+    # Ranking and evidence references are per observation, so they still need the records
     records = await _load_trial_numeric_records(db, organization_id, trial.id)
     baseline_entity_id, baseline_entity_name, baseline_selection = _select_trial_baseline(records)
     interpretation = phenotype_interpretation_service.build_interpretation(
@@ -1013,7 +952,7 @@ async def get_trial_summary(
     )
     trial_info = TrialInfo.model_validate(_build_trial_info(trial, studies, records))
     top_performers = _build_top_performers_from_interpretation(interpretation, limit=5)
-    statistics = _build_trial_statistics(records)
+    statistics = _build_trial_statistics(cells)
     evidence_envelope = _build_trial_evidence_envelope(
         trial_info=trial_info,
         top_performers=top_performers,
@@ -1023,11 +962,11 @@ async def get_trial_summary(
         contract_metadata=contract_metadata,
     )
 
-    return TrialSummaryResponse(
+    response = TrialSummaryResponse(
         trial=trial_info,
         topPerformers=top_performers,
-        traitSummary=_build_trait_summary(records),
-        locationPerformance=_build_location_performance(records),
+        traitSummary=_build_trait_summary(cells),
+        locationPerformance=_build_location_performance(cells),
         statistics=statistics,
         interpretation=interpretation,
         evidence_refs=interpretation.evidence_refs,
@@ -1037,6 +976,10 @@ async def get_trial_summary(
         calculation_method_refs=contract_metadata.calculation_method_refs,
         evidence_envelope=evidence_envelope,
     )
+    await trial_statistics_service.store_cached_summary(
+        organization_id, trial.id, data_version, response.model_dump(mode="json")
+    )
+    return response
 
 
 @router.get("/trials/{trial_id}/top-performers")
@@ -1072,8 +1015,8 @@ async def get_trait_summary(
     if not trial:
         raise HTTPException(status_code=404, detail="Trial not found")
 
-    records = await _load_trial_numeric_records(db, organization_id, trial.id)
-    summary_list = _build_trait_summary(records)
+    cells = await trial_statistics_service.ensure_cells(db, organization_id, trial.id)
+    summary_list = _build_trait_summary(cells)
     return {
         "data": [summary.model_dump() for summary in summary_list],
         "message": "Trait statistics are derived from observed trial values. ANOVA-style metrics are returned when group structure supports them.",
@@ -1091,8 +1034,8 @@ async def get_location_performance(
     if not trial:
         raise HTTPException(status_code=404, detail="Trial not found")
 
-    records = await _load_trial_numeric_records(db, organization_id, trial.id)
-    return {"data": [location.model_dump() for location in _build_location_performance(records)]}
+    cells = await trial_statistics_service.ensure_cells(db, organization_id, trial.id)
+    return {"data": [location.model_dump() for location in _build_location_performance(cells)]}
 
 
 @router.get("/trials/{trial_id}/statistics")
@@ -1106,8 +1049,8 @@ async def get_trial_statistics(
     if not trial:
         raise HTTPException(status_code=404, detail="Trial not found")
 
-    records = await _load_trial_numeric_records(db, organization_id, trial.id)
-    return _build_trial_statistics(records)
+    cells = await trial_statistics_service.ensure_cells(db, organization_id, trial.id)
+    return _build_trial_statistics(cells)
 
 
 @router.post("/trials/{trial_id}/export")
@@ -69,6 +69,9 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = ""
+    # Pool size per process; callers beyond it wait up to REDIS_POOL_TIMEOUT seconds
+    REDIS_MAX_CONNECTIONS: int = 20
+    REDIS_POOL_TIMEOUT: float = 5.0
 
     @property
     def REDIS_URL(self) -> str:
@@ -88,6 +91,51 @@ class Settings(BaseSettings):
     MINIO_BUCKET_METADATA: str = "bijmantra-metadata"
     MINIO_USE_SSL: bool = False
 
+    # Compute result artifacts (binary .npy/.npz outputs served by /api/v2/artifacts)
+    RESULT_ARTIFACTS_DIR: str | None = None
+    RESULT_ARTIFACT_TTL_HOURS: int = 24
+
+    # Compute kernel dispatch: per-size-bucket choice between NumPy and native
+    # kernels, tuned on first use and persisted (default: a file in the temp dir).
+    # Cross-check runs every call through the NumPy reference as well.
+    COMPUTE_KERNEL_TABLE_PATH: str | None = None
+    COMPUTE_KERNEL_AUTOTUNE: bool = True
+    COMPUTE_KERNEL_CROSS_CHECK: bool = False
+
+    # Streaming exports: rows fetched and encoded per chunk, and the source row
+    # count above which an export is written to a result artifact in the background
+    EXPORT_CHUNK_ROWS: int = 5000
+    EXPORT_STREAM_MAX_ROWS: int = 2_000_000
+
+    # Space parameter sweeps: process workers per sweep, capped at the CPU count
+    # (unset: one per CPU)
+    SWEEP_MAX_WORKERS: int | None = None
+
+    # Background task queue
+    # memory: in-process only; redis: Redis hashes + Streams; sqlite: local file stand-in
+    TASK_QUEUE_BACKEND: str = "memory"
+    TASK_QUEUE_SQLITE_PATH: str | None = None
+    # Compute types this API process executes itself (comma-separated ComputeType values);
+    # leave only light_python when dedicated heavy/GPU workers are deployed
+    TASK_QUEUE_API_COMPUTE_TYPES: str = "light_python,heavy_compute,gpu_compute"
+    TASK_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    TASK_MAX_DELIVERIES: int = 3
+    TASK_RESULT_TTL_HOURS: int = 24
+
+    # Request profiling: per-request SQL/Redis/HTTP/compute/serialization time and
+    # per-route latency histograms (per process). Requests issuing more than
+    # REQUEST_PROFILE_N_PLUS_ONE_QUERIES statements are reported as N+1 suspects.
+    REQUEST_PROFILING_ENABLED: bool = True
+    REQUEST_PROFILE_SLOW_MS: float = 1000.0
+    REQUEST_PROFILE_N_PLUS_ONE_QUERIES: int = 20
+
+    # Route loading: "eager" registers every router at import; "lazy" registers the
+    # core group and mounts the rest on first request, for faster replica start.
+    # ROUTER_WARMUP mounts deferred groups and resolves every route in the background
+    # after startup, so first requests do not pay for it.
+    ROUTER_LOADING: str = "eager"
+    ROUTER_WARMUP: bool = True
+
     # Security
     # CRITICAL: SECRET_KEY must be set via environment variable in production
     # Generate with: python -c "import secrets; print(secrets.token_urlsafe(64))"
@@ -150,6 +198,11 @@ class Settings(BaseSettings):
     # Pagination
     DEFAULT_PAGE_SIZE: int = 100
     MAX_PAGE_SIZE: int = 1000
+    # List totals: "cached" (per-filter, per-process), "estimate" (planner rows) or "exact"
+    PAGINATION_COUNT_MODE: str = "cached"
+    PAGINATION_COUNT_TTL_SECONDS: int = 60
+    # Pedigree index: how often a cached index is checked for writes from other processes
+    PEDIGREE_INDEX_RECHECK_SECONDS: int = 30
 
     # Seeding Configuration
     # Controls whether demo data seeders run (set to False in production)
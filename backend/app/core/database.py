@@ -9,6 +9,7 @@ from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
+from app.core.request_profiling import instrument_engine
 
 
 # Create async engine
@@ -20,6 +21,7 @@ engine = create_async_engine(
     pool_size=10,
     max_overflow=20,
 )
+instrument_engine(engine)
 
 # SQLite compatibility patches
 if "sqlite" in settings.DATABASE_URL:
@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+import time
 from collections.abc import Callable, Mapping
 from typing import Any
 
 import httpx
 
+from app.core.request_profiling import current_profile
 from app.core.tracing import DEFAULT_TRACE_ID, TRACE_ID_HEADER, get_current_trace_id
 
 
+_PROFILE_STARTED_AT = "profile_started_at"
+
+
 async def _inject_trace_id_header(request: httpx.Request) -> None:
     trace_id = get_current_trace_id()
     if trace_id == DEFAULT_TRACE_ID or request.headers.get(TRACE_ID_HEADER):
@@ -18,6 +23,19 @@ async def _inject_trace_id_header(request: httpx.Request) -> None:
     request.headers[TRACE_ID_HEADER] = trace_id
 
 
+async def _mark_request_start(request: httpx.Request) -> None:
+    if current_profile() is not None:
+        request.extensions[_PROFILE_STARTED_AT] = time.perf_counter()
+
+
+async def _record_response_time(response: httpx.Response) -> None:
+    # Time to response headers; streamed bodies are read after the hook runs
+    started_at = response.request.extensions.get(_PROFILE_STARTED_AT)
+    profile = current_profile()
+    if started_at is not None and profile is not None:
+        profile.add("http", time.perf_counter() - started_at)
+
+
 def merge_trace_headers(headers: Mapping[str, str] | None = None) -> dict[str, str]:
     merged_headers = dict(headers or {})
     trace_id = get_current_trace_id()
@@ -33,9 +51,13 @@ def build_traced_event_hooks(
 ) -> dict[str, list[Callable[..., Any]]]:
     merged_hooks = {name: list(hooks) for name, hooks in (event_hooks or {}).items()}
     request_hooks = merged_hooks.setdefault("request", [])
+    response_hooks = merged_hooks.setdefault("response", [])
 
-    if _inject_trace_id_header not in request_hooks:
-        request_hooks.append(_inject_trace_id_header)
+    for hook in (_inject_trace_id_header, _mark_request_start):
+        if hook not in request_hooks:
+            request_hooks.append(hook)
+    if _record_response_time not in response_hooks:
+        response_hooks.append(_record_response_time)
 
     return merged_hooks
 
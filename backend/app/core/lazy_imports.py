@@ -0,0 +1,38 @@
+"""
+Deferred imports for package re-exports.
+
+Package ``__init__`` modules that re-export from many submodules make every
+importer pay for all of them, including heavy optional stacks (pandas, polars,
+SciPy, MinIO). ``lazy_exports`` builds a module ``__getattr__``/``__dir__``
+pair (PEP 562) that imports the defining submodule the first time a name is
+accessed, so ``from package import Name`` still works unchanged::
+
+    __getattr__, __dir__ = lazy_exports(__name__, {"EnsemblePredictor": ".ensemble"})
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from collections.abc import Callable, Mapping
+from typing import Any
+
+
+def lazy_exports(
+    package: str, exports: Mapping[str, str]
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Module ``__getattr__`` and ``__dir__`` resolving ``exports`` (name -> module) on use."""
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        # Cache on the package so later lookups skip __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
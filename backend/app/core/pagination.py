@@ -0,0 +1,370 @@
+"""
+Keyset Pagination
+
+List endpoints page with ``ORDER BY <sort keys> LIMIT n`` and continue from the
+last row's sort key (a seek on an indexed column) instead of ``OFFSET``, so a
+deep page costs the same as the first one:
+
+    page = await paginate(db, select(Germplasm).where(...), page=3, page_size=100, page_token=token)
+    page.items, page.total_count, page.next_page_token
+
+Clients that follow ``nextPageToken`` seek directly. Clients that ask for page
+numbers (or raw row offsets) are served from anchors: the sort key of the last
+row before each row offset already served for the same filter, so walking
+pages 0, 1, 2, ... in order never scans more than one page. Anchors are keyed
+by row offset rather than page number, so they stay correct when a client
+changes ``pageSize``; an unanchored offset falls back to OFFSET from the
+nearest anchor below.
+
+Totals come from a per-filter count cache (``cached``), the PostgreSQL
+planner's row estimate for large results (``estimate``) or a fresh
+``count(*)`` (``exact``). Cached counts and anchors expire after
+``PAGINATION_COUNT_TTL_SECONDS``, which bounds how stale they get after
+Core/bulk writes or writes from other processes, and are dropped as soon as
+this process flushes a write to one of the tables a query reads.
+
+Routers that rely on row-level security issue the same SQL for every
+organization, so cache entries (and page tokens) are keyed by the tenant the
+query runs for as well as its SQL. Queries paged without a tenant are never
+cached.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import and_, event, func, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.util import find_tables
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+COUNT_MODES = ("exact", "cached", "estimate")
+# Planner estimates are only trusted above this many rows; smaller results are counted
+ESTIMATE_EXACT_BELOW = 10_000
+MAX_CACHED_QUERIES = 2048
+MAX_ANCHORS_PER_QUERY = 10_000
+
+
+class InvalidPageToken(HTTPException):
+    """A page token that is malformed or was issued for a different query."""
+
+    def __init__(self, detail: str = "Invalid page token"):
+        super().__init__(status_code=400, detail=detail)
+
+
+@dataclass
+class Page:
+    """One page of results and the pagination metadata BrAPI expects."""
+
+    items: list[Any]
+    page: int
+    page_size: int
+    total_count: int
+    next_page_token: str | None = None
+    total_is_estimate: bool = False
+
+    @property
+    def total_pages(self) -> int:
+        return (self.total_count + self.page_size - 1) // self.page_size if self.total_count > 0 else 0
+
+    def pagination(self) -> dict[str, Any]:
+        """BrAPI ``metadata.pagination`` for this page."""
+        return {
+            "currentPage": self.page,
+            "pageSize": self.page_size,
+            "totalCount": self.total_count,
+            "totalPages": self.total_pages,
+            "nextPageToken": self.next_page_token,
+        }
+
+
+# ---------------------------------------------------------------- Query cache
+
+
+class _QueryCache:
+    """Per-process cache of totals and page anchors, keyed by query fingerprint."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_QUERIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._by_table: dict[str, set[str]] = {}
+
+    def entry(self, key: str, tables: set[str], ttl: float) -> dict[str, Any]:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is None or entry["expires"] < now:
+            entry = {"expires": now + ttl, "count": None, "estimate": False, "anchors": {}, "tables": tables}
+            self._entries[key] = entry
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        for table in entry["tables"] if entry else ():
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def invalidate(self, tables: Sequence[str]) -> None:
+        for table in tables:
+            for key in list(self._by_table.get(table, ())):
+                self._drop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_table.clear()
+
+
+query_cache = _QueryCache()
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    tables = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, "__table__")
+    }
+    if tables:
+        query_cache.invalidate(tables)
+
+
+def register_pagination_hooks() -> None:
+    """Drop cached totals and anchors when this process writes to their tables (idempotent)."""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+
+
+def unregister_pagination_hooks() -> None:
+    """Detach the flush hook."""
+    if event.contains(Session, "after_flush", _after_flush):
+        event.remove(Session, "after_flush", _after_flush)
+
+
+# ---------------------------------------------------------------- Tokens
+
+
+def _fingerprint(query, organization_id: int | None = None) -> str:
+    compiled = query.compile()
+    params = sorted((k, repr(v)) for k, v in compiled.params.items())
+    return hashlib.sha1(f"{organization_id}|{compiled}|{params}".encode()).hexdigest()
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_page_token(fingerprint: str, page: int, key: Sequence[Any], row: int | None = None) -> str:
+    payload = {"f": fingerprint[:16], "p": page, "k": [_encode_value(v) for v in key]}
+    if row is not None:
+        payload["o"] = row
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_page_token(token: str, fingerprint: str, n_keys: int) -> tuple[int, list[Any], int | None]:
+    """Return ``(page, key, row offset)`` from a token issued for the same query."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        page, key = int(payload["p"]), [_decode_value(v) for v in payload["k"]]
+        row = int(payload["o"]) if "o" in payload else None
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidPageToken() from e
+    if payload.get("f") != fingerprint[:16]:
+        raise InvalidPageToken("Page token was issued for a different query")
+    if len(key) != n_keys:
+        raise InvalidPageToken()
+    return page, key, row
+
+
+# ---------------------------------------------------------------- Seeking
+
+
+def _sort_spec(query, sort_keys: Sequence[Any] | None) -> list[tuple[Any, bool]]:
+    """``[(column, descending)]``; defaults to the queried entity's primary key."""
+    if not sort_keys:
+        entity = query.column_descriptions[0]["entity"]
+        sort_keys = [entity.id]
+    spec = []
+    for key in sort_keys:
+        modifier = getattr(key, "modifier", None)
+        if modifier is operators.desc_op:
+            spec.append((key.element, True))
+        elif modifier is operators.asc_op:
+            spec.append((key.element, False))
+        else:
+            spec.append((key, False))
+    return spec
+
+
+def _seek(spec: list[tuple[Any, bool]], key: Sequence[Any]):
+    """Rows strictly after ``key`` in ``spec`` order."""
+    if not any(desc for _, desc in spec):
+        if len(spec) == 1:
+            return spec[0][0] > key[0]
+        return tuple_(*[column for column, _ in spec]) > tuple_(*key)
+    clauses = []
+    for i, (column, desc) in enumerate(spec):
+        equal = [spec[j][0] == key[j] for j in range(i)]
+        clauses.append(and_(*equal, column < key[i] if desc else column > key[i]))
+    return or_(*clauses)
+
+
+def _row_key(item: Any, spec: list[tuple[Any, bool]]) -> list[Any] | None:
+    key = [getattr(item, column.key) for column, _ in spec]
+    return None if any(v is None for v in key) else key
+
+
+# ---------------------------------------------------------------- Totals
+
+
+async def _planner_estimate(db: AsyncSession, query) -> int | None:
+    try:
+        compiled = query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+        plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.debug(f"Planner estimate unavailable, counting instead: {e}")
+        return None
+
+
+async def _total(db: AsyncSession, query, entry: dict[str, Any] | None, count_mode: str) -> tuple[int, bool]:
+    if entry is not None and entry["count"] is not None:
+        return entry["count"], entry["estimate"]
+
+    total, estimated = None, False
+    if count_mode == "estimate" and db.bind.dialect.name == "postgresql":
+        estimate = await _planner_estimate(db, query)
+        if estimate is not None and estimate >= ESTIMATE_EXACT_BELOW:
+            total, estimated = estimate, True
+    if total is None:
+        total = (await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))).scalar() or 0
+
+    if entry is not None:
+        entry["count"], entry["estimate"] = total, estimated
+    return total, estimated
+
+
+# ---------------------------------------------------------------- Paginate
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    *,
+    page: int = 0,
+    page_size: int = 100,
+    page_token: str | None = None,
+    sort_keys: Sequence[Any] | None = None,
+    count_mode: str | None = None,
+    offset: int | None = None,
+    organization_id: int | None = None,
+) -> Page:
+    """
+    Return one page of ``query`` (a filtered ``select`` of one entity).
+
+    Args:
+        page: Page number, used when no ``page_token`` is given.
+        page_token: ``nextPageToken`` from the previous page of the same query.
+        sort_keys: Indexed columns (``.desc()`` allowed) ending in a unique
+            one; default is the entity's primary key. Sorts on a nullable
+            column are served by OFFSET without tokens.
+        count_mode: "cached" (default from settings), "estimate" or "exact".
+        offset: Raw row offset for callers that do not page in whole pages;
+            it takes precedence over ``page``.
+        organization_id: Tenant the query runs for (the caller's
+            organization, which is also what row-level security filters on).
+            Totals and anchors are only cached when it is given.
+    """
+    count_mode = count_mode or settings.PAGINATION_COUNT_MODE
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"Unknown count mode: {count_mode}. Use one of {COUNT_MODES}")
+
+    spec = _sort_spec(query, sort_keys)
+    # A NULL sort key cannot be seeked past, so nullable sorts page by offset
+    seekable = not any(getattr(column, "nullable", True) for column, _ in spec)
+    base = query.order_by(None)
+    fingerprint = _fingerprint(base, organization_id)
+    entry = None
+    if organization_id is not None:
+        tables = {t.name for t in find_tables(base, include_joins=True) if hasattr(t, "name")}
+        entry = query_cache.entry(fingerprint, tables, settings.PAGINATION_COUNT_TTL_SECONDS)
+
+    ordered = base.order_by(*[column.desc() if desc else column.asc() for column, desc in spec])
+    skip = 0
+    if page_token and seekable:
+        page, key, start = decode_page_token(page_token, fingerprint, len(spec))
+        ordered = ordered.where(_seek(spec, key))
+    else:
+        start = offset if offset is not None else page * page_size
+        page = start // page_size
+        skip = start
+        if seekable and entry is not None:
+            # Anchors are keyed by row offset, so they hold for any page size
+            anchors = entry["anchors"]
+            anchored = max((row for row in anchors if row <= start), default=0)
+            if anchored:
+                ordered = ordered.where(_seek(spec, anchors[anchored]))
+            skip = start - anchored
+
+    if skip:
+        ordered = ordered.offset(skip)
+    items = list((await db.execute(ordered.limit(page_size + 1))).scalars().unique().all())
+    has_more = len(items) > page_size
+    items = items[:page_size]
+
+    next_token = None
+    last_key = _row_key(items[-1], spec) if items and has_more and seekable else None
+    if last_key is not None:
+        end = start + len(items) if start is not None else None
+        next_token = encode_page_token(fingerprint, page + 1, last_key, end)
+        if entry is not None and end is not None and len(entry["anchors"]) < MAX_ANCHORS_PER_QUERY:
+            entry["anchors"][end] = last_key
+
+    count_entry = entry if count_mode != "exact" else None
+    total, estimated = await _total(db, base, count_entry, count_mode)
+    # Never report fewer rows than this page proves exist
+    before = start if start is not None else page * page_size
+    total = max(total, before + len(items) + (1 if has_more else 0))
+    return Page(items, page, page_size, total, next_token, estimated)
+
+
+def with_page(response: dict[str, Any], page: Page) -> dict[str, Any]:
+    """Add ``page``'s position and nextPageToken to a BrAPI response's ``metadata.pagination``."""
+    pagination = response.setdefault("metadata", {}).setdefault("pagination", {})
+    pagination["currentPage"] = page.page
+    pagination["nextPageToken"] = page.next_page_token
+    return response
@@ -16,14 +16,23 @@ import logging
 from typing import Any
 
 import redis.asyncio as redis
-from redis.asyncio.connection import ConnectionPool
+from redis.asyncio.connection import BlockingConnectionPool, ConnectionPool
 
 from app.core.config import settings
+from app.core.request_profiling import span
 
 
 logger = logging.getLogger(__name__)
 
 
+class _ProfiledRedis(redis.Redis):
+    """Redis client that adds command round-trips to the current request profile."""
+
+    async def execute_command(self, *args, **options):
+        with span("redis"):
+            return await super().execute_command(*args, **options)
+
+
 class RedisClient:
     """
     Async Redis client wrapper with connection pooling.
@@ -39,16 +48,21 @@ class RedisClient:
         self._pool: ConnectionPool | None = None
         self._client: redis.Redis | None = None
         self._available: bool = False
+        self._scripts: dict[str, Any] = {}
 
     async def connect(self) -> bool:
         """Initialize Redis connection pool."""
         try:
-            self._pool = ConnectionPool.from_url(
+            # Blocking pool: a burst beyond max_connections waits for a free
+            # connection instead of raising, so atomic scripts are not skipped
+            self._pool = BlockingConnectionPool.from_url(
                 settings.REDIS_URL,
-                max_connections=20,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
                 decode_responses=True
             )
-            self._client = redis.Redis(connection_pool=self._pool)
+            self._client = _ProfiledRedis(connection_pool=self._pool)
+            self._scripts = {}
 
             # Test connection
             await self._client.ping()
@@ -174,6 +188,26 @@ class RedisClient:
             logger.error(f"Redis EXPIRE error: {e}")
             return False
 
+    # ============================================
+    # LUA SCRIPTS (atomic multi-step operations)
+    # ============================================
+
+    async def eval_script(self, source: str, keys: list[str], args: list[Any]) -> Any:
+        """
+        Run a Lua script atomically in one round trip.
+
+        The script is loaded once and then invoked by SHA (EVALSHA); redis-py
+        reloads it transparently after a SCRIPT FLUSH or failover. Errors are
+        raised so callers can choose to fail open or closed.
+        """
+        if not self._available:
+            return None
+
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self._client.register_script(source)
+        return await script(keys=keys, args=args)
+
     # ============================================
     # HASH OPERATIONS (for structured data)
     # ============================================
@@ -0,0 +1,460 @@
+"""
+Request-level performance profiling.
+
+RouteProfilerMiddleware opens a RequestProfile for every HTTP request and
+makes it current for the request's context. Instrumented clients add their
+time to the current profile:
+
+- sql: cursor executions on the application engine (SQLAlchemy events)
+- redis: commands sent through the shared Redis client
+- http: outbound calls made with create_traced_async_client
+- compute: time spent waiting for compute job results
+- serialization: response-model validation and encoding by FastAPI
+
+Finished profiles are tagged with the request's trace ID and feed per-route
+latency histograms, the N+1 report (routes whose requests issue more than
+REQUEST_PROFILE_N_PLUS_ONE_QUERIES statements) and a ring of slow requests.
+Everything is kept in memory per worker process.
+
+A route can be armed for stack sampling: the next N matching requests are
+sampled from a background thread and their folded stacks kept for download
+(one "frame;frame;frame count" line per stack, as flame graph tools read).
+The sampled thread is the event loop thread, so concurrent requests on the
+same worker show up in the samples too.
+
+When no profile is current (workers, scripts, startup) every hook is a
+single context-variable lookup.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("sql", "redis", "http", "compute", "serialization")
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+RECENT_DURATIONS = 512
+SLOW_REQUESTS = 200
+SAMPLED_REQUESTS = 20
+MAX_STATEMENT_CHARS = 500
+MAX_STACK_DEPTH = 64
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+# =============================================================================
+# Per-request profile
+# =============================================================================
+
+
+@dataclass
+class RequestProfile:
+    """Where one request's time went."""
+
+    trace_id: str
+    method: str
+    path: str
+    started_at: float = field(default_factory=time.perf_counter)
+    route: str | None = None
+    status_code: int | None = None
+    duration_ms: float = 0.0
+    # category -> [count, seconds]
+    timings: dict[str, list[float]] = field(default_factory=dict)
+    statements: Counter[str] = field(default_factory=Counter)
+    # Set once the response is sent; background tasks that run afterwards
+    # in the same context are not charged to the request.
+    closed: bool = False
+
+    def add(self, category: str, seconds: float) -> None:
+        if self.closed:
+            return
+        entry = self.timings.setdefault(category, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    @property
+    def key(self) -> str:
+        """Route template key, e.g. ``GET /brapi/v2/germplasm/{germplasmDbId}``."""
+        return f"{self.method} {self.route or 'unmatched'}"
+
+    @property
+    def query_count(self) -> int:
+        return int(self.timings.get("sql", (0,))[0])
+
+    def repeated_statement(self) -> tuple[str, int] | None:
+        """The statement this request executed most often, with its count."""
+        common = self.statements.most_common(1)
+        return common[0] if common else None
+
+    def to_dict(self) -> dict[str, Any]:
+        breakdown = {
+            category: {"count": int(count), "ms": round(seconds * 1000.0, 3)}
+            for category in CATEGORIES
+            if category in self.timings
+            for count, seconds in [self.timings[category]]
+        }
+        repeated = self.repeated_statement()
+        return {
+            "trace_id": self.trace_id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.key,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration_ms, 3),
+            "query_count": self.query_count,
+            "breakdown": breakdown,
+            "top_statement": (
+                {"statement": repeated[0], "count": repeated[1]} if repeated else None
+            ),
+        }
+
+
+def current_profile() -> RequestProfile | None:
+    return _current_profile.get()
+
+
+def activate_profile(profile: RequestProfile) -> Token:
+    return _current_profile.set(profile)
+
+
+def deactivate_profile(token: Token) -> None:
+    _current_profile.reset(token)
+
+
+def record(category: str, seconds: float) -> None:
+    """Add ``seconds`` of ``category`` time to the current request, if any."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add(category, seconds)
+
+
+@contextmanager
+def span(category: str) -> Iterator[None]:
+    """Time the block as ``category`` for the current request, if any."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(category, time.perf_counter() - started)
+
+
+# =============================================================================
+# Instrumentation hooks
+# =============================================================================
+
+
+def instrument_engine(engine: Any) -> None:
+    """Count and time every cursor execution of ``engine`` (sync or async)."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _current_profile.get()
+    started = conn.info.get("profile_started_at")
+    if profile is None or not started:
+        return
+    profile.add("sql", time.perf_counter() - started.pop())
+    if not profile.closed:
+        profile.statements[statement[:MAX_STATEMENT_CHARS]] += 1
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    started = conn.info.get("profile_started_at") if conn is not None else None
+    if started:
+        record("sql", time.perf_counter() - started.pop())
+
+
+def instrument_response_serialization() -> None:
+    """
+    Time FastAPI's response-model serialization as ``serialization``.
+
+    FastAPI has no hook around ``serialize_response``; the request handler
+    looks it up as a module global, so it is wrapped in place once.
+    """
+    import fastapi.routing as fastapi_routing
+
+    original = getattr(fastapi_routing, "serialize_response", None)
+    if original is None or getattr(original, "__profiled__", False):
+        return
+
+    async def serialize_response(*args: Any, **kwargs: Any) -> Any:
+        with span("serialization"):
+            return await original(*args, **kwargs)
+
+    serialize_response.__profiled__ = True
+    serialize_response.__wrapped__ = original
+    fastapi_routing.serialize_response = serialize_response
+
+
+# =============================================================================
+# Stack sampling
+# =============================================================================
+
+
+def _fold(frame) -> str:
+    """``outer;...;inner`` for a frame's stack, root first."""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples one thread's Python stack every ``interval`` seconds from a daemon thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-stack-sampler", daemon=True)
+
+    def start(self) -> StackSampler:
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_fold(frame)] += 1
+
+
+@dataclass
+class ArmedRoute:
+    remaining: int
+    interval_ms: float
+
+
+# =============================================================================
+# Aggregates
+# =============================================================================
+
+
+@dataclass
+class RouteStats:
+    requests: int = 0
+    server_errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    recent_ms: deque = field(default_factory=lambda: deque(maxlen=RECENT_DURATIONS))
+    # category -> [count, seconds]
+    timings: dict[str, list[float]] = field(default_factory=dict)
+    max_queries: int = 0
+    n_plus_one_requests: int = 0
+    worst: dict[str, Any] | None = None
+
+    def observe(self, profile: RequestProfile, n_plus_one_queries: int) -> None:
+        self.requests += 1
+        if profile.status_code is not None and profile.status_code >= 500:
+            self.server_errors += 1
+        self.total_ms += profile.duration_ms
+        self.max_ms = max(self.max_ms, profile.duration_ms)
+        self.recent_ms.append(profile.duration_ms)
+        bucket = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS_MS) if profile.duration_ms <= bound),
+            len(LATENCY_BUCKETS_MS),
+        )
+        self.buckets[bucket] += 1
+        for category, (count, seconds) in profile.timings.items():
+            entry = self.timings.setdefault(category, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+
+        queries = profile.query_count
+        self.max_queries = max(self.max_queries, queries)
+        if queries > n_plus_one_queries:
+            self.n_plus_one_requests += 1
+            if self.worst is None or queries >= self.worst["query_count"]:
+                statement, repeats = profile.repeated_statement() or ("", 0)
+                self.worst = {
+                    "trace_id": profile.trace_id,
+                    "path": profile.path,
+                    "query_count": queries,
+                    "statement": statement,
+                    "statement_repeats": repeats,
+                }
+
+    def histogram(self) -> dict[str, Any]:
+        recent = sorted(self.recent_ms)
+
+        def percentile(q: float) -> float | None:
+            return round(recent[min(int(q * len(recent)), len(recent) - 1)], 3) if recent else None
+
+        bounds = [str(bound) for bound in LATENCY_BUCKETS_MS] + ["+Inf"]
+        return {
+            "requests": self.requests,
+            "server_errors": self.server_errors,
+            "mean_ms": round(self.total_ms / self.requests, 3) if self.requests else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "buckets_ms": dict(zip(bounds, self.buckets, strict=True)),
+            "mean_breakdown_ms": {
+                category: round(self.timings[category][1] * 1000.0 / self.requests, 3)
+                for category in CATEGORIES
+                if category in self.timings
+            },
+            "mean_queries": round(self.timings.get("sql", (0, 0.0))[0] / self.requests, 2)
+            if self.requests
+            else 0.0,
+        }
+
+
+class RequestProfileRegistry:
+    """Per-process aggregates of finished request profiles."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, RouteStats] = {}
+        self._slow: deque[dict[str, Any]] = deque(maxlen=SLOW_REQUESTS)
+        self._armed: dict[str, ArmedRoute] = {}
+        self._sampled: deque[dict[str, Any]] = deque(maxlen=SAMPLED_REQUESTS)
+
+    def observe(self, profile: RequestProfile, slow_ms: float, n_plus_one_queries: int) -> None:
+        with self._lock:
+            stats = self._routes.get(profile.key)
+            if stats is None:
+                stats = self._routes[profile.key] = RouteStats()
+            stats.observe(profile, n_plus_one_queries)
+            if profile.duration_ms >= slow_ms:
+                self._slow.append(profile.to_dict())
+
+    def histograms(self) -> dict[str, dict[str, Any]]:
+        """Latency histogram and mean time breakdown per route, busiest first."""
+        with self._lock:
+            ranked = sorted(self._routes.items(), key=lambda item: -item[1].total_ms)
+            return {key: stats.histogram() for key, stats in ranked}
+
+    def n_plus_one_offenders(self, top: int = 10) -> list[dict[str, Any]]:
+        """Routes whose requests exceeded the query threshold, most frequent first."""
+        with self._lock:
+            offenders = [
+                {
+                    "route": key,
+                    "requests": stats.requests,
+                    "flagged_requests": stats.n_plus_one_requests,
+                    "flagged_share": round(stats.n_plus_one_requests / stats.requests, 3),
+                    "mean_queries": round(stats.timings.get("sql", (0,))[0] / stats.requests, 2),
+                    "max_queries": stats.max_queries,
+                    "worst": stats.worst,
+                }
+                for key, stats in self._routes.items()
+                if stats.n_plus_one_requests
+            ]
+        offenders.sort(key=lambda o: (-o["flagged_requests"], -o["max_queries"]))
+        return offenders[:top]
+
+    def slow_requests(self, limit: int = 50) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._slow)[-limit:][::-1]
+
+    def find(self, trace_id: str) -> dict[str, Any] | None:
+        """A slow or sampled request by trace ID."""
+        with self._lock:
+            for entry in reversed(list(self._slow) + list(self._sampled)):
+                if entry["trace_id"] == trace_id:
+                    return entry
+        return None
+
+    # Stack sampling -----------------------------------------------------------
+
+    def arm(self, route: str, requests: int, interval_ms: float) -> None:
+        with self._lock:
+            self._armed[route] = ArmedRoute(remaining=requests, interval_ms=interval_ms)
+
+    def disarm(self, route: str) -> bool:
+        with self._lock:
+            return self._armed.pop(route, None) is not None
+
+    @property
+    def any_armed(self) -> bool:
+        return bool(self._armed)
+
+    def claim_sample(self, route: str) -> float | None:
+        """Sampling interval (seconds) if ``route`` is armed, consuming one request."""
+        with self._lock:
+            armed = self._armed.get(route)
+            if armed is None:
+                return None
+            armed.remaining -= 1
+            if armed.remaining <= 0:
+                del self._armed[route]
+            return armed.interval_ms / 1000.0
+
+    def store_sample(self, profile: RequestProfile, stacks: Counter[str]) -> None:
+        with self._lock:
+            self._sampled.append(
+                {
+                    **profile.to_dict(),
+                    "samples": sum(stacks.values()),
+                    "stacks": dict(stacks.most_common()),
+                }
+            )
+
+    def sampler_state(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "armed": {
+                    route: {"remaining": armed.remaining, "interval_ms": armed.interval_ms}
+                    for route, armed in self._armed.items()
+                },
+                "captured": [
+                    {key: value for key, value in entry.items() if key != "stacks"}
+                    for entry in reversed(self._sampled)
+                ],
+            }
+
+    def folded_stacks(self, trace_id: str) -> str | None:
+        with self._lock:
+            for entry in reversed(self._sampled):
+                if entry["trace_id"] == trace_id:
+                    return "".join(f"{stack} {count}\n" for stack, count in entry["stacks"].items())
+        return None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._slow.clear()
+            self._sampled.clear()
+
+
+request_profiles = RequestProfileRegistry()
@@ -40,6 +40,15 @@ RLS_ENABLED_TABLES = [
     "people",
     "users",
 
+    # Materialised aggregates
+    "organization_counters",
+    "trial_trait_statistics",
+    "phenotype_qc_statistics",
+    "phenotype_qc_issues",
+
+    # Integrations
+    "brapi_harvest_checkpoints",
+
     # AI configuration
     "ai_usage_daily",
     "ai_providers",
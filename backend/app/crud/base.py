@@ -5,9 +5,10 @@ Base CRUD operations
 from typing import Generic, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import Page, paginate
 from app.models.base import BaseModel as DBBaseModel
 
 
@@ -42,6 +43,20 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
         return result.scalar_one_or_none()
 
+    def _list_query(self, org_id: int | None = None, filters: dict | None = None):
+        query = select(self.model)
+
+        # Apply organization filter if provided
+        if org_id is not None and hasattr(self.model, 'organization_id'):
+            query = query.where(self.model.organization_id == org_id)
+
+        # Apply additional filters
+        if filters:
+            for key, value in filters.items():
+                if hasattr(self.model, key) and value is not None:
+                    query = query.where(getattr(self.model, key) == value)
+        return query
+
     async def get_multi(
         self,
         db: AsyncSession,
@@ -55,32 +70,26 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Get multiple records with pagination
         Returns: (records, total_count)
         """
-        # Base query
-        query = select(self.model)
-
-        # Apply organization filter if provided
-        if org_id is not None and hasattr(self.model, 'organization_id'):
-            query = query.where(self.model.organization_id == org_id)
-
-        # Apply additional filters
-        if filters:
-            for key, value in filters.items():
-                if hasattr(self.model, key) and value is not None:
-                    query = query.where(getattr(self.model, key) == value)
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total_count = total_result.scalar()
-
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-
-        # Execute query
-        result = await db.execute(query)
-        records = result.scalars().all()
+        page = await paginate(
+            db, self._list_query(org_id, filters), page_size=limit, offset=skip, organization_id=org_id
+        )
+        return page.items, page.total_count
 
-        return list(records), total_count
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        page: int = 0,
+        page_size: int = 100,
+        page_token: str | None = None,
+        org_id: int | None = None,
+        filters: dict | None = None
+    ) -> Page:
+        """Get one keyset-paginated page of records (see app.core.pagination)"""
+        return await paginate(
+            db, self._list_query(org_id, filters), page=page, page_size=page_size, page_token=page_token,
+            organization_id=org_id,
+        )
 
     async def create(
         self,
@@ -15,6 +15,7 @@ from abc import ABC, abstractmethod
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.modules.core.services.organization_counter_service import stale_counters_statement
 
 
 logger = logging.getLogger(__name__)
@@ -111,6 +112,14 @@ def get_all_seeders() -> list[type]:
     return _seeders.copy()
 
 
+def _mark_counters_stale(db: Session, results: dict) -> None:
+    """Seeders write raw SQL without the counter flush hook, so recount on next read."""
+    if not any(results.values()):
+        return
+    db.execute(stale_counters_statement())
+    db.commit()
+
+
 def run_seeders(db: Session, env: str = "dev", seeders: list[str] | None = None) -> dict:
     """
     Run all or specified seeders.
@@ -135,6 +144,7 @@ def run_seeders(db: Session, env: str = "dev", seeders: list[str] | None = None)
         count = seeder.run(env)
         results[seeder.name] = count
 
+    _mark_counters_stale(db, results)
     return results
 
 
@@ -166,4 +176,5 @@ def clear_seeders(db: Session, seeders: list[str] | None = None) -> dict:
         results[seeder.name] = count
         logger.info(f"Cleared {count} records from {seeder.name}")
 
+    _mark_counters_stale(db, results)
     return results
@@ -6,9 +6,12 @@ Enables data exchange with other BrAPI-compatible breeding databases.
 
 from typing import Any
 
+import httpx
+
 from app.core.http_tracing import create_traced_async_client
 
 from .base import IntegrationAdapter, IntegrationConfig, IntegrationStatus, SyncResult
+from .brapi_harvester import DEFAULT_CONCURRENCY, DEFAULT_PAGE_SIZE, BrAPIHarvester, EntityHarvest
 from .registry import register_adapter
 
 
@@ -27,6 +30,9 @@ class BrAPIAdapter(IntegrationAdapter):
     required_config = ["base_url"]
     optional_config = ["api_key", "username", "password"]
 
+    # Harvest tuning read from ``config.extra``: page_size, concurrency,
+    # use_search (None = ask serverinfo) and modified_since_param
+
     @property
     def capability_tags(self) -> list[str]:
         return ["germplasm", "trials", "observations", "seedlots", "programs"]
@@ -57,7 +63,11 @@ class BrAPIAdapter(IntegrationAdapter):
 
     def __init__(self, config: IntegrationConfig):
         super().__init__(config)
-        self._client = create_traced_async_client(timeout=config.timeout_seconds)
+        concurrency = int(config.extra.get("concurrency", DEFAULT_CONCURRENCY))
+        self._client = create_traced_async_client(
+            timeout=config.timeout_seconds,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
 
     async def close(self):
         """Close the underlying HTTP client."""
@@ -113,31 +123,43 @@ class BrAPIAdapter(IntegrationAdapter):
                 duration_ms=(time.time() - start) * 1000,
             )
 
-    async def _pull_data(self) -> SyncResult:
-        """Pull data from external BrAPI server."""
-        records = 0
-        errors = []
+    def harvester(self) -> BrAPIHarvester:
+        """Harvester over this adapter's pooled client."""
+        extra = self.config.extra
+        return BrAPIHarvester(
+            self._client,
+            self.config.base_url,
+            headers=self._get_headers(),
+            page_size=int(extra.get("page_size", DEFAULT_PAGE_SIZE)),
+            concurrency=int(extra.get("concurrency", DEFAULT_CONCURRENCY)),
+            use_search=extra.get("use_search"),
+            modified_since_param=extra.get("modified_since_param"),
+        )
 
-        # Pull germplasm
-        try:
-            germplasm = await self.get_germplasm()
-            records += len(germplasm)
-        except Exception as e:
-            errors.append(f"Germplasm pull failed: {e}")
-
-        # Pull programs
-        try:
-            programs = await self.get_programs()
-            records += len(programs)
-        except Exception as e:
-            errors.append(f"Programs pull failed: {e}")
+    async def harvest(self, db, organization_id: int, entities: list[str] | None = None) -> dict[str, EntityHarvest]:
+        """Pull every page of ``entities`` (default: all supported) into the organization's tables."""
+        return await self.harvester().harvest(db, organization_id, entities)
 
+    @staticmethod
+    def to_sync_result(results: dict[str, EntityHarvest]) -> SyncResult:
+        """Summarise per-entity harvest results."""
+        errors = [error for result in results.values() for error in result.errors]
         return SyncResult(
-            success=len(errors) == 0,
-            records_synced=records,
+            success=not errors,
+            records_synced=sum(r.records - r.failed for r in results.values()),
+            records_failed=sum(r.failed for r in results.values()),
             errors=errors,
         )
 
+    async def _pull_data(self) -> SyncResult:
+        """
+        Walk every page of every supported entity on the external server.
+
+        The adapter has no tenant here, so records are counted rather than
+        stored; use ``harvest`` with a session to write them locally.
+        """
+        return self.to_sync_result(await self.harvester().harvest(None, None))
+
     async def _push_data(self) -> SyncResult:
         """Push data to external BrAPI server."""
         # Since this adapter doesn't have access to a local data repository directly,
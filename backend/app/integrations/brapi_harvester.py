@@ -0,0 +1,687 @@
+"""
+BrAPI Harvester
+
+Walks every page of the supported BrAPI entities on a remote server and
+upserts them into the local BrAPI tables:
+
+    harvester = BrAPIHarvester(client, "https://brapi.example.org", headers)
+    results = await harvester.harvest(db, organization_id)
+
+Pages of one entity are fetched concurrently (at most ``concurrency`` requests
+in flight over the caller's pooled client) while the pages already received
+are written one at a time. Entities are harvested parent-first so trials can
+resolve their program and studies their trial.
+
+Where the server advertises ``POST /search/{entity}`` the harvest runs over one
+server-side result set (``searchResultsDbId``), polling while the server
+answers 202. 429/503 responses are retried after the server's Retry-After,
+other transient failures with exponential backoff.
+
+Remote records are stored under namespaced local db ids
+(``brapi-<org>-<source hash>:<remote id>``) and carry the remote id in
+``external_references``, so re-harvesting updates rows in place. Progress is
+checkpointed per entity in ``brapi_harvest_checkpoints``: an interrupted
+harvest resumes at its first unstored page, and a completed one leaves a
+modification watermark so the next pull skips unchanged records and, when
+``modified_since_param`` is set, asks the server only for changed ones. A
+harvest with records it could not store (a parent not harvested yet) keeps the
+previous watermark, so those records are fetched again on the next pull.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.brapi_harvest import BrAPIHarvestCheckpoint
+from app.models.core import Location, Program, Study, Trial
+from app.models.germplasm import Germplasm
+from app.models.phenotyping import ObservationVariable
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_CONCURRENCY = 4
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 0.5
+MAX_RETRY_AFTER_SECONDS = 120.0
+SEARCH_POLL_SECONDS = 1.0
+MAX_SEARCH_POLLS = 60
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Checkpoint states from which the next harvest continues the same run
+RESUMABLE = {"running", "interrupted"}
+
+# Keys a record's last modification time is read from, in order
+MODIFIED_FIELDS = ("lastUpdated", "modifiedDate", "updatedAt", "dateModified")
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """How one BrAPI entity maps onto a local table."""
+
+    name: str
+    model: type
+    remote_key: str
+    local_key: str
+    required: str
+    # local column -> BrAPI field (dotted for nested objects)
+    fields: dict[str, str]
+    # local FK column -> (BrAPI reference field, parent entity name, required)
+    parents: tuple[tuple[str, str, str, bool], ...] = ()
+
+
+ENTITIES: dict[str, EntitySpec] = {
+    spec.name: spec
+    for spec in (
+        EntitySpec(
+            "programs", Program, "programDbId", "program_db_id", "program_name",
+            {"program_name": "programName", "abbreviation": "abbreviation", "objective": "objective"},
+        ),
+        EntitySpec(
+            "locations", Location, "locationDbId", "location_db_id", "location_name",
+            {
+                "location_name": "locationName",
+                "location_type": "locationType",
+                "abbreviation": "abbreviation",
+                "country_name": "countryName",
+                "country_code": "countryCode",
+                "institute_name": "instituteName",
+                "institute_address": "instituteAddress",
+                "coordinate_uncertainty": "coordinateUncertainty",
+                "coordinate_description": "coordinateDescription",
+            },
+        ),
+        EntitySpec(
+            "trials", Trial, "trialDbId", "trial_db_id", "trial_name",
+            {
+                "trial_name": "trialName",
+                "trial_description": "trialDescription",
+                "start_date": "startDate",
+                "end_date": "endDate",
+                "active": "active",
+                "common_crop_name": "commonCropName",
+            },
+            parents=(("program_id", "programDbId", "programs", True),),
+        ),
+        EntitySpec(
+            "studies", Study, "studyDbId", "study_db_id", "study_name",
+            {
+                "study_name": "studyName",
+                "study_description": "studyDescription",
+                "study_type": "studyType",
+                "study_code": "studyCode",
+                "start_date": "startDate",
+                "end_date": "endDate",
+                "active": "active",
+                "common_crop_name": "commonCropName",
+                "cultural_practices": "culturalPractices",
+                "observation_levels": "observationLevels",
+                "observation_units_description": "observationUnitsDescription",
+            },
+            parents=(
+                ("trial_id", "trialDbId", "trials", True),
+                ("location_id", "locationDbId", "locations", False),
+            ),
+        ),
+        EntitySpec(
+            "germplasm", Germplasm, "germplasmDbId", "germplasm_db_id", "germplasm_name",
+            {
+                "germplasm_name": "germplasmName",
+                "germplasm_pui": "germplasmPUI",
+                "default_display_name": "defaultDisplayName",
+                "accession_number": "accessionNumber",
+                "common_crop_name": "commonCropName",
+                "genus": "genus",
+                "species": "species",
+                "species_authority": "speciesAuthority",
+                "subtaxa": "subtaxa",
+                "subtaxa_authority": "subtaxaAuthority",
+                "country_of_origin_code": "countryOfOriginCode",
+                "institute_code": "instituteCode",
+                "institute_name": "instituteName",
+                "biological_status_of_accession_code": "biologicalStatusOfAccessionCode",
+                "pedigree": "pedigree",
+                "seed_source": "seedSource",
+                "seed_source_description": "seedSourceDescription",
+                "synonyms": "synonyms",
+            },
+        ),
+        EntitySpec(
+            "variables", ObservationVariable, "observationVariableDbId", "observation_variable_db_id",
+            "observation_variable_name",
+            {
+                "observation_variable_name": "observationVariableName",
+                "common_crop_name": "commonCropName",
+                "default_value": "defaultValue",
+                "growth_stage": "growthStage",
+                "institution": "institution",
+                "language": "language",
+                "scientist": "scientist",
+                "status": "status",
+                "submission_timestamp": "submissionTimestamp",
+                "synonyms": "synonyms",
+                "trait_db_id": "trait.traitDbId",
+                "trait_name": "trait.traitName",
+                "trait_description": "trait.traitDescription",
+                "trait_class": "trait.traitClass",
+                "method_db_id": "method.methodDbId",
+                "method_name": "method.methodName",
+                "method_description": "method.description",
+                "method_class": "method.methodClass",
+                "formula": "method.formula",
+                "scale_db_id": "scale.scaleDbId",
+                "scale_name": "scale.scaleName",
+                "data_type": "scale.dataType",
+                "decimal_places": "scale.decimalPlaces",
+                "valid_values": "scale.validValues",
+                "ontology_db_id": "ontologyReference.ontologyDbId",
+            },
+        ),
+    )
+}
+
+
+@dataclass
+class EntityHarvest:
+    """Outcome of harvesting one entity."""
+
+    entity: str
+    pages: int = 0
+    records: int = 0
+    upserted: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    resumed_from_page: int = 0
+    used_search: bool = False
+    errors: list[str] = field(default_factory=list)
+
+
+def normalise_source(base_url: str) -> str:
+    """Canonical server identity used for checkpoints and local db ids."""
+    return base_url.strip().rstrip("/").lower()
+
+
+def local_db_id(organization_id: int, source: str, remote_id: Any) -> str:
+    """Namespaced local db id for a remote record (db ids are globally unique locally)."""
+    digest = hashlib.sha1(normalise_source(source).encode()).hexdigest()[:10]
+    return f"brapi-{organization_id}-{digest}:{remote_id}"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max((when - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+def record_modified_at(record: dict[str, Any]) -> datetime | None:
+    """Last modification time of a BrAPI record, if the server reports one."""
+    sources = (record, record.get("additionalInfo") or {})
+    for source in sources:
+        for key in MODIFIED_FIELDS:
+            value = source.get(key) if isinstance(source, dict) else None
+            if not value:
+                continue
+            try:
+                parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+            except ValueError:
+                continue
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+    return None
+
+
+def _get_path(record: dict[str, Any], path: str) -> Any:
+    value: Any = record
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _pagination(body: dict[str, Any]) -> tuple[int | None, int | None]:
+    """(totalPages, totalCount) from a BrAPI response, when the server reports them."""
+    pagination = (body.get("metadata") or {}).get("pagination") or {}
+    total_pages, total_count = pagination.get("totalPages"), pagination.get("totalCount")
+    page_size = pagination.get("pageSize")
+    if total_pages is None and total_count is not None and page_size:
+        total_pages = -(-int(total_count) // int(page_size))
+    return (int(total_pages) if total_pages is not None else None,
+            int(total_count) if total_count is not None else None)
+
+
+def _records(body: dict[str, Any]) -> list[dict[str, Any]]:
+    return (body.get("result") or {}).get("data") or []
+
+
+class BrAPIHarvester:
+    """Concurrent, checkpointed pull of BrAPI entities into the local store."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        headers: dict[str, str] | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        use_search: bool | None = None,
+        modified_since_param: str | None = None,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.source = normalise_source(base_url)
+        self.headers = headers or {}
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.use_search = use_search
+        self.modified_since_param = modified_since_param
+        self.max_retries = max_retries
+        self._sleep = asyncio.sleep
+        self._search_services: set[str] | None = None
+
+    # ------------------------------------------------------------------ HTTP
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}/brapi/v2/{path.lstrip('/')}"
+
+    async def _request(self, method: str, path: str, **kwargs) -> tuple[int, dict[str, Any]]:
+        """Send one request, retrying throttled and transient failures."""
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.request(method, self._url(path), headers=self.headers, **kwargs)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+                await self._sleep(BACKOFF_SECONDS * 2**attempt)
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = BACKOFF_SECONDS * 2**attempt
+                await self._sleep(min(delay, MAX_RETRY_AFTER_SECONDS))
+                attempt += 1
+                continue
+
+            response.raise_for_status()
+            return response.status_code, response.json() if response.content else {}
+
+    async def supports_search(self, entity: str) -> bool:
+        """Whether the server advertises ``POST /search/{entity}`` in serverinfo."""
+        if self.use_search is not None:
+            return self.use_search
+        if self._search_services is None:
+            self._search_services = set()
+            try:
+                _, body = await self._request("GET", "serverinfo")
+            except httpx.HTTPError as e:
+                logger.info(f"BrAPI serverinfo unavailable at {self.source}, using list endpoints: {e}")
+                return False
+            for call in (body.get("result") or {}).get("calls") or []:
+                service = str(call.get("service", "")).strip("/")
+                if service.startswith("search/") and "POST" in [m.upper() for m in call.get("methods") or []]:
+                    self._search_services.add(service)
+        return f"search/{entity}" in self._search_services
+
+    # ---------------------------------------------------------------- Paging
+
+    async def _search_page(self, entity: str, search_id: str, page: int) -> dict[str, Any]:
+        params = {"page": page, "pageSize": self.page_size}
+        for _ in range(MAX_SEARCH_POLLS):
+            status, body = await self._request("GET", f"search/{entity}/{search_id}", params=params)
+            if status != 202:
+                return body
+            await self._sleep(SEARCH_POLL_SECONDS)
+        raise TimeoutError(f"BrAPI search {entity}/{search_id} still pending after {MAX_SEARCH_POLLS} polls")
+
+    async def _open(
+        self, entity: str, filters: dict[str, Any], checkpoint: BrAPIHarvestCheckpoint | None, result: EntityHarvest
+    ) -> tuple[Callable[[int], Any], int, dict[str, Any] | None, str | None]:
+        """
+        Choose how pages are fetched and where to start.
+
+        Returns ``(fetch_page, start_page, first_body, search_results_db_id)``;
+        ``first_body`` is set when opening the search already returned a page.
+        """
+        resume_page = checkpoint.next_page if checkpoint is not None and checkpoint.status in RESUMABLE else 0
+
+        if not await self.supports_search(entity):
+            async def fetch_list(page: int) -> dict[str, Any]:
+                params = {**filters, "page": page, "pageSize": self.page_size}
+                return (await self._request("GET", entity, params=params))[1]
+
+            return fetch_list, resume_page, None, None
+
+        result.used_search = True
+        search_id = checkpoint.search_results_db_id if checkpoint is not None and resume_page else None
+        if search_id:
+            try:
+                first = await self._search_page(entity, search_id, resume_page)
+                return (lambda page: self._search_page(entity, search_id, page)), resume_page, first, search_id
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 404:
+                    raise
+                # The server expired the result set; start a fresh search from page 0
+                resume_page = 0
+
+        status, body = await self._request(
+            "POST", f"search/{entity}", json={**filters, "page": resume_page, "pageSize": self.page_size}
+        )
+        search_id = (body.get("result") or {}).get("searchResultsDbId")
+        if status == 202 or search_id:
+            return (lambda page: self._search_page(entity, search_id, page)), resume_page, None, search_id
+
+        async def fetch_search(page: int) -> dict[str, Any]:
+            payload = {**filters, "page": page, "pageSize": self.page_size}
+            return (await self._request("POST", f"search/{entity}", json=payload))[1]
+
+        return fetch_search, resume_page, body, None
+
+    async def _pages(
+        self, fetch: Callable[[int], Any], start: int, first: dict[str, Any] | None
+    ) -> AsyncIterator[tuple[int, dict[str, Any], int | None]]:
+        """
+        Yield ``(page, body, total_pages)`` from ``start`` onwards as pages arrive.
+
+        After the first page reveals the page count, up to ``concurrency``
+        fetches run ahead of the consumer. Servers that report no page count
+        are walked one page at a time until a short page.
+        """
+        if first is None:
+            first = await fetch(start)
+        total_pages, _ = _pagination(first)
+        yield start, first, total_pages
+
+        if total_pages is None:
+            page, body = start, first
+            while len(_records(body)) >= self.page_size:
+                page += 1
+                body = await fetch(page)
+                yield page, body, None
+            return
+
+        remaining = iter(range(start + 1, total_pages))
+        pending: dict[asyncio.Task, int] = {}
+
+        def launch() -> None:
+            while len(pending) < self.concurrency:
+                page = next(remaining, None)
+                if page is None:
+                    return
+                pending[asyncio.ensure_future(fetch(page))] = page
+
+        launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = pending.pop(task)
+                    yield page, task.result(), total_pages
+                launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # ---------------------------------------------------------------- Storage
+
+    async def _checkpoint(self, db: AsyncSession, organization_id: int, entity: str) -> BrAPIHarvestCheckpoint:
+        checkpoint = (await db.execute(
+            select(BrAPIHarvestCheckpoint).where(
+                BrAPIHarvestCheckpoint.organization_id == organization_id,
+                BrAPIHarvestCheckpoint.source == self.source,
+                BrAPIHarvestCheckpoint.entity == entity,
+            )
+        )).scalar_one_or_none()
+        if checkpoint is None:
+            checkpoint = BrAPIHarvestCheckpoint(
+                organization_id=organization_id, source=self.source, entity=entity,
+                next_page=0, records_harvested=0, failed_records=0, status="idle",
+            )
+            db.add(checkpoint)
+            await db.flush()
+        return checkpoint
+
+    async def _parent_ids(
+        self, db: AsyncSession, organization_id: int, spec: EntitySpec, records: list[dict[str, Any]]
+    ) -> dict[str, dict[str, int]]:
+        """Local ids of the parents referenced by a page, keyed by FK column then remote id."""
+        resolved: dict[str, dict[str, int]] = {}
+        for column, remote_field, parent_name, _ in spec.parents:
+            parent = ENTITIES[parent_name]
+            remote_ids = {str(r[remote_field]) for r in records if r.get(remote_field) is not None}
+            if not remote_ids:
+                resolved[column] = {}
+                continue
+            by_local = {local_db_id(organization_id, self.source, rid): rid for rid in remote_ids}
+            key_column = getattr(parent.model, parent.local_key)
+            rows = await db.execute(
+                select(key_column, parent.model.id).where(
+                    parent.model.organization_id == organization_id, key_column.in_(by_local)
+                )
+            )
+            resolved[column] = {by_local[key]: pk for key, pk in rows.all()}
+        return resolved
+
+    def _row(
+        self, organization_id: int, spec: EntitySpec, record: dict[str, Any], parents: dict[str, dict[str, int]]
+    ) -> tuple[dict[str, Any] | None, str | None]:
+        remote_id = record.get(spec.remote_key)
+        if remote_id is None:
+            return None, f"{spec.name} record without {spec.remote_key}"
+
+        row: dict[str, Any] = {
+            "organization_id": organization_id,
+            spec.local_key: local_db_id(organization_id, self.source, remote_id),
+        }
+        for column, path in spec.fields.items():
+            row[column] = _get_path(record, path)
+        if not row.get(spec.required):
+            row[spec.required] = str(remote_id)
+
+        for column, remote_field, parent_name, required in spec.parents:
+            parent_remote = record.get(remote_field)
+            parent_id = parents[column].get(str(parent_remote)) if parent_remote is not None else None
+            if parent_id is None and required:
+                return None, f"{spec.name} {remote_id}: {parent_name} {parent_remote!r} not harvested"
+            row[column] = parent_id
+
+        references = [r for r in record.get("externalReferences") or [] if isinstance(r, dict)]
+        references.append({"referenceId": str(remote_id), "referenceSource": self.source})
+        row["external_references"] = references
+        row["additional_info"] = record.get("additionalInfo")
+        return row, None
+
+    async def _upsert(self, db: AsyncSession, spec: EntitySpec, rows: list[dict[str, Any]]) -> None:
+        """Insert or update rows keyed on the entity's local db id, in one statement where supported."""
+        if not rows:
+            return
+        table = spec.model.__table__
+        key = table.c[spec.local_key]
+        now = datetime.now(UTC)
+        insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(db.bind.dialect.name)
+
+        if insert is not None:
+            stmt = insert(table).values([{**row, "created_at": now, "updated_at": now} for row in rows])
+            updated = {column: stmt.excluded[column] for column in rows[0] if column not in (spec.local_key, "organization_id")}
+            await db.execute(stmt.on_conflict_do_update(index_elements=[key], set_={**updated, "updated_at": now}))
+            return
+
+        existing = set((await db.execute(select(key).where(key.in_([r[spec.local_key] for r in rows])))).scalars())
+        for row in rows:
+            if row[spec.local_key] in existing:
+                await db.execute(table.update().where(key == row[spec.local_key]).values(**row, updated_at=now))
+            else:
+                await db.execute(table.insert().values(**row, created_at=now, updated_at=now))
+
+    async def _store_page(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        spec: EntitySpec,
+        records: list[dict[str, Any]],
+        watermark: datetime | None,
+        result: EntityHarvest,
+    ) -> datetime | None:
+        """Upsert one page; returns the newest modification time seen on it."""
+        newest = None
+        changed = []
+        for record in records:
+            modified = record_modified_at(record)
+            if modified is not None:
+                newest = modified if newest is None else max(newest, modified)
+                if watermark is not None and modified <= watermark:
+                    result.unchanged += 1
+                    continue
+            changed.append(record)
+
+        parents = await self._parent_ids(db, organization_id, spec, changed)
+        rows = []
+        for record in changed:
+            row, error = self._row(organization_id, spec, record, parents)
+            if row is None:
+                result.failed += 1
+                if len(result.errors) < 20:
+                    result.errors.append(error)
+                continue
+            rows.append(row)
+
+        await self._upsert(db, spec, rows)
+        result.upserted += len(rows)
+        return newest
+
+    # ---------------------------------------------------------------- Harvest
+
+    async def harvest_entity(
+        self,
+        db: AsyncSession | None,
+        organization_id: int | None,
+        entity: str,
+        filters: dict[str, Any] | None = None,
+    ) -> EntityHarvest:
+        """
+        Harvest every page of one entity.
+
+        With a session the records are upserted and the checkpoint is committed
+        after each page, so progress survives an interrupted run. Without one
+        the pages are only walked and counted.
+        """
+        if entity not in ENTITIES:
+            raise ValueError(f"Unsupported BrAPI entity: {entity}. Supported: {list(ENTITIES)}")
+        spec = ENTITIES[entity]
+        result = EntityHarvest(entity=entity)
+        filters = dict(filters or {})
+        checkpoint = await self._checkpoint(db, organization_id, entity) if db is not None else None
+
+        watermark = None
+        if checkpoint is not None:
+            watermark = checkpoint.modified_since
+            if watermark is not None and watermark.tzinfo is None:
+                watermark = watermark.replace(tzinfo=UTC)
+            if checkpoint.status not in RESUMABLE:
+                checkpoint.run_started_at = datetime.now(UTC)
+                checkpoint.records_harvested = 0
+                checkpoint.failed_records = 0
+            if watermark is not None and self.modified_since_param:
+                filters[self.modified_since_param] = watermark.isoformat()
+
+        fetch, start, first, search_id = await self._open(entity, filters, checkpoint, result)
+        result.resumed_from_page = start
+        if checkpoint is not None:
+            checkpoint.status = "running"
+            checkpoint.next_page = start
+            checkpoint.search_results_db_id = search_id
+            checkpoint.last_error = None
+            await db.commit()
+
+        newest = watermark
+        stored: set[int] = set()
+        try:
+            async for page, body, total_pages in self._pages(fetch, start, first):
+                records = _records(body)
+                result.pages += 1
+                result.records += len(records)
+                if checkpoint is None:
+                    continue
+
+                failed_before = result.failed
+                page_newest = await self._store_page(db, organization_id, spec, records, watermark, result)
+                checkpoint.failed_records += result.failed - failed_before
+                if page_newest is not None:
+                    newest = page_newest if newest is None else max(newest, page_newest)
+
+                # The cursor only advances over a contiguous run of stored pages
+                stored.add(page)
+                while checkpoint.next_page in stored:
+                    stored.discard(checkpoint.next_page)
+                    checkpoint.next_page += 1
+                checkpoint.total_pages = total_pages
+                checkpoint.records_harvested += len(records)
+                await db.commit()
+        except Exception as e:
+            if checkpoint is not None:
+                await db.rollback()
+                await db.refresh(checkpoint)
+                checkpoint.status = "interrupted" if checkpoint.next_page else "failed"
+                checkpoint.last_error = str(e)[:2000]
+                await db.commit()
+            raise
+
+        if checkpoint is not None:
+            started = checkpoint.run_started_at
+            checkpoint.status = "completed"
+            checkpoint.next_page = 0
+            checkpoint.search_results_db_id = None
+            checkpoint.completed_at = datetime.now(UTC)
+            # Servers that report modification times get a watermark in their own clock.
+            # Records that failed to store are older than it, so it only advances
+            # after a run that stored everything
+            if not checkpoint.failed_records:
+                checkpoint.modified_since = newest if newest is not None else started
+            await db.commit()
+        return result
+
+    async def harvest(
+        self,
+        db: AsyncSession | None,
+        organization_id: int | None,
+        entities: list[str] | None = None,
+        filters: dict[str, dict[str, Any]] | None = None,
+    ) -> dict[str, EntityHarvest]:
+        """Harvest ``entities`` (default: all supported) parent-first; failures are per entity."""
+        wanted = [name for name in ENTITIES if entities is None or name in entities]
+        unknown = set(entities or []) - set(ENTITIES)
+        if unknown:
+            raise ValueError(f"Unsupported BrAPI entities: {sorted(unknown)}. Supported: {list(ENTITIES)}")
+
+        results: dict[str, EntityHarvest] = {}
+        for name in wanted:
+            try:
+                results[name] = await self.harvest_entity(db, organization_id, name, (filters or {}).get(name))
+            except Exception as e:
+                logger.warning(f"BrAPI harvest of {name} from {self.source} failed: {e}")
+                results[name] = EntityHarvest(entity=name, errors=[f"{name} harvest failed: {e}"])
+        return results
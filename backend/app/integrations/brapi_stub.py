@@ -0,0 +1,122 @@
+"""
+Stub BrAPI server
+
+An httpx transport that serves an in-memory BrAPI v2 server, so the harvester
+runs end to end in tests and offline environments:
+
+    server = StubBrAPIServer({"germplasm": [...], "programs": [...]}, search=True)
+    client = httpx.AsyncClient(transport=server)
+    harvester = BrAPIHarvester(client, server.base_url)
+
+List endpoints page their records with ``page``/``pageSize``. With
+``search=True`` the server advertises ``POST /search/{entity}`` and answers it
+asynchronously: the POST returns 202 with a ``searchResultsDbId`` and the first
+poll of that result set is 202 again. ``throttle_every`` answers every n-th
+request with 429 and a Retry-After, ``fail_pages`` answers chosen
+``(entity, page)`` requests with 500, and ``modified_since_param`` filters
+records on their ``lastUpdated``. Every request is logged in ``requests``.
+"""
+
+import json
+from datetime import datetime
+from typing import Any
+
+import httpx
+
+
+class StubBrAPIServer(httpx.AsyncBaseTransport):
+    """Serve BrAPI list and search endpoints from in-memory records."""
+
+    base_url = "http://brapi.stub"
+
+    def __init__(
+        self,
+        records: dict[str, list[dict[str, Any]]],
+        search: bool = False,
+        throttle_every: int = 0,
+        retry_after: str = "1",
+        fail_pages: set[tuple[str, int]] | None = None,
+        modified_since_param: str | None = None,
+    ):
+        self.records = records
+        self.search = search
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.fail_pages = set(fail_pages or ())
+        self.modified_since_param = modified_since_param
+        self.requests: list[httpx.Request] = []
+        self.throttled = 0
+        self._searches: dict[str, tuple[str, dict[str, Any], int]] = {}
+
+    def _filter(self, entity: str, filters: dict[str, Any]) -> list[dict[str, Any]]:
+        records = self.records.get(entity, [])
+        since = filters.get(self.modified_since_param) if self.modified_since_param else None
+        if since:
+            cutoff = datetime.fromisoformat(str(since))
+            records = [r for r in records if datetime.fromisoformat(r["lastUpdated"]) > cutoff]
+        return records
+
+    def _page(self, request: httpx.Request, entity: str, records: list[dict[str, Any]], page: int, size: int):
+        if (entity, page) in self.fail_pages:
+            return httpx.Response(500, json={"metadata": {"status": [{"message": "boom"}]}}, request=request)
+        total = len(records)
+        body = {
+            "metadata": {
+                "pagination": {
+                    "currentPage": page,
+                    "pageSize": size,
+                    "totalCount": total,
+                    "totalPages": -(-total // size) if total else 0,
+                },
+                "status": [],
+            },
+            "result": {"data": records[page * size:(page + 1) * size]},
+        }
+        return httpx.Response(200, json=body, request=request)
+
+    def _serverinfo(self, request: httpx.Request) -> httpx.Response:
+        calls = [{"service": "serverinfo", "methods": ["GET"]}]
+        for entity in self.records:
+            calls.append({"service": entity, "methods": ["GET"]})
+            if self.search:
+                calls.append({"service": f"search/{entity}", "methods": ["POST"]})
+                calls.append({"service": f"search/{entity}/{{searchResultsDbId}}", "methods": ["GET"]})
+        return httpx.Response(200, json={"result": {"calls": calls}}, request=request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.throttle_every and len(self.requests) % self.throttle_every == 0:
+            self.throttled += 1
+            return httpx.Response(429, headers={"Retry-After": self.retry_after}, request=request)
+
+        path = request.url.path.removeprefix("/brapi/v2/").strip("/").split("/")
+        params = dict(request.url.params)
+
+        if path == ["serverinfo"]:
+            return self._serverinfo(request)
+
+        if path[0] == "search" and self.search and path[1] in self.records:
+            entity = path[1]
+            if request.method == "POST":
+                filters = json.loads(request.content or b"{}")
+                search_id = f"{entity}-{len(self._searches) + 1}"
+                self._searches[search_id] = (entity, filters, 0)
+                return httpx.Response(202, json={"result": {"searchResultsDbId": search_id}}, request=request)
+            if len(path) == 3 and path[2] in self._searches:
+                entity, filters, polls = self._searches[path[2]]
+                self._searches[path[2]] = (entity, filters, polls + 1)
+                if polls == 0:
+                    return httpx.Response(202, json={"result": {"searchResultsDbId": path[2]}}, request=request)
+                return self._page(
+                    request, entity, self._filter(entity, filters),
+                    int(params.get("page", 0)), int(params.get("pageSize", 1000)),
+                )
+            return httpx.Response(404, json={"metadata": {"status": [{"message": "unknown search"}]}}, request=request)
+
+        if len(path) == 1 and path[0] in self.records and request.method == "GET":
+            return self._page(
+                request, path[0], self._filter(path[0], params),
+                int(params.get("page", 0)), int(params.get("pageSize", 1000)),
+            )
+
+        return httpx.Response(404, json={"metadata": {"status": [{"message": "not found"}]}}, request=request)
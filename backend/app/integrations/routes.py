@@ -4,12 +4,18 @@ Integration Hub - API Routes
 Endpoints for managing external integrations.
 """
 
+from dataclasses import asdict
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_organization_id
+from app.core.database import get_db
 
 from .base import IntegrationConfig
+from .brapi import BrAPIAdapter
 from .registry import INTEGRATION_REGISTRY, get_adapter, list_integrations
 
 
@@ -24,6 +30,12 @@ class IntegrationConfigRequest(BaseModel):
     extra: dict[str, Any] = {}
 
 
+class HarvestRequest(BaseModel):
+    """Request to harvest a BrAPI server into the local store."""
+    config: IntegrationConfigRequest
+    entities: list[str] | None = None
+
+
 class TestConnectionRequest(BaseModel):
     """Request to test an integration connection."""
     integration_id: str
@@ -116,3 +128,31 @@ async def sync_integration(
             status_code=501,
             detail="This integration does not support sync"
         )
+
+
+@router.post("/brapi/harvest", dependencies=[Depends(get_current_user)])
+async def harvest_brapi(
+    request: HarvestRequest,
+    db: AsyncSession = Depends(get_db),
+    organization_id: int = Depends(get_organization_id),
+):
+    """
+    Pull all pages of the requested BrAPI entities into the organization's tables.
+
+    Repeated calls are incremental: each entity resumes from its checkpoint.
+    """
+    adapter = BrAPIAdapter(IntegrationConfig(**request.config.dict()))
+    try:
+        async with adapter:
+            results = await adapter.harvest(db, organization_id, request.entities)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    summary = adapter.to_sync_result(results)
+    return {
+        "integration_id": "brapi",
+        "success": summary.success,
+        "records_synced": summary.records_synced,
+        "records_failed": summary.records_failed,
+        "entities": {name: asdict(result) for name, result in results.items()},
+    }
@@ -4,8 +4,6 @@ from __future__ import annotations
 
 import asyncio
 import re
-import time
-from collections import defaultdict, deque
 from collections.abc import Callable
 
 from fastapi import Request, Response
@@ -14,6 +12,7 @@ from starlette.responses import JSONResponse
 
 from app.core.database import AsyncSessionLocal
 from app.models.audit import AuditLog
+from app.modules.core.services.rate_limiter_service import RATE_LIMITS, RateLimitType, rate_limiter
 
 
 SENSITIVE_KEYS = {"name", "full_name", "email", "phone", "contact", "address"}
@@ -25,24 +24,20 @@ class EmergencyLockdown:
     enabled: bool = False
 
 
-class _SimpleLimiter:
-    def __init__(self, max_requests: int = 20, window_seconds: int = 60):
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
-        self._buckets: dict[str, deque[float]] = defaultdict(deque)
+class _HighResourceLimiter:
+    """Per client-and-path limit for compute endpoints, shared across workers via Redis."""
 
-    def allow(self, key: str) -> bool:
-        now = time.time()
-        bucket = self._buckets[key]
-        while bucket and now - bucket[0] > self.window_seconds:
-            bucket.popleft()
-        if len(bucket) >= self.max_requests:
-            return False
-        bucket.append(now)
-        return True
+    limit_type = RateLimitType.HIGH_RESOURCE
 
+    @property
+    def max_requests(self) -> int:
+        return RATE_LIMITS[self.limit_type].max_requests
 
-high_resource_limiter = _SimpleLimiter()
+    async def allow(self, key: str) -> bool:
+        return (await rate_limiter.check(self.limit_type, key)).allowed
+
+
+high_resource_limiter = _HighResourceLimiter()
 
 
 def _mask_payload(payload: dict | None) -> dict | None:
@@ -72,7 +67,7 @@ class AuditMiddleware(BaseHTTPMiddleware):
 
         if any(seg in path for seg in HIGH_RESOURCE_SEGMENTS):
             ip = self._client_ip(request)
-            if not high_resource_limiter.allow(f"{ip}:{path}"):
+            if not await high_resource_limiter.allow(f"{ip}:{path}"):
                 return JSONResponse(
                     status_code=429,
                     content={"detail": "Rate limit exceeded for high-resource endpoint"},
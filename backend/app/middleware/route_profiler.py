@@ -1,28 +1,127 @@
-"""Development-only route profiler middleware."""
+"""
+Route profiler middleware.
+
+Opens a RequestProfile for every HTTP request (see app.core.request_profiling),
+records the route template and status once the response is sent, and feeds the
+per-route aggregates served by /api/v2/monitoring/requests. Requests to routes
+armed for stack sampling are sampled while they run.
+
+Plain ASGI rather than BaseHTTPMiddleware so the profile context reaches the
+endpoint unchanged and streamed responses are timed to their last chunk.
+"""
 
 from __future__ import annotations
 
 import logging
+import threading
 import time
-from collections.abc import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.request_profiling import (
+    RequestProfile,
+    StackSampler,
+    activate_profile,
+    deactivate_profile,
+    request_profiles,
+)
+from app.core.tracing import get_current_trace_id
 
 
 logger = logging.getLogger("route_profiler")
 
 
-class RouteProfilerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        started_at = time.perf_counter()
-        response = await call_next(request)
-        duration_ms = (time.perf_counter() - started_at) * 1000
-        logger.info(
-            "[RouteProfiler] %s %s -> %s in %.2fms",
-            request.method,
-            request.url.path,
-            response.status_code,
-            duration_ms,
+def _route_template(scope: Scope) -> str | None:
+    route = scope.get("route")
+    return getattr(route, "path", None)
+
+
+def _match_route_template(scope: Scope) -> str | None:
+    """Resolve the route template before routing runs (only needed for sampling)."""
+    router = getattr(scope.get("app"), "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None)
+    return None
+
+
+class RouteProfilerMiddleware:
+    def __init__(self, app: ASGIApp, log_requests: bool = False):
+        self.app = app
+        self.log_requests = log_requests
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            trace_id=get_current_trace_id(),
+            method=scope["method"],
+            path=scope["path"],
+        )
+        sampler = self._start_sampler(scope, profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                self._finish(scope, profile, sampler)
+
+        token = activate_profile(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            profile.status_code = profile.status_code or 500
+            raise
+        finally:
+            deactivate_profile(token)
+            self._finish(scope, profile, sampler)
+
+    @staticmethod
+    def _start_sampler(scope: Scope, profile: RequestProfile) -> StackSampler | None:
+        if not request_profiles.any_armed:
+            return None
+        profile.route = _match_route_template(scope)
+        interval = request_profiles.claim_sample(profile.key)
+        if interval is None:
+            return None
+        return StackSampler(threading.get_ident(), interval).start()
+
+    def _finish(self, scope: Scope, profile: RequestProfile, sampler: StackSampler | None) -> None:
+        if profile.closed:
+            return
+        profile.closed = True
+        profile.duration_ms = (time.perf_counter() - profile.started_at) * 1000
+        profile.route = _route_template(scope) or profile.route
+
+        request_profiles.observe(
+            profile,
+            slow_ms=settings.REQUEST_PROFILE_SLOW_MS,
+            n_plus_one_queries=settings.REQUEST_PROFILE_N_PLUS_ONE_QUERIES,
         )
-        return response
+        if sampler is not None:
+            request_profiles.store_sample(profile, sampler.stop())
+
+        if self.log_requests:
+            logger.info(
+                "[RouteProfiler] %s %s -> %s in %.2fms (%d queries)",
+                profile.method,
+                profile.path,
+                profile.status_code,
+                profile.duration_ms,
+                profile.query_count,
+            )
+        if profile.duration_ms >= settings.REQUEST_PROFILE_SLOW_MS:
+            logger.warning(
+                "[RouteProfiler] slow request %s %s -> %s in %.2fms: %s",
+                profile.method,
+                profile.path,
+                profile.status_code,
+                profile.duration_ms,
+                profile.to_dict()["breakdown"],
+            )
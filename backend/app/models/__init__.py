@@ -9,6 +9,7 @@ from app.models.audit import AuditLog, Permission, RolePermission
 from app.models.barcode import BarcodeScan
 from app.models.base import BaseModel
 from app.models.biosimulation import CropModel, SimulationRun
+from app.models.brapi_harvest import BrAPIHarvestCheckpoint
 from app.models.climate import (
     AdoptionLevel,
     CarbonMeasurement,
@@ -202,6 +203,7 @@ from app.models.iot import (
 )
 from app.models.label_printing import PrintJob, PrintJobStatus
 from app.models.mars import MarsClosedLoopMetric, MarsEnvironmentProfile, MarsTrial
+from app.models.organization_counter import OrganizationCounter
 from app.models.orchestrator_state import (
     OrchestratorAssignment,
     OrchestratorBlocker,
@@ -218,7 +220,10 @@ from app.models.phenotyping import (
     Observation,
     ObservationUnit,
     ObservationVariable,
+    PhenotypeQCIssue,
+    PhenotypeQCStatistic,
     Sample,
+    TrialTraitStatistic,
 )
 from app.models.proposal import ActionType, Proposal, ProposalStatus
 from app.models.qtl import QTL, Gene, GOTerm, gene_go_terms
@@ -334,6 +339,9 @@ __all__ = [
     "ObservationVariable",
     "ObservationUnit",
     "Observation",
+    "TrialTraitStatistic",
+    "PhenotypeQCStatistic",
+    "PhenotypeQCIssue",
     "Sample",
     "Image",
     "Event",
@@ -536,6 +544,8 @@ __all__ = [
     "MarsTrial",
     "MarsClosedLoopMetric",
     "AIUsageDaily",
+    "OrganizationCounter",
+    "BrAPIHarvestCheckpoint",
     "PrintJob",
     # Veena Core
     "VeenaMemory",
@@ -0,0 +1,49 @@
+"""
+BrAPI Harvest Models
+
+Per-entity checkpoints for pulls from external BrAPI servers. A checkpoint
+records how far an in-progress harvest has got, so an interrupted pull resumes
+at the next unharvested page, and the modification watermark of the last
+completed pull, so the following pull only asks for what changed since.
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+
+from app.models.base import BaseModel
+
+
+class BrAPIHarvestCheckpoint(BaseModel):
+    """
+    Harvest progress for one entity type from one BrAPI server.
+
+    ``source`` is the normalised server base URL. ``next_page`` is the first
+    page not yet stored in the running harvest (0 once a harvest completes);
+    ``search_results_db_id`` is the server-side result set that page belongs to.
+    ``failed_records`` counts records the running harvest could not store; a
+    harvest that completes with failures keeps the previous watermark.
+    """
+
+    __tablename__ = "brapi_harvest_checkpoints"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    source = Column(String(500), nullable=False)
+    entity = Column(String(50), nullable=False)
+
+    # In-progress harvest
+    next_page = Column(Integer, default=0, nullable=False)
+    total_pages = Column(Integer, nullable=True)
+    search_results_db_id = Column(String(255), nullable=True)
+    run_started_at = Column(DateTime(timezone=True), nullable=True)
+    failed_records = Column(Integer, default=0, nullable=False)
+
+    # Last completed harvest
+    modified_since = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    records_harvested = Column(Integer, default=0, nullable=False)
+
+    status = Column(String(20), default="idle", nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("organization_id", "source", "entity", name="uq_brapi_harvest_checkpoint"),
+    )
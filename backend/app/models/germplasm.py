@@ -3,7 +3,10 @@ BrAPI Germplasm Module Models
 Germplasm, Attributes, Crosses, Seedlots
 """
 
-from sqlalchemy import JSON, Column, Date, Float, ForeignKey, Integer, String, Text
+import contextlib
+from datetime import date
+
+from sqlalchemy import JSON, Column, Date, Float, ForeignKey, Index, Integer, String, Text, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -240,6 +243,8 @@ class Seedlot(BaseModel):
     # Dates
     creation_date = Column(Date)
     last_updated = Column(Date)
+    # Copy of additional_info["last_viability_test"] so overdue lots can be found by index
+    last_viability_test = Column(Date)
 
     # BrAPI additional info
     additional_info = Column(JSON)
@@ -255,6 +260,28 @@ class Seedlot(BaseModel):
         "SeedlotTransaction", back_populates="seedlot", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_seedlots_org_last_viability_test", "organization_id", "last_viability_test"),
+    )
+
+
+def parse_last_viability_test(additional_info: dict | None) -> date | None:
+    """The ISO date of a lot's latest viability test, or None when absent or malformed."""
+    raw = (additional_info or {}).get("last_viability_test")
+    if raw:
+        with contextlib.suppress(ValueError, TypeError):
+            return date.fromisoformat(raw)
+    return None
+
+
+def set_last_viability_test(mapper, connection, target: Seedlot) -> None:
+    """Keep last_viability_test in step with additional_info on ORM writes."""
+    target.last_viability_test = parse_last_viability_test(target.additional_info)
+
+
+event.listen(Seedlot, "before_insert", set_last_viability_test)
+event.listen(Seedlot, "before_update", set_last_viability_test)
+
 
 class SeedlotTransaction(BaseModel):
     """BrAPI Seedlot Transaction - Movement of seeds in/out of seedlot"""
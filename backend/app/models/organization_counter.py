@@ -0,0 +1,43 @@
+"""
+Organization Counter Models
+
+Per-organization aggregate counters backing dashboard and inventory summaries.
+Values are maintained incrementally on ORM flush and periodically reconciled
+against full recounts.
+"""
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+
+from app.models.base import BaseModel
+
+
+class OrganizationCounter(BaseModel):
+    """
+    A single named aggregate for an organization.
+
+    Keys are dotted names with an optional ``:dimension`` suffix, e.g.
+    ``observations``, ``trials.active`` or ``seedlots.status:active``.
+    """
+
+    __tablename__ = "organization_counters"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    counter_key = Column(String(255), nullable=False)
+    value = Column(Float, default=0.0, nullable=False)
+
+    # Only meaningful on the reconciliation sentinel row; see OrganizationCounterService
+    is_stale = Column(Boolean, default=False, nullable=False)
+    reconciled_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("organization_id", "counter_key", name="uq_org_counter_key"),
+    )
@@ -3,12 +3,70 @@ BrAPI Phenotyping Module Models
 Observation Variables (Traits), Observations, Observation Units, Samples, Images, Events
 """
 
-from sqlalchemy import JSON, Column, Float, ForeignKey, Integer, String, Text
+import math
+import re
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    event,
+)
 from sqlalchemy.orm import relationship
 
 from app.models.base import BaseModel
 
 
+# Plain decimal/scientific literals; the backfill migration uses the same pattern
+NUMERIC_VALUE_PATTERN = r"^[-+]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][-+]?[0-9]+)?$"
+_NUMERIC_VALUE = re.compile(NUMERIC_VALUE_PATTERN)
+CATEGORICAL_VALUE_MAX_LENGTH = 255
+
+
+def typed_observation_values(value: Any, time_stamp: Any) -> dict[str, Any]:
+    """
+    Typed columns for an observation's raw value and timestamp.
+
+    Numeric literals go to value_numeric, other non-empty short text to
+    value_categorical; ISO 8601 timestamps (naive = UTC) to observed_at.
+    """
+    text = str(value).strip() if value is not None else ""
+    numeric = float(text) if _NUMERIC_VALUE.match(text) else None
+    if numeric is not None and not math.isfinite(numeric):
+        numeric = None
+    categorical = text if numeric is None and text and len(text) <= CATEGORICAL_VALUE_MAX_LENGTH else None
+
+    return {
+        "value_numeric": numeric,
+        "value_categorical": categorical,
+        "observed_at": parse_observation_timestamp(time_stamp),
+    }
+
+
+def parse_observation_timestamp(time_stamp: Any) -> datetime | None:
+    """ISO 8601 string or datetime -> aware datetime (naive = UTC); None when unparseable."""
+    observed_at = None
+    if isinstance(time_stamp, datetime):
+        observed_at = time_stamp
+    elif time_stamp:
+        try:
+            observed_at = datetime.fromisoformat(str(time_stamp).strip())
+        except ValueError:
+            return None
+    if observed_at is not None and observed_at.tzinfo is None:
+        observed_at = observed_at.replace(tzinfo=UTC)
+    return observed_at
+
+
 class ObservationVariable(BaseModel):
     """BrAPI Observation Variable (Trait) - A measured characteristic"""
 
@@ -119,6 +177,11 @@ class Observation(BaseModel):
     upload_timestamp = Column(String(50))
     value = Column(Text)
 
+    # Typed copies of value / observation_time_stamp, set on write (typed_observation_values)
+    value_numeric = Column(Float)
+    value_categorical = Column(String(CATEGORICAL_VALUE_MAX_LENGTH))
+    observed_at = Column(DateTime(timezone=True))
+
     # Geo coordinates
     geo_coordinates = Column(JSON)
 
@@ -133,6 +196,107 @@ class Observation(BaseModel):
     study = relationship("Study")
     germplasm = relationship("Germplasm")
 
+    __table_args__ = (
+        Index("ix_observations_org_variable_study", "organization_id", "observation_variable_id", "study_id"),
+        Index("ix_observations_study_germplasm", "study_id", "germplasm_id"),
+        Index("ix_observations_org_observed_at", "organization_id", "observed_at"),
+    )
+
+
+def set_typed_observation_values(mapper, connection, target: Observation) -> None:
+    """Keep the typed columns in step with value / observation_time_stamp on ORM writes."""
+    for key, typed in typed_observation_values(target.value, target.observation_time_stamp).items():
+        setattr(target, key, typed)
+
+
+event.listen(Observation, "before_insert", set_typed_observation_values)
+event.listen(Observation, "before_update", set_typed_observation_values)
+
+
+class TrialTraitStatistic(BaseModel):
+    """
+    Sufficient statistics (n, sum, sum of squares) of numeric observations per
+    (study, trait, germplasm). Maintained on observation writes so trial
+    summaries can run ANOVA without re-reading raw observations.
+
+    germplasm_id is 0 for observations without a germplasm link.
+    """
+
+    __tablename__ = "trial_trait_statistics"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    study_id = Column(Integer, ForeignKey("studies.id"), nullable=False, index=True)
+    observation_variable_id = Column(Integer, ForeignKey("observation_variables.id"), nullable=False)
+    germplasm_id = Column(Integer, nullable=False, default=0)
+    n = Column(Integer, nullable=False, default=0)
+    sum_x = Column(Float, nullable=False, default=0.0)
+    sum_x2 = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "study_id", "observation_variable_id", "germplasm_id", name="uq_trial_trait_statistic_cell"
+        ),
+    )
+
+
+class PhenotypeQCStatistic(BaseModel):
+    """
+    Running robust statistics of a trait within a study for ingest-time QC.
+
+    ``sketch`` is a mergeable log-bucket quantile sketch (see
+    phenotype_qc_service.QuantileSketch) from which the median and MAD are
+    read; n / min / max / Σx / Σx² are exact.
+    """
+
+    __tablename__ = "phenotype_qc_statistics"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    study_id = Column(Integer, ForeignKey("studies.id"), nullable=False, index=True)
+    observation_variable_id = Column(Integer, ForeignKey("observation_variables.id"), nullable=False)
+    n = Column(Integer, nullable=False, default=0)
+    min_value = Column(Float)
+    max_value = Column(Float)
+    sum_x = Column(Float, nullable=False, default=0.0)
+    sum_x2 = Column(Float, nullable=False, default=0.0)
+    sketch = Column(JSON)
+
+    __table_args__ = (
+        UniqueConstraint("study_id", "observation_variable_id", name="uq_phenotype_qc_statistic_trait"),
+    )
+
+
+class PhenotypeQCIssue(BaseModel):
+    """
+    A QC flag raised on an observation value (outlier, out of scale, invalid).
+
+    ``source`` names the table the flagged record lives in ("observation" or
+    "field_book"); ``record_id`` is its primary key there.
+    """
+
+    __tablename__ = "phenotype_qc_issues"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    source = Column(String(30), nullable=False)
+    record_id = Column(Integer, nullable=False)
+    observation_variable_id = Column(Integer, ForeignKey("observation_variables.id"))
+    study_id = Column(Integer, ForeignKey("studies.id"))
+    germplasm_id = Column(Integer)
+    value = Column(String(255))
+    rule = Column(String(50), nullable=False)
+    issue_type = Column(String(30), nullable=False)
+    severity = Column(String(20), nullable=False)
+    reason = Column(Text)
+    score = Column(Float)  # robust z-score where the rule computes one
+    status = Column(String(20), nullable=False, default="open")
+    batch_id = Column(String(64))
+    resolved_at = Column(DateTime(timezone=True))
+    resolved_by = Column(String(255))
+
+    __table_args__ = (
+        Index("ix_phenotype_qc_issues_org_status_severity", "organization_id", "status", "severity"),
+        Index("ix_phenotype_qc_issues_record", "source", "record_id"),
+    )
+
 
 class Sample(BaseModel):
     """BrAPI Sample - A physical sample taken from an observation unit"""
@@ -1,58 +1,54 @@
 """Public AI service exports."""
 
-from app.modules.ai.adapters import IProviderAdapter, ProviderRegistry
-from app.modules.ai.services.orchestrator_state import (
-	AssignmentRecord,
-	BlockerRecord,
-	DecisionNoteRecord,
-	EvidenceItemRecord,
-	MissionRecord,
-	MissionStateRepository,
-	MissionStateSnapshot,
-	MissionStatus,
-	OrchestratorMissionStateService,
-	SubtaskRecord,
-	SubtaskStatus,
-	VerificationResult,
-	VerificationRunRecord,
-	VolatileMissionStateRepository,
-)
-from app.modules.ai.services.project_brain_memory_file import FileBackedProjectBrainMemoryRepository
-from app.modules.ai.services.project_brain_memory import (
-	ProjectBrainCorrectionRecord,
-	ProjectBrainMemoryEdgeRecord,
-	ProjectBrainMemoryNodeRecord,
-	ProjectBrainMemoryRepository,
-	ProjectBrainMemoryService,
-	ProjectBrainProjectionRecord,
-	ProjectBrainProvenanceTrail,
-	ProjectBrainRecallView,
-	ProjectBrainScope,
-	ProjectBrainSourceArtifactRecord,
-	ProjectBrainSourceSurface,
-	ProjectBrainTrustRank,
-	VolatileProjectBrainMemoryRepository,
-)
-from app.modules.ai.services.project_brain_memory_surreal import (
-	ProjectBrainSurrealConnectionConfig,
-	ProjectBrainSurrealRepositoryError,
-	SurrealProjectBrainMemoryRepository,
-)
-from app.modules.ai.services.project_brain_memory_surreal_schema import (
-	ProjectBrainSurrealSchemaBootstrapError,
-	ProjectBrainSurrealSchemaBootstrapReport,
-	ProjectBrainSurrealSchemaManager,
-	build_project_brain_surreal_schema_statements,
-)
-from app.modules.ai.services.project_brain_query import (
-	ProjectBrainQueryResult,
-	ProjectBrainQueryService,
-	render_project_brain_query_result,
-)
-from app.modules.ai.services.project_brain_snapshot_query import (
-	ProjectBrainSnapshotQueryResult,
-	ProjectBrainSnapshotQueryService,
-)
+from app.core.lazy_imports import lazy_exports
+
+
+_EXPORTS = {
+	"IProviderAdapter": "app.modules.ai.adapters",
+	"ProviderRegistry": "app.modules.ai.adapters",
+	"AssignmentRecord": ".orchestrator_state",
+	"BlockerRecord": ".orchestrator_state",
+	"DecisionNoteRecord": ".orchestrator_state",
+	"EvidenceItemRecord": ".orchestrator_state",
+	"MissionRecord": ".orchestrator_state",
+	"MissionStateRepository": ".orchestrator_state",
+	"MissionStateSnapshot": ".orchestrator_state",
+	"MissionStatus": ".orchestrator_state",
+	"OrchestratorMissionStateService": ".orchestrator_state",
+	"SubtaskRecord": ".orchestrator_state",
+	"SubtaskStatus": ".orchestrator_state",
+	"VerificationResult": ".orchestrator_state",
+	"VerificationRunRecord": ".orchestrator_state",
+	"VolatileMissionStateRepository": ".orchestrator_state",
+	"FileBackedProjectBrainMemoryRepository": ".project_brain_memory_file",
+	"ProjectBrainCorrectionRecord": ".project_brain_memory",
+	"ProjectBrainMemoryEdgeRecord": ".project_brain_memory",
+	"ProjectBrainMemoryNodeRecord": ".project_brain_memory",
+	"ProjectBrainMemoryRepository": ".project_brain_memory",
+	"ProjectBrainMemoryService": ".project_brain_memory",
+	"ProjectBrainProjectionRecord": ".project_brain_memory",
+	"ProjectBrainProvenanceTrail": ".project_brain_memory",
+	"ProjectBrainRecallView": ".project_brain_memory",
+	"ProjectBrainScope": ".project_brain_memory",
+	"ProjectBrainSourceArtifactRecord": ".project_brain_memory",
+	"ProjectBrainSourceSurface": ".project_brain_memory",
+	"ProjectBrainTrustRank": ".project_brain_memory",
+	"VolatileProjectBrainMemoryRepository": ".project_brain_memory",
+	"ProjectBrainSurrealConnectionConfig": ".project_brain_memory_surreal",
+	"ProjectBrainSurrealRepositoryError": ".project_brain_memory_surreal",
+	"SurrealProjectBrainMemoryRepository": ".project_brain_memory_surreal",
+	"ProjectBrainSurrealSchemaBootstrapError": ".project_brain_memory_surreal_schema",
+	"ProjectBrainSurrealSchemaBootstrapReport": ".project_brain_memory_surreal_schema",
+	"ProjectBrainSurrealSchemaManager": ".project_brain_memory_surreal_schema",
+	"build_project_brain_surreal_schema_statements": ".project_brain_memory_surreal_schema",
+	"ProjectBrainQueryResult": ".project_brain_query",
+	"ProjectBrainQueryService": ".project_brain_query",
+	"render_project_brain_query_result": ".project_brain_query",
+	"ProjectBrainSnapshotQueryResult": ".project_brain_snapshot_query",
+	"ProjectBrainSnapshotQueryService": ".project_brain_snapshot_query",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
 	"AssignmentRecord",
@@ -14,6 +14,11 @@ import httpx
 
 from app.core.http_tracing import create_traced_async_client
 from app.modules.ai.services.reevu.planner import _detect_domains
+from app.modules.ai.services.reevu.route_compiler import (
+    RouteScan,
+    register_route_terms,
+    scan_message,
+)
 from app.schemas.functions import (
     BIJMANTRA_FUNCTIONS,
     format_functions_for_prompt,
@@ -188,6 +193,92 @@ TRIAL_QUERY_ACTION_TERMS: frozenset[str] = frozenset(
         "who",
     }
 )
+GERMPLASM_DETAIL_TERMS: tuple[str, ...] = ("germplasm", "variety", "accession")
+GERMPLASM_DETAIL_ACTION_PHRASES: tuple[str, ...] = (
+    "detail",
+    "details",
+    "lookup",
+    "profile",
+    "tell me about",
+)
+TRAIT_SUMMARY_KEYWORDS: tuple[str, ...] = ("summarize", "summary", "summarise")
+SEARCH_ACTION_PHRASES: tuple[str, ...] = ("search", "find", "show me", "show", "list")
+COMPARE_TRAIT_TERMS: tuple[str, ...] = ("trait", "traits", "yield", "performance", "phenotype")
+NAVIGATION_PHRASES: tuple[str, ...] = ("go to", "open", "navigate")
+SEARCH_CROPS: tuple[str, ...] = (
+    "rice",
+    "wheat",
+    "maize",
+    "soybean",
+    "cotton",
+    "chickpea",
+    "pigeon pea",
+)
+TRIAL_CREATE_CROPS: tuple[str, ...] = ("rice", "wheat", "maize")
+TRIAL_TYPES: tuple[str, ...] = ("PYT", "AYT", "MLT", "OYT")
+# Common breeding stations
+BREEDING_STATIONS: tuple[str, ...] = (
+    "Ludhiana",
+    "Delhi",
+    "Hyderabad",
+    "IRRI",
+    "CIMMYT",
+    "Bangalore",
+)
+NAVIGATION_PAGES: dict[str, str] = {
+    "dashboard": "/dashboard",
+    "programs": "/programs",
+    "trials": "/trials",
+    "germplasm": "/germplasm",
+    "crosses": "/crosses",
+    "settings": "/settings",
+}
+# Single keywords checked directly by the pattern router
+INTENT_KEYWORDS: tuple[str, ...] = (
+    "trial",
+    "trait",
+    "germplasm",
+    "variety",
+    "varieties",
+    "accession",
+    "accessions",
+    "cross",
+    "compare",
+    "create",
+    "make",
+    "record",
+    "observation",
+    "score",
+    "weather",
+)
+
+# Every phrase the pattern router looks for, compiled with the planner's
+# domain keywords so a message is scanned once per turn
+register_route_terms(
+    {
+        "intent.keywords": INTENT_KEYWORDS,
+        "intent.known_traits": KNOWN_TRAIT_PHRASES,
+        "intent.marker_terms": MARKER_TERMS,
+        "intent.marker_actions": MARKER_ACTION_PHRASES,
+        "intent.trial_summary_actions": TRIAL_SUMMARY_ACTION_PHRASES,
+        "intent.trial_result_keywords": TRIAL_RESULT_KEYWORDS,
+        "intent.trait_summary_actions": TRAIT_SUMMARY_ACTION_PHRASES,
+        "intent.trait_summary_keywords": TRAIT_SUMMARY_KEYWORDS,
+        "intent.genomic_selection": GENOMIC_SELECTION_PHRASES,
+        "intent.breeding_entities": BREEDING_ENTITY_TERMS,
+        "intent.protocol_terms": PROTOCOL_QUERY_TERMS,
+        "intent.germplasm_detail_terms": GERMPLASM_DETAIL_TERMS,
+        "intent.germplasm_detail_actions": GERMPLASM_DETAIL_ACTION_PHRASES,
+        "intent.search_actions": SEARCH_ACTION_PHRASES,
+        "intent.compare_traits": COMPARE_TRAIT_TERMS,
+        "intent.navigation": NAVIGATION_PHRASES,
+        "intent.search_crops": SEARCH_CROPS,
+        "intent.trial_create_crops": TRIAL_CREATE_CROPS,
+        "intent.trial_types": TRIAL_TYPES,
+        "intent.locations": BREEDING_STATIONS,
+        "intent.pages": NAVIGATION_PAGES,
+    }
+)
 
 
 class FunctionCall:
@@ -361,12 +452,12 @@ Response:"""
 
         This is a simple rule-based system for when FunctionGemma is unavailable.
         """
-        message_lower = user_message.lower()
+        scan = scan_message(user_message)
         detected_domains = set(_detect_domains(user_message))
 
-        if self._is_trial_results_request(message_lower) and self._should_prefer_trial_results_route(
+        if self._is_trial_results_request(scan) and self._should_prefer_trial_results_route(
             user_message=user_message,
-            message_lower=message_lower,
+            scan=scan,
             detected_domains=detected_domains,
         ):
             return self._finalize_detected_call(
@@ -375,9 +466,9 @@ Response:"""
                 confidence=0.75,
             )
 
-        if self._is_trait_summary_request(message_lower) and not self._has_explicit_cross_domain_cues(
+        if self._is_trait_summary_request(scan) and not self._has_explicit_cross_domain_cues(
             user_message=user_message,
-            message_lower=message_lower,
+            scan=scan,
             detected_domains=detected_domains,
         ):
             trait_summary_params: dict[str, Any] = {}
@@ -393,7 +484,7 @@ Response:"""
 
         if self._should_route_cross_domain_query(
             detected_domains=detected_domains,
-            message_lower=message_lower,
+            scan=scan,
         ):
             return self._finalize_detected_call(
                 "cross_domain_query",
@@ -401,22 +492,15 @@ Response:"""
                 confidence=0.8,
             )
 
-        if self._is_trial_results_request(message_lower):
+        if self._is_trial_results_request(scan):
             return self._finalize_detected_call(
                 "get_trial_results",
                 self._build_trial_results_params(user_message),
                 confidence=0.75,
             )
 
-        if any(token in message_lower for token in ("germplasm", "variety", "accession")) and any(
-            phrase in message_lower
-            for phrase in (
-                "detail",
-                "details",
-                "lookup",
-                "profile",
-                "tell me about",
-            )
+        if scan.any("intent.germplasm_detail_terms") and scan.any(
+            "intent.germplasm_detail_actions"
         ):
             germplasm_identifier = self._extract_germplasm_identifier(user_message)
             germplasm_params: dict[str, Any] = {}
@@ -435,9 +519,7 @@ Response:"""
                 confidence=0.75,
             )
 
-        if any(term in message_lower for term in MARKER_TERMS) and any(
-            phrase in message_lower for phrase in MARKER_ACTION_PHRASES
-        ):
+        if scan.any("intent.marker_terms") and scan.any("intent.marker_actions"):
             marker_query = self._extract_marker_trait_query(user_message)
             marker_params = {"query": marker_query or user_message.strip()}
             return self._finalize_detected_call(
@@ -446,7 +528,7 @@ Response:"""
                 confidence=0.75,
             )
 
-        if any(phrase in message_lower for phrase in GENOMIC_SELECTION_PHRASES):
+        if scan.any("intent.genomic_selection"):
             breeding_value_params: dict[str, Any] = {"method": "GBLUP"}
             if trait := self._extract_trait_query(user_message):
                 breeding_value_params["trait"] = trait
@@ -461,30 +543,30 @@ Response:"""
             )
 
         # Search patterns
-        if any(word in message_lower for word in ["search", "find", "show me", "show", "list"]):
-            if "germplasm" in message_lower or "variety" in message_lower or "varieties" in message_lower:
+        if scan.any("intent.search_actions"):
+            if scan.has("germplasm") or scan.has("variety") or scan.has("varieties"):
                 params = self._extract_search_params(user_message, "germplasm")
                 return self._finalize_detected_call("search_germplasm", params, confidence=0.7)
 
-            elif "trial" in message_lower:
+            elif scan.has("trial"):
                 params = self._extract_search_params(user_message, "trial")
                 return self._finalize_detected_call("search_trials", params, confidence=0.7)
 
-            elif "cross" in message_lower:
+            elif scan.has("cross"):
                 params = self._extract_search_params(user_message, "cross")
                 return self._finalize_detected_call("search_crosses", params, confidence=0.7)
 
-            elif "accession" in message_lower or "accessions" in message_lower:
+            elif scan.has("accession") or scan.has("accessions"):
                 params = self._extract_search_params(user_message, "accession")
                 return self._finalize_detected_call("search_accessions", params, confidence=0.7)
 
         # Compare patterns
-        if "compare" in message_lower:
+        if scan.has("compare"):
             if (
-                "germplasm" in message_lower
-                or "variety" in message_lower
-                or "varieties" in message_lower
-                or any(term in message_lower for term in ("trait", "traits", "yield", "performance", "phenotype"))
+                scan.has("germplasm")
+                or scan.has("variety")
+                or scan.has("varieties")
+                or scan.any("intent.compare_traits")
             ):
                 varieties = self._extract_variety_names(user_message)
                 if varieties:
@@ -497,15 +579,15 @@ Response:"""
                     )
 
         # Proposal Patterns
-        if "create" in message_lower and "trial" in message_lower:
+        if scan.has("create") and scan.has("trial"):
             params = self._extract_create_trial_params(user_message)
             return self._finalize_detected_call("propose_create_trial", params, confidence=0.7)
 
-        if ("create" in message_lower or "make" in message_lower) and "cross" in message_lower:
+        if (scan.has("create") or scan.has("make")) and scan.has("cross"):
             params = self._extract_create_cross_params(user_message)
             return self._finalize_detected_call("propose_create_cross", params, confidence=0.7)
 
-        if "record" in message_lower and ("observation" in message_lower or "score" in message_lower):
+        if scan.has("record") and (scan.has("observation") or scan.has("score")):
             # Simple extraction for observation
             # Ideally needs more complex extraction logic, but this is fallback
             return self._finalize_detected_call(
@@ -520,7 +602,7 @@ Response:"""
 
 
         # Weather patterns
-        if "weather" in message_lower:
+        if scan.has("weather"):
             location = self._extract_location(user_message)
             return self._finalize_detected_call(
                 "get_weather_forecast",
@@ -532,7 +614,7 @@ Response:"""
             )
 
         # Navigate patterns
-        if any(word in message_lower for word in ["go to", "open", "navigate"]):
+        if scan.any("intent.navigation"):
             page = self._extract_page_name(user_message)
             if page:
                 return self._finalize_detected_call("navigate_to", {"page": page}, confidence=0.8)
@@ -555,20 +637,15 @@ Response:"""
     def _extract_search_params(self, message: str, entity_type: str) -> dict[str, Any]:
         """Extract search parameters from message"""
         params = {}
-        message_lower = message.lower()
+        scan = scan_message(message)
 
         # Extract crop
-        crops = ["rice", "wheat", "maize", "soybean", "cotton", "chickpea", "pigeon pea"]
-        for crop in crops:
-            if crop in message_lower:
-                params["crop"] = crop
-                break
+        if crop := scan.first("intent.search_crops"):
+            params["crop"] = crop
 
         # Extract traits
-        for trait in KNOWN_TRAIT_PHRASES:
-            if trait in message_lower:
-                params["trait"] = trait.replace(" ", "_")
-                break
+        if trait := scan.first("intent.known_traits"):
+            params["trait"] = trait.replace(" ", "_")
 
         return params
 
@@ -621,47 +698,39 @@ Response:"""
             return None
 
         normalized = " ".join(extracted.split())
-        normalized_lower = normalized.lower()
-        for trait in KNOWN_TRAIT_PHRASES:
-            if trait in normalized_lower:
-                return trait
-
-        return normalized
+        return scan_message(normalized).first("intent.known_traits") or normalized
 
-    def _is_trial_results_request(self, message_lower: str) -> bool:
+    def _is_trial_results_request(self, scan: RouteScan) -> bool:
         """Return whether the request is asking for a trial summary or ranking surface."""
-        if "trial" not in message_lower:
+        if not scan.has("trial"):
             return False
 
-        if any(phrase in message_lower for phrase in TRIAL_SUMMARY_ACTION_PHRASES):
+        if scan.any("intent.trial_summary_actions"):
             return True
 
-        return any(keyword in message_lower for keyword in TRIAL_RESULT_KEYWORDS)
+        return scan.any("intent.trial_result_keywords")
 
-    def _is_trait_summary_request(self, message_lower: str) -> bool:
+    def _is_trait_summary_request(self, scan: RouteScan) -> bool:
         """Return whether the request should route to phenotype trait summary."""
-        if any(phrase in message_lower for phrase in TRAIT_SUMMARY_ACTION_PHRASES):
+        if scan.any("intent.trait_summary_actions"):
             return True
 
-        return (
-            "trait" in message_lower
-            and any(keyword in message_lower for keyword in ("summarize", "summary", "summarise"))
-        )
+        return scan.has("trait") and scan.any("intent.trait_summary_keywords")
 
     def _should_prefer_trial_results_route(
         self,
         *,
         user_message: str,
-        message_lower: str,
+        scan: RouteScan,
         detected_domains: set[str],
     ) -> bool:
         """Keep trial-summary prompts on the dedicated trial path unless compound cues are explicit."""
-        if not self._is_trial_results_request(message_lower):
+        if not self._is_trial_results_request(scan):
             return False
 
         return not self._has_explicit_cross_domain_cues(
             user_message=user_message,
-            message_lower=message_lower,
+            scan=scan,
             detected_domains=detected_domains,
         )
 
@@ -669,7 +738,7 @@ Response:"""
         self,
         *,
         user_message: str,
-        message_lower: str,
+        scan: RouteScan,
         detected_domains: set[str],
     ) -> bool:
         """Return whether the prompt carries explicit signals that it must stay compound."""
@@ -679,7 +748,7 @@ Response:"""
         if self._extract_location(user_message):
             return True
 
-        if any(term in message_lower for term in BREEDING_ENTITY_TERMS):
+        if scan.any("intent.breeding_entities"):
             return True
 
         return False
@@ -784,7 +853,7 @@ Response:"""
         self,
         *,
         detected_domains: set[str],
-        message_lower: str,
+        scan: RouteScan,
     ) -> bool:
         """Return whether the request should use the compound cross-domain route.
 
@@ -796,14 +865,14 @@ Response:"""
         for domain_class in CROSS_DOMAIN_QUERY_DOMAIN_CLASSES:
             if not domain_class.issubset(detected_domains):
                 continue
-            if domain_class == frozenset({"breeding", "genomics"}) and not any(
-                term in message_lower for term in BREEDING_ENTITY_TERMS
+            if domain_class == frozenset({"breeding", "genomics"}) and not scan.any(
+                "intent.breeding_entities"
             ):
                 continue
             if domain_class == frozenset({"breeding", "protocols"}) and not (
-                any(term in message_lower for term in BREEDING_ENTITY_TERMS)
-                and any(term in message_lower for term in PROTOCOL_QUERY_TERMS)
-                and any(trait in message_lower for trait in KNOWN_TRAIT_PHRASES)
+                scan.any("intent.breeding_entities")
+                and scan.any("intent.protocol_terms")
+                and scan.any("intent.known_traits")
             ):
                 continue
             return True
@@ -828,23 +897,16 @@ Response:"""
 
     def _extract_trait_query(self, message: str) -> str | None:
         """Extract a known breeding trait phrase from a free-form request."""
-        message_lower = message.lower()
-        for trait in KNOWN_TRAIT_PHRASES:
-            if trait in message_lower:
-                return trait
-        return None
+        return scan_message(message).first("intent.known_traits")
 
     def _extract_create_trial_params(self, message: str) -> dict[str, Any]:
         """Extract trial creation parameters"""
         params = {}
-        message_lower = message.lower()
+        scan = scan_message(message)
 
         # Extract crop
-        crops = ["rice", "wheat", "maize"]
-        for crop in crops:
-            if crop in message_lower:
-                params["crop"] = crop
-                break
+        if crop := scan.first("intent.trial_create_crops"):
+            params["crop"] = crop
 
         # Extract location
         location = self._extract_location(message)
@@ -852,11 +914,8 @@ Response:"""
             params["location"] = location
 
         # Extract trial type
-        trial_types = ["PYT", "AYT", "MLT", "OYT"]
-        for trial_type in trial_types:
-            if trial_type.lower() in message_lower:
-                params["trial_type"] = trial_type
-                break
+        if trial_type := scan.first("intent.trial_types"):
+            params["trial_type"] = trial_type.upper()
 
         return params
 
@@ -874,12 +933,9 @@ Response:"""
 
     def _extract_location(self, message: str) -> str | None:
         """Extract location from message"""
-        # Common breeding stations
-        locations = ["Ludhiana", "Delhi", "Hyderabad", "IRRI", "CIMMYT", "Bangalore"]
-        message_lower = message.lower()
-
-        for location in locations:
-            if location.lower() in message_lower:
+        scan = scan_message(message)
+        for location in BREEDING_STATIONS:
+            if scan.has(location.lower()):
                 return location
 
         return None
@@ -921,18 +977,7 @@ Response:"""
 
     def _extract_page_name(self, message: str) -> str | None:
         """Extract page name from navigation request"""
-        pages = {
-            "dashboard": "/dashboard",
-            "programs": "/programs",
-            "trials": "/trials",
-            "germplasm": "/germplasm",
-            "crosses": "/crosses",
-            "settings": "/settings",
-        }
-
-        message_lower = message.lower()
-        for page_name, route in pages.items():
-            if page_name in message_lower:
-                return route
+        if page_name := scan_message(message).first("intent.pages"):
+            return NAVIGATION_PAGES[page_name]
 
         return None
@@ -1,22 +1,110 @@
 """
 AI Quota Service
 Enforces daily usage limits for organization-managed AI keys.
+
+When Redis is available the daily counters live there: each request is
+checked and counted by one Lua script, and the increments are flushed to
+``AIUsageDaily`` in batches by ``run_quota_flush_loop``. A day's counter is
+seeded from its ``AIUsageDaily`` row on first use. Without Redis every request
+reads and writes ``AIUsageDaily`` directly.
 """
 
-from datetime import date
+import asyncio
+import logging
+from datetime import UTC, date, datetime
 from typing import Any
 
 from fastapi import HTTPException, status
 from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.redis import redis_client
 from app.models.ai_quota import AIUsageDaily
 from app.models.core import Organization
 
 
+logger = logging.getLogger(__name__)
+
 # Default limit if not set in DB
 DEFAULT_DAILY_LIMIT = 50
 
+QUOTA_KEY_TTL_SECONDS = 2 * 86400
+QUOTA_FLUSH_INTERVAL_SECONDS = 30
+QUOTA_FLUSH_BATCH = 500
+DIRTY_KEY = "ai_quota:dirty"
+COUNTER_FIELDS = {
+    "requests": "request_count",
+    "tokens_in": "token_count_input",
+    "tokens_out": "token_count_output",
+}
+
+# KEYS: day counters, unflushed increments, dirty set
+# ARGV: daily limit, increment (0/1), input tokens, output tokens, ttl, dirty member
+# Returns: {-1, 0} when the day is not seeded yet, else {allowed, requests used}
+CHECK_AND_INCREMENT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {-1, 0}
+end
+local used = tonumber(redis.call('HGET', KEYS[1], 'requests') or '0')
+if used >= tonumber(ARGV[1]) then
+    return {0, used}
+end
+if ARGV[2] == '1' then
+    for _, key in ipairs({KEYS[1], KEYS[2]}) do
+        redis.call('HINCRBY', key, 'requests', 1)
+        redis.call('HINCRBY', key, 'tokens_in', ARGV[3])
+        redis.call('HINCRBY', key, 'tokens_out', ARGV[4])
+    end
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+    redis.call('SADD', KEYS[3], ARGV[6])
+    used = used + 1
+end
+return {1, used}
+"""
+
+# KEYS: day counters. ARGV: requests, input tokens, output tokens, ttl
+SEED_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], 'requests', ARGV[1], 'tokens_in', ARGV[2], 'tokens_out', ARGV[3])
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return 1
+"""
+
+# KEYS: day counters, unflushed increments, dirty set
+# ARGV: input tokens, output tokens, dirty member
+ADD_TOKENS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for _, key in ipairs({KEYS[1], KEYS[2]}) do
+    redis.call('HINCRBY', key, 'tokens_in', ARGV[1])
+    redis.call('HINCRBY', key, 'tokens_out', ARGV[2])
+end
+redis.call('SADD', KEYS[3], ARGV[3])
+return 1
+"""
+
+# KEYS: unflushed increments. Returns them and clears them atomically.
+TAKE_PENDING_SCRIPT = """
+local values = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return values
+"""
+
+
+def _day_member(organization_id: int, usage_day: date) -> str:
+    return f"{organization_id}:{usage_day.isoformat()}"
+
+
+def _usage_key(member: str) -> str:
+    return f"ai_quota:usage:{member}"
+
+
+def _pending_key(member: str) -> str:
+    return f"ai_quota:pending:{member}"
+
 
 class AIQuotaService:
     """
@@ -160,6 +248,21 @@ class AIQuotaService:
 
         daily_limit = getattr(org, "ai_daily_limit", DEFAULT_DAILY_LIMIT)
 
+        # Atomic Redis counter when available; the row is written by the flush loop
+        allowed = await AIQuotaService._check_redis(
+            db, organization_id, today, daily_limit, increment, tokens_input, tokens_output
+        )
+        if allowed is not None:
+            if not allowed and increment:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=(
+                        f"Daily AI quota exceeded ({daily_limit} requests/day). "
+                        "Upgrade plan or use BYOK."
+                    ),
+                )
+            return allowed
+
         # 2. Get Usage Record
         usage_record = await AIQuotaService._get_usage_record(db, organization_id, today)
 
@@ -196,6 +299,147 @@ class AIQuotaService:
 
         return True
 
+    @staticmethod
+    async def _check_redis(
+        db: AsyncSession,
+        organization_id: int,
+        usage_day: date,
+        daily_limit: int,
+        increment: bool,
+        tokens_input: int,
+        tokens_output: int,
+    ) -> bool | None:
+        """Check (and count) a request against the Redis counter; None when Redis is unusable."""
+        if not redis_client.is_available:
+            return None
+
+        member = _day_member(organization_id, usage_day)
+        keys = [_usage_key(member), _pending_key(member), DIRTY_KEY]
+        args = [
+            daily_limit,
+            1 if increment else 0,
+            max(int(tokens_input or 0), 0),
+            max(int(tokens_output or 0), 0),
+            QUOTA_KEY_TTL_SECONDS,
+            member,
+        ]
+        try:
+            allowed, _ = await redis_client.eval_script(CHECK_AND_INCREMENT_SCRIPT, keys, args)
+            if allowed == -1:
+                # First request of the day on this Redis: start from the flushed row
+                record = await AIQuotaService._get_usage_record(db, organization_id, usage_day)
+                await redis_client.eval_script(
+                    SEED_SCRIPT,
+                    [keys[0]],
+                    [
+                        record.request_count if record else 0,
+                        (record.token_count_input or 0) if record else 0,
+                        (record.token_count_output or 0) if record else 0,
+                        QUOTA_KEY_TTL_SECONDS,
+                    ],
+                )
+                allowed, _ = await redis_client.eval_script(CHECK_AND_INCREMENT_SCRIPT, keys, args)
+            return allowed == 1
+        except Exception as e:
+            logger.warning(f"Redis quota counter failed, using database: {e}")
+            return None
+
+    @staticmethod
+    async def _redis_counters(organization_id: int, usage_day: date) -> dict[str, int] | None:
+        if not redis_client.is_available:
+            return None
+        try:
+            key = _usage_key(_day_member(organization_id, usage_day))
+            values = await redis_client._client.hgetall(key)
+        except Exception as e:
+            logger.warning(f"Redis quota counters unavailable: {e}")
+            return None
+        return {field: int(value) for field, value in values.items()} if values else None
+
+    @staticmethod
+    async def flush_usage(db: AsyncSession, batch_size: int = QUOTA_FLUSH_BATCH) -> int:
+        """
+        Move unflushed Redis increments into ``AIUsageDaily`` with one upsert.
+
+        Increments are taken atomically per organization-day; if the write
+        fails they are put back for the next flush. Returns the rows written.
+        """
+        if not redis_client.is_available:
+            return 0
+
+        members = await redis_client._client.spop(DIRTY_KEY, batch_size) or []
+        rows = []
+        for member in members:
+            values = await redis_client.eval_script(
+                TAKE_PENDING_SCRIPT, [_pending_key(member)], []
+            )
+            deltas = {
+                field: int(value) for field, value in zip(values[::2], values[1::2], strict=True)
+            }
+            if not any(deltas.values()):
+                continue
+            organization_id, usage_day = member.split(":")
+            row = {
+                "organization_id": int(organization_id),
+                "usage_date": date.fromisoformat(usage_day),
+            }
+            row.update({column: deltas.get(field, 0) for field, column in COUNTER_FIELDS.items()})
+            rows.append(row)
+        if not rows:
+            return 0
+
+        try:
+            await AIQuotaService._add_usage_rows(db, rows)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            await AIQuotaService._restore_pending(rows)
+            raise
+        return len(rows)
+
+    @staticmethod
+    async def _add_usage_rows(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+        now = datetime.now(UTC)
+        table = AIUsageDaily.__table__
+        dialect = db.bind.dialect.name
+        insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(dialect)
+
+        if insert is not None:
+            stmt = insert(table).values(
+                [{**row, "created_at": now, "updated_at": now} for row in rows]
+            )
+            added = {
+                column: table.c[column] + stmt.excluded[column]
+                for column in COUNTER_FIELDS.values()
+            }
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["organization_id", "usage_date"],
+                    set_={**added, "updated_at": now},
+                )
+            )
+            return
+
+        for row in rows:
+            record = await AIQuotaService._get_usage_record(
+                db, row["organization_id"], row["usage_date"]
+            )
+            if record is None:
+                db.add(AIUsageDaily(**row))
+                continue
+            for column in COUNTER_FIELDS.values():
+                setattr(record, column, (getattr(record, column) or 0) + row[column])
+
+    @staticmethod
+    async def _restore_pending(rows: list[dict[str, Any]]) -> None:
+        async with redis_client._client.pipeline(transaction=True) as pipe:
+            for row in rows:
+                member = _day_member(row["organization_id"], row["usage_date"])
+                for field, column in COUNTER_FIELDS.items():
+                    pipe.hincrby(_pending_key(member), field, row[column])
+                pipe.sadd(DIRTY_KEY, member)
+            await pipe.execute()
+
     @staticmethod
     async def record_generation_usage(
         db: AsyncSession,
@@ -216,6 +460,18 @@ class AIQuotaService:
             return
 
         today = date.today()
+        if redis_client.is_available:
+            member = _day_member(organization_id, today)
+            try:
+                added = await redis_client.eval_script(
+                    ADD_TOKENS_SCRIPT,
+                    [_usage_key(member), _pending_key(member), DIRTY_KEY],
+                    [normalized_input, normalized_output, member],
+                )
+                if added:
+                    return
+            except Exception as e:
+                logger.warning(f"Redis token telemetry failed, writing to database: {e}")
         usage_record = await AIQuotaService._get_usage_record(db, organization_id, today)
 
         if usage_record:
@@ -249,11 +505,19 @@ class AIQuotaService:
         org = await AIQuotaService._get_organization(db, organization_id)
         limit = getattr(org, "ai_daily_limit", DEFAULT_DAILY_LIMIT)
         used = record.request_count if record else 0
-        remaining = max(0, limit - used)
-        request_percentage_used = round((used / limit) * 100, 1) if limit > 0 else 0.0
         input_tokens = max(record.token_count_input or 0, 0) if record else 0
         output_tokens = max(record.token_count_output or 0, 0) if record else 0
 
+        # Redis counters include increments not yet flushed to the row
+        counters = await AIQuotaService._redis_counters(organization_id, today)
+        if counters:
+            used = counters.get("requests", used)
+            input_tokens = max(counters.get("tokens_in", input_tokens), 0)
+            output_tokens = max(counters.get("tokens_out", output_tokens), 0)
+
+        remaining = max(0, limit - used)
+        request_percentage_used = round((used / limit) * 100, 1) if limit > 0 else 0.0
+
         return {
             "used": used,
             "limit": limit,
@@ -280,3 +544,32 @@ class AIQuotaService:
             },
             "soft_alert": AIQuotaService._build_soft_alert(used, limit),
         }
+
+
+async def run_quota_flush_loop(interval_seconds: int = QUOTA_FLUSH_INTERVAL_SECONDS):
+    """
+    Background task that periodically flushes Redis quota counters to ``AIUsageDaily``
+
+    Usage:
+        # In lifespan
+        asyncio.create_task(run_quota_flush_loop())
+    """
+    from app.core.database import AsyncSessionLocal
+    from app.core.rls import set_tenant_context
+
+    logger.info("[AIQuota] Starting usage flush loop")
+
+    while True:
+        try:
+            await asyncio.sleep(interval_seconds)
+            async with AsyncSessionLocal() as db:
+                if db.bind.dialect.name == "postgresql":
+                    await set_tenant_context(db, None, is_superuser=True)
+                flushed = await AIQuotaService.flush_usage(db)
+            if flushed:
+                logger.debug("[AIQuota] Flushed usage for %d organization-days", flushed)
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"[AIQuota] Error in usage flush loop: {e}")
+            await asyncio.sleep(60)
@@ -9,6 +9,7 @@ from __future__ import annotations
 
 import re
 
+from app.modules.ai.services.reevu.route_compiler import register_route_terms, scan_message
 from app.schemas.reevu_plan import RoutingDecision
 
 # ── routing criteria ─────────────────────────────────────────────────
@@ -36,6 +37,8 @@ NUMERIC_DENSITY_THRESHOLD: float = 0.15
 
 _NUMERIC_TOKEN_RE = re.compile(r"\b\d+(?:\.\d+)?%?\b")
 
+register_route_terms({"router.numeric_keywords": NUMERIC_KEYWORDS})
+
 
 class DeterministicRouter:
     """Route requests to deterministic computation when criteria match."""
@@ -56,12 +59,10 @@ class DeterministicRouter:
         if function_call_name and function_call_name.startswith(DETERMINISTIC_FUNCTION_PREFIXES):
             criteria.append(f"function_prefix:{function_call_name}")
 
-        # 2. Message keyword match.
-        message_lower = message.lower()
-        for kw in NUMERIC_KEYWORDS:
-            if kw in message_lower:
-                criteria.append(f"keyword:{kw}")
-                break  # one is enough
+        # 2. Message keyword match (one is enough).
+        kw = scan_message(message).first("router.numeric_keywords")
+        if kw:
+            criteria.append(f"keyword:{kw}")
 
         # 3. Numeric density heuristic.
         words = message.split()
@@ -8,9 +8,11 @@ with domain tags, dependency ordering, and deterministic routing markers.
 from __future__ import annotations
 
 import re
+from itertools import product
 from os import getenv
 from uuid import uuid4
 
+from app.modules.ai.services.reevu.route_compiler import register_route_terms, scan_message
 from app.schemas.reevu_plan import PlanStep, ReevuExecutionPlan
 
 # ── domain keyword registry ──────────────────────────────────────────
@@ -102,79 +104,102 @@ def _normalize_tokens(text: str) -> list[str]:
             stemmed.append(w)
     return stemmed
 
+
+# ── compiled route table ─────────────────────────────────────────────
+# Phrase-level cues, matched with hyphens read as spaces.
+IMPLICIT_DOMAIN_CUES: dict[str, list[str]] = {
+    "sowing window": ["weather", "analytics"],
+    "soil moisture": ["weather"],
+    "genomic selection": ["analytics"],
+    "gblup": ["analytics"],
+    "gebv": ["analytics"],
+    "recommend": ["analytics"],
+    "recommendation": ["analytics"],
+    "top performer": ["analytics"],
+    "top performers": ["analytics"],
+    "best performer": ["analytics"],
+    "best performers": ["analytics"],
+    "performed best": ["analytics"],
+    "compute": ["analytics"],
+    "calculate": ["analytics"],
+    "assess": ["analytics"],
+    "cross validation": ["analytics"],
+    "accuracy": ["analytics"],
+    "protein": ["breeding"],
+    "entries": ["breeding"],
+    "sorghum": ["breeding"],
+    "pearl millet": ["breeding"],
+    "chickpea": ["breeding"],
+    "cotton": ["breeding"],
+    "rice": ["breeding"],
+    "wheat": ["breeding"],
+    "maize": ["breeding"],
+    "soybean": ["breeding"],
+    "disease pattern": ["analytics"],
+    "selection index": ["analytics"],
+}
+
+# Every spelling of each cue with its spaces written as spaces or hyphens
+_IMPLICIT_CUE_SPELLINGS: dict[str, str] = {
+    spelling: phrase
+    for phrase in IMPLICIT_DOMAIN_CUES
+    for spelling in map("".join, product(*((" ", "-") if c == " " else (c,) for c in phrase)))
+}
+
+_KEYWORD_TOKENS: dict[str, list[str]] = {
+    kw: _normalize_tokens(kw) for keywords in DOMAIN_KEYWORDS.values() for kw in keywords
+}
+
+register_route_terms(
+    {
+        **{f"planner.domain.{domain}": keywords for domain, keywords in DOMAIN_KEYWORDS.items()},
+        "planner.implicit_cues": _IMPLICIT_CUE_SPELLINGS,
+        "planner.negative_cues": (
+            "solar radiation trend", "snps", "snp markers", "disease resistance", "germplasm",
+        ),
+        "planner.breeding_stress_traits": BREEDING_STRESS_TRAIT_PHRASES,
+        "planner.explicit_weather": EXPLICIT_WEATHER_TERMS,
+    }
+)
+
+
 def _nlp_detect_domains(message: str) -> dict[str, float]:
     """NLP-assisted domain detection with scoring."""
-    message_lower = message.lower()
-    tokens = _normalize_tokens(message)
-    token_set = set(tokens)
-    
+    scan = scan_message(message)
+    token_set = set(_normalize_tokens(message))
+
     scores: dict[str, float] = {d: 0.0 for d in DOMAIN_ORDER.keys()}
-    
+
     # 1. Base keyword matching with lemmatization
     for domain, keywords in DOMAIN_KEYWORDS.items():
         for kw in keywords:
-            if kw in message_lower:
+            if scan.has(kw):
                 scores[domain] += 1.0
             else:
-                kw_tokens = _normalize_tokens(kw)
+                kw_tokens = _KEYWORD_TOKENS[kw]
                 if len(kw_tokens) == 1 and kw_tokens[0] in token_set:
                     scores[domain] += 0.8
                 elif len(kw_tokens) > 1 and all(k in token_set for k in kw_tokens):
                     scores[domain] += 0.8
 
-    # 2. Implicit / Phrase-level cues
-    implicit_cues = {
-        "sowing window": ["weather", "analytics"],
-        "soil moisture": ["weather"],
-        "genomic selection": ["analytics"],
-        "gblup": ["analytics"],
-        "gebv": ["analytics"],
-        "recommend": ["analytics"],
-        "recommendation": ["analytics"],
-        "top performer": ["analytics"],
-        "top performers": ["analytics"],
-        "best performer": ["analytics"],
-        "best performers": ["analytics"],
-        "performed best": ["analytics"],
-        "compute": ["analytics"],
-        "calculate": ["analytics"],
-        "assess": ["analytics"],
-        "cross validation": ["analytics"],
-        "accuracy": ["analytics"],
-        "protein": ["breeding"],
-        "entries": ["breeding"],
-        "sorghum": ["breeding"],
-        "pearl millet": ["breeding"],
-        "chickpea": ["breeding"],
-        "cotton": ["breeding"],
-        "rice": ["breeding"],
-        "wheat": ["breeding"],
-        "maize": ["breeding"],
-        "soybean": ["breeding"],
-        "disease pattern": ["analytics"],
-        "selection index": ["analytics"],
-    }
-    
-    # Remove hyphens for implicit phrase matching
-    msg_clean = message_lower.replace("-", " ")
-    for phrase, domains in implicit_cues.items():
-        if phrase in msg_clean:
+    # 2. Implicit / Phrase-level cues, matched with hyphens read as spaces
+    cues = {_IMPLICIT_CUE_SPELLINGS[spelling] for spelling in scan.matched("planner.implicit_cues")}
+    for phrase, domains in IMPLICIT_DOMAIN_CUES.items():
+        if phrase in cues:
             for d in domains:
                 scores[d] += 1.5
 
     # 3. Contextual Negative Cues (Disambiguation)
-    if "solar radiation trend" in message_lower:
+    if scan.has("solar radiation trend"):
         scores["analytics"] -= 2.0
-    if "snps" in message_lower or "snp markers" in message_lower:
-        if "disease resistance" in message_lower and "germplasm" in message_lower:
+    if scan.has("snps") or scan.has("snp markers"):
+        if scan.has("disease resistance") and scan.has("germplasm"):
             # For purely genomics questions that mention resistance/germplasm as context
             scores["breeding"] -= 2.0
 
     # Drought-tolerance trait questions should stay on breeding/trial surfaces unless
     # the user also asks explicitly for weather or climate context.
-    if any(phrase in message_lower for phrase in BREEDING_STRESS_TRAIT_PHRASES) and not any(
-        term in message_lower for term in EXPLICIT_WEATHER_TERMS
-    ):
+    if scan.any("planner.breeding_stress_traits") and not scan.any("planner.explicit_weather"):
         scores["weather"] = max(0.0, scores["weather"] - 1.0)
 
     return scores
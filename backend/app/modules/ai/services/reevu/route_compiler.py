@@ -0,0 +1,117 @@
+"""
+REEVU Route Compiler
+
+Compiles the keyword tables used by intent and domain routing into a single
+matcher, so each message is scanned once instead of once per ``term in
+message`` check.
+
+Modules register named term groups (``register_route_terms``); every group
+is folded into one prefix-trie regex. Scanning a message finds the longest
+term starting at each position, then adds every registered term contained
+in it, which yields exactly the set of terms for which ``term in text``
+holds. Routing code then asks the scan which groups were hit instead of
+rescanning the text.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex matching any of ``terms``, longest first, with common prefixes factored out."""
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        ends = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            # Greedy: prefer the longer term, fall back to the one ending here
+            return body + "?" if len(branches) == 1 and len(body) == 1 else f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class RouteScan:
+    """Terms of the compiled route table found in one message."""
+
+    __slots__ = ("text", "terms", "_groups")
+
+    def __init__(self, text: str, terms: frozenset[str], groups: Mapping[str, tuple[str, ...]]):
+        self.text = text
+        self.terms = terms
+        self._groups = groups
+
+    def has(self, term: str) -> bool:
+        """Whether ``term`` (a registered term) occurs in the message."""
+        return term in self.terms
+
+    def any(self, group: str) -> bool:
+        """Whether any term of ``group`` occurs in the message."""
+        return not self.terms.isdisjoint(self._groups[group])
+
+    def matched(self, group: str) -> list[str]:
+        """Terms of ``group`` that occur, in the group's declared order."""
+        return [term for term in self._groups[group] if term in self.terms]
+
+    def first(self, group: str) -> str | None:
+        """First term of ``group``, in declared order, that occurs."""
+        for term in self._groups[group]:
+            if term in self.terms:
+                return term
+        return None
+
+
+class CompiledRoutes:
+    """Named term groups compiled into one matcher."""
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]):
+        self.groups: dict[str, tuple[str, ...]] = {
+            name: tuple(dict.fromkeys(term.lower() for term in terms))
+            for name, terms in groups.items()
+        }
+        vocabulary = sorted({term for terms in self.groups.values() for term in terms if term})
+        # Every term contained in another, so the longest match at a position implies them too
+        self._contained: dict[str, frozenset[str]] = {
+            term: frozenset(other for other in vocabulary if other in term) for term in vocabulary
+        }
+        pattern = _trie_pattern(vocabulary)
+        self._regex = re.compile(f"(?=({pattern}))") if pattern else None
+        self.scan = lru_cache(maxsize=512)(self._scan)
+
+    def _scan(self, text: str) -> RouteScan:
+        lowered = text.lower()
+        terms: set[str] = set()
+        if self._regex is not None:
+            for longest in {match.group(1) for match in self._regex.finditer(lowered)}:
+                terms |= self._contained[longest]
+        return RouteScan(lowered, frozenset(terms), self.groups)
+
+
+_ROUTE_GROUPS: dict[str, tuple[str, ...]] = {}
+_compiled: CompiledRoutes | None = None
+
+
+def register_route_terms(groups: Mapping[str, Iterable[str]]) -> None:
+    """Add named term groups to the shared route table and recompile it."""
+    global _compiled
+    _ROUTE_GROUPS.update({name: tuple(terms) for name, terms in groups.items()})
+    _compiled = CompiledRoutes(_ROUTE_GROUPS)
+
+
+def scan_message(message: str) -> RouteScan:
+    """Scan ``message`` against every registered term group in one pass."""
+    if _compiled is None:
+        register_route_terms({})
+    return _compiled.scan(message)
@@ -73,7 +73,9 @@ class GWASAnalysisService:
                 )
 
             # 3. Persist Results
-            res_dict = result.to_dict()
+            # Plots are stored as bounded previews; the full per-marker
+            # arrays never go through JSON
+            res_dict = result.to_summary()
 
             gwas_run = GWASRun(
                 organization_id=user.organization_id,
@@ -84,8 +86,8 @@ class GWASAnalysisService:
                 marker_count=result.n_markers,
                 significance_threshold=result.significance_threshold,
                 significant_marker_count=res_dict["n_significant"],
-                manhattan_plot_data=res_dict["manhattan_data"], # Storing huge JSON blob
-                qq_plot_data=res_dict["qq_data"]
+                manhattan_plot_data=result.manhattan_preview(),
+                qq_plot_data=result.qq_preview()
             )
             db.add(gwas_run)
             await db.flush()
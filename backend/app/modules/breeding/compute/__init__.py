@@ -4,5 +4,6 @@ Heavy compute operations for breeding domain
 """
 
 from .blup_compute import BLUPCompute
+from .population_simulation_compute import PopulationSimulationCompute
 
-__all__ = ["BLUPCompute"]
+__all__ = ["BLUPCompute", "PopulationSimulationCompute"]
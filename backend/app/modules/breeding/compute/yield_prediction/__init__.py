@@ -5,12 +5,19 @@ This module contains compute-intensive yield prediction services
 that should be executed via job queue for isolation from API workers.
 """
 
-from app.modules.breeding.compute.yield_prediction.attribution import FactorAttribution
-from app.modules.breeding.compute.yield_prediction.ensemble import EnsemblePredictor
-from app.modules.breeding.compute.yield_prediction.ml import MLPredictor
-from app.modules.breeding.compute.yield_prediction.process import ProcessBasedPredictor
-from app.modules.breeding.compute.yield_prediction.statistical import StatisticalPredictor
-from app.modules.breeding.compute.yield_prediction.yield_matrix_math import YieldMatrixMath
+from app.core.lazy_imports import lazy_exports
+
+
+_EXPORTS = {
+    "FactorAttribution": ".attribution",
+    "EnsemblePredictor": ".ensemble",
+    "MLPredictor": ".ml",
+    "ProcessBasedPredictor": ".process",
+    "StatisticalPredictor": ".statistical",
+    "YieldMatrixMath": ".yield_matrix_math",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     "FactorAttribution",
@@ -205,7 +205,7 @@ class BreedingValueService:
             result = calculate_vanraden_kinship(M)
 
             if result.get("success"):
-                return result["K"] # Already list of lists
+                return result["K"].tolist()
             else:
                 return self._calculate_g_matrix_heuristic(markers)
 
@@ -487,7 +487,7 @@ class BreedingValueService:
         and solves the Mixed Model Equations.
         """
         import numpy as np
-        from sqlalchemy import Float, cast, select
+        from sqlalchemy import select
 
         from app.models.core import Study
         from app.models.germplasm import Germplasm
@@ -498,7 +498,7 @@ class BreedingValueService:
             select(
                 Germplasm.germplasm_name,
                 Study.study_name,
-                cast(Observation.value, Float).label("value")
+                Observation.value_numeric.label("value")
             )
             .join(ObservationUnit, Observation.observation_unit_id == ObservationUnit.id)
             .join(Germplasm, Observation.germplasm_id == Germplasm.id)
@@ -506,6 +506,7 @@ class BreedingValueService:
             .join(ObservationVariable, Observation.observation_variable_id == ObservationVariable.id)
             .where(ObservationVariable.observation_variable_db_id == trait_db_id)
             .where(Study.study_db_id.in_(study_db_ids))
+            .where(Observation.value_numeric.isnot(None))
         )
 
         result = await db.execute(stmt)
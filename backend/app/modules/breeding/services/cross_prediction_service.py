@@ -6,19 +6,35 @@ Features:
 - Predict mean progeny performance
 - Estimate genetic variance in progeny
 - Calculate usefulness criterion
-- Rank potential crosses
+- Rank potential crosses (blocked all-pairs engine with top-k selection)
 """
 
 from dataclasses import dataclass
 from typing import Any
 
 import numpy as np
+from scipy.special import ndtr
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.biometrics import CrossPredictionResult
 from app.services.compute_engine import compute_engine
 
 
+# Parent pairs evaluated per block (rows x columns), bounds temporary memory
+PAIR_BLOCK_SIZE = 1 << 20
+
+# Genotype codings with at most this many distinct values use indicator
+# matrix products for identity-by-state; others compare element-wise
+MAX_IBS_LEVELS = 4
+
+RANK_CRITERIA = {
+    "usefulness": "usefulness",
+    "mean": "predicted_mean",
+    "variance": "predicted_variance",
+    "superior_prob": "superior_progeny_prob",
+}
+
+
 @dataclass
 class CrossPrediction:
     """Prediction for a single cross"""
@@ -39,6 +55,7 @@ class CrossRanking:
     selection_intensity: float
     threshold: float
     method: str
+    n_candidates: int = 0  # Crosses passing the inbreeding/distance filters
 
 
 class CrossPredictionService:
@@ -79,30 +96,12 @@ class CrossPredictionService:
         Var(progeny) = sum of (a_i^2 * p_i * (1-p_i))
         where a_i = marker effect, p_i = probability of inheriting allele
         """
-        # For each marker, variance depends on parental heterozygosity
-        n_markers = len(marker_effects)
-        variance = 0.0
-
-        for i in range(n_markers):
-            g1, g2 = parent1_genotypes[i], parent2_genotypes[i]
-            a = marker_effects[i]
-
-            # Segregation variance depends on parental genotypes
-            # Both homozygous same: no variance
-            # Both homozygous different: all progeny heterozygous, no variance
-            # One heterozygous: 0.25 variance
-            # Both heterozygous: 0.5 variance
-
-            if g1 == 1 and g2 == 1:  # Both het
-                seg_var = 0.5
-            elif g1 == 1 or g2 == 1:  # One het
-                seg_var = 0.25
-            else:
-                seg_var = 0.0
-
-            variance += (a ** 2) * seg_var
-
-        return variance
+        # Segregation variance depends on parental genotypes:
+        # Both homozygous (same or different): no variance
+        # One heterozygous: 0.25 variance
+        # Both heterozygous: 0.5 variance
+        seg_var = 0.25 * ((np.asarray(parent1_genotypes) == 1).astype(float) + (np.asarray(parent2_genotypes) == 1))
+        return float(np.sum(np.asarray(marker_effects) ** 2 * seg_var))
 
     def calculate_usefulness(
         self,
@@ -246,11 +245,16 @@ class CrossPredictionService:
         max_inbreeding: float = 0.25,
         min_genetic_distance: float = 0.1,
         top_n: int = 20,
-        rank_by: str = "usefulness"
+        rank_by: str = "usefulness",
+        max_uses_per_parent: int | None = None
     ) -> CrossRanking:
         """
         Rank all possible crosses
 
+        Pairs are evaluated in blocks of parent rows as matrix operations
+        (the per-pair quantities match predict_single_cross), filtered with
+        masks, and only the running top candidates are kept.
+
         Parameters:
             parents: List of parent info dicts with 'id' key
             genotypes: Genotype matrix (n_parents x n_markers)
@@ -262,53 +266,199 @@ class CrossPredictionService:
             min_genetic_distance: Minimum genetic distance
             top_n: Number of top crosses to return
             rank_by: "usefulness", "mean", "variance", "superior_prob"
+            max_uses_per_parent: Mate allocation limit; crosses are taken
+                greedily in rank order while both parents are under the limit
 
         Returns:
             CrossRanking with sorted crosses
         """
+        genotypes = np.asarray(genotypes, dtype=np.float64)
+        gebvs = np.asarray(gebvs, dtype=np.float64)
         n_parents = len(parents)
-        crosses = []
-
-        # Generate all pairwise crosses
-        for i in range(n_parents):
-            for j in range(i + 1, n_parents):
-                prediction = self.predict_single_cross(
-                    parent1_id=parents[i]['id'],
-                    parent2_id=parents[j]['id'],
-                    parent1_gebv=gebvs[i],
-                    parent2_gebv=gebvs[j],
-                    parent1_genotypes=genotypes[i],
-                    parent2_genotypes=genotypes[j],
-                    marker_effects=marker_effects,
-                    selection_intensity=selection_intensity,
-                    threshold=threshold
-                )
-
-                # Apply filters
-                if prediction.inbreeding_coefficient > max_inbreeding:
-                    continue
-                if prediction.genetic_distance < min_genetic_distance:
-                    continue
-
-                crosses.append(prediction)
-
-        # Sort by criterion
-        if rank_by == "usefulness":
-            crosses.sort(key=lambda x: x.usefulness, reverse=True)
-        elif rank_by == "mean":
-            crosses.sort(key=lambda x: x.predicted_mean, reverse=True)
-        elif rank_by == "variance":
-            crosses.sort(key=lambda x: x.predicted_variance, reverse=True)
-        elif rank_by == "superior_prob":
-            crosses.sort(key=lambda x: x.superior_progeny_prob, reverse=True)
+        criterion = RANK_CRITERIA.get(rank_by)
+
+        parent_stats = self._parent_statistics(genotypes, marker_effects)
+        pair_args = (genotypes, gebvs, parent_stats, selection_intensity, threshold, max_inbreeding, min_genetic_distance, criterion)
+
+        if max_uses_per_parent is None:
+            pool, n_candidates = self._top_pairs(*pair_args, k=top_n)
+            chosen = pool["order"]
+        else:
+            # Greedy allocation only needs the best candidates; widen the
+            # pool until it fills top_n or holds every candidate
+            k = top_n * 4
+            while True:
+                pool, n_candidates = self._top_pairs(*pair_args, k=k)
+                chosen = self._allocate_mates(pool, n_parents, top_n, max_uses_per_parent)
+                if len(chosen) >= top_n or len(pool["order"]) >= n_candidates:
+                    break
+                k *= 4
+
+        crosses = [
+            CrossPrediction(
+                parent1_id=parents[pool["i"][idx]]['id'],
+                parent2_id=parents[pool["j"][idx]]['id'],
+                predicted_mean=float(pool["predicted_mean"][idx]),
+                predicted_variance=float(pool["predicted_variance"][idx]),
+                usefulness=float(pool["usefulness"][idx]),
+                superior_progeny_prob=float(pool["superior_progeny_prob"][idx]),
+                inbreeding_coefficient=float(pool["inbreeding_coefficient"][idx]),
+                genetic_distance=float(pool["genetic_distance"][idx])
+            )
+            for idx in chosen[:top_n]
+        ]
 
         return CrossRanking(
-            crosses=crosses[:top_n],
+            crosses=crosses,
             selection_intensity=selection_intensity,
             threshold=threshold or 0.0,
-            method=rank_by
+            method=rank_by,
+            n_candidates=n_candidates
         )
 
+    def _parent_statistics(
+        self,
+        genotypes: np.ndarray,
+        marker_effects: np.ndarray | None
+    ) -> dict[str, Any]:
+        """Per-parent terms that the pairwise quantities are built from."""
+        heterozygous = genotypes == 1
+        levels = np.unique(genotypes)
+        return {
+            "n_markers": genotypes.shape[1],
+            # Segregation variance is additive over parents: 0.25 * sum(a^2) per het locus
+            "segregation": (
+                heterozygous @ (np.asarray(marker_effects, dtype=np.float64) ** 2)
+                if marker_effects is not None else None
+            ),
+            "het_fraction": heterozygous.mean(axis=1),
+            "sq_norm": np.einsum("ij,ij->i", genotypes, genotypes),
+            "indicators": (
+                [(genotypes == level).astype(np.float64) for level in levels]
+                if len(levels) <= MAX_IBS_LEVELS else None
+            ),
+        }
+
+    def _pair_block(
+        self,
+        rows: slice,
+        genotypes: np.ndarray,
+        gebvs: np.ndarray,
+        stats: dict[str, Any],
+        selection_intensity: float,
+        threshold: float | None
+    ) -> dict[str, np.ndarray]:
+        """All metrics for parents ``rows`` (x) against parents rows.start.. (y)."""
+        cols = slice(rows.start, len(gebvs))
+        g_rows, g_cols = genotypes[rows], genotypes[cols]
+        n_markers = stats["n_markers"]
+
+        mean = 0.5 * (gebvs[rows, None] + gebvs[None, cols])
+        if stats["segregation"] is not None:
+            variance = 0.25 * (stats["segregation"][rows, None] + stats["segregation"][None, cols])
+        else:
+            het = stats["het_fraction"]
+            variance = 0.25 * (het[rows, None] + het[None, cols]) * (0.5 * (gebvs[rows, None] - gebvs[None, cols])) ** 2
+
+        sd = np.sqrt(np.maximum(variance, 0))
+        usefulness = mean + selection_intensity * sd
+        if threshold is None:
+            # Threshold defaults to the cross mean: P = 0.5 whenever progeny segregate
+            superior = np.where(variance > 0, 0.5, 0.0)
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                superior = np.where(variance > 0, 1 - ndtr((threshold - mean) / sd), (mean > threshold).astype(float))
+
+        if stats["indicators"] is not None:
+            ibs = sum(ind[rows] @ ind[cols].T for ind in stats["indicators"])
+        else:
+            ibs = (g_rows[:, None, :] == g_cols[None, :, :]).sum(axis=2)
+        squared_distance = stats["sq_norm"][rows, None] + stats["sq_norm"][None, cols] - 2 * (g_rows @ g_cols.T)
+
+        return {
+            "predicted_mean": mean,
+            "predicted_variance": variance,
+            "usefulness": usefulness,
+            "superior_progeny_prob": superior,
+            "inbreeding_coefficient": 0.5 * ibs / n_markers,
+            "genetic_distance": np.sqrt(np.maximum(squared_distance, 0) / (2 * n_markers)),
+        }
+
+    def _top_pairs(
+        self,
+        genotypes: np.ndarray,
+        gebvs: np.ndarray,
+        stats: dict[str, Any],
+        selection_intensity: float,
+        threshold: float | None,
+        max_inbreeding: float,
+        min_genetic_distance: float,
+        criterion: str | None,
+        k: int
+    ) -> tuple[dict[str, np.ndarray], int]:
+        """
+        Best k filtered pairs i < j, ranked by criterion.
+
+        Ties keep pair order (i, j), as a stable sort of the full list would.
+        Returns the pool (metric arrays plus "order", the ranked positions)
+        and the number of pairs passing the filters.
+        """
+        n_parents = len(gebvs)
+        pair_cost = n_parents * (1 if stats["indicators"] is not None else stats["n_markers"])
+        block_rows = max(1, PAIR_BLOCK_SIZE // max(pair_cost, 1))
+        pool: dict[str, np.ndarray] = {}
+        n_candidates = 0
+
+        for start in range(0, n_parents, block_rows):
+            rows = slice(start, min(start + block_rows, n_parents))
+            metrics = self._pair_block(rows, genotypes, gebvs, stats, selection_intensity, threshold)
+
+            i = np.arange(rows.start, rows.stop)[:, None]
+            j = np.arange(rows.start, n_parents)[None, :]
+            keep = (j > i) & ~(metrics["inbreeding_coefficient"] > max_inbreeding) & ~(metrics["genetic_distance"] < min_genetic_distance)
+            n_candidates += int(keep.sum())
+
+            block = {name: values[keep] for name, values in metrics.items()}
+            block["i"] = np.broadcast_to(i, keep.shape)[keep]
+            block["j"] = np.broadcast_to(j, keep.shape)[keep]
+            block["score"] = np.nan_to_num(block[criterion], nan=-np.inf) if criterion else np.zeros(len(block["i"]))
+
+            pool = {name: np.concatenate([pool[name], values]) for name, values in block.items()} if pool else block
+            selected = self._select_top(pool["score"], pool["i"] * n_parents + pool["j"], k)
+            pool = {name: values[selected] for name, values in pool.items()}
+
+        if not pool:
+            pool = {name: np.empty(0) for name in (*RANK_CRITERIA.values(), "inbreeding_coefficient", "genetic_distance", "score")}
+            pool["i"] = pool["j"] = np.empty(0, dtype=np.int64)
+        pool["order"] = np.lexsort((pool["i"] * n_parents + pool["j"], -pool["score"]))
+        return pool, n_candidates
+
+    @staticmethod
+    def _select_top(score: np.ndarray, pair_order: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores (partial selection, ties by pair order)."""
+        if len(score) <= k:
+            return np.arange(len(score))
+        cutoff = -np.partition(-score, k - 1)[k - 1]
+        above = np.flatnonzero(score > cutoff)
+        ties = np.flatnonzero(score == cutoff)
+        ties = ties[np.argsort(pair_order[ties], kind="stable")[:k - len(above)]]
+        return np.concatenate([above, ties])
+
+    @staticmethod
+    def _allocate_mates(pool: dict[str, np.ndarray], n_parents: int, top_n: int, max_uses: int) -> list[int]:
+        """Walk the ranked pool, taking crosses whose parents are under max_uses."""
+        uses = np.zeros(n_parents, dtype=np.int64)
+        chosen = []
+        for idx in pool["order"]:
+            i, j = pool["i"][idx], pool["j"][idx]
+            if uses[i] < max_uses and uses[j] < max_uses:
+                uses[i] += 1
+                uses[j] += 1
+                chosen.append(idx)
+                if len(chosen) == top_n:
+                    break
+        return chosen
+
     async def save_prediction(
         self,
         db: AsyncSession,
@@ -412,45 +412,36 @@ class GxEAnalysisService:
         self,
         db,  # AsyncSession
         study_db_ids: list[str],
-        trait_db_id: str
+        trait_db_id: str,
+        organization_id: int | None = None,
     ) -> dict[str, Any]:
         """
         Generate Yield Matrix from Database Observations
 
+        Reads the shared phenotype matrix (one streamed extract, cached per
+        data version); gaps are filled with the genotype's mean over its
+        observed environments.
+
         Args:
             db: Database session
             study_db_ids: List of Study DB IDs to include (Environments)
             trait_db_id: Trait DB ID to analyze (Yield)
+            organization_id: Restrict to one organisation's observations
 
         Returns:
-            Dict containing yield_matrix, genotype_names, environment_names
+            Dict containing yield_matrix (genotypes × environments ndarray),
+            genotype_names, environment_names
         """
-        from sqlalchemy import Float, cast, func, select
-
-        from app.models.core import Study
-        from app.models.germplasm import Germplasm
-        from app.models.phenotyping import Observation, ObservationUnit, ObservationVariable
-
-        # 1. Fetch observations
-        stmt = (
-            select(
-                Germplasm.germplasm_name,
-                Study.study_name,
-                func.avg(cast(Observation.value, Float)).label("mean_value")
-            )
-            .join(ObservationUnit, Observation.observation_unit_id == ObservationUnit.id)
-            .join(Germplasm, Observation.germplasm_id == Germplasm.id)
-            .join(Study, Observation.study_id == Study.id)
-            .join(ObservationVariable, Observation.observation_variable_id == ObservationVariable.id)
-            .where(ObservationVariable.observation_variable_db_id == trait_db_id)
-            .where(Study.study_db_id.in_(study_db_ids))
-            .group_by(Germplasm.germplasm_name, Study.study_name)
-        )
+        from app.modules.core.services.phenotype_matrix_service import phenotype_matrix_service
 
-        result = await db.execute(stmt)
-        rows = result.all()
+        study_ids, trait_ids = await phenotype_matrix_service.resolve_ids(
+            db, study_db_ids, [trait_db_id], organization_id
+        )
+        matrix = None
+        if study_ids and trait_ids:
+            matrix = await phenotype_matrix_service.get_matrix(db, study_ids, trait_ids, organization_id)
 
-        if not rows:
+        if matrix is None or not matrix.n_observations:
             return {
                 "yield_matrix": [],
                 "genotype_names": [],
@@ -458,33 +449,10 @@ class GxEAnalysisService:
                 "error": "No observations found for these criteria"
             }
 
-        # 2. Pivot Data
-        # structured as {(genotype, environment): value}
-        data_map = {(r.germplasm_name, r.study_name): r.mean_value for r in rows}
-
-        # Get unique sorted lists
-        genotypes = sorted({r.germplasm_name for r in rows})
-        environments = sorted({r.study_name for r in rows})
-
-        # Build Matrix
-        matrix = []
-        for g in genotypes:
-            row = []
-            for e in environments:
-                val = data_map.get((g, e))
-                if val is None:
-                    # Handle missing data - for now, fill with mean of genotype or None?
-                    # GXE analysis often requires complete data.
-                    # Simple imputation: Genotype Mean
-                    g_vals = [data_map.get((g, env)) for env in environments if data_map.get((g, env)) is not None]
-                    val = sum(g_vals) / len(g_vals) if g_vals else 0
-                row.append(val)
-            matrix.append(row)
-
         return {
-            "yield_matrix": matrix,
-            "genotype_names": genotypes,
-            "environment_names": environments
+            "yield_matrix": matrix.trait_matrix(trait_ids[0], impute="genotype_mean"),
+            "genotype_names": matrix.genotype_names,
+            "environment_names": matrix.environment_names
         }
 
 # Singleton instance
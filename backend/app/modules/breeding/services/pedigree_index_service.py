@@ -0,0 +1,479 @@
+"""
+Pedigree Index Service
+Integer-coded, topologically sorted pedigree for whole-organisation analysis
+
+The germplasm and cross tables are read once per organisation into parent
+arrays (position of sire and dam, -1 when unknown) ordered so that parents
+always precede their progeny. Generation numbers, inbreeding, coancestry and
+ancestor/descendant traversal then run in memory instead of issuing one
+query per node.
+
+Algorithms:
+- Generations: level-by-level topological sort (one vectorised pass per generation)
+- Inbreeding: Meuwissen & Luo (1992), full-sib families computed once
+- A·x products: Colleau (2002), A = L D L' applied as two sweeps over generation
+  levels, so relationship columns are obtained without forming A
+
+Indexes are dropped as soon as this process flushes a germplasm or cross
+write for their organisation, and again when that transaction commits or
+rolls back. Writes from other processes and Core bulk writes are picked up
+by revalidating against a fingerprint of the germplasm and cross tables (two
+aggregate queries), at most once per ``PEDIGREE_INDEX_RECHECK_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.germplasm import Cross, Germplasm
+
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN = -1
+
+
+def topological_generations(sire: np.ndarray, dam: np.ndarray) -> tuple[np.ndarray, int]:
+    """
+    Generation number per individual (founders = 0).
+
+    Each pass marks every individual whose known parents are all placed.
+    When a pass stalls the remainder contains a pedigree loop; unresolved
+    links pointing forward in row order are cut (what is left is acyclic)
+    and their count returned so callers can report corrupt data.
+    """
+    n = len(sire)
+    positions = np.arange(n)
+    generation = np.full(n, UNKNOWN, dtype=np.int64)
+    # Trailing sentinel: index -1 (UNKNOWN parent) always counts as placed
+    placed = np.zeros(n + 1, dtype=bool)
+    placed[-1] = True
+    broken_links = 0
+    level = 0
+    remaining = n
+    while remaining:
+        ready = ~placed[:-1] & placed[sire] & placed[dam]
+        if not ready.any():
+            unresolved = ~placed[:-1]
+            for parents in (sire, dam):
+                cut = unresolved & (parents > positions) & unresolved[parents]
+                broken_links += int(cut.sum())
+                parents[cut] = UNKNOWN
+            continue
+        generation[ready] = level
+        placed[:-1] |= ready
+        remaining -= int(ready.sum())
+        level += 1
+    return generation, broken_links
+
+
+@dataclass(eq=False)
+class PedigreeIndex:
+    """
+    Compact pedigree of one organisation.
+
+    Positions are topological: ``sire[i] < i`` and ``dam[i] < i`` whenever
+    known, and individuals of one generation occupy a contiguous block.
+    """
+
+    germplasm_ids: np.ndarray
+    keys: list[str]
+    labels: list[str]
+    sire: np.ndarray
+    dam: np.ndarray
+    generation: np.ndarray
+    fingerprint: tuple = ()
+    broken_links: int = 0
+    _lookup: dict[str, int] = field(default_factory=dict, repr=False)
+    _id_lookup: dict[int, int] = field(default_factory=dict, repr=False)
+    _level_bounds: np.ndarray | None = field(default=None, repr=False)
+    _inbreeding: np.ndarray | None = field(default=None, repr=False)
+    _mendelian_variance: np.ndarray | None = field(default=None, repr=False)
+    _children: tuple[np.ndarray, np.ndarray] | None = field(default=None, repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        rows: Iterable[Sequence[Any]],
+        fingerprint: tuple = (),
+    ) -> PedigreeIndex:
+        """
+        Build from ``(germplasm id, germplasm_db_id, germplasm_name, parent1 id, parent2 id)`` rows.
+
+        Parents outside the row set and self-parenting links are treated as unknown.
+        """
+        rows = list(rows)
+        n = len(rows)
+        raw_position = {row[0]: i for i, row in enumerate(rows)}
+
+        def parent_positions(column: int) -> np.ndarray:
+            positions = np.fromiter(
+                (raw_position.get(row[column], UNKNOWN) if row[column] is not None else UNKNOWN for row in rows),
+                dtype=np.int64,
+                count=n,
+            )
+            positions[positions == np.arange(n)] = UNKNOWN
+            return positions
+
+        sire, dam = parent_positions(3), parent_positions(4)
+        generation, broken_links = topological_generations(sire, dam)
+        if broken_links:
+            logger.warning(f"[PedigreeIndex] Cut {broken_links} parent links forming pedigree loops")
+
+        order = np.argsort(generation, kind="stable")
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n)
+
+        def reorder_parents(parents: np.ndarray) -> np.ndarray:
+            reordered = parents[order]
+            known = reordered >= 0
+            reordered[known] = rank[reordered[known]]
+            return reordered
+
+        ordered_rows = [rows[i] for i in order]
+        index = cls(
+            germplasm_ids=np.fromiter((row[0] for row in ordered_rows), dtype=np.int64, count=n),
+            keys=[row[1] or row[2] or str(row[0]) for row in ordered_rows],
+            labels=[row[2] or row[1] or str(row[0]) for row in ordered_rows],
+            sire=reorder_parents(sire),
+            dam=reorder_parents(dam),
+            generation=generation[order],
+            fingerprint=fingerprint,
+            broken_links=broken_links,
+        )
+        # Names first so that db ids win when a name collides with another db id
+        for i, row in enumerate(ordered_rows):
+            if row[2]:
+                index._lookup.setdefault(row[2], i)
+        for i, row in enumerate(ordered_rows):
+            if row[1]:
+                index._lookup[row[1]] = i
+        index._id_lookup = {int(germplasm_id): i for i, germplasm_id in enumerate(index.germplasm_ids)}
+        return index
+
+    # ============================================
+    # LOOKUPS
+    # ============================================
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def position(self, key: str) -> int | None:
+        """Position of an individual by germplasm_db_id or germplasm_name."""
+        return self._lookup.get(key)
+
+    def position_of_id(self, germplasm_id: int) -> int | None:
+        return self._id_lookup.get(germplasm_id)
+
+    def parent_keys(self, position: int) -> tuple[str | None, str | None]:
+        sire, dam = int(self.sire[position]), int(self.dam[position])
+        return (
+            self.keys[sire] if sire >= 0 else None,
+            self.keys[dam] if dam >= 0 else None,
+        )
+
+    @property
+    def level_bounds(self) -> np.ndarray:
+        """Start offsets of each generation block, plus the end."""
+        if self._level_bounds is None:
+            n_levels = int(self.generation[-1]) + 1 if self.size else 0
+            self._level_bounds = np.searchsorted(self.generation, np.arange(n_levels + 1))
+        return self._level_bounds
+
+    @property
+    def n_generations(self) -> int:
+        return len(self.level_bounds) - 1
+
+    @property
+    def founders(self) -> np.ndarray:
+        return (self.sire < 0) & (self.dam < 0)
+
+    # ============================================
+    # INBREEDING (Meuwissen & Luo)
+    # ============================================
+
+    @property
+    def inbreeding(self) -> np.ndarray:
+        if self._inbreeding is None:
+            self._compute_inbreeding()
+        return self._inbreeding
+
+    @property
+    def mendelian_variance(self) -> np.ndarray:
+        """Diagonal of D in A = L D L' (within-family additive variance)."""
+        if self._mendelian_variance is None:
+            self._compute_inbreeding()
+        return self._mendelian_variance
+
+    def _compute_inbreeding(self) -> None:
+        n = self.size
+        sire, dam = self.sire, self.dam
+        # Trailing sentinel so F[UNKNOWN] == 0
+        inbreeding = np.zeros(n + 1)
+        variance = np.ones(n)
+        contribution = np.zeros(n)
+        queued = np.zeros(n, dtype=bool)
+        family: dict[tuple[int, int], float] = {}
+
+        for i in range(n):
+            s, d = int(sire[i]), int(dam[i])
+            if s >= 0 and d >= 0:
+                variance[i] = 0.5 - 0.25 * (inbreeding[s] + inbreeding[d])
+            elif s >= 0 or d >= 0:
+                variance[i] = 0.75 - 0.25 * (inbreeding[s] + inbreeding[d])
+            if s < 0 or d < 0:
+                continue
+
+            pair = (s, d) if s <= d else (d, s)
+            if pair in family:
+                inbreeding[i] = family[pair]
+                continue
+
+            # a_ii = sum over ancestors j of L_ij^2 * d_j, visited youngest first
+            contribution[i] = 1.0
+            queued[i] = True
+            heap = [-i]
+            a_ii = 0.0
+            while heap:
+                j = -heapq.heappop(heap)
+                l_ij = contribution[j]
+                a_ii += l_ij * l_ij * variance[j]
+                for p in (int(sire[j]), int(dam[j])):
+                    if p >= 0:
+                        contribution[p] += 0.5 * l_ij
+                        if not queued[p]:
+                            queued[p] = True
+                            heapq.heappush(heap, -p)
+                contribution[j] = 0.0
+                queued[j] = False
+            inbreeding[i] = a_ii - 1.0
+            family[pair] = inbreeding[i]
+
+        self._inbreeding = inbreeding[:n]
+        self._mendelian_variance = variance
+
+    # ============================================
+    # RELATIONSHIPS (Colleau)
+    # ============================================
+
+    def a_times(self, x: np.ndarray) -> np.ndarray:
+        """
+        A·x for an (n,) vector or (n, k) matrix without forming A.
+
+        y = L'x sweeps generations oldest-last adding half of each child to
+        its parents; z = D y; A x = L z sweeps back adding half of each
+        parent to its children.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        vector = x.ndim == 1
+        columns = x.reshape(self.size, -1)
+        bounds = self.level_bounds
+        # Trailing sentinel row absorbs UNKNOWN parents
+        work = np.zeros((self.size + 1, columns.shape[1]))
+        work[:-1] = columns
+
+        for level in range(len(bounds) - 2, 0, -1):
+            block = slice(bounds[level], bounds[level + 1])
+            half = 0.5 * work[block]
+            np.add.at(work, self.sire[block], half)
+            np.add.at(work, self.dam[block], half)
+
+        work[:-1] *= self.mendelian_variance[:, None]
+        work[-1] = 0.0
+        for level in range(1, len(bounds) - 1):
+            block = slice(bounds[level], bounds[level + 1])
+            work[block] += 0.5 * (work[self.sire[block]] + work[self.dam[block]])
+
+        result = work[:-1]
+        return result[:, 0] if vector else result
+
+    def relationship_columns(self, positions: Sequence[int]) -> np.ndarray:
+        """Columns A[:, positions] as an (n, len(positions)) array."""
+        selector = np.zeros((self.size, len(positions)))
+        selector[np.asarray(positions, dtype=np.int64), np.arange(len(positions))] = 1.0
+        return self.a_times(selector)
+
+    def relationship_matrix(self, positions: Sequence[int]) -> np.ndarray:
+        """A[positions, positions]."""
+        positions = np.asarray(positions, dtype=np.int64)
+        return self.relationship_columns(positions)[positions]
+
+    def coancestry(self, first: int, second: int) -> float:
+        """Coefficient of coancestry f_xy = a_xy / 2."""
+        return 0.5 * float(self.relationship_columns([second])[first, 0])
+
+    # ============================================
+    # TRAVERSAL
+    # ============================================
+
+    @property
+    def children(self) -> tuple[np.ndarray, np.ndarray]:
+        """CSR adjacency from parent position to child positions (offsets, children)."""
+        if self._children is None:
+            parents = np.concatenate([self.sire, self.dam])
+            kids = np.concatenate([np.arange(self.size), np.arange(self.size)])
+            known = parents >= 0
+            parents, kids = parents[known], kids[known]
+            order = np.argsort(parents, kind="stable")
+            offsets = np.zeros(self.size + 1, dtype=np.int64)
+            np.cumsum(np.bincount(parents, minlength=self.size), out=offsets[1:])
+            self._children = (offsets, kids[order])
+        return self._children
+
+    def _children_of(self, frontier: np.ndarray) -> np.ndarray:
+        offsets, kids = self.children
+        starts = offsets[frontier]
+        lengths = offsets[frontier + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        # Concatenated ranges [start, start + length) without a Python loop
+        shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return kids[shifts + np.arange(total)]
+
+    def _parents_of(self, frontier: np.ndarray) -> np.ndarray:
+        parents = np.concatenate([self.sire[frontier], self.dam[frontier]])
+        return parents[parents >= 0]
+
+    def _walk(self, position: int, max_generations: int | None, step) -> dict[int, int]:
+        seen = np.zeros(self.size, dtype=bool)
+        seen[position] = True
+        depth: dict[int, int] = {}
+        frontier = np.array([position], dtype=np.int64)
+        level = 0
+        while frontier.size and (max_generations is None or level < max_generations):
+            nxt = np.unique(step(frontier))
+            nxt = nxt[~seen[nxt]]
+            seen[nxt] = True
+            level += 1
+            depth.update(dict.fromkeys(nxt.tolist(), level))
+            frontier = nxt
+        return depth
+
+    def ancestors(self, position: int, max_generations: int | None = None) -> dict[int, int]:
+        """Ancestor positions mapped to their closest generation distance."""
+        return self._walk(position, max_generations, self._parents_of)
+
+    def descendants(self, position: int, max_generations: int | None = None) -> dict[int, int]:
+        """Descendant positions mapped to their closest generation distance."""
+        return self._walk(position, max_generations, self._children_of)
+
+
+class PedigreeIndexCache:
+    """Per-organisation PedigreeIndex, rebuilt when the pedigree tables change."""
+
+    def __init__(self):
+        self._indexes: dict[int, PedigreeIndex] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        # monotonic time each cached index was last matched against the tables
+        self._checked: dict[int, float] = {}
+
+    async def fingerprint(self, db: AsyncSession, organization_id: int) -> tuple:
+        """Row counts and last update times of the organisation's germplasm and crosses."""
+        germplasm = select(func.count(Germplasm.id), func.max(Germplasm.updated_at)).where(
+            Germplasm.organization_id == organization_id
+        )
+        crosses = select(func.count(Cross.id), func.max(Cross.updated_at)).where(
+            Cross.organization_id == organization_id
+        )
+        germplasm_row = (await db.execute(germplasm)).one()
+        cross_row = (await db.execute(crosses)).one()
+        return (*germplasm_row, *cross_row)
+
+    async def _load(self, db: AsyncSession, organization_id: int, fingerprint: tuple) -> PedigreeIndex:
+        stmt = (
+            select(
+                Germplasm.id,
+                Germplasm.germplasm_db_id,
+                Germplasm.germplasm_name,
+                Cross.parent1_db_id,
+                Cross.parent2_db_id,
+            )
+            .outerjoin(Cross, Cross.id == Germplasm.cross_id)
+            .where(Germplasm.organization_id == organization_id)
+            .order_by(Germplasm.id)
+        )
+        rows = (await db.execute(stmt)).all()
+        return await asyncio.to_thread(PedigreeIndex.build, rows, fingerprint)
+
+    async def get(self, db: AsyncSession, organization_id: int) -> PedigreeIndex:
+        index = self._indexes.get(organization_id)
+        checked = self._checked.get(organization_id, float("-inf"))
+        if index is not None and time.monotonic() - checked < settings.PEDIGREE_INDEX_RECHECK_SECONDS:
+            return index
+
+        fingerprint = await self.fingerprint(db, organization_id)
+        lock = self._locks.setdefault(organization_id, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(organization_id)
+            if index is None or index.fingerprint != fingerprint:
+                index = await self._load(db, organization_id, fingerprint)
+                self._indexes[organization_id] = index
+            self._checked[organization_id] = time.monotonic()
+        return index
+
+    def invalidate(self, organization_id: int | None = None) -> None:
+        if organization_id is None:
+            self._indexes.clear()
+            self._checked.clear()
+        else:
+            self._indexes.pop(organization_id, None)
+            self._checked.pop(organization_id, None)
+
+
+pedigree_index_cache = PedigreeIndexCache()
+
+_PENDING_KEY = "pedigree_index_organizations"
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    organizations = {
+        obj.organization_id
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, (Germplasm, Cross))
+    }
+    if organizations:
+        for organization_id in organizations:
+            pedigree_index_cache.invalidate(organization_id)
+        session.info.setdefault(_PENDING_KEY, set()).update(organizations)
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    # A reader may have rebuilt from rows that were flushed but not yet committed,
+    # or that were rolled back, since the flush
+    if transaction.parent is None:
+        for organization_id in session.info.pop(_PENDING_KEY, ()):
+            pedigree_index_cache.invalidate(organization_id)
+
+
+_HOOKS = (
+    ("after_flush", _after_flush),
+    ("after_transaction_end", _after_transaction_end),
+)
+
+
+def register_pedigree_index_hooks() -> None:
+    """Drop cached pedigree indexes when this process writes germplasm or crosses (idempotent)."""
+    for name, hook in _HOOKS:
+        if not event.contains(Session, name, hook):
+            event.listen(Session, name, hook)
+
+
+def unregister_pedigree_index_hooks() -> None:
+    """Detach the write hooks."""
+    for name, hook in _HOOKS:
+        if event.contains(Session, name, hook):
+            event.remove(Session, name, hook)
@@ -1,12 +1,20 @@
 import uuid
-from collections import deque
 from typing import Any
 
-from sqlalchemy import and_, func, literal, or_, select
+import numpy as np
+from sqlalchemy import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import aliased, selectinload
 
 from app.models.germplasm import Cross, Germplasm
+from app.modules.breeding.services.pedigree_index_service import (
+    UNKNOWN,
+    PedigreeIndex,
+    pedigree_index_cache,
+)
+
+
+# Dense matrices grow quadratically in the response
+MAX_RELATIONSHIP_MATRIX_SIZE = 1000
 
 
 class PedigreeService:
@@ -137,263 +145,99 @@ class PedigreeService:
             **stats
         }
 
+    async def _index(self, organization_id: int) -> PedigreeIndex:
+        return await pedigree_index_cache.get(self.db, organization_id)
+
+    async def _locate(self, germplasm_id: int) -> tuple[PedigreeIndex, int] | None:
+        organization_id = await self.db.scalar(
+            select(Germplasm.organization_id).where(Germplasm.id == germplasm_id)
+        )
+        if organization_id is None:
+            return None
+        index = await self._index(organization_id)
+        position = index.position_of_id(germplasm_id)
+        return (index, position) if position is not None else None
+
     async def get_stats(self, organization_id: int = 1) -> dict:
         """
         Calculate pedigree statistics.
         """
-        # Count individuals
-        stmt_count = select(Germplasm).where(Germplasm.organization_id == organization_id)
-        result_count = await self.db.execute(stmt_count)
-        individuals = result_count.scalars().all()
-        n_individuals = len(individuals)
-
-        # Count founders (no cross_id or cross with no parents)
-        # This is an approximation. A more accurate way is to check cross parents.
-        # But efficiently:
-        stmt_founders = select(Germplasm).where(
-            and_(
-                Germplasm.organization_id == organization_id,
-                Germplasm.cross_id is None
-            )
-        )
-        result_founders = await self.db.execute(stmt_founders)
-        n_founders = len(result_founders.scalars().all())
+        index = await self._index(organization_id)
+        if not index.size:
+            return {
+                "n_individuals": 0,
+                "n_founders": 0,
+                "n_generations": 0,
+                "avg_inbreeding": 0,
+                "max_inbreeding": 0,
+                "completeness_index": 0
+            }
 
-        # Calculate generations and inbreeding is expensive for the whole DB.
-        # We'll do a sample or basic check.
-        # For now, return placeholders or cached stats if we had them.
+        founders = index.founders
+        # Share of known parents among non-founders, as a percentage
+        known_parents = (index.sire >= 0).astype(int) + (index.dam >= 0)
+        completeness = float(known_parents[~founders].mean() / 2 * 100) if (~founders).any() else 100.0
+        inbreeding = index.inbreeding
 
         return {
-            "n_individuals": n_individuals,
-            "n_founders": n_founders,
-            "n_generations": 0, # To be implemented properly
-            "avg_inbreeding": 0,
-            "max_inbreeding": 0,
-            "completeness_index": 0
+            "n_individuals": index.size,
+            "n_founders": int(founders.sum()),
+            "n_generations": index.n_generations,
+            "avg_inbreeding": round(float(inbreeding.mean()), 6),
+            "max_inbreeding": round(float(inbreeding.max()), 6),
+            "completeness_index": round(completeness, 2)
         }
 
     async def _calculate_generation(self, germplasm_id: int) -> int:
         """
-        Calculates generation using a recursive CTE.
         Generation 0 = Founder (no recorded parents).
         Generation N = max(Generation(parents)) + 1
         """
-        # Ancestry CTE
-        # Base: The target individual, depth 0
-        ancestry = select(
-            Germplasm.id,
-            literal(0).label('depth')
-        ).where(Germplasm.id == germplasm_id).cte(name='ancestry', recursive=True)
-
-        ancestry_alias = ancestry.alias("a")
-
-        # Recursive: Join through Cross to Parents
-        # Parents increase depth by 1
-
-        child = aliased(Germplasm)
-        parent = aliased(Germplasm)
-        cr = aliased(Cross)
-
-        recursive_part = select(
-            parent.id,
-            (ancestry_alias.c.depth + 1).label('depth')
-        ).select_from(
-            ancestry_alias
-        ).join(
-            child, child.id == ancestry_alias.c.id
-        ).join(
-            cr, cr.id == child.cross_id
-        ).join(
-            parent, or_(parent.id == cr.parent1_db_id, parent.id == cr.parent2_db_id)
-        )
-
-        ancestry = ancestry.union_all(recursive_part)
-
-        # Select max depth
-        stmt = select(func.max(ancestry.c.depth))
-        result = await self.db.execute(stmt)
-        max_depth = result.scalar()
-
-        return max_depth if max_depth is not None else 0
-
-    async def get_individual(self, individual_id: str, organization_id: int = 1) -> dict | None:
-        stmt = select(Germplasm).options(
-            selectinload(Germplasm.cross).selectinload(Cross.parent1),
-            selectinload(Germplasm.cross).selectinload(Cross.parent2)
-        ).where(
-            and_(
-                Germplasm.organization_id == organization_id,
-                or_(
-                    Germplasm.germplasm_db_id == individual_id,
-                    Germplasm.germplasm_name == individual_id
-                )
-            )
-        )
-        result = await self.db.execute(stmt)
-        germplasm = result.scalar_one_or_none()
-
-        if not germplasm:
-            return None
-
-        individual_key = self._germplasm_public_id(germplasm)
-        sire_id = None
-        dam_id = None
-
-        if germplasm.cross:
-            if germplasm.cross.parent1:
-                sire_id = self._germplasm_public_id(germplasm.cross.parent1)
-            if germplasm.cross.parent2:
-                dam_id = self._germplasm_public_id(germplasm.cross.parent2)
-
-        generation = await self._calculate_generation(germplasm.id)
-
-        inbreeding = await self._calculate_inbreeding(germplasm.id)
-
+        located = await self._locate(germplasm_id)
+        if located is None:
+            return 0
+        index, position = located
+        return int(index.generation[position])
+
+    def _individual_record(self, index: PedigreeIndex, position: int) -> dict:
+        sire_id, dam_id = index.parent_keys(position)
         return {
-            "id": individual_key,
+            "id": index.keys[position],
             "sire_id": sire_id,
             "dam_id": dam_id,
-            "generation": generation,
-            "inbreeding": inbreeding
+            "generation": int(index.generation[position]),
+            "inbreeding": round(float(index.inbreeding[position]), 6)
         }
 
+    async def get_individual(self, individual_id: str, organization_id: int = 1) -> dict | None:
+        index = await self._index(organization_id)
+        position = index.position(individual_id)
+        if position is None:
+            return None
+        return self._individual_record(index, position)
+
     async def _calculate_inbreeding(self, germplasm_id: int) -> float:
         """
-        Calculate inbreeding coefficient using the tabular method.
-        F(i) = A(sire, dam) / 2
+        Inbreeding coefficient from the organisation's pedigree index
+        (Meuwissen & Luo over the whole population, computed once per index).
         """
-        # 1. Fetch all ancestors using recursive CTE (id, depth)
-        ancestry = select(
-            Germplasm.id,
-            literal(0).label('depth')
-        ).where(Germplasm.id == germplasm_id).cte(name='ancestry', recursive=True)
-
-        ancestry_alias = ancestry.alias("a")
-        child = aliased(Germplasm)
-        parent = aliased(Germplasm)
-        cr = aliased(Cross)
-
-        recursive_part = select(
-            parent.id,
-            (ancestry_alias.c.depth + 1).label('depth')
-        ).select_from(
-            ancestry_alias
-        ).join(
-            child, child.id == ancestry_alias.c.id
-        ).join(
-            cr, cr.id == child.cross_id
-        ).join(
-            parent, or_(parent.id == cr.parent1_db_id, parent.id == cr.parent2_db_id)
-        )
-
-        ancestry = ancestry.union_all(recursive_part)
-
-        # Fetch IDs and depths
-        stmt = select(ancestry.c.id, ancestry.c.depth)
-        result = await self.db.execute(stmt)
-        ancestor_data = result.all()
-
-        if not ancestor_data:
+        located = await self._locate(germplasm_id)
+        if located is None:
             return 0.0
-
-        # 2. Fetch parent info for all ancestors
-        ancestor_ids = list({row.id for row in ancestor_data})
-
-        stmt_parents = select(
-            Germplasm.id,
-            Cross.parent1_db_id,
-            Cross.parent2_db_id
-        ).outerjoin(
-            Cross, Cross.id == Germplasm.cross_id
-        ).where(Germplasm.id.in_(ancestor_ids))
-
-        res_parents = await self.db.execute(stmt_parents)
-        parent_map = {row.id: (row.parent1_db_id, row.parent2_db_id) for row in res_parents.all()}
-
-        # 3. Sort by depth descending (Founders first, Target last)
-        id_depth_map: dict[int, int] = {}
-        for row in ancestor_data:
-            curr_depth = row.depth
-            if row.id in id_depth_map:
-                id_depth_map[row.id] = max(id_depth_map[row.id], curr_depth)
-            else:
-                id_depth_map[row.id] = curr_depth
-
-        sorted_ids = sorted(id_depth_map.keys(), key=lambda x: id_depth_map[x], reverse=True)
-
-        # 4. Tabular Method — A[i, j]
-        A: dict[tuple[int, int], float] = {}
-
-        def set_A(i: int, j: int, val: float) -> None:
-            if i > j:
-                A[(j, i)] = val
-            else:
-                A[(i, j)] = val
-
-        def get_A(i: int | None, j: int | None) -> float:
-            if i is None or j is None:
-                return 0.0
-            if i > j:
-                return A.get((j, i), 0.0)
-            return A.get((i, j), 0.0)
-
-        for i in sorted_ids:
-            sire, dam = parent_map.get(i, (None, None))
-
-            # Diagonal: A[i, i] = 1 + F_i = 1 + A[sire, dam] / 2
-            f_i = 0.0
-            if sire and dam:
-                f_i = 0.5 * get_A(sire, dam)
-
-            set_A(i, i, 1.0 + f_i)
-
-            # Off-diagonal: A[i, j] for j < i (processed earlier)
-            for j in sorted_ids:
-                if j == i:
-                    break
-                val = 0.5 * (get_A(sire, j) + get_A(dam, j))
-                set_A(i, j, val)
-
-        # Return F of target (germplasm_id)
-        return round(get_A(germplasm_id, germplasm_id) - 1.0, 6)
+        index, position = located
+        return round(float(index.inbreeding[position]), 6)
 
     async def get_individuals(self, generation: int | None = None, page: int = 0, page_size: int = 1000, organization_id: int = 1) -> tuple[list[dict], int]:
-        # Fetch count
-        count_stmt = select(Germplasm).where(Germplasm.organization_id == organization_id)
-        # If generation filtering was implemented, we would add it here. Currently it is placeholder in model.
+        index = await self._index(organization_id)
 
-        count_res = await self.db.execute(count_stmt)
-        total_count = len(count_res.scalars().all()) # Efficient count in SQL would be better: select(func.count())...
+        # Page in germplasm id order, as the table would
+        positions = np.argsort(index.germplasm_ids, kind="stable")
+        if generation is not None:
+            positions = positions[index.generation[positions] == generation]
+        total_count = len(positions)
 
-        # Fetch page
-        stmt = select(Germplasm).options(
-            selectinload(Germplasm.cross).selectinload(Cross.parent1),
-            selectinload(Germplasm.cross).selectinload(Cross.parent2)
-        ).where(Germplasm.organization_id == organization_id).limit(page_size).offset(page * page_size)
-
-        result = await self.db.execute(stmt)
-        germplasms = result.scalars().all()
-
-        data = []
-        for g in germplasms:
-            individual_key = self._germplasm_public_id(g)
-            sire_id = None
-            dam_id = None
-
-            if g.cross and g.cross.parent1:
-                sire_id = self._germplasm_public_id(g.cross.parent1)
-            if g.cross and g.cross.parent2:
-                dam_id = self._germplasm_public_id(g.cross.parent2)
-
-            data.append({
-                "id": individual_key,
-                "sire_id": sire_id,
-                "dam_id": dam_id,
-                "generation": 0,
-                "inbreeding": 0
-            })
-
-        return data, total_count
+        page_positions = positions[page * page_size:(page + 1) * page_size]
+        return [self._individual_record(index, int(position)) for position in page_positions], total_count
 
     async def get_pedigree_graph(self, germplasm_id: str, depth: int = 2, organization_id: int = 1) -> dict[str, list[dict[str, Any]]]:
         """
@@ -403,113 +247,38 @@ class PedigreeService:
         if depth < 0:
             depth = 0
 
-        # Step 1: Fetch central node
-        root_stmt = select(Germplasm).options(
-            selectinload(Germplasm.cross).selectinload(Cross.parent1),
-            selectinload(Germplasm.cross).selectinload(Cross.parent2),
-        ).where(
-            and_(
-                Germplasm.organization_id == organization_id,
-                or_(
-                    Germplasm.germplasm_db_id == germplasm_id,
-                    Germplasm.germplasm_name == germplasm_id,
-                ),
-            )
-        )
-        root_res = await self.db.execute(root_stmt)
-        root = root_res.scalar_one_or_none()
-        if not root:
+        index = await self._index(organization_id)
+        root = index.position(germplasm_id)
+        if root is None:
             raise ValueError(f"Germplasm '{germplasm_id}' not found")
 
         node_map: dict[str, dict[str, Any]] = {}
         edge_set: set[tuple[str, str]] = set()
 
-        def _node_id(g: Germplasm) -> str:
-            return self._germplasm_public_id(g)
-
-        def _node_label(g: Germplasm) -> str:
-            return self._germplasm_label(g)
-
-        def add_node(g: Germplasm | None) -> str | None:
-            if not g:
-                return None
-            gid = _node_id(g)
-            node_map[gid] = {"id": gid, "label": _node_label(g), "type": "germplasm"}
+        def add_node(position: int) -> str:
+            gid = index.keys[position]
+            node_map[gid] = {"id": gid, "label": index.labels[position], "type": "germplasm"}
             return gid
 
-        root_node_id = add_node(root)
+        def add_parent_edges(position: int) -> None:
+            child_node_id = add_node(position)
+            for parent in (int(index.sire[position]), int(index.dam[position])):
+                if parent >= 0:
+                    edge_set.add((add_node(parent), child_node_id))
 
-        # Step 2: Fetch ancestors up to depth using iterative traversal
-        visited_ancestors: set[int] = set()
-        ancestor_queue: deque[tuple[Germplasm, int]] = deque([(root, 0)])
+        add_node(root)
 
-        while ancestor_queue:
-            current, curr_depth = ancestor_queue.popleft()
-            if current.id in visited_ancestors:
-                continue
-            visited_ancestors.add(current.id)
-            if curr_depth >= depth:
-                continue
+        # Ancestors: every node closer than `depth` links to its parents
+        ancestors = index.ancestors(root, depth)
+        for position in [root, *ancestors]:
+            if ancestors.get(position, 0) < depth:
+                add_parent_edges(position)
 
-            if not current.cross:
-                continue
-
-            parents = [current.cross.parent1, current.cross.parent2]
-            child_node_id = add_node(current)
-            for parent in parents:
-                if parent and parent.id == current.id:
-                    raise RuntimeError("Circular pedigree dependency detected (self-parent)")
-                parent_node_id = add_node(parent)
-                if parent_node_id and child_node_id:
-                    edge_set.add((parent_node_id, child_node_id))
-                if parent and parent.id not in visited_ancestors:
-                    ancestor_queue.append((parent, curr_depth + 1))
-
-        # Step 3: Fetch descendants up to depth (forward links via Cross.progeny)
-        visited_descendants: set[int] = set()
-        descendant_queue: deque[tuple[Germplasm, int]] = deque([(root, 0)])
-
-        while descendant_queue:
-            current, curr_depth = descendant_queue.popleft()
-            if current.id in visited_descendants:
-                continue
-            visited_descendants.add(current.id)
-            if curr_depth >= depth:
-                continue
+        # Descendants up to `depth`, each with both of its parents
+        for position in index.descendants(root, depth):
+            add_parent_edges(position)
 
-            child_stmt = select(Germplasm).options(
-                selectinload(Germplasm.cross).selectinload(Cross.parent1),
-                selectinload(Germplasm.cross).selectinload(Cross.parent2),
-            ).join(Cross, Germplasm.cross_id == Cross.id).where(
-                and_(
-                    Germplasm.organization_id == organization_id,
-                    or_(
-                        Cross.parent1_db_id == current.id,
-                        Cross.parent2_db_id == current.id,
-                    ),
-                )
-            )
-            child_res = await self.db.execute(child_stmt)
-            children = child_res.scalars().all()
-
-            for child in children:
-                child_node_id = add_node(child)
-                if child_node_id:
-                    if child.cross and child.cross.parent1:
-                        if child.cross.parent1.id == child.id:
-                            raise RuntimeError("Circular pedigree dependency detected (self-parent)")
-                        edge_set.add((_node_id(child.cross.parent1), child_node_id))
-                    if child.cross and child.cross.parent2:
-                        if child.cross.parent2.id == child.id:
-                            raise RuntimeError("Circular pedigree dependency detected (self-parent)")
-                        edge_set.add((_node_id(child.cross.parent2), child_node_id))
-                if child.id not in visited_descendants:
-                    descendant_queue.append((child, curr_depth + 1))
-
-        if not root_node_id:
-            raise ValueError(f"Unable to build graph for germplasm '{germplasm_id}'")
-
-        # Step 4: Format for Cytoscape
+        # Format for Cytoscape
         return {
             "nodes": [{"data": node} for node in node_map.values()],
             "edges": [
@@ -520,264 +289,109 @@ class PedigreeService:
 
     async def get_ancestors(self, individual_id: str, max_generations: int = 5, organization_id: int = 1) -> dict:
         """
-        Trace ancestors using Recursive CTE for efficient retrieval.
-        Relation: Germplasm (Child) -> Cross -> Germplasm (Parent)
+        Trace ancestors through the in-memory pedigree index.
         """
-        from sqlalchemy import literal
-        from sqlalchemy.orm import aliased
-
-        # 1. Get database ID of the starting individual
-        stmt = select(Germplasm.id, Germplasm.cross_id).where(
-            and_(
-                Germplasm.organization_id == organization_id,
-                or_(
-                    Germplasm.germplasm_db_id == individual_id,
-                    Germplasm.germplasm_name == individual_id,
-                )
-            )
-        )
-        result = await self.db.execute(stmt)
-        start_node = result.first() # (id, cross_id)
-
-        if not start_node:
+        index = await self._index(organization_id)
+        root = index.position(individual_id)
+        if root is None:
             return {"error": f"Individual {individual_id} not found", "ancestors": []}
 
-        start_id, start_cross_id = start_node
-
-        # 2. Define Recursive CTE
-        # We need to traverse UP data: Child -> Parent
-
-        # Base case: The starting individual
-        # We select: id, cross_id, generation, path (for tracking)
-        hierarchy = select(
-            Germplasm.id,
-            Germplasm.germplasm_db_id,
-            Germplasm.germplasm_name,
-            Germplasm.cross_id,
-            literal(0).label('generation')
-        ).where(Germplasm.id == start_id).cte(name="ancestral_tree", recursive=True)
-
-        # Recursive part: Find parents of individuals in the hierarchy
-        # Logic:
-        # Current (Child) has cross_id.
-        # Cross table has parent1_db_id and parent2_db_id pointing to Parent Germplasm.id
-
-        parent_germplasm = aliased(Germplasm)
-        c = aliased(Cross)
-
-        recursive_stmt = select(
-            parent_germplasm.id,
-            parent_germplasm.germplasm_db_id,
-            parent_germplasm.germplasm_name,
-            parent_germplasm.cross_id,
-            (hierarchy.c.generation + 1).label('generation')
-        ).select_from(hierarchy).join(
-            c, c.id == hierarchy.c.cross_id
-        ).join(
-            parent_germplasm,
-            or_(
-                parent_germplasm.id == c.parent1_db_id,
-                parent_germplasm.id == c.parent2_db_id
-            )
-        ).where(hierarchy.c.generation < max_generations)
-
-        # Combine
-        combined_cte = hierarchy.union_all(recursive_stmt)
-
-        # 3. Execute CTE
-        final_stmt = select(combined_cte)
-        res = await self.db.execute(final_stmt)
-        rows = res.all()
-
-        # 4. Format Output
-        # To build a tree, we need the relationships.
-        # The CTE gives us the nodes. We need to know the edges (parents) for each node to reconstruct the tree.
-        # We can fetch all these individuals and their parents.
-
-        ancestor_ids = {
-            row.germplasm_db_id or row.germplasm_name or str(row.id)
-            for row in rows
-        }
-        ancestor_ids.add(individual_id)
-
-        # Fetch detailed info for all involved individuals (to get sire/dam)
-        # We can reuse get_individual or just query in bulk
-        stmt_details = select(Germplasm).options(
-            selectinload(Germplasm.cross).selectinload(Cross.parent1),
-            selectinload(Germplasm.cross).selectinload(Cross.parent2)
-        ).where(
-            and_(
-                Germplasm.organization_id == organization_id,
-                or_(
-                    Germplasm.germplasm_db_id.in_(ancestor_ids),
-                    Germplasm.germplasm_name.in_(ancestor_ids),
-                )
-            )
-        )
-        res_details = await self.db.execute(stmt_details)
-        details_map = {
-            self._germplasm_public_id(g): g
-            for g in res_details.scalars().all()
-        }
-
-        # Build Tree Function
-        def build_tree(curr_id: str, current_depth: int) -> dict | None:
-            if current_depth > max_generations:
-                return None
-
-            g = details_map.get(curr_id)
-            if not g:
-                return None
-
+        def build_tree(position: int, current_depth: int) -> dict:
             node = {
-                "id": self._germplasm_public_id(g),
-                "name": self._germplasm_label(g),
+                "id": index.keys[position],
+                "name": index.labels[position],
                 "generation": current_depth, # Relative to start
                 "type": "germplasm" # Frontend expects this
             }
-
-            # Find parents
-            sire_id = None
-            dam_id = None
-            if g.cross:
-                if g.cross.parent1:
-                    sire_id = self._germplasm_public_id(g.cross.parent1)
-                if g.cross.parent2:
-                    dam_id = self._germplasm_public_id(g.cross.parent2)
-
-            if sire_id:
-                node["sire"] = build_tree(sire_id, current_depth + 1)
-            if dam_id:
-                node["dam"] = build_tree(dam_id, current_depth + 1)
-
+            if current_depth < max_generations:
+                sire, dam = int(index.sire[position]), int(index.dam[position])
+                if sire >= 0:
+                    node["sire"] = build_tree(sire, current_depth + 1)
+                if dam >= 0:
+                    node["dam"] = build_tree(dam, current_depth + 1)
             return node
 
-        tree_root = build_tree(individual_id, 0)
-
-        ancestors_set = set(ancestor_ids)
-        if individual_id in ancestors_set:
-            ancestors_set.remove(individual_id)
+        ancestors = [index.keys[position] for position in index.ancestors(root, max_generations)]
 
         return {
             "individual_id": individual_id,
-            "n_ancestors": len(ancestors_set),
-            "ancestors": list(ancestors_set),
-            "tree": tree_root, # Nested structure
-            # "tree_flat": tree_nodes # Optional: keep if helpful debugging
+            "n_ancestors": len(ancestors),
+            "ancestors": ancestors,
+            "tree": build_tree(root, 0), # Nested structure
         }
 
     async def get_descendants(self, individual_id: str, max_generations: int = 3, organization_id: int = 1) -> dict:
-        # This is harder without a parent->child index.
-        # We need to find all crosses where parent1 or parent2 is the individual.
-
-        descendants_set = set()
-
-        async def fetch_children(curr_id, depth):
-            if depth >= max_generations:
-                return
-
-            # Find germplasm ID
-            stmt_g = select(Germplasm.id).where(
-                and_(
-                    Germplasm.organization_id == organization_id,
-                    Germplasm.germplasm_db_id == curr_id
-                )
-            )
-            res_g = await self.db.execute(stmt_g)
-            g_id = res_g.scalar_one_or_none()
-
-            if not g_id:
-                return
-
-            # Find crosses where this germplasm is a parent
-            stmt_c = select(Cross.id).where(
-                or_(
-                    Cross.parent1_db_id == g_id,
-                    Cross.parent2_db_id == g_id
-                )
-            )
-            res_c = await self.db.execute(stmt_c)
-            cross_ids = res_c.scalars().all()
-
-            if not cross_ids:
-                return
-
-            # Find germplasms from these crosses
-            stmt_kids = select(Germplasm).where(Germplasm.cross_id.in_(cross_ids))
-            res_kids = await self.db.execute(stmt_kids)
-            kids = res_kids.scalars().all()
-
-            for kid in kids:
-                if kid.germplasm_db_id not in descendants_set:
-                    descendants_set.add(kid.germplasm_db_id)
-                    await fetch_children(kid.germplasm_db_id, depth + 1)
-
-        await fetch_children(individual_id, 0)
+        index = await self._index(organization_id)
+        root = index.position(individual_id)
+        descendants = (
+            [index.keys[position] for position in index.descendants(root, max_generations)]
+            if root is not None else []
+        )
 
         return {
             "individual_id": individual_id,
-            "n_descendants": len(descendants_set),
-            "descendants": list(descendants_set)
+            "n_descendants": len(descendants),
+            "descendants": descendants
         }
 
+    @staticmethod
+    def _describe_relationship(index: PedigreeIndex, first: int, second: int, coancestry: float) -> str:
+        if first == second:
+            return "Same individual"
+        parents_1 = {int(index.sire[first]), int(index.dam[first])} - {UNKNOWN}
+        parents_2 = {int(index.sire[second]), int(index.dam[second])} - {UNKNOWN}
+        if second in parents_1 or first in parents_2:
+            return "Parent-Offspring"
+        if len(parents_1) == 2 and parents_1 == parents_2:
+            return "Full Siblings"
+        if parents_1 & parents_2:
+            return "Half Siblings"
+        return "Related" if coancestry > 0 else "Unrelated"
+
     async def calculate_coancestry(self, id1: str, id2: str, organization_id: int = 1) -> dict:
-        # Placeholder for complex calculation
-        # If same individual, 0.5 (or 0.5 + F/2)
-        # If parent-child, 0.25
-        # If full sibs, 0.25
+        """
+        Coefficient of coancestry f = a_12 / 2, from one Colleau A·x product.
+        """
+        index = await self._index(organization_id)
+        first, second = index.position(id1), index.position(id2)
 
-        if id1 == id2:
+        if first is None or second is None:
             return {
-                "individual_1": id1,
-                "individual_2": id2,
-                "coancestry": 0.5,
-                "relationship": "Same individual"
-            }
-
-        # Get immediate parents
-        ind1 = await self.get_individual(id1, organization_id)
-        ind2 = await self.get_individual(id2, organization_id)
-
-        if not ind1 or not ind2:
-             return {
                 "individual_1": id1,
                 "individual_2": id2,
                 "coancestry": 0.0,
                 "relationship": "Unknown"
             }
 
-        # Basic check for Parent-Child
-        is_parent_child = (
-            ind1["sire_id"] == id2 or ind1["dam_id"] == id2 or
-            ind2["sire_id"] == id1 or ind2["dam_id"] == id1
-        )
-
-        if is_parent_child:
-             return {
-                "individual_1": id1,
-                "individual_2": id2,
-                "coancestry": 0.25,
-                "relationship": "Parent-Offspring"
-            }
+        coancestry = index.coancestry(first, second)
+        return {
+            "individual_1": id1,
+            "individual_2": id2,
+            "coancestry": round(coancestry, 6),
+            "relationship": self._describe_relationship(index, first, second, coancestry)
+        }
 
-        # Basic check for Full Siblings
-        is_full_sibs = (
-            ind1["sire_id"] and ind1["dam_id"] and
-            ind1["sire_id"] == ind2["sire_id"] and
-            ind1["dam_id"] == ind2["dam_id"]
-        )
+    async def get_relationship_matrix(self, individual_ids: list[str] | None = None, organization_id: int = 1) -> dict:
+        """
+        Additive relationship matrix for a subset of individuals (None = all).
 
-        if is_full_sibs:
-            return {
-                "individual_1": id1,
-                "individual_2": id2,
-                "coancestry": 0.25,
-                "relationship": "Full Siblings"
-            }
+        Only the requested columns of A are computed.
+        """
+        index = await self._index(organization_id)
+        if individual_ids is None:
+            positions = list(range(index.size))
+        else:
+            positions = [p for p in (index.position(i) for i in individual_ids) if p is not None]
+        if len(positions) > MAX_RELATIONSHIP_MATRIX_SIZE:
+            raise ValueError(
+                f"Relationship matrix limited to {MAX_RELATIONSHIP_MATRIX_SIZE} individuals "
+                f"({len(positions)} requested); pass individual_ids"
+            )
 
+        keys = [index.keys[p] for p in positions]
+        matrix = np.round(index.relationship_matrix(positions), 4) if positions else np.empty((0, 0))
         return {
-            "individual_1": id1,
-            "individual_2": id2,
-            "coancestry": 0.0,
-            "relationship": "Unrelated (or calculation too complex)"
+            "individuals": keys,
+            "matrix": matrix.tolist(),
+            "n_individuals": len(keys),
         }
@@ -8,11 +8,12 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from functools import lru_cache
 from time import perf_counter
 from typing import Any
 
-from sqlalchemy import Float, and_, cast, func, select
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.integrations.base import IntegrationConfig
@@ -223,7 +224,7 @@ class YieldGapService:
         start_year, end_year = year_range
 
         stmt = (
-            select(cast(Observation.value, Float))
+            select(Observation.value_numeric)
             .join(
                 ObservationVariable,
                 Observation.observation_variable_id == ObservationVariable.id,
@@ -240,10 +241,8 @@ class YieldGapService:
                     func.lower(ObservationVariable.observation_variable_name).like(
                         "%yield%"
                     ),
-                    cast(func.substr(Observation.observation_time_stamp, 1, 4), Float)
-                    >= start_year,
-                    cast(func.substr(Observation.observation_time_stamp, 1, 4), Float)
-                    <= end_year,
+                    Observation.observed_at >= datetime(start_year, 1, 1, tzinfo=UTC),
+                    Observation.observed_at < datetime(end_year + 1, 1, 1, tzinfo=UTC),
                 )
             )
         )
@@ -359,7 +358,7 @@ class YieldGapService:
         """
         start = perf_counter()
         stmt = (
-            select(Trial.location_id, func.avg(cast(Observation.value, Float)))
+            select(Trial.location_id, func.avg(Observation.value_numeric))
             .join(Study, Study.trial_id == Trial.id)
             .join(Observation, Observation.study_id == Study.id)
             .join(
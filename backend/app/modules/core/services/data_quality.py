@@ -2,6 +2,8 @@
 Data Quality Service
 Monitors and validates data quality across the system.
 Queries real data from database - no demo/mock data.
+Trait value flags come from the phenotype QC issue store written at ingest
+(phenotype_qc_service), so dashboards never rescan observations.
 """
 
 from datetime import UTC, datetime
@@ -11,6 +13,13 @@ from typing import Any
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.phenotyping import (
+    Observation,
+    ObservationVariable,
+    PhenotypeQCIssue,
+    PhenotypeQCStatistic,
+)
+
 
 class IssueSeverity(StrEnum):
     LOW = "low"
@@ -113,35 +122,35 @@ class DataQualityService:
                 "resolvedBy": None,
             })
 
-        # Count by severity
-        critical = len([i for i in issues if i["severity"] == IssueSeverity.CRITICAL.value])
-        high = len([i for i in issues if i["severity"] == IssueSeverity.HIGH.value])
-        medium = len([i for i in issues if i["severity"] == IssueSeverity.MEDIUM.value])
-        low = len([i for i in issues if i["severity"] == IssueSeverity.LOW.value])
+        # Phenotype QC flags are counted in the issue store (scored at ingest)
+        counts = [
+            (issue["status"], issue["severity"], issue["issueType"], issue["entity"], 1) for issue in issues
+        ]
+        counts.extend(await self._qc_issue_counts(db, organization_id))
+
+        def total(index: int, value: str) -> int:
+            return sum(row[4] for row in counts if row[index] == value)
 
-        # Count by type
-        issues_by_type = {}
-        for issue in issues:
-            t = issue["issueType"]
-            issues_by_type[t] = issues_by_type.get(t, 0) + 1
+        # Count by type and entity
+        issues_by_type: dict[str, int] = {}
+        issues_by_entity: dict[str, int] = {}
+        for _, _, issue_type, entity, n in counts:
+            issues_by_type[issue_type] = issues_by_type.get(issue_type, 0) + n
+            issues_by_entity[entity] = issues_by_entity.get(entity, 0) + n
 
-        # Count by entity
-        issues_by_entity = {}
-        for issue in issues:
-            e = issue["entity"]
-            issues_by_entity[e] = issues_by_entity.get(e, 0) + 1
+        recent = await self._list_qc_issues(db, organization_id, status=IssueStatus.OPEN.value, limit=10)
 
         return {
-            "totalIssues": len(issues),
-            "openIssues": len([i for i in issues if i["status"] == IssueStatus.OPEN.value]),
-            "resolvedIssues": len([i for i in issues if i["status"] == IssueStatus.RESOLVED.value]),
-            "criticalIssues": critical,
-            "highIssues": high,
-            "mediumIssues": medium,
-            "lowIssues": low,
+            "totalIssues": sum(row[4] for row in counts),
+            "openIssues": total(0, IssueStatus.OPEN.value),
+            "resolvedIssues": total(0, IssueStatus.RESOLVED.value),
+            "criticalIssues": total(1, IssueSeverity.CRITICAL.value),
+            "highIssues": total(1, IssueSeverity.HIGH.value),
+            "mediumIssues": total(1, IssueSeverity.MEDIUM.value),
+            "lowIssues": total(1, IssueSeverity.LOW.value),
             "issuesByType": issues_by_type,
             "issuesByEntity": issues_by_entity,
-            "recentIssues": issues[:10],
+            "recentIssues": (issues + recent)[:10],
             "dataCounts": {
                 "germplasm": germplasm_count,
                 "programs": program_count,
@@ -181,6 +190,166 @@ class DataQualityService:
         result = await db.execute(stmt)
         return result.scalar() or 0
 
+    async def _qc_issue_counts(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+    ) -> list[tuple[str, str, str, str, int]]:
+        """(status, severity, issue type, entity, count) groups of stored QC issues."""
+        stmt = (
+            select(
+                PhenotypeQCIssue.status,
+                PhenotypeQCIssue.severity,
+                PhenotypeQCIssue.issue_type,
+                PhenotypeQCIssue.source,
+                func.count(PhenotypeQCIssue.id),
+            )
+            .where(PhenotypeQCIssue.organization_id == organization_id)
+            .group_by(
+                PhenotypeQCIssue.status,
+                PhenotypeQCIssue.severity,
+                PhenotypeQCIssue.issue_type,
+                PhenotypeQCIssue.source,
+            )
+        )
+        result = await db.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def _list_qc_issues(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        entity: str | None = None,
+        severity: str | None = None,
+        status: str | None = None,
+        issue_type: str | None = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """Newest stored QC issues matching the filters."""
+        stmt = (
+            select(PhenotypeQCIssue, ObservationVariable.observation_variable_name)
+            .outerjoin(ObservationVariable, ObservationVariable.id == PhenotypeQCIssue.observation_variable_id)
+            .where(PhenotypeQCIssue.organization_id == organization_id)
+            .order_by(PhenotypeQCIssue.id.desc())
+            .limit(limit)
+        )
+        if entity:
+            stmt = stmt.where(PhenotypeQCIssue.source == entity)
+        if severity:
+            stmt = stmt.where(PhenotypeQCIssue.severity == severity)
+        if status:
+            stmt = stmt.where(PhenotypeQCIssue.status == status)
+        if issue_type:
+            stmt = stmt.where(PhenotypeQCIssue.issue_type == issue_type)
+        result = await db.execute(stmt)
+        return [self._qc_issue_to_dict(issue, name) for issue, name in result.all()]
+
+    def _qc_issue_to_dict(self, issue: PhenotypeQCIssue, variable_name: str | None = None) -> dict[str, Any]:
+        return {
+            "id": str(issue.id),
+            "entity": issue.source,
+            "entityId": str(issue.record_id),
+            "entityName": f"{variable_name or 'Trait'} = {issue.value}",
+            "issueType": issue.issue_type,
+            "field": "value",
+            "description": issue.reason,
+            "severity": issue.severity,
+            "status": issue.status,
+            "rule": issue.rule,
+            "score": issue.score,
+            "studyId": issue.study_id,
+            "germplasmId": issue.germplasm_id,
+            "createdAt": issue.created_at.isoformat() if issue.created_at else None,
+            "resolvedAt": issue.resolved_at.isoformat() if issue.resolved_at else None,
+            "resolvedBy": issue.resolved_by,
+        }
+
+    async def get_issue(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        issue_id: str,
+    ) -> dict[str, Any] | None:
+        """Get a stored QC issue by ID."""
+        issue = await self._get_qc_issue(db, organization_id, issue_id)
+        return self._qc_issue_to_dict(issue) if issue else None
+
+    async def _get_qc_issue(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        issue_id: str,
+    ) -> PhenotypeQCIssue | None:
+        if not str(issue_id).isdigit():
+            return None
+        result = await db.execute(
+            select(PhenotypeQCIssue).where(
+                PhenotypeQCIssue.organization_id == organization_id,
+                PhenotypeQCIssue.id == int(issue_id),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def _set_issue_status(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        issue_id: str,
+        status: IssueStatus,
+        resolved_by: str | None = None,
+        note: str | None = None,
+    ) -> dict[str, Any] | None:
+        issue = await self._get_qc_issue(db, organization_id, issue_id)
+        if not issue:
+            return None
+        issue.status = status.value
+        if status == IssueStatus.OPEN:
+            issue.resolved_at = None
+            issue.resolved_by = None
+        else:
+            issue.resolved_at = datetime.now(UTC)
+            issue.resolved_by = resolved_by
+        if note:
+            issue.reason = f"{issue.reason} [{status.value}: {note}]"
+        await db.commit()
+        await db.refresh(issue)
+        return self._qc_issue_to_dict(issue)
+
+    async def resolve_issue(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        issue_id: str,
+        resolved_by: str,
+        notes: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Mark a QC issue resolved; re-scoring will not raise it again."""
+        return await self._set_issue_status(
+            db, organization_id, issue_id, IssueStatus.RESOLVED, resolved_by, notes
+        )
+
+    async def ignore_issue(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        issue_id: str,
+        reason: str,
+        ignored_by: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Ignore a QC issue (e.g. a genuine extreme value)."""
+        return await self._set_issue_status(
+            db, organization_id, issue_id, IssueStatus.IGNORED, ignored_by, reason
+        )
+
+    async def reopen_issue(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        issue_id: str,
+    ) -> dict[str, Any] | None:
+        """Reopen a resolved or ignored QC issue."""
+        return await self._set_issue_status(db, organization_id, issue_id, IssueStatus.OPEN)
+
     async def get_issues(
         self,
         db: AsyncSession,
@@ -188,6 +357,7 @@ class DataQualityService:
         entity: str | None = None,
         severity: str | None = None,
         status: str | None = None,
+        issue_type: str | None = None,
         limit: int = 50,
     ) -> list[dict[str, Any]]:
         """Get filtered list of data quality issues.
@@ -198,14 +368,15 @@ class DataQualityService:
             entity: Filter by entity type
             severity: Filter by severity level
             status: Filter by status
+            issue_type: Filter by issue type
             limit: Maximum results to return
 
         Returns:
             List of issue dictionaries
         """
-        # Get dashboard which calculates issues from actual data
+        # Missing-field summaries from the dashboard, then stored QC issues
         dashboard = await self.get_dashboard(db, organization_id)
-        issues = dashboard.get("recentIssues", [])
+        issues = [i for i in dashboard.get("recentIssues", []) if not i["id"].isdigit()]
 
         # Apply filters
         if entity:
@@ -214,7 +385,12 @@ class DataQualityService:
             issues = [i for i in issues if i["severity"] == severity]
         if status:
             issues = [i for i in issues if i["status"] == status]
+        if issue_type:
+            issues = [i for i in issues if i["issueType"] == issue_type]
 
+        issues += await self._list_qc_issues(
+            db, organization_id, entity=entity, severity=severity, status=status, issue_type=issue_type, limit=limit
+        )
         return issues[:limit]
 
     async def run_validation(
@@ -293,6 +469,35 @@ class DataQualityService:
             results["entities_checked"] += program_count
             results["issues_found"] += missing_name
 
+        # Observation values are scored at ingest; report the stored QC state.
+        # The QC statistics only count in-scale values (field-book values
+        # included), so they are reported beside the observation count
+        if entity_type is None or entity_type == "observation":
+            observation_count = await self._count_records(db, Observation, organization_id)
+            scored = await db.execute(
+                select(func.coalesce(func.sum(PhenotypeQCStatistic.n), 0)).where(
+                    PhenotypeQCStatistic.organization_id == organization_id
+                )
+            )
+            open_by_rule = await db.execute(
+                select(PhenotypeQCIssue.rule, func.count(PhenotypeQCIssue.id))
+                .where(
+                    PhenotypeQCIssue.organization_id == organization_id,
+                    PhenotypeQCIssue.status == IssueStatus.OPEN.value,
+                )
+                .group_by(PhenotypeQCIssue.rule)
+            )
+            rule_counts = dict(open_by_rule.all())
+
+            results["checks_run"].append({
+                "entity": "observation",
+                "total_records": observation_count,
+                "values_scored": int(scored.scalar() or 0),
+                "issues": rule_counts,
+            })
+            results["entities_checked"] += observation_count
+            results["issues_found"] += sum(rule_counts.values())
+
         return results
 
     async def get_entity_quality(
@@ -400,7 +605,7 @@ class DataQualityService:
         """List quality issues — delegates to get_issues."""
         return await self.get_issues(
             db, organization_id,
-            entity=entity, severity=severity, status=status,
+            entity=entity, severity=severity, status=status, issue_type=issue_type,
         )
 
     async def get_metrics(
@@ -9,6 +9,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user_management import ActivityLog
 from app.modules.core.services.import_engine.schemas import ValidationMessage, ValidationReport
 from app.modules.core.services.import_engine.validator import SchemaValidator
+from app.modules.core.services.organization_counter_service import (
+    apply_bulk_deltas,
+    tracks_table,
+)
 
 
 class BaseImporter(ABC):
@@ -116,7 +120,13 @@ class BaseImporter(ABC):
         if not rows:
             return 0
         stmt = insert(self.model).values(rows)
-        await self.db.execute(stmt)
+        table = self.model.__table__
+        if not tracks_table(table.name):
+            await self.db.execute(stmt)
+            return len(rows)
+        # Core inserts skip the counter flush hook, so apply the deltas from RETURNING
+        result = await self.db.execute(stmt.returning(*table.columns))
+        await apply_bulk_deltas(self.db, table.name, result.mappings().all())
         return len(rows)
 
     async def log_activity(self, details: str) -> None:
@@ -1,15 +1,37 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Mapping, Sequence
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.modules.bio_analytics.models import BioQTL
 from app.models.core import Location, Program, Trial
 from app.models.germplasm import Germplasm
-from app.models.phenotyping import Observation, ObservationUnit, ObservationVariable
+from app.models.phenotyping import (
+    Observation,
+    ObservationUnit,
+    ObservationVariable,
+    typed_observation_values,
+)
+from app.modules.bio_analytics.models import BioQTL
 from app.modules.core.services.import_engine.base import BaseImporter
+from app.modules.core.services.organization_counter_service import (
+    apply_bulk_deltas as apply_counter_deltas,
+)
+from app.modules.core.services.phenotype_qc_service import phenotype_qc_service
+from app.modules.phenotyping.services.trial_statistics_service import (
+    apply_bulk_deltas as apply_statistics_deltas,
+)
+
+
+async def apply_observation_deltas(
+    db: AsyncSession, rows: Sequence[Mapping[str, object]], sign: float = 1.0
+) -> None:
+    """Counter and trial statistic upkeep for observations written by Core statements."""
+    await apply_counter_deltas(db, Observation.__tablename__, rows, sign)
+    await apply_statistics_deltas(db, rows, sign)
 
 
 class GermplasmImporter(BaseImporter):
@@ -96,6 +118,8 @@ class ObservationImporter(BaseImporter):
         "organization_id",
         "observation_time_stamp",
     }
+    # QC outcome of the last bulk_insert batch (None until one has run)
+    qc_summary: dict[str, object] | None = None
 
     @property
     def domain(self) -> str:
@@ -140,9 +164,39 @@ class ObservationImporter(BaseImporter):
             row["observation_time_stamp"] = row.pop("date")
 
         row["value"] = str(row.get("value", ""))
+        # Core bulk insert bypasses the mapper hooks that keep the typed columns in sync
+        row.update(typed_observation_values(row["value"], row.get("observation_time_stamp")))
         row["organization_id"] = self.organization_id
         return row
 
+    async def bulk_insert(self, rows: list[dict[str, object]]) -> int:
+        if not rows:
+            return 0
+        result = await self.db.execute(
+            insert(Observation).returning(*Observation.__table__.columns), rows
+        )
+        inserted = result.mappings().all()
+        # Core inserts skip the flush hooks that keep counters and trial statistics current
+        await apply_observation_deltas(self.db, inserted)
+        # Score the batch in the import transaction so flags land with the data
+        self.qc_summary = await phenotype_qc_service.score_batch(
+            self.db,
+            self.organization_id,
+            [
+                {
+                    "record_id": r["id"],
+                    "observation_variable_id": r["observation_variable_id"],
+                    "study_id": r["study_id"],
+                    "germplasm_id": r["germplasm_id"],
+                    "value": r["value"],
+                    "value_numeric": r["value_numeric"],
+                }
+                for r in inserted
+            ],
+            source="observation",
+        )
+        return len(rows)
+
 
 class QTLImporter(BaseImporter):
     model = BioQTL
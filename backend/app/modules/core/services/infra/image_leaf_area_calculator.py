@@ -1,6 +1,20 @@
+from collections.abc import Sequence
+
 import cv2
 import numpy as np
 
+from app.modules.core.services.raster_tile_service import (
+    TILE_SIZE,
+    exg,
+    iter_windows,
+    open_raster,
+)
+
+
+# Chromatic ExG spans [-1, 2]; histogram bins for the tiled Otsu threshold
+EXG_RANGE = (-1.0, 2.0)
+EXG_BINS = 256
+
 
 class LeafAreaCalculator:
     """
@@ -48,6 +62,69 @@ class LeafAreaCalculator:
             # Re-raise with context or handle specific errors
             raise ValueError(f"Failed to process image: {str(e)}") from e
 
+    def calculate_canopy_area(
+        self,
+        raster_path: str,
+        band_names: Sequence[str] | None = None,
+        tile_size: int = TILE_SIZE,
+    ) -> dict:
+        """
+        Canopy (green pixel) area of a raster too large to decode, such as an
+        orthomosaic. Reads it twice, tile by tile: once to build the ExG
+        histogram for a global Otsu threshold, once to count canopy pixels.
+        Leaves are not separated into contours at this scale.
+
+        Returns:
+            Dictionary containing total_area_pixels, valid_pixels,
+            canopy_fraction, exg_threshold and, for georeferenced rasters,
+            pixel_area and total_area in squared CRS units.
+        """
+        with open_raster(raster_path, band_names) as source:
+            bands = [source.band_map[b] for b in ("red", "green", "blue")]
+            windows = list(iter_windows(source.height, source.width, tile_size))
+
+            histogram = np.zeros(EXG_BINS, dtype=np.int64)
+            for window in windows:
+                values, valid = source.read(bands, window)
+                histogram += np.histogram(exg(*values)[valid], bins=EXG_BINS, range=EXG_RANGE)[0]
+            threshold = self._otsu_threshold(histogram)
+
+            canopy = 0
+            for window in windows:
+                values, valid = source.read(bands, window)
+                canopy += int((exg(*values)[valid] > threshold).sum())
+            transform = source.transform
+
+        valid_pixels = int(histogram.sum())
+        result = {
+            "total_area_pixels": canopy,
+            "valid_pixels": valid_pixels,
+            "canopy_fraction": canopy / valid_pixels if valid_pixels else 0.0,
+            "exg_threshold": float(threshold),
+        }
+        if transform is not None and not transform.is_identity:
+            pixel_area = abs(transform.a * transform.e - transform.b * transform.d)
+            result.update(pixel_area=pixel_area, total_area=canopy * pixel_area)
+        return result
+
+    @staticmethod
+    def _otsu_threshold(histogram: np.ndarray) -> float:
+        """Otsu's threshold (as an ExG value) from an ExG histogram."""
+        edges = np.linspace(*EXG_RANGE, EXG_BINS + 1)
+        centres = (edges[:-1] + edges[1:]) / 2
+        weight = np.cumsum(histogram)
+        total = weight[-1]
+        if total == 0:
+            return float(centres[-1])
+        cumulative_mean = np.cumsum(histogram * centres)
+        background = weight[:-1]
+        foreground = total - background
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_background = cumulative_mean[:-1] / background
+            mean_foreground = (cumulative_mean[-1] - cumulative_mean[:-1]) / foreground
+            between = background * foreground * (mean_background - mean_foreground) ** 2
+        return float(edges[1:-1][np.nanargmax(np.nan_to_num(between, nan=-1.0))])
+
     def _decode_image(self, image_bytes: bytes) -> np.ndarray:
         """Decodes image bytes into a numpy array (BGR)."""
         nparr = np.frombuffer(image_bytes, np.uint8)
@@ -3,15 +3,28 @@ UAV Orthomosaic Stitcher Webhook Service
 
 Handles incoming webhooks from UAV stitching services (e.g., WebODM, DroneDeploy).
 Processes the results and updates the GISLayer database.
+
+When the metadata names a study (``study_id``), the orthomosaic is also queued
+for plot extraction: it is streamed to disk, never held in memory, and
+raster_tile_service reduces it tile by tile to per-plot index observations.
+Optional metadata: ``indices`` (default ["ndvi"]), ``band_names`` and
+``acquisition_date``.
 """
 
+import contextlib
 import logging
+import os
+import tempfile
+from datetime import datetime
 from typing import Any
 
+import httpx
 from pydantic import BaseModel, Field
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.spatial import GISLayer
+from app.modules.core.services.raster_tile_service import plot_index_service
 
 logger = logging.getLogger(__name__)
 
@@ -72,12 +85,29 @@ class UAVStitcherWebhookService:
                         new_layer.band_count = int(payload.metadata["band_count"])
                     except (ValueError, TypeError):
                         pass
+                if isinstance(payload.metadata.get("band_names"), list):
+                    new_layer.band_names = payload.metadata["band_names"]
+                if payload.metadata.get("acquisition_date"):
+                    try:
+                        new_layer.acquisition_date = datetime.fromisoformat(payload.metadata["acquisition_date"])
+                    except (ValueError, TypeError):
+                        pass
 
             db.add(new_layer)
             await db.commit()
             await db.refresh(new_layer)
             logger.info(f"Created GISLayer {new_layer.id} for job {payload.job_id}")
 
+            study_id = payload.metadata.get("study_id") if payload.metadata else None
+            if study_id:
+                task_id = await submit_plot_extraction_job(
+                    layer_id=new_layer.id,
+                    organization_id=payload.organization_id,
+                    study_id=int(study_id),
+                    indices=payload.metadata.get("indices") or ["ndvi"],
+                )
+                logger.info(f"Queued plot extraction {task_id} for GISLayer {new_layer.id}")
+
         elif payload.status.lower() == "failed":
             logger.warning(f"UAV stitching job {payload.job_id} failed. No layer created.")
             # Optionally update a job status if we had a Job record, but for now just log.
@@ -86,3 +116,96 @@ class UAVStitcherWebhookService:
             logger.info(f"Ignoring status {payload.status} for job {payload.job_id}")
 
 uav_stitcher_service = UAVStitcherWebhookService()
+
+
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+async def _download_to_disk(url: str) -> str:
+    """Stream a remote raster to a temporary file in fixed-size chunks."""
+    suffix = os.path.splitext(url.split("?")[0])[1] or ".tif"
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            async with httpx.AsyncClient(timeout=httpx.Timeout(60.0, read=600.0), follow_redirects=True) as client:
+                async with client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        out.write(chunk)
+    except Exception:
+        with contextlib.suppress(OSError):
+            os.remove(path)
+        raise
+    return path
+
+
+async def run_plot_extraction_job(
+    layer_id: int,
+    organization_id: int,
+    study_id: int,
+    indices: list[str],
+    progress_callback=None,
+) -> dict[str, Any]:
+    """Task queue entry point: per-plot index observations from an orthomosaic layer."""
+    from app.core.database import AsyncSessionLocal
+    from app.core.rls import set_tenant_context
+
+    async with AsyncSessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            await set_tenant_context(db, organization_id)
+        layer = (await db.execute(
+            select(GISLayer).where(GISLayer.id == layer_id, GISLayer.organization_id == organization_id)
+        )).scalar_one()
+
+        source = layer.source_path.removeprefix("file://")
+        downloaded = source.startswith(("http://", "https://"))
+        if progress_callback:
+            progress_callback(0.05, "Downloading orthomosaic" if downloaded else "Opening orthomosaic")
+        path = await _download_to_disk(source) if downloaded else source
+        try:
+            if progress_callback:
+                progress_callback(0.3, "Extracting plot statistics")
+            result = await plot_index_service.extract_plot_observations(
+                db,
+                organization_id,
+                path,
+                study_id,
+                indices=indices,
+                band_names=layer.band_names,
+                acquired_at=layer.acquisition_date,
+                source_layer_id=layer.id,
+            )
+            await db.commit()
+        finally:
+            if downloaded:
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+
+    if progress_callback:
+        progress_callback(1.0, f"Recorded {result['observations']} plot observations")
+    return result
+
+
+async def submit_plot_extraction_job(
+    layer_id: int,
+    organization_id: int,
+    study_id: int,
+    indices: list[str],
+    user_id: str | None = None,
+) -> str:
+    """Queue plot extraction for an orthomosaic layer and return the task id."""
+    from app.services.task_queue import TaskPriority, task_queue
+
+    return await task_queue.submit(
+        name="uav_plot_extraction",
+        func=run_plot_extraction_job,
+        kwargs={
+            "layer_id": layer_id,
+            "organization_id": organization_id,
+            "study_id": study_id,
+            "indices": indices,
+        },
+        priority=TaskPriority.LOW,
+        user_id=user_id,
+        organization_id=str(organization_id),
+    )
@@ -0,0 +1,565 @@
+"""
+Organization Counter Service
+
+Incrementally maintained per-organization aggregates for dashboards.
+
+Features:
+- Deltas computed from ORM inserts/updates/deletes on every flush and
+  upserted into ``organization_counters`` inside the same transaction
+- ``apply_bulk_deltas`` for Core ``insert()``/``delete()`` statements (the
+  import engine), fed from their RETURNING rows
+- O(1) reads for analytics and seed inventory summaries
+- Stale flag for bulk write paths that bypass the ORM unit of work
+- Full recount (reconciliation) on demand and on a periodic loop
+
+Counters are trusted only after an organization has been reconciled at
+least once and while its sentinel row is not flagged stale; callers fall
+back to ``reconcile`` (a full recount) otherwise. Concurrent requests for
+the same organization share one recount, and on PostgreSQL a per-organization
+advisory lock fences the recount against the flush hook: writers hold it
+shared from their first counter delta until commit, reconcile holds it
+exclusively, so a delta is either counted by the recount or applied after it.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Mapping
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import and_, delete, event, func, inspect, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.core import Location, Program, Study, Trial
+from app.models.germplasm import Germplasm, Seedlot
+from app.models.organization_counter import OrganizationCounter
+from app.models.phenotyping import Observation, ObservationVariable
+
+
+logger = logging.getLogger(__name__)
+
+# Sentinel row marking that an organization's counters have been reconciled
+RECONCILED_KEY = "_reconciled"
+
+LOW_STOCK_THRESHOLD_G = 100
+LOW_VIABILITY_THRESHOLD = 70
+
+_MAX_KEY_LENGTH = 255
+
+# First key of the per-organization advisory locks (PostgreSQL)
+COUNTER_LOCK_CLASS = 0x4F43
+_COUNTER_LOCK_SHARED = text("SELECT pg_advisory_xact_lock_shared(:lock_class, :org_id)")
+_COUNTER_LOCK = text("SELECT pg_advisory_xact_lock(:lock_class, :org_id)")
+
+Getter = Callable[[str], Any]
+
+
+# ============================================
+# CONTRIBUTIONS
+# ============================================
+# Each function maps one row (read through a getter) to the counter deltas it
+# contributes. Updates apply ``new - old`` so the same function serves inserts,
+# updates and deletes, and also drives Python-side reconciliation.
+
+def _simple_count(key: str) -> Callable[[Getter], dict[str, float]]:
+    def contribution(get: Getter) -> dict[str, float]:
+        return {key: 1.0}
+    return contribution
+
+
+def _active_count(key: str) -> Callable[[Getter], dict[str, float]]:
+    def contribution(get: Getter) -> dict[str, float]:
+        deltas = {key: 1.0}
+        if get("active"):
+            deltas[f"{key}.active"] = 1.0
+        return deltas
+    return contribution
+
+
+def month_key(moment: datetime) -> str:
+    """Counter key for observations created in the month of ``moment``."""
+    return f"observations.month:{moment:%Y-%m}"
+
+
+def _observation_contribution(get: Getter) -> dict[str, float]:
+    deltas = {"observations": 1.0}
+    value = get("value")
+    if value is not None and value != "":
+        deltas["observations.valid"] = 1.0
+    created_at = get("created_at")
+    if created_at is not None:
+        deltas[month_key(created_at)] = 1.0
+    return deltas
+
+
+def seedlot_contribution(get: Getter) -> dict[str, float]:
+    """Counter deltas for one seed lot (totals and summary breakdowns)."""
+    info = get("additional_info") or {}
+    quantity = float(get("count") or 0)
+    status = info.get("status", "active")
+    storage_type = info.get("storage_type", "medium_term")
+    species = info.get("species", "")
+    viability = info.get("current_viability")
+
+    deltas = {
+        "seedlots": 1.0,
+        "seedlots.quantity_g": quantity,
+        f"seedlots.status:{status}": 1.0,
+        f"seedlots.storage:{storage_type}": 1.0,
+        f"seedlots.species:{species}": 1.0,
+        f"seedlots.species_quantity_g:{species}": quantity,
+    }
+    if quantity < LOW_STOCK_THRESHOLD_G:
+        deltas["seedlots.low_stock"] = 1.0
+    if viability and viability < LOW_VIABILITY_THRESHOLD:
+        deltas["seedlots.low_viability"] = 1.0
+    return {key[:_MAX_KEY_LENGTH]: value for key, value in deltas.items()}
+
+
+CONTRIBUTIONS: dict[str, Callable[[Getter], dict[str, float]]] = {
+    Program.__tablename__: _simple_count("programs"),
+    Trial.__tablename__: _active_count("trials"),
+    Study.__tablename__: _active_count("studies"),
+    Germplasm.__tablename__: _simple_count("germplasm"),
+    Location.__tablename__: _simple_count("locations"),
+    ObservationVariable.__tablename__: _simple_count("traits"),
+    Observation.__tablename__: _observation_contribution,
+    Seedlot.__tablename__: seedlot_contribution,
+}
+
+
+def current_getter(obj: Any) -> Getter:
+    """Read attribute values as they will be after the pending flush."""
+    return lambda name: getattr(obj, name, None)
+
+
+def previous_getter(obj: Any) -> Getter:
+    """Read attribute values as they were before the pending flush."""
+    state = inspect(obj)
+
+    def get(name: str) -> Any:
+        if name not in state.attrs.keys():
+            return None
+        history = state.attrs[name].history
+        if history.deleted:
+            return history.deleted[0]
+        if history.unchanged:
+            return history.unchanged[0]
+        # Set without the prior value being loaded; reconciliation corrects any drift
+        return None
+
+    return get
+
+
+def _accumulate(
+    totals: dict[tuple[int, str], float],
+    org_id: int | None,
+    contribution: dict[str, float],
+    sign: float,
+) -> None:
+    if org_id is None:
+        return
+    for key, value in contribution.items():
+        totals[(org_id, key)] += sign * value
+
+
+def collect_flush_deltas(session: Session) -> dict[tuple[int, str], float]:
+    """Compute counter deltas for the objects pending in ``session``'s flush."""
+    totals: dict[tuple[int, str], float] = defaultdict(float)
+
+    for obj in session.new:
+        contribution = CONTRIBUTIONS.get(getattr(obj, "__tablename__", None))
+        if contribution is not None:
+            get = current_getter(obj)
+            _accumulate(totals, get("organization_id"), contribution(get), 1.0)
+
+    for obj in session.deleted:
+        contribution = CONTRIBUTIONS.get(getattr(obj, "__tablename__", None))
+        if contribution is not None:
+            get = previous_getter(obj)
+            _accumulate(totals, get("organization_id"), contribution(get), -1.0)
+
+    for obj in session.dirty:
+        contribution = CONTRIBUTIONS.get(getattr(obj, "__tablename__", None))
+        if contribution is None or not session.is_modified(obj, include_collections=False):
+            continue
+        old, new = previous_getter(obj), current_getter(obj)
+        _accumulate(totals, old("organization_id"), contribution(old), -1.0)
+        _accumulate(totals, new("organization_id"), contribution(new), 1.0)
+
+    return {key: delta for key, delta in totals.items() if delta}
+
+
+def collect_row_deltas(
+    table_name: str, rows: Iterable[Mapping[str, Any]], sign: float = 1.0
+) -> dict[tuple[int, str], float]:
+    """Counter deltas for rows of ``table_name`` inserted (``sign=1``) or deleted (``-1``)."""
+    contribution = CONTRIBUTIONS.get(table_name)
+    if contribution is None:
+        return {}
+    totals: dict[tuple[int, str], float] = defaultdict(float)
+    for row in rows:
+        _accumulate(totals, row.get("organization_id"), contribution(row.get), sign)
+    return {key: delta for key, delta in totals.items() if delta}
+
+
+def tracks_table(table_name: str) -> bool:
+    """Whether rows of ``table_name`` contribute to any counter."""
+    return table_name in CONTRIBUTIONS
+
+
+async def apply_bulk_deltas(
+    db: AsyncSession, table_name: str, rows: Iterable[Mapping[str, Any]], sign: float = 1.0
+) -> None:
+    """
+    Keep counters in step with a Core statement that bypassed the flush hook.
+
+    ``rows`` are the statement's RETURNING rows and must carry the columns the
+    table's contribution reads (returning the whole table is simplest).
+    """
+    deltas = collect_row_deltas(table_name, rows, sign)
+    if deltas:
+        await db.run_sync(lambda session: apply_deltas(session.connection(), deltas))
+
+
+def _dialect_insert(dialect_name: str):
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    return None
+
+
+def _upsert_statement(dialect_name: str, org_id: int, key: str, delta: float):
+    table = OrganizationCounter.__table__
+    now = datetime.now(UTC)
+    insert = _dialect_insert(dialect_name)
+    if insert is None:
+        return None
+    stmt = insert(table).values(
+        organization_id=org_id,
+        counter_key=key,
+        value=delta,
+        is_stale=False,
+        created_at=now,
+        updated_at=now,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.organization_id, table.c.counter_key],
+        set_={"value": table.c.value + stmt.excluded.value, "updated_at": now},
+    )
+
+
+def apply_deltas(connection, deltas: dict[tuple[int, str], float]) -> None:
+    """Apply counter deltas on ``connection`` (sync) inside the caller's transaction."""
+    table = OrganizationCounter.__table__
+    dialect_name = connection.dialect.name
+    now = datetime.now(UTC)
+
+    if dialect_name == "postgresql":
+        # Held until commit, so a concurrent reconcile waits for these deltas
+        for org_id in sorted({org_id for org_id, _ in deltas}):
+            connection.execute(_COUNTER_LOCK_SHARED, {"lock_class": COUNTER_LOCK_CLASS, "org_id": org_id})
+
+    for (org_id, key), delta in sorted(deltas.items()):
+        stmt = _upsert_statement(dialect_name, org_id, key, delta)
+        if stmt is not None:
+            connection.execute(stmt)
+            continue
+
+        # Portable fallback: update, then insert when the row is missing
+        result = connection.execute(
+            update(table)
+            .where(and_(table.c.organization_id == org_id, table.c.counter_key == key))
+            .values(value=table.c.value + delta, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(
+                table.insert().values(
+                    organization_id=org_id,
+                    counter_key=key,
+                    value=delta,
+                    is_stale=False,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    deltas = collect_flush_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def register_counter_hooks() -> None:
+    """Attach the flush hook that keeps counters in step with ORM writes (idempotent)."""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+
+
+def unregister_counter_hooks() -> None:
+    """Detach the flush hook."""
+    if event.contains(Session, "after_flush", _after_flush):
+        event.remove(Session, "after_flush", _after_flush)
+
+
+def stale_counters_statement(organization_id: int | None = None):
+    """
+    UPDATE flagging counters stale, for one organization or all of them.
+
+    Sync sessions (seeders, scripts) execute it directly; async callers use
+    ``OrganizationCounterService.mark_stale``.
+    """
+    table = OrganizationCounter.__table__
+    stmt = update(table).where(table.c.counter_key == RECONCILED_KEY)
+    if organization_id is not None:
+        stmt = stmt.where(table.c.organization_id == organization_id)
+    return stmt.values(is_stale=True, updated_at=datetime.now(UTC))
+
+
+class OrganizationCounterService:
+    """
+    Read, invalidate and reconcile per-organization counters
+    """
+
+    def __init__(self):
+        # Recounts running in this process, shared by concurrent readers
+        self._reconciling: dict[int, asyncio.Future] = {}
+
+    async def get_counters(self, db: AsyncSession, organization_id: int) -> dict[str, float] | None:
+        """
+        Return all counters for an organization, or None when they cannot be trusted
+        (never reconciled, or flagged stale).
+        """
+        result = await db.execute(
+            select(
+                OrganizationCounter.counter_key,
+                OrganizationCounter.value,
+                OrganizationCounter.is_stale,
+            ).where(OrganizationCounter.organization_id == organization_id)
+        )
+        rows = result.all()
+
+        counters: dict[str, float] = {}
+        reconciled = False
+        for key, value, is_stale in rows:
+            if key == RECONCILED_KEY:
+                if is_stale:
+                    return None
+                reconciled = True
+                continue
+            counters[key] = value or 0.0
+
+        return counters if reconciled else None
+
+    async def get_or_reconcile(self, db: AsyncSession, organization_id: int) -> dict[str, float]:
+        """
+        Return trusted counters, recounting first when they are stale or missing.
+
+        Only one recount per organization runs at a time: callers in this
+        process wait for the one in flight, and on PostgreSQL callers in other
+        processes wait on the advisory lock and then read its result.
+        """
+        counters = await self.get_counters(db, organization_id)
+        if counters is not None:
+            return counters
+
+        pending = self._reconciling.get(organization_id)
+        if pending is not None:
+            return dict(await asyncio.shield(pending))
+
+        pending = asyncio.get_running_loop().create_future()
+        self._reconciling[organization_id] = pending
+        try:
+            if await self._lock(db, organization_id):
+                counters = await self.get_counters(db, organization_id)
+            if counters is None:
+                counters = await self.reconcile(db, organization_id)
+            pending.set_result(counters)
+            return counters
+        except BaseException as e:
+            pending.set_exception(e)
+            pending.exception()  # followers re-raise it; nobody else needs to
+            raise
+        finally:
+            del self._reconciling[organization_id]
+
+    async def _lock(self, db: AsyncSession, organization_id: int) -> bool:
+        """Take the organization's counter lock until the transaction ends (PostgreSQL only)."""
+        if (await db.connection()).dialect.name != "postgresql":
+            return False
+        await db.execute(_COUNTER_LOCK, {"lock_class": COUNTER_LOCK_CLASS, "org_id": organization_id})
+        return True
+
+    async def mark_stale(self, db: AsyncSession, organization_id: int | None = None) -> None:
+        """
+        Flag an organization's counters (all organizations' when None) as untrustworthy.
+
+        Call after bulk writes that bypass the ORM unit of work
+        (``insert()``/``delete()`` statements, COPY, raw SQL).
+        """
+        result = await db.execute(stale_counters_statement(organization_id))
+        if result.rowcount:
+            logger.info("Counters for organization %s marked stale", organization_id or "*")
+
+    async def recount(self, db: AsyncSession, organization_id: int) -> dict[str, float]:
+        """Compute every counter for an organization from the source tables."""
+        now = datetime.now(UTC)
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        def count(model, *conditions):
+            return (
+                select(func.count(model.id))
+                .where(model.organization_id == organization_id, *conditions)
+                .scalar_subquery()
+            )
+
+        row = (await db.execute(select(
+            count(Program),
+            count(Trial),
+            count(Trial, Trial.active),
+            count(Study),
+            count(Study, Study.active),
+            count(Germplasm),
+            count(Location),
+            count(ObservationVariable),
+            count(Observation),
+            count(Observation, Observation.value.isnot(None), Observation.value != ""),
+            count(Observation, Observation.created_at >= month_start),
+        ))).one()
+
+        counters: dict[str, float] = {
+            "programs": row[0] or 0,
+            "trials": row[1] or 0,
+            "trials.active": row[2] or 0,
+            "studies": row[3] or 0,
+            "studies.active": row[4] or 0,
+            "germplasm": row[5] or 0,
+            "locations": row[6] or 0,
+            "traits": row[7] or 0,
+            "observations": row[8] or 0,
+            "observations.valid": row[9] or 0,
+            month_key(now): row[10] or 0,
+        }
+
+        # Seed lot breakdowns live in JSON, so fold them in Python
+        seedlot_totals: dict[str, float] = defaultdict(float)
+        seedlot_rows = await db.stream(
+            select(Seedlot.count, Seedlot.additional_info)
+            .where(Seedlot.organization_id == organization_id)
+            .execution_options(yield_per=1000)
+        )
+        async for lot_count, additional_info in seedlot_rows:
+            values = {"count": lot_count, "additional_info": additional_info}
+            for key, value in seedlot_contribution(values.get).items():
+                seedlot_totals[key] += value
+        counters.update(seedlot_totals)
+
+        return counters
+
+    async def reconcile(self, db: AsyncSession, organization_id: int) -> dict[str, float]:
+        """
+        Replace an organization's counters with a full recount and clear the stale flag.
+
+        Earlier months' observation counters are dropped; only the current month is kept.
+        Rows are upserted rather than deleted and re-inserted, so concurrent reconciles
+        of the same organization do not collide on the unique key. On PostgreSQL the
+        organization's counter lock is held from before the recount until commit.
+        """
+        await self._lock(db, organization_id)
+        counters = await self.recount(db, organization_id)
+        now = datetime.now(UTC)
+
+        table = OrganizationCounter.__table__
+        of_org = table.c.organization_id == organization_id
+        rows = [
+            {
+                "organization_id": organization_id,
+                "counter_key": key,
+                "value": float(value),
+                "is_stale": False,
+                "reconciled_at": now if key == RECONCILED_KEY else None,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for key, value in {**counters, RECONCILED_KEY: 0.0}.items()
+        ]
+
+        insert = _dialect_insert((await db.connection()).dialect.name)
+        if insert is None:
+            # No upsert on this backend: serialize reconciles on the organization's rows
+            await db.execute(select(table.c.id).where(of_org).with_for_update())
+            await db.execute(delete(table).where(of_org))
+            await db.execute(table.insert(), rows)
+        else:
+            stmt = insert(table)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[table.c.organization_id, table.c.counter_key],
+                    set_={
+                        "value": stmt.excluded.value,
+                        "is_stale": False,
+                        "reconciled_at": stmt.excluded.reconciled_at,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                ),
+                rows,
+            )
+            # Drop keys the recount no longer produces (earlier months)
+            keys = [row["counter_key"] for row in rows]
+            await db.execute(delete(table).where(of_org, table.c.counter_key.not_in(keys)))
+        await db.flush()
+
+        logger.info("Reconciled %d counters for organization %s", len(counters), organization_id)
+        return counters
+
+    async def reconcile_all(self, db: AsyncSession) -> int:
+        """Reconcile every organization that has data in any counted table."""
+        org_ids: set[int] = set()
+        for model in (Program, Germplasm, Observation, Seedlot, Trial, Study):
+            result = await db.execute(select(model.organization_id).distinct())
+            org_ids.update(org_id for org_id in result.scalars() if org_id is not None)
+
+        for org_id in sorted(org_ids):
+            await self.reconcile(db, org_id)
+        return len(org_ids)
+
+
+organization_counter_service = OrganizationCounterService()
+
+
+def get_organization_counter_service() -> OrganizationCounterService:
+    return organization_counter_service
+
+
+async def run_counter_reconciliation_loop(interval_seconds: int = 3600):
+    """
+    Background task to periodically reconcile counters against full recounts
+
+    Usage:
+        # In lifespan
+        asyncio.create_task(run_counter_reconciliation_loop())
+    """
+    from app.core.database import AsyncSessionLocal
+    from app.core.rls import set_tenant_context
+
+    logger.info("[OrganizationCounters] Starting reconciliation loop")
+
+    while True:
+        try:
+            await asyncio.sleep(interval_seconds)
+            async with AsyncSessionLocal() as db:
+                if db.bind.dialect.name == "postgresql":
+                    await set_tenant_context(db, None, is_superuser=True)
+                reconciled = await organization_counter_service.reconcile_all(db)
+                await db.commit()
+            logger.info("[OrganizationCounters] Reconciled %d organizations", reconciled)
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"[OrganizationCounters] Error in reconciliation loop: {e}")
+            await asyncio.sleep(60)
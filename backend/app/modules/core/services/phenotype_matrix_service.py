@@ -0,0 +1,394 @@
+"""
+Phenotype Matrix Service
+Columnar genotype × environment × trait extract shared by the analytics engines
+
+Observations for a (study set, trait set) are streamed once, in chunks, into
+flat NumPy columns (genotype, environment, trait codes and the numeric value)
+and pivoted with bincount into replicate means and counts per cell. Analyses
+read the same in-memory matrix instead of each running its own ORM join:
+
+- ``trait_matrix`` — dense genotype × environment view of one trait
+- ``sparse_trait_matrix`` — CSR matrix of observed cells only
+- ``observations`` — plot-level long form for ANOVA / variance components
+- ``to_arrow`` — long-form Arrow table (when pyarrow is installed)
+
+Environments are studies. Matrices are cached per (organisation, studies,
+traits) and revalidated against a cheap data-version fingerprint of the
+studies' observations on every access.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import Study
+from app.models.germplasm import Germplasm
+from app.models.phenotyping import Observation, ObservationVariable
+
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_ROWS = 50_000
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+# Dense G × E × T cubes above this many cells are refused; use the sparse views
+MAX_DENSE_CELLS = 50_000_000
+
+
+def _ranked_codes(ids: np.ndarray, labels: dict[int, str]) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """Integer codes for ``ids`` ordered by label (then id), with the ordered ids and labels."""
+    unique, codes = np.unique(ids, return_inverse=True)
+    names = [labels.get(int(i)) or str(int(i)) for i in unique]
+    order = sorted(range(len(unique)), key=lambda k: (names[k], int(unique[k])))
+    rank = np.empty(len(unique), dtype=np.int32)
+    rank[order] = np.arange(len(unique), dtype=np.int32)
+    return rank[codes], unique[order], [names[k] for k in order]
+
+
+@dataclass
+class PhenotypeMatrix:
+    """
+    Observations pivoted to genotype × environment × trait.
+
+    Plot-level columns (``genotype_codes``, ``environment_codes``,
+    ``trait_codes``, ``values``) index into the label arrays. Per-cell
+    replicate sums and counts are kept only for observed cells; ``cube``
+    expands them to dense arrays on first use.
+    """
+    genotype_ids: np.ndarray
+    genotype_names: list[str]
+    environment_ids: np.ndarray
+    environment_names: list[str]
+    trait_ids: np.ndarray
+    trait_names: list[str]
+    genotype_codes: np.ndarray
+    environment_codes: np.ndarray
+    trait_codes: np.ndarray
+    values: np.ndarray
+    version: Any = None
+    _cell_index: np.ndarray = field(init=False, repr=False)
+    _cell_sums: np.ndarray = field(init=False, repr=False)
+    _cell_counts: np.ndarray = field(init=False, repr=False)
+    _cube: tuple[np.ndarray, np.ndarray] | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        flat = self._flat_index(self.genotype_codes, self.environment_codes, self.trait_codes)
+        self._cell_index, inverse = np.unique(flat, return_inverse=True)
+        self._cell_sums = np.bincount(inverse, weights=self.values, minlength=len(self._cell_index))
+        self._cell_counts = np.bincount(inverse, minlength=len(self._cell_index)).astype(np.int32)
+
+    @classmethod
+    def from_columns(
+        cls,
+        germplasm_ids: np.ndarray,
+        study_ids: np.ndarray,
+        variable_ids: np.ndarray,
+        values: np.ndarray,
+        genotype_labels: dict[int, str] | None = None,
+        environment_labels: dict[int, str] | None = None,
+        trait_labels: dict[int, str] | None = None,
+        version: Any = None,
+    ) -> PhenotypeMatrix:
+        """Build from raw id/value columns; labels order the axes (ids when unlabelled)."""
+        values = np.asarray(values, dtype=np.float64)
+        keep = np.isfinite(values)
+        g_codes, g_ids, g_names = _ranked_codes(np.asarray(germplasm_ids)[keep], genotype_labels or {})
+        e_codes, e_ids, e_names = _ranked_codes(np.asarray(study_ids)[keep], environment_labels or {})
+        t_codes, t_ids, t_names = _ranked_codes(np.asarray(variable_ids)[keep], trait_labels or {})
+        return cls(
+            genotype_ids=g_ids,
+            genotype_names=g_names,
+            environment_ids=e_ids,
+            environment_names=e_names,
+            trait_ids=t_ids,
+            trait_names=t_names,
+            genotype_codes=g_codes,
+            environment_codes=e_codes,
+            trait_codes=t_codes,
+            values=values[keep],
+            version=version,
+        )
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return len(self.genotype_names), len(self.environment_names), len(self.trait_names)
+
+    @property
+    def n_observations(self) -> int:
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [
+            self.genotype_codes, self.environment_codes, self.trait_codes, self.values,
+            self._cell_index, self._cell_sums, self._cell_counts,
+        ]
+        if self._cube is not None:
+            arrays.extend(self._cube)
+        return sum(a.nbytes for a in arrays)
+
+    def _flat_index(self, g: np.ndarray, e: np.ndarray, t: np.ndarray) -> np.ndarray:
+        n_env, n_traits = len(self.environment_names), len(self.trait_names)
+        return (g.astype(np.int64) * n_env + e) * n_traits + t
+
+    def _cell_coordinates(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n_env, n_traits = len(self.environment_names), len(self.trait_names)
+        ge, t = np.divmod(self._cell_index, n_traits)
+        g, e = np.divmod(ge, n_env)
+        return g, e, t
+
+    def trait_index(self, trait: int | str | None = None) -> int:
+        """Axis position of a trait given its variable id or name (None for a single-trait matrix)."""
+        if trait is None:
+            if len(self.trait_names) != 1:
+                raise ValueError(f"Matrix holds {len(self.trait_names)} traits; name one")
+            return 0
+        if isinstance(trait, str):
+            if trait not in self.trait_names:
+                raise KeyError(f"Trait {trait!r} not in matrix")
+            return self.trait_names.index(trait)
+        matches = np.flatnonzero(self.trait_ids == trait)
+        if not len(matches):
+            raise KeyError(f"Trait {trait!r} not in matrix")
+        return int(matches[0])
+
+    def cube(self) -> tuple[np.ndarray, np.ndarray]:
+        """Dense (means, counts) arrays of shape G × E × T; built once, then shared."""
+        if self._cube is None:
+            n_cells = int(np.prod(self.shape))
+            if n_cells > MAX_DENSE_CELLS:
+                raise ValueError(
+                    f"Dense matrix would have {n_cells} cells (max {MAX_DENSE_CELLS}); use sparse_trait_matrix"
+                )
+            means = np.full(n_cells, np.nan)
+            counts = np.zeros(n_cells, dtype=np.int32)
+            means[self._cell_index] = self._cell_sums / self._cell_counts
+            counts[self._cell_index] = self._cell_counts
+            self._cube = means.reshape(self.shape), counts.reshape(self.shape)
+        return self._cube
+
+    def trait_matrix(self, trait: int | str | None = None, impute: str | None = None) -> np.ndarray:
+        """
+        Genotype × environment cell means for one trait (NaN when unobserved).
+
+        The result is a view into the shared cube unless ``impute`` is given:
+        "genotype_mean" fills gaps with the genotype's mean over observed
+        environments (0 when it has none).
+        """
+        means = self.cube()[0][:, :, self.trait_index(trait)]
+        if impute is None:
+            return means
+        if impute != "genotype_mean":
+            raise ValueError(f"Unknown imputation: {impute}")
+        missing = np.isnan(means)
+        observed = (~missing).sum(axis=1)
+        row_means = np.divide(
+            np.where(missing, 0.0, means).sum(axis=1), observed,
+            out=np.zeros(len(means)), where=observed > 0,
+        )
+        return np.where(missing, row_means[:, None], means)
+
+    def sparse_trait_matrix(self, trait: int | str | None = None) -> sparse.csr_array:
+        """Observed genotype × environment cell means for one trait as CSR (no dense cube)."""
+        t_index = self.trait_index(trait)
+        g, e, t = self._cell_coordinates()
+        selected = t == t_index
+        means = self._cell_sums[selected] / self._cell_counts[selected]
+        return sparse.csr_array((means, (g[selected], e[selected])), shape=self.shape[:2])
+
+    def observations(self, trait: int | str | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Plot-level (genotype codes, environment codes, values) for one trait."""
+        selected = self.trait_codes == self.trait_index(trait)
+        return self.genotype_codes[selected], self.environment_codes[selected], self.values[selected]
+
+    def to_arrow(self) -> pa.Table:
+        """Plot-level long form with dictionary-encoded labels."""
+        if not ARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is not installed")
+
+        def labelled(codes: np.ndarray, names: list[str]) -> pa.DictionaryArray:
+            return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), pa.array(names, type=pa.string()))
+
+        return pa.table({
+            "genotype": labelled(self.genotype_codes, self.genotype_names),
+            "environment": labelled(self.environment_codes, self.environment_names),
+            "trait": labelled(self.trait_codes, self.trait_names),
+            "value": pa.array(self.values),
+        })
+
+
+class PhenotypeMatrixService:
+    """Loads and caches phenotype matrices for (organisation, studies, traits)."""
+
+    def __init__(self, max_cache_bytes: int = MAX_CACHE_BYTES):
+        self.max_cache_bytes = max_cache_bytes
+        self._cache: OrderedDict[tuple, PhenotypeMatrix] = OrderedDict()
+        self._locks: dict[tuple, asyncio.Lock] = {}
+
+    def _filters(self, organization_id: int | None, study_ids: Sequence[int], trait_ids: Sequence[int]) -> list:
+        filters = [
+            Observation.observation_variable_id.in_(trait_ids),
+            Observation.study_id.in_(study_ids),
+            Observation.germplasm_id.isnot(None),
+            Observation.value_numeric.isnot(None),
+        ]
+        if organization_id is not None:
+            filters.append(Observation.organization_id == organization_id)
+        return filters
+
+    async def resolve_ids(
+        self,
+        db: AsyncSession,
+        study_db_ids: Iterable[str],
+        trait_db_ids: Iterable[str],
+        organization_id: int | None = None,
+    ) -> tuple[list[int], list[int]]:
+        """Internal study and observation-variable ids for their BrAPI DbIds."""
+        studies = select(Study.id).where(Study.study_db_id.in_(list(study_db_ids)))
+        traits = select(ObservationVariable.id).where(
+            ObservationVariable.observation_variable_db_id.in_(list(trait_db_ids))
+        )
+        if organization_id is not None:
+            studies = studies.where(Study.organization_id == organization_id)
+            traits = traits.where(ObservationVariable.organization_id == organization_id)
+        study_ids = (await db.execute(studies)).scalars().all()
+        trait_ids = (await db.execute(traits)).scalars().all()
+        return sorted(study_ids), sorted(trait_ids)
+
+    async def data_version(
+        self,
+        db: AsyncSession,
+        organization_id: int | None,
+        study_ids: Sequence[int],
+        trait_ids: Sequence[int],
+    ) -> tuple:
+        """
+        Fingerprint of the inputs: observation count and last write for the
+        (studies, traits) slice, plus the label tables' last updates.
+        """
+        observations = select(Observation.id, Observation.updated_at).where(
+            *self._filters(organization_id, study_ids, trait_ids)
+        ).subquery()
+        germplasm = select(func.max(Germplasm.updated_at))
+        if organization_id is not None:
+            germplasm = germplasm.where(Germplasm.organization_id == organization_id)
+        row = (
+            await db.execute(
+                select(
+                    func.count(observations.c.id),
+                    func.max(observations.c.updated_at),
+                    select(func.max(Study.updated_at)).where(Study.id.in_(study_ids)).scalar_subquery(),
+                    select(func.max(ObservationVariable.updated_at))
+                    .where(ObservationVariable.id.in_(trait_ids))
+                    .scalar_subquery(),
+                    germplasm.scalar_subquery(),
+                )
+            )
+        ).one()
+        return tuple(row)
+
+    async def _load(
+        self,
+        db: AsyncSession,
+        organization_id: int | None,
+        study_ids: Sequence[int],
+        trait_ids: Sequence[int],
+        version: tuple,
+    ) -> PhenotypeMatrix:
+        stmt = (
+            select(
+                Observation.germplasm_id,
+                Observation.study_id,
+                Observation.observation_variable_id,
+                Observation.value_numeric,
+            )
+            .where(*self._filters(organization_id, study_ids, trait_ids))
+            .execution_options(yield_per=STREAM_CHUNK_ROWS)
+        )
+        chunks: list[np.ndarray] = []
+        result = await db.stream(stmt)
+        async for partition in result.partitions(STREAM_CHUNK_ROWS):
+            chunks.append(np.array(partition, dtype=np.float64).reshape(-1, 4))
+        columns = np.concatenate(chunks) if chunks else np.empty((0, 4))
+        ids = columns[:, :3].astype(np.int64)
+
+        genotype_labels = await self._labels(db, Germplasm.id, Germplasm.germplasm_name, np.unique(ids[:, 0]))
+        environment_labels = await self._labels(db, Study.id, Study.study_name, study_ids)
+        trait_labels = await self._labels(
+            db, ObservationVariable.id, ObservationVariable.observation_variable_name, trait_ids
+        )
+        return await asyncio.to_thread(
+            PhenotypeMatrix.from_columns,
+            ids[:, 0], ids[:, 1], ids[:, 2], columns[:, 3],
+            genotype_labels, environment_labels, trait_labels, version,
+        )
+
+    async def _labels(self, db: AsyncSession, id_column, name_column, ids: Iterable[int]) -> dict[int, str]:
+        ids = [int(i) for i in ids]
+        labels: dict[int, str] = {}
+        for start in range(0, len(ids), STREAM_CHUNK_ROWS):
+            batch = ids[start:start + STREAM_CHUNK_ROWS]
+            rows = await db.execute(select(id_column, name_column).where(id_column.in_(batch)))
+            labels.update({row[0]: row[1] for row in rows})
+        return labels
+
+    async def get_matrix(
+        self,
+        db: AsyncSession,
+        study_ids: Iterable[int],
+        trait_ids: Iterable[int],
+        organization_id: int | None = None,
+    ) -> PhenotypeMatrix:
+        """Matrix for the given studies and traits, reusing the cached one while its version holds."""
+        study_ids = sorted({int(s) for s in study_ids})
+        trait_ids = sorted({int(t) for t in trait_ids})
+        key = (organization_id, tuple(study_ids), tuple(trait_ids))
+        version = await self.data_version(db, organization_id, study_ids, trait_ids)
+
+        matrix = self._cache.get(key)
+        if matrix is not None and matrix.version == version:
+            self._cache.move_to_end(key)
+            return matrix
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            matrix = self._cache.get(key)
+            if matrix is None or matrix.version != version:
+                matrix = await self._load(db, organization_id, study_ids, trait_ids, version)
+                self._store(key, matrix)
+        return matrix
+
+    def _store(self, key: tuple, matrix: PhenotypeMatrix) -> None:
+        self._cache[key] = matrix
+        self._cache.move_to_end(key)
+        total = sum(m.nbytes for m in self._cache.values())
+        while total > self.max_cache_bytes and len(self._cache) > 1:
+            evicted_key, evicted = self._cache.popitem(last=False)
+            self._locks.pop(evicted_key, None)
+            total -= evicted.nbytes
+
+    def invalidate(self, organization_id: int | None = None) -> None:
+        if organization_id is None:
+            self._cache.clear()
+        else:
+            for key in [k for k in self._cache if k[0] == organization_id]:
+                del self._cache[key]
+
+
+phenotype_matrix_service = PhenotypeMatrixService()
@@ -0,0 +1,890 @@
+"""
+Phenotype QC Service
+Ingest-time quality control of trait values
+
+Each import or Field Book sync batch is scored in one vectorised pass against
+running per (study, trait) statistics:
+- not_numeric       text recorded for a numeric trait
+- out_of_scale      outside the variable's scale range (valid_values / Scale)
+- invalid_category  not one of the scale's categories
+- robust_outlier    robust z = |x - median| / (1.4826 * MAD) above 3.5
+                    (high severity above 7), once the trait has enough values
+
+Statistics live in phenotype_qc_statistics: exact n / min / max / Σx / Σx²
+plus a mergeable log-bucket quantile sketch for the median and MAD, so a
+batch only touches the rows of the traits it carries. Flags are persisted to
+phenotype_qc_issues, which the data quality dashboard reads.
+
+Sketches cannot forget values, so edits and deletes after ingest drift the
+statistics until the organisation is re-scored (run_rescore_job, submitted
+through the task queue).
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.field_operations import (
+    FieldBookEntry,
+    FieldBookObservation,
+    FieldBookStudy,
+    FieldBookTrait,
+)
+from app.models.phenotyping import (
+    Observation,
+    ObservationVariable,
+    PhenotypeQCIssue,
+    PhenotypeQCStatistic,
+)
+from app.modules.core.services.data_quality import IssueSeverity, IssueStatus, IssueType
+
+
+logger = logging.getLogger(__name__)
+
+# Robust z-score thresholds (Iglewicz & Hoaglin modified z)
+OUTLIER_Z = 3.5
+OUTLIER_Z_HIGH = 7.0
+# Values a trait needs within a study before the outlier rule applies
+MIN_VALUES_FOR_OUTLIERS = 10
+MAD_TO_SD = 1.4826
+RESCORE_CHUNK_SIZE = 5000
+
+NUMERIC_DATA_TYPES = {"numerical", "numeric", "integer", "float", "decimal", "duration"}
+CATEGORICAL_DATA_TYPES = {"ordinal", "nominal", "categorical", "code"}
+
+# (study_id, observation_variable_id)
+StatisticKey = tuple[int, int]
+
+
+# ============================================
+# QUANTILE SKETCH
+# ============================================
+
+class QuantileSketch:
+    """
+    Mergeable log-bucket quantile sketch (DDSketch).
+
+    Values fall in buckets whose bounds grow by gamma = (1 + α) / (1 - α), so
+    every quantile is returned within relative error α. Merging adds bucket
+    counts, which makes per-batch sketches cheap to fold into the stored one.
+    """
+
+    def __init__(self, alpha: float = 0.001, max_buckets: int = 2048):
+        self.alpha = alpha
+        self.max_buckets = max_buckets
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self.positive: dict[int, int] = {}
+        self.negative: dict[int, int] = {}
+        self.zero = 0
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.positive.values()) + sum(self.negative.values())
+
+    def add(self, values: np.ndarray) -> QuantileSketch:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        magnitude = np.abs(values)
+        is_zero = magnitude < 1e-12
+        self.zero += int(is_zero.sum())
+        for store, mask in ((self.positive, (values > 0) & ~is_zero), (self.negative, (values < 0) & ~is_zero)):
+            if mask.any():
+                keys, counts = np.unique(np.ceil(np.log(magnitude[mask]) / self._log_gamma), return_counts=True)
+                for key, count in zip(keys.astype(np.int64).tolist(), counts.tolist()):
+                    store[key] = store.get(key, 0) + count
+        self._collapse()
+        return self
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        if not math.isclose(self.alpha, other.alpha):
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for store, incoming in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in incoming.items():
+                store[key] = store.get(key, 0) + count
+        self.zero += other.zero
+        self._collapse()
+        return self
+
+    def _collapse(self) -> None:
+        """Fold the smallest-magnitude buckets together once a store exceeds max_buckets."""
+        for store in (self.positive, self.negative):
+            if len(store) > self.max_buckets:
+                keys = sorted(store)
+                cut = keys[len(keys) - self.max_buckets]
+                folded = sum(store.pop(key) for key in keys[: len(keys) - self.max_buckets])
+                store[cut] += folded
+
+    def _buckets(self) -> tuple[np.ndarray, np.ndarray]:
+        """Representative values (ascending) and their counts."""
+        gamma = math.exp(self._log_gamma)
+        neg_keys = sorted(self.negative, reverse=True)
+        pos_keys = sorted(self.positive)
+        keys = np.array(neg_keys + pos_keys, dtype=np.float64)
+        values = 2 * np.exp(keys * self._log_gamma) / (gamma + 1)
+        values[: len(neg_keys)] *= -1
+        counts = np.array([self.negative[k] for k in neg_keys] + [self.positive[k] for k in pos_keys], dtype=np.int64)
+        if self.zero:
+            at = len(neg_keys)
+            values = np.insert(values, at, 0.0)
+            counts = np.insert(counts, at, self.zero)
+        return values, counts
+
+    @staticmethod
+    def _weighted_quantile(values: np.ndarray, counts: np.ndarray, q: float) -> float:
+        cumulative = np.cumsum(counts)
+        rank = q * (cumulative[-1] - 1)
+        return float(values[np.searchsorted(cumulative, rank, side="right")])
+
+    def quantile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        values, counts = self._buckets()
+        return self._weighted_quantile(values, counts, q)
+
+    def median(self) -> float | None:
+        return self.quantile(0.5)
+
+    def mad(self) -> float | None:
+        """Median absolute deviation from the median."""
+        if self.count == 0:
+            return None
+        values, counts = self._buckets()
+        deviation = np.abs(values - self._weighted_quantile(values, counts, 0.5))
+        order = np.argsort(deviation, kind="stable")
+        return self._weighted_quantile(deviation[order], counts[order], 0.5)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "alpha": self.alpha,
+            "zero": self.zero,
+            "positive": sorted(self.positive.items()),
+            "negative": sorted(self.negative.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> QuantileSketch:
+        if not data:
+            return cls()
+        sketch = cls(alpha=data.get("alpha", 0.001))
+        sketch.zero = int(data.get("zero", 0))
+        sketch.positive = {int(k): int(c) for k, c in data.get("positive", [])}
+        sketch.negative = {int(k): int(c) for k, c in data.get("negative", [])}
+        return sketch
+
+
+# ============================================
+# SCALES AND STATISTICS
+# ============================================
+
+@dataclass(frozen=True)
+class TraitScale:
+    """What a trait's scale allows: numeric range and/or categories."""
+
+    data_type: str | None = None
+    min_value: float | None = None
+    max_value: float | None = None
+    categories: frozenset[str] = frozenset()
+
+    @property
+    def is_numeric(self) -> bool:
+        kind = (self.data_type or "").lower()
+        if kind in NUMERIC_DATA_TYPES:
+            return True
+        return not kind and (self.min_value is not None or self.max_value is not None)
+
+    @property
+    def is_categorical(self) -> bool:
+        return bool(self.categories) and (self.data_type or "").lower() in CATEGORICAL_DATA_TYPES | {""}
+
+    @property
+    def accepts_numbers(self) -> bool:
+        """Whether numeric values feed statistics (declared numeric, or untyped)."""
+        return self.is_numeric or not (self.is_categorical or (self.data_type or "").lower() in {"text", "date"})
+
+    def in_scale(self, values: np.ndarray) -> np.ndarray:
+        low = -np.inf if self.min_value is None else self.min_value
+        high = np.inf if self.max_value is None else self.max_value
+        return (values >= low) & (values <= high)
+
+    @classmethod
+    def from_valid_values(
+        cls,
+        data_type: str | None,
+        min_value: Any = None,
+        max_value: Any = None,
+        categories: Sequence[Any] | None = None,
+    ) -> TraitScale:
+        labels: set[str] = set()
+        for category in categories or []:
+            # BrAPI categories are {label, value}; Field Book stores plain strings
+            if isinstance(category, dict):
+                labels.update(str(category[k]) for k in ("value", "label") if category.get(k) is not None)
+            else:
+                labels.add(str(category))
+        return cls(
+            data_type=data_type,
+            min_value=float(min_value) if min_value is not None else None,
+            max_value=float(max_value) if max_value is not None else None,
+            categories=frozenset(labels),
+        )
+
+
+@dataclass
+class TraitStatistics:
+    """Running statistics of one trait in one study."""
+
+    n: int = 0
+    min_value: float | None = None
+    max_value: float | None = None
+    sum_x: float = 0.0
+    sum_x2: float = 0.0
+    sketch: QuantileSketch | None = None
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> TraitStatistics:
+        if values.size == 0:
+            return cls(sketch=QuantileSketch())
+        return cls(
+            n=int(values.size),
+            min_value=float(values.min()),
+            max_value=float(values.max()),
+            sum_x=float(values.sum()),
+            sum_x2=float(np.dot(values, values)),
+            sketch=QuantileSketch().add(values),
+        )
+
+    @classmethod
+    def from_row(cls, row: PhenotypeQCStatistic) -> TraitStatistics:
+        return cls(
+            n=row.n or 0,
+            min_value=row.min_value,
+            max_value=row.max_value,
+            sum_x=row.sum_x or 0.0,
+            sum_x2=row.sum_x2 or 0.0,
+            sketch=QuantileSketch.from_dict(row.sketch),
+        )
+
+    def merge(self, other: TraitStatistics) -> TraitStatistics:
+        if other.n == 0:
+            return self
+        self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+        self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+        self.n += other.n
+        self.sum_x += other.sum_x
+        self.sum_x2 += other.sum_x2
+        self.sketch = (self.sketch or QuantileSketch()).merge(other.sketch)
+        return self
+
+    def write_to(self, row: PhenotypeQCStatistic) -> None:
+        row.n = self.n
+        row.min_value = self.min_value
+        row.max_value = self.max_value
+        row.sum_x = self.sum_x
+        row.sum_x2 = self.sum_x2
+        row.sketch = self.sketch.to_dict() if self.sketch else None
+
+    def robust_location_scale(self) -> tuple[float, float] | None:
+        """(median, robust SD), falling back to the exact SD when the MAD is zero."""
+        if self.n < MIN_VALUES_FOR_OUTLIERS or self.sketch is None:
+            return None
+        median = self.sketch.median()
+        scale = MAD_TO_SD * (self.sketch.mad() or 0.0)
+        if scale <= 0:
+            variance = (self.sum_x2 - self.sum_x ** 2 / self.n) / (self.n - 1)
+            scale = math.sqrt(variance) if variance > 0 else 0.0
+        if median is None or scale <= 0:
+            return None
+        return median, scale
+
+
+# ============================================
+# VECTORISED SCORING
+# ============================================
+
+@dataclass
+class QCFlag:
+    index: int
+    rule: str
+    issue_type: str
+    severity: str
+    reason: str
+    score: float | None = None
+
+
+def score_values(
+    raw: Sequence[Any],
+    numeric: np.ndarray,
+    groups: np.ndarray,
+    scales: Sequence[TraitScale],
+    statistics: Sequence[TraitStatistics | None],
+) -> list[QCFlag]:
+    """
+    Score a batch of values in one pass.
+
+    ``groups[i]`` indexes the scale and statistics that apply to value i;
+    ``numeric`` holds parsed values with NaN where the value is not a number.
+    """
+    numeric = np.asarray(numeric, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.int64)
+    if numeric.size == 0:
+        return []
+
+    is_numeric_trait = np.array([scale.is_numeric for scale in scales], dtype=bool)
+    accepts_numbers = np.array([scale.accepts_numbers for scale in scales], dtype=bool)
+    low = np.array([-np.inf if s.min_value is None else s.min_value for s in scales])
+    high = np.array([np.inf if s.max_value is None else s.max_value for s in scales])
+    location = np.full(len(scales), np.nan)
+    spread = np.full(len(scales), np.nan)
+    for g, stats in enumerate(statistics):
+        robust = stats.robust_location_scale() if stats is not None else None
+        if robust is not None:
+            location[g], spread[g] = robust
+
+    has_number = ~np.isnan(numeric)
+    present = np.array([raw_value is not None and str(raw_value).strip() != "" for raw_value in raw], dtype=bool)
+    numeric_trait = is_numeric_trait[groups]
+    in_scale = (numeric >= low[groups]) & (numeric <= high[groups])
+
+    not_numeric = numeric_trait & present & ~has_number
+    out_of_scale = numeric_trait & has_number & ~in_scale
+    with np.errstate(invalid="ignore"):
+        z = np.abs(numeric - location[groups]) / spread[groups]
+    outlier = accepts_numbers[groups] & in_scale & (z > OUTLIER_Z)
+
+    invalid_category = np.zeros(numeric.size, dtype=bool)
+    for g, scale in enumerate(scales):
+        if scale.is_categorical and not scale.is_numeric:
+            members = np.flatnonzero((groups == g) & present)
+            if members.size:
+                labels = np.array([str(raw[i]).strip() for i in members], dtype=object)
+                invalid_category[members] = ~np.isin(labels, list(scale.categories))
+
+    flags: list[QCFlag] = []
+    for i in np.flatnonzero(not_numeric).tolist():
+        flags.append(QCFlag(
+            i, "not_numeric", IssueType.INVALID.value, IssueSeverity.MEDIUM.value,
+            f"Non-numeric value {str(raw[i])!r} recorded for a numeric trait",
+        ))
+    for i in np.flatnonzero(out_of_scale).tolist():
+        scale = scales[groups[i]]
+        flags.append(QCFlag(
+            i, "out_of_scale", IssueType.INVALID.value, IssueSeverity.HIGH.value,
+            f"Value {numeric[i]:g} outside scale range [{_bound(scale.min_value)}, {_bound(scale.max_value)}]",
+        ))
+    for i in np.flatnonzero(invalid_category).tolist():
+        flags.append(QCFlag(
+            i, "invalid_category", IssueType.INVALID.value, IssueSeverity.MEDIUM.value,
+            f"{str(raw[i]).strip()!r} is not a category of the trait scale",
+        ))
+    for i in np.flatnonzero(outlier).tolist():
+        g = groups[i]
+        severity = IssueSeverity.HIGH if z[i] > OUTLIER_Z_HIGH else IssueSeverity.MEDIUM
+        flags.append(QCFlag(
+            i, "robust_outlier", IssueType.OUTLIER.value, severity.value,
+            f"Value {numeric[i]:g} is {z[i]:.1f} robust SDs from the study median "
+            f"{location[g]:.4g} (n={statistics[g].n})",
+            score=float(z[i]),
+        ))
+    return flags
+
+
+def _bound(value: float | None) -> str:
+    return "-" if value is None else f"{value:g}"
+
+
+def _as_float(value: Any) -> float:
+    if value is None:
+        return np.nan
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return number if math.isfinite(number) else np.nan
+
+
+# ============================================
+# SERVICE
+# ============================================
+
+class PhenotypeQCService:
+    """Scores observation batches and keeps the QC statistics and issue store."""
+
+    async def load_scales(self, db: AsyncSession, variable_ids: set[int]) -> dict[int, TraitScale]:
+        """Scales of the given variables from valid_values, falling back to the linked Scale."""
+        if not variable_ids:
+            return {}
+        result = await db.execute(
+            select(
+                ObservationVariable.id,
+                ObservationVariable.data_type,
+                ObservationVariable.valid_values,
+                ObservationVariable.scale_db_id,
+            ).where(ObservationVariable.id.in_(variable_ids))
+        )
+        rows = result.all()
+
+        linked = {row.scale_db_id for row in rows if row.scale_db_id and not row.valid_values}
+        scale_rows = {}
+        if linked:
+            from app.models.brapi_phenotyping import Scale
+
+            scale_result = await db.execute(select(Scale).where(Scale.scale_db_id.in_(linked)))
+            scale_rows = {scale.scale_db_id: scale for scale in scale_result.scalars().all()}
+
+        scales = {}
+        for row in rows:
+            valid = row.valid_values or {}
+            scale = scale_rows.get(row.scale_db_id)
+            if valid or scale is None:
+                scales[row.id] = TraitScale.from_valid_values(
+                    row.data_type, valid.get("min"), valid.get("max"), valid.get("categories")
+                )
+            else:
+                scales[row.id] = TraitScale.from_valid_values(
+                    row.data_type or scale.data_type,
+                    scale.valid_values_min,
+                    scale.valid_values_max,
+                    scale.valid_values_categories,
+                )
+        return scales
+
+    async def _load_statistics(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        keys: set[StatisticKey],
+        for_update: bool = False,
+    ) -> dict[StatisticKey, PhenotypeQCStatistic]:
+        if not keys:
+            return {}
+        stmt = select(PhenotypeQCStatistic).where(
+            PhenotypeQCStatistic.organization_id == organization_id,
+            PhenotypeQCStatistic.study_id.in_({study for study, _ in keys}),
+            PhenotypeQCStatistic.observation_variable_id.in_({variable for _, variable in keys}),
+        )
+        if for_update:
+            stmt = stmt.with_for_update()
+        result = await db.execute(stmt)
+        rows = {(row.study_id, row.observation_variable_id): row for row in result.scalars().all()}
+        return {key: row for key, row in rows.items() if key in keys}
+
+    async def _apply_statistics(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        deltas: dict[StatisticKey, TraitStatistics],
+    ) -> dict[StatisticKey, TraitStatistics]:
+        """Fold batch statistics into the stored rows (locked) and return the merged statistics."""
+        rows = await self._load_statistics(db, organization_id, set(deltas), for_update=True)
+        merged: dict[StatisticKey, TraitStatistics] = {}
+        for key, row in rows.items():
+            merged[key] = TraitStatistics.from_row(row).merge(deltas[key])
+            merged[key].write_to(row)
+
+        new_keys = set(deltas) - set(rows)
+        if new_keys:
+            try:
+                # A concurrent batch may create the same trait rows; retry those as updates
+                async with db.begin_nested():
+                    for study_id, variable_id in sorted(new_keys):
+                        row = PhenotypeQCStatistic(
+                            organization_id=organization_id, study_id=study_id, observation_variable_id=variable_id
+                        )
+                        deltas[(study_id, variable_id)].write_to(row)
+                        db.add(row)
+                        merged[(study_id, variable_id)] = deltas[(study_id, variable_id)]
+            except IntegrityError:
+                merged.update(await self._apply_statistics(
+                    db, organization_id, {key: deltas[key] for key in new_keys}
+                ))
+        await db.flush()
+        return merged
+
+    async def score_batch(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        records: Sequence[dict[str, Any]],
+        source: str = "observation",
+        batch_id: str | None = None,
+        update_statistics: bool = True,
+        skip_reviewed: set[tuple[int, str]] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Score a batch of freshly written values and persist any flags.
+
+        Records carry ``record_id``, ``observation_variable_id``, ``study_id``,
+        ``germplasm_id``, ``value`` and optionally ``value_numeric`` and a
+        ``scale`` (TraitScale) that overrides the variable's own scale. Values
+        within scale feed the (study, trait) statistics before scoring, so the
+        first batch of a study is scored against itself.
+        """
+        batch_id = batch_id or uuid.uuid4().hex
+        summary = {"batch_id": batch_id, "scored": len(records), "flagged": 0, "by_rule": {}}
+        if not records:
+            return summary
+
+        variable_ids = {r["observation_variable_id"] for r in records if r.get("observation_variable_id")}
+        variable_scales = await self.load_scales(db, variable_ids)
+
+        # Group records by (study, trait, scale) so every column below is a flat array
+        group_index: dict[tuple, int] = {}
+        scales: list[TraitScale] = []
+        group_keys: list[StatisticKey | None] = []
+        groups = np.empty(len(records), dtype=np.int64)
+        numeric = np.empty(len(records), dtype=np.float64)
+        raw = []
+        for i, record in enumerate(records):
+            study_id, variable_id = record.get("study_id"), record.get("observation_variable_id")
+            scale = record.get("scale") or variable_scales.get(variable_id) or TraitScale()
+            key = (study_id, variable_id, scale)
+            if key not in group_index:
+                group_index[key] = len(scales)
+                scales.append(scale)
+                group_keys.append((study_id, variable_id) if study_id and variable_id else None)
+            groups[i] = group_index[key]
+            value_numeric = record.get("value_numeric")
+            numeric[i] = _as_float(record.get("value") if value_numeric is None else value_numeric)
+            raw.append(record.get("value"))
+
+        # In-scale numeric values of each group feed its statistics
+        usable = ~np.isnan(numeric)
+        for g, scale in enumerate(scales):
+            members = groups == g
+            usable[members] &= scale.accepts_numbers & scale.in_scale(numeric[members])
+        order = np.argsort(groups[usable], kind="stable")
+        counts = np.bincount(groups[usable], minlength=len(scales))
+        values_by_group = np.split(numeric[usable][order], np.cumsum(counts)[:-1])
+
+        deltas: dict[StatisticKey, TraitStatistics] = {}
+        transient: dict[int, TraitStatistics] = {}
+        for g, values in enumerate(values_by_group):
+            key = group_keys[g]
+            if key is None:
+                transient[g] = TraitStatistics.from_values(values)
+            elif key in deltas:
+                deltas[key].merge(TraitStatistics.from_values(values))
+            else:
+                deltas[key] = TraitStatistics.from_values(values)
+
+        if update_statistics:
+            merged = await self._apply_statistics(db, organization_id, deltas)
+        else:
+            rows = await self._load_statistics(db, organization_id, set(deltas))
+            merged = {key: TraitStatistics.from_row(row) for key, row in rows.items()}
+        statistics = [
+            transient.get(g) if group_keys[g] is None else merged.get(group_keys[g])
+            for g in range(len(scales))
+        ]
+
+        flags = score_values(raw, numeric, groups, scales, statistics)
+
+        # Re-recorded values replace their earlier open flags
+        await db.execute(
+            delete(PhenotypeQCIssue).where(
+                PhenotypeQCIssue.organization_id == organization_id,
+                PhenotypeQCIssue.source == source,
+                PhenotypeQCIssue.record_id.in_({r["record_id"] for r in records}),
+                PhenotypeQCIssue.status == IssueStatus.OPEN.value,
+            )
+        )
+        issue_rows = []
+        by_rule: dict[str, int] = defaultdict(int)
+        for flag in flags:
+            record = records[flag.index]
+            if skip_reviewed and (record["record_id"], flag.rule) in skip_reviewed:
+                continue
+            by_rule[flag.rule] += 1
+            issue_rows.append({
+                "organization_id": organization_id,
+                "source": source,
+                "record_id": record["record_id"],
+                "observation_variable_id": record.get("observation_variable_id"),
+                "study_id": record.get("study_id"),
+                "germplasm_id": record.get("germplasm_id"),
+                "value": None if raw[flag.index] is None else str(raw[flag.index])[:255],
+                "rule": flag.rule,
+                "issue_type": flag.issue_type,
+                "severity": flag.severity,
+                "reason": flag.reason,
+                "score": flag.score,
+                "status": IssueStatus.OPEN.value,
+                "batch_id": batch_id,
+            })
+        if issue_rows:
+            await db.execute(insert(PhenotypeQCIssue), issue_rows)
+
+        summary["flagged"] = len(issue_rows)
+        summary["by_rule"] = dict(by_rule)
+        summary["flagged_record_ids"] = sorted({row["record_id"] for row in issue_rows})
+        return summary
+
+    async def rescore_organization(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        progress_callback: Callable[[float, str], None] | None = None,
+        chunk_size: int = RESCORE_CHUNK_SIZE,
+    ) -> dict[str, Any]:
+        """
+        Rebuild statistics and open issues for all values of an organisation.
+
+        Two streaming passes over the observations and Field Book values in id
+        order: the first rebuilds the statistics, the second scores every value
+        against them. Resolved and ignored issues are kept and not raised again.
+        """
+        sources = {"observation": self._observation_chunks, "field_book": self._field_book_chunks}
+        await db.execute(delete(PhenotypeQCStatistic).where(PhenotypeQCStatistic.organization_id == organization_id))
+        await db.execute(
+            delete(PhenotypeQCIssue).where(
+                PhenotypeQCIssue.organization_id == organization_id,
+                PhenotypeQCIssue.source.in_(sources),
+                PhenotypeQCIssue.status == IssueStatus.OPEN.value,
+            )
+        )
+        reviewed_result = await db.execute(
+            select(PhenotypeQCIssue.source, PhenotypeQCIssue.record_id, PhenotypeQCIssue.rule).where(
+                PhenotypeQCIssue.organization_id == organization_id,
+                PhenotypeQCIssue.source.in_(sources),
+            )
+        )
+        reviewed: dict[str, set[tuple[int, str]]] = defaultdict(set)
+        for source, record_id, rule in reviewed_result.all():
+            reviewed[source].add((record_id, rule))
+
+        last_ids = {
+            "observation": await db.scalar(
+                select(func.max(Observation.id)).where(Observation.organization_id == organization_id)
+            ),
+            "field_book": await db.scalar(
+                select(func.max(FieldBookObservation.id)).where(
+                    FieldBookObservation.organization_id == organization_id
+                )
+            ),
+        }
+
+        def report(step: int, source: str, record_id: int, message: str) -> None:
+            # Four equal steps: (statistics, scoring) x (observations, Field Book)
+            if progress_callback:
+                offset = 2 * step + list(sources).index(source)
+                progress_callback((offset + record_id / max(last_ids[source] or 0, 1)) / 4, message)
+
+        # Pass 1: statistics from in-scale numeric values
+        scales: dict[int, TraitScale] = {}
+        accumulated: dict[StatisticKey, TraitStatistics] = {}
+        for source, chunks in sources.items():
+            async for chunk in chunks(db, organization_id, chunk_size, numeric_only=True):
+                missing = {r["observation_variable_id"] for r in chunk} - set(scales)
+                scales.update(await self.load_scales(db, missing))
+                values: dict[tuple[int, int, TraitScale], list[float]] = defaultdict(list)
+                for record in chunk:
+                    variable_id = record["observation_variable_id"]
+                    scale = record.get("scale") or scales.get(variable_id) or TraitScale()
+                    values[(record["study_id"], variable_id, scale)].append(record["value_numeric"])
+                for (study_id, variable_id, scale), chunk_values in values.items():
+                    if not scale.accepts_numbers:
+                        continue
+                    key = (study_id, variable_id)
+                    chunk_values = np.asarray(chunk_values, dtype=np.float64)
+                    stats = TraitStatistics.from_values(chunk_values[scale.in_scale(chunk_values)])
+                    accumulated[key] = accumulated[key].merge(stats) if key in accumulated else stats
+                report(0, source, chunk[-1]["record_id"], "Rebuilding trait statistics")
+
+        for (study_id, variable_id), stats in accumulated.items():
+            row = PhenotypeQCStatistic(
+                organization_id=organization_id, study_id=study_id, observation_variable_id=variable_id
+            )
+            stats.write_to(row)
+            db.add(row)
+        await db.flush()
+
+        # Pass 2: score every value against the rebuilt statistics
+        batch_id = uuid.uuid4().hex
+        scored = flagged = 0
+        by_rule: dict[str, int] = defaultdict(int)
+        for source, chunks in sources.items():
+            async for chunk in chunks(db, organization_id, chunk_size):
+                summary = await self.score_batch(
+                    db,
+                    organization_id,
+                    chunk,
+                    source=source,
+                    batch_id=batch_id,
+                    update_statistics=False,
+                    skip_reviewed=reviewed[source],
+                )
+                if source == "field_book":
+                    await self._mark_field_book_outliers(db, chunk, summary["flagged_record_ids"])
+                scored += summary["scored"]
+                flagged += summary["flagged"]
+                for rule, count in summary["by_rule"].items():
+                    by_rule[rule] += count
+                report(1, source, chunk[-1]["record_id"], f"Scored {scored} values")
+
+        if progress_callback:
+            progress_callback(1.0, "Done")
+        logger.info(f"[PhenotypeQC] Re-scored org {organization_id}: {scored} values, {flagged} flagged")
+        return {
+            "batch_id": batch_id,
+            "scored": scored,
+            "flagged": flagged,
+            "by_rule": dict(by_rule),
+            "statistics": len(accumulated),
+        }
+
+    async def _observation_chunks(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        chunk_size: int,
+        numeric_only: bool = False,
+    ):
+        """Keyset-paginated observation records of an organisation."""
+        after = 0
+        while True:
+            stmt = (
+                select(
+                    Observation.id,
+                    Observation.observation_variable_id,
+                    Observation.study_id,
+                    Observation.germplasm_id,
+                    Observation.value,
+                    Observation.value_numeric,
+                )
+                .where(
+                    Observation.organization_id == organization_id,
+                    Observation.id > after,
+                    Observation.observation_variable_id.is_not(None),
+                )
+                .order_by(Observation.id)
+                .limit(chunk_size)
+            )
+            if numeric_only:
+                stmt = stmt.where(Observation.value_numeric.is_not(None), Observation.study_id.is_not(None))
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                return
+            yield [
+                {
+                    "record_id": row.id,
+                    "observation_variable_id": row.observation_variable_id,
+                    "study_id": row.study_id,
+                    "germplasm_id": row.germplasm_id,
+                    "value": row.value,
+                    "value_numeric": row.value_numeric,
+                }
+                for row in rows
+            ]
+            after = rows[-1].id
+
+
+    async def _field_book_chunks(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        chunk_size: int,
+        numeric_only: bool = False,
+    ):
+        """Keyset-paginated Field Book records of an organisation, scaled by their trait."""
+        after = 0
+        while True:
+            stmt = (
+                select(
+                    FieldBookObservation.id,
+                    FieldBookObservation.value_numeric,
+                    FieldBookObservation.value_text,
+                    FieldBookEntry.germplasm_id,
+                    FieldBookStudy.study_id,
+                    FieldBookTrait.variable_id,
+                    FieldBookTrait.data_type,
+                    FieldBookTrait.min_value,
+                    FieldBookTrait.max_value,
+                    FieldBookTrait.categories,
+                )
+                .join(FieldBookEntry, FieldBookEntry.id == FieldBookObservation.entry_id)
+                .join(FieldBookTrait, FieldBookTrait.id == FieldBookObservation.trait_id)
+                .join(FieldBookStudy, FieldBookStudy.id == FieldBookObservation.study_id)
+                .where(
+                    FieldBookObservation.organization_id == organization_id,
+                    FieldBookObservation.id > after,
+                    FieldBookTrait.variable_id.is_not(None),
+                )
+                .order_by(FieldBookObservation.id)
+                .limit(chunk_size)
+            )
+            if numeric_only:
+                stmt = stmt.where(
+                    FieldBookObservation.value_numeric.is_not(None), FieldBookStudy.study_id.is_not(None)
+                )
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                return
+            yield [
+                {
+                    "record_id": row.id,
+                    "observation_variable_id": row.variable_id,
+                    "study_id": row.study_id,
+                    "germplasm_id": row.germplasm_id,
+                    "value": row.value_numeric if row.value_numeric is not None else row.value_text,
+                    "value_numeric": row.value_numeric,
+                    "scale": TraitScale.from_valid_values(
+                        row.data_type, row.min_value, row.max_value, row.categories
+                    ),
+                }
+                for row in rows
+            ]
+            after = rows[-1].id
+
+    async def _mark_field_book_outliers(
+        self, db: AsyncSession, records: Sequence[dict[str, Any]], flagged_record_ids: Sequence[int]
+    ) -> None:
+        """Keep the Field Book outlier marks in step with the open flags."""
+        flagged = set(flagged_record_ids)
+        for is_outlier in (True, False):
+            ids = [r["record_id"] for r in records if (r["record_id"] in flagged) == is_outlier]
+            if ids:
+                await db.execute(
+                    update(FieldBookObservation)
+                    .where(FieldBookObservation.id.in_(ids))
+                    .values(is_outlier=is_outlier)
+                )
+
+phenotype_qc_service = PhenotypeQCService()
+
+
+async def run_rescore_job(organization_id: int, progress_callback=None) -> dict[str, Any]:
+    """Task queue entry point: re-score an organisation in its own session."""
+    from app.core.database import AsyncSessionLocal
+    from app.core.rls import set_tenant_context
+
+    async with AsyncSessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            await set_tenant_context(db, organization_id)
+        result = await phenotype_qc_service.rescore_organization(db, organization_id, progress_callback)
+        await db.commit()
+    return result
+
+
+async def submit_rescore_job(organization_id: int, user_id: str | None = None) -> str:
+    """Queue a whole-organisation re-score and return the task id."""
+    from app.services.task_queue import TaskPriority, task_queue
+
+    return await task_queue.submit(
+        name="phenotype_qc_rescore",
+        func=run_rescore_job,
+        kwargs={"organization_id": organization_id},
+        priority=TaskPriority.LOW,
+        user_id=user_id,
+        organization_id=str(organization_id),
+    )
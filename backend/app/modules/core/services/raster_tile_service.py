@@ -0,0 +1,769 @@
+"""
+Raster Tile Service
+Tiled, bounded-memory processing of UAV orthomosaics and other large rasters
+
+A raster is never decoded whole. GeoTIFFs (and anything else GDAL opens) are
+read window by window through rasterio; ``.npy`` arrays are memory-mapped.
+Each tile reads only the bands its indices need, so peak memory is about
+tile_size² × bands × 4 bytes per worker whatever the size of the mosaic.
+
+Two pipelines run over the tiles:
+- write_index_raster     per-pixel index (NDVI, TGI, ...) written tile by
+                         tile to a float32 GeoTIFF
+- plot_index_statistics  plot polygons from the field layout (observation
+                         unit geoCoordinates) rasterised per tile and
+                         reduced to per-plot count / mean / std / min / max;
+                         tiles without plots are never read
+
+With more than one worker, tiles are processed in separate processes (each
+opens the raster itself) with a bounded number of tiles in flight.
+PlotIndexService writes the per-plot means as plot-level observations.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.phenotyping import (
+    Observation,
+    ObservationUnit,
+    ObservationVariable,
+    typed_observation_values,
+)
+
+
+try:
+    import rasterio
+    from rasterio.features import rasterize
+    from rasterio.transform import Affine
+    from rasterio.warp import transform_geom
+    from rasterio.windows import Window
+    from rasterio.windows import transform as window_transform
+
+    RASTERIO_AVAILABLE = True
+except ImportError:
+    rasterio = None
+    RASTERIO_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 1024
+# Tiles queued per worker process; bounds memory held by finished tiles
+TILES_IN_FLIGHT_PER_WORKER = 2
+# BrAPI geoCoordinates are WGS84 GeoJSON
+PLOT_CRS = "EPSG:4326"
+
+# Band order assumed when a raster carries no band names (RGB, then the
+# NIR and red-edge bands of common multispectral mosaics)
+DEFAULT_BAND_ORDER = ("red", "green", "blue", "nir", "rededge")
+BAND_ALIASES = {
+    "r": "red",
+    "g": "green",
+    "b": "blue",
+    "near infrared": "nir",
+    "near-infrared": "nir",
+    "nearinfrared": "nir",
+    "red edge": "rededge",
+    "red-edge": "rededge",
+    "re": "rededge",
+}
+
+
+# ============================================
+# INDEX KERNELS
+# ============================================
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator with 0 where undefined (the spectral_indices convention)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = numerator / denominator
+    out[~np.isfinite(out)] = 0
+    return out
+
+
+def ndvi(nir: np.ndarray, red: np.ndarray) -> np.ndarray:
+    """NDVI = (NIR - Red) / (NIR + Red)"""
+    return _ratio(nir - red, nir + red)
+
+
+def ndre(nir: np.ndarray, rededge: np.ndarray) -> np.ndarray:
+    """NDRE = (NIR - RedEdge) / (NIR + RedEdge)"""
+    return _ratio(nir - rededge, nir + rededge)
+
+
+def gndvi(nir: np.ndarray, green: np.ndarray) -> np.ndarray:
+    """GNDVI = (NIR - Green) / (NIR + Green)"""
+    return _ratio(nir - green, nir + green)
+
+
+def tgi(red: np.ndarray, green: np.ndarray, blue: np.ndarray) -> np.ndarray:
+    """TGI = G - 0.39*R - 0.61*B"""
+    return green - 0.39 * red - 0.61 * blue
+
+
+def vari(red: np.ndarray, green: np.ndarray, blue: np.ndarray) -> np.ndarray:
+    """VARI = (G - R) / (G + R - B)"""
+    return _ratio(green - red, green + red - blue)
+
+
+def exg(red: np.ndarray, green: np.ndarray, blue: np.ndarray) -> np.ndarray:
+    """Excess green on chromatic coordinates: 2g - r - b with r = R / (R + G + B)"""
+    return _ratio(2 * green - red - blue, red + green + blue)
+
+
+def ccc(red: np.ndarray, green: np.ndarray, blue: np.ndarray) -> np.ndarray:
+    """Canopy cover mask (1 canopy, 0 background); a plot mean is its cover fraction."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        canopy = (red / green < 0.95) & (blue / green < 0.95) & (2 * green - red - blue > 20)
+    return canopy.astype(np.float32)
+
+
+@dataclass(frozen=True)
+class SpectralIndex:
+    name: str
+    bands: tuple[str, ...]
+    kernel: Callable[..., np.ndarray]
+    valid_range: tuple[float, float] | None = None
+
+
+SPECTRAL_INDICES = {
+    index.name: index
+    for index in (
+        SpectralIndex("ndvi", ("nir", "red"), ndvi, (-1.0, 1.0)),
+        SpectralIndex("ndre", ("nir", "rededge"), ndre, (-1.0, 1.0)),
+        SpectralIndex("gndvi", ("nir", "green"), gndvi, (-1.0, 1.0)),
+        SpectralIndex("tgi", ("red", "green", "blue"), tgi),
+        SpectralIndex("vari", ("red", "green", "blue"), vari),
+        SpectralIndex("exg", ("red", "green", "blue"), exg, (-1.0, 2.0)),
+        SpectralIndex("ccc", ("red", "green", "blue"), ccc, (0.0, 1.0)),
+    )
+}
+
+
+def get_index(name: str) -> SpectralIndex:
+    try:
+        return SPECTRAL_INDICES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported index: {name}. Try: {', '.join(SPECTRAL_INDICES)}") from None
+
+
+def resolve_band_map(band_names: Sequence[str | None] | None, count: int) -> dict[str, int]:
+    """Map canonical band names to 0-based band positions."""
+    if not band_names or all(not name for name in band_names):
+        band_names = DEFAULT_BAND_ORDER[:count]
+    band_map = {}
+    for position, name in enumerate(band_names[:count]):
+        if not name:
+            continue
+        key = name.strip().lower()
+        band_map.setdefault(BAND_ALIASES.get(key, key), position)
+    return band_map
+
+
+def compute_index(name: str, bands: dict[str, np.ndarray]) -> np.ndarray:
+    index = get_index(name)
+    return index.kernel(*(bands[band] for band in index.bands)).astype(np.float32, copy=False)
+
+
+# ============================================
+# SOURCES
+# ============================================
+
+# (row_off, col_off, height, width)
+TileWindow = tuple[int, int, int, int]
+
+
+def iter_windows(height: int, width: int, tile_size: int = TILE_SIZE) -> Iterator[TileWindow]:
+    for row in range(0, height, tile_size):
+        for col in range(0, width, tile_size):
+            yield (row, col, min(tile_size, height - row), min(tile_size, width - col))
+
+
+class RasterSource:
+    """Windowed read access to a multi-band raster."""
+
+    height: int
+    width: int
+    count: int
+    band_map: dict[str, int]
+    crs: str | None = None
+    transform: Any = None
+    nodata: float | None = None
+    # Picklable argument that reopens this source in a worker process
+    spec: str | None = None
+
+    def read(self, bands: Sequence[int], window: TileWindow) -> tuple[np.ndarray, np.ndarray]:
+        """(len(bands), h, w) float32 values and an (h, w) valid-pixel mask."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> RasterSource:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GeoRasterSource(RasterSource):
+    """A GDAL raster opened through rasterio; every read is a window read."""
+
+    def __init__(self, path: str, band_names: Sequence[str] | None = None):
+        if not RASTERIO_AVAILABLE:
+            raise RuntimeError("rasterio is required for windowed raster reads")
+        self.dataset = rasterio.open(path)
+        self.spec = path
+        self.height, self.width, self.count = self.dataset.height, self.dataset.width, self.dataset.count
+        interp = [ci.name for ci in self.dataset.colorinterp]
+        if not band_names and any(self.dataset.descriptions):
+            band_names = self.dataset.descriptions
+        if not band_names:
+            band_names = [
+                ci if ci in ("red", "green", "blue", "alpha") else DEFAULT_BAND_ORDER[i % len(DEFAULT_BAND_ORDER)]
+                for i, ci in enumerate(interp)
+            ]
+        self.band_map = resolve_band_map(band_names, self.count)
+        self.crs = self.dataset.crs.to_string() if self.dataset.crs else None
+        self.transform = self.dataset.transform
+        self.nodata = self.dataset.nodata
+        # GDAL tags the fourth band of an untagged 4-band image as alpha; when
+        # that band is named as a spectral band (RGB + NIR) it is data, not a mask
+        self.alpha_is_data = any(interp[i] == "alpha" for i in self.band_map.values())
+
+    def read(self, bands: Sequence[int], window: TileWindow) -> tuple[np.ndarray, np.ndarray]:
+        row, col, height, width = window
+        rio_window = Window(col, row, width, height)
+        indexes = [b + 1 for b in bands]
+        values = self.dataset.read(indexes, window=rio_window, out_dtype="float32")
+        if self.alpha_is_data:
+            valid = np.ones(values.shape[1:], dtype=bool)
+            if self.nodata is not None:
+                valid &= (values != self.nodata).all(axis=0)
+        else:
+            # Dataset masks cover nodata values, alpha bands and internal masks
+            valid = (self.dataset.read_masks(indexes, window=rio_window) > 0).all(axis=0)
+        return values, valid
+
+    def close(self) -> None:
+        self.dataset.close()
+
+
+class ArrayRasterSource(RasterSource):
+    """An (height, width, bands) array, typically a read-only memmap of a .npy file."""
+
+    def __init__(
+        self,
+        array: np.ndarray,
+        band_names: Sequence[str] | None = None,
+        nodata: float | None = None,
+        spec: str | None = None,
+    ):
+        self.array = array if array.ndim == 3 else array[:, :, None]
+        self.height, self.width, self.count = self.array.shape
+        self.band_map = resolve_band_map(band_names, self.count)
+        self.nodata = nodata
+        self.spec = spec
+        if RASTERIO_AVAILABLE:
+            self.transform = Affine.identity()
+
+    def read(self, bands: Sequence[int], window: TileWindow) -> tuple[np.ndarray, np.ndarray]:
+        row, col, height, width = window
+        tile = self.array[row:row + height, col:col + width]
+        values = np.moveaxis(tile[:, :, list(bands)], -1, 0).astype(np.float32)
+        valid = np.isfinite(values).all(axis=0)
+        if self.nodata is not None:
+            valid &= (values != self.nodata).all(axis=0)
+        return values, valid
+
+
+def open_raster(path: str, band_names: Sequence[str] | None = None) -> RasterSource:
+    """Open a raster for windowed reads without loading it."""
+    if path.endswith(".npy"):
+        return ArrayRasterSource(np.load(path, mmap_mode="r"), band_names, spec=path)
+    return GeoRasterSource(path, band_names)
+
+
+# ============================================
+# TILE EXECUTION
+# ============================================
+
+def _bounded_map(
+    pool: Executor | None,
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    in_flight: int,
+) -> Iterator[Any]:
+    """Ordered map that keeps at most in_flight tasks submitted."""
+    if pool is None:
+        yield from map(fn, items)
+        return
+    pending: list[Future] = []
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= in_flight:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def _run_tiles(
+    job: _TileJob,
+    windows: list[TileWindow],
+    max_workers: int | None,
+    source: RasterSource | None,
+) -> Iterator[tuple[TileWindow, Any]]:
+    workers = min(len(windows), max_workers or os.cpu_count() or 1)
+    if workers <= 1 or job.source_spec is None:
+        _WORKER["job"], _WORKER["source"] = job, source or open_raster(job.source_spec, job.band_names)
+        try:
+            yield from zip(windows, _bounded_map(None, _process_tile, windows, 1), strict=True)
+        finally:
+            if source is None:
+                _WORKER["source"].close()
+            _WORKER.clear()
+        return
+
+    # spawn: forking a process that runs an event loop and threads is unsafe
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(job,),
+    ) as pool:
+        results = _bounded_map(pool, _process_tile, windows, workers * TILES_IN_FLIGHT_PER_WORKER)
+        yield from zip(windows, results, strict=True)
+
+
+@dataclass
+class _TileJob:
+    """Everything a worker needs besides the window; sent once per process."""
+
+    source_spec: str | None
+    band_names: list[str] | None
+    indices: list[str]
+    band_positions: list[int]
+    band_names_read: list[str]
+    # Plot statistics only: (geometry in raster CRS, label) and pixel bboxes
+    shapes: list[tuple[dict, int]] = field(default_factory=list)
+    bboxes: np.ndarray | None = None
+    transform: Any = None
+
+
+# Per-process state set by _init_worker (or by _run_tiles when serial)
+_WORKER: dict[str, Any] = {}
+
+
+def _init_worker(job: _TileJob) -> None:
+    _WORKER["job"] = job
+    _WORKER["source"] = open_raster(job.source_spec, job.band_names)
+
+
+def _process_tile(window: TileWindow) -> Any:
+    job: _TileJob = _WORKER["job"]
+    source: RasterSource = _WORKER["source"]
+    values, valid = source.read(job.band_positions, window)
+    bands = dict(zip(job.band_names_read, values, strict=True))
+    if not job.shapes:
+        return {name: np.where(valid, compute_index(name, bands), np.nan) for name in job.indices}
+    return _tile_plot_statistics(job, window, bands, valid)
+
+
+def _tile_plot_statistics(
+    job: _TileJob,
+    window: TileWindow,
+    bands: dict[str, np.ndarray],
+    valid: np.ndarray,
+) -> tuple[np.ndarray, dict[str, np.ndarray]] | None:
+    row, col, height, width = window
+    r0, r1, c0, c1 = job.bboxes.T
+    hits = np.flatnonzero((r0 < row + height) & (r1 > row) & (c0 < col + width) & (c1 > col))
+    labels = rasterize(
+        [job.shapes[i] for i in hits],
+        out_shape=(height, width),
+        transform=window_transform(Window(col, row, width, height), job.transform),
+        fill=0,
+        dtype="int32",
+    )
+    inside = (labels > 0) & valid
+    if not inside.any():
+        return None
+
+    plot_labels = labels[inside]
+    order = np.argsort(plot_labels, kind="stable")
+    plot_labels = plot_labels[order]
+    starts = np.flatnonzero(np.r_[True, plot_labels[1:] != plot_labels[:-1]])
+    present = plot_labels[starts]
+    counts = np.diff(np.r_[starts, len(plot_labels)])
+
+    partial = {}
+    for name in job.indices:
+        values = compute_index(name, bands)[inside][order].astype(np.float64)
+        partial[name] = np.stack([
+            counts,
+            np.add.reduceat(values, starts),
+            np.add.reduceat(values * values, starts),
+            np.minimum.reduceat(values, starts),
+            np.maximum.reduceat(values, starts),
+        ])
+    return present, partial
+
+
+def _prepare_job(
+    source: RasterSource,
+    indices: Sequence[str],
+    band_names: Sequence[str] | None,
+) -> _TileJob:
+    needed: list[str] = []
+    for name in indices:
+        for band in get_index(name).bands:
+            if band not in source.band_map:
+                raise ValueError(f"{name.upper()} needs a {band} band; raster bands are {sorted(source.band_map)}")
+            if band not in needed:
+                needed.append(band)
+    return _TileJob(
+        source_spec=source.spec,
+        band_names=list(band_names) if band_names else None,
+        indices=[name.lower() for name in indices],
+        band_positions=[source.band_map[band] for band in needed],
+        band_names_read=needed,
+    )
+
+
+# ============================================
+# PIPELINES
+# ============================================
+
+def write_index_raster(
+    source_path: str,
+    out_path: str,
+    index: str,
+    band_names: Sequence[str] | None = None,
+    tile_size: int = TILE_SIZE,
+    max_workers: int | None = None,
+) -> dict[str, Any]:
+    """Compute a per-pixel index tile by tile into a tiled float32 GeoTIFF (NaN outside data)."""
+    if not RASTERIO_AVAILABLE:
+        raise RuntimeError("rasterio is required to write index rasters")
+    with open_raster(source_path, band_names) as source:
+        job = _prepare_job(source, [index], band_names)
+        windows = list(iter_windows(source.height, source.width, tile_size))
+        profile = {
+            "driver": "GTiff",
+            "height": source.height,
+            "width": source.width,
+            "count": 1,
+            "dtype": "float32",
+            "nodata": np.nan,
+            "tiled": True,
+            "blockxsize": 256,
+            "blockysize": 256,
+            "compress": "deflate",
+        }
+        if source.crs:
+            profile.update(crs=source.crs, transform=source.transform)
+
+        total = count = 0.0
+        with rasterio.open(out_path, "w", **profile) as out:
+            out.update_tags(1, index=index.lower())
+            for (row, col, height, width), tile in _run_tiles(job, windows, max_workers, source):
+                values = tile[index.lower()]
+                out.write(values, 1, window=Window(col, row, width, height))
+                finite = np.isfinite(values)
+                total += float(values[finite].sum())
+                count += int(finite.sum())
+
+    return {
+        "index": index.lower(),
+        "path": out_path,
+        "width": source.width,
+        "height": source.height,
+        "tiles": len(windows),
+        "mean": total / count if count else None,
+    }
+
+
+@dataclass
+class PlotPolygon:
+    """A plot's outline, keyed by its observation unit."""
+
+    observation_unit_id: int | None
+    name: str
+    geometry: dict
+    study_id: int | None = None
+    germplasm_id: int | None = None
+
+
+def plot_geometry(geo_coordinates: dict | None) -> dict | None:
+    """Polygon geometry of a BrAPI geoCoordinates object (a GeoJSON Feature or geometry)."""
+    if not geo_coordinates:
+        return None
+    geometry = geo_coordinates.get("geometry", geo_coordinates)
+    if geometry.get("type") in ("Polygon", "MultiPolygon"):
+        return geometry
+    return None
+
+
+def _pixel_bbox(geometry: dict, inverse: Any) -> tuple[float, float, float, float]:
+    rings = geometry["coordinates"] if geometry["type"] == "Polygon" else [r for p in geometry["coordinates"] for r in p]
+    points = np.array([point[:2] for ring in rings for point in ring], dtype=float)
+    cols, rows = inverse @ (points[:, 0], points[:, 1])
+    return (np.floor(rows.min()), np.ceil(rows.max()), np.floor(cols.min()), np.ceil(cols.max()))
+
+
+@dataclass
+class PlotIndexStatistics:
+    """Per-plot pixel statistics for each index."""
+
+    plots: list[PlotPolygon]
+    indices: list[str]
+    # index -> (5, n_plots): count, sum, sum of squares, min, max
+    moments: dict[str, np.ndarray]
+    tiles_read: int
+    tiles_total: int
+
+    def summary(self, name: str) -> dict[str, np.ndarray]:
+        count, total, squares, low, high = self.moments[name]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / count
+            std = np.sqrt(np.maximum(squares / count - mean * mean, 0.0))
+        return {"count": count.astype(int), "mean": mean, "std": std, "min": low, "max": high}
+
+
+def plot_index_statistics(
+    source: str | RasterSource,
+    plots: Sequence[PlotPolygon],
+    indices: Sequence[str] = ("ndvi",),
+    band_names: Sequence[str] | None = None,
+    plot_crs: str | None = PLOT_CRS,
+    tile_size: int = TILE_SIZE,
+    max_workers: int | None = None,
+) -> PlotIndexStatistics:
+    """
+    Per-plot index statistics over a raster of any size.
+
+    Plot geometries are in plot_crs and reprojected to the raster's CRS; for
+    rasters without a CRS they are taken as pixel coordinates.
+    """
+    if not RASTERIO_AVAILABLE:
+        raise RuntimeError("rasterio is required to rasterise plot polygons")
+    owned = isinstance(source, str)
+    raster = open_raster(source, band_names) if owned else source
+    try:
+        job = _prepare_job(raster, indices, band_names)
+        job.transform = raster.transform
+        geometries = [
+            transform_geom(plot_crs, raster.crs, p.geometry) if raster.crs and plot_crs else p.geometry
+            for p in plots
+        ]
+        job.shapes = [(geometry, label) for label, geometry in enumerate(geometries, start=1)]
+        inverse = ~raster.transform
+        job.bboxes = np.array([_pixel_bbox(g, inverse) for g in geometries]).reshape(-1, 4)
+
+        # Only tiles that some plot's bbox touches are read
+        r0, r1, c0, c1 = job.bboxes.T
+        windows = [
+            (row, col, height, width)
+            for row, col, height, width in iter_windows(raster.height, raster.width, tile_size)
+            if np.any((r0 < row + height) & (r1 > row) & (c0 < col + width) & (c1 > col))
+        ]
+        tiles_total = sum(1 for _ in iter_windows(raster.height, raster.width, tile_size))
+
+        moments = {}
+        for name in job.indices:
+            moments[name] = np.zeros((5, len(plots) + 1))
+            moments[name][3] = np.inf
+            moments[name][4] = -np.inf
+        for _, result in _run_tiles(job, windows, max_workers, None if owned else raster):
+            if result is None:
+                continue
+            present, partial = result
+            for name, stats in partial.items():
+                m = moments[name]
+                m[:3, present] += stats[:3]
+                m[3, present] = np.minimum(m[3, present], stats[3])
+                m[4, present] = np.maximum(m[4, present], stats[4])
+    finally:
+        if owned:
+            raster.close()
+
+    for m in moments.values():
+        empty = m[0] == 0
+        m[3:, empty] = np.nan
+    logger.info(
+        f"[RasterTiles] {len(plots)} plots x {len(job.indices)} indices from "
+        f"{len(windows)}/{tiles_total} tiles of {raster.height}x{raster.width}"
+    )
+    return PlotIndexStatistics(
+        plots=list(plots),
+        indices=job.indices,
+        moments={name: m[:, 1:] for name, m in moments.items()},
+        tiles_read=len(windows),
+        tiles_total=tiles_total,
+    )
+
+
+# ============================================
+# PLOT OBSERVATIONS
+# ============================================
+
+class PlotIndexService:
+    """Turns orthomosaic index statistics into plot-level observations."""
+
+    VARIABLE_PREFIX = "UAV"
+
+    async def load_plots(self, db: AsyncSession, organization_id: int, study_id: int) -> list[PlotPolygon]:
+        units = (await db.execute(
+            select(
+                ObservationUnit.id,
+                ObservationUnit.observation_unit_name,
+                ObservationUnit.study_id,
+                ObservationUnit.germplasm_id,
+                ObservationUnit.geo_coordinates,
+            ).where(
+                ObservationUnit.organization_id == organization_id,
+                ObservationUnit.study_id == study_id,
+            ).order_by(ObservationUnit.id)
+        )).all()
+        plots = []
+        for unit in units:
+            geometry = plot_geometry(unit.geo_coordinates)
+            if geometry is not None:
+                plots.append(PlotPolygon(unit.id, unit.observation_unit_name, geometry, unit.study_id, unit.germplasm_id))
+        return plots
+
+    async def get_or_create_variables(
+        self, db: AsyncSession, organization_id: int, indices: Sequence[str]
+    ) -> dict[str, ObservationVariable]:
+        names = {name: f"{self.VARIABLE_PREFIX} {name.upper()}" for name in indices}
+        existing = (await db.execute(
+            select(ObservationVariable).where(
+                ObservationVariable.organization_id == organization_id,
+                ObservationVariable.observation_variable_name.in_(names.values()),
+            )
+        )).scalars().all()
+        by_name = {v.observation_variable_name: v for v in existing}
+        variables = {}
+        for index, name in names.items():
+            variable = by_name.get(name)
+            if variable is None:
+                spec = get_index(index)
+                variable = ObservationVariable(
+                    organization_id=organization_id,
+                    observation_variable_name=name,
+                    trait_name=index.upper(),
+                    method_name="UAV orthomosaic plot mean",
+                    method_class="Computation",
+                    formula=(spec.kernel.__doc__ or "").strip(),
+                    data_type="Numerical",
+                    valid_values=(
+                        {"min": spec.valid_range[0], "max": spec.valid_range[1]} if spec.valid_range else None
+                    ),
+                )
+                db.add(variable)
+            variables[index] = variable
+        await db.flush()
+        return variables
+
+    async def extract_plot_observations(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        raster_path: str,
+        study_id: int,
+        indices: Sequence[str] = ("ndvi",),
+        band_names: Sequence[str] | None = None,
+        acquired_at: datetime | None = None,
+        source_layer_id: int | None = None,
+        plot_crs: str | None = PLOT_CRS,
+        user_id: int | None = None,
+        tile_size: int = TILE_SIZE,
+        max_workers: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Record the mean of each index over every plot of a study as an
+        observation. Re-running for the same raster replaces its observations.
+        """
+        from app.modules.core.services.import_engine.domain_importers import (
+            ObservationImporter,
+            apply_observation_deltas,
+        )
+
+        indices = [get_index(name).name for name in indices]
+        plots = await self.load_plots(db, organization_id, study_id)
+        if not plots:
+            return {"study_id": study_id, "plots": 0, "observations": 0, "message": "No plot polygons in study"}
+
+        # Tiles are CPU-bound; keep them off the event loop
+        statistics = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            plot_index_statistics, raster_path, plots, indices, band_names, plot_crs, tile_size, max_workers,
+        ))
+        variables = await self.get_or_create_variables(db, organization_id, indices)
+
+        source_key = f"layer{source_layer_id}" if source_layer_id else hashlib.sha1(raster_path.encode()).hexdigest()[:12]
+        time_stamp = (acquired_at or datetime.now()).isoformat()
+        rows = []
+        for name in indices:
+            summary = statistics.summary(name)
+            variable_id = variables[name].id
+            for i, plot in enumerate(statistics.plots):
+                if summary["count"][i] == 0:
+                    continue
+                value = str(round(float(summary["mean"][i]), 4))
+                rows.append({
+                    "organization_id": organization_id,
+                    "observation_db_id": f"uav-{source_key}-{plot.observation_unit_id}-{variable_id}",
+                    "observation_unit_id": plot.observation_unit_id,
+                    "observation_variable_id": variable_id,
+                    "study_id": plot.study_id,
+                    "germplasm_id": plot.germplasm_id,
+                    "value": value,
+                    "observation_time_stamp": time_stamp,
+                    "collector": "uav-orthomosaic",
+                    "additional_info": {
+                        "source": "uav_orthomosaic",
+                        "gis_layer_id": source_layer_id,
+                        "pixel_count": int(summary["count"][i]),
+                        "std": float(summary["std"][i]),
+                        "min": float(summary["min"][i]),
+                        "max": float(summary["max"][i]),
+                    },
+                    **typed_observation_values(value, time_stamp),
+                })
+
+        replaced = await db.execute(delete(Observation).where(
+            Observation.organization_id == organization_id,
+            Observation.observation_db_id.in_([row["observation_db_id"] for row in rows]),
+        ).returning(*Observation.__table__.columns))
+        await apply_observation_deltas(db, replaced.mappings().all(), sign=-1.0)
+        importer = ObservationImporter(db, organization_id=organization_id, user_id=user_id)
+        inserted = await importer.bulk_insert(rows)
+
+        return {
+            "study_id": study_id,
+            "plots": len(plots),
+            "plots_covered": int((statistics.summary(indices[0])["count"] > 0).sum()),
+            "indices": indices,
+            "observations": inserted,
+            "tiles_read": statistics.tiles_read,
+            "tiles_total": statistics.tiles_total,
+            "qc": importer.qc_summary,
+        }
+
+
+plot_index_service = PlotIndexService()
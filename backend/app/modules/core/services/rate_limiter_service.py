@@ -4,11 +4,19 @@ Rate Limiter Service
 Production-ready rate limiting using Redis with in-memory fallback.
 Fixes M2 (login rate limiting) and M3 (in-memory rate limiting not production-ready).
 
-Uses sliding window algorithm for accurate rate limiting.
+Each check is one Lua script call (EVALSHA), so reading the window, admitting
+the request and applying a block happen atomically in a single round trip.
+Two algorithms are available per limit type:
+
+- Sliding window log: exact count of requests in the trailing window
+- GCRA (token bucket): constant memory, requests spaced at window/max with a
+  burst of max_requests
 """
 
 import logging
+import math
 import time
+import uuid
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from enum import StrEnum
@@ -26,6 +34,13 @@ class RateLimitType(StrEnum):
     API_WRITE = "api_write"  # Moderate: 30 requests per minute
     API_SEARCH = "api_search"  # Relaxed: 60 requests per minute
     PASSWORD_RESET = "password_reset"  # Very strict: 3 per hour
+    HIGH_RESOURCE = "high_resource"  # Compute endpoints: 20 per minute per client and path
+
+
+class RateLimitAlgorithm(StrEnum):
+    """Rate limiting algorithms."""
+    SLIDING_WINDOW = "sliding_window"
+    GCRA = "gcra"
 
 
 @dataclass
@@ -34,6 +49,7 @@ class RateLimitConfig:
     max_requests: int
     window_seconds: int
     block_duration_seconds: int = 0  # How long to block after limit exceeded
+    algorithm: RateLimitAlgorithm = RateLimitAlgorithm.SLIDING_WINDOW
 
 
 # Rate limit configurations
@@ -47,6 +63,7 @@ RATE_LIMITS: dict[RateLimitType, RateLimitConfig] = {
         max_requests=100,
         window_seconds=60,
         block_duration_seconds=60,
+        algorithm=RateLimitAlgorithm.GCRA,
     ),
     RateLimitType.API_WRITE: RateLimitConfig(
         max_requests=30,
@@ -57,12 +74,99 @@ RATE_LIMITS: dict[RateLimitType, RateLimitConfig] = {
         max_requests=60,
         window_seconds=60,
         block_duration_seconds=60,
+        algorithm=RateLimitAlgorithm.GCRA,
     ),
     RateLimitType.PASSWORD_RESET: RateLimitConfig(
         max_requests=3,
         window_seconds=3600,  # 1 hour
         block_duration_seconds=3600,
     ),
+    RateLimitType.HIGH_RESOURCE: RateLimitConfig(
+        max_requests=20,
+        window_seconds=60,
+    ),
+}
+
+
+# KEYS: window log, block key
+# ARGV: now (ms), window (ms), max requests, block (ms), unique member
+# Returns: {allowed, remaining, reset_at (ms), retry_after (ms)}
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local block = tonumber(ARGV[4])
+
+local blocked = redis.call('PTTL', KEYS[2])
+if blocked > 0 then
+    return {0, 0, now + blocked, blocked}
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    local reset = now + window
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        reset = tonumber(oldest[2]) + window
+    end
+    if block > 0 then
+        redis.call('SET', KEYS[2], '1', 'PX', block)
+        reset = math.max(reset, now + block)
+    end
+    return {0, 0, reset, reset - now}
+end
+
+redis.call('ZADD', KEYS[1], now, ARGV[5])
+redis.call('PEXPIRE', KEYS[1], window + 60000)
+return {1, limit - count - 1, now + window, 0}
+"""
+
+# KEYS: theoretical arrival time (TAT) key, block key
+# ARGV: now (ms), window (ms), max requests, block (ms)
+# Returns: {allowed, remaining, reset_at (ms), retry_after (ms)}
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local block = tonumber(ARGV[4])
+local interval = window / limit
+
+local blocked = redis.call('PTTL', KEYS[2])
+if blocked > 0 then
+    return {0, 0, now + blocked, blocked}
+end
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if now < allow_at then
+    local retry = math.ceil(allow_at - now)
+    if block > 0 then
+        redis.call('SET', KEYS[2], '1', 'PX', block)
+        retry = math.max(retry, block)
+    end
+    return {0, 0, now + retry, retry}
+end
+
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / interval), math.ceil(new_tat), 0}
+"""
+
+# Limits that protect credentials deny requests when Redis errors instead of
+# letting them through unchecked; clients are asked to retry shortly
+FAIL_CLOSED_RETRY_SECONDS = 30
+FAIL_CLOSED: frozenset[RateLimitType] = frozenset({
+    RateLimitType.LOGIN,
+    RateLimitType.PASSWORD_RESET,
+})
+
+SCRIPTS = {
+    RateLimitAlgorithm.SLIDING_WINDOW: SLIDING_WINDOW_SCRIPT,
+    RateLimitAlgorithm.GCRA: GCRA_SCRIPT,
 }
 
 
@@ -75,20 +179,31 @@ class RateLimitResult:
     retry_after: int | None = None  # Seconds until retry allowed
 
 
+def _result(allowed: int, remaining: int, reset_ms: float, retry_ms: float) -> RateLimitResult:
+    return RateLimitResult(
+        allowed=bool(allowed),
+        remaining=max(int(remaining), 0),
+        reset_at=datetime.fromtimestamp(reset_ms / 1000, tz=UTC),
+        retry_after=None if allowed else max(math.ceil(retry_ms / 1000), 0),
+    )
+
+
 class RateLimiter:
     """
     Production-ready rate limiter using Redis.
 
     Features:
-    - Sliding window algorithm for accuracy
+    - Sliding window log or GCRA per limit type
+    - One atomic Lua call per check (no read-then-write races)
     - Redis-backed for multi-instance support
-    - In-memory fallback for development
+    - In-memory fallback for development, with the same semantics
     - Configurable limits per endpoint type
     - Automatic cleanup of expired entries
     """
 
     def __init__(self):
         self._in_memory_store: dict[str, list] = {}
+        self._tat: dict[str, float] = {}
         self._blocked: dict[str, float] = {}
 
     def _get_key(self, limit_type: RateLimitType, identifier: str) -> str:
@@ -105,7 +220,7 @@ class RateLimiter:
         identifier: str,
     ) -> RateLimitResult:
         """
-        Check if request is allowed under rate limit.
+        Check if request is allowed under rate limit, and count it if it is.
 
         Args:
             limit_type: Type of rate limit to apply
@@ -115,34 +230,16 @@ class RateLimiter:
             RateLimitResult with allowed status and metadata
         """
         config = RATE_LIMITS[limit_type]
-        now = time.time()
-        window_start = now - config.window_seconds
-
-        # Check if blocked
-        if await self._is_blocked(limit_type, identifier):
-            block_key = self._get_block_key(limit_type, identifier)
-            if redis_client.is_available:
-                ttl = await redis_client.ttl(block_key)
-            else:
-                ttl = int(self._blocked.get(f"{limit_type.value}:{identifier}", 0) - now)
-
-            return RateLimitResult(
-                allowed=False,
-                remaining=0,
-                reset_at=datetime.fromtimestamp(now + max(ttl, 0), tz=UTC),
-                retry_after=max(ttl, 0),
-            )
+        now_ms = time.time() * 1000
 
         # Use Redis if available, otherwise in-memory
         if redis_client.is_available:
-            result = await self._check_redis(limit_type, identifier, config, now, window_start)
+            result = await self._check_redis(limit_type, identifier, config, now_ms)
         else:
-            result = self._check_memory(limit_type, identifier, config, now, window_start)
-
-        # If limit exceeded, apply block
-        if not result.allowed and config.block_duration_seconds > 0:
-            await self._apply_block(limit_type, identifier, config.block_duration_seconds)
+            result = self._check_memory(limit_type, identifier, config, now_ms)
 
+        if not result.allowed:
+            logger.debug(f"Rate limit exceeded: {limit_type.value} for {identifier}")
         return result
 
     async def _check_redis(
@@ -150,60 +247,40 @@ class RateLimiter:
         limit_type: RateLimitType,
         identifier: str,
         config: RateLimitConfig,
-        now: float,
-        window_start: float,
+        now_ms: float,
     ) -> RateLimitResult:
-        """Check rate limit using Redis sorted set (sliding window)."""
-        key = self._get_key(limit_type, identifier)
+        """Check rate limit with one atomic Lua script call."""
+        keys = [self._get_key(limit_type, identifier), self._get_block_key(limit_type, identifier)]
+        args = [
+            int(now_ms),
+            config.window_seconds * 1000,
+            config.max_requests,
+            config.block_duration_seconds * 1000,
+        ]
+        if config.algorithm == RateLimitAlgorithm.SLIDING_WINDOW:
+            # Unique member so concurrent requests in the same millisecond are all counted
+            args.append(f"{int(now_ms)}:{uuid.uuid4().hex}")
 
         try:
-            # Use Redis sorted set for sliding window
-            # Score = timestamp, Member = unique request ID
-
-            # Remove old entries outside window
-            await redis_client._client.zremrangebyscore(key, 0, window_start)
-
-            # Count current requests in window
-            count = await redis_client._client.zcard(key)
-
-            if count >= config.max_requests:
-                # Get oldest entry to calculate reset time
-                oldest = await redis_client._client.zrange(key, 0, 0, withscores=True)
-                if oldest:
-                    reset_time = oldest[0][1] + config.window_seconds
-                else:
-                    reset_time = now + config.window_seconds
+            allowed, remaining, reset_ms, retry_ms = await redis_client.eval_script(
+                SCRIPTS[config.algorithm], keys, args
+            )
+            return _result(allowed, remaining, reset_ms, retry_ms)
 
+        except Exception as e:
+            logger.error(f"Redis rate limit error: {e}")
+            if limit_type in FAIL_CLOSED:
                 return RateLimitResult(
                     allowed=False,
                     remaining=0,
-                    reset_at=datetime.fromtimestamp(reset_time, tz=UTC),
-                    retry_after=int(reset_time - now),
+                    reset_at=datetime.fromtimestamp(now_ms / 1000 + FAIL_CLOSED_RETRY_SECONDS, tz=UTC),
+                    retry_after=FAIL_CLOSED_RETRY_SECONDS,
                 )
-
-            # Add current request
-            request_id = f"{now}:{identifier}"
-            await redis_client._client.zadd(key, {request_id: now})
-
-            # Set TTL on the key
-            await redis_client._client.expire(key, config.window_seconds + 60)
-
-            remaining = config.max_requests - count - 1
-            reset_at = datetime.fromtimestamp(now + config.window_seconds, tz=UTC)
-
-            return RateLimitResult(
-                allowed=True,
-                remaining=remaining,
-                reset_at=reset_at,
-            )
-
-        except Exception as e:
-            logger.error(f"Redis rate limit error: {e}")
             # Fail open - allow request but log error
             return RateLimitResult(
                 allowed=True,
                 remaining=config.max_requests,
-                reset_at=datetime.fromtimestamp(now + config.window_seconds, tz=UTC),
+                reset_at=datetime.fromtimestamp(now_ms / 1000 + config.window_seconds, tz=UTC),
             )
 
     def _check_memory(
@@ -211,48 +288,48 @@ class RateLimiter:
         limit_type: RateLimitType,
         identifier: str,
         config: RateLimitConfig,
-        now: float,
-        window_start: float,
+        now_ms: float,
     ) -> RateLimitResult:
-        """Check rate limit using in-memory storage (development fallback)."""
-        key = f"{limit_type.value}:{identifier}"
-
-        # Initialize if needed
-        if key not in self._in_memory_store:
-            self._in_memory_store[key] = []
-
-        # Remove old entries
-        self._in_memory_store[key] = [
-            ts for ts in self._in_memory_store[key] if ts > window_start
-        ]
-
-        count = len(self._in_memory_store[key])
-
-        if count >= config.max_requests:
-            # Calculate reset time from oldest entry
-            if self._in_memory_store[key]:
-                reset_time = self._in_memory_store[key][0] + config.window_seconds
-            else:
-                reset_time = now + config.window_seconds
-
-            return RateLimitResult(
-                allowed=False,
-                remaining=0,
-                reset_at=datetime.fromtimestamp(reset_time, tz=UTC),
-                retry_after=int(reset_time - now),
-            )
-
-        # Add current request
-        self._in_memory_store[key].append(now)
-
-        remaining = config.max_requests - count - 1
-        reset_at = datetime.fromtimestamp(now + config.window_seconds, tz=UTC)
+        """
+        Check rate limit using in-memory storage (development fallback).
 
-        return RateLimitResult(
-            allowed=True,
-            remaining=remaining,
-            reset_at=reset_at,
-        )
+        Mirrors the Lua scripts; it never awaits, so it is atomic within the event loop.
+        """
+        key = f"{limit_type.value}:{identifier}"
+        window_ms = config.window_seconds * 1000
+        block_ms = config.block_duration_seconds * 1000
+
+        blocked_until = self._blocked.get(key)
+        if blocked_until is not None:
+            if blocked_until > now_ms:
+                return _result(0, 0, blocked_until, blocked_until - now_ms)
+            del self._blocked[key]
+
+        if config.algorithm == RateLimitAlgorithm.GCRA:
+            interval = window_ms / config.max_requests
+            tat = max(self._tat.get(key, now_ms), now_ms)
+            new_tat = tat + interval
+            allow_at = new_tat - window_ms
+            if now_ms < allow_at:
+                retry = math.ceil(allow_at - now_ms)
+                if block_ms:
+                    self._blocked[key] = now_ms + block_ms
+                    retry = max(retry, block_ms)
+                return _result(0, 0, now_ms + retry, retry)
+            self._tat[key] = new_tat
+            return _result(1, math.floor((now_ms - allow_at) / interval), new_tat, 0)
+
+        log = [ts for ts in self._in_memory_store.get(key, []) if ts > now_ms - window_ms]
+        self._in_memory_store[key] = log
+        if len(log) >= config.max_requests:
+            reset = log[0] + window_ms
+            if block_ms:
+                self._blocked[key] = now_ms + block_ms
+                reset = max(reset, now_ms + block_ms)
+            return _result(0, 0, reset, reset - now_ms)
+
+        log.append(now_ms)
+        return _result(1, config.max_requests - len(log), now_ms + window_ms, 0)
 
     async def _is_blocked(self, limit_type: RateLimitType, identifier: str) -> bool:
         """Check if identifier is currently blocked."""
@@ -262,28 +339,12 @@ class RateLimiter:
         else:
             key = f"{limit_type.value}:{identifier}"
             if key in self._blocked:
-                if time.time() > self._blocked[key]:
+                if time.time() * 1000 > self._blocked[key]:
                     del self._blocked[key]
                     return False
                 return True
             return False
 
-    async def _apply_block(
-        self,
-        limit_type: RateLimitType,
-        identifier: str,
-        duration_seconds: int,
-    ) -> None:
-        """Apply a temporary block."""
-        if redis_client.is_available:
-            block_key = self._get_block_key(limit_type, identifier)
-            await redis_client.set(block_key, "blocked", ttl_seconds=duration_seconds)
-            logger.warning(f"Rate limit block applied: {limit_type.value} for {identifier}")
-        else:
-            key = f"{limit_type.value}:{identifier}"
-            self._blocked[key] = time.time() + duration_seconds
-            logger.warning(f"Rate limit block applied (in-memory): {limit_type.value} for {identifier}")
-
     async def reset(self, limit_type: RateLimitType, identifier: str) -> bool:
         """Reset rate limit for an identifier (admin function)."""
         key = self._get_key(limit_type, identifier)
@@ -295,6 +356,7 @@ class RateLimiter:
         else:
             mem_key = f"{limit_type.value}:{identifier}"
             self._in_memory_store.pop(mem_key, None)
+            self._tat.pop(mem_key, None)
             self._blocked.pop(mem_key, None)
 
         return True
@@ -303,28 +365,32 @@ class RateLimiter:
         """Get current rate limit status for an identifier."""
         config = RATE_LIMITS[limit_type]
         key = self._get_key(limit_type, identifier)
-        now = time.time()
-        window_start = now - config.window_seconds
+        mem_key = f"{limit_type.value}:{identifier}"
+        now_ms = time.time() * 1000
+        window_ms = config.window_seconds * 1000
 
-        if redis_client.is_available:
-            # Clean old entries
-            await redis_client._client.zremrangebyscore(key, 0, window_start)
-            count = await redis_client._client.zcard(key)
-        else:
-            mem_key = f"{limit_type.value}:{identifier}"
-            if mem_key in self._in_memory_store:
-                self._in_memory_store[mem_key] = [
-                    ts for ts in self._in_memory_store[mem_key] if ts > window_start
-                ]
-                count = len(self._in_memory_store[mem_key])
+        if config.algorithm == RateLimitAlgorithm.GCRA:
+            # Requests "in flight" in the bucket: how far the TAT runs ahead of now
+            if redis_client.is_available:
+                tat = float(await redis_client.get(key) or 0)
             else:
-                count = 0
+                tat = self._tat.get(mem_key, 0)
+            count = math.ceil(max(tat - now_ms, 0) / (window_ms / config.max_requests))
+        elif redis_client.is_available:
+            async with redis_client._client.pipeline(transaction=True) as pipe:
+                pipe.zremrangebyscore(key, "-inf", now_ms - window_ms)
+                pipe.zcard(key)
+                _, count = await pipe.execute()
+        else:
+            log = self._in_memory_store.get(mem_key, [])
+            count = len([ts for ts in log if ts > now_ms - window_ms])
 
         is_blocked = await self._is_blocked(limit_type, identifier)
 
         return {
             "limit_type": limit_type.value,
             "identifier": identifier,
+            "algorithm": config.algorithm.value,
             "max_requests": config.max_requests,
             "window_seconds": config.window_seconds,
             "current_count": count,
@@ -0,0 +1,536 @@
+"""
+Result Artifact Service
+
+Binary storage for large compute outputs (relationship matrices, GWAS scans).
+
+Arrays are written once as ``.npy`` (tables as uncompressed ``.npz`` with one
+array per column) next to a JSON sidecar, and handed back to API callers as
+small handles. Downloads are streamed from the stored file:
+
+- ``application/x-npy`` (``application/x-npz`` for tables): the stored file
+  itself, no re-encoding
+- ``application/vnd.apache.arrow.stream``: Arrow IPC record batches built from
+  memory-mapped arrays (requires pyarrow)
+- ``application/json``: incremental JSON, only when explicitly requested
+
+Encoded files (exports) are stored as-is and served with their own media type.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import tempfile
+import uuid
+from collections.abc import AsyncIterable, Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_BYTES = 1024 * 1024
+ARTIFACT_HREF_PREFIX = "/api/v2/artifacts"
+
+
+class ArtifactKind(StrEnum):
+    ARRAY = "array"
+    TABLE = "table"
+    FILE = "file"
+
+
+class ArtifactFormat(StrEnum):
+    NPY = "npy"
+    ARROW = "arrow"
+    JSON = "json"
+
+
+MEDIA_TYPES = {
+    ArtifactFormat.NPY: "application/x-npy",
+    ArtifactFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ArtifactFormat.JSON: "application/json",
+}
+TABLE_NPZ_MEDIA_TYPE = "application/x-npz"
+
+
+def media_type_for(artifact: ResultArtifact, fmt: ArtifactFormat) -> str:
+    if fmt == ArtifactFormat.NPY and artifact.kind == ArtifactKind.TABLE:
+        return TABLE_NPZ_MEDIA_TYPE
+    return MEDIA_TYPES[fmt]
+
+
+class UnsupportedArtifactFormat(ValueError):
+    """Requested representation cannot be produced for this artifact."""
+
+
+@dataclass
+class ResultArtifact:
+    """Metadata for a stored compute output."""
+
+    artifact_id: str
+    name: str
+    kind: ArtifactKind
+    filename: str
+    shape: list[int]
+    dtype: str | None = None
+    columns: dict[str, str] = field(default_factory=dict)
+    nbytes: int = 0
+    organization_id: str | None = None
+    created_at: str = ""
+    expires_at: str | None = None
+    metadata: dict[str, Any] = field(default_factory=dict)
+    media_type: str | None = None
+
+    @property
+    def href(self) -> str:
+        return f"{ARTIFACT_HREF_PREFIX}/{self.artifact_id}/data"
+
+    @property
+    def formats(self) -> list[str]:
+        if self.kind == ArtifactKind.FILE:
+            return []
+        formats = [ArtifactFormat.NPY.value]
+        if ARROW_AVAILABLE:
+            formats.append(ArtifactFormat.ARROW.value)
+        formats.append(ArtifactFormat.JSON.value)
+        return formats
+
+    def is_expired(self, now: datetime | None = None) -> bool:
+        if not self.expires_at:
+            return False
+        return datetime.fromisoformat(self.expires_at) <= (now or datetime.now(UTC))
+
+    def to_handle(self) -> dict[str, Any]:
+        """Small JSON-safe reference returned in place of the data."""
+        handle = {
+            "artifact_id": self.artifact_id,
+            "name": self.name,
+            "kind": self.kind.value,
+            "shape": self.shape,
+            "nbytes": self.nbytes,
+            "formats": self.formats,
+            "href": self.href,
+            "created_at": self.created_at,
+            "expires_at": self.expires_at,
+            "metadata": self.metadata,
+        }
+        if self.kind == ArtifactKind.ARRAY:
+            handle["dtype"] = self.dtype
+        elif self.kind == ArtifactKind.FILE:
+            handle["media_type"] = self.media_type
+        else:
+            handle["columns"] = self.columns
+        return handle
+
+
+def negotiate_format(
+    artifact: ResultArtifact,
+    accept: str | None = None,
+    requested: str | None = None,
+) -> ArtifactFormat:
+    """
+    Pick the download representation.
+
+    An explicit ``requested`` format wins; otherwise the Accept header is
+    honoured in order. Wildcards resolve to the cheapest binary format, so
+    JSON is only produced when asked for.
+    """
+    available = artifact.formats
+    if requested:
+        if requested not in available:
+            raise UnsupportedArtifactFormat(
+                f"Format '{requested}' is not available for this artifact (available: {available})"
+            )
+        return ArtifactFormat(requested)
+
+    by_media_type = {media_type_for(artifact, ArtifactFormat(fmt)): ArtifactFormat(fmt) for fmt in available}
+    for part in (accept or "*/*").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in by_media_type:
+            return by_media_type[media_type]
+        if media_type in ("*/*", "application/*", "application/octet-stream", ""):
+            return ArtifactFormat(available[0])
+
+    raise UnsupportedArtifactFormat(
+        f"None of the accepted media types can be produced (available: {available})"
+    )
+
+
+def downsample_matrix(matrix: np.ndarray, max_size: int = 64) -> dict[str, Any]:
+    """
+    Block-mean preview of a (square) matrix plus summary statistics.
+
+    Lets clients draw a heatmap without downloading the full matrix.
+    """
+    n_rows, n_cols = matrix.shape
+    row_edges = np.linspace(0, n_rows, min(n_rows, max_size) + 1).astype(int)
+    col_edges = np.linspace(0, n_cols, min(n_cols, max_size) + 1).astype(int)
+    # Sum over row blocks then column blocks; divide by block sizes for means
+    row_sums = np.add.reduceat(np.asarray(matrix, dtype=np.float64), row_edges[:-1], axis=0)
+    block_sums = np.add.reduceat(row_sums, col_edges[:-1], axis=1)
+    block_sizes = np.outer(np.diff(row_edges), np.diff(col_edges))
+    preview = block_sums / block_sizes
+
+    summary: dict[str, Any] = {
+        "min": float(np.min(matrix)) if matrix.size else None,
+        "max": float(np.max(matrix)) if matrix.size else None,
+    }
+    if n_rows == n_cols and n_rows:
+        diagonal = np.diagonal(matrix)
+        off_diagonal_sum = float(np.sum(matrix) - np.sum(diagonal))
+        off_diagonal_count = n_rows * n_rows - n_rows
+        summary["diagonal_mean"] = float(np.mean(diagonal))
+        summary["off_diagonal_mean"] = off_diagonal_sum / off_diagonal_count if off_diagonal_count else None
+
+    return {
+        "shape": [int(n_rows), int(n_cols)],
+        "preview_shape": list(preview.shape),
+        "values": np.round(preview, 6).tolist(),
+        "summary": summary,
+    }
+
+
+def _to_storable(values: Any) -> np.ndarray:
+    array = np.asarray(values)
+    if array.dtype == object:
+        # Never persist pickled objects; strings round-trip as fixed-width unicode
+        array = array.astype(str)
+    return array
+
+
+class ResultArtifactStore:
+    """
+    Filesystem-backed artifact store.
+
+    Files live under ``RESULT_ARTIFACTS_DIR`` (default: a directory in the
+    system temp dir) as ``<id>.npy``/``<id>.npz`` plus ``<id>.json``.
+    """
+
+    def __init__(self, root: str | None = None, ttl_hours: int | None = None):
+        self.root = root or settings.RESULT_ARTIFACTS_DIR or os.path.join(
+            tempfile.gettempdir(), "bijmantra-result-artifacts"
+        )
+        self.ttl = timedelta(hours=settings.RESULT_ARTIFACT_TTL_HOURS if ttl_hours is None else ttl_hours)
+
+    # ============================================
+    # WRITE
+    # ============================================
+
+    def save_array(
+        self,
+        array: np.ndarray,
+        name: str,
+        organization_id: Any = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> ResultArtifact:
+        """Persist a numeric array and return its handle."""
+        array = np.ascontiguousarray(_to_storable(array))
+        artifact = self._new_artifact(
+            name,
+            ArtifactKind.ARRAY,
+            ".npy",
+            organization_id=organization_id,
+            metadata=metadata,
+            shape=list(array.shape),
+            dtype=array.dtype.str,
+            nbytes=int(array.nbytes),
+        )
+        self._write_atomic(artifact.filename, lambda handle: np.save(handle, array, allow_pickle=False))
+        self._write_sidecar(artifact)
+        return artifact
+
+    def save_table(
+        self,
+        columns: dict[str, Any],
+        name: str,
+        organization_id: Any = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> ResultArtifact:
+        """Persist equal-length columns (one array each) and return the handle."""
+        arrays = {column: _to_storable(values) for column, values in columns.items()}
+        lengths = {array.shape[0] for array in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Table columns must have equal length, got {sorted(lengths)}")
+        artifact = self._new_artifact(
+            name,
+            ArtifactKind.TABLE,
+            ".npz",
+            organization_id=organization_id,
+            metadata=metadata,
+            shape=[lengths.pop() if lengths else 0, len(arrays)],
+            columns={column: array.dtype.str for column, array in arrays.items()},
+            nbytes=int(sum(array.nbytes for array in arrays.values())),
+        )
+        self._write_atomic(artifact.filename, lambda handle: np.savez(handle, **arrays))
+        self._write_sidecar(artifact)
+        return artifact
+
+    async def save_chunks(
+        self,
+        chunks: AsyncIterable[bytes],
+        name: str,
+        suffix: str,
+        media_type: str,
+        organization_id: Any = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> ResultArtifact:
+        """Write an already-encoded file chunk by chunk and return its handle."""
+        artifact = self._new_artifact(
+            name,
+            ArtifactKind.FILE,
+            suffix,
+            organization_id=organization_id,
+            metadata=metadata,
+            shape=[],
+            media_type=media_type,
+        )
+        target = self.path(artifact)
+        temp_path = f"{target}.tmp"
+        try:
+            with open(temp_path, "wb") as handle:
+                async for chunk in chunks:
+                    handle.write(chunk)
+                    artifact.nbytes += len(chunk)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp_path)
+            raise
+        os.replace(temp_path, target)
+        self._write_sidecar(artifact)
+        return artifact
+
+    def _new_artifact(
+        self, name: str, kind: ArtifactKind, suffix: str, organization_id: Any, metadata, **fields
+    ) -> ResultArtifact:
+        os.makedirs(self.root, exist_ok=True)
+        artifact_id = uuid.uuid4().hex
+        now = datetime.now(UTC)
+        return ResultArtifact(
+            artifact_id=artifact_id,
+            name=name,
+            kind=kind,
+            filename=f"{artifact_id}{suffix}",
+            organization_id=str(organization_id) if organization_id is not None else None,
+            created_at=now.isoformat(),
+            expires_at=(now + self.ttl).isoformat(),
+            metadata=metadata or {},
+            **fields,
+        )
+
+    def _write_atomic(self, filename: str, writer) -> None:
+        target = os.path.join(self.root, filename)
+        temp_path = f"{target}.tmp"
+        with open(temp_path, "wb") as handle:
+            writer(handle)
+        os.replace(temp_path, target)
+
+    def _write_sidecar(self, artifact: ResultArtifact) -> None:
+        payload = json.dumps(asdict(artifact)).encode()
+        self._write_atomic(f"{artifact.artifact_id}.json", lambda handle: handle.write(payload))
+
+    # ============================================
+    # READ
+    # ============================================
+
+    def get(self, artifact_id: str, organization_id: Any = None) -> ResultArtifact | None:
+        """Artifact metadata, or None when missing, expired or owned by another organization."""
+        if not artifact_id.isalnum():
+            return None
+        try:
+            with open(os.path.join(self.root, f"{artifact_id}.json")) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+        artifact = ResultArtifact(**{**data, "kind": ArtifactKind(data["kind"])})
+        if artifact.is_expired():
+            return None
+        if artifact.organization_id is not None and artifact.organization_id != str(organization_id):
+            return None
+        return artifact
+
+    def path(self, artifact: ResultArtifact) -> str:
+        return os.path.join(self.root, artifact.filename)
+
+    def load_array(self, artifact: ResultArtifact) -> np.ndarray:
+        """Memory-mapped view of a stored array (no copy into process memory)."""
+        return np.load(self.path(artifact), mmap_mode="r", allow_pickle=False)
+
+    def load_table(self, artifact: ResultArtifact) -> dict[str, np.ndarray]:
+        with np.load(self.path(artifact), allow_pickle=False) as archive:
+            return {column: archive[column] for column in artifact.columns}
+
+    # ============================================
+    # STREAMING
+    # ============================================
+
+    def iter_bytes(
+        self, artifact: ResultArtifact, fmt: ArtifactFormat, rows_per_batch: int | None = None
+    ) -> Iterator[bytes]:
+        """Encoded download body in chunks."""
+        if fmt == ArtifactFormat.NPY:
+            yield from self._iter_file(self.path(artifact))
+        elif fmt == ArtifactFormat.ARROW:
+            yield from self._iter_arrow(artifact, rows_per_batch)
+        else:
+            yield from self._iter_json(artifact, rows_per_batch)
+
+    def _rows_per_batch(self, artifact: ResultArtifact, rows_per_batch: int | None) -> int:
+        if rows_per_batch:
+            return rows_per_batch
+        n_rows = max(artifact.shape[0], 1) if artifact.shape else 1
+        row_bytes = max(artifact.nbytes // n_rows, 1)
+        return max(STREAM_CHUNK_BYTES // row_bytes, 1)
+
+    def _iter_file(self, path: str) -> Iterator[bytes]:
+        with open(path, "rb") as handle:
+            while chunk := handle.read(STREAM_CHUNK_BYTES):
+                yield chunk
+
+    def _arrow_batches(self, artifact: ResultArtifact, rows_per_batch: int):
+        if artifact.kind == ArtifactKind.TABLE:
+            table = self.load_table(artifact)
+            n_rows = artifact.shape[0]
+            for start in range(0, n_rows, rows_per_batch):
+                yield pa.record_batch(
+                    [pa.array(values[start:start + rows_per_batch]) for values in table.values()],
+                    names=list(table),
+                )
+            return
+
+        array = self.load_array(artifact)
+        if array.ndim == 0:
+            array = array.reshape(1)
+        for start in range(0, array.shape[0], rows_per_batch):
+            block = np.ascontiguousarray(array[start:start + rows_per_batch])
+            if block.ndim == 1:
+                column = pa.array(block)
+            else:
+                # Each row of a matrix is one fixed-size list; the flat buffer is shared
+                column = pa.FixedSizeListArray.from_arrays(pa.array(block.reshape(-1)), block.shape[1])
+            yield pa.record_batch([column], names=["values"])
+
+    def _iter_arrow(self, artifact: ResultArtifact, rows_per_batch: int | None) -> Iterator[bytes]:
+        if not ARROW_AVAILABLE:
+            raise UnsupportedArtifactFormat("Arrow IPC output requires pyarrow")
+
+        sink = io.BytesIO()
+        writer = None
+        schema_metadata = {
+            "artifact_id": artifact.artifact_id,
+            "shape": json.dumps(artifact.shape),
+        }
+        for batch in self._arrow_batches(artifact, self._rows_per_batch(artifact, rows_per_batch)):
+            if writer is None:
+                writer = pa.ipc.new_stream(sink, batch.schema.with_metadata(schema_metadata))
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+        if writer is not None:
+            writer.close()
+            yield sink.getvalue()
+
+    def _iter_json(self, artifact: ResultArtifact, rows_per_batch: int | None) -> Iterator[bytes]:
+        batch_rows = self._rows_per_batch(artifact, rows_per_batch)
+        yield b"["
+        first = True
+        if artifact.kind == ArtifactKind.TABLE:
+            table = self.load_table(artifact)
+            names = list(table)
+            for start in range(0, artifact.shape[0], batch_rows):
+                columns = [table[name][start:start + batch_rows].tolist() for name in names]
+                rows = (json.dumps(dict(zip(names, row, strict=True))) for row in zip(*columns, strict=True))
+                chunk = ",".join(rows)
+                if chunk:
+                    yield (chunk if first else "," + chunk).encode()
+                    first = False
+        else:
+            array = self.load_array(artifact)
+            if array.ndim == 0:
+                array = array.reshape(1)
+            for start in range(0, array.shape[0], batch_rows):
+                chunk = ",".join(json.dumps(row) for row in array[start:start + batch_rows].tolist())
+                if chunk:
+                    yield (chunk if first else "," + chunk).encode()
+                    first = False
+        yield b"]"
+
+    # ============================================
+    # HOUSEKEEPING
+    # ============================================
+
+    def delete(self, artifact: ResultArtifact) -> None:
+        for filename in (artifact.filename, f"{artifact.artifact_id}.json"):
+            try:
+                os.remove(os.path.join(self.root, filename))
+            except FileNotFoundError:
+                pass
+
+    def purge_expired(self) -> int:
+        """Remove expired artifacts. Returns the number removed."""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        now = datetime.now(UTC)
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path) as handle:
+                    data = json.load(handle)
+                artifact = ResultArtifact(**{**data, "kind": ArtifactKind(data["kind"])})
+            except (OSError, ValueError, TypeError) as exc:
+                logger.warning("Skipping unreadable artifact sidecar %s: %s", entry.name, exc)
+                continue
+            if artifact.is_expired(now):
+                self.delete(artifact)
+                removed += 1
+        return removed
+
+
+result_artifact_store = ResultArtifactStore()
+
+
+def get_result_artifact_store() -> ResultArtifactStore:
+    return result_artifact_store
+
+
+async def run_artifact_purge_loop(interval_seconds: int = 3600):
+    """
+    Background task that removes expired artifacts (compute results and exports)
+
+    Usage:
+        # In lifespan
+        asyncio.create_task(run_artifact_purge_loop())
+    """
+    logger.info("[ResultArtifacts] Starting purge loop")
+
+    while True:
+        try:
+            removed = await asyncio.to_thread(result_artifact_store.purge_expired)
+            if removed:
+                logger.info("[ResultArtifacts] Purged %d expired artifacts", removed)
+            await asyncio.sleep(interval_seconds)
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"[ResultArtifacts] Error in purge loop: {e}")
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,461 @@
+"""
+Spectral Calibration Service
+Vectorised spectral preprocessing and PLS calibration shared by NIRS and phenomic selection
+
+Preprocessing runs on the whole (samples × wavelengths) matrix at once:
+
+- ``snv`` — standard normal variate, per-row centring and scaling
+- ``msc`` — multiplicative scatter correction against a reference spectrum,
+  all rows solved as one least-squares problem with a shared design matrix
+- ``emsc`` — extended MSC, adding a polynomial baseline in wavelength
+- ``sg0`` / ``sg1`` / ``sg2`` — Savitzky-Golay smoothing and derivatives
+
+PLS1 is fitted with SIMPLS. A k-component model's coefficients are the first
+k columns of the weight matrix times the y-loadings, so one fit scores every
+component count; cross-validation fits once per fold (folds in parallel
+threads, BLAS releases the GIL) and picks the component count with the lowest
+RMSECV. Calibrations (preprocessing state + coefficients) persist as ``.npz``.
+
+Preprocessed matrices are cached per dataset and pipeline, keyed by a content
+digest of the raw spectra, so calibrating several traits on one dataset
+preprocesses it once. Reference spectra are estimated on the full calibration
+set (unsupervised, no reference values involved) before cross-validation.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from scipy.signal import savgol_filter
+
+
+logger = logging.getLogger(__name__)
+
+PREPROCESSING_STEPS = ("raw", "snv", "msc", "emsc", "sg0", "sg1", "sg2")
+# Steps whose state (a reference spectrum) is learned from calibration spectra
+REFERENCE_STEPS = ("msc", "emsc")
+DEFAULT_MAX_COMPONENTS = 20
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+
+# ============================================
+# PREPROCESSING
+# ============================================
+
+def snv(spectra: np.ndarray) -> np.ndarray:
+    means = spectra.mean(axis=1, keepdims=True)
+    stds = spectra.std(axis=1, keepdims=True)
+    stds[stds == 0] = 1.0
+    return (spectra - means) / stds
+
+
+def _scatter_correct(spectra: np.ndarray, design: np.ndarray) -> np.ndarray:
+    """
+    Solve ``spectra[i] ≈ design @ c[i]`` for every row in one lstsq call and
+    remove all terms but the last (the reference), dividing by its slope.
+    """
+    coef, *_ = np.linalg.lstsq(design, spectra.T, rcond=None)  # (n_terms, n_samples)
+    slope = coef[-1]
+    slope = np.where(np.abs(slope) > 1e-12, slope, 1.0)
+    baseline = design[:, :-1] @ coef[:-1]
+    return ((spectra.T - baseline) / slope).T
+
+
+def msc(spectra: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    design = np.column_stack([np.ones_like(reference), reference])
+    return _scatter_correct(spectra, design)
+
+
+def emsc(spectra: np.ndarray, reference: np.ndarray, degree: int = 2) -> np.ndarray:
+    axis = np.linspace(-1.0, 1.0, len(reference))
+    design = np.column_stack([axis ** d for d in range(degree + 1)] + [reference])
+    return _scatter_correct(spectra, design)
+
+
+def savgol(spectra: np.ndarray, window: int, polyorder: int, deriv: int) -> np.ndarray:
+    n_wavelengths = spectra.shape[1]
+    if window >= n_wavelengths:
+        window = max(5, n_wavelengths // 2 * 2 - 1)
+    return savgol_filter(spectra, window, polyorder, deriv=deriv, axis=1)
+
+
+@dataclass
+class SpectralPreprocessor:
+    """
+    An ordered preprocessing pipeline, e.g. ``("emsc", "sg1")``.
+
+    ``fit`` learns the reference spectrum of each MSC/EMSC step (the mean
+    spectrum reaching that step) so new spectra are corrected against the
+    calibration set rather than their own batch.
+    """
+    steps: tuple[str, ...] = ("snv",)
+    window: int = 11
+    polyorder: int = 2
+    emsc_degree: int = 2
+    references: dict[int, np.ndarray] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.steps = tuple(self.steps)
+        unknown = [s for s in self.steps if s not in PREPROCESSING_STEPS]
+        if unknown:
+            raise ValueError(f"Unknown preprocessing method: {unknown[0]}")
+
+    @property
+    def spec(self) -> tuple:
+        """Hashable description of the pipeline (without fitted state)."""
+        return (self.steps, self.window, self.polyorder, self.emsc_degree)
+
+    def _apply(self, spectra: np.ndarray, fit: bool) -> np.ndarray:
+        out = np.asarray(spectra, dtype=np.float64)
+        for i, step in enumerate(self.steps):
+            if step == "raw":
+                continue
+            if step == "snv":
+                out = snv(out)
+            elif step in REFERENCE_STEPS:
+                if fit:
+                    self.references[i] = out.mean(axis=0)
+                elif i not in self.references:
+                    raise ValueError(f"Preprocessor step '{step}' has not been fitted")
+                reference = self.references[i]
+                out = msc(out, reference) if step == "msc" else emsc(out, reference, self.emsc_degree)
+            else:
+                out = savgol(out, self.window, self.polyorder, deriv=int(step[-1]))
+        return out if out is not spectra else out.copy()
+
+    def fit_transform(self, spectra: np.ndarray) -> np.ndarray:
+        return self._apply(spectra, fit=True)
+
+    def transform(self, spectra: np.ndarray) -> np.ndarray:
+        return self._apply(spectra, fit=False)
+
+
+# ============================================
+# SIMPLS
+# ============================================
+
+@dataclass
+class PLSFit:
+    """SIMPLS PLS1 fit; column k of ``weights`` maps centred X to score k."""
+    x_mean: np.ndarray
+    y_mean: float
+    weights: np.ndarray  # R (n_wavelengths, n_components)
+    y_loadings: np.ndarray  # q (n_components,)
+
+    @property
+    def n_components(self) -> int:
+        return len(self.y_loadings)
+
+    def coefficients(self, n_components: int | None = None) -> np.ndarray:
+        k = self.n_components if n_components is None else min(n_components, self.n_components)
+        return self.weights[:, :k] @ self.y_loadings[:k]
+
+    def predict_all(self, spectra: np.ndarray) -> np.ndarray:
+        """(n_samples, n_components) predictions of the 1..K component models."""
+        scores = (spectra - self.x_mean) @ self.weights
+        return self.y_mean + np.cumsum(scores * self.y_loadings, axis=1)
+
+    def predict(self, spectra: np.ndarray, n_components: int | None = None) -> np.ndarray:
+        return (spectra - self.x_mean) @ self.coefficients(n_components) + self.y_mean
+
+
+def simpls(X: np.ndarray, y: np.ndarray, n_components: int) -> PLSFit:
+    """
+    SIMPLS (de Jong 1993) for a single response.
+
+    Stops early once X has no covariance with y left to explain, so the fit
+    may hold fewer than ``n_components`` components.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n, p = X.shape
+    x_mean = X.mean(axis=0)
+    y_mean = float(y.mean())
+    Xc = X - x_mean
+    yc = y - y_mean
+    n_components = max(0, min(n_components, n - 1, p))
+
+    R = np.zeros((p, n_components))
+    V = np.zeros((p, n_components))
+    q = np.zeros(n_components)
+    s = Xc.T @ yc
+    s_norm0 = np.linalg.norm(s)
+    fitted = 0
+    for a in range(n_components):
+        if np.linalg.norm(s) <= 1e-10 * s_norm0 or s_norm0 == 0:
+            break
+        r = s.copy()
+        t = Xc @ r
+        t_norm = np.linalg.norm(t)
+        if t_norm < 1e-12:
+            break
+        t /= t_norm
+        r /= t_norm
+        loading = Xc.T @ t
+        v = loading - V[:, :a] @ (V[:, :a].T @ loading)
+        v_norm = np.linalg.norm(v)
+        if v_norm < 1e-12:
+            break
+        v /= v_norm
+        s -= v * (v @ s)
+        R[:, a] = r
+        V[:, a] = v
+        q[a] = yc @ t
+        fitted = a + 1
+
+    return PLSFit(x_mean=x_mean, y_mean=y_mean, weights=R[:, :fitted], y_loadings=q[:fitted])
+
+
+def _fold_predictions(args: tuple) -> tuple[np.ndarray, np.ndarray]:
+    X, y, train_idx, val_idx, max_components = args
+    fit = simpls(X[train_idx], y[train_idx], max_components)
+    predictions = np.empty((len(val_idx), max_components))
+    if fit.n_components:
+        fitted = fit.predict_all(X[val_idx])
+        predictions[:, :fit.n_components] = fitted
+        # Folds that ran out of components keep predicting with their largest model
+        predictions[:, fit.n_components:] = fitted[:, -1:]
+    else:
+        predictions[:] = fit.y_mean
+    return val_idx, predictions
+
+
+def cross_validate_pls(
+    X: np.ndarray,
+    y: np.ndarray,
+    max_components: int = DEFAULT_MAX_COMPONENTS,
+    n_folds: int = 5,
+    random_state: int | None = None,
+    max_workers: int | None = None,
+) -> dict[str, Any]:
+    """
+    K-fold RMSECV for every component count 1..max_components from one SIMPLS
+    fit per fold. Returns per-count RMSECV/R², the best count and its
+    out-of-fold predictions.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    n_folds = max(2, min(n_folds, n))
+    max_components = max(1, min(max_components, n - n // n_folds - 1, X.shape[1]))
+    folds = np.array_split(np.random.default_rng(random_state).permutation(n), n_folds)
+    tasks = [
+        (X, y, np.concatenate(folds[:i] + folds[i + 1:]), fold, max_components)
+        for i, fold in enumerate(folds)
+    ]
+
+    workers = min(n_folds, max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        results = [_fold_predictions(task) for task in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fold_predictions, tasks))
+
+    y_pred = np.empty((n, max_components))
+    for val_idx, predictions in results:
+        y_pred[val_idx] = predictions
+
+    ss_res = ((y[:, None] - y_pred) ** 2).sum(axis=0)
+    ss_tot = float(((y - y.mean()) ** 2).sum())
+    rmse_cv = np.sqrt(ss_res / n)
+    r2_cv = 1 - ss_res / ss_tot if ss_tot > 0 else np.zeros(max_components)
+    best = int(np.argmin(rmse_cv))
+    return {
+        "rmse_cv_by_components": rmse_cv.tolist(),
+        "r2_cv_by_components": r2_cv.tolist(),
+        "best_n_components": best + 1,
+        "rmse_cv": float(rmse_cv[best]),
+        "r2_cv": float(r2_cv[best]),
+        "y_pred_cv": y_pred[:, best],
+        "n_folds": n_folds,
+    }
+
+
+# ============================================
+# CALIBRATIONS
+# ============================================
+
+@dataclass
+class SpectralCalibration:
+    """A fitted preprocessing pipeline and PLS coefficients for one trait."""
+    preprocessor: SpectralPreprocessor
+    coefficients: np.ndarray
+    x_mean: np.ndarray
+    y_mean: float
+    n_components: int
+    metrics: dict[str, Any] = field(default_factory=dict)
+
+    def predict(self, spectra: np.ndarray) -> np.ndarray:
+        """Predict from raw spectra (the stored pipeline is applied first)."""
+        spectra = np.atleast_2d(np.asarray(spectra, dtype=np.float64))
+        if spectra.shape[1] != len(self.x_mean):
+            raise ValueError(
+                f"Spectra have {spectra.shape[1]} wavelengths, calibration expects {len(self.x_mean)}"
+            )
+        return (self.preprocessor.transform(spectra) - self.x_mean) @ self.coefficients + self.y_mean
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        p = self.preprocessor
+        arrays = {
+            "coefficients": self.coefficients,
+            "x_mean": self.x_mean,
+            "y_mean": np.float64(self.y_mean),
+            "n_components": np.int64(self.n_components),
+            "steps": np.asarray(p.steps, dtype=str),
+            "settings": np.array([p.window, p.polyorder, p.emsc_degree], dtype=np.int64),
+        }
+        arrays.update({f"reference_{i}": ref for i, ref in p.references.items()})
+        # Write-then-rename so a concurrent predict never loads a partial file
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> SpectralCalibration:
+        with np.load(path, allow_pickle=False) as data:
+            window, polyorder, emsc_degree = (int(v) for v in data["settings"])
+            references = {
+                int(name.rsplit("_", 1)[1]): data[name] for name in data.files if name.startswith("reference_")
+            }
+            preprocessor = SpectralPreprocessor(
+                steps=tuple(str(s) for s in data["steps"]),
+                window=window,
+                polyorder=polyorder,
+                emsc_degree=emsc_degree,
+                references=references,
+            )
+            return cls(
+                preprocessor=preprocessor,
+                coefficients=data["coefficients"],
+                x_mean=data["x_mean"],
+                y_mean=float(data["y_mean"]),
+                n_components=int(data["n_components"]),
+            )
+
+
+def _digest(spectra: np.ndarray) -> str:
+    return hashlib.blake2b(np.ascontiguousarray(spectra).view(np.uint8), digest_size=16).hexdigest()
+
+
+class SpectralCalibrationService:
+    """
+    Preprocessed-spectra cache and PLS calibration entry point.
+
+    ``calibrate`` runs in worker threads (``asyncio.to_thread``), so the cache
+    is only touched under ``_lock``; preprocessing itself runs outside it.
+    """
+
+    def __init__(self, max_cache_bytes: int = MAX_CACHE_BYTES):
+        self.max_cache_bytes = max_cache_bytes
+        self._cache: OrderedDict[tuple, tuple[SpectralPreprocessor, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def preprocess(
+        self,
+        spectra: np.ndarray,
+        preprocessor: SpectralPreprocessor,
+        dataset_key: Any = None,
+    ) -> tuple[SpectralPreprocessor, np.ndarray]:
+        """
+        Fit ``preprocessor`` on ``spectra`` and return (fitted preprocessor,
+        preprocessed matrix), reusing the cached result for the same dataset,
+        pipeline and spectra.
+        """
+        spectra = np.asarray(spectra, dtype=np.float64)
+        key = (dataset_key, preprocessor.spec, spectra.shape, _digest(spectra)) if dataset_key is not None else None
+        if key is not None:
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    return self._cache[key]
+
+        processed = preprocessor.fit_transform(spectra)
+        if key is not None:
+            self._store(key, (preprocessor, processed))
+        return preprocessor, processed
+
+    def _store(self, key: tuple, entry: tuple[SpectralPreprocessor, np.ndarray]) -> None:
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            total = sum(processed.nbytes for _, processed in self._cache.values())
+            while total > self.max_cache_bytes and len(self._cache) > 1:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                total -= evicted.nbytes
+
+    def invalidate(self, dataset_key: Any = None) -> None:
+        with self._lock:
+            if dataset_key is None:
+                self._cache.clear()
+                return
+            for key in [k for k in self._cache if k[0] == dataset_key]:
+                del self._cache[key]
+
+    def calibrate(
+        self,
+        spectra: np.ndarray,
+        reference_values: np.ndarray,
+        steps: Sequence[str] = ("snv",),
+        max_components: int = DEFAULT_MAX_COMPONENTS,
+        n_folds: int = 5,
+        window: int = 11,
+        polyorder: int = 2,
+        dataset_key: Any = None,
+        random_state: int | None = None,
+        max_workers: int | None = None,
+    ) -> SpectralCalibration:
+        """
+        Preprocess, choose the component count by cross-validation and refit
+        on all samples with that count.
+        """
+        y = np.asarray(reference_values, dtype=np.float64)
+        if len(y) != len(spectra):
+            raise ValueError("reference_values must have one entry per spectrum")
+        if len(y) < 3:
+            raise ValueError("At least 3 spectra are required for calibration")
+
+        preprocessor, X = self.preprocess(
+            spectra, SpectralPreprocessor(steps=tuple(steps), window=window, polyorder=polyorder), dataset_key
+        )
+        cv = cross_validate_pls(X, y, max_components, n_folds, random_state, max_workers)
+        fit = simpls(X, y, cv["best_n_components"])
+        n_components = fit.n_components
+
+        y_cal = fit.predict(X)
+        ss_tot = float(((y - y.mean()) ** 2).sum())
+        ss_res = float(((y - y_cal) ** 2).sum())
+        metrics = {
+            "r2_calibration": 1 - ss_res / ss_tot if ss_tot > 0 else 0.0,
+            "rmse_calibration": float(np.sqrt(ss_res / len(y))),
+            "r2_cv": cv["r2_cv"],
+            "rmse_cv": cv["rmse_cv"],
+            "rmse_cv_by_components": cv["rmse_cv_by_components"],
+            "n_folds": cv["n_folds"],
+            "n_samples": len(y),
+            "n_wavelengths": int(X.shape[1]),
+        }
+        logger.info(
+            f"[SpectralCalibration] {len(y)} spectra x {X.shape[1]} wavelengths, "
+            f"{'+'.join(preprocessor.steps)}: {n_components} components, RMSECV {cv['rmse_cv']:.4g}"
+        )
+        return SpectralCalibration(
+            preprocessor=preprocessor,
+            coefficients=fit.coefficients(),
+            x_mean=fit.x_mean,
+            y_mean=fit.y_mean,
+            n_components=n_components,
+            metrics=metrics,
+        )
+
+
+spectral_calibration_service = SpectralCalibrationService()
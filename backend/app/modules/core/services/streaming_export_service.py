@@ -0,0 +1,600 @@
+"""
+Streaming Export Service
+
+Exports observations, phenotype matrices and marker matrices straight from the
+database without materialising the dataset:
+
+- Rows are pulled with server-side cursors (``AsyncSession.stream`` with
+  ``yield_per``) one chunk at a time
+- Each chunk is encoded incrementally: CSV/TSV text (optionally gzipped),
+  Parquet row groups, or XLSX rows in openpyxl write-only mode
+- Matrices are pivoted on the fly from rows ordered by genotype, so only one
+  matrix row is held at a time
+
+Memory is bounded by ``EXPORT_CHUNK_ROWS`` (and one matrix row), not by the
+size of the export. Exports above ``EXPORT_STREAM_MAX_ROWS`` source rows are
+written to a result artifact by a background task instead of being streamed.
+"""
+
+import csv
+import io
+import logging
+import os
+import tempfile
+import zlib
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.core import Study, Trial
+from app.models.genotyping import Call, CallSet, Variant
+from app.models.germplasm import Germplasm
+from app.models.phenotyping import Observation, ObservationUnit, ObservationVariable
+
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+XLSX_MAX_ROWS = 1_048_576
+XLSX_MAX_COLUMNS = 16_384
+FILE_CHUNK_BYTES = 1024 * 1024
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    TSV = "tsv"
+    PARQUET = "parquet"
+    XLSX = "xlsx"
+
+
+class ExportDataset(StrEnum):
+    OBSERVATIONS = "observations"
+    PHENOTYPE_MATRIX = "phenotype-matrix"
+    MARKERS = "markers"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.TSV: "text/tab-separated-values",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+GZIP_MEDIA_TYPE = "application/gzip"
+
+# Parquet and XLSX are compressed containers already; only text is gzipped
+GZIP_FORMATS = {ExportFormat.CSV, ExportFormat.TSV}
+
+
+class ExportError(ValueError):
+    """The export cannot be produced in the requested shape or format."""
+
+
+@dataclass
+class ExportScope:
+    """Which rows of an organization to export. At least one filter narrows it."""
+    organization_id: int
+    program_id: int | None = None
+    trial_id: int | None = None
+    study_id: int | None = None
+    variant_set_id: int | None = None
+
+    def describe(self) -> str:
+        parts = [
+            f"{name}_{value}"
+            for name, value in (
+                ("program", self.program_id),
+                ("trial", self.trial_id),
+                ("study", self.study_id),
+                ("variantset", self.variant_set_id),
+            )
+            if value is not None
+        ]
+        return "_".join(parts) or "all"
+
+
+@dataclass
+class ExportPlan:
+    """Columns, column types and the row chunks of one export."""
+    columns: list[str]
+    chunks: AsyncIterator[list[tuple]]
+    types: dict[str, str] = field(default_factory=dict)  # column -> "float"; default string
+
+
+def _format_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+# ============================================
+# ENCODERS
+# ============================================
+
+class _TextEncoder:
+    """CSV/TSV rows written to a reusable buffer and drained per chunk."""
+
+    def __init__(self, delimiter: str):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, delimiter=delimiter)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def begin(self, columns: list[str], types: dict[str, str]) -> bytes:
+        self._writer.writerow(columns)
+        return self._drain()
+
+    def write(self, rows: list[tuple]) -> bytes:
+        self._writer.writerows([_format_value(value) for value in row] for row in rows)
+        return self._drain()
+
+    def finish(self) -> Iterator[bytes]:
+        return iter(())
+
+
+class _ParquetSink:
+    """Write-only file object that hands back what pyarrow has written so far."""
+
+    closed = False
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class _ParquetEncoder:
+    """One Parquet row group per chunk."""
+
+    def __init__(self):
+        if not PARQUET_AVAILABLE:
+            raise ExportError("Parquet export requires pyarrow")
+        self._sink = _ParquetSink()
+        self._writer = None
+        self._schema = None
+
+    def begin(self, columns: list[str], types: dict[str, str]) -> bytes:
+        self._schema = pa.schema([
+            (column, pa.float64() if types.get(column) == "float" else pa.string())
+            for column in columns
+        ])
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+        return b""
+
+    def write(self, rows: list[tuple]) -> bytes:
+        arrays = []
+        for index, column in enumerate(self._schema):
+            values = [row[index] for row in rows]
+            if column.type != pa.float64():
+                values = [None if value is None else str(_format_value(value)) for value in values]
+            arrays.append(pa.array(values, type=column.type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+        return self._sink.drain()
+
+    def finish(self) -> Iterator[bytes]:
+        self._writer.close()
+        yield self._sink.drain()
+
+
+class _XlsxEncoder:
+    """
+    Rows appended to a write-only workbook.
+
+    openpyxl spools write-only sheets to temporary files, and the finished
+    workbook is saved to a temporary file and streamed from there. Rows past
+    the Excel sheet limit continue on a new sheet.
+    """
+
+    def __init__(self):
+        try:
+            from openpyxl import Workbook
+        except Exception as exc:  # pragma: no cover - dependency/environment sensitive
+            raise ExportError("XLSX export requires openpyxl") from exc
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._columns: list[str] = []
+
+    def _new_sheet(self) -> None:
+        number = len(self._workbook.worksheets) + 1
+        self._sheet = self._workbook.create_sheet("export" if number == 1 else f"export_{number}")
+        self._sheet.append(self._columns)
+        self._sheet_rows = 1
+
+    def begin(self, columns: list[str], types: dict[str, str]) -> bytes:
+        if len(columns) > XLSX_MAX_COLUMNS:
+            raise ExportError(
+                f"XLSX supports at most {XLSX_MAX_COLUMNS} columns, "
+                f"this export has {len(columns)}; use csv, tsv or parquet"
+            )
+        self._columns = columns
+        self._new_sheet()
+        return b""
+
+    def write(self, rows: list[tuple]) -> bytes:
+        for row in rows:
+            if self._sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append(["" if value is None else _format_value(value) for value in row])
+            self._sheet_rows += 1
+        return b""
+
+    def finish(self) -> Iterator[bytes]:
+        with tempfile.TemporaryFile(suffix=".xlsx") as handle:
+            self._workbook.save(handle)
+            handle.seek(0)
+            while chunk := handle.read(FILE_CHUNK_BYTES):
+                yield chunk
+
+
+def _encoder(fmt: ExportFormat):
+    if fmt == ExportFormat.PARQUET:
+        return _ParquetEncoder()
+    if fmt == ExportFormat.XLSX:
+        return _XlsxEncoder()
+    return _TextEncoder("\t" if fmt == ExportFormat.TSV else ",")
+
+
+def encode(plan: ExportPlan, fmt: ExportFormat, gzip: bool = False) -> AsyncIterator[bytes]:
+    """
+    Encode an export plan chunk by chunk, optionally gzipping the output.
+
+    The encoder is set up before the first chunk is requested, so a format that
+    cannot hold the export raises ``ExportError`` here rather than mid-stream.
+    """
+    encoder = _encoder(fmt)
+    header = encoder.begin(plan.columns, plan.types)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip and fmt in GZIP_FORMATS else None
+
+    def emit(data: bytes) -> bytes:
+        # Sync-flush per chunk so each chunk of rows reaches the client as it is read
+        if compressor is None or not data:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    async def chunks() -> AsyncIterator[bytes]:
+        if data := emit(header):
+            yield data
+        async for rows in plan.chunks:
+            if data := emit(encoder.write(rows)):
+                yield data
+        for encoded in encoder.finish():
+            if data := emit(encoded):
+                yield data
+        if compressor:
+            yield compressor.flush()
+
+    return chunks()
+
+
+def media_type(fmt: ExportFormat, gzip: bool = False) -> str:
+    return GZIP_MEDIA_TYPE if gzip and fmt in GZIP_FORMATS else MEDIA_TYPES[fmt]
+
+
+def filename(
+    dataset: ExportDataset, scope: ExportScope, fmt: ExportFormat, gzip: bool = False
+) -> str:
+    stem = f"{dataset.value.replace('-', '_')}_{scope.describe()}"
+    name = f"{stem}_{datetime.now().strftime('%Y%m%d')}.{fmt}"
+    return f"{name}.gz" if gzip and fmt in GZIP_FORMATS else name
+
+
+# ============================================
+# ROW SOURCES
+# ============================================
+
+async def stream_chunks(
+    db: AsyncSession, stmt: Select, chunk_size: int | None = None
+) -> AsyncIterator[list[tuple]]:
+    """Rows of a query in chunks, fetched through a server-side cursor."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_ROWS
+    result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+    try:
+        async for partition in result.partitions(chunk_size):
+            yield [tuple(row) for row in partition]
+    finally:
+        await result.close()
+
+
+def _observation_filters(scope: ExportScope) -> list:
+    filters = [Observation.organization_id == scope.organization_id]
+    if scope.study_id is not None:
+        filters.append(Observation.study_id == scope.study_id)
+    if scope.trial_id is not None:
+        filters.append(Study.trial_id == scope.trial_id)
+    if scope.program_id is not None:
+        filters.append(Trial.program_id == scope.program_id)
+    return filters
+
+
+def _observation_source(stmt: Select, scope: ExportScope) -> Select:
+    # Observations without a study are exported too, unless a trial or
+    # program filter needs the joined rows
+    isouter = scope.trial_id is None and scope.program_id is None
+    return (
+        stmt.select_from(Observation)
+        .join(Study, Study.id == Observation.study_id, isouter=isouter)
+        .join(Trial, Trial.id == Study.trial_id, isouter=isouter)
+    )
+
+
+OBSERVATION_COLUMNS = [
+    "trial", "study", "plot_id", "observation_level", "genotype", "trait",
+    "value", "value_numeric", "unit", "date", "observer",
+]
+
+
+def observations_query(scope: ExportScope) -> Select:
+    """One row per observation, in primary key order."""
+    stmt = select(
+        Trial.trial_name,
+        Study.study_name,
+        ObservationUnit.observation_unit_name,
+        ObservationUnit.observation_level,
+        Germplasm.germplasm_name,
+        ObservationVariable.observation_variable_name,
+        Observation.value,
+        Observation.value_numeric,
+        ObservationVariable.scale_name,
+        Observation.observation_time_stamp,
+        Observation.collector,
+    )
+    return (
+        _observation_source(stmt, scope)
+        .outerjoin(ObservationUnit, ObservationUnit.id == Observation.observation_unit_id)
+        .outerjoin(Germplasm, Germplasm.id == Observation.germplasm_id)
+        .outerjoin(
+            ObservationVariable, ObservationVariable.id == Observation.observation_variable_id
+        )
+        .where(*_observation_filters(scope))
+        .order_by(Observation.id)
+    )
+
+
+def observation_count_query(scope: ExportScope) -> Select:
+    stmt = _observation_source(select(func.count(Observation.id)), scope)
+    return stmt.where(*_observation_filters(scope))
+
+
+def marker_count_query(scope: ExportScope) -> Select:
+    stmt = select(func.count(Call.id)).where(Call.organization_id == scope.organization_id)
+    if scope.variant_set_id is not None:
+        stmt = stmt.join(Variant, Variant.id == Call.variant_id).where(
+            Variant.variant_set_id == scope.variant_set_id
+        )
+    return stmt
+
+
+async def _pivot(
+    cells: AsyncIterator[list[tuple]], column_index: dict[Any, int], chunk_size: int
+) -> AsyncIterator[list[tuple]]:
+    """
+    Turn ``(row_key, row_label, column_key, value)`` cells ordered by row key
+    into matrix rows ``(row_label, value, value, ...)``.
+    """
+    width = len(column_index)
+    rows: list[tuple] = []
+    current_key, current = None, None
+    async for chunk in cells:
+        for row_key, label, column_key, value in chunk:
+            if row_key != current_key:
+                if current is not None:
+                    rows.append(tuple(current))
+                current_key, current = row_key, [label] + [None] * width
+            position = column_index.get(column_key)
+            if position is not None:
+                current[position + 1] = value
+        while len(rows) >= chunk_size:
+            yield rows[:chunk_size]
+            rows = rows[chunk_size:]
+    if current is not None:
+        rows.append(tuple(current))
+    if rows:
+        yield rows
+
+
+async def phenotype_matrix_plan(
+    db: AsyncSession, scope: ExportScope, chunk_size: int | None = None
+) -> ExportPlan:
+    """Genotype × trait matrix of mean numeric values."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_ROWS
+    traits = (await db.execute(
+        _observation_source(
+            select(ObservationVariable.id, ObservationVariable.observation_variable_name).distinct(),
+            scope,
+        )
+        .join(ObservationVariable, ObservationVariable.id == Observation.observation_variable_id)
+        .where(*_observation_filters(scope))
+        .order_by(ObservationVariable.observation_variable_name, ObservationVariable.id)
+    )).all()
+
+    cells = (
+        _observation_source(
+            select(
+                Germplasm.id,
+                Germplasm.germplasm_name,
+                Observation.observation_variable_id,
+                func.avg(Observation.value_numeric),
+            ),
+            scope,
+        )
+        .join(Germplasm, Germplasm.id == Observation.germplasm_id)
+        .where(*_observation_filters(scope), Observation.value_numeric.is_not(None))
+        .group_by(Germplasm.id, Germplasm.germplasm_name, Observation.observation_variable_id)
+        .order_by(Germplasm.id)
+    )
+    names = [name for _, name in traits]
+    positions = {trait_id: i for i, (trait_id, _) in enumerate(traits)}
+    return ExportPlan(
+        columns=["genotype", *names],
+        chunks=_pivot(stream_chunks(db, cells, chunk_size), positions, chunk_size),
+        types=dict.fromkeys(names, "float"),
+    )
+
+
+async def marker_matrix_plan(
+    db: AsyncSession, scope: ExportScope, chunk_size: int | None = None
+) -> ExportPlan:
+    """Call set × variant matrix of genotype calls."""
+    if scope.variant_set_id is None:
+        raise ExportError("Marker exports need a variant_set_id")
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_ROWS
+    variants = (await db.execute(
+        select(Variant.id, func.coalesce(Variant.variant_name, Variant.variant_db_id))
+        .where(
+            Variant.organization_id == scope.organization_id,
+            Variant.variant_set_id == scope.variant_set_id,
+        )
+        .order_by(Variant.id)
+    )).all()
+
+    cells = (
+        select(CallSet.id, CallSet.call_set_name, Call.variant_id, Call.genotype_value)
+        .select_from(Call)
+        .join(CallSet, CallSet.id == Call.call_set_id)
+        .join(Variant, Variant.id == Call.variant_id)
+        .where(
+            Call.organization_id == scope.organization_id,
+            Variant.variant_set_id == scope.variant_set_id,
+        )
+        .order_by(CallSet.id)
+    )
+    positions = {variant_id: i for i, (variant_id, _) in enumerate(variants)}
+    return ExportPlan(
+        columns=["genotype", *(name for _, name in variants)],
+        chunks=_pivot(stream_chunks(db, cells, chunk_size), positions, chunk_size),
+    )
+
+
+async def build_plan(
+    db: AsyncSession, dataset: ExportDataset, scope: ExportScope, chunk_size: int | None = None
+) -> ExportPlan:
+    if dataset == ExportDataset.OBSERVATIONS:
+        return ExportPlan(
+            columns=OBSERVATION_COLUMNS,
+            chunks=stream_chunks(db, observations_query(scope), chunk_size),
+            types={"value_numeric": "float"},
+        )
+    if dataset == ExportDataset.PHENOTYPE_MATRIX:
+        return await phenotype_matrix_plan(db, scope, chunk_size)
+    return await marker_matrix_plan(db, scope, chunk_size)
+
+
+async def count_source_rows(db: AsyncSession, dataset: ExportDataset, scope: ExportScope) -> int:
+    """Rows the export reads (observations or calls); decides stream vs background job."""
+    if dataset == ExportDataset.MARKERS:
+        return (await db.execute(marker_count_query(scope))).scalar_one()
+    return (await db.execute(observation_count_query(scope))).scalar_one()
+
+
+# ============================================
+# BACKGROUND JOBS
+# ============================================
+
+async def write_export_artifact(
+    db: AsyncSession,
+    dataset: ExportDataset,
+    scope: ExportScope,
+    fmt: ExportFormat,
+    gzip: bool = True,
+    chunk_size: int | None = None,
+) -> dict[str, Any]:
+    """Encode an export into a result artifact file and return its handle."""
+    from app.modules.core.services.result_artifact_service import get_result_artifact_store
+
+    plan = await build_plan(db, dataset, scope, chunk_size)
+    name = filename(dataset, scope, fmt, gzip)
+    artifact = await get_result_artifact_store().save_chunks(
+        encode(plan, fmt, gzip),
+        name=name,
+        suffix=os.path.splitext(name)[1],
+        media_type=media_type(fmt, gzip),
+        organization_id=scope.organization_id,
+        metadata={"dataset": dataset.value, "format": fmt.value, "columns": len(plan.columns)},
+    )
+    return artifact.to_handle()
+
+
+async def run_export_job(
+    dataset: str,
+    scope: dict[str, Any],
+    format: str,
+    gzip: bool = True,
+    progress_callback=None,
+) -> dict[str, Any]:
+    """Task queue entry point: write one export artifact in its own session."""
+    from app.core.database import AsyncSessionLocal
+    from app.core.rls import set_tenant_context
+
+    export_scope = ExportScope(**scope)
+    async with AsyncSessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            await set_tenant_context(db, export_scope.organization_id)
+        return await write_export_artifact(
+            db, ExportDataset(dataset), export_scope, ExportFormat(format), gzip
+        )
+
+
+async def submit_export_job(
+    dataset: ExportDataset,
+    scope: ExportScope,
+    fmt: ExportFormat,
+    gzip: bool = True,
+    user_id: str | None = None,
+) -> str:
+    """Queue an export to a result artifact and return the task id."""
+    from app.services.task_queue import TaskPriority, task_queue
+
+    return await task_queue.submit(
+        name=f"export_{dataset.value}",
+        func=run_export_job,
+        kwargs={
+            "dataset": dataset.value,
+            "scope": {key: value for key, value in vars(scope).items() if value is not None},
+            "format": fmt.value,
+            "gzip": gzip,
+        },
+        priority=TaskPriority.LOW,
+        user_id=user_id,
+        organization_id=str(scope.organization_id),
+    )
+
@@ -18,6 +18,11 @@ from .gdd_calculator_service import (
     GDDCalculatorService,
     gdd_calculator_service,
 )
+from .gdd_engine_service import (
+    FieldSeason,
+    GDDEngineService,
+    gdd_engine_service,
+)
 from .gee_integration_service import (
     GEEIntegrationService,
     get_gee_service,
@@ -41,6 +46,9 @@ __all__ = [
     "SoilTexture",
     "GDDCalculatorService",
     "gdd_calculator_service",
+    "FieldSeason",
+    "GDDEngineService",
+    "gdd_engine_service",
     "GEEIntegrationService",
     "get_gee_service",
     "weather_client",
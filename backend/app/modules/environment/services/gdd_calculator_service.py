@@ -225,10 +225,11 @@ class GDDCalculatorService:
             avg_temp = (capped_max + temp_min) / 2
             gdd = max(0, avg_temp - base_temp)
         elif method == "sine_wave":
-            # Sine wave method (more complex, used for research)
-            # Simplified implementation for now
+            # Single sine (Baskerville & Emin): area of the daily sine curve above the base
+            from app.modules.environment.services.gdd_engine_service import daily_gdd
+
             avg_temp = (temp_max + temp_min) / 2
-            gdd = max(0, avg_temp - base_temp)
+            gdd = float(daily_gdd(temp_max, temp_min, base_temp, "sine_wave"))
         else:
             raise ValueError(f"Unknown calculation method: {method}")
 
@@ -270,31 +271,24 @@ class GDDCalculatorService:
         if start_date:
             sorted_data = [d for d in sorted_data if d.date >= start_date]
 
-        results = []
-        cumulative_gdd = 0.0
+        # One vectorised pass over the season (daily GDD, running total, 7-day outliers)
+        from app.modules.environment.services.gdd_engine_service import compute_season
 
         for temp_data in sorted_data:
-            # Calculate daily GDD
-            daily_gdd, metadata = self.calculate_daily_gdd(
-                temp_data.temp_max,
-                temp_data.temp_min,
-                base_temp
-            )
-
-            cumulative_gdd += daily_gdd
-
-            # Detect outliers
-            outlier_detected = self._detect_temperature_outlier(
-                temp_data.temp_max,
-                temp_data.temp_min,
-                [d.temp_max for d in sorted_data[-7:] if d.date < temp_data.date],
-                [d.temp_min for d in sorted_data[-7:] if d.date < temp_data.date]
-            )
+            if temp_data.temp_max < temp_data.temp_min:
+                raise ValueError(
+                    f"Maximum temperature ({temp_data.temp_max}°C) cannot be less than minimum ({temp_data.temp_min}°C)"
+                )
+        season = compute_season(
+            [d.temp_max for d in sorted_data],
+            [d.temp_min for d in sorted_data],
+            base_temp,
+        )
 
-            # Create result
-            result = GDDCalculationResult(
-                daily_gdd=daily_gdd,
-                cumulative_gdd=round(cumulative_gdd, 2),
+        return [
+            GDDCalculationResult(
+                daily_gdd=float(daily_gdd),
+                cumulative_gdd=float(cumulative_gdd),
                 base_temperature=base_temp,
                 max_temperature=temp_data.temp_max,
                 min_temperature=temp_data.temp_min,
@@ -304,12 +298,12 @@ class GDDCalculatorService:
                 weather_source=temp_data.source,
                 is_interpolated=temp_data.is_interpolated,
                 has_data_gaps=False,  # Will be set by caller if needed
-                outlier_detected=outlier_detected
+                outlier_detected=bool(outlier_detected)
             )
-
-            results.append(result)
-
-        return results
+            for temp_data, daily_gdd, cumulative_gdd, outlier_detected in zip(
+                sorted_data, season.daily[0], season.cumulative[0], season.outliers[0], strict=True
+            )
+        ]
 
     def predict_growth_stages(
         self,
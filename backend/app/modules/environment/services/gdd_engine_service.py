@@ -0,0 +1,455 @@
+"""
+GDD Engine Service
+Vectorised Growing Degree Day and crop-stage engine for many fields at once
+
+Temperatures come in as (fields × days) arrays, one row per field season and
+one column per calendar day (NaN for a missing day), and every step is a
+NumPy operation over the whole array:
+- daily GDD         standard, modified (Tmax capped at 30°C) or sine_wave
+                    (single sine, Baskerville & Emin 1969)
+- cumulative GDD    running sum per field, missing days contribute nothing
+- outliers          Tmax/Tmin more than 2σ from the preceding 7 days
+- growth stage      searchsorted of cumulative GDD into the crop's stage
+                    thresholds (GDDCalculatorService.GROWTH_STAGES)
+
+Seasons are persisted to growing_degree_day_logs. record_season writes a
+whole season; advance appends one day for every field from the last logged
+running total and the last week of logged temperatures, so a daily job does
+O(fields) work instead of recomputing each season.
+"""
+
+import logging
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+from sqlalchemy import and_, delete, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.future.gdd_log import GrowingDegreeDayLog
+from app.modules.environment.services.gdd_calculator_service import GDDCalculatorService
+
+
+logger = logging.getLogger(__name__)
+
+GDD_METHODS = ("standard", "modified", "sine_wave")
+METHOD_ALIASES = {"simple": "standard", "average": "standard", "sine": "sine_wave"}
+# Upper threshold of the modified method (heat stress cap on Tmax)
+MODIFIED_MAX_TEMP = 30.0
+
+OUTLIER_WINDOW_DAYS = 7
+OUTLIER_SIGMA = 2.0
+OUTLIER_MIN_DAYS = 3
+
+PRE_EMERGENCE = "Pre-emergence"
+DEFAULT_STAGE_CROP = "corn"
+
+
+def resolve_method(method: str) -> str:
+    """Normalise a GDD method name, accepting the common aliases."""
+    key = METHOD_ALIASES.get(method.lower(), method.lower())
+    if key not in GDD_METHODS:
+        raise ValueError(f"Unknown calculation method: {method}")
+    return key
+
+
+# ============================================
+# ARRAY KERNELS
+# ============================================
+
+def daily_gdd(
+    temp_max: ArrayLike,
+    temp_min: ArrayLike,
+    base_temp: ArrayLike,
+    method: str = "standard",
+) -> np.ndarray:
+    """
+    Daily GDD for arrays of temperatures.
+
+    base_temp broadcasts against the temperatures, so a (fields, 1) column
+    gives every field its own base. Missing temperatures give NaN.
+    """
+    method = resolve_method(method)
+    tmax = np.asarray(temp_max, dtype=float)
+    tmin = np.asarray(temp_min, dtype=float)
+    base = np.asarray(base_temp, dtype=float)
+
+    if method == "modified":
+        tmax = np.minimum(tmax, MODIFIED_MAX_TEMP)
+
+    mean = (tmax + tmin) / 2
+    if method != "sine_wave":
+        return np.where(np.isnan(mean), np.nan, np.maximum(mean - base, 0.0))
+
+    # Area under T(t) = M + W sin(t) above the base over one day. Where the
+    # curve crosses the base at theta = asin((base - M) / W):
+    #   GDD = ((M - base)(pi/2 - theta) + W cos(theta)) / pi
+    half_range = (tmax - tmin) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        theta = np.arcsin(np.clip((base - mean) / half_range, -1.0, 1.0))
+        crossing = ((mean - base) * (np.pi / 2 - theta) + half_range * np.cos(theta)) / np.pi
+    gdd = np.where(tmin >= base, mean - base, np.where(tmax <= base, 0.0, crossing))
+    return np.where(np.isnan(mean), np.nan, gdd)
+
+
+def rolling_outliers(
+    temp_max: ArrayLike,
+    temp_min: ArrayLike,
+    window: int = OUTLIER_WINDOW_DAYS,
+    sigma: float = OUTLIER_SIGMA,
+    min_days: int = OUTLIER_MIN_DAYS,
+) -> np.ndarray:
+    """
+    Flag days whose Tmax or Tmin is more than sigma population standard
+    deviations from the mean of the preceding window days.
+
+    Works along the last axis; days with fewer than min_days recorded days in
+    their window are never flagged.
+    """
+    flags = np.zeros(np.shape(temp_max), dtype=bool)
+    for values in (np.asarray(temp_max, dtype=float), np.asarray(temp_min, dtype=float)):
+        pad = np.full(values.shape[:-1] + (window,), np.nan)
+        # windows[..., d, :] holds days d - window .. d - 1
+        windows = np.lib.stride_tricks.sliding_window_view(
+            np.concatenate([pad, values], axis=-1), window, axis=-1
+        )[..., :-1, :]
+        present = ~np.isnan(windows)
+        count = present.sum(axis=-1)
+        n = np.maximum(count, 1)
+        mean = np.where(present, windows, 0.0).sum(axis=-1) / n
+        std = np.sqrt((np.where(present, windows - mean[..., None], 0.0) ** 2).sum(axis=-1) / n)
+        with np.errstate(invalid="ignore"):
+            flags |= (count >= min_days) & (np.abs(values - mean) > sigma * std)
+    return flags
+
+
+def stage_thresholds(crop_name: str) -> tuple[list[str], np.ndarray]:
+    """Stage names (with the pre-emergence stage first) and GDD thresholds for a crop."""
+    stages = GDDCalculatorService.GROWTH_STAGES.get(
+        crop_name.lower(), GDDCalculatorService.GROWTH_STAGES[DEFAULT_STAGE_CROP]
+    )
+    return [PRE_EMERGENCE] + [name for name, _ in stages], np.array([gdd for _, gdd in stages], dtype=float)
+
+
+def growth_stages(cumulative: ArrayLike, crops: str | Sequence[str]) -> np.ndarray:
+    """
+    Growth stage name for every cumulative GDD value.
+
+    crops is one crop for every row or one crop per row; rows are grouped by
+    crop and each group resolved with a single searchsorted.
+    """
+    cumulative = np.asarray(cumulative, dtype=float)
+    crop_rows = [crops] * len(cumulative) if isinstance(crops, str) else list(crops)
+    stages = np.empty(cumulative.shape, dtype=object)
+    by_crop: dict[str, list[int]] = defaultdict(list)
+    for row, crop in enumerate(crop_rows):
+        by_crop[crop].append(row)
+    for crop, rows in by_crop.items():
+        names, thresholds = stage_thresholds(crop)
+        index = np.searchsorted(thresholds, np.nan_to_num(cumulative[rows], nan=-np.inf), side="right")
+        stages[rows] = np.asarray(names, dtype=object)[index]
+    return stages
+
+
+@dataclass
+class GDDSeason:
+    """Daily and cumulative GDD, outlier flags and stages for (fields × days)."""
+
+    daily: np.ndarray
+    cumulative: np.ndarray
+    outliers: np.ndarray
+    stages: np.ndarray
+    crops: list[str]
+    method: str
+
+    def stage_onsets(self, field: int) -> dict[str, int | None]:
+        """Day index at which a field first reached each growth stage."""
+        names, thresholds = stage_thresholds(self.crops[field])
+        # Cumulative GDD never decreases, so searchsorted finds the first day
+        days = np.searchsorted(self.cumulative[field], thresholds, side="left")
+        n_days = self.cumulative.shape[1]
+        return {name: (int(day) if day < n_days else None) for name, day in zip(names[1:], days, strict=True)}
+
+
+def compute_season(
+    temp_max: ArrayLike,
+    temp_min: ArrayLike,
+    base_temp: ArrayLike,
+    crops: str | Sequence[str] = DEFAULT_STAGE_CROP,
+    method: str = "standard",
+    decimals: int | None = 2,
+    initial: ArrayLike = 0.0,
+) -> GDDSeason:
+    """
+    GDD season for a (fields × days) temperature array.
+
+    base_temp and initial (the running total before the first column) are a
+    scalar or one value per field. Daily values are rounded to decimals
+    before accumulation, as GDDCalculatorService has always done.
+    """
+    tmax = np.atleast_2d(np.asarray(temp_max, dtype=float))
+    tmin = np.atleast_2d(np.asarray(temp_min, dtype=float))
+    if tmax.shape != tmin.shape:
+        raise ValueError(f"temp_max {tmax.shape} and temp_min {tmin.shape} differ in shape")
+    base = np.broadcast_to(np.asarray(base_temp, dtype=float), tmax.shape[:1])[:, None]
+    start = np.broadcast_to(np.asarray(initial, dtype=float), tmax.shape[:1])[:, None]
+
+    method = resolve_method(method)
+    daily = daily_gdd(tmax, tmin, base, method)
+    if decimals is not None:
+        daily = np.round(daily, decimals)
+    cumulative = start + np.nancumsum(daily, axis=1)
+    if decimals is not None:
+        cumulative = np.round(cumulative, decimals)
+
+    crop_list = [crops] * len(tmax) if isinstance(crops, str) else list(crops)
+    return GDDSeason(
+        daily=daily,
+        cumulative=cumulative,
+        outliers=rolling_outliers(tmax, tmin),
+        stages=growth_stages(cumulative, crop_list),
+        crops=crop_list,
+        method=method,
+    )
+
+
+# ============================================
+# PERSISTED SEASONS
+# ============================================
+
+@dataclass(frozen=True)
+class FieldSeason:
+    """One crop season in one field: the key of its GDD log."""
+
+    field_id: int
+    crop_name: str
+    planting_date: date
+    base_temperature: float | None = None
+
+    @property
+    def key(self) -> tuple[int, str, date]:
+        return (self.field_id, self.crop_name, self.planting_date)
+
+
+class GDDEngineService:
+    """Computes GDD seasons in bulk and keeps their logs current day by day."""
+
+    def __init__(self):
+        self.calculator = GDDCalculatorService()
+
+    def base_temperatures(self, seasons: Sequence[FieldSeason]) -> np.ndarray:
+        return np.array([
+            s.base_temperature if s.base_temperature is not None
+            else self.calculator.get_crop_base_temperature(s.crop_name)
+            for s in seasons
+        ])
+
+    def compute(
+        self,
+        seasons: Sequence[FieldSeason],
+        temp_max: ArrayLike,
+        temp_min: ArrayLike,
+        method: str = "standard",
+    ) -> GDDSeason:
+        return compute_season(
+            temp_max, temp_min, self.base_temperatures(seasons),
+            crops=[s.crop_name for s in seasons], method=method,
+        )
+
+    @staticmethod
+    def _season_filter(organization_id: int, seasons: Sequence[FieldSeason]):
+        return and_(
+            GrowingDegreeDayLog.organization_id == organization_id,
+            tuple_(
+                GrowingDegreeDayLog.field_id,
+                GrowingDegreeDayLog.crop_name,
+                GrowingDegreeDayLog.planting_date,
+            ).in_([s.key for s in seasons]),
+        )
+
+    async def record_season(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        seasons: Sequence[FieldSeason],
+        dates: Sequence[date],
+        temp_max: ArrayLike,
+        temp_min: ArrayLike,
+        method: str = "standard",
+    ) -> dict[str, Any]:
+        """
+        Replace the GDD logs of these seasons with the given (fields × days)
+        temperatures. Days before a field's planting date or without both
+        temperatures are not logged.
+        """
+        tmax = np.array(temp_max, dtype=float, ndmin=2)
+        tmin = np.array(temp_min, dtype=float, ndmin=2)
+        if tmax.shape != (len(seasons), len(dates)):
+            raise ValueError(f"Expected temperatures of shape {(len(seasons), len(dates))}, got {tmax.shape}")
+
+        day_numbers = np.array([d.toordinal() for d in dates])
+        planted = day_numbers[None, :] >= np.array([s.planting_date.toordinal() for s in seasons])[:, None]
+        tmax[~planted] = np.nan
+        tmin[~planted] = np.nan
+
+        season = self.compute(seasons, tmax, tmin, method)
+        base = self.base_temperatures(seasons)
+        logged = planted & ~np.isnan(season.daily)
+
+        await db.execute(delete(GrowingDegreeDayLog).where(self._season_filter(organization_id, seasons)))
+        rows = [
+            self._log_row(
+                organization_id, seasons[f], dates[d], base[f],
+                season.daily[f, d], season.cumulative[f, d], tmax[f, d], tmin[f, d], season.stages[f, d],
+            )
+            for f, d in zip(*np.nonzero(logged), strict=True)
+        ]
+        if rows:
+            await db.execute(insert(GrowingDegreeDayLog), rows)
+
+        return {
+            "fields": len(seasons),
+            "days_logged": len(rows),
+            "outlier_days": int((season.outliers & logged).sum()),
+            "method": season.method,
+        }
+
+    async def advance(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        log_date: date,
+        seasons: Sequence[FieldSeason],
+        temp_max: ArrayLike,
+        temp_min: ArrayLike,
+        method: str = "standard",
+    ) -> dict[str, Any]:
+        """
+        Log one new day for every season from its last running total.
+
+        Re-running a day replaces that day's log. Fields with a missing
+        temperature are skipped; a season already logged past log_date must
+        be rebuilt with record_season instead.
+        """
+        tmax = np.asarray(temp_max, dtype=float).reshape(-1)
+        tmin = np.asarray(temp_min, dtype=float).reshape(-1)
+        if not (len(tmax) == len(tmin) == len(seasons)):
+            raise ValueError("temp_max and temp_min need one value per season")
+        for season in seasons:
+            if log_date < season.planting_date:
+                raise ValueError(f"Field {season.field_id} was planted after {log_date}")
+
+        season_filter = self._season_filter(organization_id, seasons)
+        ahead = (await db.execute(
+            select(GrowingDegreeDayLog.field_id).where(season_filter, GrowingDegreeDayLog.log_date > log_date).limit(1)
+        )).scalar_one_or_none()
+        if ahead is not None:
+            raise ValueError(f"Field {ahead} already has GDD logged after {log_date}; use record_season")
+
+        # Last running total, and the temperatures of the preceding week
+        recency = func.row_number().over(
+            partition_by=(GrowingDegreeDayLog.field_id, GrowingDegreeDayLog.crop_name, GrowingDegreeDayLog.planting_date),
+            order_by=GrowingDegreeDayLog.log_date.desc(),
+        ).label("recency")
+        recent = (
+            select(
+                GrowingDegreeDayLog.field_id,
+                GrowingDegreeDayLog.crop_name,
+                GrowingDegreeDayLog.planting_date,
+                GrowingDegreeDayLog.log_date,
+                GrowingDegreeDayLog.cumulative_gdd,
+                GrowingDegreeDayLog.max_temperature,
+                GrowingDegreeDayLog.min_temperature,
+                recency,
+            )
+            .where(season_filter, GrowingDegreeDayLog.log_date < log_date)
+            .subquery()
+        )
+        history = (await db.execute(select(recent).where(recent.c.recency <= OUTLIER_WINDOW_DAYS))).all()
+
+        index = {s.key: i for i, s in enumerate(seasons)}
+        initial = np.zeros(len(seasons))
+        window_max = np.full((len(seasons), OUTLIER_WINDOW_DAYS + 1), np.nan)
+        window_min = np.full_like(window_max, np.nan)
+        for row in history:
+            i = index[(row.field_id, row.crop_name, row.planting_date)]
+            if row.recency == 1:
+                initial[i] = row.cumulative_gdd
+            column = OUTLIER_WINDOW_DAYS - (log_date - row.log_date).days
+            if column >= 0:
+                window_max[i, column] = np.nan if row.max_temperature is None else row.max_temperature
+                window_min[i, column] = np.nan if row.min_temperature is None else row.min_temperature
+        window_max[:, -1] = tmax
+        window_min[:, -1] = tmin
+
+        base = self.base_temperatures(seasons)
+        day = compute_season(
+            tmax[:, None], tmin[:, None], base,
+            crops=[s.crop_name for s in seasons], method=method, initial=initial,
+        )
+        outliers = rolling_outliers(window_max, window_min)[:, -1]
+        valid = ~np.isnan(day.daily[:, 0])
+
+        logged = [seasons[i] for i in np.flatnonzero(valid)]
+        if logged:
+            await db.execute(delete(GrowingDegreeDayLog).where(
+                self._season_filter(organization_id, logged), GrowingDegreeDayLog.log_date == log_date
+            ))
+            await db.execute(insert(GrowingDegreeDayLog), [
+                self._log_row(
+                    organization_id, seasons[i], log_date, base[i],
+                    day.daily[i, 0], day.cumulative[i, 0], tmax[i], tmin[i], day.stages[i, 0],
+                )
+                for i in np.flatnonzero(valid)
+            ])
+
+        return {
+            "log_date": log_date.isoformat(),
+            "fields": len(logged),
+            "skipped_field_ids": [seasons[i].field_id for i in np.flatnonzero(~valid)],
+            "outlier_field_ids": [seasons[i].field_id for i in np.flatnonzero(outliers & valid)],
+            "results": [
+                {
+                    "field_id": seasons[i].field_id,
+                    "crop_name": seasons[i].crop_name,
+                    "daily_gdd": float(day.daily[i, 0]),
+                    "cumulative_gdd": float(day.cumulative[i, 0]),
+                    "growth_stage": day.stages[i, 0],
+                    "outlier_detected": bool(outliers[i]),
+                }
+                for i in np.flatnonzero(valid)
+            ],
+        }
+
+    @staticmethod
+    def _log_row(
+        organization_id: int,
+        season: FieldSeason,
+        log_date: date,
+        base: float,
+        daily: float,
+        cumulative: float,
+        tmax: float,
+        tmin: float,
+        stage: str,
+    ) -> dict[str, Any]:
+        return {
+            "organization_id": organization_id,
+            "field_id": season.field_id,
+            "crop_name": season.crop_name,
+            "planting_date": season.planting_date,
+            "log_date": log_date,
+            "daily_gdd": float(daily),
+            "cumulative_gdd": float(cumulative),
+            "base_temperature": float(base),
+            "max_temperature": float(tmax),
+            "min_temperature": float(tmin),
+            "growth_stage": stage,
+        }
+
+
+gdd_engine_service = GDDEngineService()
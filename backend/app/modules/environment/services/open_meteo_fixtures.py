@@ -0,0 +1,110 @@
+"""
+Recorded Open-Meteo stand-in
+
+An httpx transport that answers forecast and archive requests from recorded
+Open-Meteo responses, so the weather client runs end to end in tests and
+offline environments without network access:
+
+    transport = RecordedOpenMeteoTransport.from_file("tests/fixtures/open_meteo/delhi.json")
+    client = OpenMeteoClient(transport=transport, archive_dir=tmp_path)
+
+A fixture holds one long ``archive`` response and one ``forecast`` response
+(the JSON bodies Open-Meteo returned). Archive requests are answered with the
+recorded days inside start_date..end_date; forecast requests with the first
+forecast_days. Use ``record`` to capture a fixture from the live API.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import date
+from typing import Any
+
+import httpx
+
+from app.modules.environment.services.weather_integration_service import (
+    FORECAST_FETCH_DAYS,
+    FORECAST_VARIABLES,
+    HISTORY_VARIABLES,
+    OpenMeteoClient,
+)
+
+
+class RecordedOpenMeteoTransport(httpx.AsyncBaseTransport):
+    """Serve Open-Meteo requests from recorded responses and log each request."""
+
+    def __init__(self, archive: dict[str, Any] | None = None, forecast: dict[str, Any] | None = None):
+        self.archive = archive or {"daily": {"time": []}}
+        self.forecast = forecast or {"daily": {"time": []}}
+        self.requests: list[httpx.Request] = []
+
+    @classmethod
+    def from_file(cls, path: str) -> RecordedOpenMeteoTransport:
+        with open(path) as f:
+            fixture = json.load(f)
+        return cls(archive=fixture.get("archive"), forecast=fixture.get("forecast"))
+
+    @staticmethod
+    def _select(recorded: dict[str, Any], keep: list[int], variables: list[str]) -> dict[str, Any]:
+        daily = recorded.get("daily", {})
+        body = {k: v for k, v in recorded.items() if k != "daily"}
+        body["daily"] = {"time": [daily["time"][i] for i in keep]}
+        for var in variables:
+            values = daily.get(var)
+            body["daily"][var] = [values[i] for i in keep] if values is not None else [None] * len(keep)
+        return body
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        params = request.url.params
+        variables = [v for v in params.get("daily", "").split(",") if v]
+
+        if request.url.host.startswith("archive-api"):
+            start = date.fromisoformat(params["start_date"])
+            end = date.fromisoformat(params["end_date"])
+            times = self.archive.get("daily", {}).get("time", [])
+            keep = [i for i, day in enumerate(times) if start <= date.fromisoformat(day) <= end]
+            body = self._select(self.archive, keep, variables)
+        elif request.url.path.endswith("/forecast"):
+            days = int(params.get("forecast_days", 7))
+            times = self.forecast.get("daily", {}).get("time", [])
+            body = self._select(self.forecast, list(range(min(days, len(times)))), variables)
+        else:
+            return httpx.Response(404, json={"error": True, "reason": "not recorded"}, request=request)
+
+        return httpx.Response(200, json=body, request=request)
+
+
+async def record(
+    path: str,
+    lat: float,
+    lon: float,
+    start_date: date,
+    end_date: date,
+) -> dict[str, Any]:
+    """Capture live archive and forecast responses for (lat, lon) as a fixture file."""
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        archive = await client.get(OpenMeteoClient.HISTORY_URL, params={
+            "latitude": lat,
+            "longitude": lon,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "daily": ",".join(HISTORY_VARIABLES),
+            "timezone": "auto",
+        })
+        archive.raise_for_status()
+        forecast = await client.get(OpenMeteoClient.FORECAST_URL, params={
+            "latitude": lat,
+            "longitude": lon,
+            "daily": ",".join(FORECAST_VARIABLES),
+            "timezone": "auto",
+            "forecast_days": FORECAST_FETCH_DAYS,
+        })
+        forecast.raise_for_status()
+
+    fixture = {"archive": archive.json(), "forecast": forecast.json()}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(fixture, f)
+    return fixture
@@ -15,8 +15,10 @@ from datetime import UTC, datetime, timedelta
 from enum import StrEnum
 from typing import Any
 
+import numpy as np
 from pydantic import BaseModel
 
+from app.modules.environment.services.gdd_engine_service import daily_gdd
 from app.modules.environment.services.weather_integration_service import weather_client
 
 
@@ -472,38 +474,29 @@ class WeatherService:
         forecast: list[WeatherData],
         crop: str
     ) -> list[GrowingDegreeDays]:
-        """Calculate growing degree days for crop development tracking via EnvironmentalPhysicsService."""
-        # Import dynamically to avoid circular imports if any
-        from app.modules.environment.services.environmental_physics_service import environmental_service
+        """Calculate growing degree days for the whole forecast in one vectorised pass."""
+        if not forecast:
+            return []
 
         base_temp = self.CROP_BASE_TEMPS.get(crop.lower(), self.CROP_BASE_TEMPS["default"])
 
-        gdd_list = []
-        cumulative = 0
+        # Temperatures below the base count as the base (EnvironmentalPhysicsService.calculate_gdd)
+        temp_max = np.maximum([day.temp_max for day in forecast], base_temp)
+        temp_min = np.maximum([day.temp_min for day in forecast], base_temp)
+        daily = daily_gdd(temp_max, temp_min, base_temp)
+        cumulative = np.cumsum(daily)
 
-        for day in forecast:
-            # Delegate calculation to Science Engine
-            # Note: calculate_gdd is async but here we are in a loop.
-            # Ideally we'd gather, but for simplicity let's await sequentially or adapt.
-            # However, calculate_gdd is pure logic in this context, let's check its definition.
-            # Checking service definition from prior read: it IS async.
-
-            daily_gdd = await environmental_service.calculate_gdd(
-                t_max=day.temp_max,
-                t_min=day.temp_min,
-                t_base=base_temp
-            )
-
-            cumulative += daily_gdd
-
-            gdd_list.append(GrowingDegreeDays(
+        gdd_list = [
+            GrowingDegreeDays(
                 location_id=day.location_id,
                 date=day.date,
-                gdd_daily=round(daily_gdd, 1),
-                gdd_cumulative=round(cumulative, 1),
+                gdd_daily=round(float(daily_value), 1),
+                gdd_cumulative=round(float(cumulative_value), 1),
                 base_temp=base_temp,
                 crop=crop
-            ))
+            )
+            for day, daily_value, cumulative_value in zip(forecast, daily, cumulative, strict=True)
+        ]
 
         return gdd_list
 
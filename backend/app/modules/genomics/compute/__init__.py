@@ -3,6 +3,13 @@ Genomics Compute Interface
 Heavy compute operations for genomics domain
 """
 
-from .gwas_compute import GWASCompute
+from app.core.lazy_imports import lazy_exports
+
+
+_EXPORTS = {
+    "GWASCompute": ".gwas_compute",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = ["GWASCompute"]
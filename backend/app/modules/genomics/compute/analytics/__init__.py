@@ -6,9 +6,19 @@ MinIO object-storage integration, and phenotype extraction utilities.
 It is not yet a complete production data-lake implementation.
 """
 
-from .engine import analytics_engine
-from .etl_phenotype_extractor import phenotype_extractor
-from .ssp_scenario_parser import SSPDataPoint, SSPParserResult, SSPScenario, parse_ssp_csv
+from app.core.lazy_imports import lazy_exports
+
+
+_EXPORTS = {
+    "analytics_engine": ".engine",
+    "phenotype_extractor": ".etl_phenotype_extractor",
+    "SSPDataPoint": ".ssp_scenario_parser",
+    "SSPParserResult": ".ssp_scenario_parser",
+    "SSPScenario": ".ssp_scenario_parser",
+    "parse_ssp_csv": ".ssp_scenario_parser",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 
 __all__ = [
@@ -12,6 +12,7 @@ Features:
 Dependencies:
 - numpy: Array operations
 - scipy.linalg: Matrix solving (more stable/faster than numpy for linear systems)
+- compute_engine: Tuned symmetric solver kernel
 """
 
 import logging
@@ -20,6 +21,8 @@ from typing import TypedDict
 import numpy as np
 from scipy import linalg
 
+from app.services.compute_engine import compute_engine
+
 
 logger = logging.getLogger(__name__)
 
@@ -100,13 +103,15 @@ class GBLUPMatrixSolver:
             V = G + identity_matrix * lambda_val
 
             # 3. Solve Equations
-            # Solve V * alpha = y_centered
-            # Use linalg.solve (assumes V is non-singular)
+            # Solve V * alpha = y_centered, and V * X = G for the reliabilities
+            # below, as one multi-RHS solve so V is factorized once
             try:
-                alpha = linalg.solve(V, y_centered, assume_a='sym')
+                solution = compute_engine.solve_symmetric(V, np.column_stack([y_centered, G]))
             except linalg.LinAlgError as e:
                 logger.error(f"Matrix inversion failed: {e}")
                 return _error_result("Singular matrix encountered during GEBV estimation", heritability, mean=mu)
+            alpha = solution[:, 0]
+            V_inv_G = solution[:, 1:]
 
             # 4. Calculate GEBVs
             # u_hat = G * alpha
@@ -126,17 +131,9 @@ class GBLUPMatrixSolver:
             # Reliability = 1 - PEV / sigma_g^2 = 1 - (diag(V^-1 G) * sigma_e^2) / sigma_g^2
             # Since sigma_e^2 / sigma_g^2 = lambda,
             # Reliability = 1 - lambda * diag(V^-1 G).
-
-            # Calculate V^-1 G efficiently
-            # We solve V * Z = G for Z
-            try:
-                V_inv_G = linalg.solve(V, G, assume_a='sym')
-                reliabilities = 1.0 - lambda_val * np.diag(V_inv_G)
-                # Clip to valid range [0, 1] due to numerical noise
-                reliabilities = np.clip(reliabilities, 0.0, 1.0)
-            except linalg.LinAlgError:
-                # Fallback if V is singular (unlikely if alpha was solved, but possible)
-                reliabilities = np.zeros(n)
+            reliabilities = 1.0 - lambda_val * np.diag(V_inv_G)
+            # Clip to valid range [0, 1] due to numerical noise
+            reliabilities = np.clip(reliabilities, 0.0, 1.0)
 
             # 6. Variance Statistics
             var_gebv = float(np.var(gebv))
@@ -1,8 +1,6 @@
 import io
 import logging
-
-from minio import Minio
-from minio.error import S3Error
+from functools import cached_property
 
 from app.core.config import settings
 
@@ -16,24 +14,33 @@ class StorageService:
     Handles analytical export artifact uploads and downloads.
     """
 
-    def __init__(self):
+    @cached_property
+    def client(self):
+        """MinIO client, created on first use (the SDK is slow to import); None if unavailable."""
         try:
-            self.client = Minio(
+            from minio import Minio
+
+            return Minio(
                 endpoint=settings.MINIO_ENDPOINT,
                 access_key=settings.MINIO_ROOT_USER,
                 secret_key=settings.MINIO_ROOT_PASSWORD,
                 secure=settings.MINIO_USE_SSL,
             )
-            self._available = True
         except Exception as e:
             logger.error(f"Failed to initialize MinIO client: {e}")
-            self._available = False
+            return None
+
+    @property
+    def _available(self) -> bool:
+        return self.client is not None
 
     def ensure_bucket_exists(self, bucket_name: str) -> bool:
         """Ensure a bucket exists, creating it if necessary."""
         if not self._available:
             return False
 
+        from minio.error import S3Error
+
         try:
             if not self.client.bucket_exists(bucket_name):
                 self.client.make_bucket(bucket_name)
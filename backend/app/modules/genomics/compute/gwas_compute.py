@@ -129,6 +129,7 @@ class GWASCompute(BaseComputeInterface):
             phenotype_data=phenotype_data,
             covariates=covariates,
             method=method,
+            artifact_owner=organization_id,
         )
 
     async def _gwas_worker(
@@ -138,8 +139,15 @@ class GWASCompute(BaseComputeInterface):
         covariates: np.ndarray | None,
         method: str,
         progress_callback,
+        artifact_owner: str | None = None,
     ) -> dict[str, Any]:
-        """GWAS worker function using an explicit linear marker scan."""
+        """
+        GWAS worker function using an explicit linear marker scan.
+
+        When an owner is given, per-marker statistics are written as a binary
+        table artifact and the result carries its handle in place of the
+        ``p_values`` / ``effect_sizes`` lists.
+        """
 
         genotype_matrix = np.asarray(genotype_data, dtype=np.float64)
         phenotype_vector = np.asarray(phenotype_data, dtype=np.float64)
@@ -198,6 +206,21 @@ class GWASCompute(BaseComputeInterface):
             "significant_markers": significant_markers,
         }
 
+        if artifact_owner is not None:
+            from app.modules.core.services.result_artifact_service import get_result_artifact_store
+
+            artifact = get_result_artifact_store().save_table(
+                {
+                    "marker_index": np.arange(n_markers),
+                    "p_value": np.asarray(p_values),
+                    "effect_size": np.asarray(effect_sizes),
+                },
+                name=f"gwas_{method}",
+                organization_id=artifact_owner,
+            )
+            result["artifact"] = artifact.to_handle()
+            del result["p_values"], result["effect_sizes"]
+
         progress_callback(1.0, "GWAS analysis complete")
 
         return result
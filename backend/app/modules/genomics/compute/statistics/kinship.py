@@ -9,6 +9,8 @@ from typing import Any
 
 import numpy as np
 
+from app.services.compute_engine import compute_engine
+
 
 logger = logging.getLogger(__name__)
 
@@ -62,17 +64,7 @@ def calculate_vanraden_kinship(
         # p = sum(x) / (2n)
         p = np.mean(M, axis=0) / 2.0
 
-        # 4. Construct Z matrix (Centered Genotypes)
-        # Z = M - P
-        # P = 2(p - 0.5) if range is -1..1? No.
-        # VanRaden: Z = M - 2p
-        # M is dosage (0..2), 2p is expected dosage.
-
-        # Matrix of 2p values (n x m)
-        P = 2 * p
-        Z = M - P
-
-        # 5. Calculate Denominator (Scaling Factor)
+        # 4. Calculate Denominator (Scaling Factor)
         # 2 * sum(p * (1-p))
         denominator = 2 * np.sum(p * (1 - p))
 
@@ -80,13 +72,13 @@ def calculate_vanraden_kinship(
             logger.warning("Denominator is 0. Monomorphic markers? Using 1 to avoid NaN.")
             denominator = 1.0
 
-        # 6. Calculate K
-        # K = Z Z' / denominator
-        K = np.dot(Z, Z.T) / denominator
+        # 5. Calculate K = Z Z' / denominator, with Z = M - 2p (VanRaden)
+        # The compute engine picks the fastest GRM kernel for this matrix size
+        K = compute_engine.compute_grm(M, method="vanraden1").matrix
 
         return {
             "success": True,
-            "K": K.tolist(), # Convert to list for JSON serialization if needed
+            "K": K,
             "denominator": denominator,
             "marker_count": n_markers,
             "sample_count": n_ind
@@ -64,6 +64,7 @@ class KinshipCompute(BaseComputeInterface):
             organization_id=organization_id,
             genotype_matrix=genotype_matrix,
             check_maf=check_maf,
+            artifact_owner=organization_id,
         )
 
     async def calculate_inbreeding(
@@ -101,13 +102,22 @@ class KinshipCompute(BaseComputeInterface):
         genotype_matrix: np.ndarray,
         check_maf: bool,
         progress_callback,
+        artifact_owner: str | None = None,
     ) -> dict[str, Any]:
         """
         Kinship worker function (executed by compute workers)
         
-        Includes timeout handling and error recovery
+        Includes timeout handling and error recovery. When an owner is given
+        the matrix is written as a binary result artifact and the result
+        carries its handle and a block-mean preview in place of ``K``;
+        otherwise ``K`` is returned as nested lists so the task result stays
+        JSON-serialisable.
         """
         import asyncio
+        from app.modules.core.services.result_artifact_service import (
+            downsample_matrix,
+            get_result_artifact_store,
+        )
         from app.modules.genomics.compute.statistics.kinship import calculate_vanraden_kinship
 
         n_samples, n_markers = genotype_matrix.shape
@@ -138,6 +148,19 @@ class KinshipCompute(BaseComputeInterface):
             if not result.get("success"):
                 raise RuntimeError(f"Kinship calculation error: {result.get('error', 'Unknown error')}")
             
+            K = result.pop("K")
+            if artifact_owner is not None:
+                artifact = await asyncio.to_thread(
+                    get_result_artifact_store().save_array,
+                    K,
+                    name="kinship",
+                    organization_id=artifact_owner,
+                )
+                result["artifact"] = artifact.to_handle()
+                result["preview"] = downsample_matrix(K)
+            else:
+                result["K"] = K.tolist()
+
             progress_callback(1.0, "Kinship calculation complete")
             
             return result
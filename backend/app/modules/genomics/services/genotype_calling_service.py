@@ -0,0 +1,208 @@
+"""
+Genotype Calling Service
+Plate-level SNP calling into the Zarr genotype store
+
+Runs the batched EM caller (snp_clustering_service.call_genotype_matrix)
+over a plate's X/Y intensity matrices, seeded from the panel's cluster atlas,
+and writes calls straight to a scikit-allel style Zarr group registered as a
+VariantSet, so genomic prediction and VCF-imported sets read it the same way.
+
+Store layout (variants x samples):
+- calldata/GT          int8 (n_snps, n_samples, 2), -1 for no call
+- calldata/CONF        float32 posterior of the called cluster
+- samples, variants/ID
+- variants/CALL_RATE, variants/CLUSTER_SEP, variants/THETA_MEANS
+
+Atlases (one .npz per SNP panel) are updated after each plate with SNPs that
+called cleanly, so later plates start from learned clusters.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+from typing import Any
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.genotyping import CallSet, VariantSet
+from app.modules.genomics.services.snp_clustering_service import (
+    BatchCallResult,
+    ClusterAtlas,
+    call_genotype_matrix,
+)
+
+
+# zarr is an optional dependency, only needed to write the genotype store
+try:
+    import zarr as _zarr
+    _HAS_ZARR = True
+except ImportError:
+    _zarr = None  # type: ignore
+    _HAS_ZARR = False
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = "data/genotyping"
+ATLAS_DIR = f"{DATA_DIR}/atlases"
+# SNPs must call at least this well before their clusters feed the atlas
+ATLAS_MIN_CALL_RATE = 0.9
+ATLAS_MIN_SEPARATION = 2.0
+
+# Genotype code -> diploid GT alleles (AA = 0/0, AB = 0/1, BB = 1/1, no call = ./.)
+_GT_ALLELES = np.array([[0, 0], [0, 1], [1, 1], [-1, -1]], dtype=np.int8)
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("._") or "panel"
+
+
+def atlas_path(panel: str) -> str:
+    return os.path.join(ATLAS_DIR, f"{_safe_name(panel)}.npz")
+
+
+def write_genotype_store(
+    path: str,
+    result: BatchCallResult,
+    sample_names: list[str],
+    chunk_snps: int = 1024,
+) -> None:
+    """Write calls and per-SNP statistics as a Zarr group at ``path`` (replacing it)."""
+    if not _HAS_ZARR:
+        raise RuntimeError("Writing the genotype store requires zarr. Install with: pip install zarr")
+    if len(sample_names) != result.n_samples:
+        raise ValueError("sample_names must have one entry per sample column")
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    root = _zarr.open_group(path, mode="w")
+    chunk_snps = max(1, min(chunk_snps, result.n_snps or 1))
+
+    # NO_CALL (-1) indexes the last row of _GT_ALLELES
+    root.create_array(
+        "calldata/GT", data=_GT_ALLELES[result.calls], chunks=(chunk_snps, result.n_samples, 2)
+    )
+    root.create_array(
+        "calldata/CONF", data=result.confidence, chunks=(chunk_snps, result.n_samples)
+    )
+    root.create_array("samples", data=np.asarray(sample_names, dtype=str))
+    root.create_array("variants/ID", data=np.asarray(result.snp_names, dtype=str))
+    root.create_array("variants/CALL_RATE", data=result.call_rates.astype(np.float32))
+    root.create_array("variants/CLUSTER_SEP", data=result.cluster_separation.astype(np.float32))
+    root.create_array("variants/THETA_MEANS", data=result.means.astype(np.float32))
+
+
+def update_atlas(atlas: ClusterAtlas, result: BatchCallResult) -> tuple[ClusterAtlas, int]:
+    """Pool the plate's well-separated, high call-rate SNPs into the atlas."""
+    separation = np.nan_to_num(result.cluster_separation, nan=np.inf)
+    clean = (result.call_rates >= ATLAS_MIN_CALL_RATE) & (separation >= ATLAS_MIN_SEPARATION)
+    if not clean.any():
+        return atlas, 0
+    merged = atlas.merged(
+        np.asarray(result.snp_names)[clean],
+        result.means[clean],
+        result.variances[clean],
+        result.cluster_counts[clean],
+    )
+    return merged, int(clean.sum())
+
+
+class GenotypeCallingService:
+    """Calls genotyping plates and registers them as variant sets."""
+
+    def __init__(self):
+        # One writer per panel atlas within this process
+        self._atlas_locks: dict[str, asyncio.Lock] = {}
+
+    async def call_plate(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        variant_set_name: str,
+        x_matrix: np.ndarray,
+        y_matrix: np.ndarray,
+        sample_names: list[str],
+        snp_names: list[str],
+        panel: str = "default",
+        study_id: int | None = None,
+        min_r: float = 0.2,
+        min_confidence: float = 0.9,
+        update_cluster_atlas: bool = True,
+        max_workers: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Call a plate (SNPs x samples intensities), write it to the genotype
+        store and register a VariantSet with one CallSet per sample.
+        """
+        store_path = os.path.join(DATA_DIR, f"{_safe_name(variant_set_name)}.zarr")
+        path = atlas_path(panel)
+        lock = self._atlas_locks.setdefault(path, asyncio.Lock())
+
+        async with lock:
+            atlas = await asyncio.to_thread(ClusterAtlas.load, path)
+            result = await asyncio.to_thread(
+                call_genotype_matrix,
+                x_matrix,
+                y_matrix,
+                snp_names=snp_names,
+                atlas=atlas,
+                min_r=min_r,
+                min_confidence=min_confidence,
+                max_workers=max_workers,
+            )
+            await asyncio.to_thread(write_genotype_store, store_path, result, sample_names)
+
+            atlas_updates = 0
+            if update_cluster_atlas:
+                atlas, atlas_updates = update_atlas(atlas, result)
+                if atlas_updates:
+                    await asyncio.to_thread(atlas.save, path)
+
+        mean_call_rate = float(np.mean(result.call_rates)) if result.n_snps else 0.0
+        variant_set = VariantSet(
+            organization_id=organization_id,
+            variant_set_name=variant_set_name,
+            call_set_count=result.n_samples,
+            variant_count=result.n_snps,
+            storage_path=store_path,
+            study_id=study_id,
+            additional_info={
+                "importer": "snp_clustering",
+                "zarr_path": store_path,
+                "panel": panel,
+                "mean_call_rate": mean_call_rate,
+            },
+        )
+        db.add(variant_set)
+        await db.flush()
+        db.add_all([
+            CallSet(
+                organization_id=organization_id,
+                call_set_name=name,
+                call_set_db_id=f"{variant_set.id}_{name}",
+                additional_info={"variant_set_id": variant_set.id},
+            )
+            for name in sample_names
+        ])
+        await db.flush()
+
+        logger.info(
+            f"[GenotypeCalling] {variant_set_name}: {result.n_snps} SNPs x {result.n_samples} samples, "
+            f"mean call rate {mean_call_rate:.3f}, {int(result.seeded.sum())} seeded from atlas"
+        )
+        return {
+            "variant_set_id": variant_set.id,
+            "storage_path": store_path,
+            "n_snps": result.n_snps,
+            "n_samples": result.n_samples,
+            "mean_call_rate": mean_call_rate,
+            "sample_call_rates": ((result.calls >= 0).mean(axis=0).round(4).tolist() if result.n_snps else []),
+            "n_seeded_from_atlas": int(result.seeded.sum()),
+            "atlas_snps_updated": atlas_updates,
+            "low_separation_snps": int((np.nan_to_num(result.cluster_separation, nan=np.inf) < ATLAS_MIN_SEPARATION).sum()),
+        }
+
+
+genotype_calling_service = GenotypeCallingService()
@@ -36,19 +36,55 @@ class GWASResult:
     method: str
     significance_threshold: float
 
-    def to_dict(self) -> dict[str, Any]:
-        # Calculate -log10(p)
-        neg_log_p = -np.log10(np.clip(self.p_values, 1e-300, 1))
+    @property
+    def neg_log_p(self) -> np.ndarray:
+        return -np.log10(np.clip(self.p_values, 1e-300, 1))
 
-        # Identify significant markers
+    def _significant_markers(self, neg_log_p: np.ndarray) -> list[dict[str, Any]]:
         significant_idx = np.where(self.p_values < self.significance_threshold)[0]
+        return [
+            {
+                "name": self.marker_names[i],
+                "chromosome": self.chromosomes[i],
+                "position": self.positions[i],
+                "p_value": float(self.p_values[i]),
+                "neg_log_p": float(neg_log_p[i]),
+                "effect": float(self.effect_sizes[i]),
+            }
+            for i in significant_idx
+        ]
 
+    def to_summary(self) -> dict[str, Any]:
+        """Result header and significant hits, without per-marker arrays."""
+        significant_markers = self._significant_markers(self.neg_log_p)
         return {
             "n_samples": self.n_samples,
             "n_markers": self.n_markers,
             "method": self.method,
             "significance_threshold": self.significance_threshold,
-            "n_significant": len(significant_idx),
+            "n_significant": len(significant_markers),
+            "significant_markers": significant_markers,
+        }
+
+    def to_columns(self) -> dict[str, np.ndarray]:
+        """Per-marker results as columns, for binary artifact storage."""
+        return {
+            "name": np.asarray(self.marker_names, dtype=str),
+            "chromosome": np.asarray(self.chromosomes, dtype=str),
+            "position": np.asarray(self.positions, dtype=np.int64),
+            "p_value": np.asarray(self.p_values, dtype=np.float64),
+            "neg_log_p": self.neg_log_p,
+            "effect": np.asarray(self.effect_sizes, dtype=np.float64),
+            "se": np.asarray(self.standard_errors, dtype=np.float64),
+            "maf": np.asarray(self.maf, dtype=np.float64),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        # Calculate -log10(p)
+        neg_log_p = self.neg_log_p
+
+        return {
+            **self.to_summary(),
             "markers": [
                 {
                     "name": self.marker_names[i],
@@ -63,22 +99,11 @@ class GWASResult:
                 }
                 for i in range(self.n_markers)
             ],
-            "significant_markers": [
-                {
-                    "name": self.marker_names[i],
-                    "chromosome": self.chromosomes[i],
-                    "position": self.positions[i],
-                    "p_value": float(self.p_values[i]),
-                    "neg_log_p": float(neg_log_p[i]),
-                    "effect": float(self.effect_sizes[i]),
-                }
-                for i in significant_idx
-            ],
             "manhattan_data": self._get_manhattan_data(neg_log_p),
             "qq_data": self._get_qq_data(),
         }
 
-    def _get_manhattan_data(self, neg_log_p: np.ndarray) -> list[dict]:
+    def _get_manhattan_data(self, neg_log_p: np.ndarray, indices: np.ndarray | None = None) -> list[dict]:
         """Get data for Manhattan plot"""
         return [
             {
@@ -87,20 +112,55 @@ class GWASResult:
                 "p": float(neg_log_p[i]),
                 "name": self.marker_names[i],
             }
-            for i in range(self.n_markers)
+            for i in (range(self.n_markers) if indices is None else indices)
         ]
 
-    def _get_qq_data(self) -> dict[str, list[float]]:
+    def manhattan_preview(self, max_points: int = 2000) -> list[dict]:
+        """
+        Downsampled Manhattan plot data.
+
+        Markers are ordered along the genome and split into ``max_points``
+        bins; the strongest signal in each bin is kept, plus every marker
+        above the significance threshold, so peaks survive downsampling.
+        """
+        neg_log_p = self.neg_log_p
+        if self.n_markers <= max_points:
+            return self._get_manhattan_data(neg_log_p)
+
+        order = np.lexsort((np.asarray(self.positions), np.asarray(self.chromosomes, dtype=str)))
+        ordered = neg_log_p[order]
+        starts = np.linspace(0, self.n_markers, max_points + 1).astype(int)[:-1]
+        bin_max = np.maximum.reduceat(ordered, starts)
+        bin_ids = np.repeat(np.arange(max_points), np.diff(np.append(starts, self.n_markers)))
+        # First marker reaching its bin's maximum
+        hits = np.flatnonzero(ordered == bin_max[bin_ids])
+        _, first_hit = np.unique(bin_ids[hits], return_index=True)
+        keep = np.union1d(order[hits[first_hit]], np.flatnonzero(self.p_values < self.significance_threshold))
+        # Present the preview in genome order
+        rank = np.empty(self.n_markers, dtype=np.int64)
+        rank[order] = np.arange(self.n_markers)
+        return self._get_manhattan_data(neg_log_p, keep[np.argsort(rank[keep])])
+
+    def _get_qq_data(self, max_points: int | None = None) -> dict[str, list[float]]:
         """Get data for QQ plot"""
         n = len(self.p_values)
         expected = -np.log10(np.arange(1, n + 1) / (n + 1))
         observed = -np.log10(np.sort(self.p_values))
 
+        if max_points is not None and n > max_points:
+            # Log-spaced ranks keep the informative tail dense
+            ranks = np.unique(np.geomspace(1, n, max_points).astype(int)) - 1
+            expected, observed = expected[ranks], observed[ranks]
+
         return {
             "expected": expected.tolist(),
             "observed": observed.tolist(),
         }
 
+    def qq_preview(self, max_points: int = 1000) -> dict[str, list[float]]:
+        """Downsampled QQ plot data."""
+        return self._get_qq_data(max_points)
+
 
 class GWASService:
     """
@@ -1,9 +1,11 @@
 import math
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.ld import LDDecayPoint, LDPair
 from app.modules.genomics.services.genotyping_service import genotyping_service
+from app.services.compute_engine import compute_engine
 
 
 class LDAnalysisService:
@@ -36,6 +38,13 @@ class LDAnalysisService:
         r2 = (cov ** 2) / (var1 * var2)
         return r2
 
+    def calculate_r2_matrix(self, genotypes: list[list[int]]) -> np.ndarray:
+        """r² between every pair of markers (rows), in one compute-engine call."""
+        if not genotypes:
+            return np.zeros((0, 0))
+        # Engine takes individuals x markers
+        return compute_engine.compute_ld_matrix(np.asarray(genotypes, dtype=np.float64).T)
+
     def calculate_pairwise_ld(
         self,
         genotypes: list[list[int]],
@@ -48,29 +57,27 @@ class LDAnalysisService:
         Returns list of significant pairs and the full matrix.
         """
         n_markers = len(genotypes)
+        r2 = self.calculate_r2_matrix(genotypes)
+
+        # Only pairs within the window are reported; the rest of the matrix is 0
+        index = np.arange(n_markers)
+        in_window = np.abs(index[:, None] - index[None, :]) <= window_size
+        matrix = np.where(in_window, r2, 0.0)
+
         pairs = []
-        matrix = [[0.0] * n_markers for _ in range(n_markers)]
-
-        for i in range(n_markers):
-            matrix[i][i] = 1.0
-            end_j = min(n_markers, i + window_size + 1)
-            for j in range(i + 1, end_j):
-                r2 = self.calculate_r2(genotypes[i], genotypes[j])
-                matrix[i][j] = r2
-                matrix[j][i] = r2
-
-                dist = abs(positions[i] - positions[j])
-                pairs.append(LDPair(
-                    marker1=marker_names[i],
-                    marker2=marker_names[j],
-                    distance=dist,
-                    r2=r2,
-                    d_prime=math.sqrt(r2) # Approximate/Placeholder for D'
-                ))
+        for i, j in zip(*np.nonzero(np.triu(in_window, 1)), strict=True):
+            pair_r2 = float(r2[i, j])
+            pairs.append(LDPair(
+                marker1=marker_names[i],
+                marker2=marker_names[j],
+                distance=abs(positions[i] - positions[j]),
+                r2=pair_r2,
+                d_prime=math.sqrt(pair_r2) # Approximate/Placeholder for D'
+            ))
 
         # Sort pairs by r2 descending
         pairs.sort(key=lambda x: x.r2, reverse=True)
-        return pairs, matrix
+        return pairs, matrix.tolist()
 
     def calculate_decay(
         self,
@@ -83,35 +90,30 @@ class LDAnalysisService:
         Calculate LD decay.
         """
         n_markers = len(genotypes)
-        bins = {} # bin_start -> [sum_r2, count]
-
-        for i in range(n_markers):
-            # Limit inner loop to avoid O(N^2) on large sets if needed, but for decay we usually check pairs within max_dist
-            # Optimization: since positions are likely sorted, we can break early
-            for j in range(i + 1, n_markers):
-                dist = abs(positions[i] - positions[j])
-                if dist > max_dist:
-                    continue # Assuming sorted
-
-                r2 = self.calculate_r2(genotypes[i], genotypes[j])
-
-                bin_idx = (dist // bin_size) * bin_size
-                if bin_idx not in bins:
-                    bins[bin_idx] = [0.0, 0]
-
-                bins[bin_idx][0] += r2
-                bins[bin_idx][1] += 1
-
-        decay_points = []
-        for bin_start in sorted(bins.keys()):
-            total_r2, count = bins[bin_start]
-            decay_points.append(LDDecayPoint(
-                distance=bin_start,
-                mean_r2=total_r2 / count if count > 0 else 0,
-                pair_count=count
-            ))
-
-        return decay_points
+        if n_markers < 2:
+            return []
+
+        r2 = self.calculate_r2_matrix(genotypes)
+        first, second = np.triu_indices(n_markers, 1)
+        position = np.asarray(positions, dtype=np.int64)
+        dist = np.abs(position[first] - position[second])
+        within = dist <= max_dist
+
+        # Mean r2 per distance bin
+        bin_starts, bin_of_pair = np.unique(
+            (dist[within] // bin_size) * bin_size, return_inverse=True
+        )
+        totals = np.bincount(bin_of_pair, weights=r2[first[within], second[within]])
+        counts = np.bincount(bin_of_pair)
+
+        return [
+            LDDecayPoint(
+                distance=int(bin_start),
+                mean_r2=float(total / count) if count > 0 else 0,
+                pair_count=int(count)
+            )
+            for bin_start, total, count in zip(bin_starts, totals, counts, strict=True)
+        ]
 
     async def get_genotype_matrix(self, db: AsyncSession, variant_set_id: str) -> tuple[list[list[int]], list[str], list[int], int]:
         """
@@ -5,16 +5,29 @@ Near-Infrared Spectroscopy (NIRS) prediction engine for quality traits.
 Implements PLS (Partial Least Squares) regression on spectral data.
 
 Methods:
-- preprocess_spectra: SNV, MSC, derivatives
-- fit_pls: Train PLS model on calibration data
+- preprocess_spectra: SNV, MSC/EMSC, derivatives (vectorised over all spectra)
+- fit_pls: Train PLS model on calibration data (SIMPLS)
 - predict: Apply trained model to new spectra
+- cross_validate: RMSECV for every component count from one fit per fold
+
+The numerical engine lives in core's spectral_calibration_service so phenomic
+selection can share it.
 """
 
 import logging
 from typing import Any
 
 import numpy as np
-from scipy.signal import savgol_filter
+
+from app.modules.core.services.spectral_calibration_service import (
+    SpectralPreprocessor,
+    cross_validate_pls,
+    emsc,
+    msc,
+    savgol,
+    simpls,
+    snv,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -53,26 +66,15 @@ class NIRSPredictionService:
             return spectra.copy()
 
         if method == "snv":
-            # Standard Normal Variate
-            means = spectra.mean(axis=1, keepdims=True)
-            stds = spectra.std(axis=1, keepdims=True)
-            stds[stds == 0] = 1.0
-            return (spectra - means) / stds
+            return snv(spectra)
 
         if method == "derivative":
-            # Savitzky-Golay derivative
-            if window >= spectra.shape[1]:
-                window = max(5, spectra.shape[1] // 2 * 2 - 1)
-            return savgol_filter(spectra, window, polyorder, deriv=deriv_order, axis=1)
-
-        if method == "msc":
-            # Multiplicative Scatter Correction
-            mean_spectrum = spectra.mean(axis=0)
-            corrected = np.zeros_like(spectra)
-            for i in range(spectra.shape[0]):
-                fit = np.polyfit(mean_spectrum, spectra[i], 1)
-                corrected[i] = (spectra[i] - fit[1]) / fit[0]
-            return corrected
+            return savgol(spectra, window, polyorder, deriv=deriv_order)
+
+        if method in ("msc", "emsc"):
+            # Corrected against this batch's mean spectrum
+            reference = spectra.mean(axis=0)
+            return msc(spectra, reference) if method == "msc" else emsc(spectra, reference)
 
         raise ValueError(f"Unknown preprocessing method: {method}")
 
@@ -83,7 +85,7 @@ class NIRSPredictionService:
         n_components: int = 10,
     ) -> dict[str, Any]:
         """
-        Fit PLS regression using NIPALS algorithm.
+        Fit PLS regression using the SIMPLS algorithm.
 
         Args:
             X: Preprocessed spectra (n_samples, n_wavelengths)
@@ -91,79 +93,24 @@ class NIRSPredictionService:
             n_components: Number of PLS components
 
         Returns:
-            Model dict with weights, loadings, and coefficients
+            Model dict with coefficients and calibration statistics
         """
         n, p = X.shape
-        n_components = min(n_components, min(n, p))
-
-        # Center
-        X_mean = X.mean(axis=0)
-        y_mean = y.mean()
-        Xc = X - X_mean
-        yc = y - y_mean
-
-        # NIPALS PLS1
-        W = np.zeros((p, n_components))  # X weights
-        P = np.zeros((p, n_components))  # X loadings
-        T = np.zeros((n, n_components))  # X scores
-        Q = np.zeros(n_components)        # y loadings
-
-        E = Xc.copy()
-        f = yc.copy()
-
-        for a in range(n_components):
-            # Weight vector
-            w = E.T @ f
-            w_norm = np.linalg.norm(w)
-            if w_norm < 1e-10:
-                n_components = a
-                W = W[:, :a]
-                P = P[:, :a]
-                T = T[:, :a]
-                Q = Q[:a]
-                break
-            w = w / w_norm
-
-            # Score
-            t = E @ w
-            t_sq = t @ t
-            if t_sq < 1e-10:
-                n_components = a
-                break
-
-            # Loadings
-            p_load = E.T @ t / t_sq
-            q_load = f @ t / t_sq
-
-            # Deflate
-            E = E - np.outer(t, p_load)
-            f = f - t * q_load
-
-            W[:, a] = w
-            P[:, a] = p_load
-            T[:, a] = t
-            Q[a] = q_load
-
-        # Regression coefficients: B = W(P'W)^-1 * Q
-        PW = P.T @ W
-        try:
-            B = W @ np.linalg.solve(PW, np.diag(Q))
-            B = B.sum(axis=1)
-        except np.linalg.LinAlgError:
-            B = np.zeros(p)
+        fit = simpls(X, y, n_components)
+        B = fit.coefficients()
 
         # Calculate R² on calibration
-        y_pred = (X - X_mean) @ B + y_mean
+        y_pred = fit.predict(X)
         ss_res = np.sum((y - y_pred) ** 2)
-        ss_tot = np.sum((y - y_mean) ** 2)
+        ss_tot = np.sum((y - fit.y_mean) ** 2)
         r2_cal = 1 - ss_res / ss_tot if ss_tot > 0 else 0.0
         rmse_cal = np.sqrt(ss_res / n)
 
         return {
             "coefficients": B,
-            "x_mean": X_mean,
-            "y_mean": float(y_mean),
-            "n_components": n_components,
+            "x_mean": fit.x_mean,
+            "y_mean": fit.y_mean,
+            "n_components": fit.n_components,
             "r2_calibration": float(r2_cal),
             "rmse_calibration": float(rmse_cal),
             "n_samples": int(n),
@@ -196,50 +143,43 @@ class NIRSPredictionService:
         n_components: int = 10,
         n_folds: int = 5,
         preprocess: str = "snv",
+        random_state: int | None = None,
+        max_workers: int | None = None,
     ) -> dict[str, Any]:
         """
         Leave-group-out cross-validation for PLS.
 
+        Spectra are preprocessed once; each fold is fitted once with
+        ``n_components`` components and scores every smaller count too, and
+        folds run in parallel.
+
         Args:
             X: Raw spectra
             y: Reference values
             n_components: Max PLS components
             n_folds: Number of CV folds
-            preprocess: Preprocessing method
+            preprocess: Preprocessing method ('derivative' is a 1st derivative)
+            random_state: Seed for the fold assignment
 
         Returns:
-            CV statistics
+            CV statistics at ``n_components``, the best component count with
+            its statistics, and RMSECV per component count
         """
-        n = len(y)
-        indices = np.arange(n)
-        np.random.shuffle(indices)
-        fold_size = n // n_folds
-
-        y_pred_cv = np.zeros(n)
-
-        for fold in range(n_folds):
-            start = fold * fold_size
-            end = start + fold_size if fold < n_folds - 1 else n
-
-            val_idx = indices[start:end]
-            train_idx = np.concatenate([indices[:start], indices[end:]])
-
-            X_train = self.preprocess_spectra(X[train_idx], method=preprocess)
-            X_val = self.preprocess_spectra(X[val_idx], method=preprocess)
-
-            model = self.fit_pls(X_train, y[train_idx], n_components)
-            y_pred_cv[val_idx] = self.predict(model, X_val)
-
-        ss_res = np.sum((y - y_pred_cv) ** 2)
-        ss_tot = np.sum((y - y.mean()) ** 2)
-        r2_cv = 1 - ss_res / ss_tot if ss_tot > 0 else 0.0
-        rmse_cv = np.sqrt(ss_res / n)
+        steps = {"derivative": ("sg1",)}.get(preprocess, (preprocess,))
+        X_processed = SpectralPreprocessor(steps=steps).fit_transform(X)
+        cv = cross_validate_pls(X_processed, y, n_components, n_folds, random_state, max_workers)
+        # Reported at the requested count; small data can cap the components fitted
+        at = min(n_components, len(cv["rmse_cv_by_components"])) - 1
 
         return {
-            "r2_cv": float(r2_cv),
-            "rmse_cv": float(rmse_cv),
-            "n_folds": n_folds,
+            "r2_cv": cv["r2_cv_by_components"][at],
+            "rmse_cv": cv["rmse_cv_by_components"][at],
+            "n_folds": cv["n_folds"],
             "n_components": n_components,
+            "best_n_components": cv["best_n_components"],
+            "best_r2_cv": cv["r2_cv"],
+            "best_rmse_cv": cv["rmse_cv"],
+            "rmse_cv_by_components": cv["rmse_cv_by_components"],
             "preprocess": preprocess,
         }
 
@@ -8,9 +8,18 @@ Methods:
 - theta_r_transform: Convert (X, Y) intensities to (Theta, R)
 - cluster_snp: Assign genotype clusters (AA, AB, BB)
 - call_genotypes: Batch genotype calling from intensity matrix
+- call_genotype_matrix: Batched EM calling over SNP blocks (SNP x sample x
+  cluster tensors), seeded from a per-SNP ClusterAtlas, blocks in parallel
+  processes
 """
 
+from __future__ import annotations
+
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
 from typing import Any
 
 import numpy as np
@@ -19,6 +28,397 @@ from scipy.cluster.vq import kmeans2
 
 logger = logging.getLogger(__name__)
 
+GENOTYPE_LABELS = ("AA", "AB", "BB")
+N_CLUSTERS = len(GENOTYPE_LABELS)
+NO_CALL = -1
+
+SNP_BLOCK_SIZE = 1024
+EM_ITERATIONS = 12
+MIN_CLUSTER_VARIANCE = 1e-4
+# Theta priors for SNPs the atlas has not seen
+DEFAULT_THETA_MEANS = (0.05, 0.5, 0.95)
+DEFAULT_THETA_SD = 0.1
+DEFAULT_PRIOR_STRENGTH = 1.0
+# Pseudo-samples per cluster that anchor atlas-seeded SNPs to their learned clusters
+ATLAS_PRIOR_STRENGTH = 10.0
+
+
+# ============================================
+# CLUSTER ATLAS
+# ============================================
+
+@dataclass
+class ClusterAtlas:
+    """
+    Per-SNP theta cluster parameters learned from previous plates.
+
+    Arrays are aligned with ``snp_names``; ``means``/``variances``/``weights``
+    are (n_snps, 3) in AA, AB, BB order and ``n_samples`` counts the calls
+    the parameters were pooled from.
+    """
+    snp_names: np.ndarray
+    means: np.ndarray
+    variances: np.ndarray
+    weights: np.ndarray
+    n_samples: np.ndarray
+    n_plates: np.ndarray
+
+    @classmethod
+    def empty(cls) -> ClusterAtlas:
+        return cls(
+            snp_names=np.array([], dtype=str),
+            means=np.empty((0, N_CLUSTERS)),
+            variances=np.empty((0, N_CLUSTERS)),
+            weights=np.empty((0, N_CLUSTERS)),
+            n_samples=np.empty(0, dtype=np.int64),
+            n_plates=np.empty(0, dtype=np.int32),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> ClusterAtlas:
+        if not os.path.exists(path):
+            return cls.empty()
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{name: data[name] for name in cls.__dataclass_fields__})
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial atlas
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **{name: getattr(self, name) for name in self.__dataclass_fields__})
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.snp_names)
+
+    def _positions(self, snp_names: np.ndarray) -> np.ndarray:
+        """Atlas row of each SNP name, -1 when unknown."""
+        if not len(self):
+            return np.full(len(snp_names), -1)
+        order = np.argsort(self.snp_names)
+        sorted_names = self.snp_names[order]
+        found = np.searchsorted(sorted_names, snp_names).clip(max=len(sorted_names) - 1)
+        return np.where(sorted_names[found] == snp_names, order[found], -1)
+
+    def priors(self, snp_names: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(means, variances, weights, seeded) for ``snp_names``; defaults where unseen."""
+        n = len(snp_names)
+        means = np.tile(np.asarray(DEFAULT_THETA_MEANS, dtype=np.float64), (n, 1))
+        variances = np.full((n, N_CLUSTERS), DEFAULT_THETA_SD ** 2)
+        weights = np.full((n, N_CLUSTERS), 1.0 / N_CLUSTERS)
+        positions = self._positions(np.asarray(snp_names))
+        seeded = positions >= 0
+        if seeded.any():
+            rows = positions[seeded]
+            means[seeded] = self.means[rows]
+            variances[seeded] = self.variances[rows]
+            # A cluster absent from earlier plates (e.g. a rare homozygote) must stay reachable
+            weights[seeded] = np.maximum(self.weights[rows], 1e-3)
+        return means, variances, weights, seeded
+
+    def merged(
+        self,
+        snp_names: np.ndarray,
+        means: np.ndarray,
+        variances: np.ndarray,
+        cluster_counts: np.ndarray,
+    ) -> ClusterAtlas:
+        """
+        Atlas with a plate's clusters pooled in (count-weighted moments per
+        cluster); clusters the plate did not populate keep their old values.
+        """
+        snp_names = np.asarray(snp_names)
+        positions = self._positions(snp_names)
+        known = positions >= 0
+        new_names = snp_names[~known]
+
+        atlas_means = np.concatenate([self.means, means[~known]])
+        atlas_vars = np.concatenate([self.variances, variances[~known]])
+        atlas_counts = np.concatenate([
+            self.weights * self.n_samples[:, None],
+            np.zeros((len(new_names), N_CLUSTERS)),
+        ])
+        n_plates = np.concatenate([self.n_plates, np.zeros(len(new_names), dtype=np.int32)])
+        rows = np.where(known, positions, len(self) + np.cumsum(~known) - 1)
+
+        old_n = atlas_counts[rows]
+        new_n = cluster_counts.astype(np.float64)
+        total = old_n + new_n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pooled_mean = (old_n * atlas_means[rows] + new_n * means) / total
+            pooled_second = (
+                old_n * (atlas_vars[rows] + atlas_means[rows] ** 2) + new_n * (variances + means ** 2)
+            ) / total
+        populated = total > 0
+        atlas_means[rows] = np.where(populated, pooled_mean, atlas_means[rows])
+        atlas_vars[rows] = np.where(
+            populated, np.maximum(pooled_second - pooled_mean ** 2, MIN_CLUSTER_VARIANCE), atlas_vars[rows]
+        )
+        atlas_counts[rows] = total
+        n_plates[rows] += 1
+
+        n_samples = atlas_counts.sum(axis=1)
+        weights = np.divide(
+            atlas_counts, n_samples[:, None],
+            out=np.full_like(atlas_counts, 1.0 / N_CLUSTERS), where=n_samples[:, None] > 0,
+        )
+        return ClusterAtlas(
+            snp_names=np.concatenate([self.snp_names.astype(str), new_names.astype(str)]),
+            means=atlas_means,
+            variances=atlas_vars,
+            weights=weights,
+            n_samples=n_samples.round().astype(np.int64),
+            n_plates=n_plates,
+        )
+
+
+# ============================================
+# BATCHED CALLING
+# ============================================
+
+@dataclass
+class BatchCallResult:
+    """Calls and per-SNP cluster statistics for an (n_snps, n_samples) plate."""
+    snp_names: list[str]
+    calls: np.ndarray  # int8 (n_snps, n_samples): 0 AA, 1 AB, 2 BB, -1 no call
+    confidence: np.ndarray  # float32 posterior of the called cluster
+    call_rates: np.ndarray
+    cluster_separation: np.ndarray  # NaN when fewer than two clusters are populated
+    means: np.ndarray  # (n_snps, 3) theta cluster means, AA < AB < BB
+    variances: np.ndarray
+    weights: np.ndarray
+    cluster_counts: np.ndarray  # (n_snps, 3) called samples per cluster
+    seeded: np.ndarray  # SNPs initialised from the atlas
+
+    @property
+    def n_snps(self) -> int:
+        return self.calls.shape[0]
+
+    @property
+    def n_samples(self) -> int:
+        return self.calls.shape[1]
+
+    def per_snp_stats(self) -> dict[str, dict[str, Any]]:
+        stats = {}
+        for i, name in enumerate(self.snp_names):
+            stats[name] = {
+                "call_rate": float(self.call_rates[i]),
+                "cluster_separation": (
+                    None if np.isnan(self.cluster_separation[i]) else float(self.cluster_separation[i])
+                ),
+                "cluster_stats": {
+                    label: {
+                        "count": int(self.cluster_counts[i, k]),
+                        "mean_theta": float(self.means[i, k]),
+                        "std_theta": float(np.sqrt(self.variances[i, k])),
+                    }
+                    for k, label in enumerate(GENOTYPE_LABELS)
+                    if self.cluster_counts[i, k]
+                },
+            }
+        return stats
+
+
+def _posteriors(theta: np.ndarray, means: np.ndarray, variances: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    (3, S, N) cluster posteriors for theta of shape (S, N); parameters are (S, 3).
+
+    The tensor is cluster-major so each cluster is a contiguous (S, N) slab and
+    the max/sum over clusters are elementwise ops between slabs rather than
+    reductions over a length-3 trailing axis.
+    """
+    scale = (-0.5 / variances).T[:, :, None].astype(theta.dtype)
+    offset = (np.log(weights) - 0.5 * np.log(variances)).T[:, :, None].astype(theta.dtype)
+    log_p = theta[None, :, :] - means.T[:, :, None].astype(theta.dtype)
+    log_p *= log_p
+    log_p *= scale
+    log_p += offset
+    log_p -= np.maximum(np.maximum(log_p[0], log_p[1]), log_p[2])
+    resp = np.exp(log_p, out=log_p)
+    resp /= resp[0] + resp[1] + resp[2]
+    return resp
+
+
+def _em_block(
+    theta: np.ndarray,
+    valid: np.ndarray,
+    prior_means: np.ndarray,
+    prior_vars: np.ndarray,
+    prior_weights: np.ndarray,
+    prior_strength: np.ndarray,
+    n_iterations: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fixed-iteration EM for a 3-component 1-D Gaussian mixture per SNP.
+
+    theta/valid are (S, N); priors are (S, 3); the posterior tensor is
+    (3, S, N). M-steps are MAP estimates with ``prior_strength`` pseudo-samples
+    at the prior mean/variance, which keeps empty clusters at their priors.
+    """
+    # float32 halves memory traffic on the posterior tensor; sums stay float64
+    theta = theta.astype(np.float32)
+    theta_valid = np.where(valid, theta, 0).astype(np.float32)
+    theta2_valid = theta_valid * theta_valid
+    tau = prior_strength[:, None]
+    prior_second = prior_vars + prior_means ** 2
+    n_valid = valid.sum(axis=1, keepdims=True).astype(np.float64)
+    means, variances, weights = prior_means.copy(), prior_vars.copy(), prior_weights.copy()
+
+    for _ in range(n_iterations):
+        resp = _posteriors(theta, means, variances, weights)
+        resp *= valid
+        n_k = resp.sum(axis=2, dtype=np.float64).T
+        sum_x = np.einsum("ksn,sn->sk", resp, theta_valid, dtype=np.float64)
+        sum_x2 = np.einsum("ksn,sn->sk", resp, theta2_valid, dtype=np.float64)
+        means = (sum_x + tau * prior_means) / (n_k + tau)
+        variances = np.maximum((sum_x2 + tau * prior_second) / (n_k + tau) - means ** 2, MIN_CLUSTER_VARIANCE)
+        weights = np.maximum((n_k + 1e-3) / (n_valid + N_CLUSTERS * 1e-3), 1e-6)
+
+    return _posteriors(theta, means, variances, weights), means, variances, weights
+
+
+def call_block(
+    x: np.ndarray,
+    y: np.ndarray,
+    prior_means: np.ndarray,
+    prior_vars: np.ndarray,
+    prior_weights: np.ndarray,
+    seeded: np.ndarray,
+    min_r: float = 0.2,
+    min_confidence: float = 0.9,
+    n_iterations: int = EM_ITERATIONS,
+) -> dict[str, np.ndarray]:
+    """Call one block of SNPs; arrays are (S, N) intensities and (S, 3) priors."""
+    theta, r = snp_clustering_service.theta_r_transform(
+        np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    )
+    valid = r >= min_r
+    prior_strength = np.where(seeded, ATLAS_PRIOR_STRENGTH, DEFAULT_PRIOR_STRENGTH)
+    resp, means, variances, weights = _em_block(
+        theta, valid, prior_means, prior_vars, prior_weights, prior_strength, n_iterations
+    )
+
+    # Order clusters by theta so labels always read AA < AB < BB
+    order = np.argsort(means, axis=1)
+    means = np.take_along_axis(means, order, axis=1)
+    variances = np.take_along_axis(variances, order, axis=1)
+    weights = np.take_along_axis(weights, order, axis=1)
+    resp = np.take_along_axis(resp, order.T[:, :, None], axis=0)
+
+    calls = resp.argmax(axis=0).astype(np.int8)
+    confidence = resp.max(axis=0)
+    called = valid & (confidence >= min_confidence)
+    calls[~called] = NO_CALL
+    confidence[~valid] = 0.0
+
+    cluster_counts = np.stack([(calls == k).sum(axis=1) for k in range(N_CLUSTERS)], axis=1)
+    n_samples = calls.shape[1]
+    call_rates = called.sum(axis=1) / n_samples if n_samples else np.zeros(len(calls))
+
+    # Separation: smallest gap between adjacent populated clusters in units of
+    # their summed standard deviations
+    sd = np.sqrt(variances)
+    gap = np.diff(means, axis=1) / (sd[:, 1:] + sd[:, :-1])
+    separation = np.full(len(calls), np.nan)
+    populated = cluster_counts >= 2
+    for low, high in ((0, 1), (1, 2), (0, 2)):
+        pair = populated[:, low] & populated[:, high]
+        if high - low == 2:
+            # AA and BB with no AB between them
+            pair &= ~populated[:, 1]
+            value = (means[:, 2] - means[:, 0]) / (sd[:, 2] + sd[:, 0])
+        else:
+            value = gap[:, low]
+        separation = np.where(pair, np.fmin(separation, value), separation)
+
+    return {
+        "calls": calls,
+        "confidence": confidence,
+        "call_rates": call_rates,
+        "cluster_separation": separation,
+        "means": means,
+        "variances": variances,
+        "weights": weights,
+        "cluster_counts": cluster_counts,
+    }
+
+
+def _call_block_args(args: tuple) -> dict[str, np.ndarray]:
+    x, y, priors, kwargs = args
+    return call_block(x, y, *priors, **kwargs)
+
+
+def call_genotype_matrix(
+    x_matrix: np.ndarray,
+    y_matrix: np.ndarray,
+    snp_names: list[str] | None = None,
+    atlas: ClusterAtlas | None = None,
+    min_r: float = 0.2,
+    min_confidence: float = 0.9,
+    n_iterations: int = EM_ITERATIONS,
+    block_size: int = SNP_BLOCK_SIZE,
+    max_workers: int | None = None,
+) -> BatchCallResult:
+    """
+    Call genotypes for every SNP on a plate.
+
+    SNPs are processed in blocks of ``block_size`` as (block, samples, 3)
+    posterior tensors; with more than one block and worker the blocks run in
+    separate processes. Atlas SNPs start from (and are anchored to) their
+    learned clusters, unseen SNPs from default theta priors.
+    """
+    x_matrix = np.asarray(x_matrix, dtype=np.float64)
+    y_matrix = np.asarray(y_matrix, dtype=np.float64)
+    if x_matrix.shape != y_matrix.shape or x_matrix.ndim != 2:
+        raise ValueError("x_matrix and y_matrix must both be (n_snps, n_samples)")
+    n_snps = x_matrix.shape[0]
+    if snp_names is None:
+        snp_names = [f"SNP_{i+1}" for i in range(n_snps)]
+    if len(snp_names) != n_snps:
+        raise ValueError("snp_names must have one entry per SNP")
+
+    priors = (atlas or ClusterAtlas.empty()).priors(np.asarray(snp_names, dtype=str))
+    kwargs = {"min_r": min_r, "min_confidence": min_confidence, "n_iterations": n_iterations}
+    blocks = [
+        (
+            x_matrix[start:start + block_size],
+            y_matrix[start:start + block_size],
+            tuple(p[start:start + block_size] for p in priors),
+            kwargs,
+        )
+        # An empty plate still runs one (empty) block so the result arrays keep their shapes
+        for start in range(0, max(n_snps, 1), block_size)
+    ]
+
+    workers = min(len(blocks), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        results = [_call_block_args(block) for block in blocks]
+    else:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            results = list(pool.map(_call_block_args, blocks))
+
+    logger.info(
+        f"[SNPClustering] Called {n_snps} SNPs x {x_matrix.shape[1]} samples "
+        f"in {len(blocks)} block(s) on {workers} process(es)"
+    )
+
+    def stacked(key: str) -> np.ndarray:
+        return np.concatenate([result[key] for result in results])
+
+    return BatchCallResult(
+        snp_names=list(snp_names),
+        calls=stacked("calls"),
+        confidence=stacked("confidence"),
+        call_rates=stacked("call_rates"),
+        cluster_separation=stacked("cluster_separation"),
+        means=stacked("means"),
+        variances=stacked("variances"),
+        weights=stacked("weights"),
+        cluster_counts=stacked("cluster_counts"),
+        seeded=priors[3],
+    )
+
 
 class SNPClusteringService:
     """
@@ -153,7 +553,7 @@ class SNPClusteringService:
         min_r: float = 0.2,
     ) -> dict[str, Any]:
         """
-        Batch genotype calling for multiple SNPs.
+        Batch genotype calling for multiple SNPs (batched EM engine, in process).
 
         Args:
             x_matrix: (n_snps, n_samples) allele A intensities
@@ -164,35 +564,16 @@ class SNPClusteringService:
         Returns:
             Dict with genotype calls matrix and per-SNP stats
         """
-        n_snps, n_samples = x_matrix.shape
-
-        if snp_names is None:
-            snp_names = [f"SNP_{i+1}" for i in range(n_snps)]
-
-        all_calls = []
-        all_stats = {}
-
-        for i in range(n_snps):
-            theta, r = self.theta_r_transform(x_matrix[i], y_matrix[i])
-            result = self.cluster_snp(theta, r, min_r=min_r)
-            all_calls.append(result["calls"])
-            all_stats[snp_names[i]] = {
-                "call_rate": result["call_rate"],
-                "cluster_stats": result.get("cluster_stats", {}),
-            }
-
-        genotype_matrix = np.array(all_calls)
-
-        # Summary
-        call_rates = [all_stats[s]["call_rate"] for s in snp_names]
+        result = call_genotype_matrix(x_matrix, y_matrix, snp_names=snp_names, min_r=min_r, max_workers=1)
+        per_snp_stats = result.per_snp_stats()
 
         return {
-            "genotype_matrix": genotype_matrix.tolist(),
-            "snp_names": snp_names,
-            "n_snps": n_snps,
-            "n_samples": n_samples,
-            "per_snp_stats": all_stats,
-            "mean_call_rate": float(np.mean(call_rates)),
+            "genotype_matrix": result.calls.astype(int).tolist(),
+            "snp_names": result.snp_names,
+            "n_snps": result.n_snps,
+            "n_samples": result.n_samples,
+            "per_snp_stats": per_snp_stats,
+            "mean_call_rate": float(np.mean(result.call_rates)) if result.n_snps else 0.0,
         }
 
 
@@ -14,14 +14,19 @@ import contextlib
 import logging
 import uuid
 from dataclasses import dataclass, field
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from enum import StrEnum
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.germplasm import Seedlot, SeedlotTransaction
+from app.modules.core.services.organization_counter_service import (
+    LOW_STOCK_THRESHOLD_G,
+    LOW_VIABILITY_THRESHOLD,
+    get_organization_counter_service,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -393,8 +398,80 @@ class SeedInventoryService:
 
         return lot.additional_info.get("viability_tests", [])
 
-    async def get_inventory_summary(self, db: AsyncSession) -> dict[str, Any]:
-        """Get inventory summary statistics"""
+    async def _count_pending_requests(self, db: AsyncSession) -> int:
+        """Count pending seed requests (stored as REQ- transactions)"""
+        stmt_req = select(SeedlotTransaction).where(
+            # Using JSON filtering usually requires casting or dialect specific syntax.
+            # For simplicity, filtering in python for now since table scan is expensive but safer without dialect.
+            # Or assume we can add a column later.
+            # Or rely on transaction_description starting with "Request" and no quantity deducted yet?
+            # Let's filter in python for now.
+            SeedlotTransaction.transaction_db_id.like("REQ-%")
+        )
+        result_req = await db.execute(stmt_req)
+        txs = result_req.scalars().all()
+        return sum(1 for tx in txs if (tx.additional_info or {}).get("status") == "pending")
+
+    async def _get_counter_summary(self, db: AsyncSession, organization_id: int) -> dict[str, Any]:
+        """Inventory summary served from maintained organization counters"""
+        counters = await get_organization_counter_service().get_or_reconcile(db, organization_id)
+
+        def breakdown(prefix: str) -> dict[str, float]:
+            return {
+                key[len(prefix):]: value
+                for key, value in counters.items()
+                if key.startswith(prefix) and value
+            }
+
+        by_status = {k: int(v) for k, v in breakdown("seedlots.status:").items()}
+        by_storage = {k: int(v) for k, v in breakdown("seedlots.storage:").items()}
+        species_quantity = breakdown("seedlots.species_quantity_g:")
+        by_species = {
+            species: {"lots": int(lots), "quantity_g": species_quantity.get(species, 0)}
+            for species, lots in breakdown("seedlots.species:").items()
+        }
+
+        today = date.today()
+        stmt = (
+            select(Seedlot)
+            .where(
+                Seedlot.organization_id == organization_id,
+                Seedlot.last_viability_test < today - timedelta(days=365),
+            )
+            .order_by(Seedlot.last_viability_test, Seedlot.id)
+            .limit(10)
+        )
+        needs_testing = []
+        for lot in (await db.execute(stmt)).scalars():
+            dto = SeedLotDTO.from_model(lot)
+            needs_testing.append({
+                "lot_id": dto.lot_id,
+                "days_since_test": (today - lot.last_viability_test).days,
+                "last_viability": dto.current_viability,
+            })
+
+        return {
+            "total_lots": int(counters.get("seedlots", 0)),
+            "total_quantity_g": round(counters.get("seedlots.quantity_g", 0), 2),
+            "by_status": by_status,
+            "by_storage_type": by_storage,
+            "by_species": by_species,
+            "lots_needing_viability_test": needs_testing,
+            "pending_requests": await self._count_pending_requests(db),
+        }
+
+    async def get_inventory_summary(
+        self, db: AsyncSession, organization_id: int | None = None
+    ) -> dict[str, Any]:
+        """
+        Get inventory summary statistics
+
+        With an organization, totals and breakdowns come from maintained
+        counters instead of loading every seed lot.
+        """
+        if organization_id:
+            return await self._get_counter_summary(db, organization_id)
+
         stmt = select(Seedlot)
         result = await db.execute(stmt)
         lots = result.scalars().all()
@@ -438,17 +515,7 @@ class SeedInventoryService:
                     })
 
         # Pending requests count from transactions
-        stmt_req = select(SeedlotTransaction).where(
-            # Using JSON filtering usually requires casting or dialect specific syntax.
-            # For simplicity, filtering in python for now since table scan is expensive but safer without dialect.
-            # Or assume we can add a column later.
-            # Or rely on transaction_description starting with "Request" and no quantity deducted yet?
-            # Let's filter in python for now.
-            SeedlotTransaction.transaction_db_id.like("REQ-%")
-        )
-        result_req = await db.execute(stmt_req)
-        txs = result_req.scalars().all()
-        pending_requests = sum(1 for tx in txs if (tx.additional_info or {}).get("status") == "pending")
+        pending_requests = await self._count_pending_requests(db)
 
         return {
             "total_lots": total_lots,
@@ -460,9 +527,28 @@ class SeedInventoryService:
             "pending_requests": pending_requests,
         }
 
-    async def get_alerts(self, db: AsyncSession) -> list[dict[str, Any]]:
-        """Get inventory alerts"""
+    async def get_alerts(
+        self, db: AsyncSession, organization_id: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Get inventory alerts
+
+        With an organization, counters decide which lots need loading: none when
+        nothing is flagged, only low-stock lots when viability is healthy.
+        """
         stmt = select(Seedlot)
+        if organization_id:
+            counters = await get_organization_counter_service().get_or_reconcile(db, organization_id)
+            low_stock = counters.get("seedlots.low_stock", 0)
+            low_viability = counters.get("seedlots.low_viability", 0)
+            if not low_stock and not low_viability:
+                return []
+            stmt = stmt.where(Seedlot.organization_id == organization_id)
+            if not low_viability:
+                stmt = stmt.where(
+                    or_(Seedlot.count.is_(None), Seedlot.count < LOW_STOCK_THRESHOLD_G)
+                )
+
         result = await db.execute(stmt)
         lots = result.scalars().all()
 
@@ -472,7 +558,7 @@ class SeedInventoryService:
         for lot in lots:
             dto = SeedLotDTO.from_model(lot)
 
-            if dto.current_quantity < 100:
+            if dto.current_quantity < LOW_STOCK_THRESHOLD_G:
                  alerts.append({
                     "type": "low_stock",
                     "severity": "warning",
@@ -480,7 +566,7 @@ class SeedInventoryService:
                     "message": f"Low stock: {dto.current_quantity}g remaining",
                 })
 
-            if dto.current_viability and dto.current_viability < 70:
+            if dto.current_viability and dto.current_viability < LOW_VIABILITY_THRESHOLD:
                 alerts.append({
                     "type": "low_viability",
                     "severity": "warning" if dto.current_viability >= 50 else "critical",
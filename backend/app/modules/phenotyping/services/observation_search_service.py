@@ -47,7 +47,7 @@ class ObservationSearchService:
         Returns:
             List of observation dictionaries, empty if no data
         """
-        from app.models.phenotyping import Observation
+        from app.models.phenotyping import Observation, parse_observation_timestamp
 
         stmt = (
             select(Observation)
@@ -58,7 +58,7 @@ class ObservationSearchService:
                 selectinload(Observation.study)
             )
             .where(Observation.organization_id == organization_id)
-            .order_by(Observation.observation_time_stamp.desc())
+            .order_by(Observation.observed_at.desc().nulls_last())
             .limit(limit)
         )
 
@@ -68,11 +68,14 @@ class ObservationSearchService:
         if germplasm_id:
             stmt = stmt.where(Observation.germplasm_id == germplasm_id)
 
+        # Typed timestamp filters can use (organization_id, observed_at)
         if date_from:
-            stmt = stmt.where(Observation.observation_time_stamp >= date_from)
+            start = parse_observation_timestamp(date_from)
+            stmt = stmt.where(Observation.observed_at >= start) if start else stmt.where(Observation.observation_time_stamp >= date_from)
 
         if date_to:
-            stmt = stmt.where(Observation.observation_time_stamp <= date_to)
+            end = parse_observation_timestamp(date_to)
+            stmt = stmt.where(Observation.observed_at <= end) if end else stmt.where(Observation.observation_time_stamp <= date_to)
 
         result = await db.execute(stmt)
         observations = result.scalars().all()
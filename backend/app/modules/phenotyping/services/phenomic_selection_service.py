@@ -3,19 +3,48 @@ Phenomic Selection Service
 High-throughput phenotyping for genomic prediction
 
 Converted to database queries per Zero Mock Data Policy.
+
+PLSR models are calibrated with core's spectral_calibration_service and the
+fitted calibration (preprocessing state + coefficients) is stored as .npz
+under MODEL_DIR; the PhenomicModel row keeps its path in parameters.
 """
+import asyncio
+import os
+import uuid
 from datetime import datetime
+from typing import Any
 
+import numpy as np
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.import_job import ImportJob
 from app.models.phenomic import PhenomicDataset, PhenomicModel
+from app.modules.core.services.spectral_calibration_service import (
+    SpectralCalibration,
+    spectral_calibration_service,
+)
+
+
+MODEL_DIR = "data/phenomic/models"
 
 
 class PhenomicSelectionService:
     """Service for phenomic selection and high-throughput phenotyping."""
 
+    def __init__(self):
+        # Loaded calibrations keyed by (path, mtime) so a retrained file is picked up
+        self._calibrations: dict[str, tuple[float, SpectralCalibration]] = {}
+
+    def _load_calibration(self, path: str) -> SpectralCalibration:
+        mtime = os.path.getmtime(path)
+        cached = self._calibrations.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        calibration = SpectralCalibration.load(path)
+        self._calibrations[path] = (mtime, calibration)
+        return calibration
+
     async def get_datasets(
         self,
         db: AsyncSession,
@@ -267,25 +296,115 @@ class PhenomicSelectionService:
             "message": "Spectral upload receipt created and queued against a persistent import job.",
         }
 
+    async def train_model(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        dataset_id: str,
+        target_trait: str,
+        spectra: list[list[float]] | np.ndarray,
+        reference_values: list[float] | np.ndarray,
+        preprocessing: list[str] | None = None,
+        max_components: int = 20,
+        n_folds: int = 5,
+        name: str | None = None,
+    ) -> dict:
+        """
+        Calibrate a PLSR model for one trait on a dataset's spectra.
+
+        The component count is selected by cross-validation, the calibration
+        is persisted for predict_traits and a deployed PhenomicModel is
+        recorded with CV metrics.
+
+        Args:
+            db: Database session
+            organization_id: Organization ID for multi-tenant isolation
+            dataset_id: Dataset ID or dataset_code the spectra belong to
+            target_trait: Trait the reference values measure
+            spectra: Raw spectra (n_samples, n_wavelengths)
+            reference_values: Laboratory reference values (n_samples,)
+            preprocessing: Pipeline steps, e.g. ["emsc", "sg1"] (default ["snv"])
+            max_components: Largest component count considered
+            n_folds: Cross-validation folds
+
+        Returns:
+            Model dict (as get_model) or error dict
+        """
+        dataset = await self.get_dataset(db, organization_id, dataset_id)
+        if not dataset:
+            return {"error": "Dataset not found"}
+
+        X = np.asarray(spectra, dtype=np.float64)
+        y = np.asarray(reference_values, dtype=np.float64)
+        steps = tuple(preprocessing or ("snv",))
+        try:
+            calibration = await asyncio.to_thread(
+                spectral_calibration_service.calibrate,
+                X,
+                y,
+                steps=steps,
+                max_components=max_components,
+                n_folds=n_folds,
+                dataset_key=(organization_id, int(dataset["id"])),
+            )
+        except ValueError as e:
+            return {"error": str(e)}
+
+        model_code = f"PLSR-{uuid.uuid4().hex[:12].upper()}"
+        path = os.path.join(MODEL_DIR, str(organization_id), f"{model_code}.npz")
+        await asyncio.to_thread(calibration.save, path)
+
+        metrics = calibration.metrics
+        model = PhenomicModel(
+            organization_id=organization_id,
+            model_code=model_code,
+            name=name or f"PLSR {target_trait} ({dataset['name']})",
+            model_type="PLSR",
+            dataset_id=int(dataset["id"]),
+            target_trait=target_trait,
+            r_squared=round(metrics["r2_cv"], 4),
+            rmse=round(metrics["rmse_cv"], 4),
+            parameters={
+                "components": calibration.n_components,
+                "preprocessing": list(steps),
+                "artifact_path": path,
+                "n_folds": metrics["n_folds"],
+                "rmse_cv_by_components": [round(v, 6) for v in metrics["rmse_cv_by_components"]],
+                "r2_calibration": round(metrics["r2_calibration"], 4),
+                "rmse_calibration": round(metrics["rmse_calibration"], 4),
+                "n_samples": metrics["n_samples"],
+                "n_wavelengths": metrics["n_wavelengths"],
+            },
+            status="deployed",
+        )
+        db.add(model)
+        await db.flush()
+        await db.refresh(model)
+
+        return await self.get_model(db, organization_id, str(model.id))
+
     async def predict_traits(
         self,
         db: AsyncSession,
         organization_id: int,
         model_id: str,
-        sample_ids: list[str]
+        sample_ids: list[str],
+        spectra: list[list[float]] | np.ndarray | None = None,
     ) -> dict:
         """
         Predict traits for samples using a model.
 
-        Note: Actual prediction would require the trained model weights
-        and spectral data. This returns a placeholder indicating the
-        model was found but prediction requires compute infrastructure.
+        Spectra are not stored server-side yet, so predictions are made for
+        spectra supplied with the request (one row per sample ID). Without
+        spectra, or for models that have no stored calibration, the model is
+        validated and the request reported as pending.
 
         Args:
             db: Database session
             organization_id: Organization ID for multi-tenant isolation
             model_id: Model ID to use for prediction
             sample_ids: List of sample IDs to predict
+            spectra: Optional raw spectra aligned with sample_ids
 
         Returns:
             Prediction result dict
@@ -294,20 +413,40 @@ class PhenomicSelectionService:
         if not model:
             return {"error": "Model not found"}
 
-        # In production, this would:
-        # 1. Load the trained model weights
-        # 2. Fetch spectral data for the samples
-        # 3. Run inference
-        # For now, return a placeholder indicating infrastructure needed
-        return {
+        result: dict[str, Any] = {
             "model_id": model_id,
             "model_name": model["name"],
             "target_trait": model["target_trait"],
             "sample_count": len(sample_ids),
-            "status": "pending",
-            "message": "Prediction requires compute infrastructure. Model found and validated.",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
         }
+        path = model["parameters"].get("artifact_path")
+        if spectra is None or not path or not os.path.exists(path):
+            result.update({
+                "status": "pending",
+                "message": (
+                    "Prediction requires spectra and a calibrated model. Model found and validated."
+                ),
+            })
+            return result
+
+        X = np.atleast_2d(np.asarray(spectra, dtype=np.float64))
+        if len(X) != len(sample_ids):
+            return {"error": "spectra must have one row per sample ID"}
+        try:
+            calibration = await asyncio.to_thread(self._load_calibration, path)
+            predicted = await asyncio.to_thread(calibration.predict, X)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        result.update({
+            "status": "completed",
+            "predictions": [
+                {"sample_id": sample_id, "value": float(value)}
+                for sample_id, value in zip(sample_ids, predicted, strict=True)
+            ],
+        })
+        return result
 
     async def get_spectral_data(
         self,
@@ -5,12 +5,20 @@ Ported from ImagebreedPy (vegetative_index.py) for Bijmantra.
 
 This service provides discrete functions to calculate vegetative indices
 (NDVI, NDRE, TGI, VARI, CCC) from input image arrays.
+
+The calculate_* functions decode the whole image and suit photos and small
+uploads. For orthomosaics use calculate_index_raster, which streams the
+raster tile by tile (raster_tile_service) with bounded memory.
 """
 
 import logging
+from collections.abc import Sequence
+from typing import Any
 
 import numpy as np
 
+from app.modules.core.services import raster_tile_service
+
 try:
     import cv2
 except ImportError:
@@ -68,18 +76,8 @@ def calculate_ccc(
     if b is None or g is None or r is None:
         return None
 
-    # Theta values from original implementation
-    theta1 = 0.95
-    theta2 = 0.95
-    theta3 = 20
-
-    # Avoid division by zero
-    with np.errstate(divide='ignore', invalid='ignore'):
-        cond1 = (r / g) < theta1
-        cond2 = (b / g) < theta2
-        cond3 = (2 * g.astype(int) - r.astype(int) - b.astype(int)) > theta3
-
-    mask = cond1 & cond2 & cond3
+    # Thresholds from the original implementation (r/g < 0.95, b/g < 0.95, 2g - r - b > 20)
+    mask = raster_tile_service.ccc(r.astype(float), g.astype(float), b.astype(float)) > 0
 
     # Create output image (255 for canopy, 0 for background)
     ccc_image = np.zeros_like(g, dtype=np.uint8)
@@ -124,12 +122,7 @@ def calculate_ndvi(
     nir = nir.astype(float)
     red = red.astype(float)
 
-    with np.errstate(divide='ignore', invalid='ignore'):
-        numerator = nir - red
-        denominator = nir + red
-        ndvi = np.divide(numerator, denominator)
-        ndvi[np.isnan(ndvi)] = 0
-        ndvi[np.isinf(ndvi)] = 0
+    ndvi = raster_tile_service.ndvi(nir, red)
 
     # Scale to 0-255 uint8 for visualization
     # Standard NDVI is -1 to 1. Mapping it to image:
@@ -165,7 +158,7 @@ def calculate_tgi(
     r = r.astype(float)
     b = b.astype(float)
 
-    tgi = g - 0.39 * r - 0.61 * b
+    tgi = raster_tile_service.tgi(r, g, b)
 
     # Normalize for display? Original code writes directly.
     # TGI can be negative. cv2.imwrite handles clipping/wrapping for uint8?
@@ -179,3 +172,22 @@ def calculate_tgi(
             cv2.imwrite(outfile_path, tgi_img)
 
     return tgi_img
+
+
+def calculate_index_raster(
+    image_path: str,
+    index: str,
+    outfile_path: str,
+    band_names: Sequence[str] | None = None,
+    max_workers: int | None = None,
+) -> dict[str, Any]:
+    """
+    Compute an index over a raster of any size into a float32 GeoTIFF.
+
+    The raster is read window by window (GeoTIFF via rasterio, .npy memory
+    mapped), tiles run in parallel processes, and raw index values are
+    written (NaN outside the data) rather than a scaled preview.
+    """
+    return raster_tile_service.write_index_raster(
+        image_path, outfile_path, index, band_names=band_names, max_workers=max_workers
+    )
@@ -0,0 +1,516 @@
+"""
+Trial Statistics Service
+
+Materialised sufficient statistics for trial summaries.
+
+Features:
+- Per (study, trait, germplasm) n / Σx / Σx² maintained on observation writes,
+  through the ORM flush hook and ``apply_bulk_deltas`` for Core statements
+- Trial data version derived from the statistics rows (no raw observation scan)
+- Vectorised one-way ANOVA, heritability and CV from sufficient statistics
+- Cached trial summary payloads keyed by data version
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from math import sqrt
+from typing import Any
+
+import numpy as np
+from sqlalchemy import and_, delete, event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.redis import get_fallback, redis_client
+from app.models.core import Location, Study, Trial
+from app.models.germplasm import Germplasm
+from app.models.phenotyping import (
+    Observation,
+    ObservationUnit,
+    ObservationVariable,
+    TrialTraitStatistic,
+)
+from app.modules.core.services.organization_counter_service import current_getter, previous_getter
+
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_TTL_SECONDS = 3600
+SUMMARY_CACHE_PREFIX = "trial_summary"
+
+# (organization_id, study_id, observation_variable_id, germplasm_id)
+CellKey = tuple[int, int, int, int]
+
+
+# ============================================
+# INCREMENTAL MAINTENANCE
+# ============================================
+
+def _observation_cell(get, unit_studies: dict[int, int | None]) -> tuple[CellKey, float] | None:
+    """Cell and numeric value an observation contributes, or None when it is not counted."""
+    value = get("value_numeric")
+    unit_id = get("observation_unit_id")
+    study_id = unit_studies.get(unit_id) if unit_id is not None else None
+    org_id = get("organization_id")
+    variable_id = get("observation_variable_id")
+    if value is None or study_id is None or org_id is None or variable_id is None:
+        return None
+    return (org_id, study_id, variable_id, get("germplasm_id") or 0), value
+
+
+def collect_flush_deltas(session: Session) -> dict[CellKey, list[float]]:
+    """Compute [n, Σx, Σx²] deltas for observations pending in ``session``'s flush."""
+    changes: list[tuple[Any, float]] = []
+    for obj in session.new:
+        if isinstance(obj, Observation):
+            changes.append((current_getter(obj), 1.0))
+    for obj in session.deleted:
+        if isinstance(obj, Observation):
+            changes.append((previous_getter(obj), -1.0))
+    for obj in session.dirty:
+        if isinstance(obj, Observation) and session.is_modified(obj, include_collections=False):
+            changes.append((previous_getter(obj), -1.0))
+            changes.append((current_getter(obj), 1.0))
+    return _collect_deltas(session.connection(), changes)
+
+
+def _collect_deltas(connection, changes: list[tuple[Any, float]]) -> dict[CellKey, list[float]]:
+    if not changes:
+        return {}
+
+    # Trial membership follows the observation unit's study, as in the summary loader
+    unit_ids = {get("observation_unit_id") for get, _ in changes} - {None}
+    unit_studies: dict[int, int | None] = {}
+    if unit_ids:
+        rows = connection.execute(
+            select(ObservationUnit.id, ObservationUnit.study_id).where(ObservationUnit.id.in_(unit_ids))
+        )
+        unit_studies = dict(rows.all())
+
+    deltas: dict[CellKey, list[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+    for get, sign in changes:
+        cell = _observation_cell(get, unit_studies)
+        if cell is None:
+            continue
+        key, value = cell
+        totals = deltas[key]
+        totals[0] += sign
+        totals[1] += sign * value
+        totals[2] += sign * value * value
+
+    return {key: totals for key, totals in deltas.items() if any(totals)}
+
+
+def apply_deltas(connection, deltas: dict[CellKey, list[float]]) -> None:
+    """Upsert sufficient-statistic deltas on ``connection`` (sync) in the caller's transaction."""
+    table = TrialTraitStatistic.__table__
+    dialect_name = connection.dialect.name
+    insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(dialect_name)
+    now = datetime.now(UTC)
+
+    for (org_id, study_id, variable_id, germplasm_id), (n, sum_x, sum_x2) in sorted(deltas.items()):
+        values = {
+            "organization_id": org_id,
+            "study_id": study_id,
+            "observation_variable_id": variable_id,
+            "germplasm_id": germplasm_id,
+            "n": int(n),
+            "sum_x": sum_x,
+            "sum_x2": sum_x2,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if insert is not None:
+            stmt = insert(table).values(**values)
+            connection.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[table.c.study_id, table.c.observation_variable_id, table.c.germplasm_id],
+                    set_={
+                        "n": table.c.n + stmt.excluded.n,
+                        "sum_x": table.c.sum_x + stmt.excluded.sum_x,
+                        "sum_x2": table.c.sum_x2 + stmt.excluded.sum_x2,
+                        "updated_at": now,
+                    },
+                )
+            )
+            continue
+
+        cell = and_(
+            table.c.study_id == study_id,
+            table.c.observation_variable_id == variable_id,
+            table.c.germplasm_id == germplasm_id,
+        )
+        result = connection.execute(
+            table.update()
+            .where(cell)
+            .values(
+                n=table.c.n + int(n),
+                sum_x=table.c.sum_x + sum_x,
+                sum_x2=table.c.sum_x2 + sum_x2,
+                updated_at=now,
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(**values))
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    deltas = collect_flush_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+async def apply_bulk_deltas(
+    db: AsyncSession, rows: Iterable[Mapping[str, Any]], sign: float = 1.0
+) -> None:
+    """
+    Keep statistics in step with a Core insert (``sign=1``) or delete (``-1``) of observations.
+
+    ``rows`` are the statement's RETURNING rows with at least the columns the
+    flush hook reads (unit, variable, germplasm, organization, value_numeric).
+    """
+    changes = [(row.get, sign) for row in rows]
+    if not changes:
+        return
+
+    def apply(session: Session) -> None:
+        connection = session.connection()
+        deltas = _collect_deltas(connection, changes)
+        if deltas:
+            apply_deltas(connection, deltas)
+
+    await db.run_sync(apply)
+
+
+def register_trial_statistics_hooks() -> None:
+    """Attach the flush hook that keeps trial statistics in step with observation writes (idempotent)."""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+
+
+def unregister_trial_statistics_hooks() -> None:
+    """Detach the flush hook."""
+    if event.contains(Session, "after_flush", _after_flush):
+        event.remove(Session, "after_flush", _after_flush)
+
+
+# ============================================
+# VECTORISED STATISTICS
+# ============================================
+
+@dataclass
+class SufficientStatistics:
+    """Columnar n / Σx / Σx² for a set of groups."""
+
+    n: np.ndarray
+    sum_x: np.ndarray
+    sum_x2: np.ndarray
+
+    @classmethod
+    def from_cells(cls, cells: list[dict[str, Any]]) -> SufficientStatistics:
+        return cls(
+            n=np.fromiter((cell["n"] for cell in cells), dtype=np.float64, count=len(cells)),
+            sum_x=np.fromiter((cell["sum_x"] for cell in cells), dtype=np.float64, count=len(cells)),
+            sum_x2=np.fromiter((cell["sum_x2"] for cell in cells), dtype=np.float64, count=len(cells)),
+        )
+
+    @property
+    def count(self) -> int:
+        return int(self.n.sum())
+
+    def mean(self) -> float | None:
+        total = self.n.sum()
+        return float(self.sum_x.sum() / total) if total > 0 else None
+
+    def variance(self) -> float | None:
+        """Pooled sample variance of all observations across the groups."""
+        total = self.n.sum()
+        if total <= 0:
+            return None
+        if total == 1:
+            return 0.0
+        sum_x = self.sum_x.sum()
+        return float(max(self.sum_x2.sum() - sum_x * sum_x / total, 0.0) / (total - 1))
+
+    def coefficient_of_variation(self) -> float | None:
+        mean_value = self.mean()
+        variance = self.variance()
+        if mean_value in (None, 0) or variance is None:
+            return None
+        return sqrt(variance) / mean_value * 100
+
+
+def _round_or_none(value: float | None, digits: int = 4) -> float | None:
+    return round(value, digits) if value is not None else None
+
+
+def anova_from_statistics(groups: SufficientStatistics) -> dict[str, Any]:
+    """
+    One-way ANOVA across groups from sufficient statistics.
+
+    Mirrors the record-based trial summary metrics (F, LSD, heritability,
+    expected gain) without touching individual observations.
+    """
+    mask = groups.n > 0
+    n, sum_x, sum_x2 = groups.n[mask], groups.sum_x[mask], groups.sum_x2[mask]
+    group_count = int(n.size)
+    observation_count = int(n.sum())
+    if group_count < 2 or observation_count <= group_count:
+        return {
+            "f_value": None,
+            "lsd": None,
+            "significance": None,
+            "genetic_variance": None,
+            "error_variance": None,
+            "heritability": None,
+            "selection_intensity": None,
+            "expected_gain": None,
+            "anova": None,
+        }
+
+    means = sum_x / n
+    grand_mean = sum_x.sum() / observation_count
+    ss_between = float((n * (means - grand_mean) ** 2).sum())
+    ss_within = float(np.maximum(sum_x2 - sum_x * sum_x / n, 0.0).sum())
+    df_between = group_count - 1
+    df_within = observation_count - group_count
+    ms_between = ss_between / df_between
+    ms_within = ss_within / df_within
+    f_value = ms_between / ms_within if ms_within != 0 else None
+    average_replicates = observation_count / group_count
+    lsd = 1.96 * sqrt((2 * ms_within) / average_replicates)
+    significance = "*" if float(means.max() - means.min()) > lsd else "ns"
+
+    genetic_variance = max((ms_between - ms_within) / average_replicates, 0.0)
+    denominator = genetic_variance + (ms_within / average_replicates)
+    heritability = genetic_variance / denominator if denominator > 0 else None
+
+    selection_intensity = 1.755 if group_count >= 10 else None
+    variance = SufficientStatistics(n, sum_x, sum_x2).variance()
+    phenotypic_std_dev = sqrt(variance or 0.0)
+    expected_gain = None
+    if selection_intensity is not None and heritability is not None:
+        expected_gain = selection_intensity * heritability * phenotypic_std_dev
+
+    return {
+        "f_value": f_value,
+        "lsd": lsd,
+        "significance": significance,
+        "genetic_variance": genetic_variance,
+        "error_variance": ms_within,
+        "heritability": heritability,
+        "selection_intensity": selection_intensity,
+        "expected_gain": expected_gain,
+        "anova": {
+            "df_between": df_between,
+            "df_within": df_within,
+            "ss_between": round(ss_between, 4),
+            "ss_within": round(ss_within, 4),
+            "ms_between": _round_or_none(ms_between),
+            "ms_within": _round_or_none(ms_within),
+        },
+    }
+
+
+# ============================================
+# SERVICE
+# ============================================
+
+class TrialStatisticsService:
+    """
+    Read, rebuild and version per-trial sufficient statistics
+    """
+
+    async def load_cells(
+        self, db: AsyncSession, organization_id: int, trial_id: int
+    ) -> list[dict[str, Any]]:
+        """
+        Sufficient-statistic cells for a trial, labelled the way the trial
+        summary groups records (trait name, germplasm key, location key).
+        """
+        stmt = (
+            select(
+                TrialTraitStatistic.n,
+                TrialTraitStatistic.sum_x,
+                TrialTraitStatistic.sum_x2,
+                TrialTraitStatistic.germplasm_id,
+                TrialTraitStatistic.study_id,
+                ObservationVariable.observation_variable_name,
+                ObservationVariable.trait_name,
+                ObservationVariable.observation_variable_db_id,
+                Germplasm.germplasm_db_id,
+                Germplasm.germplasm_name,
+                Location.id.label("location_id"),
+                Location.location_name,
+            )
+            .join(Study, Study.id == TrialTraitStatistic.study_id)
+            .join(ObservationVariable, ObservationVariable.id == TrialTraitStatistic.observation_variable_id)
+            .outerjoin(Germplasm, Germplasm.id == TrialTraitStatistic.germplasm_id)
+            .outerjoin(Location, Location.id == Study.location_id)
+            .where(TrialTraitStatistic.organization_id == organization_id)
+            .where(Study.organization_id == organization_id)
+            .where(Study.trial_id == trial_id)
+            .where(TrialTraitStatistic.n > 0)
+        )
+        cells: list[dict[str, Any]] = []
+        for row in (await db.execute(stmt)).all():
+            trait_name = row.observation_variable_name or row.trait_name or row.observation_variable_db_id
+            if not trait_name:
+                continue
+            germplasm_key = row.germplasm_db_id or (str(row.germplasm_id) if row.germplasm_id else None)
+            cells.append(
+                {
+                    "trait_name": trait_name,
+                    "germplasm_key": germplasm_key,
+                    "germplasm_name": row.germplasm_name or germplasm_key,
+                    "location_key": str(row.location_id) if row.location_id is not None else f"study:{row.study_id}",
+                    "location_name": row.location_name or "Unassigned Location",
+                    "n": row.n,
+                    "sum_x": row.sum_x,
+                    "sum_x2": row.sum_x2,
+                }
+            )
+        return cells
+
+    async def rebuild(self, db: AsyncSession, organization_id: int, trial_id: int) -> int:
+        """Recompute a trial's statistics from raw observations. Returns the number of cells."""
+        study_ids = select(Study.id).where(
+            Study.organization_id == organization_id, Study.trial_id == trial_id
+        )
+        stmt = (
+            select(
+                Observation.value_numeric,
+                ObservationUnit.study_id,
+                Observation.observation_variable_id,
+                Observation.germplasm_id,
+            )
+            .join(ObservationUnit, ObservationUnit.id == Observation.observation_unit_id)
+            .where(Observation.organization_id == organization_id)
+            .where(ObservationUnit.study_id.in_(study_ids))
+            .where(Observation.observation_variable_id.isnot(None))
+            .where(Observation.value_numeric.isnot(None))
+            .execution_options(yield_per=5000)
+        )
+
+        totals: dict[tuple[int, int, int], list[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+        async for numeric, study_id, variable_id, germplasm_id in await db.stream(stmt):
+            cell = totals[(study_id, variable_id, germplasm_id or 0)]
+            cell[0] += 1
+            cell[1] += numeric
+            cell[2] += numeric * numeric
+
+        table = TrialTraitStatistic.__table__
+        await db.execute(delete(table).where(table.c.study_id.in_(study_ids)))
+        now = datetime.now(UTC)
+        if totals:
+            await db.execute(
+                table.insert(),
+                [
+                    {
+                        "organization_id": organization_id,
+                        "study_id": study_id,
+                        "observation_variable_id": variable_id,
+                        "germplasm_id": germplasm_id,
+                        "n": int(n),
+                        "sum_x": sum_x,
+                        "sum_x2": sum_x2,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for (study_id, variable_id, germplasm_id), (n, sum_x, sum_x2) in totals.items()
+                ],
+            )
+        await db.flush()
+        return len(totals)
+
+    async def data_version(self, db: AsyncSession, organization_id: int, trial_id: int) -> str:
+        """
+        Cheap fingerprint of everything a trial summary is built from.
+
+        Every observation write touches its cell's counts and updated_at, so the
+        fingerprint changes whenever the numeric inputs change; trial and study
+        timestamps cover edits to the trial metadata itself.
+        """
+        in_trial = and_(Study.organization_id == organization_id, Study.trial_id == trial_id)
+        cells = select(TrialTraitStatistic).join(Study, Study.id == TrialTraitStatistic.study_id).where(in_trial)
+        row = (
+            await db.execute(
+                select(
+                    select(Trial.updated_at)
+                    .where(Trial.id == trial_id, Trial.organization_id == organization_id)
+                    .scalar_subquery(),
+                    select(func.count(Study.id)).where(in_trial).scalar_subquery(),
+                    select(func.max(Study.updated_at)).where(in_trial).scalar_subquery(),
+                    cells.with_only_columns(func.count(TrialTraitStatistic.id)).scalar_subquery(),
+                    cells.with_only_columns(func.coalesce(func.sum(TrialTraitStatistic.n), 0)).scalar_subquery(),
+                    cells.with_only_columns(func.max(TrialTraitStatistic.updated_at)).scalar_subquery(),
+                )
+            )
+        ).one()
+        return ":".join(
+            value.isoformat() if hasattr(value, "isoformat") else str(value) for value in row
+        )
+
+    async def has_statistics(self, db: AsyncSession, organization_id: int, trial_id: int) -> bool:
+        result = await db.execute(
+            select(TrialTraitStatistic.id)
+            .join(Study, Study.id == TrialTraitStatistic.study_id)
+            .where(Study.organization_id == organization_id, Study.trial_id == trial_id)
+            .limit(1)
+        )
+        return result.first() is not None
+
+    async def ensure_cells(
+        self, db: AsyncSession, organization_id: int, trial_id: int
+    ) -> list[dict[str, Any]]:
+        """Load cells, building them first for trials written before statistics existed."""
+        if not await self.has_statistics(db, organization_id, trial_id):
+            await self.rebuild(db, organization_id, trial_id)
+        return await self.load_cells(db, organization_id, trial_id)
+
+    # ============================================
+    # SUMMARY CACHE
+    # ============================================
+
+    def _cache_key(self, organization_id: int, trial_id: int) -> str:
+        return f"{SUMMARY_CACHE_PREFIX}:{organization_id}:{trial_id}"
+
+    async def get_cached_summary(
+        self, organization_id: int, trial_id: int, version: str
+    ) -> dict[str, Any] | None:
+        key = self._cache_key(organization_id, trial_id)
+        entry = await redis_client.get(key) if redis_client.is_available else get_fallback().get(key)
+        if not entry or entry.get("version") != version:
+            return None
+
+        # Copy: the in-memory fallback hands back the stored object itself
+        payload = {**entry["payload"]}
+        # Data age keeps growing while the payload sits in the cache
+        elapsed = max(int(time.time() - entry.get("cached_at", time.time())), 0)
+        if elapsed and payload.get("data_age_seconds") is not None:
+            payload["data_age_seconds"] += elapsed
+        return payload
+
+    async def store_cached_summary(
+        self, organization_id: int, trial_id: int, version: str, payload: dict[str, Any]
+    ) -> None:
+        key = self._cache_key(organization_id, trial_id)
+        entry = {"version": version, "cached_at": time.time(), "payload": payload}
+        if redis_client.is_available:
+            await redis_client.set(key, entry, ttl_seconds=SUMMARY_CACHE_TTL_SECONDS)
+        else:
+            get_fallback().set(key, entry, ttl_seconds=SUMMARY_CACHE_TTL_SECONDS)
+
+
+trial_statistics_service = TrialStatisticsService()
+
+
+def get_trial_statistics_service() -> TrialStatisticsService:
+    return trial_statistics_service
@@ -6,6 +6,7 @@ from app.modules.space.lunar.router import router as lunar_router
 from app.modules.space.mars.router import router as mars_router
 from app.modules.space.research.router import router as research_router
 from app.modules.space.solar.router import router as solar_router
+from app.modules.space.sweep.router import router as sweep_router
 
 
 # Create the main Space Gateway router
@@ -16,3 +17,5 @@ router.include_router(mars_router, prefix="/mars", tags=["MARS Module"])
 router.include_router(lunar_router, prefix="/lunar", tags=["LUNAR Module"])
 router.include_router(research_router, prefix="/research", tags=["Space Research"])
 router.include_router(solar_router, prefix="/solar", tags=["Sun-Earth Systems"])
+# Scenario sweeps span both simulators, so they live outside the LUNAR and MARS modules
+router.include_router(sweep_router, tags=["Scenario Sweeps"])
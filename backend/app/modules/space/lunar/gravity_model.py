@@ -1,9 +1,33 @@
 import math
 import random
+from functools import lru_cache
+
+import numpy as np
 
 from app.modules.space.lunar.schemas import FailureMode, LunarEnvironmentProfileBase
 
 
+# Failure modes by integer code, as returned by simulate_batch (0 is no failure)
+FAILURE_MODES = [
+    FailureMode.UNKNOWN,
+    FailureMode.ROOT_DISORIENTATION,
+    FailureMode.ANCHORAGE_FAILURE,
+    FailureMode.PHOTOPERIOD_COLLAPSE,
+    FailureMode.MORPHOGENETIC_INSTABILITY,
+    FailureMode.TRANSLOCATION_IMPAIRMENT,
+]
+_CODE = {mode: code for code, mode in enumerate(FAILURE_MODES)}
+
+CRITICAL_THRESHOLD = 0.3
+
+
+@lru_cache(maxsize=65536)
+def germplasm_factors(germplasm_id: int) -> tuple[float, float, float]:
+    """Root resilience, photoperiod tolerance and vigor, seeded by germplasm id."""
+    rng = random.Random(germplasm_id)
+    return rng.uniform(0.8, 1.2), rng.uniform(0.8, 1.2), rng.uniform(0.8, 1.2)
+
+
 class FractionalGravityEnvironmentEngine:
     def simulate(
         self, profile: LunarEnvironmentProfileBase, generation: int, germplasm_id: int
@@ -15,11 +39,8 @@ class FractionalGravityEnvironmentEngine:
 
         # Deterministic variation based on germplasm_id
         # This ensures that the same germplasm in the same environment always produces the same result
-        rng = random.Random(germplasm_id)
         # Germplasm resilience factors (pseudo-randomly assigned based on ID)
-        root_resilience = rng.uniform(0.8, 1.2)
-        photoperiod_tolerance = rng.uniform(0.8, 1.2)
-        general_vigor = rng.uniform(0.8, 1.2)
+        root_resilience, photoperiod_tolerance, general_vigor = germplasm_factors(germplasm_id)
 
         # 1. Anchorage Score
         # Gravity helps roots go down (gravitropism). Less gravity = less orientation.
@@ -66,9 +87,6 @@ class FractionalGravityEnvironmentEngine:
         # Identify the primary bottleneck
         failure_mode = FailureMode.UNKNOWN
 
-        # Thresholds for failure
-        CRITICAL_THRESHOLD = 0.3
-
         if anchorage_score < CRITICAL_THRESHOLD:
             if profile.gravity_factor < 0.05:
                 failure_mode = FailureMode.ROOT_DISORIENTATION
@@ -91,3 +109,66 @@ class FractionalGravityEnvironmentEngine:
             "yield_index": yield_index,
             "failure_mode": failure_mode,
         }
+
+    def simulate_batch(
+        self,
+        params: dict[str, np.ndarray],
+        germplasm_ids: np.ndarray,
+        generation: np.ndarray | int = 1,
+    ) -> dict[str, np.ndarray]:
+        """
+        Vectorised ``simulate`` over profiles × germplasm.
+
+        ``params`` holds one array of length P per profile field (and optionally
+        ``generation``); results are (P, G) arrays for G germplasm ids, with
+        failure modes as integer codes into ``FAILURE_MODES``. Each germplasm
+        gets the same seeded factors as in ``simulate``, so every cell equals
+        the scalar result for that profile and germplasm.
+        """
+        factors = np.array([germplasm_factors(int(g)) for g in germplasm_ids], dtype=np.float64)
+        root_resilience, photoperiod_tolerance, general_vigor = factors.reshape(-1, 3).T
+
+        gravity = np.asarray(params["gravity_factor"], dtype=np.float64)[:, None]
+        root_support = np.asarray(params["root_support_factor"], dtype=np.float64)[:, None]
+        cycle_length_days = (
+            np.asarray(params["light_cycle_days"], dtype=np.float64)
+            + np.asarray(params["dark_cycle_days"], dtype=np.float64)
+        )[:, None]
+        pressure = np.asarray(params["habitat_pressure_kpa"], dtype=np.float64)[:, None]
+        generation = np.asarray(params.get("generation", generation), dtype=np.float64)
+        generation = np.broadcast_to(generation, gravity.shape[:1])[:, None]
+
+        anchorage = ((gravity / 0.3) * 0.6 + root_support * 0.4) * root_resilience
+        anchorage = np.clip(anchorage, 0.0, 1.0)
+
+        photoperiod_stress = np.maximum(0.0, (cycle_length_days - 1.0) / 28.0)
+        morphology = np.sqrt(gravity / 0.3) * (1.0 - photoperiod_stress / photoperiod_tolerance)
+        morphology = np.clip(morphology, 0.0, 1.0)
+
+        pressure_factor = np.minimum(pressure / 101.3, 1.0)
+        yield_index = morphology * anchorage * pressure_factor * general_vigor
+        yield_index = yield_index * np.where(generation > 1, 0.9 ** (generation - 1), 1.0)
+        yield_index = np.clip(yield_index, 0.0, 1.0)
+
+        # Later assignments win, so apply the checks in reverse priority order
+        failure = np.full(anchorage.shape, _CODE[FailureMode.UNKNOWN], dtype=np.int8)
+        failure[yield_index < CRITICAL_THRESHOLD] = _CODE[FailureMode.TRANSLOCATION_IMPAIRMENT]
+        morphology_mode = np.where(
+            photoperiod_stress > 0.5,
+            _CODE[FailureMode.PHOTOPERIOD_COLLAPSE],
+            _CODE[FailureMode.MORPHOGENETIC_INSTABILITY],
+        )
+        failure = np.where(morphology < CRITICAL_THRESHOLD, morphology_mode, failure)
+        anchorage_mode = np.where(
+            gravity < 0.05,
+            _CODE[FailureMode.ROOT_DISORIENTATION],
+            _CODE[FailureMode.ANCHORAGE_FAILURE],
+        )
+        failure = np.where(anchorage < CRITICAL_THRESHOLD, anchorage_mode, failure).astype(np.int8)
+
+        return {
+            "anchorage_score": anchorage,
+            "morphology_stability": morphology,
+            "yield_index": yield_index,
+            "failure_mode": failure,
+        }
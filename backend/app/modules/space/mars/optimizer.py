@@ -1,9 +1,19 @@
 from typing import Any
 
+import numpy as np
+
 from app.models.mars import MarsFailureMode
 from app.modules.space.mars.schemas import MarsEnvironmentProfileBase
 
 
+# Failure modes by integer code, as returned by simulate_batch (0 is no failure)
+FAILURE_MODES = [
+    MarsFailureMode.UNKNOWN,
+    *(mode for mode in MarsFailureMode if mode != MarsFailureMode.UNKNOWN),
+]
+_CODE = {mode: code for code, mode in enumerate(FAILURE_MODES)}
+
+
 class MarsOptimizer:
     @staticmethod
     def simulate_trial(profile: MarsEnvironmentProfileBase, generation: int) -> dict[str, Any]:
@@ -108,3 +118,81 @@ class MarsOptimizer:
                 "oxygen_output": 0.0,
             },
         }
+
+    @staticmethod
+    def simulate_batch(
+        params: dict[str, np.ndarray], generation: np.ndarray | int = 1
+    ) -> dict[str, np.ndarray]:
+        """
+        Vectorised ``simulate_trial`` over P profiles.
+
+        ``params`` holds one array per profile field (``temperature_avg_c`` stands
+        in for ``temperature_profile["average"]``; ``generation`` may also vary).
+        Returns length-P arrays, with failure modes as integer codes into
+        ``FAILURE_MODES``; the checks run in the same order as the scalar path.
+        """
+        pressure = np.asarray(params["pressure_kpa"], dtype=np.float64)
+        n = pressure.shape[0]
+
+        def param(name: str) -> np.ndarray:
+            return np.broadcast_to(np.asarray(params[name], dtype=np.float64), (n,))
+
+        radiation = param("radiation_msv")
+        o2 = param("o2_ppm")
+        co2 = param("co2_ppm")
+        gravity = param("gravity_factor")
+        avg_temp = np.broadcast_to(np.asarray(params.get("temperature_avg_c", 20.0)), (n,))
+        generation = np.broadcast_to(np.asarray(params.get("generation", generation)), (n,))
+
+        survival = np.ones(n)
+        biomass = np.full(n, 100.0)
+        failure = np.full(n, _CODE[MarsFailureMode.UNKNOWN], dtype=np.int8)
+
+        partial_radiation = radiation > 500.0
+        survival[partial_radiation] *= 0.5
+        biomass[partial_radiation] *= 0.4
+        failure[partial_radiation] = _CODE[MarsFailureMode.RADIATION_DAMAGE]
+
+        low_o2 = o2 < 500.0
+        survival[low_o2] *= 0.1
+        biomass[low_o2] *= 0.1
+        low_co2 = co2 < 50.0
+        survival[low_co2] *= 0.2
+        biomass[low_co2] *= 0.1
+        failure[low_o2 | low_co2] = _CODE[MarsFailureMode.PHYSIOLOGICAL_LIMIT]
+
+        low_gravity = gravity < 0.1
+        survival[low_gravity] *= 0.6
+        biomass[low_gravity] *= 0.5
+
+        died = survival < 0.1
+        failure[died & (failure == _CODE[MarsFailureMode.UNKNOWN])] = _CODE[
+            MarsFailureMode.PHYSIOLOGICAL_LIMIT
+        ]
+        survival[died] = 0.0
+        biomass[died] = 0.0
+
+        water = np.clip(98.0 - np.abs(avg_temp - 20.0) * 0.2, 0.0, 100.0)
+        nutrient = 2.0 + generation * 0.5
+        energy = 100.0 + 100.0 / (pressure + 0.1)
+        oxygen = biomass * 1.2
+
+        # Hard failures short-circuit with zeroed metrics, as in _package_result
+        collapsed = pressure < 5.0
+        irradiated = ~collapsed & (radiation > 2000.0)
+        fatal = collapsed | irradiated
+        failure[collapsed] = _CODE[MarsFailureMode.ATMOSPHERIC_COLLAPSE]
+        failure[irradiated] = _CODE[MarsFailureMode.RADIATION_DAMAGE]
+
+        def metric(values: np.ndarray) -> np.ndarray:
+            return np.where(fatal, 0.0, np.round(values, 2))
+
+        return {
+            "survival_score": metric(survival),
+            "biomass_yield": metric(biomass),
+            "failure_mode": failure,
+            "water_recycling_pct": metric(water),
+            "nutrient_loss_pct": metric(nutrient),
+            "energy_input_kwh": metric(energy),
+            "oxygen_output": metric(oxygen),
+        }
@@ -0,0 +1,375 @@
+"""
+Scenario Sweep Engine
+Vectorised parameter sweeps over the LUNAR and MARS simulators
+
+A sweep samples environment parameters (full grid, Latin hypercube or
+scrambled Sobol), evaluates every sample against every germplasm in one
+NumPy call per chunk, and reduces the results to the Pareto front of
+survival against yield:
+
+- LUNAR: survival = min(anchorage, morphology stability), yield = yield index;
+  germplasm factors are seeded by id exactly as in the per-call engine
+- MARS: survival score against biomass yield (no germplasm term)
+
+Chunks of ``CHUNK_EVALUATIONS`` sample x germplasm cells run in separate
+processes when more than one chunk and worker are available; each chunk
+returns only its own front and the parent merges them.
+"""
+
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from enum import StrEnum
+from multiprocessing import get_context
+from typing import Any
+
+import numpy as np
+
+from app.modules.space.lunar.gravity_model import FAILURE_MODES as LUNAR_FAILURE_MODES
+from app.modules.space.lunar.gravity_model import FractionalGravityEnvironmentEngine
+from app.modules.space.mars.optimizer import FAILURE_MODES as MARS_FAILURE_MODES
+from app.modules.space.mars.optimizer import MarsOptimizer
+
+
+logger = logging.getLogger(__name__)
+
+# Sample x germplasm cells evaluated per chunk (bounds per-process memory)
+CHUNK_EVALUATIONS = 250_000
+# Upper bound on sample x germplasm cells in one sweep
+MAX_EVALUATIONS = 20_000_000
+
+
+class Simulator(StrEnum):
+    LUNAR = "lunar"
+    MARS = "mars"
+
+
+class SamplingMethod(StrEnum):
+    GRID = "grid"
+    LHS = "lhs"
+    SOBOL = "sobol"
+
+
+class SweepAggregate(StrEnum):
+    NONE = "none"  # one point per sample and germplasm
+    MEAN = "mean"  # one point per sample: panel mean across germplasm
+
+
+# Parameters each simulator can sweep; anything else is fixed by the base profile
+SWEEPABLE = {
+    Simulator.LUNAR: (
+        "gravity_factor",
+        "light_cycle_days",
+        "dark_cycle_days",
+        "habitat_pressure_kpa",
+        "root_support_factor",
+        "generation",
+    ),
+    Simulator.MARS: (
+        "pressure_kpa",
+        "co2_ppm",
+        "o2_ppm",
+        "radiation_msv",
+        "gravity_factor",
+        "temperature_avg_c",
+        "generation",
+    ),
+}
+
+FAILURE_MODES = {Simulator.LUNAR: LUNAR_FAILURE_MODES, Simulator.MARS: MARS_FAILURE_MODES}
+
+# Metrics reported alongside survival and yield for each front point
+EXTRA_METRICS = {
+    Simulator.LUNAR: ("anchorage_score", "morphology_stability"),
+    Simulator.MARS: (
+        "water_recycling_pct",
+        "nutrient_loss_pct",
+        "energy_input_kwh",
+        "oxygen_output",
+    ),
+}
+
+
+@dataclass
+class ParameterAxis:
+    """One swept parameter: explicit ``values`` or a ``low``..``high`` range."""
+
+    low: float | None = None
+    high: float | None = None
+    steps: int = 5
+    values: list[float] | None = None
+
+    def bounds(self) -> tuple[float, float]:
+        if self.values:
+            return min(self.values), max(self.values)
+        return self.low, self.high
+
+
+@dataclass
+class SweepSpec:
+    simulator: Simulator
+    base: dict[str, float]
+    parameters: dict[str, ParameterAxis]
+    germplasm_ids: list[int] = field(default_factory=list)
+    generation: int = 1
+    sampling: SamplingMethod = SamplingMethod.GRID
+    n_samples: int = 256
+    seed: int = 0
+    aggregate: SweepAggregate = SweepAggregate.NONE
+
+    def validate(self):
+        unknown = set(self.parameters) - set(SWEEPABLE[self.simulator])
+        if unknown:
+            raise ValueError(f"Cannot sweep {sorted(unknown)} for {self.simulator}")
+        if not self.parameters:
+            raise ValueError("At least one parameter must be swept")
+        for name, axis in self.parameters.items():
+            if not axis.values and (axis.low is None or axis.high is None or axis.low > axis.high):
+                raise ValueError(f"Parameter '{name}' needs values or min <= max")
+        if self.simulator == Simulator.LUNAR and not self.germplasm_ids:
+            raise ValueError("LUNAR sweeps need at least one germplasm id")
+        evaluations = self.sample_count() * self.panel_size()
+        if evaluations > MAX_EVALUATIONS:
+            raise ValueError(
+                f"Sweep needs {evaluations:,} evaluations; the limit is {MAX_EVALUATIONS:,}"
+            )
+
+    def panel_size(self) -> int:
+        return len(self.germplasm_ids) if self.simulator == Simulator.LUNAR else 1
+
+    def sample_count(self) -> int:
+        if self.sampling == SamplingMethod.GRID:
+            return math.prod(
+                len(axis.values) if axis.values else axis.steps
+                for axis in self.parameters.values()
+            )
+        if self.sampling == SamplingMethod.SOBOL:
+            return 1 << max(0, math.ceil(math.log2(self.n_samples)))
+        return self.n_samples
+
+
+def sample_parameters(spec: SweepSpec) -> dict[str, np.ndarray]:
+    """
+    Draw the sweep's parameter samples as one array per swept parameter.
+
+    Grids take the cartesian product of every axis; LHS and Sobol draw
+    points in the unit hypercube (Sobol rounded up to a power of two, as
+    its balance properties require) and scale them to each range, or pick
+    from explicit ``values``. ``generation`` is rounded to whole generations.
+    """
+    names = list(spec.parameters)
+    axes = [spec.parameters[name] for name in names]
+
+    if spec.sampling == SamplingMethod.GRID:
+        points = [
+            np.asarray(axis.values, dtype=np.float64)
+            if axis.values
+            else np.linspace(axis.low, axis.high, axis.steps)
+            for axis in axes
+        ]
+        mesh = np.meshgrid(*points, indexing="ij")
+        samples = {name: grid.ravel() for name, grid in zip(names, mesh, strict=True)}
+    else:
+        from scipy.stats import qmc
+
+        rng = np.random.default_rng(spec.seed)
+        if spec.sampling == SamplingMethod.LHS:
+            unit = qmc.LatinHypercube(d=len(axes), rng=rng).random(spec.n_samples)
+        else:
+            m = max(0, math.ceil(math.log2(spec.n_samples)))
+            unit = qmc.Sobol(d=len(axes), scramble=True, rng=rng).random_base2(m)
+
+        samples = {}
+        for name, axis, u in zip(names, axes, unit.T, strict=True):
+            if axis.values:
+                choices = np.asarray(axis.values, dtype=np.float64)
+                index = np.minimum((u * len(choices)).astype(np.int64), len(choices) - 1)
+                samples[name] = choices[index]
+            else:
+                samples[name] = axis.low + u * (axis.high - axis.low)
+
+    if "generation" in samples:
+        samples["generation"] = np.maximum(np.rint(samples["generation"]), 1)
+    return samples
+
+
+def pareto_front(survival: np.ndarray, yield_: np.ndarray) -> np.ndarray:
+    """
+    Indices of the points not dominated in (survival, yield), both maximised.
+
+    Points are ordered by survival then yield, descending; a point is on the
+    front when its yield beats every point with higher survival. Duplicate
+    points are reported once.
+    """
+    if survival.size == 0:
+        return np.empty(0, dtype=np.int64)
+    # Anything below the best yield at top survival (or the best survival at
+    # top yield) is dominated; dropping it first leaves little to sort
+    top_survival = survival.max()
+    top_yield = yield_.max()
+    floor_yield = yield_[survival == top_survival].max()
+    floor_survival = survival[yield_ == top_yield].max()
+    candidates = np.flatnonzero((yield_ >= floor_yield) & (survival >= floor_survival))
+
+    order = candidates[np.lexsort((-yield_[candidates], -survival[candidates]))]
+    ordered = yield_[order]
+    best_before = np.maximum.accumulate(ordered)
+    keep = np.empty(order.size, dtype=bool)
+    keep[0] = True
+    keep[1:] = ordered[1:] > best_before[:-1]
+    return order[keep]
+
+
+def _evaluate(
+    simulator: Simulator,
+    params: dict[str, np.ndarray],
+    germplasm_ids: np.ndarray,
+    generation: int,
+) -> dict[str, np.ndarray]:
+    """Survival, yield, failure code and extra metrics as (P, G) arrays."""
+    if simulator == Simulator.LUNAR:
+        out = FractionalGravityEnvironmentEngine().simulate_batch(params, germplasm_ids, generation)
+        out["survival"] = np.minimum(out["anchorage_score"], out["morphology_stability"])
+        out["yield"] = out["yield_index"]
+    else:
+        out = {k: v[:, None] for k, v in MarsOptimizer.simulate_batch(params, generation).items()}
+        out["survival"] = out["survival_score"]
+        out["yield"] = out["biomass_yield"]
+    return out
+
+
+def evaluate_chunk(
+    simulator: Simulator,
+    params: dict[str, np.ndarray],
+    offset: int,
+    germplasm_ids: np.ndarray,
+    generation: int,
+    aggregate: SweepAggregate,
+) -> dict[str, Any]:
+    """
+    Evaluate one chunk of samples and return its Pareto candidates.
+
+    Runs in worker processes, so takes and returns only picklable arrays.
+    Sample indices are offset to their position in the full sweep.
+    """
+    out = _evaluate(simulator, params, germplasm_ids, generation)
+    codes = out["failure_mode"]
+    counts = np.bincount(codes.ravel(), minlength=len(FAILURE_MODES[simulator]))
+    n_germplasm = codes.shape[1]
+    metrics = ("survival", "yield", *EXTRA_METRICS[simulator])
+
+    if aggregate == SweepAggregate.MEAN:
+        values = {name: out[name].mean(axis=1) for name in metrics}
+        values["failure_rate"] = (codes != 0).mean(axis=1)
+        front = pareto_front(values["survival"], values["yield"])
+        candidates = {
+            "sample": front + offset,
+            "germplasm": np.full(front.size, -1, dtype=np.int64),
+            "failure_mode": np.full(front.size, -1, dtype=np.int8),
+        }
+    else:
+        values = {name: out[name].ravel() for name in metrics}
+        front = pareto_front(values["survival"], values["yield"])
+        candidates = {
+            "sample": front // n_germplasm + offset,
+            "germplasm": front % n_germplasm,
+            "failure_mode": codes.ravel()[front],
+        }
+    candidates.update({name: column[front] for name, column in values.items()})
+    candidates["failure_counts"] = counts
+    return candidates
+
+
+def _chunks(samples: dict[str, np.ndarray], n_samples: int, rows: int):
+    for start in range(0, n_samples, rows):
+        yield start, {name: column[start : start + rows] for name, column in samples.items()}
+
+
+def run_sweep(spec: SweepSpec, max_workers: int | None = None) -> dict[str, Any]:
+    """
+    Run a sweep and return its Pareto front and failure-mode counts.
+
+    Chunks run in parallel processes when there is more than one chunk and
+    worker; results are identical to a single-process run.
+    """
+    spec.validate()
+    samples = sample_parameters(spec)
+    n_samples = len(next(iter(samples.values())))
+
+    # Fixed base profile values, broadcast to each chunk by the kernels
+    params = {name: np.float64(value) for name, value in spec.base.items()}
+    params.update(samples)
+    germplasm_ids = np.asarray(spec.germplasm_ids or [0], dtype=np.int64)
+    rows = max(1, CHUNK_EVALUATIONS // len(germplasm_ids))
+    n_chunks = math.ceil(n_samples / rows)
+    workers = min(n_chunks, max_workers or os.cpu_count() or 1)
+
+    def chunk_params(chunk: dict[str, np.ndarray], size: int) -> dict[str, np.ndarray]:
+        return {
+            name: np.broadcast_to(chunk.get(name, value), (size,))
+            for name, value in params.items()
+        }
+
+    jobs = [
+        (offset, chunk_params(chunk, min(rows, n_samples - offset)))
+        for offset, chunk in _chunks(samples, n_samples, rows)
+    ]
+    args = (germplasm_ids, spec.generation, spec.aggregate)
+    if workers <= 1:
+        parts = [evaluate_chunk(spec.simulator, chunk, offset, *args) for offset, chunk in jobs]
+    else:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            futures = [
+                pool.submit(evaluate_chunk, spec.simulator, chunk, offset, *args)
+                for offset, chunk in jobs
+            ]
+            parts = [future.result() for future in futures]
+
+    merged = {
+        name: np.concatenate([part[name] for part in parts])
+        for name in parts[0]
+        if name != "failure_counts"
+    }
+    front = pareto_front(merged["survival"], merged["yield"])
+    failure_modes = FAILURE_MODES[spec.simulator]
+    counts = np.sum([part["failure_counts"] for part in parts], axis=0)
+
+    points = []
+    for i in front:
+        sample = int(merged["sample"][i])
+        germplasm = int(merged["germplasm"][i])
+        lunar_point = spec.simulator == Simulator.LUNAR and germplasm >= 0
+        germplasm_id = spec.germplasm_ids[germplasm] if lunar_point else None
+        code = int(merged["failure_mode"][i])
+        point = {
+            "parameters": {name: float(column[sample]) for name, column in samples.items()},
+            "germplasm_id": germplasm_id,
+            "survival": float(merged["survival"][i]),
+            "yield": float(merged["yield"][i]),
+            "failure_mode": failure_modes[code].value if code >= 0 else None,
+            "metrics": {name: float(merged[name][i]) for name in EXTRA_METRICS[spec.simulator]},
+        }
+        if "failure_rate" in merged:
+            point["failure_rate"] = float(merged["failure_rate"][i])
+        points.append(point)
+
+    logger.info(
+        f"[ScenarioSweep] {spec.simulator} {n_samples} samples x {len(germplasm_ids)} germplasm "
+        f"in {n_chunks} chunk(s) on {workers} process(es): {len(points)} Pareto points"
+    )
+    return {
+        "simulator": spec.simulator.value,
+        "sampling": spec.sampling.value,
+        "n_samples": n_samples,
+        "n_germplasm": len(spec.germplasm_ids),
+        "n_evaluations": n_samples * spec.panel_size(),
+        "failure_modes": {
+            mode.value: int(count)
+            for mode, count in zip(failure_modes, counts, strict=True)
+            if count
+        },
+        "pareto_front": points,
+    }
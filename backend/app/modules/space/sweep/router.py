@@ -0,0 +1,55 @@
+import asyncio
+import os
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_db
+from app.core.config import settings
+from app.models.core import User
+from app.modules.space.sweep.engine import Simulator, run_sweep
+from app.modules.space.sweep.schemas import LunarSweepRequest, MarsSweepRequest, SweepResponse
+from app.modules.space.sweep.service import SweepService
+
+
+router = APIRouter()
+
+
+async def _sweep(
+    db: AsyncSession,
+    simulator: Simulator,
+    request: LunarSweepRequest | MarsSweepRequest,
+    organization_id: int,
+) -> dict:
+    try:
+        spec = await SweepService.build_spec(db, simulator, request, organization_id)
+        spec.validate()
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # CPU-bound; keep it off the event loop. The worker count is a server
+    # setting, never taken from the request
+    cpus = os.cpu_count() or 1
+    max_workers = min(settings.SWEEP_MAX_WORKERS or cpus, cpus)
+    return await asyncio.to_thread(run_sweep, spec, max_workers)
+
+
+@router.post("/lunar/sweep", response_model=SweepResponse)
+async def sweep_lunar(
+    request: LunarSweepRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Pareto front of survival vs yield over LUNAR parameter samples x germplasm."""
+    return await _sweep(db, Simulator.LUNAR, request, current_user.organization_id)
+
+
+@router.post("/mars/sweep", response_model=SweepResponse)
+async def sweep_mars(
+    request: MarsSweepRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Pareto front of survival vs biomass yield over MARS parameter samples."""
+    return await _sweep(db, Simulator.MARS, request, current_user.organization_id)
@@ -0,0 +1,65 @@
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from app.modules.space.lunar.schemas import LunarEnvironmentProfileBase
+from app.modules.space.mars.schemas import MarsEnvironmentProfileBase
+from app.modules.space.sweep.engine import SamplingMethod, SweepAggregate
+
+
+class ParameterRange(BaseModel):
+    min: float | None = None
+    max: float | None = None
+    steps: int = Field(5, ge=1, le=1000, description="Grid points between min and max")
+    values: list[float] | None = Field(None, min_length=1, description="Explicit levels")
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.values is None and (self.min is None or self.max is None):
+            raise ValueError("Give either values or both min and max")
+        if self.min is not None and self.max is not None and self.min > self.max:
+            raise ValueError("min must not exceed max")
+        return self
+
+
+class SweepRequestBase(BaseModel):
+    environment_profile_id: UUID | None = Field(
+        None, description="Saved profile fixing every parameter not swept"
+    )
+    parameters: dict[str, ParameterRange] = Field(..., min_length=1)
+    generation: int = Field(1, ge=1)
+    sampling: SamplingMethod = SamplingMethod.GRID
+    n_samples: int = Field(256, ge=1, le=1 << 20, description="Samples for LHS and Sobol")
+    seed: int = 0
+
+
+class LunarSweepRequest(SweepRequestBase):
+    environment: LunarEnvironmentProfileBase | None = None
+    germplasm_ids: list[int] = Field(..., min_length=1, max_length=100_000)
+    aggregate: SweepAggregate = SweepAggregate.NONE
+
+
+class MarsSweepRequest(SweepRequestBase):
+    environment: MarsEnvironmentProfileBase | None = None
+
+
+class ParetoPoint(BaseModel):
+    parameters: dict[str, float]
+    germplasm_id: int | None = None
+    survival: float
+    yield_: float = Field(..., alias="yield")
+    failure_mode: str | None = None
+    failure_rate: float | None = None
+    metrics: dict[str, float]
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class SweepResponse(BaseModel):
+    simulator: str
+    sampling: SamplingMethod
+    n_samples: int
+    n_germplasm: int
+    n_evaluations: int
+    failure_modes: dict[str, int]
+    pareto_front: list[ParetoPoint]
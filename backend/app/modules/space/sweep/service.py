@@ -0,0 +1,91 @@
+from uuid import UUID
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.mars import MarsEnvironmentProfile
+from app.modules.space.lunar.models import LunarEnvironmentProfile
+from app.modules.space.lunar.schemas import LunarEnvironmentProfileBase
+from app.modules.space.mars.schemas import MarsEnvironmentProfileBase
+from app.modules.space.sweep.engine import ParameterAxis, Simulator, SweepAggregate, SweepSpec
+from app.modules.space.sweep.schemas import LunarSweepRequest, MarsSweepRequest
+
+
+PROFILES = {
+    Simulator.LUNAR: (LunarEnvironmentProfile, LunarEnvironmentProfileBase),
+    Simulator.MARS: (MarsEnvironmentProfile, MarsEnvironmentProfileBase),
+}
+
+
+class SweepService:
+    @staticmethod
+    async def get_base_profile(
+        db: AsyncSession,
+        simulator: Simulator,
+        profile_id: UUID | None,
+        inline: BaseModel | None,
+        organization_id: int,
+    ) -> BaseModel:
+        """The profile fixing every parameter the sweep does not vary."""
+        model, schema = PROFILES[simulator]
+        if inline is not None:
+            return inline
+        if profile_id is None:
+            raise ValueError("Give environment_profile_id or environment")
+        result = await db.execute(
+            select(model).where(model.id == profile_id, model.organization_id == organization_id)
+        )
+        profile = result.scalar_one_or_none()
+        if profile is None:
+            raise LookupError("Environment profile not found")
+        return schema.model_validate(profile, from_attributes=True)
+
+    @staticmethod
+    async def build_spec(
+        db: AsyncSession,
+        simulator: Simulator,
+        request: LunarSweepRequest | MarsSweepRequest,
+        organization_id: int,
+    ) -> SweepSpec:
+        """
+        Resolve the base profile and check every swept range against the
+        profile's own field constraints before anything is evaluated.
+        """
+        base = await SweepService.get_base_profile(
+            db, simulator, request.environment_profile_id, request.environment, organization_id
+        )
+        parameters = {
+            name: ParameterAxis(low=r.min, high=r.max, steps=r.steps, values=r.values)
+            for name, r in request.parameters.items()
+        }
+        fields = base.model_dump()
+        schema = type(base)
+        for name, axis in parameters.items():
+            if name not in fields:
+                continue
+            for bound in axis.bounds():
+                try:
+                    schema.model_validate({**fields, name: bound})
+                except ValidationError as e:
+                    raise ValueError(f"Parameter '{name}' = {bound}: {e.errors()[0]['msg']}")
+
+        fixed = {
+            name: float(value)
+            for name, value in fields.items()
+            if isinstance(value, int | float) and not isinstance(value, bool)
+        }
+        if simulator == Simulator.MARS:
+            fixed["temperature_avg_c"] = float(fields["temperature_profile"].get("average", 20.0))
+
+        return SweepSpec(
+            simulator=simulator,
+            base=fixed,
+            parameters=parameters,
+            germplasm_ids=getattr(request, "germplasm_ids", []),
+            generation=request.generation,
+            sampling=request.sampling,
+            n_samples=request.n_samples,
+            seed=request.seed,
+            aggregate=getattr(request, "aggregate", SweepAggregate.NONE),
+        )
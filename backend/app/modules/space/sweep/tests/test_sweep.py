@@ -0,0 +1,236 @@
+import importlib
+import itertools
+
+import numpy as np
+import pytest
+
+from app.modules.space.lunar.gravity_model import FAILURE_MODES as LUNAR_FAILURE_MODES
+from app.modules.space.lunar.gravity_model import FractionalGravityEnvironmentEngine
+from app.modules.space.lunar.schemas import LunarEnvironmentProfileBase
+from app.modules.space.mars.optimizer import FAILURE_MODES as MARS_FAILURE_MODES
+from app.modules.space.mars.optimizer import MarsOptimizer
+from app.modules.space.mars.schemas import MarsEnvironmentProfileBase
+from app.modules.space.sweep import engine
+from app.modules.space.sweep.engine import (
+    ParameterAxis,
+    SamplingMethod,
+    Simulator,
+    SweepAggregate,
+    SweepSpec,
+    pareto_front,
+    run_sweep,
+    sample_parameters,
+)
+
+
+LUNAR_BASE = {
+    "gravity_factor": 0.16,
+    "light_cycle_days": 14.0,
+    "dark_cycle_days": 14.0,
+    "habitat_pressure_kpa": 101.3,
+    "o2_ppm": 210000.0,
+    "co2_ppm": 400.0,
+    "root_support_factor": 1.0,
+}
+
+MARS_BASE = {
+    "pressure_kpa": 60.0,
+    "co2_ppm": 1000.0,
+    "o2_ppm": 200000.0,
+    "radiation_msv": 100.0,
+    "gravity_factor": 0.38,
+    "photoperiod_hours": 12.0,
+}
+
+
+def _lunar_spec(**overrides):
+    spec = {
+        "simulator": Simulator.LUNAR,
+        "base": LUNAR_BASE,
+        "parameters": {
+            "gravity_factor": ParameterAxis(low=0.01, high=0.3, steps=12),
+            "light_cycle_days": ParameterAxis(low=1, high=20, steps=6),
+            "root_support_factor": ParameterAxis(values=[0.0, 0.5, 1.0]),
+        },
+        "germplasm_ids": list(range(1, 41)),
+    }
+    return SweepSpec(**{**spec, **overrides})
+
+
+class TestBatchKernels:
+    def test_lunar_batch_matches_scalar_engine(self):
+        gravity_engine = FractionalGravityEnvironmentEngine()
+        grid = list(itertools.product([0.02, 0.1, 0.16, 0.3], [1, 3, 14], [1, 14], [0.0, 1.0], [1, 3]))
+        params = {
+            name: np.array(column, dtype=float)
+            for name, column in zip(
+                ["gravity_factor", "light_cycle_days", "dark_cycle_days", "root_support_factor", "generation"],
+                zip(*grid, strict=True),
+                strict=True,
+            )
+        }
+        params["habitat_pressure_kpa"] = np.full(len(grid), 70.0)
+        germplasm_ids = np.array([1, 7, 123, 456, 9999])
+
+        batch = gravity_engine.simulate_batch(params, germplasm_ids)
+
+        for p, (g, light, dark, support, generation) in enumerate(grid):
+            profile = LunarEnvironmentProfileBase(
+                **{**LUNAR_BASE, "gravity_factor": g, "light_cycle_days": light,
+                   "dark_cycle_days": dark, "root_support_factor": support, "habitat_pressure_kpa": 70.0}
+            )
+            for j, germplasm_id in enumerate(germplasm_ids):
+                scalar = gravity_engine.simulate(profile, generation, int(germplasm_id))
+                assert LUNAR_FAILURE_MODES[batch["failure_mode"][p, j]] == scalar["failure_mode"]
+                for metric in ("anchorage_score", "morphology_stability", "yield_index"):
+                    assert batch[metric][p, j] == pytest.approx(scalar[metric], abs=1e-12)
+
+    def test_mars_batch_matches_scalar_optimizer(self):
+        grid = list(itertools.product([2, 60], [10, 40], [100, 600, 2500], [100, 200000], [0.05, 0.38], [5, 20]))
+        columns = ["pressure_kpa", "co2_ppm", "radiation_msv", "o2_ppm", "gravity_factor", "temperature_avg_c"]
+        params = {
+            name: np.array(column, dtype=float)
+            for name, column in zip(columns, zip(*grid, strict=True), strict=True)
+        }
+
+        batch = MarsOptimizer.simulate_batch(params, generation=2)
+
+        for p, row in enumerate(grid):
+            values = dict(zip(columns, row, strict=True))
+            temperature = values.pop("temperature_avg_c")
+            profile = MarsEnvironmentProfileBase(
+                **{**MARS_BASE, **values}, temperature_profile={"average": temperature}, humidity_profile={}
+            )
+            scalar = MarsOptimizer.simulate_trial(profile, generation=2)
+            assert MARS_FAILURE_MODES[batch["failure_mode"][p]] == scalar["failure_mode"]
+            assert batch["survival_score"][p] == pytest.approx(scalar["survival_score"])
+            assert batch["biomass_yield"][p] == pytest.approx(scalar["biomass_yield"])
+            for metric, value in scalar["closed_loop_metrics"].items():
+                assert batch[metric][p] == pytest.approx(value)
+
+
+class TestSampling:
+    def test_grid_is_the_full_cartesian_product(self):
+        samples = sample_parameters(_lunar_spec())
+        assert len(samples["gravity_factor"]) == 12 * 6 * 3
+        assert set(samples["root_support_factor"]) == {0.0, 0.5, 1.0}
+        assert samples["gravity_factor"].min() == 0.01 and samples["gravity_factor"].max() == 0.3
+
+    @pytest.mark.parametrize(("sampling", "expected"), [(SamplingMethod.LHS, 100), (SamplingMethod.SOBOL, 128)])
+    def test_space_filling_samples_stay_in_range_and_are_seeded(self, sampling, expected):
+        pytest.importorskip("scipy")
+        parameters = {
+            "gravity_factor": ParameterAxis(low=0.05, high=0.3),
+            "generation": ParameterAxis(low=1, high=5),
+            "root_support_factor": ParameterAxis(values=[0.2, 0.8]),
+        }
+        spec = _lunar_spec(parameters=parameters, sampling=sampling, n_samples=100, seed=7)
+
+        samples = sample_parameters(spec)
+
+        assert len(samples["gravity_factor"]) == expected == spec.sample_count()
+        assert samples["gravity_factor"].min() >= 0.05 and samples["gravity_factor"].max() <= 0.3
+        assert set(samples["generation"]) <= {1, 2, 3, 4, 5}
+        assert set(samples["root_support_factor"]) == {0.2, 0.8}
+        if sampling == SamplingMethod.LHS:
+            # One sample per stratum in every dimension
+            strata = np.floor((samples["gravity_factor"] - 0.05) / 0.25 * 100).astype(int)
+            assert sorted(strata) == list(range(100))
+        again = sample_parameters(spec)
+        assert all(np.array_equal(samples[name], again[name]) for name in samples)
+
+
+def test_pareto_front_matches_brute_force():
+    rng = np.random.default_rng(3)
+    survival = np.round(rng.random(400), 1)
+    yield_ = np.round(rng.random(400), 1)
+
+    front = pareto_front(survival, yield_)
+
+    points = set(zip(survival, yield_, strict=True))
+    expected = {
+        (s, y) for s, y in points
+        if not any(s2 >= s and y2 >= y and (s2, y2) != (s, y) for s2, y2 in points)
+    }
+    assert sorted(zip(survival[front], yield_[front], strict=True)) == sorted(expected)
+
+
+class TestRunSweep:
+    def test_lunar_front_is_deterministic_and_non_dominated(self):
+        result = run_sweep(_lunar_spec(), max_workers=1)
+
+        assert result["n_samples"] == 216 and result["n_evaluations"] == 216 * 40
+        assert sum(result["failure_modes"].values()) == 216 * 40
+        front = result["pareto_front"]
+        assert front and all(point["germplasm_id"] in range(1, 41) for point in front)
+        for point in front:
+            assert not any(
+                other["survival"] >= point["survival"] and other["yield"] > point["yield"]
+                for other in front
+            )
+        assert run_sweep(_lunar_spec(), max_workers=1) == result
+
+        # Front points reproduce through the per-call engine
+        point = front[0]
+        profile = LunarEnvironmentProfileBase(**{**LUNAR_BASE, **point["parameters"]})
+        scalar = FractionalGravityEnvironmentEngine().simulate(profile, 1, point["germplasm_id"])
+        assert point["yield"] == pytest.approx(scalar["yield_index"])
+        assert point["failure_mode"] == scalar["failure_mode"]
+
+    def test_chunked_process_pool_matches_a_single_chunk(self, monkeypatch):
+        spec = _lunar_spec(aggregate=SweepAggregate.MEAN)
+        inline = run_sweep(spec, max_workers=1)
+
+        monkeypatch.setattr(engine, "CHUNK_EVALUATIONS", 40 * 25)
+        pooled = run_sweep(spec, max_workers=2)
+
+        assert pooled == inline
+        assert all(point["germplasm_id"] is None and 0 <= point["failure_rate"] <= 1 for point in pooled["pareto_front"])
+
+    def test_mars_sweep_and_limits(self, monkeypatch):
+        spec = SweepSpec(
+            simulator=Simulator.MARS,
+            base={**MARS_BASE, "temperature_avg_c": 20.0},
+            parameters={
+                "pressure_kpa": ParameterAxis(low=1, high=100, steps=20),
+                "radiation_msv": ParameterAxis(low=0, high=3000, steps=20),
+            },
+        )
+        result = run_sweep(spec, max_workers=1)
+        assert result["n_evaluations"] == 400
+        assert result["failure_modes"]["ATMOSPHERIC_COLLAPSE"] == 20
+        assert result["pareto_front"][0]["survival"] == 1.0 and result["pareto_front"][0]["germplasm_id"] is None
+
+        monkeypatch.setattr(engine, "MAX_EVALUATIONS", 100)
+        with pytest.raises(ValueError, match="limit"):
+            run_sweep(spec)
+        with pytest.raises(ValueError, match="Cannot sweep"):
+            run_sweep(_lunar_spec(parameters={"photoperiod_hours": ParameterAxis(low=1, high=2)}))
+
+
+
+@pytest.mark.asyncio
+async def test_sweep_workers_come_from_server_settings(monkeypatch):
+    from app.modules.space.sweep.schemas import MarsSweepRequest
+
+    # The package re-exports the APIRouter under the module's name
+    router = importlib.import_module("app.modules.space.sweep.router")
+
+    async def build_spec(db, simulator, request, organization_id):
+        return _lunar_spec()
+
+    calls = []
+    monkeypatch.setattr(router.SweepService, "build_spec", build_spec)
+    monkeypatch.setattr(router, "run_sweep", lambda spec, max_workers: calls.append(max_workers))
+    monkeypatch.setattr(router.os, "cpu_count", lambda: 4)
+    # Client-supplied worker counts are ignored
+    request = MarsSweepRequest(parameters={"pressure_kpa": {"min": 1, "max": 100}}, max_workers=64)
+
+    monkeypatch.setattr(router.settings, "SWEEP_MAX_WORKERS", 64)
+    await router._sweep(None, Simulator.MARS, request, 1)
+    monkeypatch.setattr(router.settings, "SWEEP_MAX_WORKERS", 2)
+    await router._sweep(None, Simulator.MARS, request, 1)
+    monkeypatch.setattr(router.settings, "SWEEP_MAX_WORKERS", None)
+    await router._sweep(None, Simulator.MARS, request, 1)
+
+    assert calls == [4, 2, 4]
@@ -20,6 +20,7 @@ class Pagination(BaseModel):
     page_size: int = Field(alias="pageSize")
     total_count: int = Field(alias="totalCount")
     total_pages: int = Field(alias="totalPages")
+    next_page_token: str | None = Field(None, alias="nextPageToken")
 
     model_config = ConfigDict(populate_by_name=True)
 
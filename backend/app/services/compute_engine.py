@@ -9,6 +9,8 @@ relationship matrix computation.
 Architecture:
 - Python (FastAPI) -> Rust FFI -> Fortran HPC
 - Fallback to NumPy/SciPy for development/testing
+- Each operation is routed per problem size to the fastest implementation
+  by the kernel registry (app.services.compute_kernels)
 """
 
 import logging
@@ -18,6 +20,14 @@ from enum import Enum
 import numpy as np
 from scipy import linalg
 
+from app.services.compute_kernels import (
+    GBLUP_DIAGONAL_RIDGE,
+    gblup_from_grm,
+    grm_diagonal,
+    kernel_registry,
+    native_module,
+)
+
 
 # Global flag for system compute availability (CALF)
 SYSTEM_COMPUTE_AVAILABLE = False
@@ -69,6 +79,34 @@ class GRMResult:
     n_markers: int
 
 
+@dataclass
+class PCAResult:
+    """Result from PCA"""
+
+    scores: np.ndarray
+    loadings: np.ndarray
+    variance_explained: np.ndarray
+
+
+@dataclass
+class StabilityResult:
+    """Result from Eberhart-Russell stability analysis"""
+
+    means: np.ndarray
+    regression: np.ndarray
+    deviation: np.ndarray
+
+
+@dataclass
+class FinlayWilkinsonResult:
+    """Result from Finlay-Wilkinson regression"""
+
+    means: np.ndarray
+    slopes: np.ndarray
+    r_squared: np.ndarray
+    env_index: np.ndarray
+
+
 class ComputeEngine:
     """
     High-performance compute engine for breeding analytics
@@ -80,10 +118,16 @@ class ComputeEngine:
     - PCA/SVD for population structure
     - LD analysis
     - G×E interaction analysis
+    - Stability analysis and selection indices
+
+    The backend decides whether native kernels may be used; which
+    implementation runs for a given problem size is the kernel registry's
+    tuned choice.
     """
 
     def __init__(self, backend: ComputeBackend = ComputeBackend.AUTO):
         self.backend = backend
+        self.kernels = kernel_registry
         self._fortran_available = self._check_fortran()
 
         if backend == ComputeBackend.AUTO:
@@ -96,24 +140,27 @@ class ComputeEngine:
     def _check_fortran(self) -> bool:
         """Check if Fortran library is available"""
         global SYSTEM_COMPUTE_AVAILABLE
-        try:
-            # Try to import the Rust/Fortran bindings
-            import importlib.util
-
-            if importlib.util.find_spec("bijmantra_compute"):
-                import bijmantra_compute  # noqa: F401
-
-                SYSTEM_COMPUTE_AVAILABLE = True
-                return True
-            raise ImportError
-        except ImportError:
-            # CRITICAL: Fail loudly if native compute is missing in production contexts
-            # We log as ERROR to ensure visibility in logs ("The Missing Link")
-            logger.error(
-                "SYSTEM COMPUTE MISSING: Could not import bijmantra_compute. Falling back to NumPy (slower but correct)."
-            )
-            SYSTEM_COMPUTE_AVAILABLE = False
-            return False
+        # Try to import the Rust/Fortran bindings
+        if native_module() is not None:
+            SYSTEM_COMPUTE_AVAILABLE = True
+            return True
+        # CRITICAL: Fail loudly if native compute is missing in production contexts
+        # We log as ERROR to ensure visibility in logs ("The Missing Link")
+        logger.error(
+            "SYSTEM COMPUTE MISSING: Could not import bijmantra_compute. Falling back to NumPy (slower but correct)."
+        )
+        SYSTEM_COMPUTE_AVAILABLE = False
+        return False
+
+    def _dispatch(self, operation: str, *args):
+        """Run ``operation`` through the kernel registry, natively only on the Fortran backend."""
+        return self.kernels.dispatch(
+            operation, *args, allow_native=self.backend == ComputeBackend.FORTRAN
+        )
+
+    def kernel_summary(self) -> dict:
+        """Kernels this engine may use per operation and the tuned choice per size bucket."""
+        return self.kernels.summary(allow_native=self.backend == ComputeBackend.FORTRAN)
 
     # =========================================================================
     # BLUP/GBLUP Methods
@@ -142,24 +189,26 @@ class ComputeEngine:
         Returns:
             BLUPResult with fixed effects and breeding values
         """
-        if self.backend == ComputeBackend.FORTRAN:
-            return self._blup_fortran(
-                phenotypes,
-                fixed_effects,
-                random_effects,
-                relationship_matrix_inv,
+        X = np.asarray(fixed_effects, dtype=np.float64)
+        Z = np.asarray(random_effects, dtype=np.float64)
+        try:
+            beta, u = self._dispatch(
+                "blup",
+                np.asarray(phenotypes, dtype=np.float64),
+                X,
+                Z,
+                np.asarray(relationship_matrix_inv, dtype=np.float64),
                 var_additive,
                 var_residual,
             )
-        else:
-            return self._blup_numpy(
-                phenotypes,
-                fixed_effects,
-                random_effects,
-                relationship_matrix_inv,
-                var_additive,
-                var_residual,
+        except np.linalg.LinAlgError:
+            logger.error("BLUP solve failed")
+            return BLUPResult(
+                fixed_effects=np.zeros(X.shape[1]),
+                breeding_values=np.zeros(Z.shape[1]),
+                converged=False,
             )
+        return BLUPResult(fixed_effects=beta, breeding_values=u)
 
     def compute_gblup(
         self, genotypes: np.ndarray, phenotypes: np.ndarray, heritability: float = 0.5
@@ -175,10 +224,40 @@ class ComputeEngine:
         Returns:
             BLUPResult with genomic estimated breeding values
         """
-        if self.backend == ComputeBackend.FORTRAN:
-            return self._gblup_fortran(genotypes, phenotypes, heritability)
-        else:
-            return self._gblup_numpy(genotypes, phenotypes, heritability)
+        M = np.asarray(genotypes, dtype=np.float64)
+        y = np.asarray(phenotypes, dtype=np.float64)
+
+        if M.ndim != 2 or M.shape[0] != len(y):
+            raise ValueError(
+                f"Genotypes must have one row per phenotype ({len(y)}). Got shape {M.shape}"
+            )
+
+        if not (0 < heritability <= 1.0):
+            raise ValueError(f"Heritability must be in (0, 1]. Got {heritability}")
+
+        try:
+            gebv = self._dispatch("gblup", M, y, heritability)
+        except linalg.LinAlgError:
+            # The pseudo-inverse fallback needs the full G-matrix
+            G = self.compute_grm(M, method="vanraden1").matrix
+            return self.compute_gblup_from_grm(
+                y, G + np.eye(len(y)) * GBLUP_DIAGONAL_RIDGE, heritability
+            )
+
+        # Reliability only needs the diagonal of G
+        diagonal = grm_diagonal(M, "vanraden1") + GBLUP_DIAGONAL_RIDGE
+        reliability, accuracy = self._derive_gblup_reliability(diagonal, heritability)
+        mean = float(np.nanmean(y)) if y.size else 0.0
+        residuals = np.nan_to_num(y - mean, nan=0.0) - gebv
+
+        return BLUPResult(
+            fixed_effects=np.array([mean]),
+            breeding_values=gebv,
+            reliability=reliability,
+            accuracy=accuracy,
+            genetic_variance=float(np.var(gebv)),
+            error_variance=float(np.var(residuals)),
+        )
 
     def compute_gblup_from_grm(
         self,
@@ -202,18 +281,19 @@ class ComputeEngine:
         lambda_val = (1 - heritability) / heritability
         mean = float(np.nanmean(y)) if y.size else 0.0
         y_centered = np.nan_to_num(y - mean, nan=0.0)
-        v_star = G + np.eye(n) * lambda_val
 
         try:
-            solution = linalg.solve(v_star, y_centered)
-            gebv = np.dot(G, solution)
+            gebv = gblup_from_grm(
+                G, y_centered, heritability, allow_native=self.backend == ComputeBackend.FORTRAN
+            )
             converged = True
         except linalg.LinAlgError:
+            v_star = G + np.eye(n) * lambda_val
             solution = np.dot(np.linalg.pinv(v_star), y_centered)
             gebv = np.dot(G, solution)
             converged = False
 
-        reliability, accuracy = self._derive_gblup_reliability(G, heritability)
+        reliability, accuracy = self._derive_gblup_reliability(np.diag(G), heritability)
         residuals = y_centered - gebv
 
         return BLUPResult(
@@ -226,6 +306,16 @@ class ComputeEngine:
             converged=converged,
         )
 
+    def _derive_gblup_reliability(
+        self, diagonal: np.ndarray, heritability: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Derive approximate reliability and accuracy from GRM diagonal and lambda."""
+        lambda_val = (1 - heritability) / heritability
+        diagonal = np.clip(diagonal, 1e-10, None)
+        reliability = np.clip(diagonal / (diagonal + lambda_val), 0.0, 0.99)
+        accuracy = np.sqrt(reliability)
+        return reliability, accuracy
+
     # =========================================================================
     # REML Methods
     # =========================================================================
@@ -259,30 +349,26 @@ class ComputeEngine:
         Returns:
             REMLResult with estimated variance components
         """
-        if self.backend == ComputeBackend.FORTRAN:
-            return self._reml_fortran(
-                phenotypes,
-                fixed_effects,
-                random_effects,
-                relationship_matrix,
-                var_additive_init,
-                var_residual_init,
-                method,
-                max_iter,
-                tolerance,
-            )
-        else:
-            return self._reml_numpy(
-                phenotypes,
-                fixed_effects,
-                random_effects,
-                relationship_matrix,
-                var_additive_init,
-                var_residual_init,
-                method,
-                max_iter,
-                tolerance,
-            )
+        var_a, var_e, h2, converged, iterations, log_lik = self._dispatch(
+            "reml",
+            np.asarray(phenotypes, dtype=np.float64),
+            np.asarray(fixed_effects, dtype=np.float64),
+            np.asarray(random_effects, dtype=np.float64),
+            np.asarray(relationship_matrix, dtype=np.float64),
+            var_additive_init,
+            var_residual_init,
+            method,
+            max_iter,
+            tolerance,
+        )
+        return REMLResult(
+            var_additive=var_a,
+            var_residual=var_e,
+            heritability=h2,
+            converged=bool(converged),
+            iterations=int(iterations),
+            log_likelihood=log_lik,
+        )
 
     # =========================================================================
     # GRM Methods
@@ -299,282 +385,116 @@ class ComputeEngine:
         Returns:
             GRMResult with relationship matrix
         """
+        genotypes = np.asarray(genotypes, dtype=np.float64)
         n, m = genotypes.shape
-
-        if self.backend == ComputeBackend.FORTRAN:
-            G = self._grm_fortran(genotypes, method)
-        else:
-            G = self._grm_numpy(genotypes, method)
-
+        G = self._dispatch("grm", genotypes, method)
         return GRMResult(matrix=G, method=method, n_individuals=n, n_markers=m)
 
-    # =========================================================================
-    # NumPy Implementations (Fallback)
-    # =========================================================================
-
-    def _blup_numpy(
-        self,
-        y: np.ndarray,
-        X: np.ndarray,
-        Z: np.ndarray,
-        A_inv: np.ndarray,
-        var_a: float,
-        var_e: float,
-    ) -> BLUPResult:
-        """NumPy implementation of BLUP"""
-        n, p = X.shape
-        _, q = Z.shape
-
-        # Lambda (variance ratio)
-        lam = var_e / var_a
-
-        # Build coefficient matrix
-        XtX = X.T @ X
-        XtZ = X.T @ Z
-        ZtX = Z.T @ X
-        ZtZ = Z.T @ Z + lam * A_inv
-
-        C = np.block([[XtX, XtZ], [ZtX, ZtZ]])
-
-        # Build RHS
-        rhs = np.concatenate([X.T @ y, Z.T @ y])
-
-        # Solve
-        try:
-            solution = np.linalg.solve(C, rhs)
-            beta = solution[:p]
-            u = solution[p:]
-            return BLUPResult(fixed_effects=beta, breeding_values=u)
-        except np.linalg.LinAlgError:
-            logger.error("BLUP solve failed")
-            return BLUPResult(
-                fixed_effects=np.zeros(p), breeding_values=np.zeros(q), converged=False
-            )
-
-    def _gblup_numpy(self, genotypes: np.ndarray, phenotypes: np.ndarray, h2: float) -> BLUPResult:
-        """NumPy implementation of GBLUP"""
-        # Compute GRM
-        grm_result = self.compute_grm(genotypes, method="vanraden1")
-        G = grm_result.matrix
-
-        # Add small value to diagonal for stability
-        G += np.eye(G.shape[0]) * 0.001
-        return self.compute_gblup_from_grm(phenotypes=phenotypes, grm=G, heritability=h2)
-
-    def _grm_numpy(self, genotypes: np.ndarray, method: str) -> np.ndarray:
-        """NumPy implementation of GRM computation"""
-        n, m = genotypes.shape
-
-        # Allele frequencies
-        p = genotypes.mean(axis=0) / 2
-
-        if method == "vanraden1":
-            # Center genotypes
-            Z = genotypes - 2 * p
-            # Scale factor
-            scale = 2 * np.sum(p * (1 - p))
-            if scale < 1e-10:
-                scale = 1.0
-            # G = ZZ' / scale
-            G = (Z @ Z.T) / scale
-
-        elif method == "vanraden2":
-            # Weight by heterozygosity
-            het = 2 * p * (1 - p)
-            het[het < 1e-10] = 1e-10
-            weights = 1 / het
-            Z = (genotypes - 2 * p) * np.sqrt(weights)
-            G = (Z @ Z.T) / m
-
-        else:  # yang
-            G = np.zeros((n, n))
-            for k in range(m):
-                het = 2 * p[k] * (1 - p[k])
-                if het < 1e-10:
-                    continue
-                z = genotypes[:, k] - 2 * p[k]
-                G += np.outer(z, z) / het
-            G /= m
-
-        return G
-
-    def _reml_numpy(
-        self,
-        y: np.ndarray,
-        X: np.ndarray,
-        Z: np.ndarray,
-        A: np.ndarray,
-        var_a: float,
-        var_e: float,
-        method: str,
-        max_iter: int,
-        tol: float,
-    ) -> REMLResult:
-        """NumPy implementation of REML (simplified EM)"""
-        n = len(y)
-        q = Z.shape[1]
-
-        for iteration in range(max_iter):
-            var_a_old, var_e_old = var_a, var_e
-
-            # Compute V = ZAZ'*var_a + I*var_e
-            V = var_a * (Z @ A @ Z.T) + var_e * np.eye(n)
-
-            try:
-                V_inv = np.linalg.inv(V)
-            except np.linalg.LinAlgError:
-                break
-
-            # Projection matrix P
-            VX = V_inv @ X
-            XVX = X.T @ VX
-            try:
-                XVX_inv = np.linalg.inv(XVX)
-            except np.linalg.LinAlgError:
-                break
-
-            P = V_inv - VX @ XVX_inv @ VX.T
-            Py = P @ y
-
-            # EM updates (simplified)
-            ZPy = Z.T @ Py
-            var_a = (np.dot(ZPy, ZPy) / var_a + var_a * q) / q
-            var_e = np.dot(y - Z @ (var_a * Z.T @ Py), Py) / (n - X.shape[1])
-
-            # Ensure positive
-            var_a = max(var_a, 1e-6)
-            var_e = max(var_e, 1e-6)
-
-            # Check convergence
-            if abs(var_a - var_a_old) < tol * abs(var_a_old) and abs(var_e - var_e_old) < tol * abs(
-                var_e_old
-            ):
-                return REMLResult(
-                    var_additive=var_a,
-                    var_residual=var_e,
-                    heritability=var_a / (var_a + var_e),
-                    converged=True,
-                    iterations=iteration + 1,
-                )
+    def solve_symmetric(self, matrix: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+        """
+        Solve ``matrix @ x = rhs`` for a symmetric positive definite matrix
+        (e.g. G + λI), for one or several right-hand sides at once
 
-        return REMLResult(
-            var_additive=var_a,
-            var_residual=var_e,
-            heritability=var_a / (var_a + var_e),
-            converged=False,
-            iterations=max_iter,
+        Raises ``LinAlgError`` when the matrix is singular.
+        """
+        return self._dispatch(
+            "spd_solve",
+            np.asarray(matrix, dtype=np.float64),
+            np.asarray(rhs, dtype=np.float64),
         )
 
     # =========================================================================
-    # Fortran Implementations (Production)
+    # Population Structure, LD, G×E and Selection Methods
     # =========================================================================
 
-    def _blup_fortran(
-        self,
-        phenotypes: np.ndarray,
-        fixed_effects: np.ndarray,
-        random_effects: np.ndarray,
-        relationship_matrix_inv: np.ndarray,
-        var_additive: float,
-        var_residual: float,
-    ) -> BLUPResult:
-        """Fortran implementation via Rust FFI"""
-        import bijmantra_compute
-
-        n = len(phenotypes)
-        p = fixed_effects.shape[1]
-        q = random_effects.shape[1]
-
-        # Ensure correct data types (C-contiguous, float64)
-        y = np.ascontiguousarray(phenotypes, dtype=np.float64)
-        X = np.ascontiguousarray(fixed_effects.flatten(), dtype=np.float64)
-        Z = np.ascontiguousarray(random_effects.flatten(), dtype=np.float64)
-        A_inv = np.ascontiguousarray(relationship_matrix_inv.flatten(), dtype=np.float64)
+    def compute_ld_matrix(self, genotypes: np.ndarray) -> np.ndarray:
+        """
+        Pairwise linkage disequilibrium (r²) between markers
 
-        beta, u = bijmantra_compute.blup(y, X, Z, A_inv, var_additive, var_residual, n, p, q)
+        Parameters:
+            genotypes: Genotype matrix (n, m), coded 0, 1, 2 with missing calls negative
 
-        return BLUPResult(fixed_effects=beta, breeding_values=u)
+        Returns:
+            (m, m) matrix of r² values with a unit diagonal
+        """
+        return self._dispatch("ld_matrix", np.asarray(genotypes, dtype=np.float64))
 
-    def _gblup_fortran(
-        self, genotypes: np.ndarray, phenotypes: np.ndarray, heritability: float
-    ) -> BLUPResult:
-        """Fortran implementation via Rust FFI"""
-        import bijmantra_compute
+    def compute_pca(
+        self, data: np.ndarray, n_components: int, center: bool = True, scale: bool = False
+    ) -> PCAResult:
+        """
+        Principal component analysis
 
-        n, m = genotypes.shape
+        Parameters:
+            data: Data matrix (n, p)
+            n_components: Number of components to keep
+            center: Subtract column means
+            scale: Divide columns by their standard deviation
 
-        G = np.ascontiguousarray(genotypes.flatten(), dtype=np.float64)
-        y = np.ascontiguousarray(phenotypes, dtype=np.float64)
+        Returns:
+            PCAResult with scores (n, k), loadings (p, k) and the fraction of
+            variance explained by each component; component signs are fixed so
+            each component's largest loading is positive
+        """
+        data = np.asarray(data, dtype=np.float64)
+        k = min(n_components, *data.shape)
+        scores, loadings, variance = self._dispatch("pca", data, k, center, scale)
+        return PCAResult(scores=scores, loadings=loadings, variance_explained=variance)
 
-        gebv = bijmantra_compute.gblup(G, y, heritability, n, m)
-        grm = self.compute_grm(genotypes, method="vanraden1").matrix
-        reliability, accuracy = self._derive_gblup_reliability(grm, heritability)
-        mean = float(np.nanmean(y)) if y.size else 0.0
-        residuals = np.nan_to_num(y - mean, nan=0.0) - gebv
+    def compute_stability(self, yields: np.ndarray) -> StabilityResult:
+        """
+        Eberhart-Russell stability analysis
 
-        return BLUPResult(
-            fixed_effects=np.array([mean]),
-            breeding_values=gebv,
-            reliability=reliability,
-            accuracy=accuracy,
-            genetic_variance=float(np.var(gebv)),
-            error_variance=float(np.var(residuals)),
-        )
+        Parameters:
+            yields: Genotype x environment mean table (g, e)
 
-    def _derive_gblup_reliability(self, grm: np.ndarray, heritability: float) -> tuple[np.ndarray, np.ndarray]:
-        """Derive approximate reliability and accuracy from GRM diagonal and lambda."""
-        lambda_val = (1 - heritability) / heritability
-        diagonal = np.clip(np.diag(grm), 1e-10, None)
-        reliability = np.clip(diagonal / (diagonal + lambda_val), 0.0, 0.99)
-        accuracy = np.sqrt(reliability)
-        return reliability, accuracy
+        Returns:
+            StabilityResult with genotype means, regression coefficients (bi)
+            and deviations from regression (S²di)
+        """
+        means, bi, s2di = self._dispatch("stability", np.asarray(yields, dtype=np.float64))
+        return StabilityResult(means=means, regression=bi, deviation=s2di)
 
-    def _grm_fortran(self, genotypes: np.ndarray, method: str) -> np.ndarray:
-        """Fortran implementation via Rust FFI"""
-        import bijmantra_compute
+    def compute_finlay_wilkinson(self, yields: np.ndarray) -> FinlayWilkinsonResult:
+        """
+        Finlay-Wilkinson regression of genotype yields on the environment index
 
-        n, m = genotypes.shape
-        G_flat = np.ascontiguousarray(genotypes.flatten(), dtype=np.float64)
+        Parameters:
+            yields: Genotype x environment mean table (g, e)
 
-        grm_flat = bijmantra_compute.compute_grm(G_flat, method, n, m)
-        return grm_flat.reshape(n, n)
+        Returns:
+            FinlayWilkinsonResult with genotype means, slopes, R² and the
+            environment index
+        """
+        means, slopes, r_squared, env_index = self._dispatch(
+            "gxe", np.asarray(yields, dtype=np.float64)
+        )
+        return FinlayWilkinsonResult(
+            means=means, slopes=slopes, r_squared=r_squared, env_index=env_index
+        )
 
-    def _reml_fortran(
+    def compute_selection_index(
         self,
-        y: np.ndarray,
-        X: np.ndarray,
-        Z: np.ndarray,
-        A: np.ndarray,
-        var_a: float,
-        var_e: float,
-        method: str,
-        max_iter: int,
-        tol: float,
-    ) -> REMLResult:
-        """Fortran implementation via Rust FFI"""
-        import bijmantra_compute
-
-        n = len(y)
-        p = X.shape[1]
-        q = Z.shape[1]
-
-        # Ensure correct data types (C-contiguous, float64)
-        y_flat = np.ascontiguousarray(y, dtype=np.float64)
-        X_flat = np.ascontiguousarray(X.flatten(), dtype=np.float64)
-        Z_flat = np.ascontiguousarray(Z.flatten(), dtype=np.float64)
-        A_flat = np.ascontiguousarray(A.flatten(), dtype=np.float64)
+        phenotypic_cov: np.ndarray,
+        genetic_cov: np.ndarray,
+        economic_weights: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Smith-Hazel selection index coefficients b = P⁻¹Ga
 
-        var_a_est, var_e_est, h2, converged, iterations, log_lik = bijmantra_compute.reml_estimate(
-            y_flat, X_flat, Z_flat, A_flat, var_a, var_e, method, max_iter, tol, n, p, q
-        )
+        Parameters:
+            phenotypic_cov: Phenotypic covariance matrix P (t, t)
+            genetic_cov: Genetic covariance matrix G (t, t)
+            economic_weights: Economic weights a (t,)
 
-        return REMLResult(
-            var_additive=var_a_est,
-            var_residual=var_e_est,
-            heritability=h2,
-            converged=converged,
-            iterations=iterations,
-            log_likelihood=log_lik,
+        Returns:
+            Index coefficients (t,)
+        """
+        return self._dispatch(
+            "selection_index",
+            np.asarray(phenotypic_cov, dtype=np.float64),
+            np.asarray(genetic_cov, dtype=np.float64),
+            np.asarray(economic_weights, dtype=np.float64),
         )
 
 
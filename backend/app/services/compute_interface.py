@@ -125,7 +125,7 @@ class BaseComputeInterface:
         Returns:
             True if cancelled, False if job not found or already running
         """
-        return self.task_queue.cancel_task(job_id)
+        return await self.task_queue.cancel_compute(job_id)
 
     def get_jobs(
         self,
@@ -0,0 +1,627 @@
+"""
+Compute Kernels
+Implementations behind the compute engine, registered with the kernel registry
+
+Each operation has a NumPy reference, may have alternative NumPy/SciPy
+formulations that win for some shapes, and a native candidate that calls the
+matching Fortran kernel through the ``bijmantra_compute`` extension when the
+installed build exports it. ``kernel_registry`` picks between them per
+problem-size bucket (see ``app.services.kernel_registry``).
+
+Operations:
+- grm: genomic relationship matrix (VanRaden 1/2, Yang)
+- blup: mixed model equations for fixed effects and breeding values
+- gblup: genomic breeding values from genotypes
+- spd_solve: symmetric positive definite solve (GBLUP from a G-matrix)
+- reml: variance components
+- ld_matrix: pairwise r² between markers (ld_analysis)
+- pca: principal components (pca_svd)
+- stability: Eberhart-Russell stability (stability_analysis)
+- gxe: Finlay-Wilkinson regression (gxe_analysis)
+- selection_index: Smith-Hazel index coefficients (selection_index)
+
+The Fortran kernels of the last five take column-major arrays, so their
+native wrappers pass ``ravel(order="F")`` data and reshape results likewise.
+"""
+
+from functools import lru_cache
+from types import ModuleType
+
+import numpy as np
+from scipy import linalg
+from scipy.linalg import blas
+
+from app.core.config import settings
+from app.services.kernel_registry import KernelRegistry, shape_bucket
+
+
+kernel_registry = KernelRegistry(
+    table_path=settings.COMPUTE_KERNEL_TABLE_PATH,
+    autotune=settings.COMPUTE_KERNEL_AUTOTUNE,
+    cross_check=settings.COMPUTE_KERNEL_CROSS_CHECK,
+)
+
+# Ridge added to the G-matrix diagonal before solving GBLUP from genotypes
+GBLUP_DIAGONAL_RIDGE = 0.001
+
+
+@lru_cache(maxsize=1)
+def native_module() -> ModuleType | None:
+    """The ``bijmantra_compute`` extension, or ``None`` when it is not installed."""
+    try:
+        import bijmantra_compute
+    except ImportError:
+        return None
+    return bijmantra_compute
+
+
+def _exports(function_name: str):
+    def available() -> bool:
+        module = native_module()
+        return module is not None and hasattr(module, function_name)
+
+    return available
+
+
+def _fortran_order(array: np.ndarray) -> np.ndarray:
+    return np.asarray(array, dtype=np.float64).ravel(order="F")
+
+
+# =============================================================================
+# GRM
+# =============================================================================
+
+kernel_registry.add_operation(
+    "grm", bucket=lambda genotypes, method: f"{method}:{shape_bucket(*genotypes.shape)}"
+)
+
+
+@kernel_registry.register("grm", "numpy", reference=True)
+def grm_numpy(genotypes: np.ndarray, method: str) -> np.ndarray:
+    """NumPy implementation of GRM computation"""
+    genotypes = np.asarray(genotypes, dtype=np.float64)
+    n, m = genotypes.shape
+
+    # Allele frequencies
+    p = genotypes.mean(axis=0) / 2
+
+    if method == "vanraden1":
+        # Center genotypes
+        Z = genotypes - 2 * p
+        # Scale factor
+        scale = 2 * np.sum(p * (1 - p))
+        if scale < 1e-10:
+            scale = 1.0
+        # G = ZZ' / scale
+        G = (Z @ Z.T) / scale
+
+    elif method == "vanraden2":
+        # Weight by heterozygosity
+        het = 2 * p * (1 - p)
+        het[het < 1e-10] = 1e-10
+        weights = 1 / het
+        Z = (genotypes - 2 * p) * np.sqrt(weights)
+        G = (Z @ Z.T) / m
+
+    else:  # yang
+        G = np.zeros((n, n))
+        for k in range(m):
+            het = 2 * p[k] * (1 - p[k])
+            if het < 1e-10:
+                continue
+            z = genotypes[:, k] - 2 * p[k]
+            G += np.outer(z, z) / het
+        G /= m
+
+    return G
+
+
+def _scaled_markers(genotypes: np.ndarray, method: str) -> tuple[np.ndarray, float]:
+    """Centered (and for VanRaden 2 / Yang, standardized) markers Z with G = ZZ' / scale."""
+    genotypes = np.asarray(genotypes, dtype=np.float64)
+    p = genotypes.mean(axis=0) / 2
+    het = 2 * p * (1 - p)
+    if method == "vanraden1":
+        scale = 2 * np.sum(p * (1 - p))
+        return genotypes - 2 * p, scale if scale >= 1e-10 else 1.0
+    if method == "vanraden2":
+        return (genotypes - 2 * p) / np.sqrt(np.maximum(het, 1e-10)), float(genotypes.shape[1])
+    # Yang: monomorphic markers contribute nothing
+    keep = het >= 1e-10
+    return (genotypes[:, keep] - 2 * p[keep]) / np.sqrt(het[keep]), float(genotypes.shape[1])
+
+
+@kernel_registry.register("grm", "blas_syrk")
+def grm_syrk(genotypes: np.ndarray, method: str) -> np.ndarray:
+    """Rank-k update on the upper triangle only, mirrored: half the flops of ZZ'."""
+    Z, scale = _scaled_markers(genotypes, method)
+    upper = blas.dsyrk(1.0 / scale, np.asfortranarray(Z))
+    return np.triu(upper) + np.triu(upper, 1).T
+
+
+@kernel_registry.register("grm", "native", native=True, available=_exports("compute_grm"))
+def grm_native(genotypes: np.ndarray, method: str) -> np.ndarray:
+    if method not in ("vanraden1", "vanraden2"):
+        raise NotImplementedError(f"native GRM has no '{method}' method")
+    n, m = genotypes.shape
+    flat = np.ascontiguousarray(genotypes, dtype=np.float64).ravel()
+    return native_module().compute_grm(flat, method, n, m).reshape(n, n)
+
+
+def grm_diagonal(genotypes: np.ndarray, method: str = "vanraden1") -> np.ndarray:
+    """Diagonal of the GRM in O(nm), without forming the matrix."""
+    Z, scale = _scaled_markers(genotypes, method)
+    return np.einsum("ij,ij->i", Z, Z) / scale
+
+
+# =============================================================================
+# BLUP
+# =============================================================================
+
+kernel_registry.add_operation(
+    "blup",
+    bucket=lambda y, X, Z, A_inv, var_a, var_e: shape_bucket(X.shape[0], X.shape[1] + Z.shape[1]),
+)
+
+
+def _mme(y, X, Z, A_inv, var_a, var_e) -> tuple[np.ndarray, np.ndarray]:
+    """Henderson's mixed model equations: coefficient matrix and right-hand side."""
+    # Lambda (variance ratio)
+    lam = var_e / var_a
+    C = np.block([[X.T @ X, X.T @ Z], [Z.T @ X, Z.T @ Z + lam * A_inv]])
+    rhs = np.concatenate([X.T @ y, Z.T @ y])
+    return C, rhs
+
+
+@kernel_registry.register("blup", "numpy", reference=True)
+def blup_numpy(y, X, Z, A_inv, var_a, var_e) -> tuple[np.ndarray, np.ndarray]:
+    """NumPy implementation of BLUP; raises ``LinAlgError`` on a singular system."""
+    C, rhs = _mme(y, X, Z, A_inv, var_a, var_e)
+    solution = np.linalg.solve(C, rhs)
+    p = X.shape[1]
+    return solution[:p], solution[p:]
+
+
+@kernel_registry.register("blup", "cholesky")
+def blup_cholesky(y, X, Z, A_inv, var_a, var_e) -> tuple[np.ndarray, np.ndarray]:
+    C, rhs = _mme(y, X, Z, A_inv, var_a, var_e)
+    solution = linalg.cho_solve(linalg.cho_factor(C, check_finite=False), rhs)
+    p = X.shape[1]
+    return solution[:p], solution[p:]
+
+
+@kernel_registry.register("blup", "native", native=True, available=_exports("blup"))
+def blup_native(y, X, Z, A_inv, var_a, var_e) -> tuple[np.ndarray, np.ndarray]:
+    n, p = X.shape
+    q = Z.shape[1]
+    beta, u = native_module().blup(
+        np.ascontiguousarray(y, dtype=np.float64),
+        np.ascontiguousarray(X, dtype=np.float64).ravel(),
+        np.ascontiguousarray(Z, dtype=np.float64).ravel(),
+        np.ascontiguousarray(A_inv, dtype=np.float64).ravel(),
+        var_a,
+        var_e,
+        n,
+        p,
+        q,
+    )
+    return np.asarray(beta), np.asarray(u)
+
+
+# =============================================================================
+# GBLUP
+# =============================================================================
+
+kernel_registry.add_operation(
+    "spd_solve", bucket=lambda A, b: shape_bucket(A.shape[0], 1 if b.ndim == 1 else b.shape[1])
+)
+
+
+@kernel_registry.register("spd_solve", "scipy", reference=True)
+def spd_solve_scipy(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return linalg.solve(A, b)
+
+
+@kernel_registry.register("spd_solve", "scipy_ldl")
+def spd_solve_symmetric(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return linalg.solve(A, b, assume_a="sym")
+
+
+@kernel_registry.register("spd_solve", "cholesky")
+def spd_solve_cholesky(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return linalg.cho_solve(linalg.cho_factor(A, check_finite=False), b, check_finite=False)
+
+
+@kernel_registry.register("spd_solve", "numpy_lu")
+def spd_solve_lu(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.linalg.solve(A, b)
+
+
+kernel_registry.add_operation(
+    "gblup",
+    bucket=lambda genotypes, y, h2: (
+        f"{'tall' if genotypes.shape[0] > genotypes.shape[1] else 'wide'}:"
+        f"{shape_bucket(*genotypes.shape)}"
+    ),
+)
+
+
+def _centered_phenotypes(y: np.ndarray) -> np.ndarray:
+    y = np.asarray(y, dtype=np.float64)
+    mean = float(np.nanmean(y)) if y.size else 0.0
+    return np.nan_to_num(y - mean, nan=0.0)
+
+
+def gblup_from_grm(
+    G: np.ndarray, y_centered: np.ndarray, h2: float, allow_native: bool = True
+) -> np.ndarray:
+    """GEBVs G (G + λI)⁻¹ (y - ȳ) for a relationship matrix G, λ = (1 - h²) / h²."""
+    lambda_val = (1 - h2) / h2
+    v_star = G + np.eye(len(y_centered)) * lambda_val
+    solution = kernel_registry.dispatch("spd_solve", v_star, y_centered, allow_native=allow_native)
+    return np.dot(G, solution)
+
+
+@kernel_registry.register("gblup", "numpy", reference=True)
+def gblup_numpy(genotypes: np.ndarray, y: np.ndarray, h2: float) -> np.ndarray:
+    """
+    GEBVs from the VanRaden 1 GRM plus a small ridge, through the tuned
+    NumPy ``grm`` and ``spd_solve`` kernels, so the result is the one
+    ``ComputeEngine.compute_gblup_from_grm`` gives for the same G-matrix.
+    """
+    G = kernel_registry.dispatch("grm", genotypes, "vanraden1", allow_native=False)
+    G = G + np.eye(len(y)) * GBLUP_DIAGONAL_RIDGE
+    return gblup_from_grm(G, _centered_phenotypes(y), h2, allow_native=False)
+
+
+@kernel_registry.register("gblup", "marker_woodbury")
+def gblup_woodbury(genotypes: np.ndarray, y: np.ndarray, h2: float) -> np.ndarray:
+    """
+    Same GEBVs solved in marker space: with G = ZZ'/s + rI, the Woodbury
+    identity turns the n x n solve into an m x m one. Only worth it, and
+    only offered, when there are fewer markers than individuals.
+    """
+    n, m = genotypes.shape
+    if m >= n:
+        raise NotImplementedError("marker-space solve needs fewer markers than individuals")
+    Z, scale = _scaled_markers(genotypes, "vanraden1")
+    c = (1 - h2) / h2 + GBLUP_DIAGONAL_RIDGE
+    yc = _centered_phenotypes(y)
+    # (cI + ZZ'/s)⁻¹ yc = (yc - Z (scI + Z'Z)⁻¹ Z'yc) / c
+    inner = Z.T @ Z + np.eye(m) * (scale * c)
+    alpha = (yc - Z @ linalg.solve(inner, Z.T @ yc, assume_a="pos")) / c
+    return Z @ (Z.T @ alpha) / scale + GBLUP_DIAGONAL_RIDGE * alpha
+
+
+@kernel_registry.register("gblup", "native", native=True, available=_exports("gblup"))
+def gblup_native(genotypes: np.ndarray, y: np.ndarray, h2: float) -> np.ndarray:
+    n, m = genotypes.shape
+    flat = np.ascontiguousarray(genotypes, dtype=np.float64).ravel()
+    return np.asarray(
+        native_module().gblup(flat, np.ascontiguousarray(y, dtype=np.float64), h2, n, m)
+    )
+
+
+# =============================================================================
+# REML
+# =============================================================================
+
+kernel_registry.add_operation(
+    "reml",
+    bucket=lambda y, X, Z, A, *options: f"{options[2]}:{shape_bucket(len(y), Z.shape[1])}",
+    # Iteration counts legitimately differ between algorithms
+    outputs=lambda result: result[:3],
+)
+
+
+@kernel_registry.register("reml", "numpy", reference=True)
+def reml_numpy(
+    y: np.ndarray,
+    X: np.ndarray,
+    Z: np.ndarray,
+    A: np.ndarray,
+    var_a: float,
+    var_e: float,
+    method: str,
+    max_iter: int,
+    tol: float,
+) -> tuple[float, float, float, bool, int, float | None]:
+    """
+    NumPy implementation of REML (simplified EM)
+
+    Returns (var_additive, var_residual, heritability, converged, iterations,
+    log_likelihood).
+    """
+    n = len(y)
+    q = Z.shape[1]
+
+    for iteration in range(max_iter):
+        var_a_old, var_e_old = var_a, var_e
+
+        # Compute V = ZAZ'*var_a + I*var_e
+        V = var_a * (Z @ A @ Z.T) + var_e * np.eye(n)
+
+        try:
+            V_inv = np.linalg.inv(V)
+        except np.linalg.LinAlgError:
+            break
+
+        # Projection matrix P
+        VX = V_inv @ X
+        XVX = X.T @ VX
+        try:
+            XVX_inv = np.linalg.inv(XVX)
+        except np.linalg.LinAlgError:
+            break
+
+        P = V_inv - VX @ XVX_inv @ VX.T
+        Py = P @ y
+
+        # EM updates (simplified)
+        ZPy = Z.T @ Py
+        var_a = (np.dot(ZPy, ZPy) / var_a + var_a * q) / q
+        var_e = np.dot(y - Z @ (var_a * Z.T @ Py), Py) / (n - X.shape[1])
+
+        # Ensure positive
+        var_a = max(var_a, 1e-6)
+        var_e = max(var_e, 1e-6)
+
+        # Check convergence
+        if abs(var_a - var_a_old) < tol * abs(var_a_old) and abs(var_e - var_e_old) < tol * abs(
+            var_e_old
+        ):
+            return var_a, var_e, var_a / (var_a + var_e), True, iteration + 1, None
+
+    return var_a, var_e, var_a / (var_a + var_e), False, max_iter, None
+
+
+@kernel_registry.register("reml", "native", native=True, available=_exports("reml_estimate"))
+def reml_native(y, X, Z, A, var_a, var_e, method, max_iter, tol):
+    n = len(y)
+    p = X.shape[1]
+    q = Z.shape[1]
+    return native_module().reml_estimate(
+        np.ascontiguousarray(y, dtype=np.float64),
+        np.ascontiguousarray(X, dtype=np.float64).ravel(),
+        np.ascontiguousarray(Z, dtype=np.float64).ravel(),
+        np.ascontiguousarray(A, dtype=np.float64).ravel(),
+        var_a,
+        var_e,
+        method,
+        max_iter,
+        tol,
+        n,
+        p,
+        q,
+    )
+
+
+# =============================================================================
+# LD (ld_analysis)
+# =============================================================================
+
+kernel_registry.add_operation(
+    "ld_matrix",
+    bucket=lambda genotypes: (
+        f"{'missing' if (genotypes < 0).any() else 'complete'}:"
+        f"{shape_bucket(*genotypes.shape)}"
+    ),
+)
+
+
+@kernel_registry.register("ld_matrix", "numpy", reference=True)
+def ld_matrix_numpy(genotypes: np.ndarray) -> np.ndarray:
+    """
+    Pairwise r² between the markers (columns) of an n x m genotype matrix.
+
+    Missing calls are coded negative and each pair uses the individuals
+    called at both markers; pairs with fewer than two such individuals or a
+    monomorphic marker get r² = 0. Every pairwise sum is one matrix product.
+    """
+    genotypes = np.asarray(genotypes, dtype=np.float64)
+    called = (genotypes >= 0).astype(np.float64)
+    g = np.where(called > 0, genotypes, 0.0)
+    g2 = g * g
+
+    count = called.T @ called
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_i = (g.T @ called) / count
+        mean_j = mean_i.T
+        var_i = (g2.T @ called) / count - mean_i**2
+        var_j = var_i.T
+        cov = (g.T @ g) / count - mean_i * mean_j
+        r2 = cov**2 / (var_i * var_j)
+
+    r2[(count < 2) | (var_i < 1e-10) | (var_j < 1e-10)] = 0.0
+    np.fill_diagonal(r2, 1.0)
+    # Exactly symmetric, whatever the products' rounding
+    return np.triu(r2) + np.triu(r2, 1).T
+
+
+@kernel_registry.register("ld_matrix", "numpy_complete")
+def ld_matrix_complete(genotypes: np.ndarray) -> np.ndarray:
+    """Without missing calls r² is the squared correlation matrix: one standardized Gram."""
+    genotypes = np.asarray(genotypes, dtype=np.float64)
+    if (genotypes < 0).any():
+        raise NotImplementedError("genotypes have missing calls")
+    n = genotypes.shape[0]
+    centered = genotypes - genotypes.mean(axis=0)
+    var = np.einsum("ij,ij->j", centered, centered) / n
+    polymorphic = var >= 1e-10
+    standardized = np.zeros_like(centered)
+    standardized[:, polymorphic] = centered[:, polymorphic] / np.sqrt(var[polymorphic])
+    r2 = (standardized.T @ standardized / n) ** 2 if n >= 2 else np.zeros((len(var),) * 2)
+    np.fill_diagonal(r2, 1.0)
+    return r2
+
+
+@kernel_registry.register(
+    "ld_matrix", "native", native=True, available=_exports("compute_ld_matrix")
+)
+def ld_matrix_native(genotypes: np.ndarray) -> np.ndarray:
+    n, m = genotypes.shape
+    flat = native_module().compute_ld_matrix(_fortran_order(genotypes), n, m)
+    return np.asarray(flat).reshape((m, m), order="F")
+
+
+# =============================================================================
+# PCA (pca_svd)
+# =============================================================================
+
+kernel_registry.add_operation(
+    "pca", bucket=lambda X, k, center=True, scale=False: shape_bucket(*X.shape)
+)
+
+
+def _pca_input(X: np.ndarray, center: bool, scale: bool) -> np.ndarray:
+    X = np.array(X, dtype=np.float64)
+    if center:
+        X -= X.mean(axis=0)
+    if scale:
+        std = np.sqrt(np.einsum("ij,ij->j", X, X) / (X.shape[0] - 1))
+        X[:, std > 1e-10] /= std[std > 1e-10]
+    return X
+
+
+def _oriented(scores: np.ndarray, loadings: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Fix each component's sign so its largest loading is positive."""
+    signs = np.sign(loadings[np.argmax(np.abs(loadings), axis=0), np.arange(loadings.shape[1])])
+    signs[signs == 0] = 1.0
+    return scores * signs, loadings * signs
+
+
+@kernel_registry.register("pca", "numpy_svd", reference=True)
+def pca_svd(
+    X: np.ndarray, k: int, center: bool = True, scale: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Scores (n x k), loadings (p x k) and fraction of variance per component."""
+    Xc = _pca_input(X, center, scale)
+    U, S, VT = np.linalg.svd(Xc, full_matrices=False)
+    scores, loadings = _oriented(U[:, :k] * S[:k], VT[:k].T)
+    return scores, loadings, S[:k] ** 2 / np.sum(S**2)
+
+
+@kernel_registry.register("pca", "gram_eigh")
+def pca_gram(
+    X: np.ndarray, k: int, center: bool = True, scale: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Eigendecomposition of the smaller Gram matrix; fast for wide or tall data."""
+    Xc = _pca_input(X, center, scale)
+    n, p = Xc.shape
+    total = np.einsum("ij,ij->", Xc, Xc)
+    if n <= p:
+        eigenvalues, U = linalg.eigh(Xc @ Xc.T, subset_by_index=[n - k, n - 1])
+        eigenvalues, U = eigenvalues[::-1], U[:, ::-1]
+        S = np.sqrt(np.clip(eigenvalues, 0.0, None))
+        loadings = (Xc.T @ U) / np.where(S > 0, S, 1.0)
+        scores = U * S
+    else:
+        eigenvalues, V = linalg.eigh(Xc.T @ Xc, subset_by_index=[p - k, p - 1])
+        eigenvalues, loadings = eigenvalues[::-1], V[:, ::-1]
+        scores = Xc @ loadings
+    scores, loadings = _oriented(scores, loadings)
+    return scores, loadings, np.clip(eigenvalues, 0.0, None) / total
+
+
+@kernel_registry.register("pca", "native", native=True, available=_exports("compute_pca"))
+def pca_native(
+    X: np.ndarray, k: int, center: bool = True, scale: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    n, p = X.shape
+    scores, loadings, variance = native_module().compute_pca(
+        _fortran_order(X), n, p, k, int(center), int(scale)
+    )
+    scores, loadings = _oriented(
+        np.asarray(scores).reshape((n, k), order="F"),
+        np.asarray(loadings).reshape((p, k), order="F"),
+    )
+    return scores, loadings, np.asarray(variance)
+
+
+# =============================================================================
+# Stability (stability_analysis) and G×E (gxe_analysis)
+# =============================================================================
+
+kernel_registry.add_operation("stability", bucket=lambda Y: shape_bucket(*Y.shape))
+
+
+@kernel_registry.register("stability", "numpy", reference=True)
+def eberhart_russell_numpy(Y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Genotype means, regression coefficients bᵢ and deviations S²dᵢ for a g x e table."""
+    Y = np.asarray(Y, dtype=np.float64)
+    e = Y.shape[1]
+    env_index = Y.mean(axis=0) - Y.mean()
+    means = Y.mean(axis=1)
+    sum_ij2 = env_index @ env_index
+    bi = (Y - means[:, None]) @ env_index / sum_ij2 if abs(sum_ij2) > 1e-10 else np.ones(len(Y))
+    deviations = Y - (means[:, None] + bi[:, None] * env_index)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s2di = np.einsum("ij,ij->i", deviations, deviations) / (e - 2)
+    return means, bi, s2di
+
+
+@kernel_registry.register(
+    "stability", "native", native=True, available=_exports("eberhart_russell")
+)
+def eberhart_russell_native(Y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    g, e = Y.shape
+    means, bi, s2di = native_module().eberhart_russell(_fortran_order(Y), g, e)
+    return np.asarray(means), np.asarray(bi), np.asarray(s2di)
+
+
+kernel_registry.add_operation("gxe", bucket=lambda Y: shape_bucket(*Y.shape))
+
+
+@kernel_registry.register("gxe", "numpy", reference=True)
+def finlay_wilkinson_numpy(
+    Y: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Genotype means, slopes and R² against the environment index, and the index."""
+    Y = np.asarray(Y, dtype=np.float64)
+    env_index = Y.mean(axis=0) - Y.mean()
+    means = Y.mean(axis=1)
+    x = env_index - env_index.mean()
+    yc = Y - means[:, None]
+    ss_x = x @ x
+    ss_y = np.einsum("ij,ij->i", yc, yc)
+    ss_xy = yc @ x
+    slopes = ss_xy / ss_x if abs(ss_x) > 1e-10 else np.ones(len(Y))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_squared = np.where(
+            (np.abs(ss_y) > 1e-10) & (abs(ss_x) > 1e-10), ss_xy**2 / (ss_x * ss_y), 0.0
+        )
+    return means, slopes, r_squared, env_index
+
+
+@kernel_registry.register("gxe", "native", native=True, available=_exports("finlay_wilkinson"))
+def finlay_wilkinson_native(
+    Y: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    g, e = Y.shape
+    return tuple(
+        np.asarray(out) for out in native_module().finlay_wilkinson(_fortran_order(Y), g, e)
+    )
+
+
+# =============================================================================
+# Selection index (selection_index)
+# =============================================================================
+
+kernel_registry.add_operation("selection_index", bucket=lambda P, G, a: shape_bucket(len(a)))
+
+
+@kernel_registry.register("selection_index", "numpy", reference=True)
+def smith_hazel_numpy(P: np.ndarray, G: np.ndarray, a: np.ndarray) -> np.ndarray:
+    """Smith-Hazel index coefficients b = P⁻¹Ga."""
+    return linalg.solve(np.asarray(P, dtype=np.float64), np.asarray(G, dtype=np.float64) @ a)
+
+
+@kernel_registry.register(
+    "selection_index", "native", native=True, available=_exports("smith_hazel_index")
+)
+def smith_hazel_native(P: np.ndarray, G: np.ndarray, a: np.ndarray) -> np.ndarray:
+    return np.asarray(
+        native_module().smith_hazel_index(
+            _fortran_order(P), _fortran_order(G), np.asarray(a, dtype=np.float64), len(a)
+        )
+    )
@@ -0,0 +1,414 @@
+"""
+Compute Kernel Registry
+
+Routes each numerical operation of the compute engine to the fastest
+implementation available on this host.
+
+Every operation has a NumPy reference implementation and may have
+alternatives: other NumPy/SciPy formulations and the Fortran kernels exported
+by the ``bijmantra_compute`` extension. The first call of an operation in a
+problem-size bucket times every available candidate on that call's inputs,
+checks each against the reference, and keeps the fastest one that agrees.
+The dispatch table is written to ``COMPUTE_KERNEL_TABLE_PATH`` and reloaded
+by later processes on the same host, so a bucket is tuned once rather than
+once per worker.
+
+A candidate that raises falls back to the reference. In cross-check mode
+(``COMPUTE_KERNEL_CROSS_CHECK``) every call is also run through the
+reference; on disagreement the reference result is returned and the
+candidate is dropped for that bucket.
+
+Usage:
+    registry = KernelRegistry()
+    registry.add_operation("solve", bucket=lambda A, b: shape_bucket(len(A)))
+
+    @registry.register("solve", "numpy", reference=True)
+    def solve_numpy(A, b):
+        return np.linalg.solve(A, b)
+
+    x = registry.dispatch("solve", A, b)
+"""
+
+import json
+import logging
+import os
+import platform
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Any
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+TABLE_VERSION = 1
+
+# Candidates faster than this are re-run and their best time kept
+MIN_TUNE_SECONDS = 1e-3
+TUNE_REPEATS = 5
+
+
+@dataclass(frozen=True)
+class KernelCandidate:
+    """One implementation of an operation."""
+
+    name: str
+    func: Callable[..., Any]
+    native: bool = False
+    available: Callable[[], bool] | None = None
+
+    def is_available(self) -> bool:
+        return self.available is None or bool(self.available())
+
+
+@dataclass
+class KernelOperation:
+    """An operation, how its inputs map to a size bucket, and its implementations."""
+
+    name: str
+    bucket: Callable[..., str]
+    # Projection of a result compared during tuning and cross-checks
+    outputs: Callable[[Any], Any] = lambda result: result
+    reference: KernelCandidate | None = None
+    candidates: dict[str, KernelCandidate] = field(default_factory=dict)
+
+
+def shape_bucket(*dims: int) -> str:
+    """Bucket key rounding every dimension up to a power of two, e.g. ``"512x4096"``."""
+    return "x".join(str(1 << max(int(d) - 1, 0).bit_length()) for d in dims)
+
+
+def outputs_close(a: Any, b: Any, rtol: float, atol: float) -> bool:
+    """Whether two kernel results agree: numbers within tolerance, everything else equal."""
+    if is_dataclass(a) and not isinstance(a, type):
+        return type(a) is type(b) and all(
+            outputs_close(getattr(a, f.name), getattr(b, f.name), rtol, atol) for f in fields(a)
+        )
+    if isinstance(a, dict):
+        return (
+            isinstance(b, dict)
+            and a.keys() == b.keys()
+            and all(outputs_close(a[k], b[k], rtol, atol) for k in a)
+        )
+    if isinstance(a, tuple | list):
+        return (
+            isinstance(b, tuple | list)
+            and len(a) == len(b)
+            and all(outputs_close(x, y, rtol, atol) for x, y in zip(a, b, strict=True))
+        )
+    if a is None or isinstance(a, str | bool) or b is None or isinstance(b, str | bool):
+        return a == b
+    a_arr, b_arr = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return a_arr.shape == b_arr.shape and bool(
+        np.allclose(a_arr, b_arr, rtol=rtol, atol=atol, equal_nan=True)
+    )
+
+
+class KernelRegistry:
+    """
+    Operations, their candidate implementations and the tuned dispatch table.
+
+    The table maps ``operation -> bucket -> {"timings_ms", "rejected"}``;
+    the chosen implementation is the fastest timed candidate the caller
+    allows, so one table serves both native and NumPy-only engines.
+    """
+
+    def __init__(
+        self,
+        table_path: str | None = None,
+        autotune: bool = True,
+        cross_check: bool = False,
+        rtol: float = 1e-6,
+        atol: float = 1e-8,
+    ):
+        self.table_path = table_path
+        self.autotune = autotune
+        self.cross_check = cross_check
+        self.rtol = rtol
+        self.atol = atol
+        self.operations: dict[str, KernelOperation] = {}
+        self._table: dict[str, dict[str, dict[str, Any]]] | None = None
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # Registration
+    # =========================================================================
+
+    def add_operation(
+        self,
+        name: str,
+        bucket: Callable[..., str],
+        outputs: Callable[[Any], Any] | None = None,
+    ) -> KernelOperation:
+        """Declare an operation; ``bucket`` receives the call's arguments."""
+        operation = KernelOperation(name=name, bucket=bucket)
+        if outputs is not None:
+            operation.outputs = outputs
+        self.operations[name] = operation
+        return operation
+
+    def register(
+        self,
+        operation: str,
+        name: str,
+        *,
+        reference: bool = False,
+        native: bool = False,
+        available: Callable[[], bool] | None = None,
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        Decorator adding an implementation of ``operation``.
+
+        Implementations must not modify their inputs: tuning and cross-checks
+        run several of them on the same arrays. One that cannot handle a call
+        (e.g. an unsupported method) raises ``NotImplementedError``.
+        """
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            op = self.operations[operation]
+            candidate = KernelCandidate(name=name, func=func, native=native, available=available)
+            op.candidates[name] = candidate
+            if reference:
+                op.reference = candidate
+            return func
+
+        return decorator
+
+    def candidates(self, operation: str, allow_native: bool = True) -> list[KernelCandidate]:
+        """Available implementations of ``operation``, reference first."""
+        op = self.operations[operation]
+        return sorted(
+            (
+                c
+                for c in op.candidates.values()
+                if (allow_native or not c.native) and c.is_available()
+            ),
+            key=lambda c: c is not op.reference,
+        )
+
+    # =========================================================================
+    # Dispatch
+    # =========================================================================
+
+    def dispatch(self, operation: str, *args: Any, allow_native: bool = True, **kwargs: Any) -> Any:
+        """Run ``operation`` with the fastest implementation tuned for this input size."""
+        op = self.operations[operation]
+        bucket = op.bucket(*args, **kwargs)
+        candidates = self.candidates(operation, allow_native)
+        if op.reference is None or op.reference not in candidates:
+            raise LookupError(f"Operation '{operation}' has no reference implementation")
+
+        entry = self._entry(operation, bucket)
+        settled = set(entry["timings_ms"]) | set(entry["rejected"]) if entry else set()
+        pending = [c for c in candidates if c.name not in settled]
+        if self.autotune and len(candidates) > 1 and pending:
+            return self._tune(op, bucket, candidates, entry, args, kwargs)
+
+        chosen = self._choose(op, entry, candidates)
+        if chosen is op.reference:
+            return chosen.func(*args, **kwargs)
+
+        try:
+            result = chosen.func(*args, **kwargs)
+        except Exception as e:
+            logger.warning(
+                f"Kernel {operation}/{chosen.name} failed ({e}); using {op.reference.name}"
+            )
+            # If the reference fails too the input is at fault, not the kernel
+            result = op.reference.func(*args, **kwargs)
+            self._reject(operation, bucket, chosen.name, f"error: {e}")
+            return result
+
+        if self.cross_check:
+            expected = op.reference.func(*args, **kwargs)
+            if not outputs_close(op.outputs(result), op.outputs(expected), self.rtol, self.atol):
+                logger.error(
+                    f"Kernel {operation}/{chosen.name} disagrees with {op.reference.name} "
+                    f"for bucket {bucket}; dropping it for this bucket"
+                )
+                self._reject(operation, bucket, chosen.name, "cross-check mismatch")
+                return expected
+        return result
+
+    def choice(self, operation: str, bucket: str, allow_native: bool = True) -> str | None:
+        """Implementation the table selects for ``bucket``, or ``None`` if untuned."""
+        entry = self._entry(operation, bucket)
+        if entry is None:
+            return None
+        candidates = self.candidates(operation, allow_native)
+        return self._choose(self.operations[operation], entry, candidates).name
+
+    def summary(self, allow_native: bool = True) -> dict[str, dict[str, Any]]:
+        """Per operation: available implementations and the choice for each tuned bucket."""
+        table = self.table()
+        summary = {}
+        for name, op in self.operations.items():
+            candidates = self.candidates(name, allow_native)
+            summary[name] = {
+                "candidates": [c.name for c in candidates],
+                "buckets": {
+                    bucket: self._choose(op, entry, candidates).name
+                    for bucket, entry in sorted(table.get(name, {}).items())
+                },
+            }
+        return summary
+
+    def _choose(
+        self,
+        op: KernelOperation,
+        entry: dict[str, Any] | None,
+        candidates: list[KernelCandidate],
+    ) -> KernelCandidate:
+        timings = entry["timings_ms"] if entry else {}
+        timed = [c for c in candidates if c.name in timings]
+        if not timed:
+            return op.reference
+        return min(timed, key=lambda c: timings[c.name])
+
+    # =========================================================================
+    # Tuning
+    # =========================================================================
+
+    def _tune(
+        self,
+        op: KernelOperation,
+        bucket: str,
+        candidates: list[KernelCandidate],
+        entry: dict[str, Any] | None,
+        args: tuple,
+        kwargs: dict,
+    ) -> Any:
+        """Time every candidate on this call, keep those agreeing with the reference."""
+        timings = dict(entry["timings_ms"]) if entry else {}
+        rejected = dict(entry["rejected"]) if entry else {}
+        results: dict[str, Any] = {}
+
+        expected, elapsed = self._time(op.reference, args, kwargs)
+        timings[op.reference.name] = elapsed
+        results[op.reference.name] = expected
+
+        for candidate in candidates:
+            if candidate is op.reference:
+                continue
+            try:
+                result, elapsed = self._time(candidate, args, kwargs)
+            except NotImplementedError as e:
+                rejected[candidate.name] = f"unsupported: {e}"
+                continue
+            except Exception as e:
+                rejected[candidate.name] = f"error: {e}"
+                continue
+            if not outputs_close(op.outputs(result), op.outputs(expected), self.rtol, self.atol):
+                rejected[candidate.name] = "mismatch with reference"
+                continue
+            timings[candidate.name] = elapsed
+            results[candidate.name] = result
+
+        for name, reason in rejected.items():
+            logger.info(f"Kernel {op.name}/{name} not used for bucket {bucket}: {reason}")
+
+        self._store(op.name, bucket, {"timings_ms": timings, "rejected": rejected})
+        fastest = min(results, key=timings.get)
+        logger.info(f"Kernel {op.name} bucket {bucket}: using {fastest} ({timings})")
+        return results[fastest]
+
+    def _time(self, candidate: KernelCandidate, args: tuple, kwargs: dict) -> tuple[Any, float]:
+        """Result and best wall time (ms) of ``candidate`` on the given inputs."""
+        started = time.perf_counter()
+        result = candidate.func(*args, **kwargs)
+        best = time.perf_counter() - started
+        if best < MIN_TUNE_SECONDS:
+            for _ in range(TUNE_REPEATS):
+                started = time.perf_counter()
+                candidate.func(*args, **kwargs)
+                best = min(best, time.perf_counter() - started)
+        return result, best * 1000.0
+
+    # =========================================================================
+    # Dispatch table
+    # =========================================================================
+
+    def fingerprint(self) -> dict[str, Any]:
+        """What a tuned table depends on; a table recorded elsewhere is discarded."""
+        import scipy
+
+        return {
+            "version": TABLE_VERSION,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "native": sorted(
+                f"{op.name}/{c.name}"
+                for op in self.operations.values()
+                for c in op.candidates.values()
+                if c.native and c.is_available()
+            ),
+        }
+
+    def table(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Copy of the dispatch table, loading the persisted one on first access."""
+        with self._lock:
+            return json.loads(json.dumps(self._loaded()))
+
+    def reset(self) -> None:
+        """Forget every tuning decision, on disk as well."""
+        with self._lock:
+            self._table = {}
+            self._save()
+
+    def _entry(self, operation: str, bucket: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._loaded().get(operation, {}).get(bucket)
+
+    def _store(self, operation: str, bucket: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._loaded().setdefault(operation, {})[bucket] = entry
+            self._save()
+
+    def _reject(self, operation: str, bucket: str, name: str, reason: str) -> None:
+        with self._lock:
+            entry = self._loaded().setdefault(operation, {}).setdefault(
+                bucket, {"timings_ms": {}, "rejected": {}}
+            )
+            entry["timings_ms"].pop(name, None)
+            entry["rejected"][name] = reason
+            self._save()
+
+    def _path(self) -> str:
+        return self.table_path or os.path.join(
+            tempfile.gettempdir(), "bijmantra-kernel-dispatch.json"
+        )
+
+    def _loaded(self) -> dict[str, dict[str, dict[str, Any]]]:
+        if self._table is None:
+            self._table = {}
+            try:
+                with open(self._path(), encoding="utf-8") as f:
+                    stored = json.load(f)
+                if stored.get("fingerprint") == self.fingerprint():
+                    self._table = stored.get("operations", {})
+                else:
+                    logger.info("Kernel dispatch table was tuned on another build; retuning")
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, AttributeError) as e:
+                logger.warning(f"Ignoring unreadable kernel dispatch table {self._path()}: {e}")
+        return self._table
+
+    def _save(self) -> None:
+        path = self._path()
+        payload = {"fingerprint": self.fingerprint(), "operations": self._table}
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist kernel dispatch table to {path}: {e}")
@@ -10,16 +10,23 @@ Features:
 - Result storage
 - Compute job queueing (Python/Rust/Fortran/WASM)
 - Job status tracking and result retrieval
+- Optional durable backend (see task_store): jobs survive restarts and are
+  shared between the API and light/heavy/GPU worker processes
 """
 
 import asyncio
+import contextlib
+import os
+import socket
 import uuid
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import Enum, StrEnum
 from typing import Any
 
+from app.core.request_profiling import span
+
 
 class TaskStatus(StrEnum):
     """Task execution status"""
@@ -66,6 +73,8 @@ class Task:
     organization_id: str | None = None
     metadata: dict[str, Any] = field(default_factory=dict)
     compute_type: ComputeType | None = None  # For compute job routing
+    deliveries: int = 0  # Times a durable backend handed this task to a worker
+    delivery: tuple[str, str] | None = None  # Backend lease while executing
 
 
 class TaskQueue:
@@ -100,6 +109,10 @@ class TaskQueue:
         self._running_count = 0
         self._workers: list[asyncio.Task] = []
         self._running = False
+        self._backend = None
+        self._compute_types: frozenset[ComputeType] = frozenset()
+        self._consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self._maintenance_task: asyncio.Task | None = None
 
     async def _ensure_queue_for_current_loop(self):
         """Bind queue to the current running loop and rehydrate pending tasks when loop changes."""
@@ -116,13 +129,29 @@ class TaskQueue:
             if task.status == TaskStatus.PENDING:
                 await self._queue.put((-task.priority.value, task.id))
 
-    async def start(self):
-        """Start the task queue workers"""
+    async def start(self, compute_types: Iterable[ComputeType] | None = None, backend=None):
+        """
+        Start the task queue workers
+
+        Args:
+            compute_types: Compute types this process pulls from the durable
+                backend (default: all). Dedicated worker processes pass their own.
+            backend: TaskBackend to use instead of the one from TASK_QUEUE_BACKEND
+        """
         if self._running:
             return
 
         await self._ensure_queue_for_current_loop()
 
+        if backend is None:
+            from app.services.task_store import create_task_backend
+
+            backend = create_task_backend()
+        if backend is not None:
+            await backend.initialize()
+        self._backend = backend
+        self._compute_types = frozenset(ComputeType if compute_types is None else compute_types)
+
         self._running = True
 
         # Start worker tasks
@@ -130,7 +159,11 @@ class TaskQueue:
             worker = asyncio.create_task(self._worker(i))
             self._workers.append(worker)
 
-        print(f"[TaskQueue] Started {self._max_concurrent} workers")
+        if self._backend is not None:
+            self._maintenance_task = asyncio.create_task(self._maintenance())
+
+        backend_name = self._backend.name if self._backend is not None else "memory"
+        print(f"[TaskQueue] Started {self._max_concurrent} workers (backend={backend_name})")
 
     async def stop(self):
         """Stop the task queue"""
@@ -141,6 +174,16 @@ class TaskQueue:
             worker.cancel()
 
         self._workers.clear()
+
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._maintenance_task
+            self._maintenance_task = None
+
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
         print("[TaskQueue] Stopped")
 
     @property
@@ -148,6 +191,32 @@ class TaskQueue:
         """Whether the task queue workers are currently running."""
         return self._running
 
+    @property
+    def backend(self):
+        """Durable task backend, or None when tasks only live in this process."""
+        return self._backend
+
+    async def _next_task(self) -> Task | None:
+        """Next local task, else the next job the backend routes to this process."""
+        if self._backend is None or not self._compute_types:
+            # Get next task (blocks until available)
+            priority, task_id = await asyncio.wait_for(
+                self._queue.get(),
+                timeout=1.0
+            )
+            return self._tasks.get(task_id)
+
+        if not self._queue.empty():
+            priority, task_id = self._queue.get_nowait()
+            return self._tasks.get(task_id)
+
+        claimed = await self._backend.claim(self._consumer, self._compute_types, count=1, block_ms=1000)
+        if not claimed:
+            return None
+        task = claimed[0]
+        self._tasks[task.id] = task
+        return task
+
     async def _worker(self, worker_id: int):
         """Worker coroutine that processes tasks"""
         while self._running:
@@ -156,14 +225,11 @@ class TaskQueue:
                     await asyncio.sleep(0.1)
                     continue
 
-                # Get next task (blocks until available)
-                priority, task_id = await asyncio.wait_for(
-                    self._queue.get(),
-                    timeout=1.0
-                )
-
-                task = self._tasks.get(task_id)
-                if not task or task.status == TaskStatus.CANCELLED:
+                task = await self._next_task()
+                if not task:
+                    continue
+                if task.status == TaskStatus.CANCELLED:
+                    await self._release(task)
                     continue
 
                 # Execute task
@@ -175,6 +241,57 @@ class TaskQueue:
                 break
             except Exception as e:
                 print(f"[TaskQueue] Worker {worker_id} error: {e}")
+                await asyncio.sleep(1.0)
+
+    async def _persist(self, task: Task, progress_only: bool = False):
+        """Write task state to the durable backend, if any."""
+        if self._backend is None:
+            return
+        try:
+            if progress_only:
+                await self._backend.update_progress(task)
+            else:
+                await self._backend.save(task)
+        except Exception as e:
+            print(f"[TaskQueue] Could not persist task {task.id[:8]}: {e}")
+
+    async def _release(self, task: Task):
+        """Persist final state and acknowledge the backend delivery."""
+        await self._persist(task)
+        if self._backend is not None and task.delivery is not None:
+            try:
+                await self._backend.ack(task)
+            except Exception as e:
+                print(f"[TaskQueue] Could not acknowledge task {task.id[:8]}: {e}")
+
+    async def _heartbeat(self, task: Task):
+        """Keep the backend lease alive and publish progress while a task runs."""
+        interval = max(1.0, self._backend.visibility_timeout / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._backend.heartbeat(self._consumer, task)
+            except Exception as e:
+                print(f"[TaskQueue] Heartbeat failed for task {task.id[:8]}: {e}")
+            await self._persist(task, progress_only=True)
+
+    async def _maintenance(self):
+        """Re-deliver jobs from crashed workers and evict expired results."""
+        interval = max(1.0, self._backend.visibility_timeout / 2)
+        result_ttl_hours = self._backend.result_ttl_seconds / 3600
+        while self._running:
+            try:
+                if self._compute_types:
+                    for task in await self._backend.reclaim(self._consumer, self._compute_types):
+                        self._tasks[task.id] = task
+                        await self._queue.put((-task.priority.value, task.id))
+                await self._backend.purge_expired()
+                self.cleanup_old_tasks(max_age_hours=result_ttl_hours)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[TaskQueue] Maintenance error: {e}")
+            await asyncio.sleep(interval)
 
     async def _execute_task(self, task: Task, worker_id: int):
         """Execute a single task"""
@@ -184,6 +301,11 @@ class TaskQueue:
 
         print(f"[TaskQueue] Worker {worker_id} executing: {task.name}")
 
+        heartbeat = None
+        if self._backend is not None:
+            await self._persist(task, progress_only=True)
+            heartbeat = asyncio.create_task(self._heartbeat(task))
+
         # Create progress callback
         def progress_callback(progress: float, message: str = ""):
             task.progress = min(1.0, max(0.0, progress))
@@ -208,6 +330,11 @@ class TaskQueue:
         finally:
             task.completed_at = datetime.now(UTC)
             self._running_count -= 1
+            if heartbeat is not None:
+                heartbeat.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await heartbeat
+            await self._release(task)
 
     async def submit(
         self,
@@ -219,8 +346,15 @@ class TaskQueue:
         user_id: str | None = None,
         organization_id: str | None = None,
         metadata: dict[str, Any] = None,
+        compute_type: ComputeType | None = None,
     ) -> str:
-        """Submit a task to the queue"""
+        """
+        Submit a task to the queue
+
+        With a durable backend, compute tasks whose function is importable are
+        dispatched to whichever process consumes their compute type; other
+        tasks run here and are persisted for status lookups.
+        """
         await self._ensure_queue_for_current_loop()
 
         task_id = str(uuid.uuid4())
@@ -235,8 +369,18 @@ class TaskQueue:
             user_id=user_id,
             organization_id=organization_id,
             metadata=metadata or {},
+            compute_type=compute_type,
         )
 
+        if self._backend is not None:
+            from app.services.task_store import is_dispatchable
+
+            if is_dispatchable(task):
+                await self._backend.dispatch(task)
+                print(f"[TaskQueue] Dispatched: {name} (id={task_id[:8]}, type={compute_type.value})")
+                return task_id
+            await self._persist(task)
+
         self._tasks[task_id] = task
 
         # Add to priority queue (negative priority for max-heap behavior)
@@ -270,6 +414,29 @@ class TaskQueue:
 
         return tasks[:limit]
 
+    async def _find_task(self, task_id: str) -> Task | None:
+        """Local task, else the backend's copy (jobs dispatched to other processes)."""
+        task = self._tasks.get(task_id)
+        if task is None and self._backend is not None:
+            task = await self._backend.load(task_id)
+        return task
+
+    async def cancel_compute(self, job_id: str) -> bool:
+        """Cancel a pending job, including jobs waiting in the durable backend"""
+        if job_id in self._tasks or self._backend is None:
+            cancelled = self.cancel_task(job_id)
+            if cancelled:
+                await self._persist(self._tasks[job_id])
+            return cancelled
+
+        task = await self._backend.load(job_id)
+        if task is None or task.status != TaskStatus.PENDING:
+            return False
+        task.status = TaskStatus.CANCELLED
+        task.completed_at = datetime.now(UTC)
+        await self._backend.save(task)
+        return True
+
     def cancel_task(self, task_id: str) -> bool:
         """Cancel a pending task"""
         task = self._tasks.get(task_id)
@@ -366,7 +533,7 @@ class TaskQueue:
                 phenotype_data=phenotypes
             )
         """
-        task_id = await self.submit(
+        return await self.submit(
             name=compute_name,
             func=compute_func,
             kwargs=kwargs,
@@ -374,15 +541,9 @@ class TaskQueue:
             user_id=user_id,
             organization_id=organization_id,
             metadata={"compute_type": compute_type.value},
+            compute_type=compute_type,
         )
 
-        # Update task with compute type for worker routing
-        task = self._tasks.get(task_id)
-        if task:
-            task.compute_type = compute_type
-
-        return task_id
-
     async def get_compute_status(self, job_id: str) -> dict[str, Any] | None:
         """
         Get compute job status and progress
@@ -399,7 +560,7 @@ class TaskQueue:
             if status["status"] == "completed":
                 result = status["result"]
         """
-        task = self.get_task(job_id)
+        task = await self._find_task(job_id)
         if not task:
             return None
 
@@ -432,7 +593,7 @@ class TaskQueue:
         Example:
             result = await task_queue.get_compute_result(job_id)
         """
-        task = self.get_task(job_id)
+        task = await self._find_task(job_id)
         if not task:
             raise ValueError(f"Job {job_id} not found")
 
@@ -441,12 +602,16 @@ class TaskQueue:
         poll_interval = 0.5  # 500ms
         elapsed = 0.0
 
-        while task.status in [TaskStatus.PENDING, TaskStatus.RUNNING]:
-            if elapsed >= max_wait:
-                raise TimeoutError(f"Job {job_id} timed out after {max_wait}s")
+        with span("compute"):
+            while task.status in [TaskStatus.PENDING, TaskStatus.RUNNING]:
+                if elapsed >= max_wait:
+                    raise TimeoutError(f"Job {job_id} timed out after {max_wait}s")
 
-            await asyncio.sleep(poll_interval)
-            elapsed += poll_interval
+                await asyncio.sleep(poll_interval)
+                elapsed += poll_interval
+                if job_id not in self._tasks:
+                    # Running in another process: re-read the shared record
+                    task = await self._find_task(job_id) or task
 
         if task.status == TaskStatus.FAILED:
             raise RuntimeError(f"Job {job_id} failed: {task.error}")
@@ -0,0 +1,725 @@
+"""
+Durable Task Store for the Background Task Queue
+
+Keeps task metadata, progress and results outside the API process and
+dispatches compute jobs to worker processes by ComputeType.
+
+Backends:
+- redis: task hashes + one Redis Stream per (compute type, priority),
+  consumed through a shared consumer group. Unacknowledged entries idle
+  for longer than the visibility timeout are re-delivered via XAUTOCLAIM.
+- sqlite: a single table with claim/lease columns. Same semantics, meant
+  for local development and tests where Redis is not running.
+
+Only tasks whose function is a registered entry point (TASK_ENTRY_POINTS:
+the compute interface workers, plus anything added with
+register_task_entry_point) and whose arguments fit the payload format are
+dispatched; anything else runs in the submitting process and is only
+persisted for status lookups. Records are never unpickled and never name an
+arbitrary import path: arguments and results are stored as versioned JSON
+(numpy arrays as raw bytes with dtype and shape), and a worker only imports
+functions on the allowlist.
+"""
+
+import asyncio
+import base64
+import importlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from datetime import UTC, date, datetime
+from pathlib import Path, PurePath
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.task_queue import ComputeType, Task, TaskPriority, TaskStatus
+
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset({TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED})
+CONSUMER_GROUP = "workers"
+# Fields rewritten by heartbeats; avoids re-serializing arguments while a job runs
+PROGRESS_FIELDS = ("status", "progress", "progress_message", "started_at")
+
+
+# ============================================
+# CALLABLE REFERENCES
+# ============================================
+
+# Functions a worker process may run for a dispatched task, as "module:qualname"
+TASK_ENTRY_POINTS: set[str] = {
+    "app.modules.breeding.compute.analytics.gblup_analytics_compute:GBLUPAnalyticsCompute._gblup_worker",
+    "app.modules.breeding.compute.analytics.gxe_analytics_compute:GxEAnalyticsCompute._gxe_worker",
+    "app.modules.breeding.compute.analytics.gxe_analytics_compute:GxEAnalyticsCompute._interaction_matrix_worker",
+    "app.modules.breeding.compute.blup_compute:BLUPCompute._blup_worker",
+    "app.modules.breeding.compute.blup_compute:BLUPCompute._gblup_worker",
+    "app.modules.breeding.compute.population_simulation_compute:PopulationSimulationCompute._programme_worker",
+    "app.modules.genomics.compute.gwas_compute:GWASCompute._gwas_worker",
+    "app.modules.genomics.compute.statistics.gwas_plink_compute:GWASPlinkCompute._association_worker",
+    "app.modules.genomics.compute.statistics.gwas_plink_compute:GWASPlinkCompute._ld_pruning_worker",
+    "app.modules.genomics.compute.statistics.gwas_plink_compute:GWASPlinkCompute._pca_worker",
+    "app.modules.genomics.compute.statistics.kinship_compute:KinshipCompute._inbreeding_worker",
+    "app.modules.genomics.compute.statistics.kinship_compute:KinshipCompute._kinship_worker",
+}
+
+
+def _reference(func: Callable) -> tuple[str, bool] | None:
+    owner = getattr(func, "__self__", None)
+    target = getattr(func, "__func__", func)
+    module = getattr(target, "__module__", None)
+    qualname = getattr(target, "__qualname__", "")
+    if not module or not qualname or "<" in qualname:
+        return None
+    return f"{module}:{qualname}", owner is not None and not isinstance(owner, type)
+
+
+def register_task_entry_point(func: Callable) -> Callable:
+    """Allow ``func`` (a function, or a method of an argument-less class) to run in worker processes."""
+    reference = _reference(func)
+    if reference is None:
+        raise ValueError(f"{func!r} cannot be referenced by name")
+    TASK_ENTRY_POINTS.add(reference[0])
+    return func
+
+
+def callable_path(func: Callable) -> str | None:
+    """
+    Reference for a registered task function, or None if it can only run here.
+
+    Bound methods are recorded by their class; the worker re-creates the
+    instance with no arguments, which is how compute interfaces are built.
+    """
+    reference = _reference(func)
+    if reference is None or reference[0] not in TASK_ENTRY_POINTS:
+        return None
+    path, bound = reference
+    return f"{path}#bound" if bound else path
+
+
+def resolve_callable(path: str) -> Callable:
+    """Inverse of callable_path; refuses anything that is not a registered entry point."""
+    bound = path.endswith("#bound")
+    if path.removesuffix("#bound") not in TASK_ENTRY_POINTS:
+        raise ValueError(f"{path} is not a registered task entry point")
+    module_name, qualname = path.removesuffix("#bound").split(":", 1)
+    *owner_parts, attribute = qualname.split(".")
+    obj: Any = importlib.import_module(module_name)
+    for part in owner_parts:
+        obj = getattr(obj, part)
+    if bound:
+        obj = obj()
+    return getattr(obj, attribute)
+
+
+# ============================================
+# SERIALIZATION
+# ============================================
+
+PAYLOAD_VERSION = 1
+# Tag key of the JSON objects that encode non-JSON values
+TAG = "__t__"
+
+
+def _pack(value: Any) -> Any:
+    """JSON-compatible form of ``value``; raises TypeError for unsupported types."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError("object arrays are not supported in task payloads")
+        data = np.ascontiguousarray(value)
+        return {
+            TAG: "ndarray",
+            "dtype": data.dtype.str,
+            "shape": list(data.shape),
+            "data": base64.b64encode(data.tobytes()).decode("ascii"),
+        }
+    if isinstance(value, np.generic):
+        return _pack(value.item())
+    if isinstance(value, list):
+        return [_pack(item) for item in value]
+    if isinstance(value, tuple):
+        return {TAG: "tuple", "items": [_pack(item) for item in value]}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value) and TAG not in value:
+            return {key: _pack(item) for key, item in value.items()}
+        return {TAG: "dict", "items": [[_pack(key), _pack(item)] for key, item in value.items()]}
+    if isinstance(value, datetime):
+        return {TAG: "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {TAG: "date", "value": value.isoformat()}
+    if isinstance(value, PurePath):
+        return {TAG: "path", "value": str(value)}
+    raise TypeError(f"{type(value).__name__} is not supported in task payloads")
+
+
+def _packable(value: Any) -> bool:
+    """Whether _pack accepts ``value``, without encoding it."""
+    if isinstance(value, np.ndarray):
+        return not value.dtype.hasobject
+    if isinstance(value, (list, tuple)):
+        return all(_packable(item) for item in value)
+    if isinstance(value, dict):
+        return all(_packable(key) and _packable(item) for key, item in value.items())
+    return value is None or isinstance(value, (bool, int, float, str, np.generic, date, PurePath))
+
+
+def _unpack(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_unpack(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    tag = value.get(TAG)
+    if tag is None:
+        return {key: _unpack(item) for key, item in value.items()}
+    if tag == "ndarray":
+        data = np.frombuffer(base64.b64decode(value["data"]), dtype=np.dtype(value["dtype"]))
+        return data.reshape(value["shape"]).copy()
+    if tag == "tuple":
+        return tuple(_unpack(item) for item in value["items"])
+    if tag == "dict":
+        return {_unpack(key): _unpack(item) for key, item in value["items"]}
+    if tag == "datetime":
+        return datetime.fromisoformat(value["value"])
+    if tag == "date":
+        return date.fromisoformat(value["value"])
+    if tag == "path":
+        return Path(value["value"])
+    raise ValueError(f"Unknown payload tag: {tag}")
+
+
+def _dump(value: Any) -> str:
+    return json.dumps({"v": PAYLOAD_VERSION, "data": _pack(value)}, separators=(",", ":"))
+
+
+def _dump_or_empty(value: Any, what: str) -> str:
+    try:
+        return _dump(value)
+    except Exception as e:
+        logger.warning(f"[TaskStore] {what} is not serializable, not persisted: {e}")
+        return ""
+
+
+def _load(value: str | None) -> Any:
+    if not value:
+        return None
+    document = json.loads(value)
+    if not isinstance(document, dict) or document.get("v") != PAYLOAD_VERSION:
+        raise ValueError("Unsupported task payload version")
+    return _unpack(document["data"])
+
+
+def _load_or_none(value: str | None, what: str) -> Any:
+    try:
+        return _load(value)
+    except Exception as e:
+        logger.warning(f"[TaskStore] {what} is unreadable, ignored: {e}")
+        return None
+
+
+def _timestamp(value: datetime | None) -> str:
+    return value.isoformat() if value else ""
+
+
+def _datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def task_to_record(task: Task) -> dict[str, str]:
+    """Flat string mapping suitable for a Redis hash or a SQLite row."""
+    func = callable_path(task.func)
+    return {
+        "id": task.id,
+        "name": task.name,
+        "func": func or "",
+        # Arguments are only needed while another process may still run the task
+        "payload": _dump((task.args, task.kwargs)) if func and task.status not in TERMINAL_STATUSES else "",
+        "priority": str(task.priority.value),
+        "status": task.status.value,
+        "progress": str(task.progress),
+        "progress_message": task.progress_message,
+        "result": _dump_or_empty(task.result, "Result") if task.status == TaskStatus.COMPLETED else "",
+        "error": task.error or "",
+        "created_at": _timestamp(task.created_at),
+        "started_at": _timestamp(task.started_at),
+        "completed_at": _timestamp(task.completed_at),
+        "user_id": task.user_id or "",
+        "organization_id": task.organization_id or "",
+        "metadata": json.dumps(task.metadata, default=str),
+        "compute_type": task.compute_type.value if task.compute_type else "",
+        "deliveries": str(task.deliveries),
+    }
+
+
+def _unavailable(*args, **kwargs):
+    raise RuntimeError("Task function is not importable in this process")
+
+
+def task_from_record(record: dict[str, Any]) -> Task:
+    func: Callable = _unavailable
+    if record.get("func"):
+        try:
+            func = resolve_callable(record["func"])
+        except Exception as e:
+            logger.warning(f"[TaskStore] Cannot resolve {record['func']}: {e}")
+    payload = _load_or_none(record.get("payload"), "Payload")
+    if payload is None and record.get("payload"):
+        # Running without the submitted arguments would be wrong; fail the task instead
+        func = _unavailable
+    args, kwargs = payload or ((), {})
+    return Task(
+        id=record["id"],
+        name=record["name"],
+        func=func,
+        args=tuple(args),
+        kwargs=kwargs,
+        priority=TaskPriority(int(record.get("priority") or TaskPriority.NORMAL.value)),
+        status=TaskStatus(record["status"]),
+        progress=float(record.get("progress") or 0.0),
+        progress_message=record.get("progress_message") or "",
+        result=_load_or_none(record.get("result"), "Result"),
+        error=record.get("error") or None,
+        created_at=_datetime(record.get("created_at")) or datetime.now(UTC),
+        started_at=_datetime(record.get("started_at")),
+        completed_at=_datetime(record.get("completed_at")),
+        user_id=record.get("user_id") or None,
+        organization_id=record.get("organization_id") or None,
+        metadata=json.loads(record.get("metadata") or "{}"),
+        compute_type=ComputeType(record["compute_type"]) if record.get("compute_type") else None,
+        deliveries=int(record.get("deliveries") or 0),
+    )
+
+
+def is_dispatchable(task: Task) -> bool:
+    """Whether another process can pick this task up."""
+    return (
+        task.compute_type is not None
+        and callable_path(task.func) is not None
+        and _packable((task.args, task.kwargs))
+    )
+
+
+# ============================================
+# BACKENDS
+# ============================================
+
+class TaskBackend:
+    """
+    Storage and dispatch contract used by TaskQueue.
+
+    A delivered task must be acknowledged with ack(); until then it is
+    leased to the consumer for ``visibility_timeout`` seconds, renewed by
+    heartbeat(). Leases that run out are handed to the next reclaim().
+    """
+
+    name = "base"
+
+    def __init__(
+        self,
+        visibility_timeout: float | None = None,
+        result_ttl_hours: float | None = None,
+        max_deliveries: int | None = None,
+    ):
+        self.visibility_timeout = (
+            settings.TASK_VISIBILITY_TIMEOUT_SECONDS if visibility_timeout is None else visibility_timeout
+        )
+        self.result_ttl_seconds = int(
+            3600 * (settings.TASK_RESULT_TTL_HOURS if result_ttl_hours is None else result_ttl_hours)
+        )
+        self.max_deliveries = settings.TASK_MAX_DELIVERIES if max_deliveries is None else max_deliveries
+
+    async def initialize(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def save(self, task: Task) -> None:
+        raise NotImplementedError
+
+    async def update_progress(self, task: Task) -> None:
+        raise NotImplementedError
+
+    async def load(self, task_id: str) -> Task | None:
+        raise NotImplementedError
+
+    async def dispatch(self, task: Task) -> None:
+        raise NotImplementedError
+
+    async def claim(
+        self,
+        consumer: str,
+        compute_types: Iterable[ComputeType],
+        count: int = 1,
+        block_ms: int = 1000,
+    ) -> list[Task]:
+        raise NotImplementedError
+
+    async def heartbeat(self, consumer: str, task: Task) -> None:
+        raise NotImplementedError
+
+    async def ack(self, task: Task) -> None:
+        raise NotImplementedError
+
+    async def reclaim(self, consumer: str, compute_types: Iterable[ComputeType], count: int = 10) -> list[Task]:
+        raise NotImplementedError
+
+    async def purge_expired(self) -> int:
+        return 0
+
+    def _give_up(self, task: Task) -> bool:
+        """Mark a task failed once it has been delivered too often (poison job)."""
+        if task.deliveries <= self.max_deliveries:
+            return False
+        task.status = TaskStatus.FAILED
+        task.error = f"Abandoned after {task.deliveries - 1} deliveries without completion"
+        task.completed_at = datetime.now(UTC)
+        return True
+
+
+class RedisTaskBackend(TaskBackend):
+    """Task hashes in Redis, dispatch through Redis Streams consumer groups."""
+
+    name = "redis"
+
+    def __init__(self, client=None, prefix: str = "taskq", **kwargs):
+        super().__init__(**kwargs)
+        self._client = client
+        self.prefix = prefix
+
+    @property
+    def client(self):
+        if self._client is None:
+            from app.core.redis import redis_client
+
+            return redis_client._client
+        return self._client
+
+    def _task_key(self, task_id: str) -> str:
+        return f"{self.prefix}:task:{task_id}"
+
+    def _stream(self, compute_type: ComputeType, priority: TaskPriority) -> str:
+        return f"{self.prefix}:stream:{compute_type.value}:{priority.value}"
+
+    def _streams(self, compute_types: Iterable[ComputeType]) -> list[str]:
+        """Streams for the given types, highest priority first."""
+        return [
+            self._stream(compute_type, priority)
+            for priority in sorted(TaskPriority, reverse=True)
+            for compute_type in compute_types
+        ]
+
+    async def initialize(self) -> None:
+        for stream in self._streams(ComputeType):
+            try:
+                await self.client.xgroup_create(stream, CONSUMER_GROUP, id="0", mkstream=True)
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def save(self, task: Task) -> None:
+        key = self._task_key(task.id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=task_to_record(task))
+            if task.status in TERMINAL_STATUSES:
+                pipe.expire(key, self.result_ttl_seconds)
+            await pipe.execute()
+
+    async def update_progress(self, task: Task) -> None:
+        record = task_to_record(task)
+        await self.client.hset(self._task_key(task.id), mapping={field: record[field] for field in PROGRESS_FIELDS})
+
+    async def load(self, task_id: str) -> Task | None:
+        record = await self.client.hgetall(self._task_key(task_id))
+        return task_from_record(record) if record else None
+
+    async def dispatch(self, task: Task) -> None:
+        await self.save(task)
+        await self.client.xadd(self._stream(task.compute_type, task.priority), {"task_id": task.id})
+
+    async def _deliver(self, stream: str, entry_id: str, fields: dict[str, str]) -> Task | None:
+        """Turn a stream entry into a runnable task, dropping stale entries."""
+        task = await self.load(fields.get("task_id", ""))
+        if task is None or task.status in TERMINAL_STATUSES:
+            await self._ack_entry(stream, entry_id)
+            return None
+        task.delivery = (stream, entry_id)
+        task.deliveries += 1
+        if self._give_up(task):
+            await self.save(task)
+            await self._ack_entry(stream, entry_id)
+            return None
+        await self.client.hset(self._task_key(task.id), "deliveries", str(task.deliveries))
+        return task
+
+    async def claim(
+        self,
+        consumer: str,
+        compute_types: Iterable[ComputeType],
+        count: int = 1,
+        block_ms: int = 1000,
+    ) -> list[Task]:
+        streams = self._streams(compute_types)
+        # Poll by priority first so HIGH never waits behind LOW
+        for stream in streams:
+            response = await self.client.xreadgroup(CONSUMER_GROUP, consumer, {stream: ">"}, count=count)
+            tasks = await self._collect(response)
+            if tasks:
+                return tasks
+        response = await self.client.xreadgroup(
+            CONSUMER_GROUP, consumer, dict.fromkeys(streams, ">"), count=count, block=block_ms
+        )
+        return await self._collect(response)
+
+    async def _collect(self, response) -> list[Task]:
+        tasks = []
+        for stream, entries in response or []:
+            for entry_id, fields in entries:
+                task = await self._deliver(stream, entry_id, fields)
+                if task is not None:
+                    tasks.append(task)
+        return tasks
+
+    async def heartbeat(self, consumer: str, task: Task) -> None:
+        if task.delivery is None:
+            return
+        stream, entry_id = task.delivery
+        # Re-claiming our own entry resets its idle time
+        await self.client.xclaim(stream, CONSUMER_GROUP, consumer, 0, [entry_id], justid=True)
+
+    async def _ack_entry(self, stream: str, entry_id: str) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.xack(stream, CONSUMER_GROUP, entry_id)
+            pipe.xdel(stream, entry_id)
+            await pipe.execute()
+
+    async def ack(self, task: Task) -> None:
+        if task.delivery is not None:
+            await self._ack_entry(*task.delivery)
+            task.delivery = None
+
+    async def reclaim(self, consumer: str, compute_types: Iterable[ComputeType], count: int = 10) -> list[Task]:
+        min_idle_ms = int(self.visibility_timeout * 1000)
+        tasks = []
+        for stream in self._streams(compute_types):
+            response = await self.client.xautoclaim(
+                stream, CONSUMER_GROUP, consumer, min_idle_ms, start_id="0-0", count=count
+            )
+            for entry_id, fields in response[1]:
+                if fields is None:
+                    continue
+                task = await self._deliver(stream, entry_id, fields)
+                if task is not None:
+                    logger.warning(f"[TaskStore] Re-delivering {task.name} (id={task.id[:8]})")
+                    tasks.append(task)
+        return tasks
+
+
+class SQLiteTaskBackend(TaskBackend):
+    """
+    Single-file stand-in for the Redis backend.
+
+    Leases are rows with ``lease_owner``/``lease_until``; claiming runs in
+    an IMMEDIATE transaction so several processes can share the file.
+    """
+
+    name = "sqlite"
+
+    COLUMNS = (
+        "id", "name", "func", "payload", "priority", "status", "progress", "progress_message",
+        "result", "error", "created_at", "started_at", "completed_at", "user_id",
+        "organization_id", "metadata", "compute_type", "deliveries",
+    )
+
+    def __init__(self, path: str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path or settings.TASK_QUEUE_SQLITE_PATH or os.path.join(
+            tempfile.gettempdir(), "bijmantra-task-queue.db"
+        )
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    async def _run(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        def run():
+            connection = self._connect()
+            try:
+                return func(connection)
+            finally:
+                connection.close()
+
+        async with self._lock:
+            return await asyncio.to_thread(run)
+
+    async def initialize(self) -> None:
+        def create(connection: sqlite3.Connection):
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY, name TEXT, func TEXT, payload TEXT, priority INTEGER,
+                    status TEXT, progress REAL, progress_message TEXT, result TEXT, error TEXT,
+                    created_at TEXT, started_at TEXT, completed_at TEXT, user_id TEXT,
+                    organization_id TEXT, metadata TEXT, compute_type TEXT, deliveries INTEGER,
+                    queued INTEGER DEFAULT 0, lease_owner TEXT, lease_until REAL, expires_at REAL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_tasks_queue ON tasks (queued, compute_type, priority, created_at)"
+            )
+
+        await self._run(create)
+
+    def _upsert(self, connection: sqlite3.Connection, task: Task, queued: bool | None = None) -> None:
+        record = task_to_record(task)
+        expires_at = time.time() + self.result_ttl_seconds if task.status in TERMINAL_STATUSES else None
+        columns = [*self.COLUMNS, "expires_at"]
+        values = [record[column] for column in self.COLUMNS] + [expires_at]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != "id")
+        if queued is not None:
+            columns.append("queued")
+            values.append(int(queued))
+            updates += ", queued = excluded.queued, lease_owner = NULL, lease_until = NULL"
+        connection.execute(
+            f"INSERT INTO tasks ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}",
+            values,
+        )
+
+    async def save(self, task: Task) -> None:
+        await self._run(lambda connection: self._upsert(connection, task))
+
+    async def update_progress(self, task: Task) -> None:
+        record = task_to_record(task)
+        await self._run(
+            lambda connection: connection.execute(
+                f"UPDATE tasks SET {', '.join(f'{field} = ?' for field in PROGRESS_FIELDS)} WHERE id = ?",
+                (*(record[field] for field in PROGRESS_FIELDS), task.id),
+            )
+        )
+
+    async def load(self, task_id: str) -> Task | None:
+        row = await self._run(
+            lambda connection: connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        )
+        return task_from_record(dict(row)) if row else None
+
+    async def dispatch(self, task: Task) -> None:
+        await self._run(lambda connection: self._upsert(connection, task, queued=True))
+
+    def _lease(self, connection: sqlite3.Connection, consumer: str, where: str, params: tuple, count: int):
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                f"SELECT * FROM tasks WHERE queued = 1 AND {where} "
+                "ORDER BY priority DESC, created_at LIMIT ?",
+                (*params, count),
+            ).fetchall()
+            tasks = []
+            for row in rows:
+                task = task_from_record(dict(row))
+                task.deliveries += 1
+                task.delivery = (consumer, row["id"])
+                if task.status in TERMINAL_STATUSES or self._give_up(task):
+                    self._upsert(connection, task, queued=False)
+                    continue
+                connection.execute(
+                    "UPDATE tasks SET lease_owner = ?, lease_until = ?, deliveries = ? WHERE id = ?",
+                    (consumer, now + self.visibility_timeout, task.deliveries, task.id),
+                )
+                tasks.append(task)
+            connection.execute("COMMIT")
+            return tasks
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    async def claim(
+        self,
+        consumer: str,
+        compute_types: Iterable[ComputeType],
+        count: int = 1,
+        block_ms: int = 1000,
+    ) -> list[Task]:
+        types = tuple(compute_type.value for compute_type in compute_types)
+        if not types:
+            return []
+        where = f"lease_owner IS NULL AND compute_type IN ({', '.join('?' * len(types))})"
+        deadline = time.monotonic() + block_ms / 1000
+        while True:
+            tasks = await self._run(lambda connection: self._lease(connection, consumer, where, types, count))
+            if tasks or time.monotonic() >= deadline:
+                return tasks
+            await asyncio.sleep(min(0.1, max(0.0, deadline - time.monotonic())))
+
+    async def heartbeat(self, consumer: str, task: Task) -> None:
+        await self._run(
+            lambda connection: connection.execute(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND lease_owner = ?",
+                (time.time() + self.visibility_timeout, task.id, consumer),
+            )
+        )
+
+    async def ack(self, task: Task) -> None:
+        if task.delivery is None:
+            return
+        await self._run(
+            lambda connection: connection.execute(
+                "UPDATE tasks SET queued = 0, lease_owner = NULL, lease_until = NULL WHERE id = ?",
+                (task.id,),
+            )
+        )
+        task.delivery = None
+
+    async def reclaim(self, consumer: str, compute_types: Iterable[ComputeType], count: int = 10) -> list[Task]:
+        types = tuple(compute_type.value for compute_type in compute_types)
+        if not types:
+            return []
+        where = f"lease_until < ? AND compute_type IN ({', '.join('?' * len(types))})"
+        tasks = await self._run(
+            lambda connection: self._lease(connection, consumer, where, (time.time(), *types), count)
+        )
+        for task in tasks:
+            logger.warning(f"[TaskStore] Re-delivering {task.name} (id={task.id[:8]})")
+        return tasks
+
+    async def purge_expired(self) -> int:
+        return await self._run(
+            lambda connection: connection.execute(
+                "DELETE FROM tasks WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            ).rowcount
+        )
+
+
+def create_task_backend(name: str | None = None) -> TaskBackend | None:
+    """
+    Backend selected by TASK_QUEUE_BACKEND.
+
+    Returns None for "memory", and when Redis is requested but not connected
+    (the queue then keeps its in-process behaviour).
+    """
+    name = (name or settings.TASK_QUEUE_BACKEND).lower()
+    if name == "memory":
+        return None
+    if name == "sqlite":
+        return SQLiteTaskBackend()
+    if name == "redis":
+        from app.core.redis import redis_client
+
+        if not redis_client.is_available:
+            logger.warning("[TaskStore] Redis unavailable, task queue stays in-process")
+            return None
+        return RedisTaskBackend()
+    raise ValueError(f"Unknown TASK_QUEUE_BACKEND '{name}' (expected memory, redis or sqlite)")
@@ -5,12 +5,15 @@ This module handles startup/shutdown of all external services and connections.
 Extracted from main.py as part of Task 16.
 """
 
+import asyncio
+import contextlib
 import logging
 import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,8 +44,14 @@ async def initialize_meilisearch():
 async def initialize_task_queue():
     """Start background task queue."""
     try:
-        from app.services.task_queue import task_queue
-        await task_queue.start()
+        from app.core.config import settings
+        from app.services.task_queue import ComputeType, task_queue
+        compute_types = [
+            ComputeType(value.strip())
+            for value in settings.TASK_QUEUE_API_COMPUTE_TYPES.split(",")
+            if value.strip()
+        ]
+        await task_queue.start(compute_types=compute_types)
         logger.info("Task queue started")
     except Exception as e:
         logger.warning("TaskQueue initialization skipped: %s", e)
@@ -62,6 +71,177 @@ async def initialize_redis_security():
         logger.warning("Redis security storage initialization skipped: %s", e)
 
 
+def initialize_organization_counters() -> asyncio.Task | None:
+    """Attach counter flush hooks and start periodic reconciliation."""
+    try:
+        from app.modules.core.services.organization_counter_service import (
+            register_counter_hooks,
+            run_counter_reconciliation_loop,
+        )
+        register_counter_hooks()
+        logger.info("Organization counters enabled")
+        return asyncio.create_task(run_counter_reconciliation_loop())
+    except Exception as e:
+        logger.warning("Organization counters initialization skipped: %s", e)
+        return None
+
+
+async def shutdown_organization_counters(reconciliation_task: asyncio.Task | None):
+    """Stop the counter reconciliation loop and detach flush hooks."""
+    try:
+        from app.modules.core.services.organization_counter_service import unregister_counter_hooks
+        unregister_counter_hooks()
+    except Exception:
+        pass
+    if reconciliation_task is None:
+        return
+    reconciliation_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await reconciliation_task
+
+
+def initialize_result_artifact_purge() -> asyncio.Task | None:
+    """Start the loop that removes expired result artifacts and export files."""
+    try:
+        from app.modules.core.services.result_artifact_service import run_artifact_purge_loop
+        return asyncio.create_task(run_artifact_purge_loop())
+    except Exception as e:
+        logger.warning("Result artifact purge initialization skipped: %s", e)
+        return None
+
+
+async def shutdown_result_artifact_purge(purge_task: asyncio.Task | None):
+    """Stop the result artifact purge loop."""
+    if purge_task is None:
+        return
+    purge_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await purge_task
+
+
+def initialize_ai_quota_flush() -> asyncio.Task | None:
+    """Start the loop that flushes Redis AI quota counters to the database."""
+    try:
+        from app.core.redis import redis_client
+        if not redis_client.is_available:
+            return None
+        from app.modules.ai.services.quota import run_quota_flush_loop
+        return asyncio.create_task(run_quota_flush_loop())
+    except Exception as e:
+        logger.warning("AI quota flush initialization skipped: %s", e)
+        return None
+
+
+async def shutdown_ai_quota_flush(flush_task: asyncio.Task | None):
+    """Stop the AI quota flush loop and write out any remaining counters."""
+    if flush_task is None:
+        return
+    flush_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await flush_task
+    try:
+        from app.core.database import AsyncSessionLocal
+        from app.modules.ai.services.quota import AIQuotaService
+        async with AsyncSessionLocal() as db:
+            if db.bind.dialect.name == "postgresql":
+                from app.core.rls import set_tenant_context
+                await set_tenant_context(db, None, is_superuser=True)
+            await AIQuotaService.flush_usage(db)
+    except Exception as e:
+        logger.warning("Final AI quota flush failed: %s", e)
+
+
+def initialize_route_warmup(app: FastAPI) -> asyncio.Task | None:
+    """Mount deferred route groups and resolve all routes in the background."""
+    from app.core.config import settings
+
+    loader = getattr(app.state, "route_loader", None)
+    if loader is None or not settings.ROUTER_WARMUP:
+        return None
+    return asyncio.create_task(loader.warm_up())
+
+
+async def shutdown_route_warmup(warmup_task: asyncio.Task | None):
+    """Stop a route warm-up that is still running."""
+    if warmup_task is None:
+        return
+    warmup_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await warmup_task
+
+
+def initialize_trial_statistics():
+    """Attach the flush hook that maintains trial trait statistics."""
+    try:
+        from app.modules.phenotyping.services.trial_statistics_service import (
+            register_trial_statistics_hooks,
+        )
+        register_trial_statistics_hooks()
+        logger.info("Trial statistics enabled")
+    except Exception as e:
+        logger.warning("Trial statistics initialization skipped: %s", e)
+
+
+def shutdown_trial_statistics():
+    """Detach the trial statistics flush hook."""
+    try:
+        from app.modules.phenotyping.services.trial_statistics_service import (
+            unregister_trial_statistics_hooks,
+        )
+        unregister_trial_statistics_hooks()
+    except Exception:
+        pass
+
+
+def initialize_pagination_cache():
+    """Attach the flush hook that drops cached list totals and page anchors."""
+    try:
+        from app.core.pagination import register_pagination_hooks
+        register_pagination_hooks()
+    except Exception as e:
+        logger.warning("Pagination cache initialization skipped: %s", e)
+
+
+def shutdown_pagination_cache():
+    """Detach the pagination cache flush hook."""
+    try:
+        from app.core.pagination import unregister_pagination_hooks
+        unregister_pagination_hooks()
+    except Exception:
+        pass
+
+
+def initialize_pedigree_index_cache():
+    """Attach the write hooks that drop cached pedigree indexes."""
+    try:
+        from app.modules.breeding.services.pedigree_index_service import (
+            register_pedigree_index_hooks,
+        )
+        register_pedigree_index_hooks()
+    except Exception as e:
+        logger.warning("Pedigree index cache initialization skipped: %s", e)
+
+
+def shutdown_pedigree_index_cache():
+    """Detach the pedigree index write hooks."""
+    try:
+        from app.modules.breeding.services.pedigree_index_service import (
+            unregister_pedigree_index_hooks,
+        )
+        unregister_pedigree_index_hooks()
+    except Exception:
+        pass
+
+
+async def shutdown_weather_client():
+    """Close the pooled Open-Meteo HTTP client."""
+    try:
+        from app.modules.environment.services.weather_integration_service import weather_client
+        await weather_client.aclose()
+    except Exception:
+        pass
+
+
 async def shutdown_redis():
     """Disconnect Redis on shutdown."""
     try:
@@ -86,22 +266,38 @@ async def shutdown_task_queue():
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup/shutdown events.
-    
+
     This replaces the old @app.on_event("startup") and @app.on_event("shutdown")
     decorators with the modern lifespan pattern.
     """
     # Startup
     logger.info("Starting up Bijmantra API...")
-    
+
     await initialize_redis()
     await initialize_meilisearch()
     await initialize_task_queue()
     await initialize_redis_security()
-    
+    counter_reconciliation = initialize_organization_counters()
+    quota_flush = initialize_ai_quota_flush()
+    artifact_purge = initialize_result_artifact_purge()
+    initialize_trial_statistics()
+    initialize_pagination_cache()
+    initialize_pedigree_index_cache()
+    route_warmup = initialize_route_warmup(app)
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down Bijmantra API...")
-    
-    await shutdown_redis()
+
+    await shutdown_route_warmup(route_warmup)
+    shutdown_pedigree_index_cache()
+    shutdown_pagination_cache()
+    shutdown_trial_statistics()
+    await shutdown_organization_counters(counter_reconciliation)
+    await shutdown_ai_quota_flush(quota_flush)
+    await shutdown_result_artifact_purge(artifact_purge)
+    # Task queue first: a Redis-backed queue persists in-flight state on stop
     await shutdown_task_queue()
+    await shutdown_weather_client()
+    await shutdown_redis()
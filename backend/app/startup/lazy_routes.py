@@ -0,0 +1,262 @@
+"""
+Timed and lazily mounted route groups.
+
+Route registration is split into ordered groups (see app/startup/routes.py).
+Each group's registration is timed, per group (imports included) and per
+included router, for the startup profile report.
+
+With ``ROUTER_LOADING=lazy`` only eager groups are registered at import. The
+rest are mounted by ``LazyRouteMiddleware`` when a request arrives for one of
+their path prefixes, and in the background once the app has started. Groups
+are registered into a staging router in a worker thread, so their imports do
+not block the event loop, and then spliced into the app's route table in
+registration order. The first match for any path is therefore the same as in
+an eager app.
+
+With ``ROUTER_WARMUP`` (either loading mode) the warm-up also resolves every
+route's FastAPI state in a worker thread, which FastAPI otherwise does on the
+first request that walks past each included router.
+
+Every route a group registers must start with one of its declared prefixes,
+otherwise a request for it can be answered 404 before the group is loaded.
+Routers that bring their own startup handlers or lifespan belong in an eager
+group, since they are merged into the app only when included at import.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import APIRouter, FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RouteGroup:
+    """A registration function and the path prefixes all of its routes live under."""
+
+    name: str
+    register: Callable[[Any], None]
+    prefixes: tuple[str, ...]
+    eager: bool = False
+
+    def covers(self, path: str) -> bool:
+        return any(
+            path == prefix or path.startswith(prefix.rstrip("/") + "/") for prefix in self.prefixes
+        )
+
+
+@dataclass
+class GroupRegistration:
+    """Timing of one group's registration."""
+
+    name: str
+    ms: float = 0.0
+    routes: int = 0
+    trigger: str = "startup"
+    routers: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "ms": round(self.ms, 1),
+            "routes": self.routes,
+            "trigger": self.trigger,
+            "error": self.error,
+            "routers": self.routers,
+        }
+
+
+def _count_routes(routes: list[Any]) -> int:
+    """Routes in ``routes``, counting into included routers (kept nested by newer FastAPI)."""
+    return sum(
+        _count_routes(route.original_router.routes) if hasattr(route, "original_router") else 1
+        for route in routes
+    )
+
+
+class _TimedRegistrar:
+    """Stands in for the app during registration and times each include_router call."""
+
+    def __init__(self, target: FastAPI | APIRouter, registration: GroupRegistration):
+        self._target = target
+        self._registration = registration
+
+    def include_router(self, router: APIRouter, **kwargs: Any) -> None:
+        routes_before = len(self._target.routes)
+        started_at = time.perf_counter()
+        self._target.include_router(router, **kwargs)
+        endpoint = next((getattr(r, "endpoint", None) for r in router.routes), None)
+        self._registration.routers.append(
+            {
+                "module": getattr(endpoint, "__module__", None),
+                "prefix": kwargs.get("prefix", "") + router.prefix,
+                "routes": _count_routes(self._target.routes[routes_before:]),
+                "ms": round((time.perf_counter() - started_at) * 1000, 2),
+            }
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target, name)
+
+
+def _register(group: RouteGroup, target: FastAPI | APIRouter, trigger: str) -> GroupRegistration:
+    registration = GroupRegistration(name=group.name, trigger=trigger)
+    routes_before = len(target.routes)
+    started_at = time.perf_counter()
+    try:
+        group.register(_TimedRegistrar(target, registration))
+    except Exception as e:
+        registration.error = f"{type(e).__name__}: {e}"
+        logger.exception("Route group %s failed to register", group.name)
+    registration.ms = (time.perf_counter() - started_at) * 1000
+    registration.routes = _count_routes(target.routes[routes_before:])
+    return registration
+
+
+def _prime(routes: list[Any], stop: threading.Event) -> int:
+    """
+    Build FastAPI's per-include route state ahead of the first request.
+
+    Included routers resolve their routes (dependants, parameter and response
+    fields) on first match, and a match walks every router registered before
+    the one it hits, so without this the first request to a late route pays
+    for most of the app. Returns the number of routes resolved.
+    """
+    resolved = 0
+    for route in routes:
+        if stop.is_set():
+            break
+        effective_candidates = getattr(route, "effective_candidates", None)
+        if effective_candidates is None:
+            continue
+        candidates = effective_candidates()
+        route.effective_low_priority_routes()
+        resolved += len(candidates) + _prime(candidates, stop)
+    return resolved
+
+
+class RouteGroupLoader:
+    """Registers route groups on an app, eagerly or on demand."""
+
+    def __init__(self, app: FastAPI, groups: list[RouteGroup]):
+        self.app = app
+        self.groups = groups
+        self.registrations: dict[str, GroupRegistration] = {}
+        self._order: dict[int, int] = {}
+        self._lock: asyncio.Lock | None = None
+        self.primed_ms: float | None = None
+
+    @property
+    def pending(self) -> list[RouteGroup]:
+        return [group for group in self.groups if group.name not in self.registrations]
+
+    def register_all(self) -> None:
+        """Register every group now, in order."""
+        for group in self.groups:
+            self.registrations[group.name] = _register(group, self.app, "startup")
+
+    def register_eager(self) -> None:
+        """Register eager groups now; the rest wait for a request or the warm-up."""
+        self._order = {id(route): -1 for route in self.app.router.routes}
+        for index, group in enumerate(self.groups):
+            if group.eager:
+                registration = _register(group, self.app, "startup")
+                self._tag(self.app.router.routes, index)
+                self.registrations[group.name] = registration
+
+    async def ensure_loaded(self, path: str | None, trigger: str) -> None:
+        """Load pending groups covering ``path`` (every pending group for ``None``)."""
+        if not any(path is None or group.covers(path) for group in self.pending):
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            for group in self.pending:
+                if path is None or group.covers(path):
+                    await self._load(group, trigger)
+
+    async def _load(self, group: RouteGroup, trigger: str) -> None:
+        staging = APIRouter()
+        registration = await asyncio.to_thread(_register, group, staging, trigger)
+        index = self.groups.index(group)
+        self._tag(staging.routes, index)
+
+        routes = self.app.router.routes
+        routes.extend(staging.routes)
+        # Stable sort: routes defined on the app itself stay first, groups keep their order
+        routes.sort(key=lambda route: self._order.get(id(route), -1))
+        # FastAPI caches resolved routes per router version
+        mark_changed = getattr(self.app.router, "_mark_routes_changed", None)
+        if mark_changed is not None:
+            mark_changed()
+        self.app.openapi_schema = None
+        self.registrations[group.name] = registration
+        logger.info(
+            "Mounted route group %s (%d routes, %.0fms, %s)",
+            group.name,
+            registration.routes,
+            registration.ms,
+            trigger,
+        )
+
+    def _tag(self, routes: list[Any], index: int) -> None:
+        for route in routes:
+            self._order.setdefault(id(route), index)
+
+    async def warm_up(self) -> None:
+        """Mount every pending group, then resolve all routes, in the background."""
+        for group in self.pending:
+            await self.ensure_loaded(group.prefixes[0], "warm-up")
+            await asyncio.sleep(0)
+        await self.ensure_loaded(None, "warm-up")
+
+        stop = threading.Event()
+        started_at = time.perf_counter()
+        try:
+            resolved = await asyncio.to_thread(_prime, list(self.app.router.routes), stop)
+        finally:
+            # A cancelled warm-up must not keep the thread busy through shutdown
+            stop.set()
+        self.primed_ms = (time.perf_counter() - started_at) * 1000
+        logger.info("Resolved %d routes in %.0fms", resolved, self.primed_ms)
+
+    def profile(self) -> dict[str, Any]:
+        registered = [
+            self.registrations[group.name]
+            for group in self.groups
+            if group.name in self.registrations
+        ]
+        return {
+            "groups": [registration.to_dict() for registration in registered],
+            "pending": [group.name for group in self.pending],
+            "total_ms": round(sum(r.ms for r in registered), 1),
+            "routes": sum(r.routes for r in registered),
+            "primed_ms": None if self.primed_ms is None else round(self.primed_ms, 1),
+        }
+
+
+class LazyRouteMiddleware:
+    """Mounts the route groups a request's path needs before routing it."""
+
+    def __init__(self, app: ASGIApp, loader: RouteGroupLoader):
+        self.app = app
+        self.loader = loader
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and self.loader.pending:
+            path = scope["path"]
+            # The schema documents every route, so it needs every group
+            wants_all = path == self.loader.app.openapi_url
+            await self.loader.ensure_loaded(None if wants_all else path, f"request {path}")
+        await self.app(scope, receive, send)
@@ -176,14 +176,20 @@ def add_audit_middleware(app: FastAPI):
 
 
 def add_route_profiler_middleware(app: FastAPI):
-    """Add route profiler middleware (development only)."""
-    if os.getenv("ENVIRONMENT", "development") == "development":
-        try:
-            from app.middleware.route_profiler import RouteProfilerMiddleware
-            app.add_middleware(RouteProfilerMiddleware)
-            logger.info("Route profiler middleware enabled")
-        except Exception as e:
-            logger.warning("Route profiler unavailable: %s", e)
+    """Add request profiling middleware (per-request lines are logged in development only)."""
+    if not settings.REQUEST_PROFILING_ENABLED:
+        return
+    try:
+        from app.core.request_profiling import instrument_response_serialization
+        from app.middleware.route_profiler import RouteProfilerMiddleware
+        instrument_response_serialization()
+        app.add_middleware(
+            RouteProfilerMiddleware,
+            log_requests=os.getenv("ENVIRONMENT", "development") == "development",
+        )
+        logger.info("Route profiler middleware enabled")
+    except Exception as e:
+        logger.warning("Route profiler unavailable: %s", e)
 
 
 def add_security_middleware(app: FastAPI):
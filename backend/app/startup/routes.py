@@ -9,6 +9,9 @@ import logging
 
 from fastapi import FastAPI
 
+from app.core.config import settings
+from app.startup.lazy_routes import LazyRouteMiddleware, RouteGroup, RouteGroupLoader
+
 logger = logging.getLogger(__name__)
 
 
@@ -399,28 +402,44 @@ def register_robotics_routes(app: FastAPI):
         logger.warning("Robotics routes disabled due to missing dependencies: %s", robotics_import_error)
 
 
+# Registration order is route precedence. Every route a group registers must
+# start with one of its prefixes (see app/startup/lazy_routes.py).
+ROUTE_GROUPS = [
+    RouteGroup("core", register_core_routes, ("/api/auth", "/api/v2/core", "/api/v1"), eager=True),
+    RouteGroup("brapi", register_brapi_routes, ("/brapi/v2",)),
+    RouteGroup("domain", register_domain_routes, ("/api/v2", "/plant-sciences")),
+    RouteGroup("apex", register_apex_routes, ("/api/v2",)),
+    RouteGroup("pwa", register_pwa_routes, ("/api/v2",)),
+    RouteGroup("division", register_division_routes, ("/api/v2",)),
+    RouteGroup("feature", register_feature_routes, ("/api/v2",)),
+    RouteGroup("future", register_future_routes, ("/api/v2/future",)),
+    RouteGroup("iot", register_iot_routes, ("/api/v2/iot",)),
+    RouteGroup("economics", register_economics_routes, ("/api/v2/economics",)),
+    RouteGroup("biosimulation", register_biosimulation_routes, ("/api/v2/biosimulation",)),
+    RouteGroup("trial_summary", register_trial_summary_routes, ("/api/v2",)),
+    RouteGroup("performance", register_performance_routes, ("/api/v2",)),
+    RouteGroup("robotics", register_robotics_routes, ("/api/v2/robotics",)),
+]
+
+
 def register_all_routes(app: FastAPI):
     """
     Register all application routes.
     
     This is the main entry point for route registration.
-    Routes are organized by domain and responsibility.
+    Routes are organized by domain and responsibility. With ROUTER_LOADING=lazy
+    only eager groups are registered here; the rest are mounted on first use
+    and warmed up in the background after startup.
     """
     logger.info("Registering routes...")
-    
-    register_core_routes(app)
-    register_brapi_routes(app)
-    register_domain_routes(app)
-    register_apex_routes(app)
-    register_pwa_routes(app)
-    register_division_routes(app)
-    register_feature_routes(app)
-    register_future_routes(app)
-    register_iot_routes(app)
-    register_economics_routes(app)
-    register_biosimulation_routes(app)
-    register_trial_summary_routes(app)
-    register_performance_routes(app)
-    register_robotics_routes(app)
-    
-    logger.info("All routes registered successfully")
+
+    loader = RouteGroupLoader(app, ROUTE_GROUPS)
+    app.state.route_loader = loader
+
+    if settings.ROUTER_LOADING == "lazy":
+        loader.register_eager()
+        app.add_middleware(LazyRouteMiddleware, loader=loader)
+        logger.info("Deferred route groups: %s", ", ".join(g.name for g in loader.pending))
+    else:
+        loader.register_all()
+        logger.info("All routes registered successfully")
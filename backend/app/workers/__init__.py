@@ -3,9 +3,16 @@ Compute Workers for Bijmantra
 Isolated worker processes for compute operations
 """
 
-from .light_worker import LightComputeWorker
-from .heavy_worker import HeavyComputeWorker
-from .gpu_worker import GPUComputeWorker
+from app.core.lazy_imports import lazy_exports
+
+
+_EXPORTS = {
+    "LightComputeWorker": ".light_worker",
+    "HeavyComputeWorker": ".heavy_worker",
+    "GPUComputeWorker": ".gpu_worker",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     "LightComputeWorker",
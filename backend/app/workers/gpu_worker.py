@@ -16,6 +16,8 @@ from typing import Any
 
 from app.core.redis import redis_client
 from app.services.task_queue import ComputeType, TaskStatus, task_queue
+from app.workers.hooks import register_write_hooks, unregister_write_hooks
+from app.workers.preload import preload_worker_modules
 
 
 logger = logging.getLogger(__name__)
@@ -51,12 +53,18 @@ class GPUComputeWorker:
         if not self.gpu_available:
             logger.warning(f"[{self.worker_id}] GPU {self.gpu_id} not available, worker will run in CPU fallback mode")
         
+        # Import this worker type's compute stack before taking jobs
+        preload_worker_modules(ComputeType.GPU_COMPUTE)
+
+        # Keep counters and trial statistics in step with job writes
+        register_write_hooks()
+
         # Connect to Redis
         await redis_client.connect()
         
         # Start task queue with very low concurrency for GPU operations
         task_queue._max_concurrent = self.max_concurrent
-        await task_queue.start()
+        await task_queue.start(compute_types=[ComputeType.GPU_COMPUTE])
         
         self.running = True
         
@@ -76,6 +84,7 @@ class GPUComputeWorker:
         
         # Stop task queue
         await task_queue.stop()
+        unregister_write_hooks()
         
         # Unregister worker
         await self._unregister_worker()
@@ -16,6 +16,8 @@ from typing import Any
 
 from app.core.redis import redis_client
 from app.services.task_queue import ComputeType, TaskStatus, task_queue
+from app.workers.hooks import register_write_hooks, unregister_write_hooks
+from app.workers.preload import preload_worker_modules
 
 
 logger = logging.getLogger(__name__)
@@ -43,12 +45,18 @@ class HeavyComputeWorker:
         """Start the heavy compute worker"""
         logger.info(f"[{self.worker_id}] Starting heavy compute worker (max_concurrent={self.max_concurrent})")
         
+        # Import this worker type's compute stack before taking jobs
+        preload_worker_modules(ComputeType.HEAVY_COMPUTE)
+
+        # Keep counters and trial statistics in step with job writes
+        register_write_hooks()
+
         # Connect to Redis
         await redis_client.connect()
         
         # Start task queue with lower concurrency for heavy operations
         task_queue._max_concurrent = self.max_concurrent
-        await task_queue.start()
+        await task_queue.start(compute_types=[ComputeType.HEAVY_COMPUTE])
         
         self.running = True
         
@@ -68,6 +76,7 @@ class HeavyComputeWorker:
         
         # Stop task queue
         await task_queue.stop()
+        unregister_write_hooks()
         
         # Unregister worker
         await self._unregister_worker()
@@ -0,0 +1,36 @@
+"""
+Worker write hooks
+
+Jobs write through the same ORM models as the API, so a worker attaches the
+same flush hooks that keep derived tables in step with those writes
+(organization counters, trial trait statistics). The API process attaches them
+in its lifespan; without them here, job writes would only show up in the
+counters at the next reconciliation.
+"""
+
+import logging
+
+from app.modules.core.services.organization_counter_service import (
+    register_counter_hooks,
+    unregister_counter_hooks,
+)
+from app.modules.phenotyping.services.trial_statistics_service import (
+    register_trial_statistics_hooks,
+    unregister_trial_statistics_hooks,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def register_write_hooks() -> None:
+    """Attach the derived-table flush hooks (idempotent)."""
+    register_counter_hooks()
+    register_trial_statistics_hooks()
+    logger.info("Worker write hooks attached")
+
+
+def unregister_write_hooks() -> None:
+    """Detach the derived-table flush hooks."""
+    unregister_trial_statistics_hooks()
+    unregister_counter_hooks()
@@ -15,6 +15,8 @@ from typing import Any
 
 from app.core.redis import redis_client
 from app.services.task_queue import ComputeType, TaskStatus, task_queue
+from app.workers.hooks import register_write_hooks, unregister_write_hooks
+from app.workers.preload import preload_worker_modules
 
 
 logger = logging.getLogger(__name__)
@@ -42,12 +44,18 @@ class LightComputeWorker:
         """Start the light compute worker"""
         logger.info(f"[{self.worker_id}] Starting light compute worker (max_concurrent={self.max_concurrent})")
         
+        # Import this worker type's compute stack before taking jobs
+        preload_worker_modules(ComputeType.LIGHT_PYTHON)
+
+        # Keep counters and trial statistics in step with job writes
+        register_write_hooks()
+
         # Connect to Redis
         await redis_client.connect()
         
         # Start task queue with high concurrency
         task_queue._max_concurrent = self.max_concurrent
-        await task_queue.start()
+        await task_queue.start(compute_types=[ComputeType.LIGHT_PYTHON])
         
         self.running = True
         
@@ -67,6 +75,7 @@ class LightComputeWorker:
         
         # Stop task queue
         await task_queue.stop()
+        unregister_write_hooks()
         
         # Unregister worker
         await self._unregister_worker()
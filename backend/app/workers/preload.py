@@ -0,0 +1,40 @@
+"""
+Worker import profiles
+
+Workers resolve job callables by import path when a job arrives, so a worker
+process only imports the modules its own jobs use. The modules listed for a
+compute type are imported once at start instead, before the worker takes
+jobs, so the first heavy job does not also pay for loading the compute stack.
+"""
+
+import importlib
+import logging
+import time
+
+from app.services.task_queue import ComputeType
+
+
+logger = logging.getLogger(__name__)
+
+WORKER_PRELOAD_MODULES: dict[ComputeType, tuple[str, ...]] = {
+    ComputeType.LIGHT_PYTHON: (),
+    ComputeType.HEAVY_COMPUTE: ("app.services.compute_engine", "app.services.compute_kernels"),
+    ComputeType.GPU_COMPUTE: ("app.services.compute_engine",),
+}
+
+
+def preload_worker_modules(compute_type: ComputeType) -> dict[str, float]:
+    """Import the modules a worker of ``compute_type`` needs; returns ms per module."""
+    timings: dict[str, float] = {}
+    for module_name in WORKER_PRELOAD_MODULES.get(compute_type, ()):
+        started_at = time.perf_counter()
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            logger.warning("Worker preload of %s failed: %s", module_name, e)
+            continue
+        timings[module_name] = round((time.perf_counter() - started_at) * 1000, 1)
+
+    if timings:
+        logger.info("Preloaded %s worker modules: %s", compute_type.value, timings)
+    return timings
@@ -0,0 +1,742 @@
+"""Benchmark suite for the numerical core, with regression tracking.
+
+Runs the compute engine, GWAS, genomic selection, cross prediction, GxE
+scoring, spatial correction, kinship, LD and pedigree paths on synthetic
+data at a chosen scale, and records per operation:
+
+* wall time   — median and best of ``--repeats`` runs after one warm-up run
+                (which also covers kernel auto-tuning on first use)
+* peak RSS    — high-water mark of the process running the operation, and
+                how far the operation raised it above its inputs
+* allocations — tracemalloc peak of one extra traced run (NumPy reports its
+                buffers to tracemalloc), and the blocks that run left allocated
+
+Each operation runs in a fresh spawned process by default, so peak RSS
+belongs to that operation; ``--in-process`` trades that for speed.
+
+The synthetic data is deterministic for a given scale and seed:
+
+* genotypes   — biallelic 0/1/2 calls from two haplotypes per individual,
+                correlated along each chromosome so that LD decays with
+                physical distance; phenotypes from a few hundred QTL
+* trials      — genotype x environment means with environment-dependent
+                genotype sensitivity (GxE) on top of main effects
+* field       — a plot grid with a smooth spatial trend and row gradient
+* pedigree    — founders plus random matings over several generations
+
+Results are written as JSON (``--output``) and compared against the entry for
+the same scale in ``--baseline`` (default ``test_reports/compute_benchmark_
+baseline.json``). An operation regresses when its best wall time grows by
+more than ``--time-tolerance`` and ``--min-delta-ms``, or its allocation peak
+by more than ``--memory-tolerance`` and 1 MB. ``--update-baseline`` stores
+the run as the new baseline for its scale.
+
+Usage:
+    python scripts/benchmark_compute.py --scale small
+    python scripts/benchmark_compute.py --scale medium --only engine.,gwas. --output bench.json
+    python scripts/benchmark_compute.py --scale small --fail-on-regression
+    python scripts/benchmark_compute.py --scale small --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+# Ensure `app` imports resolve when run as a standalone script.
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DEFAULT_BASELINE = PROJECT_ROOT / "test_reports" / "compute_benchmark_baseline.json"
+
+
+@dataclass(frozen=True)
+class Scale:
+    samples: int
+    markers: int
+    ld_markers: int  # markers in all-pairs LD paths
+    scan_markers: int  # markers in per-marker loop paths (MLM GWAS)
+    reml_samples: int
+    parents: int
+    trial: tuple[int, int]  # genotypes x environments
+    field: tuple[int, int]  # rows x columns
+    pedigree: tuple[int, int, int]  # founders, generations, individuals per generation
+
+
+SCALES = {
+    "small": Scale(300, 3_000, 500, 200, 300, 60, (40, 8), (20, 20), (50, 4, 100)),
+    "medium": Scale(1_000, 10_000, 1_500, 500, 600, 200, (200, 20), (50, 40), (200, 6, 500)),
+    "large": Scale(2_500, 20_000, 3_000, 1_000, 1_200, 500, (500, 40), (100, 60), (500, 8, 1_500)),
+}
+
+
+# =============================================================================
+# Synthetic data
+# =============================================================================
+
+
+def genotype_matrix(
+    n_samples: int,
+    n_markers: int,
+    rng: np.random.Generator,
+    n_chromosomes: int = 5,
+    mean_spacing: float = 5_000.0,
+    ld_range: float = 50_000.0,
+) -> tuple[np.ndarray, list[str], list[int]]:
+    """
+    0/1/2 genotypes (samples x markers) with LD decaying along each chromosome.
+
+    Every haplotype carries a latent Gaussian walk along the chromosome whose
+    correlation between neighbouring markers is exp(-gap / ld_range); an
+    allele is called where the walk falls below the marker's frequency
+    quantile, so allele frequencies follow a U-shaped Beta spectrum.
+    """
+    from scipy.stats import norm
+
+    gaps = rng.exponential(mean_spacing, n_markers)
+    chromosome = np.arange(n_markers) * n_chromosomes // n_markers
+    starts = np.r_[True, chromosome[1:] != chromosome[:-1]]
+    positions = np.empty(n_markers, dtype=np.int64)
+    for c in range(n_chromosomes):
+        on_chromosome = chromosome == c
+        positions[on_chromosome] = np.cumsum(gaps[on_chromosome]).astype(np.int64)
+    rho = np.where(starts, 0.0, np.exp(-gaps / ld_range))
+    thresholds = norm.ppf(rng.beta(0.8, 0.8, n_markers).clip(0.02, 0.98))
+
+    genotypes = np.empty((n_samples, n_markers))
+    walk = np.zeros(2 * n_samples)
+    for j in range(n_markers):
+        walk = rho[j] * walk + np.sqrt(1.0 - rho[j] ** 2) * rng.standard_normal(2 * n_samples)
+        alleles = walk < thresholds[j]
+        genotypes[:, j] = alleles[:n_samples].astype(float) + alleles[n_samples:]
+
+    chromosomes = [f"chr{c + 1}" for c in chromosome]
+    return genotypes, chromosomes, positions.tolist()
+
+
+def phenotypes_from(
+    genotypes: np.ndarray,
+    rng: np.random.Generator,
+    n_qtl: int = 200,
+    heritability: float = 0.5,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Phenotypes and true marker effects for a trait with ``n_qtl`` QTL."""
+    n_markers = genotypes.shape[1]
+    effects = np.zeros(n_markers)
+    qtl = rng.choice(n_markers, size=min(n_qtl, n_markers), replace=False)
+    effects[qtl] = rng.normal(0.0, 1.0, len(qtl))
+    genetic = genotypes @ effects
+    genetic_var = max(float(np.var(genetic)), 1e-12)
+    noise = rng.normal(0.0, np.sqrt(genetic_var * (1 - heritability) / heritability), len(genetic))
+    return 10.0 + genetic + noise, effects
+
+
+def multi_environment_trial(n_genotypes: int, n_environments: int, rng: np.random.Generator):
+    """Yield means (genotypes x environments) with main effects and GxE."""
+    genotype_effect = rng.normal(0.0, 0.5, n_genotypes)
+    environment_effect = rng.normal(0.0, 1.5, n_environments)
+    sensitivity = rng.normal(1.0, 0.2, n_genotypes)
+    return (
+        5.0
+        + genotype_effect[:, None]
+        + sensitivity[:, None] * environment_effect[None, :]
+        + rng.normal(0.0, 0.3, (n_genotypes, n_environments))
+    )
+
+
+def field_trial(n_rows: int, n_cols: int, rng: np.random.Generator) -> list[dict[str, Any]]:
+    """Plot records with a smooth spatial trend, a row gradient, row effects and noise."""
+    rows, cols = np.meshgrid(np.arange(1, n_rows + 1), np.arange(1, n_cols + 1), indexing="ij")
+    trend = (
+        np.sin(rows / n_rows * np.pi) * np.cos(cols / n_cols * 2 * np.pi)
+        + 0.02 * rows
+    )
+    row_effect = rng.normal(0.0, 0.3, n_rows)[:, None]
+    values = 5.0 + trend + row_effect + rng.normal(0.0, 0.4, rows.shape)
+    return [
+        {"row": int(r), "column": int(c), "value": float(v)}
+        for r, c, v in zip(rows.ravel(), cols.ravel(), values.ravel(), strict=True)
+    ]
+
+
+def pedigree(
+    n_founders: int, n_generations: int, per_generation: int, rng: np.random.Generator
+) -> list[dict[str, Any]]:
+    """Founders plus random bi-parental matings within the previous two generations."""
+    records = [{"id": f"F{i}", "sire_id": None, "dam_id": None} for i in range(n_founders)]
+    previous = [r["id"] for r in records]
+    candidates = previous
+    for gen in range(1, n_generations + 1):
+        current = []
+        for i in range(per_generation):
+            sire, dam = rng.choice(len(candidates), size=2, replace=False)
+            current.append(
+                {"id": f"G{gen}-{i}", "sire_id": candidates[sire], "dam_id": candidates[dam]}
+            )
+        records.extend(current)
+        candidates = previous + [r["id"] for r in current]
+        previous = [r["id"] for r in current]
+    return records
+
+
+class Dataset:
+    """Synthetic inputs for one scale, generated on first use."""
+
+    def __init__(self, scale: Scale, seed: int = 0):
+        self.scale = scale
+        self.seed = seed
+
+    def _rng(self, stream: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, stream])
+
+    @cached_property
+    def genotypes(self) -> tuple[np.ndarray, list[str], list[int]]:
+        return genotype_matrix(self.scale.samples, self.scale.markers, self._rng(1))
+
+    @cached_property
+    def phenotypes(self) -> np.ndarray:
+        return phenotypes_from(self.genotypes[0], self._rng(2))[0]
+
+    @cached_property
+    def marker_names(self) -> list[str]:
+        return [f"SNP{j:06d}" for j in range(self.scale.markers)]
+
+    @cached_property
+    def grm(self) -> np.ndarray:
+        from app.services.compute_engine import compute_engine
+
+        return compute_engine.compute_grm(self.genotypes[0]).matrix
+
+    @cached_property
+    def trial(self) -> np.ndarray:
+        return multi_environment_trial(*self.scale.trial, self._rng(3))
+
+    @cached_property
+    def field(self) -> list[dict[str, Any]]:
+        return field_trial(*self.scale.field, self._rng(4))
+
+    @cached_property
+    def pedigree(self) -> list[dict[str, Any]]:
+        return pedigree(*self.scale.pedigree, self._rng(5))
+
+    def marker_subset(self, count: int):
+        """The first ``count`` markers with their names, chromosomes and positions."""
+        genotypes, chromosomes, positions = self.genotypes
+        return (
+            np.ascontiguousarray(genotypes[:, :count]),
+            self.marker_names[:count],
+            chromosomes[:count],
+            positions[:count],
+        )
+
+
+# =============================================================================
+# Benchmark cases
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    prepare: Callable[[Dataset], Callable[[], Any]]  # input setup; returns the timed call
+
+
+def _engine_cases() -> list[Case]:
+    from app.services.compute_engine import compute_engine as engine
+
+    def reml(d: Dataset):
+        n = d.scale.reml_samples
+        y = d.phenotypes[:n]
+        G = d.grm[:n, :n] + np.eye(n) * 0.001
+        return lambda: engine.estimate_variance_components(y, np.ones((n, 1)), np.eye(n), G)
+
+    def ld(d: Dataset):
+        genotypes = d.marker_subset(d.scale.ld_markers)[0]
+        return lambda: engine.compute_ld_matrix(genotypes)
+
+    return [
+        Case("engine.grm", lambda d: lambda: engine.compute_grm(d.genotypes[0])),
+        Case(
+            "engine.gblup",
+            lambda d: lambda: engine.compute_gblup(d.genotypes[0], d.phenotypes, 0.5),
+        ),
+        Case("engine.reml", reml),
+        Case("engine.ld_matrix", ld),
+        Case("engine.pca", lambda d: lambda: engine.compute_pca(d.genotypes[0], 10)),
+        Case("engine.stability", lambda d: lambda: engine.compute_stability(d.trial)),
+    ]
+
+
+def _gwas_cases() -> list[Case]:
+    from app.modules.genomics.services.gwas_service import get_gwas_service
+
+    gwas = get_gwas_service()
+
+    def glm(d: Dataset):
+        genotypes, chromosomes, positions = d.genotypes
+        return lambda: gwas.glm_gwas(
+            genotypes, d.phenotypes, d.marker_names, chromosomes, positions
+        )
+
+    def mlm(d: Dataset):
+        genotypes, names, chromosomes, positions = d.marker_subset(d.scale.scan_markers)
+        kinship = d.grm
+        return lambda: gwas.mlm_gwas(
+            genotypes, d.phenotypes, kinship, names, chromosomes, positions
+        )
+
+    return [
+        Case("gwas.kinship", lambda d: lambda: gwas.calculate_kinship(d.genotypes[0])),
+        Case("gwas.pca", lambda d: lambda: gwas.calculate_pca(d.genotypes[0], 10)),
+        Case("gwas.glm", glm),
+        Case("gwas.mlm", mlm),
+    ]
+
+
+def _selection_cases() -> list[Case]:
+    from app.modules.breeding.services.cross_prediction_service import cross_prediction_service
+    from app.modules.genomics.services.genomic_selection_service import (
+        get_genomic_selection_service,
+    )
+
+    gs = get_genomic_selection_service()
+
+    def g_matrix(d: Dataset):
+        markers = d.genotypes[0].astype(int).tolist()
+        return lambda: gs.calculate_g_matrix(markers)
+
+    def gblup(d: Dataset):
+        phenotypes = d.phenotypes.tolist()
+        g = (d.grm + np.eye(len(phenotypes)) * 0.001).tolist()
+        return lambda: gs.run_gblup(phenotypes, g, 0.5)
+
+    def rrblup(d: Dataset):
+        markers = d.genotypes[0].astype(int).tolist()
+        phenotypes = d.phenotypes.tolist()
+        return lambda: gs.run_rrblup(markers, phenotypes)
+
+    def rank_crosses(d: Dataset):
+        n = d.scale.parents
+        genotypes = d.genotypes[0][:n]
+        parents = [{"id": f"P{i}"} for i in range(n)]
+        effects = phenotypes_from(d.genotypes[0], d._rng(2))[1]
+        gebvs = genotypes @ effects
+        return lambda: cross_prediction_service.rank_crosses(
+            parents, genotypes, gebvs, marker_effects=effects, top_n=50
+        )
+
+    return [
+        Case("gs.g_matrix", g_matrix),
+        Case("gs.gblup", gblup),
+        Case("gs.rrblup", rrblup),
+        Case("cross.rank_crosses", rank_crosses),
+    ]
+
+
+def _trial_cases() -> list[Case]:
+    from app.modules.genomics.compute.analytics.gxe_interaction_scorer import (
+        gxe_interaction_scorer,
+    )
+    from app.modules.spatial.services.spatial_correction_service import (
+        spatial_correction_service,
+    )
+
+    def gxe(d: Dataset):
+        n_genotypes, n_environments = d.trial.shape
+        genotypes = [f"G{i}" for i in range(n_genotypes)]
+        environments = [f"E{j}" for j in range(n_environments)]
+        return lambda: gxe_interaction_scorer.calculate_all_scores(
+            d.trial, genotypes, environments
+        )
+
+    return [
+        Case("gxe.all_scores", gxe),
+        Case(
+            "spatial.correct_phenotypes",
+            lambda d: lambda: spatial_correction_service.correct_phenotypes(d.field),
+        ),
+    ]
+
+
+def _relationship_cases() -> list[Case]:
+    from app.modules.breeding.services.pedigree_analysis_service import PedigreeService
+    from app.modules.genomics.compute.statistics.kinship import calculate_vanraden_kinship
+    from app.modules.genomics.services.ld_analysis_service import ld_service
+
+    def ld_input(d: Dataset):
+        genotypes, names, _, positions = d.marker_subset(d.scale.ld_markers)
+        return genotypes.T.astype(int).tolist(), names, positions
+
+    def pairwise(d: Dataset):
+        genotypes, names, positions = ld_input(d)
+        return lambda: ld_service.calculate_pairwise_ld(genotypes, positions, names)
+
+    def decay(d: Dataset):
+        genotypes, _, positions = ld_input(d)
+        return lambda: ld_service.calculate_decay(genotypes, positions)
+
+    return [
+        Case("kinship.vanraden", lambda d: lambda: calculate_vanraden_kinship(d.genotypes[0])),
+        Case("ld.pairwise", pairwise),
+        Case("ld.decay", decay),
+        Case("pedigree.load", lambda d: lambda: PedigreeService().load_pedigree(d.pedigree)),
+    ]
+
+
+def all_cases() -> list[Case]:
+    return (
+        _engine_cases()
+        + _gwas_cases()
+        + _selection_cases()
+        + _trial_cases()
+        + _relationship_cases()
+    )
+
+
+def select_cases(only: str | None) -> list[str]:
+    """Case names matching any comma-separated prefix in ``only`` (all if empty)."""
+    names = [case.name for case in all_cases()]
+    if not only:
+        return names
+    prefixes = [p.strip() for p in only.split(",") if p.strip()]
+    return [name for name in names if any(name.startswith(p) for p in prefixes)]
+
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+
+def _max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(case: Case, dataset: Dataset, repeats: int) -> dict[str, Any]:
+    """Time ``case`` ``repeats`` times after a warm-up, then trace one more run."""
+    call = case.prepare(dataset)
+    rss_before = _max_rss_mb()
+    call()
+
+    wall = []
+    for _ in range(max(repeats, 1)):
+        started = time.perf_counter()
+        call()
+        wall.append((time.perf_counter() - started) * 1000.0)
+    rss_after = _max_rss_mb()
+
+    tracemalloc.start()
+    try:
+        call()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        alloc_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(wall), 3),
+        "wall_ms_min": round(min(wall), 3),
+        "runs": len(wall),
+        "peak_rss_mb": round(rss_after, 1) if rss_after is not None else None,
+        "rss_growth_mb": (
+            round(rss_after - rss_before, 1) if rss_after is not None else None
+        ),
+        "alloc_peak_mb": round(alloc_peak / (1024 * 1024), 3),
+        "alloc_blocks_retained": blocks,
+    }
+
+
+def _run_case(name: str, scale: str, seed: int, repeats: int) -> dict[str, Any]:
+    case = next(c for c in all_cases() if c.name == name)
+    return measure(case, Dataset(SCALES[scale], seed), repeats)
+
+
+def _run_case_in_child(connection, name: str, scale: str, seed: int, repeats: int) -> None:
+    # Startup warnings were already shown by the parent; failures come back as results
+    logging.disable(logging.ERROR)
+    try:
+        connection.send(("ok", _run_case(name, scale, seed, repeats)))
+    except Exception as e:
+        connection.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+
+def run_isolated(name: str, scale: str, seed: int, repeats: int) -> dict[str, Any]:
+    """Measure one case in a fresh process so its peak RSS is its own."""
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_case_in_child, args=(sender, name, scale, seed, repeats)
+    )
+    process.start()
+    sender.close()
+    try:
+        status, payload = receiver.recv()
+    except EOFError:
+        status, payload = "error", "benchmark process exited without a result"
+    process.join()
+    if process.exitcode and status == "ok":
+        status, payload = "error", f"benchmark process exited with {process.exitcode}"
+    if status != "ok":
+        return {"error": payload}
+    return payload
+
+
+def run_suite(
+    scale: str,
+    names: list[str],
+    seed: int = 0,
+    repeats: int = 3,
+    isolate: bool = True,
+    progress: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Run the selected cases and return the machine-readable report."""
+    results = {}
+    dataset = None if isolate else Dataset(SCALES[scale], seed)
+    cases = {case.name: case for case in all_cases()}
+    for name in names:
+        if isolate:
+            record = run_isolated(name, scale, seed, repeats)
+        else:
+            try:
+                record = measure(cases[name], dataset, repeats)
+            except Exception as e:
+                record = {"error": f"{type(e).__name__}: {e}"}
+        results[name] = record
+        if progress:
+            progress(name, record)
+
+    return {
+        "scale": scale,
+        "seed": seed,
+        "isolated": isolate,
+        "created_at": datetime.now(UTC).isoformat(),
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def environment() -> dict[str, Any]:
+    import scipy
+
+    from app.services.compute_engine import compute_engine
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpu_count": os.cpu_count(),
+        "compute_backend": compute_engine.backend.value,
+    }
+
+
+# =============================================================================
+# Baseline comparison
+# =============================================================================
+
+
+def compare(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    time_tolerance: float = 0.25,
+    memory_tolerance: float = 0.10,
+    min_delta_ms: float = 2.0,
+) -> dict[str, Any]:
+    """
+    Per-operation deltas against the baseline entry for the report's scale.
+
+    Times are compared on the best run, the least noisy of the measurements;
+    an operation that errors now but not in the baseline is a regression too.
+    """
+    reference = baseline.get("scales", {}).get(report["scale"], {})
+    previous = reference.get("results", {})
+    operations = {}
+    regressions = []
+    for name, record in report["results"].items():
+        before = previous.get(name)
+        if before is None or "error" in before:
+            operations[name] = {"status": "new"}
+            continue
+        if "error" in record:
+            operations[name] = {"status": "error", "error": record["error"]}
+            regressions.append(name)
+            continue
+
+        best, baseline_best = record["wall_ms_min"], before["wall_ms_min"]
+        time_ratio = best / baseline_best if baseline_best else 1.0
+        memory_delta = record["alloc_peak_mb"] - before["alloc_peak_mb"]
+        memory_ratio = (
+            record["alloc_peak_mb"] / before["alloc_peak_mb"] if before["alloc_peak_mb"] else 1.0
+        )
+        slower = (
+            time_ratio > 1 + time_tolerance
+            and best - baseline_best > min_delta_ms
+        )
+        heavier = memory_ratio > 1 + memory_tolerance and memory_delta > 1.0
+        operations[name] = {
+            "status": "regressed" if slower or heavier else "ok",
+            "wall_ms_min": best,
+            "baseline_wall_ms_min": baseline_best,
+            "time_ratio": round(time_ratio, 3),
+            "alloc_peak_mb": record["alloc_peak_mb"],
+            "baseline_alloc_peak_mb": before["alloc_peak_mb"],
+            "memory_ratio": round(memory_ratio, 3),
+        }
+        if slower or heavier:
+            regressions.append(name)
+
+    baseline_env = reference.get("environment", {})
+    current_env = report["environment"]
+    mismatched = sorted(
+        key
+        for key in ("machine", "cpu_count", "numpy", "scipy", "compute_backend")
+        if key in baseline_env and baseline_env[key] != current_env.get(key)
+    )
+    if reference.get("isolated", report["isolated"]) != report["isolated"]:
+        mismatched.append("isolated")
+    return {
+        "scale": report["scale"],
+        "baseline_created_at": reference.get("created_at"),
+        "environment_mismatch": mismatched,
+        "regressions": regressions,
+        "operations": operations,
+    }
+
+
+def update_baseline(path: Path, report: dict[str, Any]) -> None:
+    """Store ``report`` as the baseline for its scale, keeping the other scales."""
+    baseline = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    baseline.setdefault("scales", {})[report["scale"]] = {
+        key: report[key] for key in ("created_at", "seed", "isolated", "environment", "results")
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _print_record(name: str, record: dict[str, Any]) -> None:
+    if "error" in record:
+        print(f"  {name:<28} ERROR {record['error']}")
+        return
+    rss = f"{record['peak_rss_mb']:>8.1f}" if record["peak_rss_mb"] is not None else "     n/a"
+    print(
+        f"  {name:<28} {record['wall_ms']:>10.2f} ms  "
+        f"rss {rss} MB  alloc {record['alloc_peak_mb']:>9.2f} MB"
+    )
+
+
+def _print_comparison(comparison: dict[str, Any]) -> None:
+    print(f"Baseline comparison ({comparison['baseline_created_at'] or 'no baseline'})")
+    if comparison["environment_mismatch"]:
+        print(
+            "- warning: baseline recorded with different "
+            + ", ".join(comparison["environment_mismatch"])
+        )
+    for name, delta in comparison["operations"].items():
+        if delta["status"] in ("new", "error"):
+            print(f"  {name:<28} {delta['status']}")
+            continue
+        marker = "REGRESSED" if delta["status"] == "regressed" else ""
+        print(
+            f"  {name:<28} time x{delta['time_ratio']:<6} "
+            f"memory x{delta['memory_ratio']:<6} {marker}".rstrip()
+        )
+    print(f"- regressions: {len(comparison['regressions'])}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the numerical compute core.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--only", default="", help="Comma-separated case name prefixes")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per operation")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    parser.add_argument(
+        "--in-process", action="store_true", help="Run every case in this process"
+    )
+    parser.add_argument("--output", default="", help="Path to write the JSON report")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON path")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    parser.add_argument("--min-delta-ms", type=float, default=2.0)
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="Exit 1 when any operation regressed"
+    )
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    args = parser.parse_args()
+
+    names = select_cases(args.only)
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        parser.error(f"no benchmark case matches {args.only!r}")
+
+    print(f"Compute Benchmark ({args.scale}, {SCALES[args.scale]})")
+    report = run_suite(
+        args.scale,
+        names,
+        seed=args.seed,
+        repeats=args.repeats,
+        isolate=not args.in_process,
+        progress=_print_record,
+    )
+
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        report["comparison"] = compare(
+            report,
+            baseline,
+            time_tolerance=args.time_tolerance,
+            memory_tolerance=args.memory_tolerance,
+            min_delta_ms=args.min_delta_ms,
+        )
+        _print_comparison(report["comparison"])
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"- wrote json report: {output_path}")
+
+    if args.update_baseline:
+        update_baseline(baseline_path, report)
+        print(f"- updated baseline: {baseline_path}")
+
+    if args.fail_on_regression and report.get("comparison", {}).get("regressions"):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
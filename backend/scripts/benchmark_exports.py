@@ -0,0 +1,167 @@
+"""Benchmark peak memory of materialised exports against cursor-driven streaming.
+
+Loads synthetic observations for one program into a temporary SQLite file
+(or the database given by --database-url, into its existing schema) and
+exports them two ways, recording time and the tracemalloc peak:
+
+* materialised — fetch every row, build ``list[dict]`` and call
+  ``DataExportService.export_to_csv`` (the old path)
+* streaming    — ``streaming_export_service.encode`` over a server-side cursor,
+                 discarding each chunk as a response body would
+
+Usage:
+    python scripts/benchmark_exports.py --rows 500000
+    python scripts/benchmark_exports.py --rows 500000 --format parquet --chunk-rows 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from pathlib import Path
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.base import BaseModel  # noqa: E402
+from app.models.core import Organization, Program, Study, Trial  # noqa: E402
+from app.models.germplasm import Germplasm  # noqa: E402
+from app.models.phenotyping import Observation, ObservationUnit, ObservationVariable  # noqa: E402
+from app.modules.core.services.data_export_service import DataExportService  # noqa: E402
+from app.modules.core.services.streaming_export_service import (  # noqa: E402
+    OBSERVATION_COLUMNS,
+    ExportDataset,
+    ExportFormat,
+    ExportScope,
+    build_plan,
+    encode,
+    observations_query,
+)
+
+
+INSERT_BATCH = 20_000
+TABLES = [Organization, Program, Trial, Study, Germplasm, ObservationVariable, ObservationUnit, Observation]
+
+
+async def _load(engine, rows: int, n_traits: int = 10) -> ExportScope:
+    now = datetime.now(UTC)
+    stamps = {"created_at": now, "updated_at": now}
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync: BaseModel.metadata.create_all(sync, tables=[model.__table__ for model in TABLES])
+        )
+        org_id = (await conn.execute(
+            sa.insert(Organization).values(name=f"Benchmark {now.timestamp()}", **stamps).returning(Organization.id)
+        )).scalar_one()
+        program_id = (await conn.execute(
+            sa.insert(Program).values(organization_id=org_id, program_name="Benchmark", **stamps).returning(Program.id)
+        )).scalar_one()
+        trial_id = (await conn.execute(
+            sa.insert(Trial).values(organization_id=org_id, program_id=program_id, trial_name="Trial", **stamps)
+            .returning(Trial.id)
+        )).scalar_one()
+        study_id = (await conn.execute(
+            sa.insert(Study).values(organization_id=org_id, trial_id=trial_id, study_name="Study", **stamps)
+            .returning(Study.id)
+        )).scalar_one()
+        variable_ids = [
+            (await conn.execute(
+                sa.insert(ObservationVariable)
+                .values(organization_id=org_id, observation_variable_name=f"Trait {i}", **stamps)
+                .returning(ObservationVariable.id)
+            )).scalar_one()
+            for i in range(n_traits)
+        ]
+
+        n_units = max(rows // n_traits, 1)
+        for start in range(0, n_units, INSERT_BATCH):
+            batch = range(start, min(start + INSERT_BATCH, n_units))
+            germplasm = (await conn.execute(
+                sa.insert(Germplasm).returning(Germplasm.id),
+                [{"organization_id": org_id, "germplasm_name": f"IR-{i}", **stamps} for i in batch],
+            )).scalars().all()
+            units = (await conn.execute(
+                sa.insert(ObservationUnit).returning(ObservationUnit.id, ObservationUnit.germplasm_id),
+                [
+                    {"organization_id": org_id, "study_id": study_id, "germplasm_id": g,
+                     "observation_unit_name": f"P{i}", **stamps}
+                    for i, g in zip(batch, germplasm, strict=True)
+                ],
+            )).all()
+            await conn.execute(sa.insert(Observation), [
+                {"organization_id": org_id, "study_id": study_id, "observation_unit_id": unit_id,
+                 "germplasm_id": germplasm_id, "observation_variable_id": variable_id,
+                 "value": f"{(unit_id * 7 + variable_id) % 1000 / 10}",
+                 "value_numeric": (unit_id * 7 + variable_id) % 1000 / 10, "collector": "bench", **stamps}
+                for unit_id, germplasm_id in units
+                for variable_id in variable_ids
+            ])
+            print(f"\rloaded {min(start + INSERT_BATCH, n_units) * n_traits:,}/{n_units * n_traits:,}", end="", flush=True)
+    print()
+    return ExportScope(organization_id=org_id, program_id=program_id)
+
+
+async def _materialised(sessions, scope: ExportScope) -> int:
+    async with sessions() as db:
+        rows = (await db.execute(observations_query(scope))).all()
+        data = [dict(zip(OBSERVATION_COLUMNS, row, strict=True)) for row in rows]
+        return len(DataExportService().export_to_csv(data, OBSERVATION_COLUMNS).encode())
+
+
+async def _streaming(sessions, scope: ExportScope, fmt: ExportFormat, chunk_rows: int) -> int:
+    size = 0
+    async with sessions() as db:
+        plan = await build_plan(db, ExportDataset.OBSERVATIONS, scope, chunk_rows)
+        async for chunk in encode(plan, fmt):
+            size += len(chunk)
+    return size
+
+
+async def _measure(label: str, call) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await call
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24}{elapsed:>9.2f}s{peak / 2**20:>12.1f} MiB{size / 2**20:>12.1f} MiB")
+
+
+async def _run(args) -> None:
+    url = args.database_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/export_benchmark.db"
+    engine = create_async_engine(url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    print(f"Loading ~{args.rows:,} synthetic observations into {engine.url.render_as_string()}")
+    scope = await _load(engine, args.rows)
+
+    print(f"\n{'path':<24}{'time':>10}{'peak memory':>16}{'output':>16}")
+    await _measure("materialised csv", _materialised(sessions, scope))
+    await _measure(
+        f"streaming {args.format} ({args.chunk_rows:,})",
+        _streaming(sessions, scope, ExportFormat(args.format), args.chunk_rows),
+    )
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="SQLAlchemy async URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--format", choices=[fmt.value for fmt in ExportFormat], default="csv")
+    parser.add_argument("--chunk-rows", type=int, default=5000)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
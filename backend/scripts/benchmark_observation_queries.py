@@ -0,0 +1,178 @@
+"""Benchmark phenotype analytics queries on string-cast vs typed observation columns.
+
+Loads a synthetic ``observations`` table (default 10M rows) into the given
+database and times the query shapes the analytics services use, once against
+the legacy text columns and once against the typed columns:
+
+* trait matrix  — avg(value) per study x germplasm for one variable
+* time range    — observations for one organization inside a one-month window
+
+Usage:
+    python scripts/benchmark_observation_queries.py --database-url postgresql+psycopg://... --rows 10000000
+    python scripts/benchmark_observation_queries.py --rows 200000            # SQLite temp file
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import sqlalchemy as sa
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models.phenotyping import Observation  # noqa: E402
+
+
+TABLE = Observation.__table__
+COLUMNS = (
+    "organization_id",
+    "observation_variable_id",
+    "study_id",
+    "germplasm_id",
+    "value",
+    "observation_time_stamp",
+    "value_numeric",
+    "value_categorical",
+    "observed_at",
+)
+N_ORGANIZATIONS = 4
+N_VARIABLES = 40
+N_STUDIES = 250
+N_GERMPLASM = 5_000
+INSERT_BATCH = 50_000
+EPOCH = datetime(2020, 1, 1, tzinfo=UTC)
+
+
+def _table(metadata: sa.MetaData) -> sa.Table:
+    """Standalone copy of the observations columns/indexes the queries touch (no FKs)."""
+    columns = [sa.Column("id", sa.Integer, primary_key=True)]
+    columns += [TABLE.c[name]._copy() for name in COLUMNS]
+    table = sa.Table("benchmark_observations", metadata, *columns)
+    for index in TABLE.indexes:
+        if all(column.name in COLUMNS for column in index.columns):
+            sa.Index(f"bench_{index.name}", *[table.c[column.name] for column in index.columns])
+    return table
+
+
+def _batches(rows: int, seed: int):
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, INSERT_BATCH):
+        n = min(INSERT_BATCH, rows - start)
+        values = np.round(rng.normal(50, 10, n), 3)
+        seconds = rng.integers(0, 5 * 365 * 86_400, n)
+        stamps = [EPOCH + timedelta(seconds=int(s)) for s in seconds]
+        yield [
+            {
+                "organization_id": int(org),
+                "observation_variable_id": int(var),
+                "study_id": int(study),
+                "germplasm_id": int(germ),
+                "value": str(value),
+                "observation_time_stamp": stamp.strftime("%Y-%m-%dT%H:%M:%S"),
+                "value_numeric": float(value),
+                "value_categorical": None,
+                "observed_at": stamp,
+            }
+            for org, var, study, germ, value, stamp in zip(
+                rng.integers(1, N_ORGANIZATIONS + 1, n),
+                rng.integers(1, N_VARIABLES + 1, n),
+                rng.integers(1, N_STUDIES + 1, n),
+                rng.integers(1, N_GERMPLASM + 1, n),
+                values,
+                stamps,
+                strict=True,
+            )
+        ]
+
+
+def _load(engine: sa.Engine, table: sa.Table, rows: int, seed: int) -> None:
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    loaded = 0
+    with engine.begin() as conn:
+        for batch in _batches(rows, seed):
+            conn.execute(table.insert(), batch)
+            loaded += len(batch)
+            print(f"\rloaded {loaded:,}/{rows:,}", end="", flush=True)
+    print()
+    with engine.begin() as conn:
+        conn.execute(sa.text(f"ANALYZE {table.name}"))
+
+
+def _queries(table: sa.Table) -> dict[str, tuple[sa.Select, sa.Select]]:
+    c = table.c
+    start = datetime(2022, 3, 1, tzinfo=UTC)
+    end = datetime(2022, 4, 1, tzinfo=UTC)
+    legacy_matrix = (
+        sa.select(c.study_id, c.germplasm_id, sa.func.avg(sa.cast(c.value, sa.Float)))
+        .where(c.organization_id == 1, c.observation_variable_id == 7)
+        .group_by(c.study_id, c.germplasm_id)
+    )
+    typed_matrix = (
+        sa.select(c.study_id, c.germplasm_id, sa.func.avg(c.value_numeric))
+        .where(c.organization_id == 1, c.observation_variable_id == 7, c.value_numeric.isnot(None))
+        .group_by(c.study_id, c.germplasm_id)
+    )
+    legacy_range = sa.select(sa.func.count()).where(
+        c.organization_id == 1,
+        c.observation_time_stamp >= start.strftime("%Y-%m-%d"),
+        c.observation_time_stamp < end.strftime("%Y-%m-%d"),
+    )
+    typed_range = sa.select(sa.func.count()).where(
+        c.organization_id == 1, c.observed_at >= start, c.observed_at < end
+    )
+    return {
+        "trait matrix": (legacy_matrix, typed_matrix),
+        "time range": (legacy_range, typed_range),
+    }
+
+
+def _time(engine: sa.Engine, query: sa.Select, repeat: int) -> float:
+    timings = []
+    with engine.connect() as conn:
+        conn.execute(query).all()  # warm cache
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(query).all()
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="SQLAlchemy sync URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark table afterwards")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/observations_benchmark.db"
+    engine = sa.create_engine(url)
+    table = _table(sa.MetaData())
+
+    print(f"Loading {args.rows:,} synthetic observations into {engine.url.render_as_string()}")
+    _load(engine, table, args.rows, args.seed)
+
+    print(f"\n{'query':<14}{'string cast':>14}{'typed':>12}{'speedup':>10}")
+    for name, (legacy, typed) in _queries(table).items():
+        before = _time(engine, legacy, args.repeat)
+        after = _time(engine, typed, args.repeat)
+        print(f"{name:<14}{before * 1000:>12.1f}ms{after * 1000:>10.1f}ms{before / after:>9.1f}x")
+
+    if not args.keep:
+        table.drop(engine)
+
+
+if __name__ == "__main__":
+    main()
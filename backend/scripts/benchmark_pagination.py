@@ -0,0 +1,163 @@
+"""Benchmark OFFSET/count(*) pagination against keyset pages and cached totals.
+
+Loads a synthetic germplasm-shaped table (default 1M rows) and times fetching
+page 1 and a deep page (default 5000) of one organization's rows, ordered by
+primary key, the way the list endpoints serve them:
+
+* offset + count  — ``OFFSET page*size LIMIT size`` plus a fresh ``count(*)`` (the old path)
+* keyset token    — ``app.core.pagination.paginate`` following a ``nextPageToken``
+* page number     — ``paginate`` with a page number, served from the page anchor
+                    the first visit recorded
+
+Usage:
+    python scripts/benchmark_pagination.py --database-url postgresql+asyncpg://... --rows 5000000
+    python scripts/benchmark_pagination.py --rows 1000000            # SQLite temp file
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.pagination import paginate, query_cache  # noqa: E402
+
+
+N_ORGANIZATIONS = 2
+INSERT_BATCH = 50_000
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class BenchmarkGermplasm(_Base):
+    """Standalone copy of the germplasm columns the list query touches (no FKs)."""
+
+    __tablename__ = "benchmark_germplasm"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    organization_id: Mapped[int] = mapped_column(index=True)
+    germplasm_name: Mapped[str] = mapped_column(sa.String(255))
+    genus: Mapped[str | None] = mapped_column(sa.String(255))
+
+    __table_args__ = (sa.Index("ix_benchmark_germplasm_org_id", "organization_id", "id"),)
+
+
+async def _load(engine, rows: int, seed: int) -> None:
+    table = BenchmarkGermplasm.__table__
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: table.drop(sync, checkfirst=True))
+        await conn.run_sync(table.create)
+    rng = np.random.default_rng(seed)
+    loaded = 0
+    async with engine.begin() as conn:
+        for start in range(0, rows, INSERT_BATCH):
+            n = min(INSERT_BATCH, rows - start)
+            orgs = rng.integers(1, N_ORGANIZATIONS + 1, n)
+            batch = [
+                {"organization_id": int(org), "germplasm_name": f"IR-{start + i}", "genus": "Oryza"}
+                for i, org in enumerate(orgs)
+            ]
+            await conn.execute(sa.insert(table), batch)
+            loaded += n
+            print(f"\rloaded {loaded:,}/{rows:,}", end="", flush=True)
+    print()
+    async with engine.begin() as conn:
+        await conn.execute(sa.text(f"ANALYZE {table.name}"))
+
+
+def _query() -> sa.Select:
+    return sa.select(BenchmarkGermplasm).where(BenchmarkGermplasm.organization_id == 1)
+
+
+async def _offset_page(db: AsyncSession, page: int, size: int) -> None:
+    query = _query()
+    await db.execute(sa.select(sa.func.count()).select_from(query.subquery()))
+    (await db.execute(query.order_by(BenchmarkGermplasm.id).offset(page * size).limit(size))).scalars().all()
+
+
+async def _time(sessions, call, repeat: int) -> float:
+    timings = []
+    async with sessions() as db:
+        await call(db)  # warm cache
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await call(db)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+async def _run(args) -> None:
+    url = args.database_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/pagination_benchmark.db"
+    engine = create_async_engine(url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    print(f"Loading {args.rows:,} synthetic germplasm rows into {engine.url.render_as_string()}")
+    await _load(engine, args.rows, args.seed)
+
+    size, deep = args.page_size, args.page
+    async with sessions() as db:
+        started = time.perf_counter()
+        first_visit = await paginate(db, _query(), page=deep - 1, page_size=size, count_mode="cached")
+        print(f"first visit to page {deep - 1:,} (records the anchor): {(time.perf_counter() - started) * 1000:.1f}ms")
+    if first_visit.next_page_token is None:
+        raise SystemExit(f"Only {first_visit.total_count:,} rows for organization 1; raise --rows or lower --page")
+    token = first_visit.next_page_token
+
+    def keyset(page, page_token=None):
+        async def call(db):
+            await paginate(db, _query(), page=page, page_size=size, page_token=page_token, count_mode="cached")
+        return call
+
+    def offset(page):
+        async def call(db):
+            await _offset_page(db, page, size)
+        return call
+
+    rows = {
+        "offset + count": (offset(0), offset(deep)),
+        "keyset token": (keyset(0), keyset(deep, token)),
+        "page number": (keyset(0), keyset(deep)),
+    }
+    print(f"\n{'strategy':<16}{'page 1':>12}{f'page {deep:,}':>14}{'ratio':>9}")
+    for name, (shallow, far) in rows.items():
+        first = await _time(sessions, shallow, args.repeat)
+        last = await _time(sessions, far, args.repeat)
+        print(f"{name:<16}{first * 1000:>10.2f}ms{last * 1000:>12.2f}ms{last / first:>8.1f}x")
+
+    query_cache.clear()
+    if not args.keep:
+        async with engine.begin() as conn:
+            await conn.run_sync(BenchmarkGermplasm.__table__.drop)
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="SQLAlchemy async URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=5000, help="Deep page to compare with page 1")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark table afterwards")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Cold-start profile of the API process and the compute workers.
+
+Starts each target in a fresh interpreter under ``python -X importtime`` and
+reports:
+
+* import      — wall time to import the target, the import tree (modules above
+                ``--min-ms`` cumulative, as ``-X importtime`` nests them) and
+                self time per top-level package. The tree and totals cover
+                everything the child imports, including modules the first
+                request and warm-up pull in; ``import_ms`` is the import alone
+* routes      — (api) registration time per route group, imports included,
+                and include time per router; which groups were deferred
+* first call  — (api) latency of the first request to ``--first-request``,
+                the background warm-up (deferred groups plus FastAPI route
+                resolution) and the same request once warm
+* preload     — (workers) time to import the modules the worker's compute
+                type preloads before taking jobs
+
+Targets: ``api`` (app.main), ``light``, ``heavy`` and ``gpu`` workers.
+``--loading`` sets ROUTER_LOADING for the API child, so eager and lazy route
+mounting can be compared on the same tree.
+
+Usage:
+    python scripts/startup_profile.py
+    python scripts/startup_profile.py --target api --loading lazy --min-ms 50
+    python scripts/startup_profile.py --target api,heavy --output startup.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+TARGETS = ("api", "light", "heavy", "gpu")
+RESULT_MARKER = "STARTUP_PROFILE_RESULT "
+
+_API_CHILD = """
+import asyncio, json, time
+started_at = time.perf_counter()
+import app.main as main
+report = {"import_ms": (time.perf_counter() - started_at) * 1000}
+loader = main.app.state.route_loader
+report["registration"] = loader.profile()
+
+async def first_calls(path):
+    import httpx
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+        started_at = time.perf_counter()
+        response = await client.get(path)
+        cold = {"status": response.status_code, "ms": (time.perf_counter() - started_at) * 1000}
+        started_at = time.perf_counter()
+        await loader.warm_up()
+        warm_up_ms = (time.perf_counter() - started_at) * 1000
+        started_at = time.perf_counter()
+        response = await client.get(path)
+        warm = {"status": response.status_code, "ms": (time.perf_counter() - started_at) * 1000}
+    return {"path": path, "cold": cold, "warm_up_ms": warm_up_ms, "warm": warm}
+
+if {first_request!r}:
+    report["first_request"] = asyncio.run(first_calls({first_request!r}))
+print({marker!r} + json.dumps(report))
+"""
+
+_WORKER_CHILD = """
+import json, time
+started_at = time.perf_counter()
+import app.workers.{target}_worker
+from app.services.task_queue import ComputeType
+from app.workers.preload import preload_worker_modules
+report = {{"import_ms": (time.perf_counter() - started_at) * 1000}}
+started_at = time.perf_counter()
+report["preload"] = preload_worker_modules(ComputeType.{compute_type})
+report["preload_ms"] = (time.perf_counter() - started_at) * 1000
+print({marker!r} + json.dumps(report))
+"""
+
+_WORKER_COMPUTE_TYPES = {"light": "LIGHT_PYTHON", "heavy": "HEAVY_COMPUTE", "gpu": "GPU_COMPUTE"}
+
+
+@dataclass
+class ImportNode:
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: list[ImportNode] = field(default_factory=list)
+
+    @property
+    def cumulative_ms(self) -> float:
+        return self.cumulative_us / 1000
+
+
+def parse_importtime(text: str) -> list[ImportNode]:
+    """Rebuild the import tree from ``-X importtime`` output (children print first)."""
+    pending: dict[int, list[ImportNode]] = defaultdict(list)
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header row
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        children = pending.pop(depth + 1, [])
+        pending[depth].append(ImportNode(name.strip(), int(self_us), int(cumulative_us), children))
+    return pending.get(0, [])
+
+
+def _walk(nodes: list[ImportNode]):
+    for node in nodes:
+        yield node
+        yield from _walk(node.children)
+
+
+def package_totals(roots: list[ImportNode], top: int = 25) -> list[dict[str, Any]]:
+    """Self time summed per top-level package, largest first."""
+    totals: dict[str, int] = defaultdict(int)
+    for node in _walk(roots):
+        totals[node.name.split(".")[0]] += node.self_us
+    ranked = sorted(totals.items(), key=lambda item: -item[1])[:top]
+    return [{"package": name, "ms": round(us / 1000, 1)} for name, us in ranked]
+
+
+def prune(nodes: list[ImportNode], min_ms: float, max_depth: int) -> list[dict[str, Any]]:
+    """The import tree down to ``max_depth``, keeping modules of ``min_ms`` or more."""
+    kept = sorted((n for n in nodes if n.cumulative_ms >= min_ms), key=lambda n: -n.cumulative_us)
+    return [
+        {
+            "module": node.name,
+            "ms": round(node.cumulative_ms, 1),
+            "self_ms": round(node.self_us / 1000, 1),
+            "children": prune(node.children, min_ms, max_depth - 1) if max_depth > 1 else [],
+        }
+        for node in kept
+    ]
+
+
+def render_tree(tree: list[dict[str, Any]], indent: int = 0) -> list[str]:
+    lines = []
+    for node in tree:
+        lines.append(f"{node['ms']:10.1f} ms  {'  ' * indent}{node['module']}")
+        lines.extend(render_tree(node["children"], indent + 1))
+    return lines
+
+
+def child_code(target: str, first_request: str) -> str:
+    if target == "api":
+        return _API_CHILD.replace("{first_request!r}", repr(first_request)).replace(
+            "{marker!r}", repr(RESULT_MARKER)
+        )
+    return _WORKER_CHILD.format(
+        target=target, compute_type=_WORKER_COMPUTE_TYPES[target], marker=RESULT_MARKER
+    )
+
+
+def profile_target(
+    target: str,
+    loading: str = "eager",
+    first_request: str = "",
+    min_ms: float = 20.0,
+    max_depth: int = 6,
+) -> dict[str, Any]:
+    """Start ``target`` in a fresh interpreter and profile its imports."""
+    python_path = [str(PROJECT_ROOT), os.environ.get("PYTHONPATH", "")]
+    env = {
+        **os.environ,
+        "ROUTER_LOADING": loading,
+        "PYTHONPATH": os.pathsep.join(filter(None, python_path)),
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", child_code(target, first_request)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    result_line = next(
+        (line for line in completed.stdout.splitlines() if line.startswith(RESULT_MARKER)), None
+    )
+    if result_line is None:
+        tail = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+        return {"target": target, "error": f"exit {completed.returncode}: {tail}"}
+
+    roots = parse_importtime(completed.stderr)
+    return {
+        "target": target,
+        "loading": loading if target == "api" else None,
+        **json.loads(result_line[len(RESULT_MARKER) :]),
+        "modules_imported": sum(1 for _ in _walk(roots)),
+        "packages": package_totals(roots),
+        "tree": prune(roots, min_ms, max_depth),
+    }
+
+
+def _print_report(report: dict[str, Any], show_tree: bool) -> None:
+    print(f"\n== {report['target']}" + (f" ({report['loading']})" if report.get("loading") else ""))
+    if "error" in report:
+        print(f"   failed: {report['error']}")
+        return
+    print(f"   import: {report['import_ms']:.0f} ms, {report['modules_imported']} modules")
+    print("   slowest packages (self time): " + ", ".join(
+        f"{p['package']} {p['ms']:.0f}ms" for p in report["packages"][:8]
+    ))
+
+    registration = report.get("registration")
+    if registration:
+        print(
+            f"   route groups: {registration['total_ms']:.0f} ms, "
+            f"{registration['routes']} routes"
+        )
+        for group in registration["groups"]:
+            print(f"     {group['ms']:8.1f} ms  {group['name']:<14} {group['routes']:>5} routes")
+            slowest = sorted(group["routers"], key=lambda r: -r["ms"])[:3]
+            for router in slowest:
+                print(f"                 {router['ms']:7.2f} ms include  {router['module']}")
+        if registration["pending"]:
+            print("   deferred groups: " + ", ".join(registration["pending"]))
+
+    first = report.get("first_request")
+    if first:
+        print(
+            f"   first request {first['path']}: {first['cold']['ms']:.0f} ms cold, "
+            f"{first['warm']['ms']:.0f} ms after a {first['warm_up_ms']:.0f} ms warm-up"
+        )
+    if "preload" in report:
+        print(f"   preload: {report['preload_ms']:.0f} ms {report['preload'] or ''}")
+
+    if show_tree:
+        print("   import tree:")
+        for line in render_tree(report["tree"]):
+            print("   " + line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile API and worker cold start.")
+    parser.add_argument("--target", default=",".join(TARGETS), help="Comma-separated targets")
+    parser.add_argument("--loading", choices=("eager", "lazy"), default="eager")
+    parser.add_argument(
+        "--first-request",
+        default="/api/v2/monitoring/compute/queue",
+        help="API path to time cold and warm ('' to skip)",
+    )
+    parser.add_argument("--min-ms", type=float, default=20.0, help="Tree: minimum cumulative ms")
+    parser.add_argument("--max-depth", type=int, default=6, help="Tree: maximum depth")
+    parser.add_argument("--no-tree", action="store_true", help="Do not print the import tree")
+    parser.add_argument("--output", default="", help="Path to write the JSON report")
+    args = parser.parse_args()
+
+    targets = [t.strip() for t in args.target.split(",") if t.strip()]
+    unknown = sorted(set(targets) - set(TARGETS))
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+
+    reports = []
+    for target in targets:
+        report = profile_target(
+            target, args.loading, args.first_request, args.min_ms, args.max_depth
+        )
+        _print_report(report, show_tree=not args.no_tree)
+        reports.append(report)
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(
+            json.dumps(
+                {
+                    "created_at": datetime.now(UTC).isoformat(),
+                    "python": platform.python_version(),
+                    "reports": reports,
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        print(f"- wrote json report: {output_path}")
+
+    return 1 if any("error" in report for report in reports) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
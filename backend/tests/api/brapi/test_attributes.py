@@ -3,6 +3,14 @@ import sys
 from unittest.mock import MagicMock, AsyncMock
 from sqlalchemy import event
 
+_real_modules = {name: sys.modules.get(name) for name in (
+    "app.core.redis",
+    "app.core.meilisearch",
+    "app.services.task_queue",
+    "app.services.redis_security",
+    "app.core.socketio",
+)}
+
 # Mock modules that might hang during startup
 sys.modules["app.core.redis"] = MagicMock()
 sys.modules["app.core.meilisearch"] = MagicMock()
@@ -21,6 +29,13 @@ from app.models.brapi_phenotyping import GermplasmAttributeDefinition  # Registe
 from app.core.security import create_access_token
 from datetime import timedelta
 
+# Only this module's imports need the stand-ins; later test modules import the real ones
+for _name, _module in _real_modules.items():
+    if _module is None:
+        sys.modules.pop(_name, None)
+    else:
+        sys.modules[_name] = _module
+
 # Patch set_tenant_context in attributes module to avoid Postgres-specific SQL in SQLite
 # We need to do this after imports because app.main imports the router which imports attributes
 from app.api.brapi import attributes
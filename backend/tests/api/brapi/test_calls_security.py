@@ -3,6 +3,15 @@ import sys
 from unittest.mock import MagicMock
 from sqlalchemy import event, select
 
+_real_modules = {name: sys.modules.get(name) for name in (
+    "app.core.redis",
+    "app.core.meilisearch",
+    "app.services.task_queue",
+    "app.services.redis_security",
+    "app.core.socketio",
+    "app.modules.core.services.audit_service",
+)}
+
 # Mock modules that might hang during startup
 sys.modules["app.core.redis"] = MagicMock()
 sys.modules["app.core.meilisearch"] = MagicMock()
@@ -21,6 +30,13 @@ from app.models.core import User, Organization
 from app.models.genotyping import Call, CallSet, Variant, VariantSet, Reference, ReferenceSet
 from app.models.phenotyping import Sample
 
+# Only this module's imports need the stand-ins; later test modules import the real ones
+for _name, _module in _real_modules.items():
+    if _module is None:
+        sys.modules.pop(_name, None)
+    else:
+        sys.modules[_name] = _module
+
 # Use async sqlite
 DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -31,6 +31,15 @@ async def test_gwas_glm(authenticated_client: AsyncClient):
     assert result["n_markers"] == 3
     assert "markers" in result
 
+    response = await authenticated_client.post(
+        "/api/v2/gwas/glm", params={"output": "artifact"}, json=data
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert "markers" not in result
+    assert result["artifact"]["artifact_id"]
+    assert "manhattan_preview" in result
+
 
 @pytest.mark.asyncio
 async def test_gxe_finlay_wilkinson(authenticated_client: AsyncClient):
@@ -127,6 +127,16 @@ def setup_db():
         "programs",
         "samples",
         "observation_units",
+        "observation_variables",
+        "observations",
+        "trial_trait_statistics",
+        "phenotype_qc_statistics",
+        "phenotype_qc_issues",
+        "field_book_studies",
+        "field_book_traits",
+        "field_book_entries",
+        "field_book_observations",
+        "growing_degree_day_logs",
         "crossing_projects",
         "crosses",
         "planned_crosses",
@@ -139,6 +149,14 @@ def setup_db():
         "iot_telemetry",
         "barcode_scans",
         "seedlots",
+        "seedlot_transactions",
+        "organization_counters",
+        "ai_usage_daily",
+        "variant_sets",
+        "variants",
+        "call_sets",
+        "calls",
+        "brapi_harvest_checkpoints",
         "weather_stations",
         "weather_forecasts",
         "weather_historical",
@@ -177,6 +195,9 @@ def setup_db():
         "gene_go_terms",
         # Bio-analytics QTL & GWAS
         "bio_candidate_genes",
+        # Phenomic selection
+        "phenomic_datasets",
+        "phenomic_models",
     ]
 
     tables_to_create = []
@@ -0,0 +1,61 @@
+"""
+API tests for LUNAR and MARS scenario sweeps.
+"""
+
+import pytest
+
+
+LUNAR_BASE = {
+    "gravity_factor": 0.16,
+    "light_cycle_days": 14.0,
+    "dark_cycle_days": 14.0,
+    "habitat_pressure_kpa": 101.3,
+    "o2_ppm": 210000.0,
+    "co2_ppm": 400.0,
+    "root_support_factor": 1.0,
+}
+
+MARS_BASE = {
+    "pressure_kpa": 60.0,
+    "co2_ppm": 1000.0,
+    "o2_ppm": 200000.0,
+    "radiation_msv": 100.0,
+    "gravity_factor": 0.38,
+    "photoperiod_hours": 12.0,
+}
+
+
+@pytest.mark.asyncio
+async def test_sweep_endpoints(authenticated_client):
+    response = await authenticated_client.post(
+        "/api/v2/space/lunar/sweep",
+        json={
+            "environment": LUNAR_BASE,
+            "germplasm_ids": [1, 2, 3],
+            "parameters": {"gravity_factor": {"min": 0.05, "max": 0.3, "steps": 6}},
+            "aggregate": "mean",
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_evaluations"] == 18 and body["pareto_front"][0]["yield"] > 0
+
+    response = await authenticated_client.post(
+        "/api/v2/space/lunar/sweep",
+        json={
+            "environment": LUNAR_BASE,
+            "germplasm_ids": [1],
+            "parameters": {"gravity_factor": {"min": 0.05, "max": 0.9}},
+        },
+    )
+    assert response.status_code == 400 and "gravity_factor" in response.json()["detail"]
+
+    response = await authenticated_client.post(
+        "/api/v2/space/mars/sweep",
+        json={
+            "environment": {**MARS_BASE, "temperature_profile": {"average": 24}, "humidity_profile": {}},
+            "parameters": {"o2_ppm": {"values": [100, 1000, 200000]}},
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["pareto_front"][0]["metrics"]["water_recycling_pct"] == 97.2
@@ -44,6 +44,21 @@ class TestNIRSPrediction:
         assert y_pred.shape == (n,)
         assert np.corrcoef(y, y_pred)[0, 1] > 0.9
 
+    def test_cross_validation_reports_requested_and_best_components(self):
+        """CV statistics stay at the requested count; the optimum is reported alongside."""
+        rng = np.random.default_rng(7)
+        X = rng.random((40, 60))
+        y = X[:, :3] @ np.array([2.0, -1.0, 0.5]) + rng.normal(0, 0.05, 40)
+
+        cv = nirs_prediction_service.cross_validate(X, y, n_components=8, random_state=1)
+
+        by_components = cv["rmse_cv_by_components"]
+        assert cv["n_components"] == 8
+        assert cv["rmse_cv"] == by_components[7]
+        assert cv["best_rmse_cv"] == min(by_components)
+        assert by_components[cv["best_n_components"] - 1] == cv["best_rmse_cv"]
+        assert cv["best_r2_cv"] >= cv["r2_cv"]
+
     def test_derivative_preprocessing(self):
         """Derivative preprocessing should run without error."""
         spectra = np.random.rand(5, 50)
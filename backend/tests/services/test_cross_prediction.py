@@ -3,7 +3,9 @@
 Tests for Cross Prediction Service
 """
 
+import numpy as np
 import pytest
+from app.modules.breeding.services import cross_prediction_service as module
 from app.modules.breeding.services.cross_prediction_service import CrossPredictionService
 
 class TestCrossMeanPrediction:
@@ -110,3 +112,62 @@ def test_calculate_usefulness_negative_mean():
         selection_intensity
     )
     assert result == -1.0
+
+
+class TestRankCrosses:
+    """Tests for the blocked all-pairs rank_crosses()"""
+
+    @pytest.fixture
+    def population(self):
+        rng = np.random.default_rng(7)
+        n_parents, n_markers = 30, 40
+        return {
+            "parents": [{"id": f"P{i}"} for i in range(n_parents)],
+            "genotypes": rng.integers(0, 3, (n_parents, n_markers)).astype(float),
+            "gebvs": rng.normal(0, 1, n_parents),
+            "marker_effects": rng.normal(0, 0.5, n_markers),
+        }
+
+    def _brute_force(self, service, population, **filters):
+        parents, genotypes, gebvs = population["parents"], population["genotypes"], population["gebvs"]
+        crosses = []
+        for i in range(len(parents)):
+            for j in range(i + 1, len(parents)):
+                prediction = service.predict_single_cross(
+                    parents[i]["id"], parents[j]["id"], gebvs[i], gebvs[j],
+                    genotypes[i], genotypes[j], marker_effects=population["marker_effects"],
+                )
+                if prediction.inbreeding_coefficient > filters["max_inbreeding"]:
+                    continue
+                if prediction.genetic_distance < filters["min_genetic_distance"]:
+                    continue
+                crosses.append(prediction)
+        return sorted(crosses, key=lambda c: c.usefulness, reverse=True)
+
+    def test_matches_pairwise_predictions(self, population, monkeypatch):
+        # Several row blocks, so candidates are merged across blocks
+        monkeypatch.setattr(module, "PAIR_BLOCK_SIZE", 64)
+        filters = {"max_inbreeding": 0.22, "min_genetic_distance": 0.6}
+        expected = self._brute_force(service, population, **filters)
+
+        ranking = service.rank_crosses(**population, top_n=10, **filters)
+
+        assert ranking.n_candidates == len(expected)
+        assert [(c.parent1_id, c.parent2_id) for c in ranking.crosses] == [
+            (c.parent1_id, c.parent2_id) for c in expected[:10]
+        ]
+        for got, want in zip(ranking.crosses, expected):
+            assert got.predicted_variance == pytest.approx(want.predicted_variance)
+            assert got.inbreeding_coefficient == pytest.approx(want.inbreeding_coefficient)
+            assert got.genetic_distance == pytest.approx(want.genetic_distance)
+
+    def test_mate_allocation_limits_parent_use(self, population):
+        ranking = service.rank_crosses(
+            **population, top_n=12, max_inbreeding=1.0, min_genetic_distance=0.0, max_uses_per_parent=1
+        )
+
+        used = [c.parent1_id for c in ranking.crosses] + [c.parent2_id for c in ranking.crosses]
+        assert len(ranking.crosses) == 12
+        assert len(used) == len(set(used))
+        unconstrained = service.rank_crosses(**population, top_n=1, max_inbreeding=1.0, min_genetic_distance=0.0)
+        assert ranking.crosses[0] == unconstrained.crosses[0]
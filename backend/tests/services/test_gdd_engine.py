@@ -0,0 +1,135 @@
+"""
+Tests for the vectorised multi-field GDD engine and its incremental season logs.
+"""
+
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from app.models.core import Organization
+from app.models.future.gdd_log import GrowingDegreeDayLog
+from app.modules.environment.services.gdd_calculator_service import GDDCalculatorService, TemperatureData
+from app.modules.environment.services.gdd_engine_service import (
+    FieldSeason,
+    GDDEngineService,
+    compute_season,
+    daily_gdd,
+    growth_stages,
+    rolling_outliers,
+)
+
+
+def _temperatures(n_fields=5, n_days=150, seed=0):
+    rng = np.random.default_rng(seed)
+    season = 8 * np.sin(np.linspace(0, np.pi, n_days))
+    tmin = 8 + season + rng.normal(0, 2, (n_fields, n_days))
+    tmax = tmin + rng.uniform(6, 14, (n_fields, n_days))
+    return np.round(tmax, 1), np.round(tmin, 1)
+
+
+def test_daily_methods_match_scalar_calculator_and_sine_integral():
+    tmax, tmin = _temperatures(3, 40)
+    calculator = GDDCalculatorService()
+    for method in ("standard", "modified"):
+        expected = [[calculator.calculate_daily_gdd(a, b, 10.0, method)[0] for a, b in zip(rx, rn)]
+                    for rx, rn in zip(tmax, tmin)]
+        assert np.allclose(np.round(daily_gdd(tmax, tmin, 10.0, method), 2), expected)
+    assert np.array_equal(daily_gdd(tmax, tmin, 10.0, "simple"), daily_gdd(tmax, tmin, 10.0))
+
+    # Sine method equals the mean excess of a daily sine curve above the base
+    t = np.linspace(0, 2 * np.pi, 200_001)
+    for high, low, base in [(30, 15, 10), (25, 5, 10), (12, 2, 10), (8, 0, 10)]:
+        curve = (high + low) / 2 + (high - low) / 2 * np.sin(t)
+        assert daily_gdd(high, low, base, "sine") == pytest.approx(np.maximum(curve - base, 0).mean(), abs=1e-3)
+
+    with pytest.raises(ValueError):
+        daily_gdd(tmax, tmin, 10.0, "triangle")
+
+
+def test_rolling_outliers_match_scalar_detector_over_preceding_week():
+    tmax, tmin = _temperatures(4, 60, seed=1)
+    tmax[2, 30] = 45.0
+    tmin[1, 10:13] = np.nan
+    flags = rolling_outliers(tmax, tmin)
+
+    calculator = GDDCalculatorService()
+    for f in range(4):
+        for d in range(60):
+            recent_max = [v for v in tmax[f, max(0, d - 7):d] if not np.isnan(v)]
+            recent_min = [v for v in tmin[f, max(0, d - 7):d] if not np.isnan(v)]
+            expected = not np.isnan(tmin[f, d]) and calculator._detect_temperature_outlier(
+                tmax[f, d], tmin[f, d], recent_max, recent_min
+            )
+            assert flags[f, d] == expected, (f, d)
+    assert flags[2, 30]
+
+
+def test_cumulative_gdd_and_stages_for_mixed_crops():
+    tmax, tmin = _temperatures(4, 150)
+    crops = ["corn", "wheat", "rice", "soybean"]
+    base = np.array([10.0, 0.0, 10.0, 10.0])
+    season = compute_season(tmax, tmin, base, crops=crops)
+
+    calculator = GDDCalculatorService()
+    for f, crop in enumerate(crops):
+        data = [TemperatureData(date=date(2024, 4, 1) + timedelta(days=d), temp_max=tmax[f, d], temp_min=tmin[f, d])
+                for d in range(150)]
+        results = calculator.calculate_cumulative_gdd(data, base[f])
+        assert [r.cumulative_gdd for r in results] == pytest.approx(season.cumulative[f].tolist())
+        for d in (0, 40, 90, 149):
+            stage = calculator.predict_growth_stages(crop, season.cumulative[f, d], date(2024, 4, 1)).current_stage
+            assert season.stages[f, d] == stage
+
+    onsets = season.stage_onsets(0)
+    emergence = onsets["Emergence"]
+    assert season.cumulative[0, emergence] >= 125 > season.cumulative[0, emergence - 1]
+    assert growth_stages(np.array([[-1.0, 0.0, 5000.0]]), "barley").tolist() == [["Pre-emergence", "Planting", "Maturity"]]
+
+
+@pytest.mark.asyncio
+async def test_advancing_one_day_continues_recorded_season(async_db_session):
+    db = async_db_session
+    org = Organization(name=f"GDD Org {datetime.now(UTC).timestamp()}")
+    db.add(org)
+    await db.flush()
+
+    start = date(2024, 4, 1)
+    seasons = [
+        FieldSeason(1, "corn", start),
+        FieldSeason(2, "wheat", start + timedelta(days=3)),
+        FieldSeason(3, "soybean", start, base_temperature=8.0),
+    ]
+    tmax, tmin = _temperatures(3, 30, seed=4)
+    tmax[0, 29] = 48.0
+    engine = GDDEngineService()
+
+    summary = await engine.record_season(db, org.id, seasons, [start + timedelta(days=d) for d in range(28)],
+                                         tmax[:, :28], tmin[:, :28])
+    assert summary["days_logged"] == 28 + 25 + 28
+
+    for d in (28, 29):
+        result = await engine.advance(db, org.id, start + timedelta(days=d), seasons, tmax[:, d], tmin[:, d])
+    # Re-running a day replaces it rather than double counting
+    result = await engine.advance(db, org.id, start + timedelta(days=29), seasons, tmax[:, 29], tmin[:, 29])
+    await db.commit()
+
+    planted = np.arange(30)[None, :] >= np.array([[0], [3], [0]])
+    expected = engine.compute(seasons, np.where(planted, tmax, np.nan), np.where(planted, tmin, np.nan))
+    assert [r["cumulative_gdd"] for r in result["results"]] == pytest.approx(expected.cumulative[:, -1].tolist())
+    assert [r["growth_stage"] for r in result["results"]] == expected.stages[:, -1].tolist()
+    assert result["outlier_field_ids"] == [seasons[f].field_id for f in np.flatnonzero(expected.outliers[:, -1])]
+    assert 1 in result["outlier_field_ids"]
+
+    logs = (await db.execute(
+        select(GrowingDegreeDayLog).where(GrowingDegreeDayLog.organization_id == org.id, GrowingDegreeDayLog.field_id == 1)
+        .order_by(GrowingDegreeDayLog.log_date)
+    )).scalars().all()
+    assert len(logs) == 30
+    assert logs[-1].cumulative_gdd == pytest.approx(expected.cumulative[0, -1])
+
+    skipped = await engine.advance(db, org.id, start + timedelta(days=30), seasons, [30.0, np.nan, 30.0], [15.0, 12.0, 15.0])
+    assert skipped["skipped_field_ids"] == [2]
+    with pytest.raises(ValueError):
+        await engine.advance(db, org.id, start + timedelta(days=10), seasons, tmax[:, 10], tmin[:, 10])
@@ -0,0 +1,116 @@
+"""
+Tests for batched SNP calling, the cluster atlas and the genotype store writer.
+"""
+
+import numpy as np
+import pytest
+import zarr
+
+from app.models.core import Organization
+from app.modules.genomics.services import genotype_calling_service as calling
+from app.modules.genomics.services.snp_clustering_service import (
+    NO_CALL,
+    ClusterAtlas,
+    call_genotype_matrix,
+)
+
+
+def _plate(n_snps, n_samples=200, seed=0, centers=(0.08, 0.5, 0.92), sd=0.03):
+    """Simulated X/Y intensities and the true genotype codes behind them."""
+    rng = np.random.default_rng(seed)
+    freq = rng.uniform(0.1, 0.9, n_snps)[:, None]
+    genotypes = (rng.random((n_snps, n_samples)) < freq).astype(int)
+    genotypes += rng.random((n_snps, n_samples)) < freq
+    snp_centers = np.asarray(centers) + rng.normal(0, 0.03, (n_snps, 3))
+    theta = np.clip(np.take_along_axis(snp_centers, genotypes, 1) + rng.normal(0, sd, genotypes.shape), 0, 1)
+    r = rng.gamma(20, 0.1, genotypes.shape)
+    r[:, :3] = 0.01  # failed samples
+    x = r / (1 + np.tan(theta * np.pi / 2))
+    return x, r - x, genotypes
+
+
+def test_batched_calls_match_simulated_genotypes():
+    x, y, truth = _plate(300)
+
+    result = call_genotype_matrix(x, y, block_size=128, max_workers=1)
+
+    called = result.calls != NO_CALL
+    assert result.calls.shape == (300, 200)
+    assert not called[:, :3].any()
+    assert called[:, 3:].mean() > 0.99
+    assert (result.calls[called] == truth[called]).mean() > 0.999
+    assert np.all(np.diff(result.means, axis=1) > 0)
+    assert np.nanmin(result.cluster_separation) > 1.0
+    assert result.per_snp_stats()["SNP_1"]["call_rate"] == pytest.approx(result.call_rates[0])
+
+
+def test_parallel_blocks_match_serial():
+    x, y, _ = _plate(96, n_samples=80, seed=1)
+
+    serial = call_genotype_matrix(x, y, block_size=32, max_workers=1)
+    parallel = call_genotype_matrix(x, y, block_size=32, max_workers=2)
+
+    assert np.array_equal(serial.calls, parallel.calls)
+    assert np.allclose(serial.means, parallel.means)
+
+
+def test_atlas_seeds_shifted_plate_and_round_trips(tmp_path):
+    names = [f"rs{i}" for i in range(50)]
+    x, y, _ = _plate(50, seed=2)
+    first = call_genotype_matrix(x, y, snp_names=names, max_workers=1)
+    atlas, updated = calling.update_atlas(ClusterAtlas.empty(), first)
+    assert updated == 50
+
+    path = str(tmp_path / "panel.npz")
+    atlas.save(path)
+    loaded = ClusterAtlas.load(path)
+    assert list(loaded.snp_names) == names
+    assert np.array_equal(loaded.n_plates, np.ones(50))
+    assert len(ClusterAtlas.load(str(tmp_path / "missing.npz"))) == 0
+
+    # A later plate in a different SNP order, carrying one SNP the atlas has not seen
+    order = [*range(49, -1, -1)]
+    x2, y2, truth2 = _plate(51, seed=3)
+    seeded = call_genotype_matrix(
+        x2, y2, snp_names=[names[i] for i in order] + ["rs_new"], atlas=loaded, max_workers=1
+    )
+    assert seeded.seeded.tolist() == [True] * 50 + [False]
+    called = seeded.calls != NO_CALL
+    assert (seeded.calls[called] == truth2[called]).mean() > 0.99
+
+    merged, _ = calling.update_atlas(loaded, seeded)
+    assert len(merged) == 51
+    assert merged.n_plates.tolist() == [2] * 50 + [1]
+    assert np.all(merged.n_samples[:50] > loaded.n_samples)
+
+
+def test_empty_plate_keeps_result_shapes():
+    result = call_genotype_matrix(np.empty((0, 12)), np.empty((0, 12)), max_workers=1)
+
+    assert result.calls.shape == (0, 12)
+    assert result.means.shape == (0, 3)
+
+
+@pytest.mark.asyncio
+async def test_call_plate_writes_store_and_registers_variant_set(async_db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(calling, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(calling, "ATLAS_DIR", str(tmp_path / "atlases"))
+    org = Organization(name="Calling Org")
+    async_db_session.add(org)
+    await async_db_session.flush()
+
+    x, y, truth = _plate(40, n_samples=30, seed=4)
+    samples = [f"S{i}" for i in range(30)]
+    summary = await calling.GenotypeCallingService().call_plate(
+        async_db_session, org.id, "plate 1", x, y, samples, [f"rs{i}" for i in range(40)],
+        panel="panel-a", max_workers=1,
+    )
+
+    store = zarr.open_group(summary["storage_path"], mode="r")
+    gt = store["calldata/GT"][:]
+    assert gt.shape == (40, 30, 2)
+    assert (gt[:, :3] == -1).all()
+    assert np.array_equal(gt[:, 3:].sum(axis=2), truth[:, 3:])
+    assert list(store["samples"][:]) == samples
+    assert summary["n_snps"] == 40 and summary["atlas_snps_updated"] > 0
+    assert len(ClusterAtlas.load(calling.atlas_path("panel-a"))) == summary["atlas_snps_updated"]
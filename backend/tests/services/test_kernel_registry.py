@@ -0,0 +1,192 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.services import compute_kernels
+from app.services.compute_engine import ComputeBackend, ComputeEngine
+from app.services.kernel_registry import KernelRegistry, outputs_close, shape_bucket
+
+
+def _solve_registry(path, **kwargs) -> KernelRegistry:
+    registry = KernelRegistry(str(path), **kwargs)
+    registry.add_operation("solve", bucket=lambda A, b: shape_bucket(len(A)))
+
+    @registry.register("solve", "numpy", reference=True)
+    def solve_numpy(A, b):
+        return np.linalg.solve(A, b)
+
+    return registry
+
+
+def _spd_system(n: int = 6):
+    rng = np.random.default_rng(0)
+    M = rng.normal(size=(n, n))
+    return M @ M.T + n * np.eye(n), rng.normal(size=n)
+
+
+def test_shape_bucket_rounds_up_to_powers_of_two():
+    assert shape_bucket(1, 3, 512, 513) == "1x4x512x1024"
+
+
+def test_outputs_close_compares_structure():
+    assert outputs_close((np.ones(3), "a", None), (np.ones(3) + 1e-12, "a", None), 1e-6, 1e-8)
+    assert not outputs_close((np.ones(3), "a"), (np.ones(3), "b"), 1e-6, 1e-8)
+    assert not outputs_close({"x": np.ones(3)}, {"x": np.ones(4)}, 1e-6, 1e-8)
+
+
+def test_tuning_is_persisted_and_reused(tmp_path):
+    path = tmp_path / "table.json"
+    registry = _solve_registry(path)
+    calls = []
+
+    @registry.register("solve", "lstsq")
+    def solve_lstsq(A, b):
+        calls.append(len(A))
+        return np.linalg.lstsq(A, b, rcond=None)[0]
+
+    A, b = _spd_system()
+    np.testing.assert_allclose(registry.dispatch("solve", A, b), np.linalg.solve(A, b))
+    assert set(registry.table()["solve"]["8"]["timings_ms"]) == {"numpy", "lstsq"}
+
+    reloaded = _solve_registry(path)
+    reloaded.register("solve", "lstsq")(solve_lstsq)
+    tuned_calls = len(calls)
+    reloaded.dispatch("solve", A, b)
+    assert reloaded.choice("solve", "8") in {"numpy", "lstsq"}
+    # A tuned bucket runs one implementation, not every candidate again
+    assert len(calls) - tuned_calls <= 1
+
+
+def test_table_from_another_build_is_discarded(tmp_path):
+    path = tmp_path / "table.json"
+    _solve_registry(path)._store("solve", "8", {"timings_ms": {"numpy": 1.0}, "rejected": {}})
+    stored = json.loads(path.read_text())
+    stored["fingerprint"]["numpy"] = "0.0"
+    path.write_text(json.dumps(stored))
+
+    assert _solve_registry(path).table() == {}
+
+
+def test_failing_and_mismatching_candidates_are_rejected(tmp_path):
+    registry = _solve_registry(tmp_path / "table.json")
+
+    @registry.register("solve", "broken")
+    def solve_broken(A, b):
+        raise RuntimeError("boom")
+
+    @registry.register("solve", "wrong")
+    def solve_wrong(A, b):
+        return np.zeros_like(b)
+
+    @registry.register("solve", "partial")
+    def solve_partial(A, b):
+        raise NotImplementedError("small systems only")
+
+    A, b = _spd_system()
+    np.testing.assert_allclose(registry.dispatch("solve", A, b), np.linalg.solve(A, b))
+
+    rejected = registry.table()["solve"]["8"]["rejected"]
+    assert rejected["broken"].startswith("error")
+    assert rejected["wrong"] == "mismatch with reference"
+    assert rejected["partial"].startswith("unsupported")
+    assert registry.choice("solve", "8") == "numpy"
+
+
+def test_cross_check_drops_a_diverging_candidate(tmp_path):
+    registry = _solve_registry(tmp_path / "table.json", cross_check=True)
+    drift = {"offset": 0.0}
+
+    @registry.register("solve", "drifting")
+    def solve_drifting(A, b):
+        return np.linalg.solve(A, b) + drift["offset"]
+
+    A, b = _spd_system()
+    registry.dispatch("solve", A, b)
+    registry._store(
+        "solve", "8", {"timings_ms": {"numpy": 10.0, "drifting": 1.0}, "rejected": {}}
+    )
+    assert registry.choice("solve", "8") == "drifting"
+
+    drift["offset"] = 1.0
+    np.testing.assert_allclose(registry.dispatch("solve", A, b), np.linalg.solve(A, b))
+    assert registry.choice("solve", "8") == "numpy"
+    assert registry.table()["solve"]["8"]["rejected"]["drifting"] == "cross-check mismatch"
+
+
+def test_native_candidates_can_be_excluded(tmp_path):
+    registry = _solve_registry(tmp_path / "table.json")
+
+    @registry.register("solve", "native", native=True)
+    def solve_native(A, b):
+        return np.linalg.solve(A, b)
+
+    @registry.register("solve", "missing", native=True, available=lambda: False)
+    def solve_missing(A, b):
+        raise AssertionError("unavailable kernels are never called")
+
+    assert [c.name for c in registry.candidates("solve")] == ["numpy", "native"]
+    assert [c.name for c in registry.candidates("solve", allow_native=False)] == ["numpy"]
+
+
+@pytest.mark.parametrize(
+    ("operation", "args"),
+    [
+        ("grm", (np.random.default_rng(1).integers(0, 3, (40, 120)).astype(float), "vanraden1")),
+        ("grm", (np.random.default_rng(2).integers(0, 3, (40, 120)).astype(float), "yang")),
+        (
+            "gblup",
+            (
+                np.random.default_rng(3).integers(0, 3, (60, 25)).astype(float),
+                np.random.default_rng(4).normal(size=60),
+                0.4,
+            ),
+        ),
+        ("pca", (np.random.default_rng(5).normal(size=(30, 80)), 3, True, True)),
+    ],
+)
+def test_numpy_candidates_agree_with_reference(operation, args):
+    registry = compute_kernels.kernel_registry
+    op = registry.operations[operation]
+    expected = op.outputs(op.reference.func(*args))
+
+    for candidate in registry.candidates(operation, allow_native=False):
+        try:
+            result = candidate.func(*args)
+        except NotImplementedError:
+            continue
+        assert outputs_close(op.outputs(result), expected, 1e-6, 1e-8), candidate.name
+
+
+def test_ld_matrix_handles_missing_calls():
+    rng = np.random.default_rng(6)
+    genotypes = rng.integers(0, 3, (50, 8)).astype(float)
+    genotypes[rng.random(genotypes.shape) < 0.1] = -1
+
+    r2 = ComputeEngine(ComputeBackend.NUMPY).compute_ld_matrix(genotypes)
+
+    i, j = 1, 5
+    ok = (genotypes[:, i] >= 0) & (genotypes[:, j] >= 0)
+    expected = np.corrcoef(genotypes[ok, i], genotypes[ok, j])[0, 1] ** 2
+    assert r2.shape == (8, 8)
+    np.testing.assert_allclose(np.diag(r2), 1.0)
+    assert r2[i, j] == pytest.approx(expected) and r2[j, i] == r2[i, j]
+
+
+def test_stability_and_selection_index():
+    engine = ComputeEngine(ComputeBackend.NUMPY)
+    env_effect = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])
+    yields = np.array([5.0, 6.0, 4.0])[:, None] + np.array([0.5, 1.0, 1.5])[:, None] * env_effect
+
+    fw = engine.compute_finlay_wilkinson(yields)
+    np.testing.assert_allclose(fw.slopes, [0.5, 1.0, 1.5])
+    np.testing.assert_allclose(fw.r_squared, 1.0)
+
+    er = engine.compute_stability(yields)
+    np.testing.assert_allclose(er.means, [5.0, 6.0, 4.0])
+    np.testing.assert_allclose(er.regression, [0.5, 1.0, 1.5])
+
+    P = np.array([[4.0, 1.0], [1.0, 3.0]])
+    G = np.array([[2.0, 0.5], [0.5, 1.0]])
+    a = np.array([1.0, 2.0])
+    np.testing.assert_allclose(engine.compute_selection_index(P, G, a), np.linalg.solve(P, G @ a))
@@ -0,0 +1,87 @@
+"""
+Tests for the typed observation columns (value_numeric / value_categorical / observed_at).
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.core import Organization
+from app.models.phenotyping import Observation, parse_observation_timestamp, typed_observation_values
+from app.modules.core.services.import_engine.domain_importers import ObservationImporter
+
+
+@pytest.mark.parametrize(
+    ("value", "numeric", "categorical"),
+    [
+        ("12.5", 12.5, None),
+        (" -3e2 ", -300.0, None),
+        (".5", 0.5, None),
+        (7, 7.0, None),
+        ("high", None, "high"),
+        ("NaN", None, "NaN"),
+        ("1e400", None, "1e400"),
+        ("", None, None),
+        (None, None, None),
+        ("x" * 300, None, None),
+    ],
+)
+def test_typed_values_split_numeric_and_categorical(value, numeric, categorical):
+    typed = typed_observation_values(value, None)
+
+    assert typed["value_numeric"] == numeric
+    assert typed["value_categorical"] == categorical
+
+
+def test_timestamps_parse_to_aware_utc():
+    assert parse_observation_timestamp("2024-05-01T10:00:00") == datetime(2024, 5, 1, 10, tzinfo=UTC)
+    assert parse_observation_timestamp("2024-05-01T10:00:00Z") == datetime(2024, 5, 1, 10, tzinfo=UTC)
+    offset = parse_observation_timestamp("2024-05-01T12:00:00+02:00")
+    assert offset.utcoffset() == timedelta(hours=2)
+    assert offset == datetime(2024, 5, 1, 10, tzinfo=UTC)
+    assert parse_observation_timestamp(datetime(2024, 5, 1)) == datetime(2024, 5, 1, tzinfo=UTC)
+    assert parse_observation_timestamp("yesterday") is None
+    assert parse_observation_timestamp(None) is None
+
+
+@pytest.mark.asyncio
+async def test_orm_writes_keep_typed_columns_in_sync(async_db_session):
+    db = async_db_session
+    org = Organization(name="Typed Org")
+    db.add(org)
+    await db.flush()
+
+    obs = Observation(
+        organization_id=org.id,
+        observation_db_id="typed-1",
+        value="4.25",
+        observation_time_stamp="2024-06-01T08:30:00+00:00",
+    )
+    db.add(obs)
+    await db.flush()
+
+    row = (await db.execute(
+        select(Observation.value_numeric, Observation.value_categorical, Observation.observed_at)
+        .where(Observation.id == obs.id)
+    )).one()
+    assert row.value_numeric == 4.25
+    assert row.value_categorical is None
+    assert row.observed_at.replace(tzinfo=UTC) == datetime(2024, 6, 1, 8, 30, tzinfo=UTC)
+
+    obs.value = "lodged"
+    await db.flush()
+    await db.refresh(obs)
+    assert obs.value_numeric is None
+    assert obs.value_categorical == "lodged"
+
+
+@pytest.mark.asyncio
+async def test_importer_rows_carry_typed_columns(async_db_session):
+    importer = ObservationImporter(async_db_session, organization_id=1, user_id=1)
+
+    row = await importer.resolve_foreign_keys({"value": "9.5", "date": "2024-07-15"})
+
+    assert row["value_numeric"] == 9.5
+    assert row["value_categorical"] is None
+    assert row["observed_at"] == datetime(2024, 7, 15, tzinfo=UTC)
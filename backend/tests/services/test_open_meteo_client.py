@@ -0,0 +1,158 @@
+"""
+Tests for the pooled, coalescing Open-Meteo client and its local history archive.
+"""
+
+import asyncio
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from app.modules.environment.services.open_meteo_fixtures import RecordedOpenMeteoTransport
+from app.modules.environment.services.weather_integration_service import (
+    OpenMeteoClient,
+    SingleFlight,
+    WeatherDataRequest,
+    WeatherIntegrationService,
+    missing_ranges,
+    snap_to_grid,
+)
+
+
+def _recorded(start: date, n_days: int, forecast_days: int = 16) -> RecordedOpenMeteoTransport:
+    days = [start + timedelta(days=i) for i in range(n_days)]
+    archive = {
+        "latitude": 28.6,
+        "longitude": 77.2,
+        "timezone": "Asia/Kolkata",
+        "daily_units": {"temperature_2m_max": "°C"},
+        "daily": {
+            "time": [d.isoformat() for d in days],
+            "temperature_2m_max": [30.0 + (i % 7) for i in range(n_days)],
+            "temperature_2m_min": [15.0 + (i % 5) for i in range(n_days)],
+            "precipitation_sum": [float(i % 3) for i in range(n_days)],
+        },
+    }
+    today = date.today()
+    forecast = {
+        "latitude": 28.6,
+        "longitude": 77.2,
+        "daily": {
+            "time": [(today + timedelta(days=i)).isoformat() for i in range(forecast_days)],
+            "temperature_2m_max": [31.0] * forecast_days,
+            "temperature_2m_min": [18.0] * forecast_days,
+        },
+    }
+    return RecordedOpenMeteoTransport(archive=archive, forecast=forecast)
+
+
+def test_grid_snapping_and_gap_ranges():
+    assert snap_to_grid(28.6139, 77.2090) == snap_to_grid(28.6321, 77.1687) == (28.6, 77.2)
+    assert snap_to_grid(28.66, 77.2) != snap_to_grid(28.6, 77.2)
+
+    have = {"2024-01-02", "2024-01-03", "2024-01-06"}
+    assert missing_ranges(have, date(2024, 1, 1), date(2024, 1, 7)) == [
+        (date(2024, 1, 1), date(2024, 1, 1)),
+        (date(2024, 1, 4), date(2024, 1, 5)),
+        (date(2024, 1, 7), date(2024, 1, 7)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_forecasts_in_one_cell_share_one_request(tmp_path):
+    transport = _recorded(date(2024, 1, 1), 10)
+    client = OpenMeteoClient(transport=transport, archive_dir=str(tmp_path))
+
+    # Twenty dashboards in the same district, asking for different horizons
+    coords = [(28.6 + i * 0.002, 77.2 - i * 0.001, 3 + i % 10) for i in range(20)]
+    results = await asyncio.gather(*(client.get_forecast(lat, lon, days) for lat, lon, days in coords))
+
+    assert len(transport.requests) == 1
+    assert transport.requests[0].url.params["forecast_days"] == "16"
+    assert [len(r["daily"]["time"]) for r in results] == [days for _, _, days in coords]
+
+    await client.get_forecast(28.61, 77.21, days=7)
+    assert len(transport.requests) == 1
+    assert client.cache_stats()["memory"] >= 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors_and_forgets_failed_calls():
+    flights = SingleFlight()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    outcomes = await asyncio.gather(*(flights.run("k", failing) for _ in range(5)), return_exceptions=True)
+    assert calls == 1
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+    assert flights.in_flight == 0
+    with pytest.raises(RuntimeError):
+        await flights.run("k", failing)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_history_archive_downloads_only_missing_days(tmp_path):
+    transport = _recorded(date(2023, 1, 1), 365)
+    client = OpenMeteoClient(transport=transport, archive_dir=str(tmp_path))
+
+    first = await client.get_historical_weather(28.61, 77.21, date(2023, 3, 1), date(2023, 3, 31))
+    assert first["cache"] == {
+        "level": "upstream", "grid_cell": [28.6, 77.2], "days_from_archive": 0, "days_downloaded": 31,
+    }
+    assert os.path.exists(client.archive.path((28.6, 77.2)))
+
+    # An overlapping season from a nearby field only fetches April
+    second = await client.get_historical_weather(28.64, 77.18, date(2023, 3, 15), date(2023, 4, 30))
+    assert len(transport.requests) == 2
+    params = transport.requests[1].url.params
+    assert (params["start_date"], params["end_date"]) == ("2023-04-01", "2023-04-30")
+    assert second["cache"]["days_from_archive"] == 17
+    assert second["daily"]["time"][0] == "2023-03-15" and len(second["daily"]["time"]) == 47
+    assert second["daily"]["temperature_2m_max"][:17] == first["daily"]["temperature_2m_max"][14:]
+
+    # A fresh process reuses the archive on disk
+    restarted = OpenMeteoClient(transport=transport, archive_dir=str(tmp_path))
+    again = await restarted.get_historical_weather(28.6, 77.2, date(2023, 3, 1), date(2023, 4, 30))
+    assert again["cache"]["level"] == "archive"
+    assert len(transport.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_recent_days_are_served_but_not_archived(tmp_path):
+    start = date.today() - timedelta(days=20)
+    transport = _recorded(start, 20)
+    client = OpenMeteoClient(transport=transport, archive_dir=str(tmp_path))
+
+    data = await client.get_historical_weather(28.6, 77.2, start, start + timedelta(days=19))
+    assert len(data["daily"]["time"]) == 20
+    archived = client.archive.load((28.6, 77.2))["days"]
+    assert max(archived) == (date.today() - timedelta(days=5)).isoformat()
+
+
+@pytest.mark.asyncio
+async def test_integration_service_reports_cache_hit_rate(tmp_path):
+    client = OpenMeteoClient(transport=_recorded(date(2023, 1, 1), 60), archive_dir=str(tmp_path))
+    service = WeatherIntegrationService()
+    service.client = client
+    request = WeatherDataRequest(
+        location_id="FIELD-7",
+        latitude=28.61,
+        longitude=77.2,
+        start_date=date(2023, 1, 1),
+        end_date=date(2023, 1, 10),
+    )
+
+    cold = await service.get_temperature_data(request)
+    warm = await service.get_temperature_data(request)
+
+    assert cold.cache_hit_rate == 0.0
+    assert warm.cache_hit_rate == 1.0
+    assert len(warm.data) == 10 and warm.data_completeness == 1.0
+    assert warm.provenance["grid_cell"] == [28.6, 77.2]
@@ -0,0 +1,288 @@
+"""
+Tests for incrementally maintained organization counters.
+"""
+
+import asyncio
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.models.core import Organization, Program, Trial
+from app.models.germplasm import Seedlot
+from app.models.organization_counter import OrganizationCounter
+from app.modules.core.services.organization_counter_service import (
+    OrganizationCounterService,
+    register_counter_hooks,
+    unregister_counter_hooks,
+)
+from app.modules.germplasm.services.seed_inventory_service import SeedInventoryService
+
+
+@pytest.fixture
+def counter_hooks():
+    register_counter_hooks()
+    yield
+    unregister_counter_hooks()
+
+
+@pytest.fixture
+async def org_id(async_db_session):
+    org = Organization(name=f"Counter Org {datetime.now(UTC).timestamp()}")
+    async_db_session.add(org)
+    await async_db_session.commit()
+    yield org.id
+    await async_db_session.execute(delete(Seedlot).where(Seedlot.organization_id == org.id))
+    await async_db_session.execute(delete(Trial).where(Trial.organization_id == org.id))
+    await async_db_session.execute(delete(Program).where(Program.organization_id == org.id))
+    await async_db_session.execute(
+        delete(OrganizationCounter).where(OrganizationCounter.organization_id == org.id)
+    )
+    await async_db_session.commit()
+
+
+def _seedlot(org_id: int, lot_id: str, count: int, species: str = "Rice") -> Seedlot:
+    return Seedlot(
+        organization_id=org_id,
+        seedlot_db_id=lot_id,
+        seedlot_name=f"{species} - Test",
+        count=count,
+        units="g",
+        additional_info={"species": species, "status": "active", "storage_type": "long_term"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_counters_untrusted_until_reconciled(async_db_session, org_id, counter_hooks):
+    service = OrganizationCounterService()
+
+    program = Program(organization_id=org_id, program_name="P1")
+    async_db_session.add(program)
+    await async_db_session.flush()
+    async_db_session.add(Trial(organization_id=org_id, program_id=program.id, trial_name="T1", active=True))
+    await async_db_session.commit()
+
+    assert await service.get_counters(async_db_session, org_id) is None
+
+    counters = await service.get_or_reconcile(async_db_session, org_id)
+    await async_db_session.commit()
+
+    assert counters["programs"] == 1
+    assert counters["trials"] == 1
+    assert counters["trials.active"] == 1
+    assert (await service.get_counters(async_db_session, org_id))["trials"] == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_hook_tracks_inserts_updates_and_deletes(async_db_session, org_id, counter_hooks):
+    service = OrganizationCounterService()
+    await service.reconcile(async_db_session, org_id)
+    await async_db_session.commit()
+
+    big = _seedlot(org_id, f"LOT-BIG-{org_id}", 500)
+    small = _seedlot(org_id, f"LOT-SMALL-{org_id}", 40, species="Wheat")
+    async_db_session.add_all([big, small])
+    await async_db_session.commit()
+
+    counters = await service.get_counters(async_db_session, org_id)
+    assert counters["seedlots"] == 2
+    assert counters["seedlots.quantity_g"] == 540
+    assert counters["seedlots.low_stock"] == 1
+    assert counters["seedlots.species:Wheat"] == 1
+
+    big.count = 50
+    big.additional_info = {**big.additional_info, "status": "low_stock"}
+    await async_db_session.commit()
+
+    counters = await service.get_counters(async_db_session, org_id)
+    assert counters["seedlots.quantity_g"] == 90
+    assert counters["seedlots.low_stock"] == 2
+    assert counters["seedlots.status:active"] == 1
+    assert counters["seedlots.status:low_stock"] == 1
+
+    await async_db_session.delete(small)
+    await async_db_session.commit()
+
+    counters = await service.get_counters(async_db_session, org_id)
+    assert counters["seedlots"] == 1
+    assert counters["seedlots.species:Wheat"] == 0
+
+    # Incremental state must agree with a full recount
+    recount = await service.recount(async_db_session, org_id)
+    for key, value in recount.items():
+        assert counters.get(key, 0) == value, key
+
+
+@pytest.mark.asyncio
+async def test_mark_stale_forces_recount(async_db_session, org_id):
+    service = OrganizationCounterService()
+    await service.reconcile(async_db_session, org_id)
+    await async_db_session.commit()
+
+    # Written without hooks, as a bulk path would
+    async_db_session.add(_seedlot(org_id, f"LOT-BULK-{org_id}", 250))
+    await async_db_session.commit()
+    assert (await service.get_counters(async_db_session, org_id)).get("seedlots", 0) == 0
+
+    await service.mark_stale(async_db_session, org_id)
+    await async_db_session.commit()
+    assert await service.get_counters(async_db_session, org_id) is None
+
+    counters = await service.get_or_reconcile(async_db_session, org_id)
+    assert counters["seedlots"] == 1
+
+    sentinel = await async_db_session.scalar(
+        select(OrganizationCounter.is_stale).where(
+            OrganizationCounter.organization_id == org_id,
+            OrganizationCounter.counter_key == "_reconciled",
+        )
+    )
+    assert sentinel is False
+
+
+@pytest.mark.asyncio
+async def test_seeders_mark_counters_stale(async_db_session, org_id, monkeypatch):
+    from app.db.seeders import base as seeder_base
+
+    service = OrganizationCounterService()
+    await service.reconcile(async_db_session, org_id)
+    await async_db_session.commit()
+
+    class RawSeeder:
+        name = "raw"
+
+        def __init__(self, db):
+            self.db = db
+
+        def run(self, env):
+            self.db.add(_seedlot(org_id, f"LOT-SEEDED-{org_id}", 250))
+            self.db.commit()
+            return 1
+
+    monkeypatch.setattr(seeder_base, "_seeders", [RawSeeder])
+    await async_db_session.run_sync(lambda session: seeder_base.run_seeders(session))
+
+    assert await service.get_counters(async_db_session, org_id) is None
+    assert (await service.get_or_reconcile(async_db_session, org_id))["seedlots"] == 1
+
+
+@pytest.mark.asyncio
+async def test_inventory_summary_and_alerts_from_counters(async_db_session, org_id, counter_hooks):
+    async_db_session.add_all([
+        _seedlot(org_id, f"LOT-A-{org_id}", 1000),
+        _seedlot(org_id, f"LOT-B-{org_id}", 20),
+    ])
+    await async_db_session.commit()
+
+    service = SeedInventoryService()
+    summary = await service.get_inventory_summary(async_db_session, org_id)
+
+    assert summary["total_lots"] == 2
+    assert summary["total_quantity_g"] == 1020
+    assert summary["by_status"] == {"active": 2}
+    assert summary["by_species"]["Rice"] == {"lots": 2, "quantity_g": 1020}
+
+    alerts = await service.get_alerts(async_db_session, org_id)
+    assert [alert["lot_id"] for alert in alerts] == [f"LOT-B-{org_id}"]
+
+
+@pytest.mark.asyncio
+async def test_overdue_viability_tests_ignore_last_updated(async_db_session, org_id, counter_hooks):
+    today = date.today()
+    overdue = (today - timedelta(days=400)).isoformat()
+    shipped = _seedlot(org_id, f"LOT-SHIPPED-{org_id}", 500)
+    shipped.additional_info = {**shipped.additional_info, "last_viability_test": overdue}
+    # Shipping touches last_updated without a new viability test
+    shipped.last_updated = today
+    undated = _seedlot(org_id, f"LOT-UNDATED-{org_id}", 500)
+    undated.additional_info = {**undated.additional_info, "last_viability_test": overdue}
+    recent = _seedlot(org_id, f"LOT-RECENT-{org_id}", 500)
+    recent.additional_info = {**recent.additional_info, "last_viability_test": today.isoformat()}
+    async_db_session.add_all([shipped, undated, recent])
+    await async_db_session.commit()
+
+    summary = await SeedInventoryService().get_inventory_summary(async_db_session, org_id)
+
+    assert sorted(lot["lot_id"] for lot in summary["lots_needing_viability_test"]) == [
+        f"LOT-SHIPPED-{org_id}",
+        f"LOT-UNDATED-{org_id}",
+    ]
+    assert {lot["days_since_test"] for lot in summary["lots_needing_viability_test"]} == {400}
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_applies_counter_deltas(async_db_session, org_id):
+    from app.models.germplasm import Germplasm
+    from app.modules.core.services.import_engine.domain_importers import GermplasmImporter
+
+    service = OrganizationCounterService()
+    await service.reconcile(async_db_session, org_id)
+    await async_db_session.commit()
+
+    importer = GermplasmImporter(async_db_session, organization_id=org_id, user_id=1)
+    rows = [
+        {"germplasm_name": f"G-{org_id}-{i}", "organization_id": org_id} for i in range(3)
+    ]
+    assert await importer.bulk_insert(rows) == 3
+    await async_db_session.commit()
+
+    counters = await service.get_counters(async_db_session, org_id)
+    assert counters["germplasm"] == 3
+    recount = await service.recount(async_db_session, org_id)
+    for key, value in recount.items():
+        assert counters.get(key, 0) == value, key
+
+    await async_db_session.execute(delete(Germplasm).where(Germplasm.organization_id == org_id))
+    await async_db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_upserts_and_drops_stale_keys(async_db_session, org_id):
+    service = OrganizationCounterService()
+    await service.reconcile(async_db_session, org_id)
+    async_db_session.add(
+        OrganizationCounter(organization_id=org_id, counter_key="observations.month:2000-01", value=4)
+    )
+    await async_db_session.commit()
+
+    # A second reconcile over existing rows must not trip the unique key
+    await service.reconcile(async_db_session, org_id)
+    await async_db_session.commit()
+
+    keys = (
+        await async_db_session.scalars(
+            select(OrganizationCounter.counter_key).where(
+                OrganizationCounter.organization_id == org_id
+            )
+        )
+    ).all()
+    assert len(keys) == len(set(keys))
+    assert "observations.month:2000-01" not in keys
+    assert "_reconciled" in keys
+
+
+@pytest.mark.asyncio
+async def test_concurrent_readers_share_one_recount(monkeypatch):
+    service = OrganizationCounterService()
+    recounts = []
+
+    async def untrusted(db, organization_id):
+        return None
+
+    async def slow_reconcile(db, organization_id):
+        recounts.append(organization_id)
+        await asyncio.sleep(0.01)
+        return {"programs.total": 3.0}
+
+    async def no_lock(db, organization_id):
+        return False
+
+    monkeypatch.setattr(service, "get_counters", untrusted)
+    monkeypatch.setattr(service, "reconcile", slow_reconcile)
+    monkeypatch.setattr(service, "_lock", no_lock)
+
+    results = await asyncio.gather(*(service.get_or_reconcile(None, 7) for _ in range(5)))
+
+    assert recounts == [7]
+    assert all(r == {"programs.total": 3.0} for r in results)
+    assert service._reconciling == {}
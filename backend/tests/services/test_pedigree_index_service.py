@@ -0,0 +1,204 @@
+"""
+Tests for the in-memory pedigree index.
+"""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.models.core import Organization
+from app.models.germplasm import Cross, Germplasm
+from app.modules.breeding.services.pedigree_index_service import (
+    PedigreeIndex,
+    pedigree_index_cache,
+    register_pedigree_index_hooks,
+    unregister_pedigree_index_hooks,
+)
+from app.modules.breeding.services.pedigree_service import PedigreeService
+
+
+def _index(pedigree: dict[str, tuple[str | None, str | None]]) -> PedigreeIndex:
+    ids = {name: i + 1 for i, name in enumerate(pedigree)}
+    rows = [
+        (ids[name], name, name, ids.get(sire), ids.get(dam))
+        for name, (sire, dam) in pedigree.items()
+    ]
+    return PedigreeIndex.build(rows)
+
+
+def _tabular_a(index: PedigreeIndex) -> np.ndarray:
+    """Reference A built with the tabular method."""
+    n = index.size
+    A = np.zeros((n, n))
+    for i in range(n):
+        s, d = int(index.sire[i]), int(index.dam[i])
+        for j in range(i):
+            A[i, j] = A[j, i] = 0.5 * ((A[j, s] if s >= 0 else 0) + (A[j, d] if d >= 0 else 0))
+        A[i, i] = 1 + (0.5 * A[s, d] if s >= 0 and d >= 0 else 0)
+    return A
+
+
+PEDIGREE = {
+    # Listed child-first so the index has to reorder
+    "G3": ("G2a", "G2b"),
+    "G2a": ("F1", "F2"),
+    "G2b": ("F1", "F2"),
+    "G2c": ("G2a", None),
+    "F1": (None, None),
+    "F2": (None, None),
+    "F3": (None, None),
+    "G4": ("G3", "G2a"),
+    "G3s": ("G2c", "G2c"),
+}
+
+
+def test_build_orders_parents_before_progeny():
+    index = _index(PEDIGREE)
+
+    known = index.sire >= 0
+    assert (index.sire[known] < np.arange(index.size)[known]).all()
+    assert index.generation[index.position("F3")] == 0
+    assert index.generation[index.position("G3")] == 2
+    assert index.generation[index.position("G4")] == 3
+    assert index.n_generations == 4
+    assert index.parent_keys(index.position("G2c")) == ("G2a", None)
+    assert list(index.generation) == sorted(index.generation)
+
+
+def test_inbreeding_full_sibs_and_selfing():
+    index = _index(PEDIGREE)
+
+    assert index.inbreeding[index.position("G3")] == pytest.approx(0.25)
+    assert index.inbreeding[index.position("G3s")] == pytest.approx(0.5)
+    assert index.inbreeding[index.position("F1")] == 0.0
+    assert np.allclose(index.inbreeding, np.diag(_tabular_a(index)) - 1)
+
+
+def test_colleau_product_matches_tabular_relationships():
+    index = _index(PEDIGREE)
+    A = _tabular_a(index)
+    x = np.random.default_rng(1).normal(size=(index.size, 3))
+
+    assert np.allclose(index.a_times(x), A @ x)
+    positions = [index.position("G3"), index.position("G2c"), index.position("G4")]
+    assert np.allclose(index.relationship_matrix(positions), A[np.ix_(positions, positions)])
+    assert index.coancestry(index.position("G2a"), index.position("G2b")) == pytest.approx(0.25)
+
+
+def test_pedigree_loops_are_cut():
+    index = _index({
+        "A": ("B", None),
+        "B": ("A", None),
+        "C": ("A", None),
+    })
+
+    assert index.broken_links == 1
+    assert index.size == 3
+    assert index.parent_keys(index.position("C")) == ("A", None)
+    assert index.parent_keys(index.position("A")) == (None, None)
+
+
+def test_ancestors_and_descendants_report_closest_depth():
+    index = _index(PEDIGREE)
+    keys = lambda depths: {index.keys[p]: d for p, d in depths.items()}  # noqa: E731
+
+    assert keys(index.ancestors(index.position("G4"))) == {
+        "G3": 1, "G2a": 1, "G2b": 2, "F1": 2, "F2": 2,
+    }
+    assert keys(index.ancestors(index.position("G4"), max_generations=1)) == {"G3": 1, "G2a": 1}
+    assert keys(index.descendants(index.position("F1"))) == {
+        "G2a": 1, "G2b": 1, "G3": 2, "G2c": 2, "G4": 2, "G3s": 3,
+    }
+    assert index.descendants(index.position("F3")) == {}
+
+
+@pytest.fixture
+def pedigree_index_hooks():
+    register_pedigree_index_hooks()
+    yield
+    unregister_pedigree_index_hooks()
+    pedigree_index_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_service_reads_index_and_picks_up_new_crosses(async_db_session, pedigree_index_hooks):
+    db = async_db_session
+    org = Organization(name="Index Org")
+    db.add(org)
+    await db.flush()
+    sire = Germplasm(germplasm_db_id="S", germplasm_name="S", organization_id=org.id)
+    dam = Germplasm(germplasm_db_id="D", germplasm_name="D", organization_id=org.id)
+    db.add_all([sire, dam])
+    await db.flush()
+    cross = Cross(cross_db_id="SxD", cross_name="S/D", organization_id=org.id, parent1_db_id=sire.id, parent2_db_id=dam.id)
+    db.add(cross)
+    await db.flush()
+
+    service = PedigreeService(db)
+    stats = await service.get_stats(org.id)
+    assert (stats["n_individuals"], stats["n_generations"]) == (2, 1)
+
+    db.add_all([
+        Germplasm(germplasm_db_id=name, germplasm_name=name, organization_id=org.id, cross_id=cross.id)
+        for name in ("K1", "K2")
+    ])
+    await db.flush()
+
+    stats = await service.get_stats(org.id)
+    assert (stats["n_individuals"], stats["n_founders"], stats["n_generations"]) == (4, 2, 2)
+    assert stats["completeness_index"] == 100.0
+
+    coancestry = await service.calculate_coancestry("K1", "K2", org.id)
+    assert coancestry["coancestry"] == pytest.approx(0.25)
+    assert coancestry["relationship"] == "Full Siblings"
+
+    ancestors = await service.get_ancestors("K1", organization_id=org.id)
+    assert sorted(ancestors["ancestors"]) == ["D", "S"]
+    assert ancestors["tree"]["sire"]["id"] == "S"
+
+    matrix = await service.get_relationship_matrix(["S", "K1", "missing"], org.id)
+    assert matrix["individuals"] == ["S", "K1"]
+    assert matrix["matrix"] == [[1.0, 0.5], [0.5, 1.0]]
+
+    graph = await service.get_pedigree_graph("S", depth=1, organization_id=org.id)
+    assert {node["data"]["id"] for node in graph["nodes"]} == {"S", "D", "K1", "K2"}
+
+
+@pytest.mark.asyncio
+async def test_cached_index_skips_fingerprint_until_recheck_or_write(
+    async_db_session, pedigree_index_hooks, monkeypatch
+):
+    db = async_db_session
+    org = Organization(name="Recheck Org")
+    db.add(org)
+    await db.flush()
+    db.add(Germplasm(germplasm_db_id="R1", germplasm_name="R1", organization_id=org.id))
+    await db.flush()
+
+    fingerprints = []
+    fingerprint = pedigree_index_cache.fingerprint
+
+    async def counting_fingerprint(session, organization_id):
+        fingerprints.append(organization_id)
+        return await fingerprint(session, organization_id)
+
+    monkeypatch.setattr(pedigree_index_cache, "fingerprint", counting_fingerprint)
+
+    first = await pedigree_index_cache.get(db, org.id)
+    assert await pedigree_index_cache.get(db, org.id) is first
+    assert fingerprints == [org.id]
+
+    # A write from this process drops the index without waiting for the recheck
+    db.add(Germplasm(germplasm_db_id="R2", germplasm_name="R2", organization_id=org.id))
+    await db.flush()
+    assert (await pedigree_index_cache.get(db, org.id)).size == 2
+
+    # Past the recheck interval an unchanged fingerprint keeps the cached index
+    monkeypatch.setattr(settings, "PEDIGREE_INDEX_RECHECK_SECONDS", 0)
+    second = await pedigree_index_cache.get(db, org.id)
+    assert await pedigree_index_cache.get(db, org.id) is second
+    assert len(fingerprints) == 4
+
+    # An index built from rows that are then rolled back is not kept
+    await db.rollback()
+    assert pedigree_index_cache._indexes.get(org.id) is None
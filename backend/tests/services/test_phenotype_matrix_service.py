@@ -0,0 +1,123 @@
+"""
+Tests for the shared columnar phenotype matrix.
+"""
+
+import numpy as np
+import pytest
+
+from app.models.core import Organization, Program, Study, Trial
+from app.models.germplasm import Germplasm
+from app.models.phenotyping import Observation, ObservationVariable
+from app.modules.breeding.services.gxe_analysis_service import GxEAnalysisService
+from app.modules.core.services.phenotype_matrix_service import PhenotypeMatrix, PhenotypeMatrixService
+
+
+def test_pivot_matches_naive_cell_means():
+    rng = np.random.default_rng(3)
+    n = 2_000
+    germplasm = rng.integers(100, 130, n)
+    studies = rng.integers(10, 15, n)
+    traits = rng.choice([7, 9], n)
+    values = rng.normal(5, 1, n)
+    values[:5] = np.nan  # dropped, like unparseable values
+
+    matrix = PhenotypeMatrix.from_columns(germplasm, studies, traits, values)
+
+    means, counts = matrix.cube()
+    assert means.shape == (30, 5, 2)
+    g, e, t = 4, 2, matrix.trait_index(9)
+    selected = (germplasm == matrix.genotype_ids[g]) & (studies == matrix.environment_ids[e]) & (traits == 9)
+    selected &= np.isfinite(values)
+    assert counts[g, e, t] == selected.sum()
+    assert means[g, e, t] == pytest.approx(values[selected].mean())
+    assert counts.sum() == matrix.n_observations == n - 5
+
+    dense = matrix.trait_matrix(9)
+    assert np.shares_memory(dense, means)
+    assert np.allclose(matrix.sparse_trait_matrix(9).toarray(), np.nan_to_num(dense))
+
+
+def test_axes_follow_labels_and_imputation_uses_genotype_mean():
+    matrix = PhenotypeMatrix.from_columns(
+        germplasm_ids=np.array([1, 1, 2, 2, 2]),
+        study_ids=np.array([20, 10, 10, 10, 20]),
+        variable_ids=np.array([5, 5, 5, 5, 5]),
+        values=np.array([6.0, 4.0, 3.0, 5.0, 8.0]),
+        genotype_labels={1: "Swarna", 2: "IR64"},
+        environment_labels={10: "Ludhiana", 20: "Cuttack"},
+    )
+
+    assert matrix.genotype_names == ["IR64", "Swarna"]
+    assert matrix.environment_names == ["Cuttack", "Ludhiana"]
+    assert matrix.trait_matrix().tolist() == [[8.0, 4.0], [6.0, 4.0]]
+    g, e, values = matrix.observations()
+    assert sorted(zip(g.tolist(), e.tolist(), values.tolist())) == [
+        (0, 0, 8.0), (0, 1, 3.0), (0, 1, 5.0), (1, 0, 6.0), (1, 1, 4.0),
+    ]
+
+    sparse_only = PhenotypeMatrix.from_columns(
+        np.array([1, 2]), np.array([10, 20]), np.array([5, 5]), np.array([2.0, 6.0])
+    )
+    assert sparse_only.trait_matrix(5, impute="genotype_mean").tolist() == [[2.0, 2.0], [6.0, 6.0]]
+    with pytest.raises(KeyError):
+        sparse_only.trait_index(6)
+
+
+@pytest.mark.asyncio
+async def test_matrix_is_cached_until_observations_change(async_db_session):
+    db = async_db_session
+    org = Organization(name="Matrix Org")
+    db.add(org)
+    await db.flush()
+    program = Program(organization_id=org.id, program_name="MX")
+    db.add(program)
+    await db.flush()
+    trial = Trial(organization_id=org.id, program_id=program.id, trial_name="MET")
+    db.add(trial)
+    await db.flush()
+    studies = [
+        Study(organization_id=org.id, trial_id=trial.id, study_name=f"E{i}", study_db_id=f"mx-E{i}")
+        for i in range(2)
+    ]
+    variable = ObservationVariable(
+        organization_id=org.id, observation_variable_name="Yield", observation_variable_db_id="mx-yield"
+    )
+    germplasm = [
+        Germplasm(organization_id=org.id, germplasm_name=f"G{i}", germplasm_db_id=f"mx-G{i}")
+        for i in range(3)
+    ]
+    db.add_all([*studies, variable, *germplasm])
+    await db.flush()
+    db.add_all([
+        Observation(
+            organization_id=org.id,
+            study_id=studies[e].id,
+            germplasm_id=germplasm[g].id,
+            observation_variable_id=variable.id,
+            value=str(value),
+        )
+        for g, e, value in [(0, 0, 4.0), (0, 1, 5.0), (1, 0, 6.0), (1, 0, 7.0), (2, 1, "n/a")]
+    ])
+    await db.flush()
+
+    service = PhenotypeMatrixService()
+    study_ids = [s.id for s in studies]
+    first = await service.get_matrix(db, study_ids, [variable.id], organization_id=org.id)
+    assert first.genotype_names == ["G0", "G1"]
+    assert np.allclose(first.trait_matrix(), [[4.0, 5.0], [6.5, np.nan]], equal_nan=True)
+    assert await service.get_matrix(db, reversed(study_ids), [variable.id], organization_id=org.id) is first
+
+    db.add(Observation(
+        organization_id=org.id, study_id=studies[1].id, germplasm_id=germplasm[1].id,
+        observation_variable_id=variable.id, value="8",
+    ))
+    await db.flush()
+    second = await service.get_matrix(db, study_ids, [variable.id], organization_id=org.id)
+    assert second is not first
+    assert second.trait_matrix()[1, 1] == 8.0
+
+    gxe = await GxEAnalysisService().get_observation_matrix(db, ["mx-E0", "mx-E1"], "mx-yield", org.id)
+    assert gxe["genotype_names"] == ["G0", "G1"]
+    assert gxe["yield_matrix"].tolist() == [[4.0, 5.0], [6.5, 8.0]]
+    missing = await GxEAnalysisService().get_observation_matrix(db, ["mx-E0"], "unknown", org.id)
+    assert "error" in missing
@@ -0,0 +1,243 @@
+"""
+Tests for the ingest-time phenotype QC engine and the issue store it feeds.
+"""
+
+from datetime import UTC, datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from app.models.core import Organization, Program, Study, Trial
+from app.models.phenotyping import PhenotypeQCIssue, PhenotypeQCStatistic, ObservationVariable
+from app.modules.core.services.data_quality import DataQualityService
+from app.modules.core.services.import_engine.domain_importers import ObservationImporter
+from app.modules.core.services.phenotype_qc_service import (
+    PhenotypeQCService,
+    QuantileSketch,
+    TraitScale,
+    TraitStatistics,
+    score_values,
+)
+
+
+def test_sketch_quantiles_are_accurate_and_merge_exactly():
+    rng = np.random.default_rng(0)
+    values = rng.normal(100, 5, 20_000)
+    values[:50] = -values[:50]
+
+    whole = QuantileSketch().add(values)
+    halves = QuantileSketch().add(values[:7_000]).merge(QuantileSketch().add(values[7_000:]))
+
+    assert whole.to_dict() == halves.to_dict()
+    assert whole.median() == pytest.approx(np.median(values), rel=2e-3)
+    assert whole.mad() == pytest.approx(np.median(np.abs(values - np.median(values))), rel=0.05)
+    assert whole.quantile(0.0) < 0 < whole.quantile(0.01)
+
+    restored = QuantileSketch.from_dict(whole.to_dict())
+    assert restored.count == 20_000
+    assert restored.median() == whole.median()
+    with pytest.raises(ValueError):
+        whole.merge(QuantileSketch(alpha=0.01))
+
+
+def test_batch_scoring_flags_each_rule():
+    heights = 100 + 4 * np.sin(np.arange(40.0))
+    heights[5] = 160  # plausible under the scale but far from the study
+    heights[6] = 400  # outside the 0-300 scale
+    raw = [f"{v:.1f}" for v in heights] + ["tall", "3", "9", ""]
+    numeric = np.array([*heights, np.nan, 3, 9, np.nan])
+    groups = np.array([0] * 41 + [1, 1, 1])
+    scales = [
+        TraitScale.from_valid_values("Numerical", 0, 300),
+        TraitScale.from_valid_values("Ordinal", categories=[{"value": "1"}, {"value": "3", "label": "mid"}]),
+    ]
+    in_scale = heights[heights <= 300]
+    statistics = [TraitStatistics.from_values(in_scale), None]
+
+    flags = {(flag.index, flag.rule): flag for flag in score_values(raw, numeric, groups, scales, statistics)}
+
+    assert set(flags) == {(5, "robust_outlier"), (6, "out_of_scale"), (40, "not_numeric"), (42, "invalid_category")}
+    assert flags[(5, "robust_outlier")].severity == "high"
+    assert flags[(5, "robust_outlier")].score > 7
+    assert "[0, 300]" in flags[(6, "out_of_scale")].reason
+
+
+def test_small_groups_are_not_scored_for_outliers():
+    stats = TraitStatistics.from_values(np.array([1.0, 1.1, 0.9]))
+    flags = score_values(["50"], np.array([50.0]), np.array([0]), [TraitScale()], [stats])
+    assert flags == []
+
+
+@pytest.fixture
+async def qc_setup(async_db_session):
+    db = async_db_session
+    org = Organization(name=f"QC Org {datetime.now(UTC).timestamp()}")
+    db.add(org)
+    await db.flush()
+    program = Program(organization_id=org.id, program_name="QC Program")
+    db.add(program)
+    await db.flush()
+    trial = Trial(organization_id=org.id, program_id=program.id, trial_name="QC Trial")
+    db.add(trial)
+    await db.flush()
+    study = Study(organization_id=org.id, trial_id=trial.id, study_name="QC Study")
+    variable = ObservationVariable(
+        organization_id=org.id,
+        observation_variable_name="Plant Height",
+        data_type="Numerical",
+        valid_values={"min": 0, "max": 300},
+    )
+    db.add_all([study, variable])
+    await db.commit()
+    return {"db": db, "org": org, "study": study, "variable": variable}
+
+
+def _rows(setup, values):
+    return [
+        {
+            "organization_id": setup["org"].id,
+            "study_id": setup["study"].id,
+            "observation_variable_id": setup["variable"].id,
+            "value": str(v),
+            "value_numeric": float(v),
+            "value_categorical": None,
+            "observed_at": None,
+        }
+        for v in values
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_batches_update_statistics_and_persist_flags(qc_setup):
+    db, org = qc_setup["db"], qc_setup["org"]
+    importer = ObservationImporter(db, organization_id=org.id, user_id=1)
+    first = np.round(np.random.default_rng(2).normal(100, 4, 30), 1)
+
+    assert await importer.bulk_insert(_rows(qc_setup, [*first, 350])) == 31
+    assert importer.qc_summary["by_rule"] == {"out_of_scale": 1}
+
+    await importer.bulk_insert(_rows(qc_setup, [101, 99, 155]))
+    assert importer.qc_summary["by_rule"] == {"robust_outlier": 1}
+    await db.commit()
+
+    stat = (await db.execute(
+        select(PhenotypeQCStatistic).where(PhenotypeQCStatistic.organization_id == org.id)
+    )).scalar_one()
+    in_scale = [*first, 101, 99, 155]
+    assert stat.n == 33
+    assert stat.max_value == 155
+    assert stat.sum_x == pytest.approx(sum(in_scale))
+
+    issues = (await db.execute(
+        select(PhenotypeQCIssue).where(PhenotypeQCIssue.organization_id == org.id)
+    )).scalars().all()
+    assert sorted(issue.value for issue in issues) == ["155", "350"]
+    assert all(issue.study_id == qc_setup["study"].id for issue in issues)
+
+
+@pytest.mark.asyncio
+async def test_dashboard_reads_store_and_rescore_keeps_reviewed_issues(qc_setup):
+    db, org = qc_setup["db"], qc_setup["org"]
+    importer = ObservationImporter(db, organization_id=org.id, user_id=1)
+    values = np.round(np.random.default_rng(3).normal(50, 2, 40), 1).tolist()
+    await importer.bulk_insert(_rows(qc_setup, [*values, 80, 500]))
+    await db.commit()
+
+    service = DataQualityService()
+    dashboard = await service.get_dashboard(db, org.id)
+    assert dashboard["issuesByEntity"]["observation"] == 2
+    assert dashboard["issuesByType"] == {"outlier": 1, "invalid": 1}
+    assert dashboard["highIssues"] == 2
+
+    outlier = (await service.get_issues(db, org.id, issue_type="outlier"))[0]
+    assert outlier["entityName"] == "Plant Height = 80"
+    resolved = await service.resolve_issue(db, org.id, outlier["id"], "curator", "checked in field notes")
+    assert resolved["status"] == "resolved"
+    assert await service.get_issue(db, org.id + 1000, outlier["id"]) is None
+
+    progress = []
+    summary = await PhenotypeQCService().rescore_organization(
+        db, org.id, progress_callback=lambda p, m: progress.append(p), chunk_size=15
+    )
+    await db.commit()
+
+    assert summary["scored"] == 42
+    assert summary["by_rule"] == {"out_of_scale": 1}
+    assert progress[-1] == 1.0
+    assert (await service.get_statistics(db, org.id))["openIssues"] == 1
+    stat = (await db.execute(
+        select(PhenotypeQCStatistic).where(PhenotypeQCStatistic.organization_id == org.id)
+    )).scalar_one()
+    assert stat.n == 41
+
+    validation = await service.run_validation(db, org.id, entity_type="observation")
+    check = validation["checks_run"][0]
+    assert check["issues"] == {"out_of_scale": 1}
+    assert (check["total_records"], check["values_scored"]) == (42, 41)
+    assert validation["entities_checked"] == 42
+
+
+@pytest.mark.asyncio
+async def test_rescore_rebuilds_field_book_values(qc_setup):
+    from app.models.field_operations import (
+        FieldBookEntry,
+        FieldBookObservation,
+        FieldBookStudy,
+        FieldBookTrait,
+    )
+
+    db, org = qc_setup["db"], qc_setup["org"]
+    importer = ObservationImporter(db, organization_id=org.id, user_id=1)
+    await importer.bulk_insert(_rows(qc_setup, np.round(np.random.default_rng(4).normal(100, 3, 20), 1)))
+    fb_study = FieldBookStudy(
+        organization_id=org.id, study_id=qc_setup["study"].id, study_code=f"FB-{org.id}", name="QC Book"
+    )
+    db.add(fb_study)
+    await db.flush()
+    trait = FieldBookTrait(
+        organization_id=org.id,
+        study_id=fb_study.id,
+        variable_id=qc_setup["variable"].id,
+        trait_code="plant_height",
+        name="Plant Height",
+        data_type="numeric",
+        min_value=0,
+        max_value=300,
+    )
+    values = [*np.round(np.random.default_rng(5).normal(100, 3, 10), 1).tolist(), 400.0]
+    entries = [
+        FieldBookEntry(organization_id=org.id, study_id=fb_study.id, plot_id=f"A-{i:02d}")
+        for i in range(len(values))
+    ]
+    db.add_all([trait, *entries])
+    await db.flush()
+    synced = [
+        FieldBookObservation(
+            organization_id=org.id, study_id=fb_study.id, entry_id=entry.id, trait_id=trait.id, value_numeric=v
+        )
+        for entry, v in zip(entries, values, strict=True)
+    ]
+    db.add_all(synced)
+    await db.commit()
+
+    summary = await PhenotypeQCService().rescore_organization(db, org.id, chunk_size=8)
+    await db.commit()
+
+    assert summary["scored"] == 31
+    stat = (await db.execute(
+        select(PhenotypeQCStatistic).where(PhenotypeQCStatistic.organization_id == org.id)
+    )).scalar_one()
+    assert stat.n == 30
+    issues = (await db.execute(
+        select(PhenotypeQCIssue).where(PhenotypeQCIssue.organization_id == org.id)
+    )).scalars().all()
+    assert [(issue.source, issue.record_id, issue.rule) for issue in issues] == [
+        ("field_book", synced[-1].id, "out_of_scale")
+    ]
+    flagged = (await db.scalars(
+        select(FieldBookObservation.id).where(
+            FieldBookObservation.organization_id == org.id, FieldBookObservation.is_outlier.is_(True)
+        )
+    )).all()
+    assert flagged == [synced[-1].id]
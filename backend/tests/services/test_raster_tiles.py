@@ -0,0 +1,179 @@
+"""
+Tests for the tiled raster engine: index rasters, per-plot statistics and plot observations.
+"""
+
+from datetime import UTC, datetime
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.features import rasterize
+from rasterio.transform import from_origin
+from rasterio.warp import transform_geom
+from sqlalchemy import func, select
+
+from app.models.core import Organization, Program, Study, Trial
+from app.models.phenotyping import Observation, ObservationUnit, ObservationVariable
+from app.modules.core.services.infra.image_leaf_area_calculator import LeafAreaCalculator
+from app.modules.core.services.raster_tile_service import (
+    ArrayRasterSource,
+    PlotIndexService,
+    PlotPolygon,
+    ndvi,
+    plot_index_statistics,
+    write_index_raster,
+)
+
+CRS = "EPSG:32643"
+TRANSFORM = from_origin(500_000.0, 3_100_000.0, 0.05, 0.05)
+
+
+def _mosaic(path, height=700, width=900, seed=0):
+    """Four-band (R, G, B, NIR) UTM orthomosaic with a nodata margin."""
+    rng = np.random.default_rng(seed)
+    bands = rng.integers(20, 230, (4, height, width)).astype(np.uint8)
+    bands[:, :, :40] = 0
+    with rasterio.open(
+        path, "w", driver="GTiff", height=height, width=width, count=4, dtype="uint8",
+        crs=CRS, transform=TRANSFORM, nodata=0, tiled=True, blockxsize=128, blockysize=128,
+    ) as dst:
+        dst.write(bands)
+        dst.descriptions = ("Red", "Green", "Blue", "NIR")
+    return bands
+
+
+def _plots(boxes):
+    """Rectangles given as pixel (row0, row1, col0, col1), returned as WGS84 polygons."""
+    plots = []
+    for i, (r0, r1, c0, c1) in enumerate(boxes):
+        (x0, y0), (x1, y1) = TRANSFORM @ (c0, r0), TRANSFORM @ (c1, r1)
+        ring = [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+        geometry = transform_geom(CRS, "EPSG:4326", {"type": "Polygon", "coordinates": [ring]})
+        plots.append(PlotPolygon(observation_unit_id=i + 1, name=f"P{i + 1}", geometry=geometry))
+    return plots
+
+
+BOXES = [(10, 60, 20, 80), (100, 160, 250, 330), (300, 420, 500, 560), (600, 690, 850, 899)]
+
+
+def _expected_means(bands):
+    red, nir = bands[0].astype(np.float32), bands[3].astype(np.float32)
+    values = ndvi(nir, red)
+    valid = (bands > 0).all(axis=0)
+    shapes = [(transform_geom("EPSG:4326", CRS, p.geometry), i + 1) for i, p in enumerate(_plots(BOXES))]
+    labels = rasterize(shapes, out_shape=valid.shape, transform=TRANSFORM, fill=0, dtype="int32")
+    return [values[(labels == i + 1) & valid].mean() for i in range(len(BOXES))], labels, valid
+
+
+def test_plot_statistics_from_tiles_match_whole_image(tmp_path):
+    path = str(tmp_path / "ortho.tif")
+    bands = _mosaic(path)
+    expected, labels, valid = _expected_means(bands)
+
+    stats = plot_index_statistics(path, _plots(BOXES), ["ndvi", "ccc"], tile_size=128, max_workers=1)
+    summary = stats.summary("ndvi")
+
+    assert np.allclose(summary["mean"], expected, atol=1e-6)
+    assert summary["count"].tolist() == [int(((labels == i + 1) & valid).sum()) for i in range(len(BOXES))]
+    assert summary["count"][0] < 50 * 60  # the plot overlapping the nodata margin
+    # Only tiles under a plot are read
+    assert stats.tiles_read < stats.tiles_total == 6 * 8
+    assert np.all((stats.summary("ccc")["mean"] >= 0) & (stats.summary("ccc")["mean"] <= 1))
+
+    parallel = plot_index_statistics(path, _plots(BOXES), ["ndvi"], tile_size=128, max_workers=2)
+    assert np.allclose(parallel.summary("ndvi")["mean"], summary["mean"])
+    assert np.array_equal(parallel.summary("ndvi")["count"], summary["count"])
+
+    with pytest.raises(ValueError, match="rededge"):
+        plot_index_statistics(path, _plots(BOXES), ["ndre"])
+
+
+def test_index_raster_is_written_tile_by_tile(tmp_path):
+    path, out = str(tmp_path / "ortho.tif"), str(tmp_path / "ndvi.tif")
+    bands = _mosaic(path, 300, 500)
+
+    result = write_index_raster(path, out, "NDVI", tile_size=128, max_workers=1)
+    assert result["tiles"] == 3 * 4
+
+    with rasterio.open(out) as written:
+        assert written.crs.to_string() == CRS and written.transform == TRANSFORM
+        values = written.read(1)
+    expected = ndvi(bands[3].astype(np.float32), bands[0].astype(np.float32))
+    assert np.isnan(values[:, :40]).all()
+    assert np.allclose(values[:, 40:], expected[:, 40:])
+
+
+def test_memory_mapped_array_and_tiled_canopy_area(tmp_path):
+    image = np.zeros((400, 600, 3), dtype=np.uint8)
+    image[:] = (120, 90, 80)  # bare soil
+    image[100:300, 200:500] = (40, 160, 30)  # canopy
+    npy = str(tmp_path / "mosaic.npy")
+    np.save(npy, image)
+
+    canopy = LeafAreaCalculator().calculate_canopy_area(npy, tile_size=128)
+    assert canopy["total_area_pixels"] == 200 * 300
+    assert canopy["canopy_fraction"] == pytest.approx(0.25)
+
+    # Without a CRS, plot coordinates are pixel coordinates
+    plot = PlotPolygon(1, "P1", {"type": "Polygon", "coordinates": [[[200, 100], [500, 100], [500, 300], [200, 300], [200, 100]]]})
+    source = ArrayRasterSource(np.load(npy, mmap_mode="r"))
+    stats = plot_index_statistics(source, [plot], ["ccc"], plot_crs=None, tile_size=128)
+    assert stats.summary("ccc")["mean"][0] == 1.0
+    assert stats.summary("ccc")["count"][0] == 200 * 300
+
+
+@pytest.mark.asyncio
+async def test_plot_observations_are_written_and_replaced_on_rerun(async_db_session, tmp_path):
+    db = async_db_session
+    org = Organization(name=f"UAV Org {datetime.now(UTC).timestamp()}")
+    db.add(org)
+    await db.flush()
+    program = Program(organization_id=org.id, program_name="UAV Program")
+    db.add(program)
+    await db.flush()
+    trial = Trial(organization_id=org.id, program_id=program.id, trial_name="UAV Trial")
+    db.add(trial)
+    await db.flush()
+    study = Study(organization_id=org.id, trial_id=trial.id, study_name="UAV Study")
+    db.add(study)
+    await db.flush()
+
+    plots = _plots(BOXES)
+    units = [
+        ObservationUnit(
+            organization_id=org.id, study_id=study.id, observation_unit_name=f"{org.id}-{p.name}",
+            geo_coordinates={"type": "Feature", "geometry": p.geometry},
+        )
+        for p in plots
+    ]
+    units.append(ObservationUnit(organization_id=org.id, study_id=study.id, observation_unit_name=f"{org.id}-nogeo"))
+    db.add_all(units)
+    await db.commit()
+
+    path = str(tmp_path / "ortho.tif")
+    expected, _, _ = _expected_means(_mosaic(path))
+    service = PlotIndexService()
+
+    result = await service.extract_plot_observations(
+        db, org.id, path, study.id, indices=["ndvi", "tgi"], source_layer_id=7, user_id=1, tile_size=256, max_workers=1,
+    )
+    await service.extract_plot_observations(
+        db, org.id, path, study.id, indices=["ndvi", "tgi"], source_layer_id=7, user_id=1, tile_size=256, max_workers=1,
+    )
+    await db.commit()
+
+    assert result["plots"] == 4 and result["observations"] == 8
+    count = (await db.execute(select(func.count()).select_from(Observation).where(Observation.organization_id == org.id))).scalar()
+    assert count == 8
+
+    ndvi_rows = (await db.execute(
+        select(Observation)
+        .join(ObservationVariable, Observation.observation_variable_id == ObservationVariable.id)
+        .where(Observation.organization_id == org.id, ObservationVariable.observation_variable_name == "UAV NDVI")
+    )).scalars().all()
+    by_unit = {r.observation_unit_id: r for r in ndvi_rows}
+    assert len(by_unit) == 4
+    for unit, mean in zip(units, expected, strict=False):
+        assert by_unit[unit.id].value_numeric == pytest.approx(mean, abs=1e-4)
+        assert by_unit[unit.id].observation_db_id == f"uav-layer7-{unit.id}-{by_unit[unit.id].observation_variable_id}"
+        assert by_unit[unit.id].additional_info["pixel_count"] > 0
@@ -0,0 +1,163 @@
+"""
+Tests for binary result artifacts.
+"""
+
+import asyncio
+import io
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.modules.core.services import result_artifact_service
+from app.modules.core.services.result_artifact_service import (
+    ArtifactFormat,
+    ResultArtifactStore,
+    UnsupportedArtifactFormat,
+    downsample_matrix,
+    negotiate_format,
+    run_artifact_purge_loop,
+)
+from app.modules.genomics.compute.gwas_compute import GWASCompute
+from app.modules.genomics.compute.statistics.kinship_compute import KinshipCompute
+from app.modules.genomics.services.gwas_service import GWASResult
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultArtifactStore(root=str(tmp_path), ttl_hours=1)
+
+
+def test_array_round_trip_is_scoped_to_organization(store):
+    matrix = np.arange(12, dtype=np.float64).reshape(3, 4)
+
+    artifact = store.save_array(matrix, name="kinship", organization_id=7)
+
+    handle = artifact.to_handle()
+    assert handle["shape"] == [3, 4]
+    assert np.dtype(handle["dtype"]) == np.float64
+    assert handle["href"].endswith(f"/{artifact.artifact_id}/data")
+    assert store.get(artifact.artifact_id, 8) is None
+    assert store.get("../etc", 7) is None
+
+    loaded = store.get(artifact.artifact_id, 7)
+    assert np.array_equal(store.load_array(loaded), matrix)
+    streamed = b"".join(store.iter_bytes(loaded, ArtifactFormat.NPY))
+    assert np.array_equal(np.load(io.BytesIO(streamed)), matrix)
+    assert json.loads(b"".join(store.iter_bytes(loaded, ArtifactFormat.JSON, rows_per_batch=2))) == matrix.tolist()
+
+
+def test_table_json_stream_and_expiry(store):
+    artifact = store.save_table(
+        {"name": np.array(["m1", "m2", "m3"]), "p_value": np.array([0.1, 0.01, 0.5])},
+        name="gwas",
+        organization_id=1,
+    )
+
+    rows = json.loads(b"".join(store.iter_bytes(artifact, ArtifactFormat.JSON, rows_per_batch=2)))
+    assert rows == [
+        {"name": "m1", "p_value": 0.1},
+        {"name": "m2", "p_value": 0.01},
+        {"name": "m3", "p_value": 0.5},
+    ]
+
+    expired = ResultArtifactStore(root=store.root, ttl_hours=0)
+    stale = expired.save_array(np.zeros(2), name="stale", organization_id=1)
+    assert store.get(stale.artifact_id, 1) is None
+    assert store.purge_expired() == 1
+    assert store.get(artifact.artifact_id, 1) is not None
+
+
+@pytest.mark.asyncio
+async def test_purge_loop_removes_expired_artifacts(store, monkeypatch):
+    kept = store.save_array(np.zeros(2), name="kept", organization_id=1)
+    expired = ResultArtifactStore(root=store.root, ttl_hours=0)
+    stale = expired.save_array(np.zeros(2), name="stale", organization_id=1)
+    monkeypatch.setattr(result_artifact_service, "result_artifact_store", store)
+
+    loop = asyncio.create_task(run_artifact_purge_loop(interval_seconds=3600))
+
+    def stale_files():
+        return [name for name in os.listdir(store.root) if name.startswith(stale.artifact_id)]
+
+    for _ in range(100):
+        if not stale_files():
+            break
+        await asyncio.sleep(0.01)
+    loop.cancel()
+    await loop
+
+    assert not stale_files()
+    assert store.get(kept.artifact_id, 1) is not None
+
+
+def test_negotiate_format(store):
+    artifact = store.save_array(np.zeros(3), name="vector")
+
+    assert negotiate_format(artifact) == ArtifactFormat.NPY
+    assert negotiate_format(artifact, accept="application/json") == ArtifactFormat.JSON
+    assert negotiate_format(artifact, accept="text/html, */*;q=0.1") == ArtifactFormat.NPY
+    assert negotiate_format(artifact, accept="application/json", requested="npy") == ArtifactFormat.NPY
+    with pytest.raises(UnsupportedArtifactFormat):
+        negotiate_format(artifact, accept="text/csv")
+
+
+def test_downsample_matrix_block_means():
+    matrix = np.arange(100, dtype=np.float64).reshape(10, 10)
+
+    preview = downsample_matrix(matrix, max_size=5)
+
+    blocks = np.array(preview["values"])
+    assert blocks.shape == (5, 5)
+    assert blocks[0, 0] == pytest.approx(matrix[:2, :2].mean())
+    assert preview["summary"]["min"] == 0
+    assert preview["summary"]["max"] == 99
+    assert preview["summary"]["diagonal_mean"] == pytest.approx(np.diag(matrix).mean())
+
+
+def test_manhattan_preview_keeps_peaks_and_significant_markers():
+    n_markers = 5000
+    rng = np.random.default_rng(0)
+    p_values = rng.uniform(0.01, 1.0, n_markers)
+    p_values[1234] = 1e-12
+    result = GWASResult(
+        marker_names=[f"m{i}" for i in range(n_markers)],
+        chromosomes=["1"] * (n_markers // 2) + ["2"] * (n_markers - n_markers // 2),
+        positions=list(range(n_markers)),
+        p_values=p_values,
+        effect_sizes=np.zeros(n_markers),
+        standard_errors=np.ones(n_markers),
+        maf=np.full(n_markers, 0.3),
+        n_samples=100,
+        n_markers=n_markers,
+        method="GLM",
+        significance_threshold=0.05 / n_markers,
+    )
+
+    preview = result.manhattan_preview(max_points=200)
+
+    assert len(preview) <= 200 + 1
+    assert "m1234" in {point["name"] for point in preview}
+    assert max(point["p"] for point in preview) == pytest.approx(12.0)
+    assert [point["chr"] for point in preview] == sorted(point["chr"] for point in preview)
+    assert len(result.qq_preview(max_points=100)["expected"]) <= 100
+
+
+@pytest.mark.asyncio
+async def test_compute_workers_return_handles_or_json_lists(store, monkeypatch):
+    monkeypatch.setattr(result_artifact_service, "result_artifact_store", store)
+    rng = np.random.default_rng(0)
+    genotypes = rng.integers(0, 3, (6, 40)).astype(np.float64)
+    progress = lambda *_: None  # noqa: E731
+
+    inline = await KinshipCompute()._kinship_worker(genotypes, True, progress)
+    assert json.loads(json.dumps(inline))["sample_count"] == 6
+    stored = await KinshipCompute()._kinship_worker(genotypes, True, progress, artifact_owner=7)
+    assert "K" not in stored and stored["preview"]
+    assert np.allclose(store.load_array(store.get(stored["artifact"]["artifact_id"], 7)), inline["K"])
+
+    scan = await GWASCompute()._gwas_worker(genotypes, rng.normal(size=6), None, "linear", progress, artifact_owner=7)
+    assert "p_values" not in scan and "effect_sizes" not in scan
+    assert len(store.load_table(store.get(scan["artifact"]["artifact_id"], 7))["p_value"]) == 40
+    json.dumps(scan)
@@ -0,0 +1,171 @@
+"""
+Tests for vectorised spectral preprocessing, SIMPLS and persisted PLSR calibrations.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.models.core import Organization
+from app.models.phenomic import PhenomicDataset
+from app.modules.core.services.spectral_calibration_service import (
+    SpectralCalibration,
+    SpectralCalibrationService,
+    SpectralPreprocessor,
+    cross_validate_pls,
+    emsc,
+    msc,
+    simpls,
+)
+from app.modules.phenotyping.services import phenomic_selection_service as phenomic
+
+
+def _spectra(n=120, p=300, seed=0):
+    """Matrix background plus two constituent bands, with scatter and baseline effects."""
+    rng = np.random.default_rng(seed)
+    axis = np.linspace(0, 1, p)
+    background = 1 + 0.5 * np.sin(3 * axis) + np.exp(-((axis - 0.8) / 0.2) ** 2)
+    bands = np.stack([np.exp(-((axis - c) / 0.05) ** 2) for c in (0.3, 0.6)])
+    constituents = rng.uniform(0.5, 2.0, (n, 2))
+    pure = background + 0.1 * constituents @ bands
+    offset = rng.normal(0, 0.3, (n, 1))
+    slope = rng.uniform(0.7, 1.3, (n, 1))
+    tilt = rng.normal(0, 0.2, (n, 1)) * axis
+    spectra = offset + slope * pure + tilt + rng.normal(0, 0.002, (n, p))
+    return spectra, constituents[:, 0]
+
+
+def test_batched_msc_matches_per_spectrum_polyfit():
+    spectra, _ = _spectra(20, 80)
+    reference = spectra.mean(axis=0)
+
+    expected = np.empty_like(spectra)
+    for i, row in enumerate(spectra):
+        b, a = np.polyfit(reference, row, 1)
+        expected[i] = (row - a) / b
+
+    assert np.allclose(msc(spectra, reference), expected)
+
+
+def test_emsc_removes_polynomial_baseline_and_transform_reuses_reference():
+    rng = np.random.default_rng(1)
+    reference = np.sin(np.linspace(0, 6, 200)) + 2
+    axis = np.linspace(-1, 1, 200)
+    baselines = rng.normal(0, 0.5, (10, 3)) @ np.stack([np.ones(200), axis, axis ** 2])
+    scaled = rng.uniform(0.5, 1.5, (10, 1)) * reference + baselines
+
+    assert np.allclose(emsc(scaled, reference), reference)
+
+    preprocessor = SpectralPreprocessor(steps=("emsc", "sg1"), window=9)
+    preprocessor.fit_transform(scaled)
+    single = preprocessor.transform(scaled[:1])
+    assert np.allclose(single, preprocessor.transform(scaled)[:1])
+    with pytest.raises(ValueError):
+        SpectralPreprocessor(steps=("msc",)).transform(scaled)
+    with pytest.raises(ValueError):
+        SpectralPreprocessor(steps=("fft",))
+
+
+def test_simpls_matches_krylov_least_squares_for_every_component_count():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(60, 25))
+    y = X[:, :3] @ np.array([1.0, -2.0, 0.5]) + rng.normal(0, 0.1, 60)
+
+    fit = simpls(X, y, 4)
+    Xc, yc = X - X.mean(axis=0), y - y.mean()
+    s = Xc.T @ yc
+    all_k = fit.predict_all(X)
+    for k in range(1, 5):
+        # PLS1 with k components is least squares restricted to the Krylov space of (X'X, X'y)
+        krylov = np.column_stack([np.linalg.matrix_power(Xc.T @ Xc, j) @ s for j in range(k)])
+        beta = krylov @ np.linalg.lstsq(Xc @ krylov, yc, rcond=None)[0]
+        assert np.allclose(fit.coefficients(k), beta, atol=1e-8)
+        assert np.allclose(all_k[:, k - 1], fit.predict(X, k))
+
+
+def test_cross_validation_scores_all_counts_from_one_fit_per_fold():
+    spectra, y = _spectra()
+    X = SpectralPreprocessor(steps=("emsc",)).fit_transform(spectra)
+
+    serial = cross_validate_pls(X, y, max_components=8, n_folds=4, random_state=0, max_workers=1)
+    parallel = cross_validate_pls(X, y, max_components=8, n_folds=4, random_state=0, max_workers=4)
+    assert np.allclose(serial["rmse_cv_by_components"], parallel["rmse_cv_by_components"])
+
+    folds = np.array_split(np.random.default_rng(0).permutation(len(y)), 4)
+    refit = np.empty((len(y), 8))
+    for i, val in enumerate(folds):
+        train = np.concatenate(folds[:i] + folds[i + 1:])
+        for k in range(1, 9):
+            refit[val, k - 1] = simpls(X[train], y[train], k).predict(X[val])
+    expected = np.sqrt(((y[:, None] - refit) ** 2).mean(axis=0))
+    assert np.allclose(serial["rmse_cv_by_components"], expected)
+    assert serial["r2_cv"] > 0.95
+
+
+def test_calibration_round_trips_and_preprocessing_is_cached(tmp_path):
+    spectra, y = _spectra()
+    service = SpectralCalibrationService()
+
+    calibration = service.calibrate(spectra, y, steps=("emsc", "sg1"), max_components=10, dataset_key="d1")
+    preprocessor, first = service.preprocess(spectra, SpectralPreprocessor(steps=("emsc", "sg1")), "d1")
+    assert preprocessor is calibration.preprocessor
+    assert service.preprocess(spectra, SpectralPreprocessor(steps=("emsc", "sg1")), "d1")[1] is first
+
+    path = str(tmp_path / "model.npz")
+    calibration.save(path)
+    loaded = SpectralCalibration.load(path)
+    assert loaded.n_components == calibration.n_components
+    assert np.allclose(loaded.predict(spectra[:5]), calibration.predict(spectra[:5]))
+    with pytest.raises(ValueError):
+        loaded.predict(spectra[:, :10])
+
+
+def test_preprocess_cache_is_safe_across_threads():
+    spectra, _ = _spectra(40, 120)
+    service = SpectralCalibrationService(max_cache_bytes=3 * spectra.nbytes)
+
+    def work(i):
+        service.preprocess(spectra + i % 8, SpectralPreprocessor(steps=("snv",)), f"d{i % 8}")
+        if i % 5 == 0:
+            service.invalidate(f"d{(i + 1) % 8}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(200)))
+
+    assert 1 <= len(service._cache) <= 3
+    assert sum(processed.nbytes for _, processed in service._cache.values()) <= service.max_cache_bytes
+
+
+@pytest.mark.asyncio
+async def test_trained_model_is_used_by_predict_traits(async_db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(phenomic, "MODEL_DIR", str(tmp_path))
+    db = async_db_session
+    org = Organization(name="Phenomic Org")
+    db.add(org)
+    await db.flush()
+    dataset = PhenomicDataset(
+        organization_id=org.id, dataset_code="NIRS-1", name="Wheat NIRS", crop="Wheat", platform="NIRS"
+    )
+    db.add(dataset)
+    await db.flush()
+
+    spectra, protein = _spectra()
+    service = phenomic.PhenomicSelectionService()
+    model = await service.train_model(
+        db, org.id, "NIRS-1", "Protein", spectra[:100].tolist(), protein[:100].tolist(),
+        preprocessing=["emsc"], max_components=10,
+    )
+    assert model["status"] == "deployed"
+    assert model["r_squared"] > 0.95
+    assert len(model["parameters"]["rmse_cv_by_components"]) == 10
+
+    pending = await service.predict_traits(db, org.id, model["model_code"], ["s1"])
+    assert pending["status"] == "pending"
+
+    result = await service.predict_traits(
+        db, org.id, model["id"], [f"s{i}" for i in range(20)], spectra[100:].tolist()
+    )
+    predicted = np.array([p["value"] for p in result["predictions"]])
+    assert result["status"] == "completed"
+    assert np.corrcoef(predicted, protein[100:])[0, 1] > 0.97
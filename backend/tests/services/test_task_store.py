@@ -0,0 +1,171 @@
+"""
+Tests for the durable task queue backend (SQLite stand-in for Redis Streams).
+"""
+
+import asyncio
+import base64
+import pickle
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services.task_queue import ComputeType, Task, TaskQueue, TaskStatus
+from app.services.task_store import (
+    SQLiteTaskBackend,
+    _dump,
+    _load,
+    callable_path,
+    is_dispatchable,
+    register_task_entry_point,
+    resolve_callable,
+    task_from_record,
+    task_to_record,
+)
+
+
+@register_task_entry_point
+async def double_values(values, progress_callback):
+    progress_callback(0.5, "halfway")
+    return [value * 2 for value in values]
+
+
+async def unregistered(progress_callback):
+    return None
+
+
+class SquareCompute:
+    def square(self, value, progress_callback):
+        return value * value
+
+
+register_task_entry_point(SquareCompute.square)
+
+
+@pytest.fixture
+async def backend(tmp_path):
+    store = SQLiteTaskBackend(path=str(tmp_path / "tasks.db"), visibility_timeout=0.2, result_ttl_hours=1)
+    await store.initialize()
+    return store
+
+
+def _task(func, **kwargs) -> Task:
+    return Task(id=f"task-{id(kwargs)}", name="test.job", func=func, kwargs=kwargs, compute_type=ComputeType.LIGHT_PYTHON)
+
+
+def test_callable_paths_round_trip():
+    assert resolve_callable(callable_path(double_values)) is double_values
+    bound = resolve_callable(callable_path(SquareCompute().square))
+    assert bound(3, progress_callback=None) == 9
+    assert callable_path(lambda progress_callback: None) is None
+    assert callable_path(unregistered) is None
+
+
+def test_only_registered_entry_points_are_resolved():
+    with pytest.raises(ValueError, match="not a registered"):
+        resolve_callable("os:system")
+    with pytest.raises(ValueError, match="not a registered"):
+        resolve_callable(f"{__name__}:unregistered")
+    assert not is_dispatchable(_task(unregistered))
+    assert not is_dispatchable(_task(double_values, values=object()))
+
+
+def test_payloads_round_trip_as_versioned_json():
+    matrix = np.arange(6, dtype=np.float32).reshape(2, 3)
+    value = (
+        [matrix, np.int64(4), (1, "a")],
+        {"by_id": {1: 0.5}, "when": datetime(2026, 1, 2, tzinfo=UTC), "day": date(2026, 1, 2), "file": Path("/tmp/x")},
+    )
+    (args, kwargs) = _load(_dump(value))
+    assert args[0].dtype == np.float32 and np.array_equal(args[0], matrix)
+    assert args[1:] == [4, (1, "a")]
+    assert kwargs == value[1]
+
+
+def test_pickled_payloads_are_never_loaded():
+    record = task_to_record(_task(double_values, values=[1]))
+    record["payload"] = base64.b64encode(pickle.dumps(((), {"values": [1]}))).decode("ascii")
+    record["result"] = record["payload"]
+    task = task_from_record(record)
+    assert task.kwargs == {} and task.result is None
+    with pytest.raises(RuntimeError, match="not importable"):
+        task.func()
+
+
+@pytest.mark.asyncio
+async def test_job_dispatched_to_worker_process(backend, tmp_path):
+    api = TaskQueue(max_concurrent=1)
+    worker = TaskQueue(max_concurrent=1)
+    worker_backend = SQLiteTaskBackend(path=backend.path, visibility_timeout=0.2)
+    await api.start(compute_types=[], backend=backend)
+    await worker.start(compute_types=[ComputeType.LIGHT_PYTHON], backend=worker_backend)
+    try:
+        job_id = await api.enqueue_compute("test.double", double_values, values=[1, 2, 3])
+
+        assert api.get_task(job_id) is None
+        result = await asyncio.wait_for(api.get_compute_result(job_id), timeout=10)
+
+        assert result == [2, 4, 6]
+        status = await api.get_compute_status(job_id)
+        assert status["status"] == "completed"
+        assert status["compute_type"] == "light_python"
+        stored = await backend.load(job_id)
+        assert stored.deliveries == 1
+    finally:
+        await api.stop()
+        await worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_job_is_redelivered_after_visibility_timeout(backend):
+    task = _task(double_values, values=[5])
+    await backend.dispatch(task)
+
+    claimed = await backend.claim("crashed-worker", [ComputeType.LIGHT_PYTHON], block_ms=0)
+    assert [item.id for item in claimed] == [task.id]
+    assert await backend.claim("survivor", [ComputeType.LIGHT_PYTHON], block_ms=0) == []
+    assert await backend.reclaim("survivor", [ComputeType.LIGHT_PYTHON]) == []
+
+    await asyncio.sleep(0.3)
+    redelivered = await backend.reclaim("survivor", [ComputeType.LIGHT_PYTHON])
+
+    assert [item.id for item in redelivered] == [task.id]
+    assert redelivered[0].deliveries == 2
+    assert redelivered[0].kwargs == {"values": [5]}
+
+    await backend.ack(redelivered[0])
+    await asyncio.sleep(0.3)
+    assert await backend.reclaim("survivor", [ComputeType.LIGHT_PYTHON]) == []
+
+
+@pytest.mark.asyncio
+async def test_poison_job_fails_after_max_deliveries(tmp_path):
+    backend = SQLiteTaskBackend(path=str(tmp_path / "poison.db"), visibility_timeout=0, max_deliveries=1)
+    await backend.initialize()
+    task = _task(double_values, values=[1])
+    await backend.dispatch(task)
+
+    assert len(await backend.claim("w1", [ComputeType.LIGHT_PYTHON], block_ms=0)) == 1
+    assert await backend.reclaim("w2", [ComputeType.LIGHT_PYTHON]) == []
+
+    stored = await backend.load(task.id)
+    assert stored.status == TaskStatus.FAILED
+    assert "deliveries" in stored.error
+
+
+@pytest.mark.asyncio
+async def test_terminal_results_expire(tmp_path):
+    backend = SQLiteTaskBackend(path=str(tmp_path / "ttl.db"), result_ttl_hours=0)
+    await backend.initialize()
+    finished = _task(double_values, values=[1])
+    finished.status = TaskStatus.COMPLETED
+    finished.result = [2]
+    pending = _task(double_values, values=[2])
+    await backend.save(finished)
+    await backend.dispatch(pending)
+
+    await asyncio.sleep(0.01)
+    assert await backend.purge_expired() == 1
+    assert await backend.load(finished.id) is None
+    assert (await backend.load(pending.id)).kwargs == {"values": [2]}
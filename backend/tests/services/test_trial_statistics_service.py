@@ -0,0 +1,283 @@
+"""
+Tests for materialised trial trait statistics.
+"""
+
+from datetime import UTC, datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import delete, select
+
+from app.api.v2.trial_summary import get_trait_summary, get_trial_summary
+from app.models.core import Organization, Program, Study, Trial
+from app.models.germplasm import Germplasm
+from app.models.phenotyping import (
+    Observation,
+    ObservationUnit,
+    ObservationVariable,
+    PhenotypeQCIssue,
+    PhenotypeQCStatistic,
+    TrialTraitStatistic,
+)
+from app.modules.phenotyping.services import trial_statistics_service
+from app.modules.phenotyping.services.trial_statistics_service import (
+    SufficientStatistics,
+    TrialStatisticsService,
+    anova_from_statistics,
+    register_trial_statistics_hooks,
+    unregister_trial_statistics_hooks,
+)
+
+
+@pytest.fixture
+def statistics_hooks():
+    register_trial_statistics_hooks()
+    yield
+    unregister_trial_statistics_hooks()
+
+
+@pytest.fixture
+async def trial_setup(async_db_session):
+    db = async_db_session
+    org = Organization(name=f"Stats Org {datetime.now(UTC).timestamp()}")
+    db.add(org)
+    await db.flush()
+    program = Program(organization_id=org.id, program_name="P1")
+    db.add(program)
+    await db.flush()
+    trial = Trial(organization_id=org.id, program_id=program.id, trial_name="Yield Trial")
+    db.add(trial)
+    await db.flush()
+    study = Study(organization_id=org.id, trial_id=trial.id, study_name="S1")
+    variable = ObservationVariable(organization_id=org.id, observation_variable_name="Grain Yield")
+    germplasm = [
+        Germplasm(organization_id=org.id, germplasm_name=f"G{i}", germplasm_db_id=f"G{i}-{org.id}")
+        for i in range(3)
+    ]
+    db.add_all([study, variable, *germplasm])
+    await db.flush()
+    units = [
+        ObservationUnit(
+            organization_id=org.id,
+            study_id=study.id,
+            germplasm_id=item.id,
+            observation_unit_name=f"U{i}",
+        )
+        for i, item in enumerate(germplasm)
+    ]
+    db.add_all(units)
+    await db.commit()
+
+    yield {"org": org, "trial": trial, "study": study, "variable": variable, "germplasm": germplasm, "units": units}
+
+    await db.execute(delete(TrialTraitStatistic).where(TrialTraitStatistic.organization_id == org.id))
+    # Written by the QC scoring of bulk imports
+    await db.execute(delete(PhenotypeQCIssue).where(PhenotypeQCIssue.organization_id == org.id))
+    await db.execute(delete(PhenotypeQCStatistic).where(PhenotypeQCStatistic.organization_id == org.id))
+    await db.execute(delete(Observation).where(Observation.organization_id == org.id))
+    await db.execute(delete(ObservationUnit).where(ObservationUnit.organization_id == org.id))
+    await db.execute(delete(ObservationVariable).where(ObservationVariable.organization_id == org.id))
+    await db.execute(delete(Germplasm).where(Germplasm.organization_id == org.id))
+    await db.execute(delete(Study).where(Study.organization_id == org.id))
+    await db.execute(delete(Trial).where(Trial.organization_id == org.id))
+    await db.execute(delete(Program).where(Program.organization_id == org.id))
+    await db.commit()
+
+
+def _observations(setup, values_by_unit: dict[int, list[str]]) -> list[Observation]:
+    return [
+        Observation(
+            organization_id=setup["org"].id,
+            observation_unit_id=setup["units"][index].id,
+            germplasm_id=setup["germplasm"][index].id,
+            observation_variable_id=setup["variable"].id,
+            value=value,
+        )
+        for index, values in values_by_unit.items()
+        for value in values
+    ]
+
+
+def test_anova_from_statistics_matches_raw_values():
+    groups = {"a": [4.0, 4.4, 4.2], "b": [5.1, 5.5], "c": [3.0, 3.4, 3.1, 3.3]}
+    statistics = SufficientStatistics(
+        n=np.array([len(values) for values in groups.values()], dtype=np.float64),
+        sum_x=np.array([sum(values) for values in groups.values()]),
+        sum_x2=np.array([sum(value * value for value in values) for values in groups.values()]),
+    )
+
+    metrics = anova_from_statistics(statistics)
+
+    values = [value for group in groups.values() for value in group]
+    grand_mean = sum(values) / len(values)
+    ss_within = sum(
+        sum((value - sum(group) / len(group)) ** 2 for value in group) for group in groups.values()
+    )
+    assert statistics.mean() == pytest.approx(grand_mean)
+    assert metrics["anova"]["df_between"] == 2
+    assert metrics["anova"]["df_within"] == 6
+    assert metrics["anova"]["ss_within"] == pytest.approx(round(ss_within, 4))
+    assert metrics["significance"] == "*"
+    assert 0 < metrics["heritability"] <= 1
+
+
+@pytest.mark.asyncio
+async def test_flush_hook_maintains_sufficient_statistics(async_db_session, trial_setup, statistics_hooks):
+    db = async_db_session
+    service = TrialStatisticsService()
+    org_id, trial_id = trial_setup["org"].id, trial_setup["trial"].id
+
+    observations = _observations(trial_setup, {0: ["4.0", "4.4"], 1: ["5.0", "n/a"], 2: ["3.0"]})
+    db.add_all(observations)
+    await db.commit()
+    version_before = await service.data_version(db, org_id, trial_id)
+
+    cells = {cell["germplasm_key"]: cell for cell in await service.load_cells(db, org_id, trial_id)}
+    first = trial_setup["germplasm"][0].germplasm_db_id
+    assert cells[first]["n"] == 2
+    assert cells[first]["sum_x"] == pytest.approx(8.4)
+    assert sum(cell["n"] for cell in cells.values()) == 4
+
+    observations[0].value = "6.0"
+    await db.delete(observations[2])
+    await db.commit()
+
+    cells = {cell["germplasm_key"]: cell for cell in await service.load_cells(db, org_id, trial_id)}
+    assert cells[first]["sum_x"] == pytest.approx(10.4)
+    assert cells[first]["sum_x2"] == pytest.approx(36.0 + 4.4 * 4.4)
+    assert trial_setup["germplasm"][1].germplasm_db_id not in cells
+    assert await service.data_version(db, org_id, trial_id) != version_before
+
+    # Incremental state must agree with a rebuild from raw observations
+    incremental = sorted((cell["germplasm_key"], cell["n"], round(cell["sum_x"], 6)) for cell in cells.values())
+    await service.rebuild(db, org_id, trial_id)
+    rebuilt = sorted(
+        (cell["germplasm_key"], cell["n"], round(cell["sum_x"], 6))
+        for cell in await service.load_cells(db, org_id, trial_id)
+    )
+    assert rebuilt == incremental
+
+
+@pytest.mark.asyncio
+async def test_ensure_cells_rebuilds_trials_without_statistics(async_db_session, trial_setup):
+    db = async_db_session
+    service = TrialStatisticsService()
+    org_id, trial_id = trial_setup["org"].id, trial_setup["trial"].id
+
+    # Written without hooks, as data predating the statistics table would be
+    db.add_all(_observations(trial_setup, {0: ["4.0"], 1: ["5.0", "5.2"]}))
+    await db.commit()
+    assert not await service.has_statistics(db, org_id, trial_id)
+
+    cells = await service.ensure_cells(db, org_id, trial_id)
+
+    assert sum(cell["n"] for cell in cells) == 3
+    assert {cell["location_key"] for cell in cells} == {f"study:{trial_setup['study'].id}"}
+    stored = await db.scalar(
+        select(TrialTraitStatistic.n).where(
+            TrialTraitStatistic.study_id == trial_setup["study"].id,
+            TrialTraitStatistic.germplasm_id == trial_setup["germplasm"][1].id,
+        )
+    )
+    assert stored == 2
+
+
+@pytest.mark.asyncio
+async def test_trial_summary_served_from_statistics_and_cache(async_db_session, trial_setup, statistics_hooks):
+    db = async_db_session
+    org_id = trial_setup["org"].id
+    trial_key = str(trial_setup["trial"].id)
+    db.add_all(_observations(trial_setup, {0: ["4.0", "4.4"], 1: ["5.0", "5.4"], 2: ["3.0", "3.2"]}))
+    await db.commit()
+
+    traits = await get_trait_summary(trial_id=trial_key, db=db, organization_id=org_id)
+    assert traits["data"][0]["trait"] == "Grain Yield"
+    assert traits["data"][0]["mean"] == pytest.approx(25.0 / 6, abs=1e-4)
+    assert traits["data"][0]["significance"] == "*"
+
+    first = await get_trial_summary(trial_id=trial_key, db=db, organization_id=org_id)
+    cached = await get_trial_summary(trial_id=trial_key, db=db, organization_id=org_id)
+    assert cached.statistics == first.statistics
+    assert cached.trial.observations == 6
+
+    db.add_all(_observations(trial_setup, {2: ["9.0"]}))
+    await db.commit()
+    refreshed = await get_trial_summary(trial_id=trial_key, db=db, organization_id=org_id)
+    assert refreshed.trial.observations == 7
+
+
+@pytest.mark.asyncio
+async def test_cached_summary_age_does_not_compound_across_hits(monkeypatch):
+    service = TrialStatisticsService()
+    monkeypatch.setattr(trial_statistics_service.redis_client, "_available", False)
+    clock = [1000.0]
+    monkeypatch.setattr(trial_statistics_service.time, "time", lambda: clock[0])
+
+    await service.store_cached_summary(1, 2, "v1", {"data_age_seconds": 5})
+    clock[0] += 10
+    first = await service.get_cached_summary(1, 2, "v1")
+    clock[0] += 10
+    second = await service.get_cached_summary(1, 2, "v1")
+
+    assert (first["data_age_seconds"], second["data_age_seconds"]) == (15, 25)
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_and_replace_update_existing_statistics(
+    async_db_session, trial_setup, statistics_hooks
+):
+    from app.models.phenotyping import typed_observation_values
+    from app.modules.core.services.import_engine.domain_importers import (
+        ObservationImporter,
+        apply_observation_deltas,
+    )
+
+    db = async_db_session
+    service = TrialStatisticsService()
+    org_id, trial_id = trial_setup["org"].id, trial_setup["trial"].id
+    db.add_all(_observations(trial_setup, {0: ["4.0"], 1: ["5.0"]}))
+    await db.commit()
+    assert await service.has_statistics(db, org_id, trial_id)
+    version_before = await service.data_version(db, org_id, trial_id)
+
+    rows = [
+        {
+            "organization_id": org_id,
+            "observation_db_id": f"bulk-{org_id}-{index}-{value}",
+            "observation_unit_id": trial_setup["units"][index].id,
+            "germplasm_id": trial_setup["germplasm"][index].id,
+            "observation_variable_id": trial_setup["variable"].id,
+            "study_id": trial_setup["study"].id,
+            "value": value,
+            **typed_observation_values(value, None),
+        }
+        for index, value in [(0, "4.4"), (2, "3.0"), (2, "3.2")]
+    ]
+    await ObservationImporter(db, organization_id=org_id, user_id=1).bulk_insert(rows)
+    await db.commit()
+
+    cells = {cell["germplasm_key"]: cell for cell in await service.load_cells(db, org_id, trial_id)}
+    assert cells[trial_setup["germplasm"][0].germplasm_db_id]["sum_x"] == pytest.approx(8.4)
+    assert cells[trial_setup["germplasm"][2].germplasm_db_id]["n"] == 2
+    assert await service.data_version(db, org_id, trial_id) != version_before
+
+    # Core delete, as the raster extraction does before re-inserting a layer
+    replaced = await db.execute(
+        delete(Observation)
+        .where(Observation.observation_db_id.in_([row["observation_db_id"] for row in rows[1:]]))
+        .returning(*Observation.__table__.columns)
+    )
+    await apply_observation_deltas(db, replaced.mappings().all(), sign=-1.0)
+    await db.commit()
+
+    incremental = sorted(
+        (cell["germplasm_key"], cell["n"], round(cell["sum_x"], 6))
+        for cell in await service.load_cells(db, org_id, trial_id)
+    )
+    await service.rebuild(db, org_id, trial_id)
+    rebuilt = sorted(
+        (cell["germplasm_key"], cell["n"], round(cell["sum_x"], 6))
+        for cell in await service.load_cells(db, org_id, trial_id)
+    )
+    assert rebuilt == incremental
+    assert sum(n for _, n, _ in rebuilt) == 3
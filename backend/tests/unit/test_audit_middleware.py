@@ -19,8 +19,9 @@ def test_critical_path_detection():
     assert not mw._is_critical("/api/v2/health")
 
 
-def test_high_resource_limiter_blocks_burst():
-    key = "t:resource"
-    allowed = [high_resource_limiter.allow(key) for _ in range(high_resource_limiter.max_requests)]
+@pytest.mark.asyncio
+async def test_high_resource_limiter_blocks_burst():
+    key = f"t:resource:{id(object())}"
+    allowed = [await high_resource_limiter.allow(key) for _ in range(high_resource_limiter.max_requests)]
     assert all(allowed)
-    assert high_resource_limiter.allow(key) is False
+    assert await high_resource_limiter.allow(key) is False
@@ -42,8 +42,17 @@ async def test_trial_summary_response_includes_trust_contract_metadata():
         SimpleNamespace(scalar_one=lambda: trial),
         SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [SimpleNamespace(id=101)])),
     ]
+    statistics_service = SimpleNamespace(
+        ensure_cells=AsyncMock(return_value=[]),
+        data_version=AsyncMock(return_value="v1"),
+        get_cached_summary=AsyncMock(return_value=None),
+        store_cached_summary=AsyncMock(),
+    )
 
     with patch(
+        "app.api.v2.trial_summary.trial_statistics_service",
+        new=statistics_service,
+    ), patch(
         "app.api.v2.trial_summary._resolve_trial",
         new=AsyncMock(return_value=trial),
     ), patch(
@@ -93,6 +102,7 @@ async def test_trial_summary_response_includes_trust_contract_metadata():
     assert response.evidence_envelope is not None
     assert response.evidence_envelope.uncertainty.confidence == 0.45
     assert response.evidence_envelope.evidence_refs[0].source_type == "database"
+    statistics_service.store_cached_summary.assert_awaited_once()
 
 
 def test_trial_summary_contract_metadata_defaults_are_stable():
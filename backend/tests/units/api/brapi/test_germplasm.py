@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import HTTPException
 import uuid
 
+from app.core.pagination import query_cache
 from app.api.brapi.germplasm import (
     list_germplasm,
     get_germplasm,
@@ -45,6 +46,7 @@ def reset_mocks():
     mock_db.commit = AsyncMock()
     mock_db.refresh = AsyncMock()
     mock_db.add = MagicMock()
+    query_cache.clear()
 
 
 @pytest.mark.asyncio
@@ -76,9 +78,10 @@ async def test_list_germplasm():
     mock_count_result.scalar.return_value = 2
 
     mock_data_result = MagicMock()
-    mock_data_result.scalars().all.return_value = mock_germplasm_list
+    mock_data_result.scalars().unique().all.return_value = mock_germplasm_list
 
-    mock_db.execute.side_effect = [mock_count_result, mock_data_result]
+    # The page is fetched first, then the (cached) total is counted
+    mock_db.execute.side_effect = [mock_data_result, mock_count_result]
 
     # Call the endpoint function
     result = await list_germplasm(page=0, pageSize=10, db=mock_db, current_user=mock_user)
@@ -89,10 +92,11 @@ async def test_list_germplasm():
     assert result['result']['data'][0]['germplasmDbId'] == "test_id_1"
     assert result['result']['data'][1]['germplasmName'] == "Test Germplasm 2"
 
-    # Check that the query was called with offset and limit
-    query_str = str(mock_db.execute.call_args_list[1].args[0])
+    # The first page is a plain keyset query: ordered and limited, no offset
+    query_str = str(mock_db.execute.call_args_list[0].args[0])
     assert "LIMIT" in query_str.upper()
-    assert "OFFSET" in query_str.upper()
+    assert "OFFSET" not in query_str.upper()
+    assert result['metadata']['pagination']['nextPageToken'] is None
 
 
 @pytest.mark.asyncio
@@ -114,9 +118,9 @@ async def test_list_germplasm_pagination():
     mock_count_result.scalar.return_value = 1
 
     mock_data_result = MagicMock()
-    mock_data_result.scalars().all.return_value = [mock_germplasm_1]
+    mock_data_result.scalars().unique().all.return_value = [mock_germplasm_1]
 
-    mock_db.execute.side_effect = [mock_count_result, mock_data_result]
+    mock_db.execute.side_effect = [mock_data_result, mock_count_result]
 
     # Call the endpoint function with specific page and pageSize
     result = await list_germplasm(page=1, pageSize=5, db=mock_db, current_user=mock_user)
@@ -125,7 +129,8 @@ async def test_list_germplasm_pagination():
     assert result['metadata']['pagination']['currentPage'] == 1
     assert result['metadata']['pagination']['pageSize'] == 5
 
-    query_str = str(mock_db.execute.call_args_list[1].args[0])
+    # Without an anchor for page 1 the page is reached by offset
+    query_str = str(mock_db.execute.call_args_list[0].args[0])
     assert "LIMIT" in query_str.upper()
     assert "OFFSET" in query_str.upper()
 
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import sys
+import types
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+from app.core.lazy_imports import lazy_exports
+from app.startup.lazy_routes import LazyRouteMiddleware, RouteGroup, RouteGroupLoader
+
+
+def _router(prefix: str, path: str, answer: str) -> APIRouter:
+    router = APIRouter(prefix=prefix)
+
+    @router.get(path)
+    def endpoint():
+        return {"answer": answer}
+
+    return router
+
+
+def _groups(calls: list[str]) -> list[RouteGroup]:
+    def register_core(app):
+        calls.append("core")
+        app.include_router(_router("/api/core", "/ping", "core"))
+
+    def register_generic(app):
+        calls.append("generic")
+        app.include_router(_router("/api/v2/items", "/{item_id}", "generic"))
+
+    def register_specific(app):
+        calls.append("specific")
+        app.include_router(_router("/api/v2/items", "/special", "specific"))
+        app.include_router(_router("/api/v2/other", "", "other"))
+
+    return [
+        RouteGroup("core", register_core, ("/api/core",), eager=True),
+        RouteGroup("generic", register_generic, ("/api/v2/items",)),
+        RouteGroup("specific", register_specific, ("/api/v2/items", "/api/v2/other")),
+    ]
+
+
+def _app(calls: list[str], lazy: bool = True) -> tuple[FastAPI, RouteGroupLoader]:
+    app = FastAPI()
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    loader = RouteGroupLoader(app, _groups(calls))
+    if lazy:
+        loader.register_eager()
+        app.add_middleware(LazyRouteMiddleware, loader=loader)
+    else:
+        loader.register_all()
+    return app, loader
+
+
+async def _get(app: FastAPI, path: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+def _paths(routes, prefix: str = ""):
+    for route in routes:
+        router = getattr(route, "original_router", None)
+        if router is None:
+            yield prefix + route.path
+        else:
+            yield from _paths(router.routes, prefix + route.include_context.prefix)
+
+
+def test_route_group_prefix_matching():
+    group = RouteGroup("iot", lambda app: None, ("/api/v2/iot",))
+
+    assert group.covers("/api/v2/iot") and group.covers("/api/v2/iot/devices")
+    assert not group.covers("/api/v2/iotx") and not group.covers("/api/v2")
+
+
+async def test_groups_mount_on_first_request_for_their_prefix():
+    calls: list[str] = []
+    app, loader = _app(calls)
+    assert calls == ["core"]
+
+    assert (await _get(app, "/api/core/ping")).json() == {"answer": "core"}
+    assert (await _get(app, "/health")).status_code == 200
+    assert [group.name for group in loader.pending] == ["generic", "specific"]
+
+    assert (await _get(app, "/api/v2/other")).json() == {"answer": "other"}
+    assert calls == ["core", "specific"]
+    assert loader.registrations["specific"].trigger == "request /api/v2/other"
+
+    # Both groups cover /api/v2/items, so the remaining one mounts before routing
+    assert (await _get(app, "/api/v2/items/7")).json() == {"answer": "generic"}
+    assert loader.pending == []
+
+
+async def test_lazy_mounting_keeps_eager_route_precedence():
+    eager_app, _ = _app([], lazy=False)
+    lazy_app, loader = _app([])
+
+    # The later group mounts first, yet the earlier group's route still wins
+    await loader.ensure_loaded("/api/v2/other", "test")
+    await loader.ensure_loaded("/api/v2/items/special", "test")
+    for app in (eager_app, lazy_app):
+        assert (await _get(app, "/api/v2/items/special")).json() == {"answer": "generic"}
+
+    assert list(_paths(lazy_app.routes)) == list(_paths(eager_app.routes))
+
+
+async def test_warm_up_mounts_everything_and_profiles_each_router():
+    app, loader = _app([])
+
+    await loader.warm_up()
+
+    profile = loader.profile()
+    assert profile["pending"] == []
+    assert [group["name"] for group in profile["groups"]] == ["core", "generic", "specific"]
+    assert profile["routes"] == 4 and profile["primed_ms"] is not None
+    specific = profile["groups"][2]
+    assert specific["trigger"] == "warm-up"
+    assert [router["prefix"] for router in specific["routers"]] == [
+        "/api/v2/items",
+        "/api/v2/other",
+    ]
+    assert all(router["module"] == __name__ for router in specific["routers"])
+
+
+async def test_failing_group_is_recorded_without_breaking_the_app():
+    def broken(app):
+        raise ImportError("optional stack missing")
+
+    app = FastAPI()
+    loader = RouteGroupLoader(app, [RouteGroup("broken", broken, ("/api/v2/broken",))])
+    loader.register_eager()
+    app.add_middleware(LazyRouteMiddleware, loader=loader)
+
+    assert (await _get(app, "/api/v2/broken/x")).status_code == 404
+    assert loader.registrations["broken"].error == "ImportError: optional stack missing"
+
+
+def test_every_app_route_lives_under_its_group_prefixes():
+    from app.startup.routes import ROUTE_GROUPS
+
+    for group in ROUTE_GROUPS:
+        app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+        group.register(app)
+        stray = [path for path in _paths(app.routes) if not group.covers(path)]
+        assert stray == [], group.name
+
+
+def test_lazy_exports_import_on_first_access(monkeypatch):
+    package = types.ModuleType("lazy_pkg")
+    package.__path__ = []
+    submodule = types.ModuleType("lazy_pkg.heavy")
+    submodule.Heavy = object()
+    monkeypatch.setitem(sys.modules, "lazy_pkg", package)
+    package.__getattr__, package.__dir__ = lazy_exports("lazy_pkg", {"Heavy": ".heavy"})
+
+    assert "Heavy" in dir(package) and "Heavy" not in vars(package)
+    with pytest.raises(ModuleNotFoundError):
+        package.Heavy
+
+    monkeypatch.setitem(sys.modules, "lazy_pkg.heavy", submodule)
+    assert package.Heavy is submodule.Heavy
+    assert vars(package)["Heavy"] is submodule.Heavy
+    with pytest.raises(AttributeError):
+        package.Missing
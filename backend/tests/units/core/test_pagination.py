@@ -0,0 +1,235 @@
+"""
+Tests for keyset pagination, page anchors and cached totals.
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.core.pagination import (
+    InvalidPageToken,
+    paginate,
+    query_cache,
+    register_pagination_hooks,
+    unregister_pagination_hooks,
+)
+from app.crud.core import program as program_crud
+from app.models.core import Organization, Program
+from app.models.germplasm import Germplasm
+
+
+async def _org_with_germplasm(db, name, n=23):
+    org = Organization(name=f"{name} {datetime.now(UTC).timestamp()}")
+    db.add(org)
+    await db.flush()
+    db.add_all([
+        Germplasm(
+            organization_id=org.id, germplasm_db_id=f"{org.id}-G{i}",
+            germplasm_name=f"IR-{(i * 7) % n:03d}", genus="Oryza" if i % 3 else None,
+        )
+        for i in range(n)
+    ])
+    await db.commit()
+    return org
+
+
+def _query(org):
+    return select(Germplasm).where(Germplasm.organization_id == org.id)
+
+
+async def _offset_walk(db, query, order, size):
+    rows = (await db.execute(query.order_by(*order))).scalars().all()
+    return [[g.id for g in rows[i:i + size]] for i in range(0, len(rows), size)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_keys", [None, "name", "name_desc"])
+async def test_token_walk_matches_offset_walk(async_db_session, sort_keys):
+    db = async_db_session
+    org = await _org_with_germplasm(db, "Keyset Org")
+    keys, order = {
+        None: (None, [Germplasm.id]),
+        "name": ([Germplasm.germplasm_name, Germplasm.id], [Germplasm.germplasm_name, Germplasm.id]),
+        "name_desc": (
+            [Germplasm.germplasm_name.desc(), Germplasm.id.desc()],
+            [Germplasm.germplasm_name.desc(), Germplasm.id.desc()],
+        ),
+    }[sort_keys]
+
+    pages, token, page_no = [], None, 0
+    while True:
+        page = await paginate(db, _query(org), organization_id=org.id, page=page_no, page_size=5, page_token=token, sort_keys=keys)
+        pages.append([g.id for g in page.items])
+        assert page.page == page_no and page.total_count == 23 and page.total_pages == 5
+        if page.next_page_token is None:
+            break
+        token, page_no = page.next_page_token, page_no + 1
+
+    assert pages == await _offset_walk(db, _query(org), order, 5)
+
+    # Page numbers are served from the anchors the walk recorded, and give the same rows
+    for number, expected in enumerate(pages):
+        page = await paginate(db, _query(org), organization_id=org.id, page=number, page_size=5, sort_keys=keys)
+        assert [g.id for g in page.items] == expected
+
+
+@pytest.mark.asyncio
+async def test_unanchored_pages_nullable_sorts_and_raw_offsets(async_db_session):
+    db = async_db_session
+    org = await _org_with_germplasm(db, "Anchor Org")
+    expected = await _offset_walk(db, _query(org), [Germplasm.id], 4)
+
+    query_cache.clear()
+    page = await paginate(db, _query(org), organization_id=org.id, page=3, page_size=4)
+    assert [g.id for g in page.items] == expected[3] and page.next_page_token
+
+    # A sort on a nullable column cannot be seeked, so it pages by offset without tokens
+    by_genus = await paginate(db, _query(org), organization_id=org.id, page=1, page_size=4, sort_keys=[Germplasm.genus, Germplasm.id])
+    assert by_genus.next_page_token is None and len(by_genus.items) == 4
+
+    # Raw offsets that do not fall on a page boundary are honoured as given
+    shifted = await paginate(db, _query(org), organization_id=org.id, page_size=4, offset=6)
+    assert [g.id for g in shifted.items] == (expected[1] + expected[2])[2:6]
+
+
+@pytest.mark.asyncio
+async def test_anchors_hold_when_the_page_size_changes(async_db_session):
+    db = async_db_session
+    org = await _org_with_germplasm(db, "Page Size Org", n=100)
+    rows = (await _offset_walk(db, _query(org), [Germplasm.id], 100))[0]
+
+    query_cache.clear()
+    for number in range(3):
+        await paginate(db, _query(org), organization_id=org.id, page=number, page_size=20)
+
+    # Anchors left by 20-row pages must not be reused as 5-row page numbers
+    for number, size in [(2, 5), (9, 5), (1, 30), (3, 15), (13, 7)]:
+        page = await paginate(db, _query(org), organization_id=org.id, page=number, page_size=size)
+        assert [g.id for g in page.items] == rows[number * size:(number + 1) * size]
+
+    # A token from a 5-row page continues at the next row whatever size follows
+    small = await paginate(db, _query(org), organization_id=org.id, page=2, page_size=5)
+    larger = await paginate(db, _query(org), organization_id=org.id, page_size=20, page_token=small.next_page_token)
+    assert [g.id for g in larger.items] == rows[15:35]
+    follow = await paginate(db, _query(org), organization_id=org.id, page=7, page_size=5)
+    assert [g.id for g in follow.items] == rows[35:40]
+
+
+@pytest.mark.asyncio
+async def test_crud_get_multi_and_get_page(async_db_session):
+    db = async_db_session
+    org = await _org_with_germplasm(db, "CRUD Org", n=0)
+    db.add_all([Program(organization_id=org.id, program_name=f"Program {i}") for i in range(5)])
+    await db.commit()
+
+    items, total = await program_crud.get_multi(db, skip=1, limit=3, org_id=org.id)
+    assert [p.program_name for p in items] == ["Program 1", "Program 2", "Program 3"] and total == 5
+
+    first = await program_crud.get_page(db, page_size=2, org_id=org.id)
+    second = await program_crud.get_page(db, page_size=2, page_token=first.next_page_token, org_id=org.id)
+    assert [p.program_name for p in second.items] == ["Program 2", "Program 3"] and second.page == 1
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_bound_to_their_query(async_db_session):
+    db = async_db_session
+    org = await _org_with_germplasm(db, "Token Org")
+    first = await paginate(db, _query(org), organization_id=org.id, page_size=5)
+
+    other = _query(org).where(Germplasm.genus == "Oryza")
+    with pytest.raises(InvalidPageToken) as exc:
+        await paginate(db, other, organization_id=org.id, page_size=5, page_token=first.next_page_token)
+    assert exc.value.status_code == 400
+    with pytest.raises(InvalidPageToken):
+        await paginate(db, _query(org), organization_id=org.id, page_size=5, page_token="not-a-token")
+
+
+@pytest.mark.asyncio
+async def test_cached_totals_are_dropped_on_flush(async_db_session):
+    db = async_db_session
+    org = await _org_with_germplasm(db, "Count Org", n=6)
+    query_cache.clear()
+    register_pagination_hooks()
+    try:
+        assert (await paginate(db, _query(org), organization_id=org.id, page_size=4)).total_count == 6
+        # Writes to other tables leave the cached total in place
+        db.add(Program(organization_id=org.id, program_name="Unrelated"))
+        await db.commit()
+        assert (await paginate(db, _query(org), organization_id=org.id, page_size=4)).total_count == 6
+
+        db.add(Germplasm(organization_id=org.id, germplasm_db_id=f"{org.id}-new", germplasm_name="IR-new"))
+        await db.commit()
+        page = await paginate(db, _query(org), organization_id=org.id, page_size=4)
+        assert page.total_count == 7 and not page.total_is_estimate
+    finally:
+        unregister_pagination_hooks()
+
+    db.add(Germplasm(organization_id=org.id, germplasm_db_id=f"{org.id}-late", germplasm_name="IR-late"))
+    await db.commit()
+    assert (await paginate(db, _query(org), organization_id=org.id, page_size=4)).total_count == 7
+    assert (await paginate(db, _query(org), organization_id=org.id, page_size=4, count_mode="exact")).total_count == 8
+    with pytest.raises(ValueError, match="count mode"):
+        await paginate(db, _query(org), organization_id=org.id, count_mode="guess")
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_by_tenant_and_expires(async_db_session):
+    db = async_db_session
+    first = await _org_with_germplasm(db, "Tenant A", n=0)
+    second = await _org_with_germplasm(db, "Tenant B", n=0)
+    db.add_all([Program(organization_id=first.id, program_name=f"A{i}") for i in range(3)])
+    await db.commit()
+    query_cache.clear()
+
+    # An unfiltered query (row-level security would scope it) compiles the same for every tenant
+    unfiltered = select(Program).where(Program.program_name.like("A%"))
+    seen_by_first = await paginate(db, unfiltered, page_size=2, organization_id=first.id)
+    assert seen_by_first.total_count >= 3
+    db.add(Program(organization_id=second.id, program_name="A-late"))
+    await db.execute(insert(Program).values(organization_id=second.id, program_name="A-core"))
+    await db.commit()
+    seen_by_second = await paginate(db, unfiltered, page_size=2, organization_id=second.id)
+    assert seen_by_second.total_count == seen_by_first.total_count + 2
+    with pytest.raises(InvalidPageToken):
+        await paginate(db, unfiltered, page_size=2, page_token=seen_by_first.next_page_token, organization_id=second.id)
+
+    # Without a tenant nothing is cached
+    entries = len(query_cache._entries)
+    await paginate(db, unfiltered, page=1, page_size=2)
+    assert len(query_cache._entries) == entries
+
+    # The Core insert bypassed the flush hook; the TTL still bounds the cached total
+    assert (await paginate(db, unfiltered, page_size=2, organization_id=first.id)).total_count == seen_by_first.total_count
+    for entry in query_cache._entries.values():
+        entry["expires"] = 0
+    refreshed = await paginate(db, unfiltered, page_size=2, organization_id=first.id)
+    assert refreshed.total_count == seen_by_second.total_count
+
+
+@pytest.mark.asyncio
+async def test_brapi_germplasm_list_follows_next_page_token(authenticated_client, async_db_session, test_user):
+    db = async_db_session
+    prefix = f"PT{int(datetime.now(UTC).timestamp() * 1000)}"
+    db.add_all([
+        Germplasm(
+            organization_id=test_user.organization_id, germplasm_db_id=f"{prefix}-{i}", germplasm_name=f"{prefix}-{i}"
+        )
+        for i in range(7)
+    ])
+    await db.commit()
+
+    names, token = [], None
+    for _ in range(3):
+        params = {"pageSize": 3, "germplasmName": prefix, **({"pageToken": token} if token else {})}
+        response = await authenticated_client.get("/brapi/v2/germplasm", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        names += [g["germplasmName"] for g in body["result"]["data"]]
+        pagination = body["metadata"]["pagination"]
+        assert pagination["totalCount"] == 7
+        token = pagination["nextPageToken"]
+    assert token is None and sorted(names) == sorted(f"{prefix}-{i}" for i in range(7))
+
+    response = await authenticated_client.get("/brapi/v2/germplasm", params={"pageToken": "garbage"})
+    assert response.status_code == 400
@@ -0,0 +1,203 @@
+"""
+Tests for the atomic rate limiter scripts and the Redis-backed AI quota counters.
+
+The Redis paths run the real Lua scripts against fakeredis; the load tests fire
+1,000 concurrent requests and check that exactly the limit is admitted.
+"""
+
+import asyncio
+from datetime import UTC, date, datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from redis.asyncio.connection import BlockingConnectionPool
+from sqlalchemy import select
+
+from app.core.redis import redis_client
+from app.models.ai_quota import AIUsageDaily
+from app.models.core import Organization
+from app.modules.ai.services.quota import DIRTY_KEY, AIQuotaService
+from app.modules.core.services import rate_limiter_service
+from app.modules.core.services.rate_limiter_service import (
+    RateLimitAlgorithm,
+    RateLimitConfig,
+    RateLimiter,
+    RateLimitType,
+)
+
+CONCURRENT_REQUESTS = 1000
+# Upper bound for one burst, so a pool or lock problem fails the test instead of hanging
+BURST_TIMEOUT_SECONDS = 30
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    # Same pool shape as RedisClient.connect: bursts wait for one of 20 connections
+    client = fakeredis.FakeAsyncRedis(
+        decode_responses=True,
+        connection_pool_class=BlockingConnectionPool,
+        max_connections=20,
+    )
+    monkeypatch.setattr(redis_client, "_client", client)
+    monkeypatch.setattr(redis_client, "_available", True)
+    monkeypatch.setattr(redis_client, "_scripts", {})
+    return client
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    def use(algorithm, max_requests=50, block_seconds=0):
+        config = RateLimitConfig(max_requests, 60, block_seconds, algorithm)
+        monkeypatch.setitem(rate_limiter_service.RATE_LIMITS, RateLimitType.API_WRITE, config)
+        return config
+
+    return use
+
+
+async def _bounded(*aws):
+    return await asyncio.wait_for(asyncio.gather(*aws), BURST_TIMEOUT_SECONDS)
+
+
+async def _burst(limiter, identifier, n=CONCURRENT_REQUESTS, limit_type=RateLimitType.API_WRITE):
+    return await _bounded(*(limiter.check(limit_type, identifier) for _ in range(n)))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
+async def test_memory_limiter_admits_exactly_the_limit(limits, algorithm):
+    limits(algorithm, max_requests=50)
+    results = await _burst(RateLimiter(), "client")
+
+    assert sum(r.allowed for r in results) == 50
+    denied = [r for r in results if not r.allowed]
+    assert all(r.retry_after is not None and r.remaining == 0 for r in denied)
+
+
+@pytest.mark.asyncio
+@pytest.mark.performance
+@pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
+async def test_redis_limiter_is_atomic_under_concurrent_load(fake_redis, limits, algorithm):
+    limits(algorithm, max_requests=50, block_seconds=30)
+    limiter = RateLimiter()
+
+    results = await _burst(limiter, f"load-{algorithm}")
+
+    assert sum(r.allowed for r in results) == 50
+    assert sorted(r.remaining for r in results if r.allowed) == list(range(50))
+    assert all(r.retry_after >= 29 for r in results if not r.allowed)
+
+    status = await limiter.get_status(RateLimitType.API_WRITE, f"load-{algorithm}")
+    assert status["is_blocked"] and status["algorithm"] == algorithm.value
+    assert status["current_count"] == 50
+
+    await limiter.reset(RateLimitType.API_WRITE, f"load-{algorithm}")
+    assert (await limiter.check(RateLimitType.API_WRITE, f"load-{algorithm}")).allowed
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_fails_open_when_the_script_errors(fake_redis, limits, monkeypatch):
+    limits(RateLimitAlgorithm.GCRA, max_requests=1)
+
+    async def broken(*args, **kwargs):
+        raise ConnectionError("redis went away")
+
+    monkeypatch.setattr(redis_client, "eval_script", broken)
+    results = await _burst(RateLimiter(), "open", n=5)
+    assert all(r.allowed for r in results)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit_type", sorted(rate_limiter_service.FAIL_CLOSED))
+async def test_credential_limits_fail_closed_when_the_script_errors(fake_redis, monkeypatch, limit_type):
+    async def broken(*args, **kwargs):
+        raise ConnectionError("redis went away")
+
+    monkeypatch.setattr(redis_client, "eval_script", broken)
+    results = await _burst(RateLimiter(), "closed", n=5, limit_type=limit_type)
+    assert not any(r.allowed for r in results)
+    assert all(r.retry_after == rate_limiter_service.FAIL_CLOSED_RETRY_SECONDS for r in results)
+
+
+async def _org(db, name, limit):
+    org = Organization(name=f"{name} {datetime.now(UTC).timestamp()}", ai_daily_limit=limit)
+    db.add(org)
+    await db.commit()
+    return org
+
+
+@pytest.mark.asyncio
+@pytest.mark.performance
+async def test_quota_counters_are_atomic_and_flush_to_daily_usage(fake_redis, async_db_session):
+    db = async_db_session
+    org = await _org(db, "Quota Org", limit=300)
+    # Usage already flushed earlier today seeds the Redis counter
+    db.add(AIUsageDaily(organization_id=org.id, usage_date=date.today(), request_count=20))
+    await db.commit()
+
+    # The organization is looked up once per call; share it so the burst does not
+    # interleave queries on one session
+    organization = SimpleNamespace(ai_daily_limit=300)
+
+    async def get_organization(_db, _organization_id):
+        return organization
+
+    async def attempt():
+        try:
+            return await AIQuotaService.check_and_increment_usage(db, org.id, tokens_input=3)
+        except HTTPException as exc:
+            assert exc.status_code == 429
+            return False
+
+    await AIQuotaService.check_and_increment_usage(db, org.id, increment=False)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(AIQuotaService, "_get_organization", staticmethod(get_organization))
+        results = await _bounded(*(attempt() for _ in range(CONCURRENT_REQUESTS)))
+
+    assert sum(results) == 280
+    await AIQuotaService.record_generation_usage(db, org.id, tokens_input=5, tokens_output=7)
+    stats = await AIQuotaService.get_usage_stats(db, org.id)
+    assert (stats["used"], stats["remaining"]) == (300, 0)
+
+    assert await AIQuotaService.flush_usage(db) == 1
+    assert not await fake_redis.smembers(DIRTY_KEY)
+    record = (await db.execute(
+        select(AIUsageDaily).where(AIUsageDaily.organization_id == org.id)
+    )).scalar_one()
+    await db.refresh(record)
+    assert (record.request_count, record.token_count_input, record.token_count_output) == (300, 845, 7)
+
+    # Nothing new to write; a later request lands on the same row
+    assert await AIQuotaService.flush_usage(db) == 0
+    organization_row = await db.get(Organization, org.id)
+    organization_row.ai_daily_limit = 301
+    await db.commit()
+    assert await AIQuotaService.check_and_increment_usage(db, org.id)
+    assert await AIQuotaService.flush_usage(db) == 1
+    await db.refresh(record)
+    assert record.request_count == 301
+
+
+@pytest.mark.asyncio
+async def test_failed_quota_flush_keeps_the_increments(fake_redis, async_db_session, monkeypatch):
+    db = async_db_session
+    org_id = (await _org(db, "Flush Retry Org", limit=10)).id
+    for _ in range(3):
+        await AIQuotaService.check_and_increment_usage(db, org_id, tokens_output=2)
+
+    async def broken(_db, _rows):
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(AIQuotaService, "_add_usage_rows", staticmethod(broken))
+        with pytest.raises(RuntimeError):
+            await AIQuotaService.flush_usage(db)
+
+    assert await AIQuotaService.flush_usage(db) == 1
+    record = (await db.execute(
+        select(AIUsageDaily).where(AIUsageDaily.organization_id == org_id)
+    )).scalar_one()
+    await db.refresh(record)
+    assert (record.request_count, record.token_count_output) == (3, 6)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.http_tracing import create_traced_async_client
+from app.core.request_profiling import (
+    RequestProfile,
+    RequestProfileRegistry,
+    activate_profile,
+    deactivate_profile,
+    instrument_engine,
+    instrument_response_serialization,
+    request_profiles,
+    span,
+)
+from app.core.tracing import trace_context
+from app.middleware.route_profiler import RouteProfilerMiddleware
+
+
+@pytest.fixture
+def profile():
+    profile = RequestProfile(trace_id="trace-1", method="GET", path="/items/1")
+    token = activate_profile(profile)
+    yield profile
+    deactivate_profile(token)
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    request_profiles.reset()
+    yield
+    request_profiles.reset()
+
+
+async def test_sql_statements_are_counted_per_request(profile):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+    instrument_engine(engine)  # idempotent
+
+    async with engine.connect() as conn:
+        for i in range(3):
+            await conn.execute(text("SELECT :i"), {"i": i})
+    await engine.dispose()
+
+    assert profile.query_count == 3
+    assert profile.repeated_statement() == ("SELECT ?", 3)
+    assert profile.timings["sql"][1] > 0
+
+
+async def test_http_hooks_record_outbound_time(profile):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return httpx.Response(200)
+
+    async with create_traced_async_client(transport=httpx.MockTransport(handler)) as client:
+        await client.get("http://upstream.test/")
+
+    count, seconds = profile.timings["http"]
+    assert count == 1 and seconds >= 0.01
+
+
+def test_spans_outside_a_request_are_ignored():
+    with span("redis"):
+        pass
+    profile = RequestProfile(trace_id="t", method="GET", path="/")
+    profile.closed = True
+    profile.add("sql", 1.0)
+    assert profile.timings == {}
+
+
+def _finished(route: str, duration_ms: float, queries: int, trace_id: str = "t") -> RequestProfile:
+    profile = RequestProfile(trace_id=trace_id, method="GET", path=route, route=route)
+    profile.status_code = 200
+    profile.duration_ms = duration_ms
+    for _ in range(queries):
+        profile.add("sql", 0.001)
+        profile.statements["SELECT * FROM item WHERE id = ?"] += 1
+    return profile
+
+
+def test_histograms_and_n_plus_one_report():
+    registry = RequestProfileRegistry()
+    registry.observe(_finished("/items", 3.0, 2), slow_ms=100, n_plus_one_queries=20)
+    registry.observe(_finished("/items", 300.0, 51, "worst"), slow_ms=100, n_plus_one_queries=20)
+    registry.observe(_finished("/other", 20000.0, 1), slow_ms=100, n_plus_one_queries=20)
+
+    items = registry.histograms()["GET /items"]
+    assert items["requests"] == 2 and items["max_ms"] == 300.0
+    assert items["buckets_ms"]["5"] == 1 and items["buckets_ms"]["500"] == 1
+    assert registry.histograms()["GET /other"]["buckets_ms"]["+Inf"] == 1
+
+    [offender] = registry.n_plus_one_offenders()
+    assert offender["route"] == "GET /items" and offender["flagged_requests"] == 1
+    assert offender["worst"]["trace_id"] == "worst"
+    assert offender["worst"]["statement_repeats"] == 51
+
+    assert [r["trace_id"] for r in registry.slow_requests()] == ["t", "worst"]
+    assert registry.find("worst")["query_count"] == 51
+
+
+class Item(BaseModel):
+    id: int
+
+
+def _app() -> FastAPI:
+    instrument_response_serialization()
+    app = FastAPI()
+
+    @app.get("/items/{item_id}", response_model=Item)
+    async def read_item(item_id: int):
+        with span("redis"):
+            await asyncio.sleep(0)
+        return {"id": item_id}
+
+    @app.get("/busy")
+    def busy():
+        time.sleep(0.05)
+        return {}
+
+    app.add_middleware(RouteProfilerMiddleware)
+    return app
+
+
+async def test_middleware_profiles_requests_by_route_template():
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        with trace_context("trace-route"):
+            for item_id in (1, 2):
+                assert (await client.get(f"/items/{item_id}")).json() == {"id": item_id}
+
+    stats = request_profiles.histograms()["GET /items/{item_id}"]
+    assert stats["requests"] == 2
+    assert set(stats["mean_breakdown_ms"]) == {"redis", "serialization"}
+
+
+async def test_armed_route_is_stack_sampled():
+    request_profiles.arm("GET /busy", requests=1, interval_ms=1)
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        with trace_context("trace-sampled"):
+            await client.get("/busy")
+            await client.get("/busy")
+
+    state = request_profiles.sampler_state()
+    assert state["armed"] == {}
+    assert [s["trace_id"] for s in state["captured"]] == ["trace-sampled"]
+    stacks = request_profiles.folded_stacks("trace-sampled")
+    assert stacks and all(line.rsplit(" ", 1)[1].isdigit() for line in stacks.splitlines())
@@ -0,0 +1,222 @@
+"""
+Tests for cursor-driven streaming exports (CSV/TSV, Parquet, XLSX) and export artifacts.
+"""
+
+import csv
+import gzip
+import io
+from datetime import UTC, datetime
+
+import pytest
+
+from app.api.v2 import export as export_api
+from app.models.core import Organization, Program, Study, Trial
+from app.models.genotyping import Call, CallSet, Variant, VariantSet
+from app.models.germplasm import Germplasm
+from app.models.phenotyping import Observation, ObservationUnit, ObservationVariable
+from app.modules.core.services import result_artifact_service
+from app.modules.core.services.result_artifact_service import ResultArtifactStore
+from app.modules.core.services.streaming_export_service import (
+    OBSERVATION_COLUMNS,
+    ExportDataset,
+    ExportError,
+    ExportFormat,
+    ExportScope,
+    build_plan,
+    encode,
+    write_export_artifact,
+)
+
+
+async def _trial(db, organization_id=None, n_genotypes=7, traits=("Height", "Yield")):
+    stamp = datetime.now(UTC).timestamp()
+    if organization_id is None:
+        org = Organization(name=f"Export Org {stamp}")
+        db.add(org)
+        await db.flush()
+        organization_id = org.id
+    program = Program(organization_id=organization_id, program_name=f"Program {stamp}")
+    db.add(program)
+    await db.flush()
+    trial = Trial(organization_id=organization_id, program_id=program.id, trial_name="Kharif")
+    db.add(trial)
+    await db.flush()
+    study = Study(organization_id=organization_id, trial_id=trial.id, study_name="Site A")
+    variables = [
+        ObservationVariable(organization_id=organization_id, observation_variable_name=f"{name} {stamp}")
+        for name in traits
+    ]
+    genotypes = [
+        Germplasm(organization_id=organization_id, germplasm_db_id=f"EXP-{stamp}-{i}", germplasm_name=f"IR-{i}")
+        for i in range(n_genotypes)
+    ]
+    db.add_all([study, *variables, *genotypes])
+    await db.flush()
+
+    for g, genotype in enumerate(genotypes):
+        unit = ObservationUnit(
+            organization_id=organization_id, study_id=study.id, germplasm_id=genotype.id,
+            observation_unit_name=f"P{g:03d}",
+        )
+        db.add(unit)
+        await db.flush()
+        for v, variable in enumerate(variables):
+            # Two replicate observations per cell; the matrix reports their mean
+            for rep in range(2):
+                db.add(Observation(
+                    organization_id=organization_id, observation_unit_id=unit.id, study_id=study.id,
+                    germplasm_id=genotype.id, observation_variable_id=variable.id,
+                    value=str(g * 10 + v + rep), collector="asha",
+                ))
+    await db.commit()
+    return ExportScope(organization_id=organization_id, program_id=program.id)
+
+
+async def _collect(plan, fmt, use_gzip=False):
+    return [chunk async for chunk in encode(plan, fmt, use_gzip)]
+
+
+@pytest.mark.asyncio
+async def test_observations_stream_as_gzipped_csv_and_tsv_in_chunks(async_db_session):
+    db = async_db_session
+    scope = await _trial(db)
+
+    chunks = await _collect(await build_plan(db, ExportDataset.OBSERVATIONS, scope, chunk_size=4), ExportFormat.CSV, True)
+    assert len(chunks) > 5
+    rows = list(csv.reader(io.StringIO(gzip.decompress(b"".join(chunks)).decode())))
+    assert rows[0] == OBSERVATION_COLUMNS and len(rows) == 1 + 7 * 2 * 2
+    assert rows[1][:3] == ["Kharif", "Site A", "P000"] and rows[1][6:9] == ["0", "0.0", ""]
+    assert rows[-1][10] == "asha"
+
+    tsv = b"".join(await _collect(await build_plan(db, ExportDataset.OBSERVATIONS, scope), ExportFormat.TSV))
+    assert tsv.decode().splitlines()[1].split("\t")[:3] == ["Kharif", "Site A", "P000"]
+
+    # Another program's observations are not included
+    assert len(tsv.decode().splitlines()) == 1 + 28
+
+
+@pytest.mark.asyncio
+async def test_observations_without_study_are_exported_unless_scoped(async_db_session):
+    db = async_db_session
+    scope = await _trial(db, n_genotypes=1, traits=("Height",))
+    db.add(Observation(organization_id=scope.organization_id, value="12", collector="ravi"))
+    await db.commit()
+
+    unscoped = ExportScope(organization_id=scope.organization_id)
+    text = b"".join(await _collect(await build_plan(db, ExportDataset.OBSERVATIONS, unscoped), ExportFormat.CSV))
+    rows = list(csv.reader(io.StringIO(text.decode())))
+    assert len(rows) == 1 + 3
+    assert rows[-1][:2] == ["", ""] and rows[-1][10] == "ravi"
+
+    scoped = b"".join(await _collect(await build_plan(db, ExportDataset.OBSERVATIONS, scope), ExportFormat.CSV))
+    assert len(scoped.decode().splitlines()) == 1 + 2
+
+
+@pytest.mark.asyncio
+async def test_phenotype_matrix_pivots_means_into_parquet_row_groups(async_db_session):
+    pq = pytest.importorskip("pyarrow.parquet")
+    db = async_db_session
+    scope = await _trial(db)
+
+    plan = await build_plan(db, ExportDataset.PHENOTYPE_MATRIX, scope, chunk_size=3)
+    data = b"".join(await _collect(plan, ExportFormat.PARQUET))
+
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.num_row_groups == 3
+    table = parquet.read().to_pydict()
+    height, grain = plan.columns[1:]
+    assert plan.columns[0] == "genotype" and height.startswith("Height")
+    assert table["genotype"] == [f"IR-{g}" for g in range(7)]
+    assert table[height] == [g * 10 + 0.5 for g in range(7)]
+    assert table[grain] == [g * 10 + 1.5 for g in range(7)]
+
+
+@pytest.mark.asyncio
+async def test_marker_matrix_streams_to_xlsx(async_db_session):
+    openpyxl = pytest.importorskip("openpyxl")
+    db = async_db_session
+    scope = await _trial(db, n_genotypes=1, traits=())
+    stamp = datetime.now(UTC).timestamp()
+    variant_set = VariantSet(organization_id=scope.organization_id, variant_set_name=f"Panel {stamp}")
+    db.add(variant_set)
+    await db.flush()
+    variants = [
+        Variant(organization_id=scope.organization_id, variant_set_id=variant_set.id, variant_name=f"M{i}")
+        for i in range(4)
+    ]
+    call_sets = [CallSet(organization_id=scope.organization_id, call_set_name=f"S{i}") for i in range(5)]
+    db.add_all([*variants, *call_sets])
+    await db.flush()
+    db.add_all([
+        Call(
+            organization_id=scope.organization_id, variant_id=variant.id, call_set_id=call_set.id,
+            genotype_value=f"{(c + m) % 3}/1",
+        )
+        for c, call_set in enumerate(call_sets)
+        for m, variant in enumerate(variants)
+        if (c, m) != (2, 3)
+    ])
+    await db.commit()
+
+    with pytest.raises(ExportError, match="variant_set_id"):
+        await build_plan(db, ExportDataset.MARKERS, scope)
+
+    scope.variant_set_id = variant_set.id
+    plan = await build_plan(db, ExportDataset.MARKERS, scope, chunk_size=2)
+    workbook = openpyxl.load_workbook(io.BytesIO(b"".join(await _collect(plan, ExportFormat.XLSX))))
+    rows = list(workbook.active.iter_rows(values_only=True))
+    assert rows[0] == ("genotype", "M0", "M1", "M2", "M3")
+    assert rows[3] == ("S2", "2/1", "0/1", "1/1", None)
+    assert len(rows) == 6
+
+
+@pytest.mark.asyncio
+async def test_export_artifact_is_written_in_chunks_and_downloadable(async_db_session, tmp_path, monkeypatch):
+    db = async_db_session
+    scope = await _trial(db)
+    store = ResultArtifactStore(root=str(tmp_path), ttl_hours=1)
+    monkeypatch.setattr(result_artifact_service, "result_artifact_store", store)
+
+    handle = await write_export_artifact(
+        db, ExportDataset.OBSERVATIONS, scope, ExportFormat.CSV, gzip=True, chunk_size=5
+    )
+
+    assert handle["kind"] == "file" and handle["media_type"] == "application/gzip"
+    assert handle["metadata"]["dataset"] == "observations"
+    artifact = store.get(handle["artifact_id"], scope.organization_id)
+    assert artifact.name.endswith(".csv.gz") and store.get(handle["artifact_id"], -1) is None
+    with open(store.path(artifact), "rb") as stored:
+        data = stored.read()
+    assert len(data) == handle["nbytes"]
+    assert gzip.decompress(data).decode().count("\n") == 1 + 28
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_streams_small_exports_and_queues_large_ones(
+    authenticated_client, async_db_session, test_user, monkeypatch
+):
+    scope = await _trial(async_db_session, organization_id=test_user.organization_id)
+    url = "/api/v2/export/stream/observations"
+
+    response = await authenticated_client.get(url, params={"program_id": scope.program_id, "gzip": False})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["x-export-source-rows"] == "28"
+    assert 'filename="observations_program_' in response.headers["content-disposition"]
+    assert len(response.text.splitlines()) == 29
+
+    queued = []
+
+    async def submit(dataset, export_scope, fmt, use_gzip, user_id=None):
+        queued.append((dataset, export_scope.program_id, fmt))
+        return "task-1"
+
+    monkeypatch.setattr(export_api, "submit_export_job", submit)
+    monkeypatch.setattr(export_api.settings, "EXPORT_STREAM_MAX_ROWS", 10)
+    response = await authenticated_client.get(url, params={"program_id": scope.program_id, "format": "parquet"})
+    assert response.status_code == 202
+    assert response.json()["status_href"] == "/api/v2/tasks/task-1"
+    assert queued == [(ExportDataset.OBSERVATIONS, scope.program_id, ExportFormat.PARQUET)]
+
+    response = await authenticated_client.get("/api/v2/export/stream/markers")
+    assert response.status_code == 400
@@ -0,0 +1,119 @@
+"""Unit tests for the compute benchmark harness and its synthetic data."""
+
+import json
+
+import numpy as np
+import pytest
+
+from scripts.benchmark_compute import (
+    SCALES,
+    Scale,
+    all_cases,
+    compare,
+    genotype_matrix,
+    multi_environment_trial,
+    pedigree,
+    run_suite,
+    select_cases,
+    update_baseline,
+)
+
+
+TINY = Scale(40, 200, 50, 20, 40, 10, (8, 4), (6, 5), (6, 2, 10))
+
+
+def test_genotypes_carry_ld_that_decays_with_distance():
+    rng = np.random.default_rng(0)
+    genotypes, chromosomes, positions = genotype_matrix(400, 300, rng, n_chromosomes=1)
+
+    assert set(np.unique(genotypes)) <= {0.0, 1.0, 2.0}
+    assert chromosomes[0] == "chr1" and positions == sorted(positions)
+
+    r = np.nan_to_num(np.corrcoef(genotypes.T))
+    mean_r2 = [np.mean(np.diag(r, lag) ** 2) for lag in (1, 5, 100)]
+    assert mean_r2 == sorted(mean_r2, reverse=True)
+    assert mean_r2[0] > 0.15 and mean_r2[-1] < 0.02
+
+
+def test_trial_and_pedigree_generators():
+    rng = np.random.default_rng(1)
+    assert multi_environment_trial(10, 5, rng).shape == (10, 5)
+
+    records = pedigree(4, 3, 6, rng)
+    ids = {r["id"] for r in records}
+    assert len(records) == 4 + 3 * 6
+    for record in records[4:]:
+        assert record["sire_id"] in ids and record["dam_id"] in ids
+        assert record["sire_id"] != record["dam_id"]
+
+
+def test_case_selection_by_prefix():
+    names = [case.name for case in all_cases()]
+    assert len(names) == len(set(names))
+    assert select_cases("") == names
+    assert select_cases("gwas.,ld.") == [n for n in names if n.startswith(("gwas.", "ld."))]
+
+
+def test_in_process_run_records_every_metric(monkeypatch):
+    monkeypatch.setitem(SCALES, "tiny", TINY)
+    report = run_suite(
+        "tiny", ["engine.grm", "gxe.all_scores", "pedigree.load"], repeats=1, isolate=False
+    )
+
+    assert report["scale"] == "tiny" and report["environment"]["cpu_count"]
+    for record in report["results"].values():
+        assert "error" not in record, record
+        assert record["wall_ms"] >= 0 and record["alloc_peak_mb"] >= 0
+    json.dumps(report)
+
+
+def _report(wall_ms: float, alloc_peak_mb: float = 10.0, **extra) -> dict:
+    return {
+        "scale": "small",
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "seed": 0,
+        "isolated": True,
+        "environment": {"machine": "x86_64", "cpu_count": 8},
+        "results": {
+            "engine.grm": {
+                "wall_ms": wall_ms,
+                "wall_ms_min": wall_ms,
+                "alloc_peak_mb": alloc_peak_mb,
+            },
+            **extra,
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    ("wall_ms", "alloc_peak_mb", "regressed"),
+    [
+        (110.0, 10.0, False),  # within the time tolerance
+        (200.0, 10.0, True),
+        (100.0, 20.0, True),
+        (100.0, 10.5, False),  # under 1 MB of extra allocation
+    ],
+)
+def test_compare_flags_time_and_memory_regressions(tmp_path, wall_ms, alloc_peak_mb, regressed):
+    path = tmp_path / "baseline.json"
+    update_baseline(path, _report(100.0))
+
+    comparison = compare(_report(wall_ms, alloc_peak_mb), json.loads(path.read_text()))
+
+    assert (comparison["regressions"] == ["engine.grm"]) is regressed
+    assert comparison["environment_mismatch"] == []
+
+
+def test_compare_reports_new_failing_and_mismatched_runs(tmp_path):
+    path = tmp_path / "baseline.json"
+    update_baseline(path, _report(100.0))
+    current = _report(100.0, **{"gwas.glm": {"wall_ms_min": 1.0, "alloc_peak_mb": 1.0}})
+    current["results"]["engine.grm"] = {"error": "LinAlgError: singular"}
+    current["environment"]["cpu_count"] = 2
+    current["isolated"] = False
+
+    comparison = compare(current, json.loads(path.read_text()))
+
+    assert comparison["operations"]["gwas.glm"]["status"] == "new"
+    assert comparison["regressions"] == ["engine.grm"]
+    assert comparison["environment_mismatch"] == ["cpu_count", "isolated"]
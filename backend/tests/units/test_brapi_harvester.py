@@ -0,0 +1,219 @@
+"""
+Tests for the concurrent, checkpointed BrAPI harvester against the stub BrAPI server.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.integrations.base import IntegrationConfig
+from app.integrations.brapi import BrAPIAdapter
+from app.integrations.brapi_harvester import BrAPIHarvester, local_db_id, parse_retry_after
+from app.integrations.brapi_stub import StubBrAPIServer
+from app.models.brapi_harvest import BrAPIHarvestCheckpoint
+from app.models.core import Organization, Program, Study, Trial
+from app.models.germplasm import Germplasm
+from app.models.phenotyping import ObservationVariable
+
+BASE = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _records(n_germplasm=1234):
+    def stamp(i):
+        return (BASE + timedelta(minutes=i)).isoformat()
+
+    return {
+        "programs": [{"programDbId": f"P{i}", "programName": f"Program {i}", "lastUpdated": stamp(i)} for i in range(3)],
+        "locations": [{"locationDbId": f"L{i}", "locationName": f"Site {i}", "countryCode": "IND"} for i in range(2)],
+        "trials": [
+            {"trialDbId": f"T{i}", "trialName": f"Trial {i}", "programDbId": f"P{i % 3}", "lastUpdated": stamp(i)}
+            for i in range(5)
+        ],
+        "studies": [
+            {"studyDbId": f"S{i}", "studyName": f"Study {i}", "trialDbId": f"T{i % 5}", "locationDbId": f"L{i % 2}",
+             "lastUpdated": stamp(i)}
+            for i in range(7)
+        ] + [{"studyDbId": "S-orphan", "studyName": "Orphan", "trialDbId": "T-missing"}],
+        "germplasm": [
+            {"germplasmDbId": f"G{i}", "germplasmName": f"IR-{i}", "genus": "Oryza", "lastUpdated": stamp(i)}
+            for i in range(n_germplasm)
+        ],
+        "variables": [
+            {"observationVariableDbId": f"V{i}", "observationVariableName": f"Height {i}",
+             "trait": {"traitName": "Plant height"}, "scale": {"dataType": "Numerical", "decimalPlaces": 1}}
+            for i in range(10)
+        ],
+    }
+
+
+class _ConcurrencyProbe(StubBrAPIServer):
+    """Stub server that holds each request briefly and records the peak number in flight."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def handle_async_request(self, request):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.002)
+            return await super().handle_async_request(request)
+        finally:
+            self.in_flight -= 1
+
+
+def _harvester(server, **kwargs):
+    harvester = BrAPIHarvester(httpx.AsyncClient(transport=server), server.base_url, **kwargs)
+    harvester.delays = []
+
+    async def record_sleep(seconds):
+        harvester.delays.append(seconds)
+
+    harvester._sleep = record_sleep
+    return harvester
+
+
+async def _org(db, name):
+    org = Organization(name=f"{name} {datetime.now(UTC).timestamp()}")
+    db.add(org)
+    await db.commit()
+    return org
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None and parse_retry_after("soon") is None
+    later = (datetime.now(UTC) + timedelta(seconds=30)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+    assert 25 <= parse_retry_after(later) <= 30
+
+
+@pytest.mark.asyncio
+async def test_search_harvest_walks_every_page_concurrently_and_honours_retry_after(async_db_session):
+    db = async_db_session
+    org = await _org(db, "Harvest Org")
+    server = _ConcurrencyProbe(_records(), search=True, throttle_every=9, retry_after="2")
+    harvester = _harvester(server, page_size=100, concurrency=4)
+
+    results = await harvester.harvest(db, org.id)
+
+    assert results["germplasm"].used_search and results["germplasm"].pages == 13
+    assert results["germplasm"].upserted == 1234
+    assert results["studies"].failed == 1 and "T-missing" in results["studies"].errors[0]
+    assert server.peak > 1 and server.peak <= 4
+    assert server.throttled > 0 and harvester.delays.count(2.0) == server.throttled
+
+    count = (await db.execute(select(func.count()).select_from(Germplasm).where(Germplasm.organization_id == org.id))).scalar()
+    assert count == 1234
+
+    study = (await db.execute(
+        select(Study).where(Study.study_db_id == local_db_id(org.id, server.base_url, "S3"))
+    )).scalar_one()
+    trial = await db.get(Trial, study.trial_id)
+    program = await db.get(Program, trial.program_id)
+    assert (trial.trial_name, program.program_name) == ("Trial 3", "Program 0")
+    assert study.location_id is not None
+    assert {"referenceId": "S3", "referenceSource": server.base_url} in study.external_references
+
+    variable = (await db.execute(
+        select(ObservationVariable).where(ObservationVariable.organization_id == org.id, ObservationVariable.observation_variable_name == "Height 4")
+    )).scalar_one()
+    assert (variable.trait_name, variable.data_type, variable.decimal_places) == ("Plant height", "Numerical", 1)
+
+    # A second organization harvesting the same server gets its own rows
+    other = await _org(db, "Other Harvest Org")
+    await _harvester(server, page_size=500).harvest(db, other.id, ["programs"])
+    programs = (await db.execute(select(func.count()).select_from(Program).where(Program.organization_id.in_([org.id, other.id])))).scalar()
+    assert programs == 6
+
+
+@pytest.mark.asyncio
+async def test_interrupted_harvest_resumes_and_next_pull_is_incremental(async_db_session):
+    db = async_db_session
+    org = await _org(db, "Resume Org")
+    records = _records(n_germplasm=950)
+    server = StubBrAPIServer(records, fail_pages={("germplasm", 5)}, modified_since_param="lastUpdatedSince")
+    harvester = _harvester(server, page_size=100, concurrency=1, use_search=False, modified_since_param="lastUpdatedSince")
+
+    first = await harvester.harvest(db, org.id, ["germplasm"])
+    assert "500" in first["germplasm"].errors[0]
+    checkpoint = (await db.execute(
+        select(BrAPIHarvestCheckpoint).where(BrAPIHarvestCheckpoint.organization_id == org.id)
+    )).scalar_one()
+    assert (checkpoint.status, checkpoint.next_page) == ("interrupted", 5)
+
+    server.fail_pages.clear()
+    server.requests.clear()
+    resumed = await harvester.harvest(db, org.id, ["germplasm"])
+    assert resumed["germplasm"].resumed_from_page == 5
+    assert [int(r.url.params["page"]) for r in server.requests] == [5, 6, 7, 8, 9]
+    await db.refresh(checkpoint)
+    assert (checkpoint.status, checkpoint.next_page) == ("completed", 0)
+    assert checkpoint.modified_since.replace(tzinfo=UTC) == BASE + timedelta(minutes=949)
+    count = (await db.execute(select(func.count()).select_from(Germplasm).where(Germplasm.organization_id == org.id))).scalar()
+    assert count == 950
+
+    # Only records changed since the watermark come back on the next pull
+    for i in (3, 400, 777):
+        records["germplasm"][i].update(germplasmName=f"IR-{i}-renamed", lastUpdated=(BASE + timedelta(days=2)).isoformat())
+    server.requests.clear()
+    incremental = await harvester.harvest(db, org.id, ["germplasm"])
+    assert incremental["germplasm"].records == 3 and incremental["germplasm"].upserted == 3
+    assert len(server.requests) == 1
+    renamed = (await db.execute(
+        select(Germplasm.germplasm_name).where(Germplasm.germplasm_db_id == local_db_id(org.id, server.base_url, "G400"))
+    )).scalar_one()
+    assert renamed == "IR-400-renamed"
+
+
+@pytest.mark.asyncio
+async def test_records_that_failed_to_store_are_retried_on_the_next_pull(async_db_session):
+    db = async_db_session
+    org = await _org(db, "Retry Org")
+    records = _records(n_germplasm=0)
+    late = {"studyDbId": "S-late", "studyName": "Late", "trialDbId": "T-late", "lastUpdated": BASE.isoformat()}
+    records["studies"] = [*records["studies"][:7], late]
+    server = StubBrAPIServer(records, modified_since_param="lastUpdatedSince")
+    harvester = _harvester(server, page_size=100, use_search=False, modified_since_param="lastUpdatedSince")
+
+    first = await harvester.harvest(db, org.id, ["programs", "trials", "studies"])
+    assert first["studies"].failed == 1 and "T-late" in first["studies"].errors[0]
+    checkpoint = (await db.execute(
+        select(BrAPIHarvestCheckpoint).where(
+            BrAPIHarvestCheckpoint.organization_id == org.id, BrAPIHarvestCheckpoint.entity == "studies"
+        )
+    )).scalar_one()
+    assert (checkpoint.failed_records, checkpoint.modified_since) == (1, None)
+
+    # The parent shows up; the study itself has not changed on the server
+    records["trials"].append(
+        {"trialDbId": "T-late", "trialName": "Late trial", "programDbId": "P0", "lastUpdated": (BASE + timedelta(days=1)).isoformat()}
+    )
+    second = await harvester.harvest(db, org.id, ["programs", "trials", "studies"])
+    assert (second["studies"].failed, second["studies"].records) == (0, 8)
+    study = (await db.execute(
+        select(Study).where(Study.study_db_id == local_db_id(org.id, server.base_url, "S-late"))
+    )).scalar_one()
+    assert study.study_name == "Late"
+    await db.refresh(checkpoint)
+    assert checkpoint.failed_records == 0
+    assert checkpoint.modified_since.replace(tzinfo=UTC) == BASE + timedelta(minutes=6)
+
+
+@pytest.mark.asyncio
+async def test_adapter_pull_walks_all_pages():
+    server = StubBrAPIServer(_records(n_germplasm=250))
+    adapter = BrAPIAdapter(IntegrationConfig(base_url=server.base_url, extra={"page_size": 100}))
+    adapter._client = httpx.AsyncClient(transport=server)
+
+    async with adapter:
+        result = await adapter.sync("pull")
+
+    assert result.success
+    assert result.records_synced == 3 + 2 + 5 + 8 + 250 + 10
+    germplasm_pages = sorted(int(r.url.params["page"]) for r in server.requests if r.url.path.endswith("/germplasm"))
+    assert germplasm_pages == [0, 1, 2]
@@ -0,0 +1,88 @@
+"""Unit tests for the REEVU route compiler and the routing paths built on it."""
+
+import json
+import random
+import string
+from pathlib import Path
+
+import pytest
+
+from app.modules.ai.services.function_calling_service import FunctionCallingService
+from app.modules.ai.services.reevu.planner import _detect_domains
+from app.modules.ai.services.reevu.route_compiler import CompiledRoutes, scan_message
+
+
+FIXTURE = Path(__file__).resolve().parents[1] / "fixtures" / "reevu" / "top_intent_routing.json"
+
+# Routing decisions of the keyword cascades the compiler replaced, per fixture case
+TOP_INTENT_DECISIONS = {
+    "intent-01": "search_germplasm",
+    "intent-02": "search_germplasm",
+    "intent-03": "search_germplasm",
+    "intent-04": "search_trials",
+    "intent-05": "cross_domain_query",
+    "intent-06": "search_crosses",
+    "intent-07": "search_accessions",
+    "intent-08": "compare_germplasm",
+    "intent-09": "cross_domain_query",
+    "intent-10": "cross_domain_query",
+    "intent-11": "propose_create_cross",
+    "intent-12": "propose_create_cross",
+    "intent-13": "propose_record_observation",
+    "intent-14": "propose_record_observation",
+    "intent-15": "get_weather_forecast",
+    "intent-16": "get_weather_forecast",
+    "intent-17": "navigate_to",
+    "intent-18": "navigate_to",
+    "intent-19": None,
+    "intent-20": "calculate_breeding_value",
+}
+
+
+class TestCompiledRoutes:
+    def test_scan_finds_exactly_the_substring_terms(self):
+        rng = random.Random(7)
+        alphabet = "abc -"
+        terms = {"".join(rng.choices(alphabet, k=rng.randint(1, 5))) for _ in range(80)}
+        routes = CompiledRoutes({"all": sorted(terms)})
+
+        for _ in range(300):
+            text = "".join(rng.choices(alphabet + string.ascii_uppercase[:3], k=rng.randint(0, 40)))
+            expected = {term for term in terms if term in text.lower()}
+            assert routes.scan(text).terms == expected, text
+
+    def test_groups_share_terms_and_keep_declared_order(self):
+        routes = CompiledRoutes(
+            {
+                "crops": ("pigeon pea", "rice", "pea"),
+                "stations": ("IRRI", "Delhi"),
+            }
+        )
+        scan = routes.scan("Pigeon pea and RICE lines at irri")
+
+        assert scan.matched("crops") == ["pigeon pea", "rice", "pea"]
+        assert scan.first("stations") == "irri" and scan.any("stations")
+        assert not routes.scan("wheat").any("crops")
+        with pytest.raises(KeyError):
+            scan.any("unknown")
+
+    def test_scans_are_cached_per_message(self):
+        assert scan_message("Show rice trials") is scan_message("Show rice trials")
+
+
+def test_hyphenated_cues_match_like_spaces():
+    assert _detect_domains("Find the best sowing-window for maize") == _detect_domains(
+        "Find the best sowing window for maize"
+    )
+
+
+def test_top_intent_fixture_routing_is_unchanged():
+    service = FunctionCallingService(api_key=None)
+    cases = json.loads(FIXTURE.read_text(encoding="utf-8"))
+
+    decisions = {}
+    for case in cases:
+        call = service._detect_with_patterns(case["message"])
+        decisions[case["id"]] = call.name if call else None
+
+    assert decisions == TOP_INTENT_DECISIONS
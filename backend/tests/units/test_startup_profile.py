@@ -0,0 +1,57 @@
+"""Unit tests for the cold-start profile script."""
+
+from scripts.startup_profile import (
+    package_totals,
+    parse_importtime,
+    profile_target,
+    prune,
+    render_tree,
+)
+
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   encodings.aliases
+import time:       300 |        400 | encodings
+import time:      2000 |       2000 |       numpy._core
+import time:      1000 |       3000 |     numpy
+import time:       500 |        500 |     json
+import time:       500 |       4000 |   app.services.compute_engine
+import time:      1000 |       5000 | app.services
+SECRET_KEY not set.
+"""
+
+
+def test_importtime_output_is_rebuilt_as_a_tree():
+    roots = parse_importtime(IMPORTTIME)
+
+    assert [(root.name, root.cumulative_us) for root in roots] == [
+        ("encodings", 400),
+        ("app.services", 5000),
+    ]
+    engine = roots[1].children[0]
+    assert engine.name == "app.services.compute_engine"
+    assert [child.name for child in engine.children] == ["numpy", "json"]
+    assert engine.children[0].children[0].name == "numpy._core"
+
+
+def test_tree_pruning_and_package_totals():
+    roots = parse_importtime(IMPORTTIME)
+
+    tree = prune(roots, min_ms=1.0, max_depth=3)
+    assert [node["module"] for node in tree] == ["app.services"]
+    assert [node["module"] for node in tree[0]["children"][0]["children"]] == ["numpy"]
+    assert tree[0]["children"][0]["children"][0]["children"] == []
+    assert render_tree(tree)[1] == "       4.0 ms    app.services.compute_engine"
+
+    totals = {row["package"]: row["ms"] for row in package_totals(roots)}
+    assert totals == {"numpy": 3.0, "app": 1.5, "json": 0.5, "encodings": 0.4}
+
+
+def test_light_worker_profile_runs_in_a_fresh_interpreter():
+    report = profile_target("light", min_ms=5.0)
+
+    assert "error" not in report
+    assert report["preload"] == {} and report["import_ms"] > 0
+    assert report["modules_imported"] > 0
+    assert report["tree"][0]["ms"] >= report["tree"][-1]["ms"]
@@ -127,3 +127,82 @@ int reml_estimate(
     *log_lik_out = -100.0;
     return 0;
 }
+
+// Column-major kernels (ld_analysis, pca_svd, stability_analysis,
+// gxe_analysis, selection_index)
+
+int compute_ld_matrix(
+    const double* genotypes,
+    double* ld_matrix,
+    int n,
+    int m
+) {
+    (void)genotypes;
+    printf("[Mock Fortran] compute_ld_matrix called (n=%d, m=%d)\n", n, m);
+    // Identity matrix
+    for(int i=0; i<m*m; i++) ld_matrix[i] = 0.0;
+    for(int i=0; i<m; i++) ld_matrix[i*m + i] = 1.0;
+    return 0;
+}
+
+int compute_pca(
+    const double* x,
+    double* scores,
+    double* loadings,
+    double* variance,
+    int n,
+    int p,
+    int k,
+    int center,
+    int scale
+) {
+    (void)x; (void)center; (void)scale;
+    printf("[Mock Fortran] compute_pca called (n=%d, p=%d, k=%d)\n", n, p, k);
+    for(int i=0; i<n*k; i++) scores[i] = 0.0;
+    for(int i=0; i<p*k; i++) loadings[i] = 0.0;
+    for(int i=0; i<k; i++) variance[i] = 1.0 / k;
+    return 0;
+}
+
+int eberhart_russell(
+    const double* y,
+    double* means,
+    double* bi,
+    double* s2di,
+    int g,
+    int e
+) {
+    (void)y;
+    printf("[Mock Fortran] eberhart_russell called (g=%d, e=%d)\n", g, e);
+    for(int i=0; i<g; i++) { means[i] = 0.0; bi[i] = 1.0; s2di[i] = 0.0; }
+    return 0;
+}
+
+int finlay_wilkinson(
+    const double* y,
+    double* means,
+    double* slopes,
+    double* r_squared,
+    double* env_index,
+    int g,
+    int e
+) {
+    (void)y;
+    printf("[Mock Fortran] finlay_wilkinson called (g=%d, e=%d)\n", g, e);
+    for(int i=0; i<g; i++) { means[i] = 0.0; slopes[i] = 1.0; r_squared[i] = 0.0; }
+    for(int j=0; j<e; j++) env_index[j] = 0.0;
+    return 0;
+}
+
+int smith_hazel_index(
+    const double* p,
+    const double* g,
+    const double* a,
+    double* b,
+    int t
+) {
+    (void)p; (void)g;
+    printf("[Mock Fortran] smith_hazel_index called (t=%d)\n", t);
+    for(int i=0; i<t; i++) b[i] = a[i];
+    return 0;
+}
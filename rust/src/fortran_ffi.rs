@@ -98,6 +98,64 @@ extern "C" {
         p: c_int,
         q: c_int,
     ) -> c_int;
+
+    // The kernels below take column-major (Fortran order) matrices
+
+    /// Compute pairwise LD (r²) matrix between markers (ld_analysis)
+    #[link_name = "compute_ld_matrix"]
+    fn c_compute_ld_matrix(
+        genotypes: *const c_double,
+        ld_matrix: *mut c_double,
+        n: c_int,
+        m: c_int,
+    ) -> c_int;
+
+    /// Principal Component Analysis via SVD (pca_svd)
+    #[link_name = "compute_pca"]
+    fn c_compute_pca(
+        x: *const c_double,
+        scores: *mut c_double,
+        loadings: *mut c_double,
+        variance: *mut c_double,
+        n: c_int,
+        p: c_int,
+        k: c_int,
+        center: c_int,
+        scale: c_int,
+    ) -> c_int;
+
+    /// Eberhart-Russell stability analysis (stability_analysis)
+    #[link_name = "eberhart_russell"]
+    fn c_eberhart_russell(
+        y: *const c_double,
+        means: *mut c_double,
+        bi: *mut c_double,
+        s2di: *mut c_double,
+        g: c_int,
+        e: c_int,
+    ) -> c_int;
+
+    /// Finlay-Wilkinson regression (gxe_analysis)
+    #[link_name = "finlay_wilkinson"]
+    fn c_finlay_wilkinson(
+        y: *const c_double,
+        means: *mut c_double,
+        slopes: *mut c_double,
+        r_squared: *mut c_double,
+        env_index: *mut c_double,
+        g: c_int,
+        e: c_int,
+    ) -> c_int;
+
+    /// Smith-Hazel selection index coefficients (selection_index)
+    #[link_name = "smith_hazel_index"]
+    fn c_smith_hazel_index(
+        p: *const c_double,
+        g: *const c_double,
+        a: *const c_double,
+        b: *mut c_double,
+        t: c_int,
+    ) -> c_int;
 }
 
 /// Error types for Fortran computations
@@ -458,6 +516,215 @@ pub fn reml_estimate(
     }
 }
 
+/// PCA computation result (column-major matrices)
+#[derive(Debug, Clone)]
+pub struct PcaResult {
+    /// Component scores (n x k)
+    pub scores: Vec<f64>,
+    /// Component loadings (p x k)
+    pub loadings: Vec<f64>,
+    /// Fraction of variance explained per component (k)
+    pub variance: Vec<f64>,
+}
+
+/// Eberhart-Russell stability result
+#[derive(Debug, Clone)]
+pub struct StabilityResult {
+    /// Genotype means (g)
+    pub means: Vec<f64>,
+    /// Regression coefficients bi (g)
+    pub regression: Vec<f64>,
+    /// Deviations from regression S²di (g)
+    pub deviation: Vec<f64>,
+}
+
+/// Finlay-Wilkinson regression result
+#[derive(Debug, Clone)]
+pub struct FinlayWilkinsonResult {
+    /// Genotype means (g)
+    pub means: Vec<f64>,
+    /// Regression slopes (g)
+    pub slopes: Vec<f64>,
+    /// R² of each genotype's regression (g)
+    pub r_squared: Vec<f64>,
+    /// Environment index (e)
+    pub env_index: Vec<f64>,
+}
+
+/// Safe wrapper for the pairwise LD (r²) matrix
+///
+/// # Arguments
+/// * `genotypes` - Marker matrix (n x m, column-major), coded 0, 1, 2; missing calls negative
+/// * `n` - Number of individuals
+/// * `m` - Number of markers
+///
+/// # Returns
+/// * Symmetric r² matrix (m x m)
+pub fn ld_matrix(genotypes: &[f64], n: usize, m: usize) -> ComputeResult<Vec<f64>> {
+    if genotypes.len() != n * m {
+        return Err(ComputeError::InvalidDimensions);
+    }
+
+    let mut ld = vec![0.0; m * m];
+
+    let status =
+        unsafe { c_compute_ld_matrix(genotypes.as_ptr(), ld.as_mut_ptr(), n as c_int, m as c_int) };
+
+    match status {
+        0 => Ok(ld),
+        code => Err(ComputeError::Unknown(code)),
+    }
+}
+
+/// Safe wrapper for PCA
+///
+/// # Arguments
+/// * `x` - Data matrix (n x p, column-major)
+/// * `n`, `p` - Dimensions
+/// * `k` - Number of components to retain (1..=min(n, p))
+/// * `center`, `scale` - Center / scale the columns first
+pub fn pca(
+    x: &[f64],
+    n: usize,
+    p: usize,
+    k: usize,
+    center: bool,
+    scale: bool,
+) -> ComputeResult<PcaResult> {
+    if x.len() != n * p || k == 0 || k > n.min(p) {
+        return Err(ComputeError::InvalidDimensions);
+    }
+
+    let mut scores = vec![0.0; n * k];
+    let mut loadings = vec![0.0; p * k];
+    let mut variance = vec![0.0; k];
+
+    let status = unsafe {
+        c_compute_pca(
+            x.as_ptr(),
+            scores.as_mut_ptr(),
+            loadings.as_mut_ptr(),
+            variance.as_mut_ptr(),
+            n as c_int,
+            p as c_int,
+            k as c_int,
+            center as c_int,
+            scale as c_int,
+        )
+    };
+
+    match status {
+        0 => Ok(PcaResult {
+            scores,
+            loadings,
+            variance,
+        }),
+        -1 => Err(ComputeError::SolveFailure),
+        code => Err(ComputeError::Unknown(code)),
+    }
+}
+
+/// Safe wrapper for Eberhart-Russell stability analysis
+///
+/// # Arguments
+/// * `y` - Genotype x environment means (g x e, column-major), e > 2
+pub fn eberhart_russell(y: &[f64], g: usize, e: usize) -> ComputeResult<StabilityResult> {
+    if y.len() != g * e || e < 3 {
+        return Err(ComputeError::InvalidDimensions);
+    }
+
+    let mut means = vec![0.0; g];
+    let mut regression = vec![0.0; g];
+    let mut deviation = vec![0.0; g];
+
+    let status = unsafe {
+        c_eberhart_russell(
+            y.as_ptr(),
+            means.as_mut_ptr(),
+            regression.as_mut_ptr(),
+            deviation.as_mut_ptr(),
+            g as c_int,
+            e as c_int,
+        )
+    };
+
+    match status {
+        0 => Ok(StabilityResult {
+            means,
+            regression,
+            deviation,
+        }),
+        code => Err(ComputeError::Unknown(code)),
+    }
+}
+
+/// Safe wrapper for Finlay-Wilkinson regression
+///
+/// # Arguments
+/// * `y` - Genotype x environment means (g x e, column-major)
+pub fn finlay_wilkinson(y: &[f64], g: usize, e: usize) -> ComputeResult<FinlayWilkinsonResult> {
+    if y.len() != g * e {
+        return Err(ComputeError::InvalidDimensions);
+    }
+
+    let mut means = vec![0.0; g];
+    let mut slopes = vec![0.0; g];
+    let mut r_squared = vec![0.0; g];
+    let mut env_index = vec![0.0; e];
+
+    let status = unsafe {
+        c_finlay_wilkinson(
+            y.as_ptr(),
+            means.as_mut_ptr(),
+            slopes.as_mut_ptr(),
+            r_squared.as_mut_ptr(),
+            env_index.as_mut_ptr(),
+            g as c_int,
+            e as c_int,
+        )
+    };
+
+    match status {
+        0 => Ok(FinlayWilkinsonResult {
+            means,
+            slopes,
+            r_squared,
+            env_index,
+        }),
+        code => Err(ComputeError::Unknown(code)),
+    }
+}
+
+/// Safe wrapper for Smith-Hazel selection index coefficients (b = P⁻¹Ga)
+///
+/// # Arguments
+/// * `p` - Phenotypic covariance matrix (t x t, column-major)
+/// * `g` - Genetic covariance matrix (t x t, column-major)
+/// * `a` - Economic weights (t)
+pub fn smith_hazel_index(p: &[f64], g: &[f64], a: &[f64], t: usize) -> ComputeResult<Vec<f64>> {
+    if p.len() != t * t || g.len() != t * t || a.len() != t {
+        return Err(ComputeError::InvalidDimensions);
+    }
+
+    let mut b = vec![0.0; t];
+
+    let status = unsafe {
+        c_smith_hazel_index(
+            p.as_ptr(),
+            g.as_ptr(),
+            a.as_ptr(),
+            b.as_mut_ptr(),
+            t as c_int,
+        )
+    };
+
+    match status {
+        0 => Ok(b),
+        -1 => Err(ComputeError::MatrixInversionFailed),
+        code => Err(ComputeError::Unknown(code)),
+    }
+}
+
 /// Solve Mixed Model Equations using Preconditioned Conjugate Gradient
 ///
 /// # Arguments
@@ -527,6 +794,28 @@ mod tests {
         assert_eq!(grm.len(), n * n);
     }
 
+    #[test]
+    fn test_ld_matrix_dimensions() {
+        let (n, m) = (8, 5);
+        let genotypes: Vec<f64> = (0..n * m).map(|i| (i % 3) as f64).collect();
+
+        let ld = ld_matrix(&genotypes, n, m).unwrap();
+        assert_eq!(ld.len(), m * m);
+        assert!(matches!(
+            ld_matrix(&genotypes, n, m + 1),
+            Err(ComputeError::InvalidDimensions)
+        ));
+    }
+
+    #[test]
+    fn test_pca_rejects_too_many_components() {
+        let x = vec![1.0; 12];
+        assert!(matches!(
+            pca(&x, 4, 3, 4, true, false),
+            Err(ComputeError::InvalidDimensions)
+        ));
+    }
+
     #[test]
     fn test_invalid_dimensions() {
         let genotypes = vec![0.0; 50]; // Wrong size
@@ -55,5 +55,10 @@ fn bijmantra_compute(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(python_bindings::gblup, m)?)?;
     m.add_function(wrap_pyfunction!(python_bindings::compute_grm, m)?)?;
     m.add_function(wrap_pyfunction!(python_bindings::reml_estimate, m)?)?;
+    m.add_function(wrap_pyfunction!(python_bindings::compute_ld_matrix, m)?)?;
+    m.add_function(wrap_pyfunction!(python_bindings::compute_pca, m)?)?;
+    m.add_function(wrap_pyfunction!(python_bindings::eberhart_russell, m)?)?;
+    m.add_function(wrap_pyfunction!(python_bindings::finlay_wilkinson, m)?)?;
+    m.add_function(wrap_pyfunction!(python_bindings::smith_hazel_index, m)?)?;
     Ok(())
 }
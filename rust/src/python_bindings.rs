@@ -146,3 +146,105 @@ pub fn reml_estimate(
         result.log_likelihood,
     ))
 }
+
+// The kernels below take column-major (Fortran order) matrices flattened to
+// 1-D, e.g. `array.ravel(order="F")`, and return column-major results.
+
+#[pyfunction]
+pub fn compute_ld_matrix(
+    _py: Python<'_>,
+    genotypes: PyReadonlyArray1<f64>,
+    n: usize,
+    m: usize,
+) -> PyResult<Py<PyAny>> {
+    let genotypes = genotypes.as_slice()?;
+
+    let ld_vec = fortran_ffi::ld_matrix(genotypes, n, m)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+
+    Ok(ld_vec.into_pyarray(_py).to_owned().into())
+}
+
+#[pyfunction]
+pub fn compute_pca(
+    _py: Python<'_>,
+    x: PyReadonlyArray1<f64>,
+    n: usize,
+    p: usize,
+    k: usize,
+    center: bool,
+    scale: bool,
+) -> PyResult<(Py<PyAny>, Py<PyAny>, Py<PyAny>)> {
+    let x = x.as_slice()?;
+
+    let result = fortran_ffi::pca(x, n, p, k, center, scale)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+
+    let scores = result.scores.into_pyarray(_py).to_owned();
+    let loadings = result.loadings.into_pyarray(_py).to_owned();
+    let variance = result.variance.into_pyarray(_py).to_owned();
+
+    Ok((scores.into(), loadings.into(), variance.into()))
+}
+
+#[pyfunction]
+pub fn eberhart_russell(
+    _py: Python<'_>,
+    yields: PyReadonlyArray1<f64>,
+    g: usize,
+    e: usize,
+) -> PyResult<(Py<PyAny>, Py<PyAny>, Py<PyAny>)> {
+    let yields = yields.as_slice()?;
+
+    let result = fortran_ffi::eberhart_russell(yields, g, e)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+
+    let means = result.means.into_pyarray(_py).to_owned();
+    let regression = result.regression.into_pyarray(_py).to_owned();
+    let deviation = result.deviation.into_pyarray(_py).to_owned();
+
+    Ok((means.into(), regression.into(), deviation.into()))
+}
+
+#[pyfunction]
+pub fn finlay_wilkinson(
+    _py: Python<'_>,
+    yields: PyReadonlyArray1<f64>,
+    g: usize,
+    e: usize,
+) -> PyResult<(Py<PyAny>, Py<PyAny>, Py<PyAny>, Py<PyAny>)> {
+    let yields = yields.as_slice()?;
+
+    let result = fortran_ffi::finlay_wilkinson(yields, g, e)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+
+    let means = result.means.into_pyarray(_py).to_owned();
+    let slopes = result.slopes.into_pyarray(_py).to_owned();
+    let r_squared = result.r_squared.into_pyarray(_py).to_owned();
+    let env_index = result.env_index.into_pyarray(_py).to_owned();
+
+    Ok((
+        means.into(),
+        slopes.into(),
+        r_squared.into(),
+        env_index.into(),
+    ))
+}
+
+#[pyfunction]
+pub fn smith_hazel_index(
+    _py: Python<'_>,
+    phenotypic_cov: PyReadonlyArray1<f64>,
+    genetic_cov: PyReadonlyArray1<f64>,
+    economic_weights: PyReadonlyArray1<f64>,
+    t: usize,
+) -> PyResult<Py<PyAny>> {
+    let phenotypic_cov = phenotypic_cov.as_slice()?;
+    let genetic_cov = genetic_cov.as_slice()?;
+    let economic_weights = economic_weights.as_slice()?;
+
+    let b_vec = fortran_ffi::smith_hazel_index(phenotypic_cov, genetic_cov, economic_weights, t)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+
+    Ok(b_vec.into_pyarray(_py).to_owned().into())
+}